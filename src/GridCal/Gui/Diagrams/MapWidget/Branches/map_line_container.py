@@ -135,6 +135,14 @@ class MapLineContainer(GenericDiagramWidget):
             segment.setToolTip(tool_tip)
             segment.set_colour(color=color, style=style)
 
+    def set_tool_tip(self, tool_tip: str) -> None:
+        """
+        Set the tool tip text of all the segments
+        :param tool_tip: tool tip text
+        """
+        for segment in self.segments_list:
+            segment.setToolTip(tool_tip)
+
     def update_connectors(self) -> None:
         """
 
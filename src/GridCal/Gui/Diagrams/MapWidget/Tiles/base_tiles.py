@@ -11,7 +11,8 @@ import math
 from typing import Tuple, Union, List
 from collections.abc import Callable
 from PySide6.QtGui import QPixmap
-from GridCal.Gui.Diagrams.MapWidget.Tiles.tiles_cache import TilesCache
+from GridCal.Gui.Diagrams.MapWidget.Tiles.tiles_cache import create_tiles_cache
+from GridCal.Gui.Diagrams.MapWidget.Tiles.mbtiles_store import is_mbtiles_path
 
 
 class BaseTiles(object):
@@ -22,14 +23,16 @@ class BaseTiles(object):
                  tile_width: int,
                  tile_height: int,
                  tiles_dir: str,
-                 max_lru: int):
+                 max_lru: int,
+                 max_cache_mb: float = 256.0):
         """
         Initialise a Tiles instance.
         :param levels: a list of level numbers that are to be served
         :param tile_width: width of each tile in pixels
         :param tile_height: height of each tile in pixels
-        :param tiles_dir: path to on-disk tile cache directory
+        :param tiles_dir: path to on-disk tile cache directory or to an MBTiles file
         :param max_lru: maximum number of tiles cached in-memory
+        :param max_cache_mb: maximum size of the tiles cached in-memory (MB)
         """
 
         # save params
@@ -54,7 +57,9 @@ class BaseTiles(object):
         #        self.wrap_y = False
 
         # setup the tile cache
-        self.cache = TilesCache(tiles_dir=tiles_dir, max_lru=max_lru)
+        self.cache = create_tiles_cache(tiles_dir=tiles_dir,
+                                        max_lru=max_lru,
+                                        max_bytes=int(max_cache_mb * 1024 * 1024))
 
         #####
         # Now finish setting up
@@ -63,8 +68,8 @@ class BaseTiles(object):
         # tiles extent for tile data (left, right, top, bottom)
         self.extent = (-180.0, 180.0, -85.0511, 85.0511)
 
-        # check tile cache - we expect there to already be a directory
-        if not os.path.isdir(tiles_dir):
+        # check tile cache - we expect there to already be a directory (or an MBTiles file)
+        if not is_mbtiles_path(tiles_dir) and not os.path.isdir(tiles_dir):
             if os.path.isfile(tiles_dir):
                 msg = ("%s doesn't appear to be a tile cache directory" % tiles_dir)
                 raise Exception(msg) from None
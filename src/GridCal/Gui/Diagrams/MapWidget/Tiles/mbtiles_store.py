@@ -0,0 +1,229 @@
+"""
+Single file tile store following the MBTiles specification (https://github.com/mapbox/mbtiles-spec)
+The tiles are stored in a SQLite database, which is much faster to copy and to read than
+thousands of small files, and it allows to ship offline maps as a single file.
+"""
+import os
+import math
+import sqlite3
+import threading
+from typing import Dict, List, Tuple, Union
+
+MBTILES_EXTENSION = '.mbtiles'
+
+
+def is_mbtiles_path(path: str) -> bool:
+    """
+    Is the path an MBTiles file path?
+    :param path: path
+    :return: bool
+    """
+    return path.lower().endswith(MBTILES_EXTENSION)
+
+
+def resolve_tiles_location(tiles_dir: str) -> str:
+    """
+    Get the location of the tiles: if there is an MBTiles file next to the tiles directory
+    (i.e. osm.mbtiles for the osm directory) the MBTiles file is used
+    :param tiles_dir: tiles directory or MBTiles file path
+    :return: tiles directory or MBTiles file path
+    """
+    if is_mbtiles_path(tiles_dir):
+        return tiles_dir
+
+    mbtiles_path = tiles_dir.rstrip('/\\') + MBTILES_EXTENSION
+    if os.path.isfile(mbtiles_path):
+        return mbtiles_path
+    else:
+        return tiles_dir
+
+
+def geo_to_tile_index(longitude: float, latitude: float, level: int) -> Tuple[int, int]:
+    """
+    Get the slippy map tile index (x, y from the top) that contains a coordinate
+    :param longitude: longitude in degrees
+    :param latitude: latitude in degrees
+    :param level: zoom level
+    :return: x, y
+    """
+    n = 2 ** level
+    lat_rad = math.radians(max(min(latitude, 85.0511), -85.0511))
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+class MBTilesStore:
+    """
+    Tiles store in an MBTiles (SQLite) file.
+    The keys are the slippy map (level, x, y) indices, y from the top; the MBTiles TMS rows are handled internally.
+    The store can be used from several threads.
+    """
+
+    def __init__(self, file_path: str, name: str = "", image_format: str = 'png'):
+        """
+        Open or create an MBTiles file
+        :param file_path: path of the .mbtiles file
+        :param name: name of the tile set (stored in the metadata when the file is created)
+        :param image_format: format of the tiles (png or jpg)
+        """
+        self.file_path = file_path
+
+        folder = os.path.dirname(file_path)
+        if folder != '' and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+
+        with self._lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT, value TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER, "
+                               "tile_row INTEGER, tile_data BLOB)")
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS tile_index "
+                               "ON tiles (zoom_level, tile_column, tile_row)")
+
+            if self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0] == 0:
+                self._conn.executemany("INSERT INTO metadata (name, value) VALUES (?, ?)",
+                                       [('name', name), ('format', image_format), ('type', 'baselayer'),
+                                        ('version', '1.0')])
+            self._conn.commit()
+
+    @staticmethod
+    def _tms_row(level: int, y: int) -> int:
+        """
+        Convert the slippy map row (from the top) to the MBTiles TMS row (from the bottom)
+        :param level: zoom level
+        :param y: row from the top
+        :return: row from the bottom
+        """
+        return (2 ** level) - 1 - int(y)
+
+    def get_metadata(self) -> Dict[str, str]:
+        """
+        Get the metadata of the file
+        :return: dictionary
+        """
+        with self._lock:
+            return {name: value for name, value in self._conn.execute("SELECT name, value FROM metadata")}
+
+    def get(self, level: int, x: int, y: int) -> Union[bytes, None]:
+        """
+        Get the encoded image of a tile
+        :param level: zoom level
+        :param x: column
+        :param y: row (from the top)
+        :return: encoded image bytes or None if the tile is not stored
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT tile_data FROM tiles "
+                                     "WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                     (int(level), int(x), self._tms_row(level, y))).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def has(self, level: int, x: int, y: int) -> bool:
+        """
+        Is the tile stored?
+        :param level: zoom level
+        :param x: column
+        :param y: row (from the top)
+        :return: bool
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                     (int(level), int(x), self._tms_row(level, y))).fetchone()
+        return row is not None
+
+    def put(self, level: int, x: int, y: int, data: bytes) -> None:
+        """
+        Store the encoded image of a tile
+        :param level: zoom level
+        :param x: column
+        :param y: row (from the top)
+        :param data: encoded image bytes
+        """
+        self.put_many([(level, x, y, data)])
+
+    def put_many(self, tiles: List[Tuple[int, int, int, bytes]]) -> None:
+        """
+        Store several tiles in a single transaction
+        :param tiles: list of (level, x, y, encoded image bytes)
+        """
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) "
+                                   "VALUES (?, ?, ?, ?)",
+                                   [(int(level), int(x), self._tms_row(level, y), sqlite3.Binary(data))
+                                    for level, x, y, data in tiles])
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        """
+        Number of stored tiles
+        :return: int
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def import_directory(self,
+                         tiles_dir: str,
+                         levels: List[int],
+                         extent: Union[Tuple[float, float, float, float], None] = None,
+                         tile_path: str = '{Z}/{X}/{Y}.png',
+                         batch_size: int = 1000) -> int:
+        """
+        Bulk import the tiles of a tiles directory (i.e. the on-disk cache of the map widget)
+        :param tiles_dir: tiles directory
+        :param levels: zoom levels to import
+        :param extent: (min longitude, max longitude, min latitude, max latitude) to import, None for everything
+        :param tile_path: relative path of a tile in the directory
+        :param batch_size: number of tiles inserted per transaction
+        :return: number of imported tiles
+        """
+        n_imported = 0
+        batch = list()
+
+        for level in levels:
+
+            level_dir = os.path.join(tiles_dir, str(level))
+            if not os.path.isdir(level_dir):
+                continue
+
+            if extent is None:
+                # walk the existing tiles of the level
+                keys = list()
+                for x_name in os.listdir(level_dir):
+                    x_dir = os.path.join(level_dir, x_name)
+                    if x_name.isdigit() and os.path.isdir(x_dir):
+                        for y_name in os.listdir(x_dir):
+                            y_str = os.path.splitext(y_name)[0]
+                            if y_str.isdigit():
+                                keys.append((int(x_name), int(y_str)))
+            else:
+                lon_min, lon_max, lat_min, lat_max = extent
+                x1, y1 = geo_to_tile_index(lon_min, lat_max, level)  # top-left
+                x2, y2 = geo_to_tile_index(lon_max, lat_min, level)  # bottom-right
+                keys = [(x, y) for x in range(x1, x2 + 1) for y in range(y1, y2 + 1)]
+
+            for x, y in keys:
+                file_path = os.path.join(tiles_dir, tile_path.format(Z=level, X=x, Y=y))
+                if os.path.isfile(file_path):
+                    with open(file_path, 'rb') as f:
+                        batch.append((level, x, y, f.read()))
+
+                    if len(batch) >= batch_size:
+                        self.put_many(batch)
+                        n_imported += len(batch)
+                        batch = list()
+
+        if len(batch):
+            self.put_many(batch)
+            n_imported += len(batch)
+
+        return n_imported
+
+    def close(self) -> None:
+        """
+        Close the file
+        """
+        with self._lock:
+            self._conn.close()
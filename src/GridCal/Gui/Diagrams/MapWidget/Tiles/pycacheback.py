@@ -4,47 +4,87 @@ and an interface to an unlimited backing store.
 
 https://github.com/rzzzwilson/pyCacheBack
 """
+from collections import OrderedDict
 
 
 class PyCacheBack(dict):
-    """An LRU limited in-memory store fronting an unlimited on-disk store."""
+    """An LRU limited in-memory store fronting an unlimited on-disk store.
+    The in-memory store is limited both by number of entries and by size in bytes."""
 
     # default maximum number of key/value pairs for pyCacheBack
     DefaultMaxLRU = 1000
 
+    # default maximum size of the in-memory values (bytes), 0 means no limit
+    DefaultMaxBytes = 0
+
     # default path to tiles directory
     DefaultTilesDir = 'tiles'
 
     def __init__(self, *args, **kwargs):
-        self._lru_list = []
+        self._lru = OrderedDict()  # key -> size of the value, most recent last
+        self._bytes = 0
         self._max_lru = kwargs.pop('max_lru', self.DefaultMaxLRU)
+        self._max_bytes = kwargs.pop('max_bytes', self.DefaultMaxBytes)
         self._tiles_dir = kwargs.pop('tiles_dir', self.DefaultTilesDir)
         super().__init__(*args, **kwargs)
 
     def __getitem__(self, key):
         if key in self:
             value = super().__getitem__(key)
+            self._lru.move_to_end(key)
         else:
             value = self._get_from_back(key)
-        self._reorder_lru(key)
         return value
 
     def __setitem__(self, key, value):
-        super().__setitem__(key, value)
+        self.put_in_memory(key, value)
         self._put_to_back(key, value)
-        self._reorder_lru(key)
-        self._enforce_lru_size()
 
     def __delitem__(self, key):
         super().__delitem__(key)
-        self._reorder_lru(key, remove=True)
+        self._bytes -= self._lru.pop(key, 0)
+
+    @property
+    def memory_size(self) -> int:
+        """
+        Size of the in-memory values (bytes)
+        """
+        return self._bytes
+
+    def put_in_memory(self, key, value):
+        """
+        Put a value in the in-memory store only (not in the backing store)
+        :param key: key
+        :param value: value
+        """
+        if key in self:
+            self._bytes -= self._lru.pop(key, 0)
+        super().__setitem__(key, value)
+        size = self._size_of(value)
+        self._lru[key] = size
+        self._bytes += size
+        self._enforce_lru_size()
+
+    def get_from_memory(self, key, default=None):
+        """
+        Get a value from the in-memory store only
+        :param key: key
+        :param default: value to return if the key is not in memory
+        :return: value
+        """
+        if key in self:
+            self._lru.move_to_end(key)
+            return super().__getitem__(key)
+        else:
+            return default
 
     def clear(self):
         """
 
         """
         super().clear()
-        self._lru_list = []
+        self._lru.clear()
+        self._bytes = 0
 
     def pop(self, *args):
         """
@@ -53,10 +93,7 @@ class PyCacheBack(dict):
         :return:
         """
         k = args[0]
-        try:
-            self._lru_list.remove(k)
-        except ValueError:
-            pass
+        self._bytes -= self._lru.pop(k, 0)
         return super().pop(*args)
 
     def popitem(self):
@@ -65,41 +102,28 @@ class PyCacheBack(dict):
         :return:
         """
         kv_return = super().popitem()
-        try:
-            self._lru_list.remove(kv_return[0])
-        except ValueError:
-            pass
+        self._bytes -= self._lru.pop(kv_return[0], 0)
         return kv_return
 
-    def _reorder_lru(self, key, remove=False):
-        """Move key in LRU (if it exists) to 'recent' end.
-
-        If 'remove' is True just remove from the LRU.
-        """
-
-        try:
-            self._lru_list.remove(key)
-        except ValueError:
-            pass
-        if remove:
-            return
-        self._lru_list.insert(0, key)
-
     def _enforce_lru_size(self):
-        """Enforce LRU size limit in cache dictionary."""
+        """Enforce LRU size limits in cache dictionary."""
 
-        # if a limit was defined and we have blown it
-        if self._max_lru and len(self) > self._max_lru:
-            # make sure in-memory dictionary doesn't get bigger
-            for key in self._lru_list[self._max_lru:]:
-                super().__delitem__(key)
-            # also truncate the LRU list
-            self._lru_list = self._lru_list[:self._max_lru]
+        # drop the least recently used entries while a limit is blown
+        while len(self._lru) > 1 and ((self._max_lru and len(self._lru) > self._max_lru) or
+                                      (self._max_bytes and self._bytes > self._max_bytes)):
+            key, size = self._lru.popitem(last=False)
+            super().__delitem__(key)
+            self._bytes -= size
 
     #####
-    # override the following two methods to implement the backing cache
+    # override the following methods to implement the backing cache
     #####
 
+    def _size_of(self, value) -> int:
+        """Size in bytes of a value held in memory."""
+
+        return 0
+
     def _put_to_back(self, key, value):
         """Store 'value' in backing store, using 'key' to access."""
 
@@ -112,4 +136,3 @@ class PyCacheBack(dict):
         """
 
         raise KeyError
-
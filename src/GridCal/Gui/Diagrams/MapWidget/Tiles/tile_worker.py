@@ -8,8 +8,9 @@ import queue
 import ssl
 # from urllib import request
 from urllib.request import Request, urlopen
+from typing import Union
 from collections.abc import Callable
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QImage
 from PySide6.QtCore import QThread
 
 # SSL magic to solve the certificates hell
@@ -29,15 +30,16 @@ class TileWorker(QThread):
                  server: str,
                  tilepath: str,
                  requests_cue: queue.Queue,
-                 callback: Callable[[int, float, float, QPixmap, bool], None],  # level, x, y, pixmap, error
-                 error_tile: QPixmap,
+                 callback: Callable[[int, float, float, QImage, bool, Union[bytes, None]], None],
+                 error_tile: QImage,
                  content_type: str,
                  rerequest_age: float,
-                 error_image: QPixmap,
+                 error_image: QImage,
                  refresh_tiles_after_days=60):
         """
         Prepare the tile worker
-        Results are returned in the callback() params.
+        Results are returned in the callback() params: level, x, y, image, error, encoded image data.
+        The tiles are decoded into QImage (and not into QPixmap) because QImage can be used outside the GUI thread.
         :param id_num: a unique numer identifying the worker instance
         :param server: server URL
         :param tilepath: path to tile on server
@@ -56,7 +58,7 @@ class TileWorker(QThread):
         self.server = server
         self.tilepath = tilepath
         self.requests_cue = requests_cue
-        self.callback: Callable[[int, float, float, QPixmap, bool], None] = callback
+        self.callback: Callable[[int, float, float, QImage, bool, Union[bytes, None]], None] = callback
         self.error_tile_image = error_tile
         self.content_type = content_type
         self.rerequest_age = rerequest_age
@@ -75,7 +77,8 @@ class TileWorker(QThread):
 
             # try to retrieve the image
             error = False
-            pixmap = self.error_image
+            image = self.error_image
+            data = None
             try:
                 tile_url = self.server + self.tilepath.format(Z=level, X=x, Y=y)
 
@@ -86,8 +89,10 @@ class TileWorker(QThread):
 
                 if content_type == self.content_type:
                     data = response.read()
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(data)
+                    image = QImage.fromData(data)
+                    if image.isNull():
+                        error = True
+                        image = self.error_image
                 else:
                     # show error, don't cache returned error tile
                     error = True
@@ -95,9 +100,9 @@ class TileWorker(QThread):
                 error = True
                 log(f"{e} exception getting tile ({level},{x},{y}) with {tile_url}")
 
-            # call the callback function passing level, x, y and pixmap data
+            # call the callback function passing level, x, y and image data
             # error is False if we want to cache this tile on-disk
-            self.callback(level, x, y, pixmap, error)
+            self.callback(level, x, y, image, error, data)
 
             # finally, removes request from queue
             self.requests_cue.task_done()
@@ -13,11 +13,14 @@ import urllib
 from urllib import request
 from urllib.error import HTTPError
 import queue
-from PySide6.QtGui import QPixmap, QColor
-from typing import List, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtGui import QPixmap, QImage, QColor
+from typing import Dict, List, Tuple, Union
 from collections.abc import Callable
 from GridCal.Gui.Diagrams.MapWidget.Tiles.base_tiles import BaseTiles
 from GridCal.Gui.Diagrams.MapWidget.Tiles.tile_worker import TileWorker
+from GridCal.Gui.Diagrams.MapWidget.Tiles.mbtiles_store import is_mbtiles_path, resolve_tiles_location
 
 
 def log(val: str):
@@ -60,19 +63,24 @@ class Tiles(BaseTiles):
                  max_server_requests: int,
                  http_proxy,
                  refetch_days: int = 60,
-                 attribution: str = ""):
+                 attribution: str = "",
+                 max_cache_mb: float = 256.0,
+                 decode_threads: int = 2):
         """
         Initialise a Tiles instance.
         :param levels: a list of level numbers that are to be served
         :param tile_width: width of each tile in pixels
         :param tile_height: height of each tile in pixels
-        :param tiles_dir: path to on-disk tile cache directory
+        :param tiles_dir: path to on-disk tile cache directory, if there is a {tiles_dir}.mbtiles file it is used instead
         :param max_lru: maximum number of tiles cached in-memory
         :param servers: list of tile servers
         :param url_path: path on server to each tile
         :param max_server_requests: maximum number of requests per server
         :param http_proxy: proxy to use if required
         :param refetch_days: fetch new server tile if older than this in days (0 means don't ever update tiles)
+        :param attribution: attribution text of the tiles
+        :param max_cache_mb: maximum size of the tiles cached in-memory (MB)
+        :param decode_threads: number of threads reading and decoding the stored tiles
         """
         self.TilesetName = TilesetName
         self.TilesetShortName = TilesetShortName
@@ -80,15 +88,19 @@ class Tiles(BaseTiles):
 
         self.attribution_string = attribution
 
+        # use the offline MBTiles file if there is one
+        tiles_dir = resolve_tiles_location(tiles_dir)
+
         # prepare the tile cache directory, if required
         # we have to do this *before* the base class initialization!
-        for level in levels:
-            level_dir = os.path.join(tiles_dir, '%d' % level)
-            if not os.path.isdir(level_dir):
-                os.makedirs(level_dir)
+        if not is_mbtiles_path(tiles_dir):
+            for level in levels:
+                level_dir = os.path.join(tiles_dir, '%d' % level)
+                if not os.path.isdir(level_dir):
+                    os.makedirs(level_dir)
 
         # perform the base class initialization
-        super().__init__(levels, tile_width, tile_height, tiles_dir, max_lru)
+        super().__init__(levels, tile_width, tile_height, tiles_dir, max_lru, max_cache_mb)
 
         # save params not saved in super()
         self.servers = servers
@@ -98,7 +110,7 @@ class Tiles(BaseTiles):
         self.refresh_tiles_after_days = refetch_days
 
         # callback must be set by higher-level copde
-        self.callback: Union[None, Callable[[int, float, float, QPixmap, bool], None]] = None
+        self.callback: Union[None, Callable[[int, float, float, QImage, bool], None]] = None
 
         # calculate a re-request age, if specified
         self.rerequest_age = (time.time() - self.refresh_tiles_after_days * self.SecondsInADay)
@@ -135,6 +147,13 @@ class Tiles(BaseTiles):
         # set the list of queued unsatisfied requests to 'empty'
         self.queued_requests = {}
 
+        # the stored tiles are read and decoded in these threads, never in the GUI thread
+        self.decode_pool = ThreadPoolExecutor(max_workers=decode_threads)
+
+        # tiles decoded by the threads, waiting to be converted to pixmap in the GUI thread
+        self._decoded: Dict[Tuple[int, float, float], QImage] = dict()
+        self._decoded_lock = threading.Lock()
+
         # prepare the "pending" and "error" images
         self.pending_tile = QPixmap(256, 256)
         self.pending_tile.fill(QColor.fromRgb(50, 50, 50, 255))
@@ -144,6 +163,9 @@ class Tiles(BaseTiles):
         self.error_tile.fill(QColor.fromRgb(255, 0, 0, 255))
         # self.error_tile.loadFromData(std.getErrorImage())
 
+        # the workers use images, because pixmaps can only be used in the GUI thread
+        self.error_tile_image = self.error_tile.toImage()
+
         # test for firewall - use proxy (if supplied)
         test_url = self.servers[0] + self.url_path.format(Z=0, X=0, Y=0)
         try:
@@ -190,10 +212,10 @@ class Tiles(BaseTiles):
                                     tilepath=self.url_path,
                                     requests_cue=self.request_queue,
                                     callback=self.tile_is_available,
-                                    error_tile=self.error_tile,
+                                    error_tile=self.error_tile_image,
                                     content_type=self.content_type,
                                     rerequest_age=self.rerequest_age,
-                                    error_image=self.error_tile,
+                                    error_image=self.error_tile_image,
                                     refresh_tiles_after_days=60)
                 self.workers.append(worker)
                 worker.start()
@@ -244,19 +266,27 @@ class Tiles(BaseTiles):
         return old tile after starting the process to get new tile from servers.
         """
 
-        try:
-            # get tile from cache
-            tile = self.cache[(self.level, x, y)]
-            if self.tile_on_disk(self.level, x, y):
-                tile_date = self.cache.tile_date((self.level, x, y))
-                if self.rerequest_age and (tile_date < self.rerequest_age):
-                    self.get_server_tile(self.level, x, y)
-        except KeyError as e:
-            # not cached, start process of getting tile from 'net, return 'pending' image
-            self.get_server_tile(self.level, x, y)
-            tile = self.pending_tile
+        key = (self.level, x, y)
 
-        return tile
+        # tile decoded by the threads (new or refreshed): convert it to pixmap (this does not decode the image again)
+        if self._decoded:
+            with self._decoded_lock:
+                image = self._decoded.pop(key, None)
+
+            if image is not None:
+                tile = QPixmap.fromImage(image)
+                self.cache.put_in_memory(key, tile)
+                return tile
+
+        # tile in memory
+        tile = self.cache.get_from_memory(key)
+        if tile is not None:
+            return tile
+
+        # not available yet: read it from the store or from the servers in the background
+        self.request_tile(self.level, x, y)
+
+        return self.pending_tile
 
     def GetInfo(self, level):
         """
@@ -294,6 +324,44 @@ class Tiles(BaseTiles):
                 self.request_queue.queue.clear()
             self.queued_requests.clear()
 
+        with self._decoded_lock:
+            self._decoded.clear()
+
+    def request_tile(self, level: int, x: float, y: float) -> None:
+        """
+        Start the process to get a tile from the backing store or, if it is not there, from the servers.
+        The tile is read and decoded in the decoding threads.
+        """
+
+        tile_key = (level, x, y)
+        if tile_key not in self.queued_requests:
+            self.queued_requests[tile_key] = True
+            self.decode_pool.submit(self._load_tile, tile_key)
+
+    def _load_tile(self, tile_key: Tuple[int, float, float]) -> None:
+        """
+        Read and decode a tile from the backing store (runs in the decoding threads)
+        :param tile_key: (level, x, y)
+        """
+        try:
+            data = self.cache.get_data(tile_key)
+            if data is not None:
+                image = QImage.fromData(data)
+                if not image.isNull():
+                    tile_date = self.cache.tile_date(tile_key)
+                    self.tile_is_available(*tile_key, image=image, error=False, data=None)
+
+                    # if the stored tile is too old, get a fresh one from the servers
+                    if self.rerequest_age and tile_date is not None and tile_date < self.rerequest_age:
+                        self.get_server_tile(*tile_key)
+                    return
+        except Exception as e:
+            log(f"{e} exception reading tile {tile_key}")
+
+        # not stored (or unreadable): get it from the servers
+        self.queued_requests.pop(tile_key, None)
+        self.get_server_tile(*tile_key)
+
     def get_server_tile(self, level: int, x: float, y: float) -> None:
         """
         Start the process to get a server tile.
@@ -314,10 +382,9 @@ class Tiles(BaseTiles):
     def tile_on_disk(self, level: int, x: float, y: float):
         """Return True if tile at (level, x, y) is on-disk."""
 
-        tile_path = self.cache.tile_path((level, x, y))
-        return os.path.exists(tile_path)
+        return self.cache.has_tile((level, x, y))
 
-    def setCallback(self, callback: Callable[[int, float, float, QPixmap, bool], None]):
+    def setCallback(self, callback: Callable[[int, float, float, QImage, bool], None]):
         """Set the "tile available" callback.
 
         callback  reference to object to call when tile is found.
@@ -325,28 +392,33 @@ class Tiles(BaseTiles):
 
         self.callback = callback
 
-    def tile_is_available(self, level: int, x: float, y: float, image: QPixmap, error: bool):
+    def tile_is_available(self, level: int, x: float, y: float, image: QImage, error: bool,
+                          data: Union[bytes, None] = None):
         """
-        Callback routine - a 'net tile is available.
+        Callback routine - a tile is available (it is called from the worker threads).
 
         level   level for the tile
         x       x coordinate of tile
         y       y coordinate of tile
         image   tile image data
         error   True if image is 'error' image, don't cache in that case
+        data    encoded image data to put in the backing store (None if it comes from the backing store)
         """
 
-        # put image into in-memory cache, but error images don't go to disk
-        self.cache[(level, x, y)] = image
-        if not error:
-            self.cache.add(key=(level, x, y), image=image)
+        # store the encoded tile as it came, error images don't go to disk
+        if not error and data is not None:
+            try:
+                self.cache.add_data(key=(level, x, y), data=data)
+            except Exception as e:
+                log(f"{e} exception storing tile ({level},{x},{y})")
+
+        # leave the image for the GUI thread
+        with self._decoded_lock:
+            self._decoded[(level, x, y)] = image
 
         # remove the request from the queued requests
         # note that it may not be there - a level change can flush the dict
-        try:
-            del self.queued_requests[(level, x, y)]
-        except KeyError:
-            pass
+        self.queued_requests.pop((level, x, y), None)
 
         # tell the world a new tile is available
         if self.callback:
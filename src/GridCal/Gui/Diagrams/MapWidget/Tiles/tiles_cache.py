@@ -7,9 +7,35 @@ For example, see gmt_local.py (local tiles) and osm_tiles.py
 """
 
 import os
-from typing import Tuple
-from PySide6.QtGui import QPixmap
+from typing import Tuple, Union
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QPixmap, QImage
 import GridCal.Gui.Diagrams.MapWidget.Tiles.pycacheback as pycacheback
+from GridCal.Gui.Diagrams.MapWidget.Tiles.mbtiles_store import MBTilesStore, is_mbtiles_path
+
+
+def image_size_in_bytes(image: Union[QPixmap, QImage]) -> int:
+    """
+    Approximate memory used by a decoded image
+    :param image: QPixmap or QImage
+    :return: number of bytes
+    """
+    return image.width() * image.height() * max(image.depth(), 8) // 8
+
+
+def encode_image(image: Union[QPixmap, QImage], file_format: str = 'PNG') -> bytes:
+    """
+    Encode an image
+    :param image: QPixmap or QImage
+    :param file_format: image format
+    :return: encoded bytes
+    """
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, file_format)
+    buffer.close()
+    return bytes(data.data())
 
 
 class TilesCache(pycacheback.PyCacheBack):
@@ -22,12 +48,40 @@ class TilesCache(pycacheback.PyCacheBack):
     PicExtension = 'png'
     TilePath = '{Z}/{X}/{Y}.%s' % PicExtension
 
-    def tile_date(self, key: Tuple[int, float, float]):
+    def _size_of(self, value: Union[QPixmap, QImage]) -> int:
+        """Size in bytes of a tile held in memory."""
+
+        return image_size_in_bytes(value)
+
+    def tile_date(self, key: Tuple[int, float, float]) -> Union[float, None]:
         """Return the creation date of a tile given its key."""
 
         tile_path = self.tile_path(key)
         return os.path.getctime(tile_path)
 
+    def has_tile(self, key: Tuple[int, float, float]) -> bool:
+        """Is the tile in the backing store?"""
+
+        return os.path.exists(self.tile_path(key))
+
+    def get_data(self, key: Tuple[int, float, float]) -> Union[bytes, None]:
+        """Return the encoded image of a tile from the backing store, None if it is not there.
+        This does not create any Qt object, so it can be called from any thread."""
+
+        try:
+            with open(self.tile_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def add_data(self, key: Tuple[int, float, float], data: bytes):
+        """Put the encoded image of a tile into the backing store."""
+
+        tile_path = self.tile_path(key)
+        os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+        with open(tile_path, 'wb') as f:
+            f.write(data)
+
     def tile_path(self, key: Tuple[int, float, float]) -> str:
         """Return path to a tile file given its key."""
 
@@ -84,3 +138,87 @@ class TilesCache(pycacheback.PyCacheBack):
         :param image: value
         """
         self._put_to_back(key, image)
+
+
+class MBTilesCache(pycacheback.PyCacheBack):
+    """Cache for local or internet tiles backed by a single MBTiles (SQLite) file.
+
+    Instance variables we use from pyCacheBack:
+        self._tiles_dir  path to the .mbtiles file
+    """
+
+    PicExtension = 'png'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = MBTilesStore(file_path=self._tiles_dir,
+                                  name=os.path.splitext(os.path.basename(self._tiles_dir))[0],
+                                  image_format=self.PicExtension)
+
+    def _size_of(self, value: Union[QPixmap, QImage]) -> int:
+        """Size in bytes of a tile held in memory."""
+
+        return image_size_in_bytes(value)
+
+    def tile_date(self, key: Tuple[int, float, float]) -> Union[float, None]:
+        """The MBTiles tiles have no date, they are never re-requested."""
+
+        return None
+
+    def has_tile(self, key: Tuple[int, float, float]) -> bool:
+        """Is the tile in the backing store?"""
+
+        return self.store.has(*key)
+
+    def get_data(self, key: Tuple[int, float, float]) -> Union[bytes, None]:
+        """Return the encoded image of a tile from the backing store, None if it is not there."""
+
+        return self.store.get(*key)
+
+    def add_data(self, key: Tuple[int, float, float], data: bytes):
+        """Put the encoded image of a tile into the backing store."""
+
+        self.store.put(*key, data=data)
+
+    def _get_from_back(self, key: Tuple[int, float, float]) -> QPixmap:
+        """Retrieve value for 'key' from backing storage.
+
+        Raises KeyError if tile not found.
+        """
+
+        data = self.store.get(*key)
+        if data is None:
+            raise KeyError("Item with key '%s' not found in the MBTiles file" % str(key)) from None
+
+        pixmap = QPixmap()
+        pixmap.loadFromData(data)
+        return pixmap
+
+    def _put_to_back(self, key: Tuple[int, float, float], image: QPixmap):
+        """Put a image into the MBTiles file."""
+
+        self.store.put(*key, data=encode_image(image, self.PicExtension.upper()))
+
+    def add(self, key: Tuple[int, float, float], image: QPixmap):
+        """
+        Add entry
+        :param key: key
+        :param image: value
+        """
+        self._put_to_back(key, image)
+
+
+def create_tiles_cache(tiles_dir: str,
+                       max_lru: int,
+                       max_bytes: int = 0) -> Union[TilesCache, MBTilesCache]:
+    """
+    Create the tiles cache that corresponds to the tiles location
+    :param tiles_dir: tiles directory or .mbtiles file path
+    :param max_lru: maximum number of tiles in memory
+    :param max_bytes: maximum size of the tiles in memory (bytes), 0 for no limit
+    :return: TilesCache or MBTilesCache
+    """
+    if is_mbtiles_path(tiles_dir):
+        return MBTilesCache(tiles_dir=tiles_dir, max_lru=max_lru, max_bytes=max_bytes)
+    else:
+        return TilesCache(tiles_dir=tiles_dir, max_lru=max_lru, max_bytes=max_bytes)
@@ -23,7 +23,7 @@ import math
 import pandas as pd
 from matplotlib import pyplot as plt
 
-from PySide6.QtWidgets import QGraphicsItem
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsScene
 from collections.abc import Callable
 from PySide6.QtSvg import QSvgGenerator
 from PySide6.QtCore import (Qt, QSize, QRect, QMimeData, QIODevice, QByteArray, QDataStream, QModelIndex)
@@ -54,6 +54,7 @@ from GridCal.Gui.Diagrams.MapWidget.Branches.map_ac_line import MapAcLine
 from GridCal.Gui.Diagrams.MapWidget.Branches.map_dc_line import MapDcLine
 from GridCal.Gui.Diagrams.MapWidget.Branches.map_hvdc_line import MapHvdcLine
 from GridCal.Gui.Diagrams.MapWidget.Branches.map_fluid_path import MapFluidPathLine
+from GridCal.Gui.Diagrams.MapWidget.Branches.map_line_segment import MapLineSegment
 from GridCal.Gui.Diagrams.MapWidget.Substation.node_graphic_item import NodeGraphicItem
 from GridCal.Gui.Diagrams.MapWidget.Substation.substation_graphic_item import SubstationGraphicItem
 from GridCal.Gui.Diagrams.MapWidget.Substation.voltage_level_graphic_item import VoltageLevelGraphicItem
@@ -64,6 +65,7 @@ import GridCalEngine.Devices.Diagrams.palettes as palettes
 from GridCal.Gui.Diagrams.graphics_manager import ALL_MAP_GRAPHICS
 from GridCal.Gui.Diagrams.MapWidget.Tiles.tiles import Tiles
 from GridCal.Gui.Diagrams.base_diagram_widget import BaseDiagramWidget
+from GridCal.Gui.Diagrams.level_of_detail import LevelOfDetailManager, DetailLevel
 from GridCal.Gui.messages import error_msg, info_msg
 
 if TYPE_CHECKING:
@@ -212,6 +214,12 @@ class GridMapWidget(BaseDiagramWidget):
     GridMapWidget
     """
 
+    # map level below which the line arrows and nodes are hidden
+    LOD_NO_LABELS_LEVEL = 8
+
+    # map level below which the line segments are drawn as a single path
+    LOD_COLLAPSE_LEVEL = 6
+
     def __init__(self,
                  gui: DiagramsMain,
                  tile_src: Tiles,
@@ -248,6 +256,9 @@ class GridMapWidget(BaseDiagramWidget):
                                    time_index=None,
                                    call_delete_db_element_func=call_delete_db_element_func)
 
+        # level of detail handler, declared after the map because it needs its scene
+        self.lod: Union[LevelOfDetailManager, None] = None
+
         # declare the map
         self.map = MapWidget(parent=self,
                              tile_src=tile_src,
@@ -256,6 +267,14 @@ class GridMapWidget(BaseDiagramWidget):
                              zoom_callback=self.zoom_callback,
                              position_callback=self.position_callback)
 
+        self.lod = LevelOfDetailManager(scene=self.map.diagram_scene,
+                                        no_labels_scale=self.LOD_NO_LABELS_LEVEL,
+                                        collapse_scale=self.LOD_COLLAPSE_LEVEL,
+                                        update_func=self.update_level_of_detail)
+
+        # the graphics added after drawing must follow the current level of detail
+        self.graphics_manager.on_add_func = self.lod.schedule_update
+
         # Any representation on the map must be done after this Goto Function
         self.map.GotoLevelAndPosition(level=6, longitude=longitude, latitude=latitude)
 
@@ -343,6 +362,71 @@ class GridMapWidget(BaseDiagramWidget):
         :param zoom_level: whatever zoom level
         """
         self.diagram.start_level = zoom_level
+        self.update_level_of_detail()
+
+    def get_lod_labels(self) -> List[QGraphicsItem]:
+        """
+        Get the arrows and line nodes that are hidden when zooming out
+        :return: list of graphic items
+        """
+        items = list()
+        for dev_tpe in [DeviceType.LineDevice,
+                        DeviceType.DCLineDevice,
+                        DeviceType.HVDCLineDevice,
+                        DeviceType.FluidPathDevice]:
+            for idtag, graphic in self.graphics_manager.get_device_type_dict(device_type=dev_tpe).items():
+                items += graphic.nodes_list
+                for segment in graphic.segments_list:
+                    items.append(segment.arrow_p_from)
+                    items.append(segment.arrow_q_from)
+                    items.append(segment.arrow_p_to)
+                    items.append(segment.arrow_q_to)
+
+        return items
+
+    def get_lod_branches(self) -> List[MapLineSegment]:
+        """
+        Get the line segments that are collapsed into a single path when zooming out
+        :return: list of MapLineSegment
+        """
+        items = list()
+        for dev_tpe in [DeviceType.LineDevice,
+                        DeviceType.DCLineDevice,
+                        DeviceType.HVDCLineDevice,
+                        DeviceType.FluidPathDevice]:
+            for idtag, graphic in self.graphics_manager.get_device_type_dict(device_type=dev_tpe).items():
+                items += graphic.segments_list
+
+        return items
+
+    def update_level_of_detail(self, force: bool = False) -> None:
+        """
+        Update the level of detail according to the current map level.
+        The items are only touched when the map level crosses one of the level thresholds.
+        :param force: apply the level even if it did not change (i.e. after drawing new elements)
+        """
+        if self.lod is None:
+            # the map is still being declared
+            return
+
+        n_branches = sum([len(self.graphics_manager.get_device_type_dict(device_type=dev_tpe))
+                          for dev_tpe in [DeviceType.LineDevice,
+                                          DeviceType.DCLineDevice,
+                                          DeviceType.HVDCLineDevice,
+                                          DeviceType.FluidPathDevice]])
+
+        level = self.lod.get_level(scale=self.map.level, n_branches=n_branches)
+
+        if level != self.lod.level or (force and level != DetailLevel.Full):
+            was_collapsed = self.lod.is_collapsed
+
+            self.lod.set_level(level=level,
+                               labels=self.get_lod_labels(),
+                               branches=self.get_lod_branches())
+
+            if was_collapsed and not self.lod.is_collapsed:
+                # the segments were not rescaled while hidden
+                self.update_device_sizes()
 
     def position_callback(self, latitude: float, longitude: float, x: int, y: int) -> None:
         """
@@ -376,7 +460,7 @@ class GridMapWidget(BaseDiagramWidget):
 
         :return:
         """
-        if self.constantLineWidth:
+        if self.constantLineWidth and not (self.lod is not None and self.lod.is_collapsed):
             for device_type, graphics in self.graphics_manager.graphic_dict.items():
                 for graphic_id, graphic_item in graphics.items():
                     if isinstance(graphic_item, MAP_BRANCH_GRAPHIC_TYPES):
@@ -723,6 +807,9 @@ class GridMapWidget(BaseDiagramWidget):
         :param diagram: MapDiagram
         :return:
         """
+        # adding many items to an indexed scene is slow, so the index is rebuilt once at the end
+        self.map.diagram_scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+
         # first pass: create substations
         for category, points_group in diagram.data.items():
 
@@ -775,6 +862,11 @@ class GridMapWidget(BaseDiagramWidget):
         for idtag, graphic_object in dev_dict.items():
             graphic_object.sort_voltage_levels()
 
+        self.map.diagram_scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+
+        # the new items must follow the current level of detail
+        self.update_level_of_detail(force=True)
+
     def add_object_to_the_schematic(self, elm: ALL_DEV_TYPES, logger: Logger = Logger()):
         """
 
@@ -926,14 +1018,18 @@ class GridMapWidget(BaseDiagramWidget):
         :return:
         """
 
-        # rescale lines
-        for dev_tpe in [DeviceType.LineDevice,
-                        DeviceType.DCLineDevice,
-                        DeviceType.HVDCLineDevice,
-                        DeviceType.FluidPathDevice]:
-            graphics_dict = self.graphics_manager.get_device_type_dict(device_type=dev_tpe)
-            for key, elm_graphics in graphics_dict.items():
-                elm_graphics.set_width_scale(self.get_branch_width())
+        # rescale lines (the collapsed lines are drawn with a constant width)
+        if not (self.lod is not None and self.lod.is_collapsed):
+            for dev_tpe in [DeviceType.LineDevice,
+                            DeviceType.DCLineDevice,
+                            DeviceType.HVDCLineDevice,
+                            DeviceType.FluidPathDevice]:
+                graphics_dict = self.graphics_manager.get_device_type_dict(device_type=dev_tpe)
+                for key, elm_graphics in graphics_dict.items():
+                    elm_graphics.set_width_scale(self.get_branch_width())
+
+        # the widths of the results colouring are gone, so they must be applied again the next time
+        self.graphics_manager.reset_colours()
 
         # rescale substations
         data: Dict[str, SubstationGraphicItem] = self.graphics_manager.get_device_type_dict(DeviceType.SubstationDevice)
@@ -1026,10 +1122,11 @@ class GridMapWidget(BaseDiagramWidget):
         longitudes = np.zeros(n)
         latitudes = np.zeros(n)
         nodes_dict = dict()
+        bus_graphics = self.graphics_manager.get_graphics_array(key="buses", elements=buses)
         for i, bus in enumerate(buses):
 
             # try to find the diagram object of the DB object
-            graphic_object = self.graphics_manager.query(bus)
+            graphic_object = bus_graphics[i]
 
             if graphic_object:
                 longitudes[i] = bus.longitude
@@ -1074,49 +1171,52 @@ class GridMapWidget(BaseDiagramWidget):
             lnorm[lnorm == np.inf] = 0
             Sfabs = np.abs(Sf)
             Sfnorm = Sfabs / np.max(Sfabs + 1e-20)
-            for i, branch in enumerate(branches):
+
+            # the graphics and the colours are computed for all the branches at once,
+            # and only the graphics whose colour changed are re-coloured
+            br_graphics = self.graphics_manager.get_graphics_array(key="branches", elements=branches)
+
+            if cmap == palettes.Colormaps.TSO:
+                vnom = np.array([branch.get_max_bus_nominal_voltage() for branch in branches])
+            else:
+                vnom = None
+
+            rgba = palettes.get_rgba_array(x=lnorm, cmap=cmap, default_cmap=loading_cmap, v=vnom)
+
+            if use_flow_based_width:
+                weights = np.floor(min_branch_width + Sfnorm * (max_branch_width - min_branch_width) * 0.1)
+            else:
+                weights = np.full(len(branches), self.get_branch_width())
+
+            changed = self.graphics_manager.get_changed_colours(
+                key="branches",
+                graphics=br_graphics,
+                codes=palettes.pack_rgba_array(rgba, width=np.round(weights * 100))
+            )
+
+            for i, graphic_object in enumerate(br_graphics):
 
                 # try to find the diagram object of the DB object
-                graphic_object: Union[MapAcLine, MapDcLine] = self.graphics_manager.query(branch)
+                graphic_object: Union[MapAcLine, MapDcLine]
 
-                if graphic_object:
+                if graphic_object is not None:
 
                     # compose the tooltip
-                    tooltip = str(i) + ': ' + branch.name
+                    tooltip = str(i) + ': ' + branches[i].name
                     tooltip += '\n' + loading_label + ': ' + "{:10.4f}".format(lnorm[i] * 100) + ' [%]'
                     if Sf is not None:
                         tooltip += '\nPower: ' + "{:10.4f}".format(Sf[i]) + ' [MVA]'
                     if losses is not None:
                         tooltip += '\nLosses: ' + "{:10.4f}".format(losses[i]) + ' [MVA]'
 
-                    # get the line colour
-                    a = 255
-                    if cmap == palettes.Colormaps.Green2Red:
-                        b, g, r = palettes.green_to_red_bgr(lnorm[i])
-
-                    elif cmap == palettes.Colormaps.Heatmap:
-                        b, g, r = palettes.heatmap_palette_bgr(lnorm[i])
-
-                    elif cmap == palettes.Colormaps.TSO:
-                        b, g, r = palettes.tso_line_palette_bgr(branch.get_max_bus_nominal_voltage(), lnorm[i])
-
+                    if changed[i]:
+                        r, g, b, a = rgba[i].tolist()
+                        graphic_object.set_colour(color=QColor(r, g, b, a),
+                                                  style=Qt.PenStyle.SolidLine,
+                                                  tool_tip=tooltip)
+                        graphic_object.set_width_scale(float(weights[i]))
                     else:
-                        r, g, b, a = loading_cmap(lnorm[i])
-                        r *= 255
-                        g *= 255
-                        b *= 255
-                        a *= 255
-
-                    color = QColor(r, g, b, a)
-                    style = Qt.PenStyle.SolidLine
-                    if use_flow_based_width:
-                        weight = int(
-                            np.floor(min_branch_width + Sfnorm[i] * (max_branch_width - min_branch_width) * 0.1))
-                    else:
-                        weight = self.get_branch_width()
-
-                    graphic_object.set_colour(color=color, style=style, tool_tip=tooltip)
-                    graphic_object.set_width_scale(weight)
+                        graphic_object.set_tool_tip(tool_tip=tooltip)
 
                     if hasattr(graphic_object, 'set_arrows_with_power'):
                         graphic_object.set_arrows_with_power(
@@ -1135,46 +1235,32 @@ class GridMapWidget(BaseDiagramWidget):
             Sfabs = np.abs(hvdc_Pf)
             Sfnorm = Sfabs / np.max(Sfabs + 1e-9)
 
-            for i, branch in enumerate(hvdc_lines):
+            hvdc_graphics = self.graphics_manager.get_graphics_array(key="hvdc", elements=hvdc_lines)
 
-                # try to find the diagram object of the DB object
-                graphic_object: MapHvdcLine = self.graphics_manager.query(branch)
+            if cmap == palettes.Colormaps.TSO:
+                vnom = np.array([elm.get_max_bus_nominal_voltage() for elm in hvdc_lines])
+            else:
+                vnom = None
 
-                if graphic_object:
+            rgba = palettes.get_rgba_array(x=lnorm, cmap=cmap, default_cmap=loading_cmap, v=vnom)
 
-                    # compose the tooltip
-                    tooltip = str(i) + ': ' + branch.name
-                    tooltip += '\n' + loading_label + ': ' + "{:10.4f}".format(lnorm[i] * 100) + ' [%]'
-                    if Sf is not None:
-                        tooltip += '\nPower: ' + "{:10.4f}".format(hvdc_Pf[i]) + ' [MW]'
-                    if losses is not None:
-                        tooltip += '\nLosses: ' + "{:10.4f}".format(hvdc_losses[i]) + ' [MW]'
+            if use_flow_based_width:
+                weights = np.floor(min_branch_width + Sfnorm * (max_branch_width - min_branch_width) * 0.1)
+            else:
+                weights = np.full(len(hvdc_lines), self.get_branch_width())
 
-                    # get the line colour
-                    a = 255
-                    if cmap == palettes.Colormaps.Green2Red:
-                        b, g, r = palettes.green_to_red_bgr(lnorm[i])
+            changed = self.graphics_manager.get_changed_colours(
+                key="hvdc",
+                graphics=hvdc_graphics,
+                codes=palettes.pack_rgba_array(rgba, width=np.round(weights * 100))
+            )
 
-                    elif cmap == palettes.Colormaps.Heatmap:
-                        b, g, r = palettes.heatmap_palette_bgr(lnorm[i])
+            for i, graphic_object in enumerate(hvdc_graphics):
 
-                    elif cmap == palettes.Colormaps.TSO:
-                        b, g, r = palettes.tso_line_palette_bgr(branch.get_max_bus_nominal_voltage(), lnorm[i])
+                # try to find the diagram object of the DB object
+                graphic_object: MapHvdcLine
 
-                    else:
-                        r, g, b, a = loading_cmap(lnorm[i])
-                        r *= 255
-                        g *= 255
-                        b *= 255
-                        a *= 255
-
-                    color = QColor(r, g, b, a)
-                    style = Qt.PenStyle.SolidLine
-                    if use_flow_based_width:
-                        weight = int(
-                            np.floor(min_branch_width + Sfnorm[i] * (max_branch_width - min_branch_width) * 0.1))
-                    else:
-                        weight = self.get_branch_width()
+                if graphic_object is not None:
 
                     tooltip = str(i) + ': ' + graphic_object.api_object.name
                     tooltip += '\n' + loading_label + ': ' + "{:10.4f}".format(
@@ -1189,8 +1275,14 @@ class GridMapWidget(BaseDiagramWidget):
                     else:
                         graphic_object.set_arrows_with_hvdc_power(Pf=hvdc_Pf[i], Pt=-hvdc_Pf[i])
 
-                    graphic_object.set_colour(color=color, style=style, tool_tip=tooltip)
-                    graphic_object.set_width_scale(weight)
+                    if changed[i]:
+                        r, g, b, a = rgba[i].tolist()
+                        graphic_object.set_colour(color=QColor(r, g, b, a),
+                                                  style=Qt.PenStyle.SolidLine,
+                                                  tool_tip=tooltip)
+                        graphic_object.set_width_scale(float(weights[i]))
+                    else:
+                        graphic_object.set_tool_tip(tool_tip=tooltip)
 
     def get_image(self, transparent: bool = False) -> QImage:
         """
@@ -31,7 +31,7 @@ from __future__ import annotations
 from typing import List, Union, Tuple, Callable, TYPE_CHECKING
 from enum import Enum
 from PySide6.QtCore import Qt, QTimer, QEvent, QPointF
-from PySide6.QtGui import (QPainter, QColor, QPixmap, QCursor,
+from PySide6.QtGui import (QPainter, QColor, QImage, QCursor,
                            QMouseEvent, QKeyEvent, QWheelEvent,
                            QResizeEvent, QEnterEvent, QPaintEvent, QDragEnterEvent, QDragMoveEvent, QDropEvent)
 from PySide6.QtWidgets import (QSizePolicy, QWidget, QGraphicsScene, QGraphicsView, QStackedLayout,
@@ -607,7 +607,7 @@ class MapWidget(QWidget):
         """
         return self.height()
 
-    def on_tile_available(self, level: int, x: float, y: float, image: QPixmap, error: bool):
+    def on_tile_available(self, level: int, x: float, y: float, image: QImage, error: bool):
         """
         Called when a new 'net tile is available.
 
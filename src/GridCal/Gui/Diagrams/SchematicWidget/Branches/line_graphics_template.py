@@ -22,6 +22,7 @@ from PySide6.QtCore import Qt, QLineF, QPointF, QRectF
 from PySide6.QtGui import QPen, QCursor, QPixmap, QBrush, QColor, QTransform, QPolygonF
 from PySide6.QtWidgets import (QGraphicsLineItem, QGraphicsRectItem, QGraphicsPolygonItem,
                                QGraphicsEllipseItem, QGraphicsSceneMouseEvent, QGraphicsTextItem)
+from GridCal.Gui.Diagrams.level_of_detail import set_item_visible
 from GridCal.Gui.Diagrams.generic_graphics import ACTIVE, DEACTIVATED, OTHER, GenericDiagramWidget, TRANSPARENT, WHITE
 from GridCal.Gui.Diagrams.SchematicWidget.terminal_item import BarTerminalItem, RoundTerminalItem
 from GridCal.Gui.Diagrams.SchematicWidget.Substation.bus_graphics import BusGraphicItem
@@ -391,7 +392,8 @@ class ArrowHead(QGraphicsPolygonItem):
         :param visibility_filter_value: threshold to determine if to show this widget
         :param draw_label: Draw label
         """
-        self.setVisible(abs(value) > visibility_filter_value)
+        # the arrow may be hidden by the level of detail too
+        set_item_visible(self, abs(value) > visibility_filter_value)
         self.backwards = backwards
 
         self.label.setVisible(draw_label)
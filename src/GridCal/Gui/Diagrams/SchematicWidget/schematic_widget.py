@@ -78,6 +78,7 @@ from GridCal.Gui.Diagrams.SchematicWidget.Branches.transformer3w_graphics import
 from GridCal.Gui.Diagrams.SchematicWidget.Injections.generator_graphics import GeneratorGraphicItem
 from GridCal.Gui.Diagrams.generic_graphics import ACTIVE
 from GridCal.Gui.Diagrams.base_diagram_widget import BaseDiagramWidget
+from GridCal.Gui.Diagrams.level_of_detail import LevelOfDetailManager, DetailLevel
 from GridCal.Gui.general_dialogues import InputNumberDialogue
 import GridCal.Gui.Visualization.visualization as viz
 import GridCalEngine.Devices.Diagrams.palettes as palettes
@@ -236,6 +237,9 @@ class SchematicScene(QGraphicsScene):
         self.parent_ = parent
         self.displacement = QPoint(0, 0)
 
+        # spatial index, so that only the items in the exposed region are looked up and repainted
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+
     def mouseMoveEvent(self, event: QGraphicsSceneMouseEvent) -> None:
         """
 
@@ -270,6 +274,10 @@ class SchematicScene(QGraphicsScene):
         # nue with the rest of the actions)
         super(SchematicScene, self).mouseReleaseEvent(event)
 
+        # the nodes may have been moved, so the collapsed branches must follow
+        if self.parent_.lod.is_collapsed:
+            self.parent_.lod.refresh_bundle(branches=self.parent_.get_lod_branches())
+
 
 class CustomGraphicsView(QGraphicsView):
     """
@@ -291,6 +299,11 @@ class CustomGraphicsView(QGraphicsView):
         self.setRenderHints(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.SmoothPixmapTransform)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+        # repaint only the bounding rectangles of the changed items, and skip the painter state bookkeeping
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
+
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """
         Mouse press event
@@ -339,6 +352,12 @@ class SchematicWidget(BaseDiagramWidget):
     To do this the graphic objects call "parent.circuit.<function or object>"
     """
 
+    # zoom scale below which the labels and injections are hidden
+    LOD_NO_LABELS_SCALE = 0.4
+
+    # zoom scale below which the branches are drawn as a single path
+    LOD_COLLAPSE_SCALE = 0.15
+
     def __init__(self,
                  gui: DiagramsMain,
                  circuit: MultiCircuit,
@@ -370,6 +389,18 @@ class SchematicWidget(BaseDiagramWidget):
         # add the actual editor
         self.editor_graphics_view = CustomGraphicsView(self.diagram_scene, parent=self)
 
+        # level of detail handler: hides the labels and collapses the branches when zooming out
+        self.lod = LevelOfDetailManager(scene=self.diagram_scene,
+                                        no_labels_scale=self.LOD_NO_LABELS_SCALE,
+                                        collapse_scale=self.LOD_COLLAPSE_SCALE,
+                                        update_func=self.update_level_of_detail)
+
+        # the graphics added after drawing must follow the current level of detail
+        self.graphics_manager.on_add_func = self.lod.schedule_update
+
+        # graphics manager version -> branch graphics, to avoid walking the registry on every zoom step
+        self._lod_branches: Tuple[int, List[LineGraphicTemplateItem]] = (-1, list())
+
         # override events
         self.editor_graphics_view.dragEnterEvent = self.graphicsDragEnterEvent
         self.editor_graphics_view.dragMoveEvent = self.graphicsDragMoveEvent
@@ -521,6 +552,7 @@ class SchematicWidget(BaseDiagramWidget):
         :param scale_factor:
         """
         self.editor_graphics_view.scale(scale_factor, scale_factor)
+        self.update_level_of_detail()
 
     def zoom_out(self, scale_factor: float = 1.15) -> None:
         """
@@ -528,6 +560,63 @@ class SchematicWidget(BaseDiagramWidget):
         :param scale_factor:
         """
         self.editor_graphics_view.scale(1.0 / scale_factor, 1.0 / scale_factor)
+        self.update_level_of_detail()
+
+    def get_lod_labels(self) -> List[QGraphicsItem]:
+        """
+        Get the labels and small glyphs that are hidden when zooming out
+        :return: list of graphic items
+        """
+        items = list()
+        for category in [DeviceType.BusDevice, DeviceType.FluidNodeDevice]:
+            for idtag, graphic in self.graphics_manager.get_device_type_dict(device_type=category).items():
+                items.append(graphic.label)
+                for g in graphic.shunt_children:
+                    items.append(g)
+                    items.append(g.nexus)
+
+        for graphic in self.get_lod_branches():
+            items.append(graphic.arrow_p_from)
+            items.append(graphic.arrow_q_from)
+            items.append(graphic.arrow_p_to)
+            items.append(graphic.arrow_q_to)
+
+        return items
+
+    def get_lod_branches(self) -> List[LineGraphicTemplateItem]:
+        """
+        Get the branch graphics that are collapsed into a single path when zooming out
+        :return: list of LineGraphicTemplateItem
+        """
+        version, items = self._lod_branches
+
+        if version != self.graphics_manager.version:
+            items = list()
+            for device_type, graphics_dict in self.graphics_manager.graphic_dict.items():
+                for idtag, graphic in graphics_dict.items():
+                    if isinstance(graphic, LineGraphicTemplateItem):
+                        items.append(graphic)
+
+            self._lod_branches = (self.graphics_manager.version, items)
+
+        return items
+
+    def update_level_of_detail(self, force: bool = False) -> None:
+        """
+        Update the level of detail according to the current zoom.
+        The items are only touched when the zoom crosses one of the level thresholds.
+        :param force: apply the level even if it did not change (i.e. after drawing new elements)
+        """
+        branches = self.get_lod_branches()
+        level = self.lod.get_level(scale=self.editor_graphics_view.transform().m11(), n_branches=len(branches))
+
+        if level != self.lod.level or (force and level != DetailLevel.Full):
+            self.lod.set_level(level=level,
+                               labels=self.get_lod_labels(),
+                               branches=branches)
+
+            # antialiasing is expensive and useless when the diagram is zoomed out
+            self.editor_graphics_view.setRenderHint(QPainter.RenderHint.Antialiasing, level == DetailLevel.Full)
 
     def create_bus_graphics(self, bus: Bus, x: int, y: int, h: int, w: int,
                             draw_labels: bool = True) -> BusGraphicItem:
@@ -630,6 +719,9 @@ class SchematicWidget(BaseDiagramWidget):
         inj_dev_by_fluid_node = self.circuit.get_injection_devices_grouped_by_fluid_node()
         inj_dev_by_cn = self.circuit.get_injection_devices_grouped_by_cn()
 
+        # adding many items to an indexed scene is slow, so the index is rebuilt once at the end
+        self.diagram_scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+
         # add node-like elements first
         for category, points_group in diagram.data.items():
 
@@ -920,6 +1012,11 @@ class SchematicWidget(BaseDiagramWidget):
             for idtag, graphic in graphics_dict.items():
                 graphic.arrange_children()
 
+        self.diagram_scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+
+        # the new items must follow the current level of detail
+        self.update_level_of_detail(force=True)
+
     def draw(self) -> None:
         """
         Draw the stored diagram
@@ -1784,6 +1881,7 @@ class SchematicWidget(BaseDiagramWidget):
         self.diagram_scene.setSceneRect(boundaries)
         self.editor_graphics_view.fitInView(boundaries, Qt.AspectRatioMode.KeepAspectRatio)
         self.editor_graphics_view.scale(1.0, 1.0)
+        self.update_level_of_detail()
 
     def graphical_search(self, search_text: str):
         """
@@ -3167,6 +3265,7 @@ class SchematicWidget(BaseDiagramWidget):
         Clear the schematic
         """
         super().clear()
+        self.lod.clear()
         self.diagram_scene.clear()
 
     def recolour_mode(self) -> None:
@@ -3180,6 +3279,9 @@ class SchematicWidget(BaseDiagramWidget):
                 if graphic_object is not None:
                     graphic_object.recolour_mode()
 
+        # the results colours are gone, so they must be applied again the next time
+        self.graphics_manager.reset_colours()
+
     def set_big_bus_marker(self, buses: List[Bus], color: QColor):
         """
         Set a big marker at the selected buses
@@ -3319,19 +3421,6 @@ class SchematicWidget(BaseDiagramWidget):
         vang = np.angle(voltages, deg=True)
         vnorm = (vabs - vmin) / vrng
 
-        if Sbus is not None:
-            if len(Sbus) > 0:
-                Pabs = np.abs(Sbus)
-                mx = Pabs.max()
-                if mx != 0.0:
-                    Pnorm = Pabs / mx
-                else:
-                    Pnorm = np.zeros(len(buses))
-            else:
-                Pnorm = np.zeros(len(buses))
-        else:
-            Pnorm = np.zeros(len(buses))
-
         voltage_cmap = viz.get_voltage_color_map()
         loading_cmap = viz.get_loading_color_map()
 
@@ -3347,35 +3436,29 @@ class SchematicWidget(BaseDiagramWidget):
 
         bus_types = ['', 'PQ', 'PV', 'Slack', 'PQV', 'P']
         max_flow = 1
+        gray = np.array([115, 115, 115, 255], dtype=np.uint8)
 
         if len(buses) == len(vnorm):
-            for i, bus in enumerate(buses):
 
-                # try to find the diagram object of the DB object
-                graphic_object = self.graphics_manager.query(bus)
-
-                if graphic_object:
-
-                    if bus_active[i]:
-                        a = 255
-                        if cmap == palettes.Colormaps.Green2Red:
-                            b, g, r = palettes.green_to_red_bgr(vnorm[i])
-
-                        elif cmap == palettes.Colormaps.Heatmap:
-                            b, g, r = palettes.heatmap_palette_bgr(vnorm[i])
+            # the graphics and the colours are computed for all the buses at once,
+            # and only the graphics whose colour changed are re-coloured
+            bus_graphics = self.graphics_manager.get_graphics_array(key="buses", elements=buses)
+            bus_active_ = np.asarray(bus_active, dtype=bool)
+            rgba = palettes.get_rgba_array(x=vnorm, cmap=cmap, default_cmap=voltage_cmap, substation=True)
+            rgba[~bus_active_] = gray
+            changed = self.graphics_manager.get_changed_colours(key="buses",
+                                                                graphics=bus_graphics,
+                                                                codes=palettes.pack_rgba_array(rgba))
 
-                        elif cmap == palettes.Colormaps.TSO:
-                            b, g, r = palettes.tso_substation_palette_bgr(vnorm[i])
+            for i, graphic_object in enumerate(bus_graphics):
 
-                        else:
-                            r, g, b, a = voltage_cmap(vnorm[i])
-                            r *= 255
-                            g *= 255
-                            b *= 255
-                            a *= 255
+                if graphic_object is not None:
 
+                    if changed[i]:
+                        r, g, b, a = rgba[i].tolist()
                         graphic_object.set_tile_color(QColor(r, g, b, a))
 
+                    if bus_active_[i]:
                         graphic_object.set_values(i=i,
                                                   Vm=vabs[i],
                                                   Va=vang[i],
@@ -3386,9 +3469,6 @@ class SchematicWidget(BaseDiagramWidget):
                         if use_flow_based_width:
                             graphic_object.change_size(w=graphic_object.w)
 
-                    else:
-                        graphic_object.set_tile_color(QColor(115, 115, 115, 255))  # gray
-
                 else:
                     # No graphic object found
                     pass
@@ -3415,43 +3495,36 @@ class SchematicWidget(BaseDiagramWidget):
                     Sfnorm = Sfabs
 
                 if len(branches) == len(Sf):
-                    for i, branch in enumerate(branches):
 
-                        # try to find the diagram object of the DB object
-                        graphic_object = self.graphics_manager.query(branch)
+                    br_graphics = self.graphics_manager.get_graphics_array(key="branches", elements=branches)
+                    br_active_ = np.asarray(br_active, dtype=bool)
 
-                        if graphic_object:
-
-                            if br_active[i]:
-
-                                if use_flow_based_width:
-                                    w = int(
-                                        np.floor(
-                                            min_branch_width + Sfnorm[i] * (max_branch_width - min_branch_width)))
-                                else:
-                                    w = graphic_object.pen_width
+                    if cmap == palettes.Colormaps.TSO:
+                        vnom = np.array([branch.get_max_bus_nominal_voltage() for branch in branches])
+                    else:
+                        vnom = None
 
-                                style = Qt.PenStyle.SolidLine
+                    rgba = palettes.get_rgba_array(x=lnorm, cmap=cmap, default_cmap=loading_cmap, v=vnom)
+                    rgba[~br_active_] = gray
 
-                                a = 255
-                                if cmap == palettes.Colormaps.Green2Red:
-                                    b, g, r = palettes.green_to_red_bgr(lnorm[i])
+                    widths = np.array([graphic_object.pen_width if graphic_object is not None else 0
+                                       for graphic_object in br_graphics], dtype=int)
+                    if use_flow_based_width:
+                        widths[br_active_] = np.floor(min_branch_width + Sfnorm[br_active_] * (
+                                max_branch_width - min_branch_width)).astype(int)
 
-                                elif cmap == palettes.Colormaps.Heatmap:
-                                    b, g, r = palettes.heatmap_palette_bgr(lnorm[i])
+                    codes = palettes.pack_rgba_array(rgba, width=widths)
+                    codes[~br_active_] |= 1 << 48  # the inactive branches are dashed
+                    changed = self.graphics_manager.get_changed_colours(key="branches",
+                                                                        graphics=br_graphics,
+                                                                        codes=codes)
 
-                                elif cmap == palettes.Colormaps.TSO:
-                                    b, g, r = palettes.tso_line_palette_bgr(branch.get_max_bus_nominal_voltage(),
-                                                                            lnorm[i])
+                    for i, graphic_object in enumerate(br_graphics):
 
-                                else:
-                                    r, g, b, a = loading_cmap(lnorm[i])
-                                    r *= 255
-                                    g *= 255
-                                    b *= 255
-                                    a *= 255
+                        if graphic_object is not None:
 
-                                color = QColor(r, g, b, a)
+                            if br_active_[i]:
+                                branch = branches[i]
 
                                 tooltip = str(i) + ': ' + branch.name
                                 tooltip += '\n' + loading_label + ': ' + "{:10.4f}".format(lnorm[i] * 100) + ' [%]'
@@ -3482,7 +3555,11 @@ class SchematicWidget(BaseDiagramWidget):
                                         tooltip += '\nBeq:\t' + "{:10.4f}".format(Beq[i])
 
                                 graphic_object.setToolTipText(tooltip)
-                                graphic_object.set_colour(color, w, style)
+
+                                if changed[i]:
+                                    r, g, b, a = rgba[i].tolist()
+                                    graphic_object.set_colour(QColor(r, g, b, a), int(widths[i]),
+                                                              Qt.PenStyle.SolidLine)
 
                                 if hasattr(graphic_object, 'set_arrows_with_power'):
                                     graphic_object.set_arrows_with_power(
@@ -3490,10 +3567,11 @@ class SchematicWidget(BaseDiagramWidget):
                                         St=St[i] if St is not None else None
                                     )
                             else:
-                                w = graphic_object.pen_width
-                                style = Qt.PenStyle.DashLine
-                                color = QColor(115, 115, 115, 255)  # gray
-                                graphic_object.set_pen(QPen(color, w, style))
+                                if changed[i]:
+                                    w = graphic_object.pen_width
+                                    style = Qt.PenStyle.DashLine
+                                    color = QColor(115, 115, 115, 255)  # gray
+                                    graphic_object.set_pen(QPen(color, w, style))
                         else:
                             # No diagram object
                             pass
@@ -3507,47 +3585,38 @@ class SchematicWidget(BaseDiagramWidget):
             hvdc_sending_power_norm = np.abs(hvdc_Pf) / (max_flow + 1e-20)
 
             if len(hvdc_lines) == len(hvdc_Pf):
-                for i, elm in enumerate(hvdc_lines):
-
-                    # try to find the diagram object of the DB object
-                    graphic_object = self.graphics_manager.query(elm)
-
-                    if graphic_object:
 
-                        if hvdc_active[i]:
+                hvdc_graphics = self.graphics_manager.get_graphics_array(key="hvdc", elements=hvdc_lines)
+                hvdc_active_ = np.asarray(hvdc_active, dtype=bool)
+                elm_active = np.array([elm.active for elm in hvdc_lines], dtype=bool)
+                hvdc_lnorm = np.abs(hvdc_loading)
 
-                            if use_flow_based_width:
-                                w = int(np.floor(
-                                    min_branch_width + hvdc_sending_power_norm[i] * (
-                                            max_branch_width - min_branch_width)))
-                            else:
-                                w = graphic_object.pen_width
+                if cmap == palettes.Colormaps.TSO:
+                    vnom = np.array([elm.get_max_bus_nominal_voltage() for elm in hvdc_lines])
+                else:
+                    vnom = None
 
-                            if elm.active:
-                                style = Qt.PenStyle.SolidLine
+                rgba = palettes.get_rgba_array(x=hvdc_lnorm, cmap=cmap, default_cmap=loading_cmap, v=vnom)
+                dashed = ~(hvdc_active_ & elm_active)
+                rgba[dashed] = gray
 
-                                a = 1
-                                if cmap == palettes.Colormaps.Green2Red:
-                                    b, g, r = palettes.green_to_red_bgr(abs(hvdc_loading[i]))
+                widths = np.array([graphic_object.pen_width if graphic_object is not None else 0
+                                   for graphic_object in hvdc_graphics], dtype=int)
+                if use_flow_based_width:
+                    widths[hvdc_active_] = np.floor(min_branch_width + hvdc_sending_power_norm[hvdc_active_] * (
+                            max_branch_width - min_branch_width)).astype(int)
 
-                                elif cmap == palettes.Colormaps.Heatmap:
-                                    b, g, r = palettes.heatmap_palette_bgr(abs(hvdc_loading[i]))
+                codes = palettes.pack_rgba_array(rgba, width=widths)
+                codes[dashed] |= 1 << 48
+                codes[~hvdc_active_] |= 1 << 49  # set with set_pen
+                changed = self.graphics_manager.get_changed_colours(key="hvdc", graphics=hvdc_graphics, codes=codes)
 
-                                elif cmap == palettes.Colormaps.TSO:
-                                    b, g, r = palettes.tso_line_palette_bgr(elm.get_max_bus_nominal_voltage(),
-                                                                            abs(hvdc_loading[i]))
+                for i, graphic_object in enumerate(hvdc_graphics):
 
-                                else:
-                                    r, g, b, a = loading_cmap(abs(hvdc_loading[i]))
-                                    r *= 255
-                                    g *= 255
-                                    b *= 255
-                                    a *= 255
+                    if graphic_object is not None:
 
-                                color = QColor(r, g, b, a)
-                            else:
-                                style = Qt.PenStyle.DashLine
-                                color = QColor(115, 115, 115, 255)  # gray
+                        if hvdc_active_[i]:
+                            elm = hvdc_lines[i]
 
                             tooltip = str(i) + ': ' + elm.name
                             tooltip += '\n' + loading_label + ': ' + "{:10.4f}".format(
@@ -3563,12 +3632,17 @@ class SchematicWidget(BaseDiagramWidget):
                                 graphic_object.set_arrows_with_hvdc_power(Pf=hvdc_Pf[i], Pt=-hvdc_Pf[i])
 
                             graphic_object.setToolTipText(tooltip)
-                            graphic_object.set_colour(color, w, style)
+
+                            if changed[i]:
+                                r, g, b, a = rgba[i].tolist()
+                                style = Qt.PenStyle.DashLine if dashed[i] else Qt.PenStyle.SolidLine
+                                graphic_object.set_colour(QColor(r, g, b, a), int(widths[i]), style)
                         else:
-                            w = graphic_object.pen_width
-                            style = Qt.PenStyle.DashLine
-                            color = QColor(115, 115, 115, 255)  # gray
-                            graphic_object.set_pen(QPen(color, w, style))
+                            if changed[i]:
+                                w = graphic_object.pen_width
+                                style = Qt.PenStyle.DashLine
+                                color = QColor(115, 115, 115, 255)  # gray
+                                graphic_object.set_pen(QPen(color, w, style))
                     else:
                         # No diagram object
                         pass
@@ -15,8 +15,9 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Tuple, Callable
 from warnings import warn
+import numpy as np
 
 from GridCalEngine.Devices.types import ALL_DEV_TYPES
 from GridCalEngine.enumerations import DeviceType
@@ -89,11 +90,26 @@ class GraphicsManager:
         # this dictionary stores the relationship between CN and their BusBar if applicable
         self.cn_to_busbar_dict: Dict[ConnectivityNode, BusBar] = dict()
 
+        # version of the registry, it changes every time that a graphic is added or removed
+        self.version: int = 0
+
+        # function called every time that a graphic is added (i.e. to apply the level of detail to it)
+        self.on_add_func: Union[Callable[[], None], None] = None
+
+        # key -> (version, list of devices, array of graphics) cache used by get_graphics_array
+        self._graphics_arrays: Dict[str, Tuple[int, List[ALL_DEV_TYPES], np.ndarray]] = dict()
+
+        # key -> (array of graphics, packed colour codes) of the last colours applied by the results colouring
+        self._colour_codes: Dict[str, Tuple[np.ndarray, np.ndarray]] = dict()
+
     def clear(self):
         """
         Clear all graphics references
         """
         self.graphic_dict.clear()
+        self.version += 1
+        self._graphics_arrays.clear()
+        self._colour_codes.clear()
 
     def add_device(self, elm: ALL_DEV_TYPES, graphic: ALL_GRAPHICS) -> None:
         """
@@ -116,9 +132,14 @@ class GraphicsManager:
                         warn(f"Replacing {graphic} with {graphic}, this could be a sign of an idtag bug")
                     elm_dict[elm.idtag] = graphic
 
+            self.version += 1
+
             # store the cn->busbar relationship
             if isinstance(elm, BusBar):
                 self.cn_to_busbar_dict[elm.cn] = elm
+
+            if self.on_add_func is not None:
+                self.on_add_func()
         else:
             raise ValueError(f"Trying to set a None graphic object for {elm}")
 
@@ -138,6 +159,7 @@ class GraphicsManager:
 
                 if graphic:
                     del elm_dict[device.idtag]
+                    self.version += 1
                     return graphic
 
             else:
@@ -198,3 +220,56 @@ class GraphicsManager:
         :return: Dict[str, ALL_GRAPHICS]
         """
         return self.graphic_dict.get(device_type, dict())
+
+    def get_graphics_array(self, key: str, elements: List[ALL_DEV_TYPES]) -> np.ndarray:
+        """
+        Get the array of graphics matching a list of devices (None where there is no graphic).
+        The array is cached under the given key and only rebuilt if the registry or the devices change,
+        so that repeated queries (i.e. when colouring the results of every time step) are cheap
+        :param key: name of the list of devices (i.e. "buses")
+        :param elements: list of devices
+        :return: object array of graphics, aligned with the elements
+        """
+        data = self._graphics_arrays.get(key, None)
+
+        if data is not None:
+            version, elements0, graphics = data
+
+            # the list comparison is done by identity first, so it is fast for the same devices
+            if version == self.version and elements0 == elements:
+                return graphics
+
+        graphics = np.empty(len(elements), dtype=object)
+        for i, elm in enumerate(elements):
+            graphics[i] = self.query(elm)
+
+        self._graphics_arrays[key] = (self.version, list(elements), graphics)
+
+        return graphics
+
+    def get_changed_colours(self, key: str, graphics: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Get the mask of the graphics whose colour code changed since the last call with the same key,
+        and store the new codes
+        :param key: name of the list of graphics (i.e. "buses")
+        :param graphics: array of graphics as returned by get_graphics_array
+        :param codes: array of packed colour codes (see palettes.pack_rgba_array)
+        :return: boolean array, True where the graphic colour must be updated
+        """
+        data = self._colour_codes.get(key, None)
+
+        if data is not None and data[0] is graphics and len(data[1]) == len(codes):
+            changed = data[1] != codes
+        else:
+            changed = np.ones(len(codes), dtype=bool)
+
+        self._colour_codes[key] = (graphics, codes.copy())
+
+        return changed
+
+    def reset_colours(self) -> None:
+        """
+        Forget the colours applied by the results colouring,
+        to be called when the graphics are coloured by other means
+        """
+        self._colour_codes.clear()
@@ -0,0 +1,259 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+from enum import Enum
+from typing import List, Union, Callable
+from PySide6.QtCore import Qt, QLineF, QTimer
+from PySide6.QtGui import QPen, QColor, QPainterPath
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsItem, QGraphicsPathItem, QGraphicsLineItem
+
+
+# keys of the QGraphicsItem data where the level of detail keeps its state
+LOD_HIDDEN_KEY = 0x10D0  # is the item hidden by the level of detail?
+OWN_VISIBILITY_KEY = 0x10D1  # visibility of the item regardless of the level of detail
+
+
+class DetailLevel(Enum):
+    """
+    Level of detail of a diagram
+    """
+    Full = "Full"  # everything is drawn
+    NoLabels = "No labels"  # the labels and the small glyphs (injections, arrows, etc.) are hidden
+    Collapsed = "Collapsed"  # on top of that, the branches are drawn as a single path item
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return str(self)
+
+
+class BranchesBundleItem(QGraphicsPathItem):
+    """
+    Single non-interactive path item that draws a bundle of branches at once.
+    It replaces thousands of individual line items when the diagram is zoomed out.
+    """
+
+    def __init__(self, color: QColor = QColor(115, 115, 115, 255), width: float = 1.0):
+        """
+        Constructor
+        :param color: colour of the bundle
+        :param width: width of the bundle in pixels (it does not scale with the zoom)
+        """
+        QGraphicsPathItem.__init__(self)
+
+        pen = QPen(color, width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.FlatCap, Qt.PenJoinStyle.BevelJoin)
+        pen.setCosmetic(True)
+        self.setPen(pen)
+
+        self.setZValue(-1)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self.setAcceptHoverEvents(False)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, False)
+
+    def set_lines(self, lines: List[QLineF]) -> None:
+        """
+        Set the lines of the bundle
+        :param lines: list of lines in scene coordinates
+        """
+        path = QPainterPath()
+        for line in lines:
+            path.moveTo(line.p1())
+            path.lineTo(line.p2())
+
+        self.setPath(path)
+
+
+def get_scene_line(item: QGraphicsLineItem) -> QLineF:
+    """
+    Get the line of a line item in scene coordinates
+    :param item: QGraphicsLineItem
+    :return: QLineF
+    """
+    line = item.line()
+    return QLineF(item.mapToScene(line.p1()), item.mapToScene(line.p2()))
+
+
+def is_explicitly_visible(item: QGraphicsItem) -> bool:
+    """
+    Is the item visible by itself? (regardless of its parent visibility)
+    :param item: QGraphicsItem
+    :return: bool
+    """
+    parent = item.parentItem()
+    return item.isVisible() if parent is None else item.isVisibleTo(parent)
+
+
+def set_lod_hidden(item: QGraphicsItem, hidden: bool) -> None:
+    """
+    Hide or restore an item because of the level of detail.
+    The item's own visibility is kept aside, so that restoring the item does not show it if it was hidden
+    :param item: QGraphicsItem
+    :param hidden: hide the item?
+    """
+    if hidden == bool(item.data(LOD_HIDDEN_KEY)):
+        return
+
+    if hidden:
+        item.setData(OWN_VISIBILITY_KEY, is_explicitly_visible(item))
+        item.setData(LOD_HIDDEN_KEY, True)
+        item.setVisible(False)
+    else:
+        item.setData(LOD_HIDDEN_KEY, False)
+        item.setVisible(bool(item.data(OWN_VISIBILITY_KEY)))
+
+
+def set_item_visible(item: QGraphicsItem, visible: bool) -> None:
+    """
+    Set the own visibility of an item, combined with the level of detail:
+    while the level of detail hides the item, the visibility is applied once the item is restored
+    :param item: QGraphicsItem
+    :param visible: show the item?
+    """
+    if item.data(LOD_HIDDEN_KEY):
+        item.setData(OWN_VISIBILITY_KEY, visible)
+    else:
+        item.setVisible(visible)
+
+
+class LevelOfDetailManager:
+    """
+    Class to switch the level of detail of a diagram depending on its zoom.
+    The level only changes when a threshold is crossed, so that zooming within a level costs nothing.
+    """
+
+    def __init__(self,
+                 scene: QGraphicsScene,
+                 no_labels_scale: float,
+                 collapse_scale: float,
+                 collapse_min_items: int = 2000,
+                 update_func: Union[Callable[[bool], None], None] = None):
+        """
+        Constructor
+        :param scene: QGraphicsScene where the bundle item is drawn
+        :param no_labels_scale: zoom scale below which the labels and the small glyphs are hidden
+        :param collapse_scale: zoom scale below which the branches are collapsed into a single path
+        :param collapse_min_items: minimum number of branch items to collapse them,
+                                   small diagrams keep their interactive (and coloured) branches
+        :param update_func: function of the diagram that applies the level of detail (force: bool) -> None,
+                            called to register the items added after drawing
+        """
+        self.scene = scene
+
+        self.update_func = update_func
+
+        self.update_scheduled = False
+
+        self.no_labels_scale = no_labels_scale
+
+        self.collapse_scale = collapse_scale
+
+        self.collapse_min_items = collapse_min_items
+
+        self.enabled = True
+
+        self.level = DetailLevel.Full
+
+        self.bundle: Union[BranchesBundleItem, None] = None
+
+    def get_level(self, scale: float, n_branches: int) -> DetailLevel:
+        """
+        Get the level of detail that corresponds to a zoom scale
+        :param scale: zoom scale (the larger the more zoomed in)
+        :param n_branches: number of branch items of the diagram
+        :return: DetailLevel
+        """
+        if not self.enabled or scale >= self.no_labels_scale:
+            return DetailLevel.Full
+        elif scale >= self.collapse_scale or n_branches < self.collapse_min_items:
+            return DetailLevel.NoLabels
+        else:
+            return DetailLevel.Collapsed
+
+    @property
+    def is_collapsed(self) -> bool:
+        """
+        Are the branches collapsed into the bundle?
+        :return: bool
+        """
+        return self.level == DetailLevel.Collapsed
+
+    def set_level(self,
+                  level: DetailLevel,
+                  labels: List[QGraphicsItem],
+                  branches: List[QGraphicsLineItem]) -> None:
+        """
+        Apply a level of detail
+        :param level: DetailLevel
+        :param labels: labels and small glyphs to hide below the Full level
+        :param branches: line items to collapse into the bundle at the Collapsed level
+        """
+        hide_labels = level != DetailLevel.Full
+        for item in labels:
+            set_lod_hidden(item, hide_labels)
+
+        if level == DetailLevel.Collapsed:
+            if self.bundle is None:
+                self.bundle = BranchesBundleItem()
+                self.scene.addItem(self.bundle)
+
+            self.bundle.set_lines([get_scene_line(item) for item in branches])
+
+            for item in branches:
+                set_lod_hidden(item, True)
+        else:
+            if self.bundle is not None:
+                self.scene.removeItem(self.bundle)
+                self.bundle = None
+
+            if self.level == DetailLevel.Collapsed:
+                for item in branches:
+                    set_lod_hidden(item, False)
+
+        self.level = level
+
+    def schedule_update(self) -> None:
+        """
+        Apply the current level of detail to the items added after drawing.
+        The update runs once the control returns to the event loop, so that adding many items costs a single update
+        """
+        if self.update_func is not None and self.level != DetailLevel.Full and not self.update_scheduled:
+            self.update_scheduled = True
+            QTimer.singleShot(0, self.scene, self._run_scheduled_update)
+
+    def _run_scheduled_update(self) -> None:
+        """
+        Run the update requested by schedule_update
+        """
+        self.update_scheduled = False
+        self.update_func(True)
+
+    def refresh_bundle(self, branches: List[QGraphicsLineItem]) -> None:
+        """
+        Redraw the bundle (i.e. after moving nodes while collapsed)
+        :param branches: line items collapsed into the bundle
+        """
+        if self.bundle is not None:
+            self.bundle.set_lines([get_scene_line(item) for item in branches])
+
+    def clear(self) -> None:
+        """
+        Forget the bundle (i.e. when the scene is cleared) and go back to the full detail
+        """
+        self.bundle = None
+        self.level = DetailLevel.Full
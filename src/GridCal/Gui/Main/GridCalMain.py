@@ -123,6 +123,7 @@ class MainGUI(ScriptingMain):
                 # save config regardless
                 self.save_all_config()
                 self.stop_all_threads()
+                self.remove_autosave_journal()
                 event.accept()
             else:
                 # save config regardless
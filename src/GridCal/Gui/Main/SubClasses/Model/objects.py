@@ -80,6 +80,9 @@ class ObjectsTableMain(DiagramsMain):
         # tree click
         self.ui.dataStructuresTreeView.clicked.connect(self.view_objects_data)
 
+        # the objects may have been modified from the diagrams while the database tab was hidden
+        self.ui.tabWidget_3.currentChanged.connect(self.refresh_objects_data)
+
         # line edit enter
         self.ui.smart_search_lineEdit.returnPressed.connect(self.objects_smart_search)
         # self.ui.time_series_search.returnPressed.connect(self.timeseries_search)
@@ -640,7 +643,7 @@ class ObjectsTableMain(DiagramsMain):
                 if elm_type == DeviceType.OverheadLineTypeDevice.value:
 
                     # pick the object
-                    tower = self.circuit.overhead_line_types[idx]
+                    tower = model.objects[idx]
 
                     # launch editor
                     self.tower_builder_window = TowerBuilderGUI(parent=self,
@@ -746,6 +749,15 @@ class ObjectsTableMain(DiagramsMain):
         else:
             return t_idx
 
+    def refresh_objects_data(self) -> None:
+        """
+        Refresh the displayed objects table when the database tab is shown
+        """
+        if self.ui.tabWidget_3.currentWidget() == self.ui.DataTab:
+            mdl = self.get_current_objects_model_view()
+            if isinstance(mdl, ObjectsModel):
+                mdl.refresh()
+
     def get_current_objects_model_view(self) -> ObjectsModel:
         """
         Get the current ObjectsModel from the GUI
@@ -864,6 +876,9 @@ class ObjectsTableMain(DiagramsMain):
                         val = elm.get_value(prop=gc_prop, t_idx=t_idx)
                         profile = elm.get_profile_by_prop(prop=gc_prop)
                         profile.fill(val)
+
+                        # the cached column values at the other time indices are outdated now
+                        model.columns_cache.invalidate(col=p_idx)
                     else:
                         logger.add_error("No profile found for " + attr, device=elm.name)
 
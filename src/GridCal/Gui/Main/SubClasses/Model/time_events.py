@@ -16,8 +16,8 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 import numpy as np
 import pandas as pd
-from typing import List
-from PySide6 import QtWidgets
+from typing import Dict, List, Union
+from PySide6 import QtWidgets, QtGui
 from matplotlib import pyplot as plt
 
 import GridCal.Gui.gui_functions as gf
@@ -65,6 +65,12 @@ class TimeEventsMain(ObjectsTableMain):
         self.ui.copy_profile_pushButton.clicked.connect(self.copy_profiles)
         self.ui.paste_profiles_pushButton.clicked.connect(self.paste_profiles)
 
+        # undo / redo of the profiles edition
+        self.profiles_undo_shortcut = QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Undo, self.ui.profiles_tableView)
+        self.profiles_undo_shortcut.activated.connect(self.undo_profiles)
+        self.profiles_redo_shortcut = QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Redo, self.ui.profiles_tableView)
+        self.profiles_redo_shortcut.activated.connect(self.redo_profiles)
+
         # combobox chnage
         self.ui.device_type_magnitude_comboBox.currentTextChanged.connect(self.display_profiles)
 
@@ -226,100 +232,68 @@ class TimeEventsMain(ObjectsTableMain):
             idx = self.ui.device_type_magnitude_comboBox.currentIndex()
             magnitude = magnitudes[idx]
 
-            dev_type = self.circuit.device_type_name_dict[dev_type_text]
-            objects: List[ALL_DEV_TYPES] = self.circuit.get_elements_by_type(dev_type)
+            # the displayed profiles are the ones of the objects shown in the table (that may be sorted or filtered)
+            model: ProfilesModel = self.ui.profiles_tableView.model()
+
             # Assign profiles
-            if len(objects) > 0:
+            if model is not None and len(model.elements) > 0:
 
                 indices = self.ui.profiles_tableView.selectedIndexes()
 
-                # attr = objects[0].properties_with_profile[magnitude]
-
-                model = self.ui.profiles_tableView.model()
-
-                mod_cols = list()
+                # column index -> selected rows (None for the whole column)
+                selection: Dict[int, Union[None, List[int]]] = dict()
 
                 if len(indices) == 0:
                     # no index was selected
-                    for i, elm in enumerate(objects):
-
-                        # get the property object
-                        gc_prop = elm.registered_properties[magnitude]
-
-                        # get the profile
-                        profile = elm.get_profile_by_prop(prop=gc_prop)
-
-                        # compute the dense array (this is the simple way of doing this)
-                        array = profile.toarray()
-
-                        if operation == '+':
-                            mod_array = (array + value).astype(gc_prop.tpe)
-                            mod_cols.append(i)
-
-                        elif operation == '-':
-                            mod_array = (array - value).astype(gc_prop.tpe)
-                            mod_cols.append(i)
-
-                        elif operation == '*':
-                            mod_array = (array * value).astype(gc_prop.tpe)
-                            mod_cols.append(i)
-
-                        elif operation == '/':
-                            mod_array = (array / value).astype(gc_prop.tpe)
-                            mod_cols.append(i)
-
-                        elif operation == 'set':
-                            mod_array = (np.ones(len(array)) * value).astype(gc_prop.tpe)
-                            mod_cols.append(i)
+                    for i in range(len(model.elements)):
+                        selection[i] = None
+                else:
+                    # indices were selected ...
+                    for idx in indices:
+                        selection.setdefault(idx.column(), list()).append(idx.row())
 
-                        else:
-                            raise Exception('Operation not supported: ' + str(operation))
+                # column index -> modified array
+                arrays = dict()
 
-                        # apply the newly computed array
-                        profile.set(arr=mod_array)
+                for col, rows in selection.items():
 
-                else:
-                    # indices were selected ...
+                    # get the device
+                    elm = model.elements[col]
 
-                    for idx in indices:
+                    # get the property object
+                    gc_prop = elm.registered_properties[magnitude]
 
-                        # get the device
-                        elm = objects[idx.column()]
+                    # get the profile
+                    profile = elm.get_profile_by_prop(prop=gc_prop)
 
-                        # get the property object
-                        gc_prop = elm.registered_properties[magnitude]
+                    # compute the dense array (this is the simple way of doing this)
+                    array = profile.toarray()
+                    array = array.astype(float) if array.dtype.kind in 'biu' else array.copy()
 
-                        # get the profile
-                        profile = elm.get_profile_by_prop(prop=gc_prop)
+                    sel = slice(None) if rows is None else np.array(rows, dtype=int)
 
-                        # compute the dense array (this is the simple way of doing this)
-                        array = profile.toarray().copy()
+                    if operation == '+':
+                        array[sel] += value
 
-                        if operation == '+':
-                            array[idx.row()] += value
-                            mod_cols.append(idx.column())
+                    elif operation == '-':
+                        array[sel] -= value
 
-                        elif operation == '-':
-                            array[idx.row()] -= value
-                            mod_cols.append(idx.column())
+                    elif operation == '*':
+                        array[sel] *= value
 
-                        elif operation == '*':
-                            array[idx.row()] *= value
-                            mod_cols.append(idx.column())
+                    elif operation == '/':
+                        array[sel] /= value
 
-                        elif operation == '/':
-                            array[idx.row()] /= value
-                            mod_cols.append(idx.column())
+                    elif operation == 'set':
+                        array[sel] = value
 
-                        elif operation == 'set':
-                            array[idx.row()] = value
-                            mod_cols.append(idx.column())
+                    else:
+                        raise Exception('Operation not supported: ' + str(operation))
 
-                        else:
-                            raise Exception('Operation not supported: ' + str(operation))
+                    arrays[col] = array.astype(gc_prop.tpe)
 
-                        # apply the newly computed array
-                        profile.set(arr=array)
+                # apply the newly computed arrays, keeping the changes in the undo history
+                model.set_profiles(arrays=arrays, action_name=operation)
 
                 # update model
                 model.update()
@@ -496,6 +470,22 @@ class TimeEventsMain(ObjectsTableMain):
         else:
             info_msg('Select a time series step to copy to the snapshot', 'Set snapshot')
 
+    def undo_profiles(self):
+        """
+        Undo the last change of the displayed profiles
+        """
+        mdl: ProfilesModel = self.ui.profiles_tableView.model()
+        if mdl is not None:
+            mdl.undo()
+
+    def redo_profiles(self):
+        """
+        Redo the last undone change of the displayed profiles
+        """
+        mdl: ProfilesModel = self.ui.profiles_tableView.model()
+        if mdl is not None:
+            mdl.redo()
+
     def copy_profiles(self):
         """
         Copy the current displayed profiles to the clipboard
@@ -15,7 +15,7 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 import numpy as np
-from PySide6 import QtWidgets
+from PySide6 import QtWidgets, QtCore
 from matplotlib import pyplot as plt
 from typing import Union
 from GridCal.Gui.table_view_header_wrap import HeaderViewWithWordWrap
@@ -23,10 +23,12 @@ import GridCal.Gui.gui_functions as gf
 from GridCal.Gui.messages import error_msg, warning_msg
 from GridCal.Gui.Main.SubClasses.simulations import SimulationsMain
 from GridCal.Gui.results_model import ResultsModel
-from GridCal.Gui.general_dialogues import fill_tree_from_logs
+from GridCal.Gui.general_dialogues import fill_tree_from_logs, LogsDialogue
+from GridCal.Session.session import ResultsLoadThread
 import GridCalEngine.Utils.Filtering as flt
 from GridCalEngine.basic_structures import Logger
 from GridCalEngine.enumerations import ResultTypes
+from GridCalEngine.Simulations.types import DRIVER_OBJECTS
 
 
 class ResultsMain(SimulationsMain):
@@ -47,6 +49,9 @@ class ResultsMain(SimulationsMain):
 
         self.current_results_logger: Union[None, Logger] = None
 
+        # results tree index to display once the results being read from the file are loaded
+        self.pending_results_index: Union[None, QtCore.QModelIndex] = None
+
         # --------------------------------------------------------------------------------------------------------------
         self.ui.actionSet_OPF_generation_to_profiles.triggered.connect(self.copy_opf_to_profiles)
 
@@ -92,6 +97,13 @@ class ResultsMain(SimulationsMain):
             self.ui.resultsLogsTreeView.setModel(logs_mdl)
             self.ui.resultsLogsTreeView.expandAll()
 
+            if self.session.is_pending(driver.tpe):
+                # the results are still in the file: read them in the background and come back here when done
+                self.load_pending_results(driver=driver, index=index)
+                self.ui.resultsTableView.setModel(None)
+                self.ui.units_label.setText("")
+                return
+
             if len(path) > 1:
 
                 if len(path) == 2:
@@ -155,6 +167,44 @@ class ResultsMain(SimulationsMain):
             self.current_results_logger = None
             self.ui.resultsLogsTreeView.setModel(None)
 
+    def load_pending_results(self, driver: DRIVER_OBJECTS, index: Union[None, QtCore.QModelIndex] = None) -> None:
+        """
+        Read the results of a driver registered from a file in the background
+        :param driver: driver whose results are still in the file
+        :param index: results tree index to display once the results are loaded
+        """
+        self.pending_results_index = index
+
+        launched = self.session.load_pending(driver_type=driver.tpe,
+                                             post_func=self.post_load_pending_results,
+                                             prog_func=self.ui.progressBar.setValue,
+                                             text_func=self.ui.progress_label.setText)
+        if launched:
+            self.LOCK()
+
+    def post_load_pending_results(self) -> None:
+        """
+        Actions after the results of a driver are read from the file
+        """
+        self.UNLOCK()
+
+        for thr in self.session.threads.values():
+            if isinstance(thr, ResultsLoadThread) and not thr.isRunning() and thr.logger.has_logs():
+                dlg = LogsDialogue(name="Results parsing", logger=thr.logger, expand_all=True)
+                dlg.exec()
+                thr.logger = Logger()
+
+        index = self.pending_results_index
+        self.pending_results_index = None
+
+        # display the results that were clicked if the tree did not change in the meantime
+        if index is not None and index.isValid() and index.model() is self.ui.results_treeView.model():
+            driver = self.session.get_driver_by_name(study_name=gf.get_tree_item_path(
+                index.model().itemFromIndex(index))[0])
+
+            if driver is not None and not self.session.is_pending(driver.tpe):
+                self.results_tree_view_click(index)
+
     def plot_results(self):
         """
         Plot the results
@@ -16,9 +16,9 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 import os
-from typing import Union, List, Callable
+from typing import Union, List, Dict, Callable
 import pandas as pd
-from PySide6 import QtWidgets
+from PySide6 import QtWidgets, QtCore
 
 import GridCal.Gui.gui_functions as gf
 import GridCal.Session.export_results_driver as exprtdrv
@@ -42,6 +42,8 @@ from GridCalEngine.IO.gridcal.contingency_parser import import_contingencies_fro
 from GridCalEngine.IO.cim.cgmes.cgmes_enums import cgmesProfile
 from GridCalEngine.IO.gridcal.remote import RemoteInstruction
 from GridCalEngine.IO.gridcal.catalogue import save_catalogue, load_catalogue
+from GridCalEngine.IO.gridcal.incremental_save import (ModelSaveState, JOURNAL_EXTENSION, get_journal_file_name,
+                                                       get_journal_base_file_name, is_journal_newer, remove_journal)
 from GridCal.templates import (get_cables_catalogue, get_transformer_catalogue, get_wires_catalogue,
                                get_sequence_lines_catalogue)
 
@@ -85,6 +87,19 @@ class IoMain(ConfigurationMain):
 
         self.ui.raw_export_version_comboBox.addItems(["33", "35"])
 
+        # state of the last .gridcal save of the model, to save only the object types that changed
+        self.file_save_state: Union[ModelSaveState, None] = None
+
+        # periodic autosave of the changes into a journal, to recover them after a crash
+        self.journal_save_thread_object: Union[filedrv.JournalSaveThread, None] = None
+        self.autosave_timer = QtCore.QTimer(self)
+        self.autosave_timer.setInterval(5 * 60 * 1000)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.autosave_timer.start()
+
+        # offer the recovery of an unsaved model once the window is up
+        QtCore.QTimer.singleShot(0, self.recover_untitled_journal)
+
         self.ui.actionNew_project.triggered.connect(self.new_project)
         self.ui.actionOpen_file.triggered.connect(self.open_file)
         self.ui.actionAdd_circuit.triggered.connect(self.add_circuit)
@@ -183,6 +198,7 @@ class IoMain(ConfigurationMain):
 
         # clear the file name
         self.file_name = ''
+        self.file_save_state = None
 
         self.remove_all_diagrams()
 
@@ -301,6 +317,13 @@ class IoMain(ConfigurationMain):
             # store the working directory
             self.project_directory = os.path.dirname(self.file_name)
 
+            # if there are autosaved changes newer than the file, offer to recover them
+            if len(filenames) == 1 and is_journal_newer(self.file_name):
+                if yes_no_question(text="There are autosaved changes newer than the file.\n"
+                                        "Do you want to recover them?",
+                                   title="Recover autosaved changes"):
+                    filenames = [get_journal_file_name(self.file_name)]
+
             # lock the ui
             self.LOCK()
 
@@ -348,6 +371,11 @@ class IoMain(ConfigurationMain):
                 if self.open_file_thread_object.circuit is not None:
                     self.circuit = self.open_file_thread_object.circuit
                     self.file_name = self.open_file_thread_object.file_name
+                    self.file_save_state = self.open_file_thread_object.save_state
+
+                    if isinstance(self.file_name, str) and self.file_name.endswith(JOURNAL_EXTENSION):
+                        # recovered from a journal: the model belongs to the file of the journal
+                        self.file_name = get_journal_base_file_name(self.file_name)
 
                 if self.circuit.has_diagrams():
                     # create the diagrams that came with the file
@@ -402,6 +430,9 @@ class IoMain(ConfigurationMain):
                 # clear the results
                 self.clear_results()
 
+                # register the stored results, they are read when they are first displayed
+                self.register_stored_results(session_data_dict=session_data_dict)
+
                 self.ui.grid_name_line_edit.setText(self.circuit.name)
 
                 # if this was a CGMES file, launch the Rosetta GUI
@@ -748,6 +779,10 @@ class IoMain(ConfigurationMain):
             options = self.get_file_save_options()
             options.type_selected = type_selected
 
+            if grid is None:
+                # only the object types that changed since the last save are serialized
+                options.save_state = self.file_save_state
+
             self.save_file_thread_object = filedrv.FileSaveThread(circuit=self.circuit if grid is None else grid,
                                                                   file_name=filename,
                                                                   options=options)
@@ -780,6 +815,15 @@ class IoMain(ConfigurationMain):
 
         self.stuff_running_now.remove('file_save')
 
+        if self.save_file_thread_object.circuit is self.circuit:
+            if self.save_file_thread_object.file_name.endswith('.gridcal'):
+                self.file_save_state = self.save_file_thread_object.save_state
+
+            if self.save_file_thread_object.logger.error_count() == 0:
+                # the autosaved changes are in the file now
+                remove_journal(self.save_file_thread_object.file_name)
+                remove_journal(None)
+
         self.ui.model_version_label.setText('Model v. ' + str(self.circuit.model_version))
 
         # get the session tree structure
@@ -790,6 +834,58 @@ class IoMain(ConfigurationMain):
         # call the garbage collector to free memory
         self.collect_memory()
 
+    def autosave(self) -> None:
+        """
+        Write the changes since the last save into the autosave journal, in a background thread
+        """
+        if ('file_save' in self.stuff_running_now) or ('file_open' in self.stuff_running_now):
+            return
+
+        if self.journal_save_thread_object is not None and self.journal_save_thread_object.isRunning():
+            return
+
+        if self.file_save_state is not None and self.file_save_state.file_name == self.file_name:
+            if len(self.file_save_state.get_changed_object_types(self.circuit)) == 0:
+                # nothing to autosave
+                return
+
+        elif self.circuit.get_bus_number() == 0:
+            return
+
+        save_state = self.file_save_state if self.file_save_state is not None and \
+                                             self.file_save_state.file_name == self.file_name else None
+
+        self.journal_save_thread_object = filedrv.JournalSaveThread(circuit=self.circuit,
+                                                                    file_name=self.file_name,
+                                                                    save_state=save_state,
+                                                                    json_files={"gui_config":
+                                                                                self.get_gui_config_data()})
+        self.journal_save_thread_object.start()
+
+    def recover_untitled_journal(self) -> None:
+        """
+        Offer to recover the autosaved changes of a model that was never saved
+        """
+        journal_file_name = get_journal_file_name(None)
+
+        if os.path.isfile(journal_file_name) and self.circuit.get_bus_number() == 0:
+            if yes_no_question(text="There is an autosaved model that was never saved.\n"
+                                    "Do you want to recover it?",
+                               title="Recover autosaved model"):
+                self.open_file_now(filenames=[journal_file_name])
+            else:
+                remove_journal(None)
+
+    def remove_autosave_journal(self) -> None:
+        """
+        Delete the autosave journal of the current model (i.e. on a clean exit)
+        """
+        if self.journal_save_thread_object is not None and self.journal_save_thread_object.isRunning():
+            self.journal_save_thread_object.wait()
+
+        remove_journal(self.file_name)
+        remove_journal(None)
+
     def grid_generator(self):
         """
         Open the grid generator window
@@ -874,6 +970,8 @@ class IoMain(ConfigurationMain):
         Export all the results
         :return:
         """
+        # read the results that are still in the file
+        self.session.load_all_pending()
 
         available_results = self.get_available_drivers()
 
@@ -946,6 +1044,35 @@ class IoMain(ConfigurationMain):
                             df.to_excel(excel_writer=writer,
                                         sheet_name=name[:31])  # excel supports 31 chars per sheet name
 
+    def register_stored_results(self, session_data_dict: Dict[str, Dict[str, List[str]]]) -> None:
+        """
+        Register the drivers of the results stored in the last file opened, without reading the results
+        :param session_data_dict: session tree structure {session name: {study name: [array names]}}
+        """
+        if self.last_file_driver is None:
+            return
+
+        file_driver = self.last_file_driver
+        any_registered = False
+
+        for session_name, studies in session_data_dict.items():
+            for study_name in studies.keys():
+
+                if self.session.get_driver_by_name(study_name=study_name) is None:
+                    # the default arguments bind the current names to the function
+                    registered = self.session.register_driver_from_disk(
+                        grid=self.circuit,
+                        study_name=study_name,
+                        data_loader=lambda s_name=session_name, st_name=study_name: file_driver.load_session_objects(
+                            session_name=s_name,
+                            study_name=st_name
+                        )
+                    )
+                    any_registered = any_registered or registered
+
+        if any_registered:
+            self.update_available_results()
+
     def load_results_driver(self):
         """
         Load a driver from disk
@@ -960,18 +1087,19 @@ class IoMain(ConfigurationMain):
                 session_name = path[0]
                 study_name = path[1]
                 if self.last_file_driver is not None:
-                    data_dict = self.last_file_driver.load_session_objects(session_name=session_name,
-                                                                           study_name=study_name)
-
-                    logger = self.session.register_driver_from_disk_data(grid=self.circuit,
-                                                                         study_name=study_name,
-                                                                         data_dict=data_dict)
-
-                    if logger.has_logs():
-                        dlg = LogsDialogue(name="Results parsing", logger=logger, expand_all=True)
-                        dlg.exec()
-
-                    self.update_available_results()
+                    file_driver = self.last_file_driver
+
+                    registered = self.session.register_driver_from_disk(
+                        grid=self.circuit,
+                        study_name=study_name,
+                        data_loader=lambda: file_driver.load_session_objects(session_name=session_name,
+                                                                             study_name=study_name)
+                    )
+
+                    if registered:
+                        self.update_available_results()
+                        drv = self.session.get_driver_by_name(study_name=study_name)
+                        self.load_pending_results(driver=drv)
                 else:
                     error_msg('No file driver declared :/')
             else:
@@ -22,7 +22,8 @@ from enum import EnumMeta
 from GridCal.Gui.gui_functions import (IntDelegate, ComboDelegate, TextDelegate, FloatDelegate, ColorPickerDelegate,
                                        ComplexDelegate, LineLocationsDelegate)
 from GridCal.Gui.wrappable_table_model import WrappableTableModel
-from GridCalEngine.Devices import Bus, ContingencyGroup
+from GridCal.Gui.objects_columns import ObjectsColumnsCache
+from GridCalEngine.Devices import ContingencyGroup
 from GridCalEngine.Devices.Parents.editable_device import GCProp, GCPROP_TYPES
 from GridCalEngine.enumerations import DeviceType
 from GridCalEngine.Devices.Branches.line_locations import LineLocations
@@ -92,6 +93,12 @@ class ObjectsModel(WrappableTableModel):
 
         self.dictionary_of_lists = dictionary_of_lists if dictionary_of_lists is not None else dict()
 
+        # columnar snapshot of the displayed values, so that the repaints do not go through the objects
+        self.columns_cache = ObjectsColumnsCache(objects=self.objects, property_list=self.property_list)
+
+        # sorting direction of each column, flipped every time that the column is sorted
+        self.max_to_min = np.ones(self.c, dtype=bool)
+
         self.set_delegates()
 
     def set_time_index(self, time_index: Union[int, None]):
@@ -173,6 +180,7 @@ class ObjectsModel(WrappableTableModel):
         update table
         """
         self.r = len(self.objects)
+        self.columns_cache.set_objects(self.objects)
         # row = self.rowCount()
         # self.beginInsertRows(QtCore.QModelIndex(), row, row)
         # # whatever code
@@ -181,6 +189,16 @@ class ObjectsModel(WrappableTableModel):
         self.layoutAboutToBeChanged.emit()
         self.layoutChanged.emit()
 
+    def refresh(self) -> None:
+        """
+        Discard the cached columns and repaint the table,
+        i.e. after the objects were modified elsewhere (diagrams, other dialogues)
+        """
+        self.columns_cache.invalidate()
+
+        if self.rowCount() > 0 and self.columnCount() > 0:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
     def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlag:
         """
         Get the display mode
@@ -233,12 +251,7 @@ class ObjectsModel(WrappableTableModel):
             obj_idx = r
             attr_idx = c
 
-        prop = self.property_list[attr_idx]
-
-        if prop.tpe is Bus:
-            return self.objects[obj_idx].get_value(prop=prop, t_idx=self.time_index_).name
-        else:
-            return self.objects[obj_idx].get_value(prop=prop, t_idx=self.time_index_)
+        return self.columns_cache.get_value(row=obj_idx, col=attr_idx, t_idx=self.time_index_)
 
     def data_with_type(self, index: QtCore.QModelIndex):
         """
@@ -253,13 +266,8 @@ class ObjectsModel(WrappableTableModel):
             obj_idx = index.row()
             attr_idx = index.column()
 
-        if obj_idx < len(self.objects):
-            prop = self.property_list[attr_idx]
-
-            if prop.tpe is Bus:
-                return self.objects[obj_idx].get_value(prop=prop, t_idx=self.time_index_).name
-            else:
-                return self.objects[obj_idx].get_value(prop=prop, t_idx=self.time_index_)
+        if obj_idx < self.columns_cache.n_rows:
+            return self.columns_cache.get_value(row=obj_idx, col=attr_idx, t_idx=self.time_index_)
         else:
             # there is a mismatch because the element was deleted without refreshing this table model
             return ""
@@ -276,7 +284,20 @@ class ObjectsModel(WrappableTableModel):
 
         if index.isValid():
             if role == QtCore.Qt.ItemDataRole.DisplayRole:
-                return str(self.data_with_type(index))
+
+                if self.transposed:
+                    obj_idx = index.column()
+                    attr_idx = index.row()
+                else:
+                    obj_idx = index.row()
+                    attr_idx = index.column()
+
+                if obj_idx < self.columns_cache.n_rows:
+                    return self.columns_cache.get_string(row=obj_idx, col=attr_idx, t_idx=self.time_index_)
+                else:
+                    # there is a mismatch because the element was deleted without refreshing this table model
+                    return ""
+
             elif role == QtCore.Qt.ItemDataRole.BackgroundRole:
 
                 if self.transposed:
@@ -325,6 +346,9 @@ class ObjectsModel(WrappableTableModel):
                         value2 = value
 
                     self.objects[obj_idx].set_vaule(prop=prop, t_idx=self.time_index_, value=value2)
+
+                    # the setters may modify other columns too (i.e. bus, active), so everything is invalidated
+                    self.columns_cache.invalidate()
                 else:
                     pass  # the column cannot be edited
             else:
@@ -427,6 +451,26 @@ class ObjectsModel(WrappableTableModel):
             else:
                 pass  # the column cannot be edited
 
+        self.columns_cache.invalidate()
+
+    def sort_column(self, c: int) -> None:
+        """
+        Sort the objects by a column, initially max to min, but flipping the side each time.
+        The list of objects of the model is replaced by a sorted copy, the original list is not modified.
+        :param c: column index
+        """
+        if self.transposed or c >= self.c:
+            return
+
+        idx = self.columns_cache.get_sorting(col=c, t_idx=self.time_index_, max_to_min=self.max_to_min[c])
+        self.max_to_min[c] = not self.max_to_min[c]
+
+        # the cached columns are permuted with the objects, so there is no need to call update()
+        self.layoutAboutToBeChanged.emit()
+        self.columns_cache.permute(idx)
+        self.objects = self.columns_cache.objects
+        self.layoutChanged.emit()
+
     def get_data(self):
         """
 
@@ -434,11 +478,10 @@ class ObjectsModel(WrappableTableModel):
         """
         nrows = self.rowCount()
         ncols = self.columnCount()
-        data = np.empty((nrows, ncols), dtype=object)
 
-        for j in range(ncols):
-            for i in range(nrows):
-                data[i, j] = self.data_raw(r=i, c=j)
+        data = self.columns_cache.get_matrix(t_idx=self.time_index_)
+        if self.transposed:
+            data = data.T
 
         columns = [self.headerData(i, orientation=QtCore.Qt.Orientation.Horizontal,
                                    role=QtCore.Qt.ItemDataRole.DisplayRole) for i in range(ncols)]
@@ -455,16 +498,21 @@ class ObjectsModel(WrappableTableModel):
         """
         if self.columnCount() > 0:
 
-            index, columns, data = self.get_data()
+            index, columns, _ = self.get_data()
 
-            data = data.astype(str)
+            # use the memoized display strings
+            data = self.columns_cache.get_strings_matrix(t_idx=self.time_index_)
+            if self.transposed:
+                data = data.T
 
             # header first
-            txt = '\t' + '\t'.join(columns) + '\n'
+            lines = ['\t' + '\t'.join(columns)]
 
             # data
             for t, index_value in enumerate(index):
-                txt += str(index_value) + '\t' + '\t'.join(data[t, :]) + '\n'
+                lines.append(str(index_value) + '\t' + '\t'.join(data[t, :]))
+
+            txt = '\n'.join(lines) + '\n'
 
             # copy to clipboard
             cb = QtWidgets.QApplication.clipboard()
@@ -0,0 +1,277 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+import numpy as np
+from operator import attrgetter
+from typing import Dict, List, Tuple, Union, Any
+from GridCalEngine.Devices import Bus
+from GridCalEngine.Devices.Parents.editable_device import GCProp
+from GridCalEngine.Devices.types import ALL_DEV_TYPES
+from GridCalEngine.basic_structures import ObjVec, IntVec, BoolVec, ObjMat
+
+
+def get_objects_column(objects: List[ALL_DEV_TYPES], prop: GCProp, t_idx: Union[int, None]) -> ObjVec:
+    """
+    Get the values of a property for all the objects at once
+    :param objects: list of objects
+    :param prop: GCProp
+    :param t_idx: time index (None for the snapshot values)
+    :return: object array with the values (the buses are represented by their name)
+    """
+    if t_idx is not None and prop.has_profile():
+        values = [profile[t_idx] for profile in map(attrgetter(prop.profile_name), objects)]
+    else:
+        values = list(map(attrgetter(prop.name), objects))
+
+    if prop.tpe is Bus:
+        values = [bus.name if bus is not None else None for bus in values]
+
+    # assign through a slice, so that numpy does not try to expand the values that are sequences
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+class ObjectsColumnsCache:
+    """
+    Columnar snapshot of the properties of a list of objects.
+    The columns are gathered once per time index, and the display strings are formatted
+    by blocks of rows as they are requested, so that repainting a table does not go through the
+    objects again. The cache must be invalidated when the objects are modified.
+    """
+
+    def __init__(self,
+                 objects: List[ALL_DEV_TYPES],
+                 property_list: List[GCProp],
+                 block_size: int = 256,
+                 max_time_entries: int = 4):
+        """
+        Constructor
+        :param objects: list of objects
+        :param property_list: list of the displayed properties (the columns)
+        :param block_size: number of rows formatted at once
+        :param max_time_entries: maximum number of time indices kept in the cache
+        """
+        self.objects: List[ALL_DEV_TYPES] = objects
+
+        self.property_list: List[GCProp] = property_list
+
+        self.block_size = block_size
+
+        self.max_time_entries = max_time_entries
+
+        # (time index, column index) -> column values
+        self._columns: Dict[Tuple[Union[int, None], int], ObjVec] = dict()
+
+        # (time index, column index) -> column display strings (None where not formatted yet)
+        self._strings: Dict[Tuple[Union[int, None], int], ObjVec] = dict()
+
+        # (time index, column index) -> formatted blocks mask
+        self._formatted: Dict[Tuple[Union[int, None], int], BoolVec] = dict()
+
+        # time indices in the cache, oldest first
+        self._time_entries: List[Union[int, None]] = list()
+
+    @property
+    def n_rows(self) -> int:
+        """
+        Number of objects
+        :return: int
+        """
+        return len(self.objects)
+
+    def set_objects(self, objects: List[ALL_DEV_TYPES]) -> None:
+        """
+        Set a new list of objects, this clears the cache
+        :param objects: list of objects
+        """
+        self.objects = objects
+        self.invalidate()
+
+    def invalidate(self, col: Union[int, None] = None) -> None:
+        """
+        Invalidate the cache
+        :param col: column index to invalidate at all the time indices, None to invalidate everything
+        """
+        if col is None:
+            self._columns.clear()
+            self._strings.clear()
+            self._formatted.clear()
+            self._time_entries.clear()
+        else:
+            for t_idx in self._time_entries:
+                key = (t_idx, col)
+                self._columns.pop(key, None)
+                self._strings.pop(key, None)
+                self._formatted.pop(key, None)
+
+    def _register_time_index(self, t_idx: Union[int, None]) -> None:
+        """
+        Register the use of a time index, dropping the oldest one if there are too many
+        :param t_idx: time index
+        """
+        if t_idx not in self._time_entries:
+            if len(self._time_entries) >= self.max_time_entries:
+                old_t = self._time_entries.pop(0)
+                for key in [key for key in self._columns.keys() if key[0] == old_t]:
+                    self._columns.pop(key, None)
+                    self._strings.pop(key, None)
+                    self._formatted.pop(key, None)
+
+            self._time_entries.append(t_idx)
+
+    def get_column(self, col: int, t_idx: Union[int, None]) -> ObjVec:
+        """
+        Get the values of a column
+        :param col: column (property) index
+        :param t_idx: time index
+        :return: object array with one value per object
+        """
+        key = (t_idx, col)
+        arr = self._columns.get(key, None)
+
+        if arr is None:
+            self._register_time_index(t_idx)
+            arr = get_objects_column(objects=self.objects, prop=self.property_list[col], t_idx=t_idx)
+            self._columns[key] = arr
+
+        return arr
+
+    def get_value(self, row: int, col: int, t_idx: Union[int, None]) -> Any:
+        """
+        Get the value of a cell
+        :param row: row (object) index
+        :param col: column (property) index
+        :param t_idx: time index
+        :return: value
+        """
+        return self.get_column(col=col, t_idx=t_idx)[row]
+
+    def _format_block(self, col: int, t_idx: Union[int, None], block: int) -> ObjVec:
+        """
+        Format a block of rows of a column if it was not formatted yet
+        :param col: column (property) index
+        :param t_idx: time index
+        :param block: block index
+        :return: array of display strings of the column
+        """
+        key = (t_idx, col)
+        arr = self.get_column(col=col, t_idx=t_idx)
+        strings = self._strings.get(key, None)
+
+        if strings is None:
+            strings = np.empty(len(arr), dtype=object)
+            self._strings[key] = strings
+            self._formatted[key] = np.zeros(len(arr) // self.block_size + 1, dtype=bool)
+
+        formatted = self._formatted[key]
+        if not formatted[block]:
+            a = block * self.block_size
+            b = min(a + self.block_size, len(arr))
+            strings[a:b] = [str(val) for val in arr[a:b]]
+            formatted[block] = True
+
+        return strings
+
+    def get_string(self, row: int, col: int, t_idx: Union[int, None]) -> str:
+        """
+        Get the display string of a cell
+        :param row: row (object) index
+        :param col: column (property) index
+        :param t_idx: time index
+        :return: string
+        """
+        return self._format_block(col=col, t_idx=t_idx, block=row // self.block_size)[row]
+
+    def get_strings(self, col: int, t_idx: Union[int, None]) -> ObjVec:
+        """
+        Get the display strings of a whole column
+        :param col: column (property) index
+        :param t_idx: time index
+        :return: object array of strings
+        """
+        strings = None
+        for block in range(self.n_rows // self.block_size + 1):
+            strings = self._format_block(col=col, t_idx=t_idx, block=block)
+
+        return strings
+
+    def get_matrix(self, t_idx: Union[int, None]) -> ObjMat:
+        """
+        Get all the values
+        :param t_idx: time index
+        :return: (n_objects, n_properties) object matrix
+        """
+        data = np.empty((self.n_rows, len(self.property_list)), dtype=object)
+        for j in range(len(self.property_list)):
+            data[:, j] = self.get_column(col=j, t_idx=t_idx)
+        return data
+
+    def get_strings_matrix(self, t_idx: Union[int, None]) -> ObjMat:
+        """
+        Get all the display strings
+        :param t_idx: time index
+        :return: (n_objects, n_properties) object matrix of strings
+        """
+        data = np.empty((self.n_rows, len(self.property_list)), dtype=object)
+        for j in range(len(self.property_list)):
+            data[:, j] = self.get_strings(col=j, t_idx=t_idx)
+        return data
+
+    def get_sorting(self, col: int, t_idx: Union[int, None], max_to_min: bool = True) -> IntVec:
+        """
+        Get the objects order that sorts a column
+        :param col: column (property) index
+        :param t_idx: time index
+        :param max_to_min: sort from the maximum to the minimum?
+        :return: array of object indices
+        """
+        arr = self.get_column(col=col, t_idx=t_idx)
+
+        if self.property_list[col].tpe in (float, int, bool):
+            try:
+                sorting_arr = arr.astype(float)
+            except (ValueError, TypeError):
+                sorting_arr = self.get_strings(col=col, t_idx=t_idx).astype(str)
+        else:
+            sorting_arr = self.get_strings(col=col, t_idx=t_idx).astype(str)
+
+        idx = np.argsort(sorting_arr, kind='stable')
+
+        if max_to_min:
+            return idx[::-1]
+        else:
+            return idx
+
+    def permute(self, idx: IntVec) -> None:
+        """
+        Reorder the cached rows (i.e. after sorting the objects)
+        :param idx: new order of the objects
+        """
+        self.objects = [self.objects[i] for i in idx]
+
+        for key in list(self._columns.keys()):
+            self._columns[key] = self._columns[key][idx]
+
+        for key in list(self._strings.keys()):
+            if self._formatted[key].all():
+                self._strings[key] = self._strings[key][idx]
+            else:
+                # the formatted blocks are scattered after the reordering, format them again when needed
+                self._strings.pop(key)
+                self._formatted.pop(key)
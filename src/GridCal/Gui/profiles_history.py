@@ -0,0 +1,197 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+import numpy as np
+from collections import deque
+from typing import Deque, Dict, Tuple, Union
+from GridCalEngine.Devices.profile import Profile
+from GridCalEngine.basic_structures import IntVec, NumericVec
+
+
+def get_changed_indices(old_arr: NumericVec, new_arr: NumericVec) -> IntVec:
+    """
+    Get the indices where two arrays differ
+    :param old_arr: array before the change
+    :param new_arr: array after the change
+    :return: array of indices
+    """
+    diff = old_arr != new_arr
+
+    if old_arr.dtype.kind in 'fc' and new_arr.dtype.kind in 'fc':
+        # NaN != NaN, but that is not a change
+        diff &= ~(np.isnan(old_arr) & np.isnan(new_arr))
+
+    return np.where(diff)[0]
+
+
+class ProfileDelta:
+    """
+    Sparse change of a profile.
+    It stores the changed indices and the values that are not in the profile, so that applying the delta
+    swaps the stored values with the profile values: applying it once undoes the change and applying it again redoes it.
+    The indices are stored as a slice when they form a contiguous block (i.e. a whole column was edited).
+    """
+
+    def __init__(self, col: int, indices: IntVec, values: NumericVec):
+        """
+        Constructor
+        :param col: column index of the profile in the table
+        :param indices: changed indices
+        :param values: values at the changed indices that are not in the profile right now
+        """
+        self.col = col
+
+        if len(indices) > 0 and indices[-1] - indices[0] + 1 == len(indices):
+            # contiguous block, no need to store the indices
+            self.indices: Union[IntVec, slice] = slice(int(indices[0]), int(indices[-1]) + 1)
+        else:
+            self.indices: Union[IntVec, slice] = np.asarray(indices, dtype=np.int32)
+
+        self.values: NumericVec = np.array(values)
+
+    @staticmethod
+    def from_arrays(col: int, old_arr: NumericVec, new_arr: NumericVec) -> Union["ProfileDelta", None]:
+        """
+        Create the delta of a change, to be stored after the change is applied
+        :param col: column index of the profile in the table
+        :param old_arr: array before the change
+        :param new_arr: array after the change
+        :return: ProfileDelta or None if nothing changed
+        """
+        idx = get_changed_indices(old_arr=old_arr, new_arr=new_arr)
+
+        if len(idx) > 0:
+            return ProfileDelta(col=col, indices=idx, values=old_arr[idx])
+        else:
+            return None
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the delta
+        :return: number of bytes
+        """
+        if isinstance(self.indices, slice):
+            return self.values.nbytes
+        else:
+            return self.values.nbytes + self.indices.nbytes
+
+    def apply(self, profile: Profile) -> None:
+        """
+        Swap the stored values with the profile values
+        :param profile: Profile to modify
+        """
+        arr = profile.toarray().copy()
+        current = arr[self.indices].copy()
+        arr[self.indices] = self.values
+        self.values = current
+        profile.set(arr)
+
+
+class ObjectHistory:
+    """
+    ObjectHistory
+    The states are stored as sparse deltas, and the history is bounded both by the number
+    of states and by the memory used by the states, the oldest states are discarded first.
+    """
+
+    def __init__(self, max_undo_states: int = 100, max_memory_mb: float = 256.0) -> None:
+        """
+        Constructor
+        :param max_undo_states: maximum number of undo states
+        :param max_memory_mb: maximum memory used by the undo states (MB)
+        """
+        self.max_undo_states = max_undo_states
+        self.max_memory = int(max_memory_mb * 1024 * 1024)
+        self.memory = 0
+        self.undo_stack: Deque[Tuple[str, Dict[int, ProfileDelta]]] = deque()
+        self.redo_stack: Deque[Tuple[str, Dict[int, ProfileDelta]]] = deque()
+
+    @staticmethod
+    def get_state_memory(data: Dict[int, ProfileDelta]) -> int:
+        """
+        Get the memory used by a state
+        :param data: dictionary {column index -> ProfileDelta}
+        :return: number of bytes
+        """
+        return sum(delta.nbytes for delta in data.values())
+
+    def _shrink(self) -> None:
+        """
+        Discard the oldest states until the limits are respected
+        """
+        while len(self.undo_stack) > 0 and (len(self.undo_stack) > self.max_undo_states
+                                            or self.memory > self.max_memory):
+            _, data = self.undo_stack.popleft()
+            self.memory -= self.get_state_memory(data)
+
+        while len(self.redo_stack) > 0 and self.memory > self.max_memory:
+            _, data = self.redo_stack.popleft()
+            self.memory -= self.get_state_memory(data)
+
+    def add_state(self, action_name: str, data: Dict[int, ProfileDelta]) -> None:
+        """
+        Add an undo state, this discards the redo states
+        :param action_name: name of the action that was performed
+        :param data: dictionary {column index -> ProfileDelta}
+        """
+        if len(data) == 0:
+            return
+
+        for _, redo_data in self.redo_stack:
+            self.memory -= self.get_state_memory(redo_data)
+        self.redo_stack.clear()
+
+        # stack the newest entry
+        self.undo_stack.append((action_name, data))
+        self.memory += self.get_state_memory(data)
+
+        # if the stack is too long or too heavy delete the oldest entries
+        self._shrink()
+
+    def redo(self) -> Tuple[str, Dict[int, ProfileDelta]]:
+        """
+        Re-do
+        :return: action name, dictionary {column index -> ProfileDelta} to apply
+        """
+        val = self.redo_stack.pop()
+        self.undo_stack.append(val)
+        return val
+
+    def undo(self) -> Tuple[str, Dict[int, ProfileDelta]]:
+        """
+        Un-do
+        :return: action name, dictionary {column index -> ProfileDelta} to apply
+        """
+        val = self.undo_stack.pop()
+        self.redo_stack.append(val)
+        return val
+
+    def can_redo(self) -> bool:
+        """
+        is it possible to redo?
+        :return: True / False
+        """
+        return len(self.redo_stack) > 0
+
+    def can_undo(self) -> bool:
+        """
+        Is it possible to undo?
+        :return: True / False
+        """
+        return len(self.undo_stack) > 0
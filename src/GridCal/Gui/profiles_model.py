@@ -17,7 +17,7 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from typing import List, Union
+from typing import Dict, List, Union
 from PySide6 import QtCore, QtWidgets
 from warnings import warn
 
@@ -25,72 +25,8 @@ from GridCalEngine.Devices.Parents.editable_device import EditableDevice
 from GridCalEngine.enumerations import DeviceType
 from GridCal.Gui.gui_functions import (ComboDelegate, TextDelegate, FloatDelegate, ComplexDelegate)
 from GridCal.Gui.wrappable_table_model import WrappableTableModel
-
-
-class ObjectHistory:
-    """
-    ObjectHistory
-    """
-
-    def __init__(self, max_undo_states: int = 100) -> None:
-        """
-        Constructor
-        :param max_undo_states: maximum number of undo states
-        """
-        self.max_undo_states = max_undo_states
-        self.position = 0
-        self.undo_stack = list()
-        self.redo_stack = list()
-
-    def add_state(self, action_name, data: dict):
-        """
-        Add an undo state
-        :param action_name: name of the action that was performed
-        :param data: dictionary {column index -> profile array}
-        """
-
-        # if the stack is too long delete the oldest entry
-        if len(self.undo_stack) > (self.max_undo_states + 1):
-            self.undo_stack.pop(0)
-
-        # stack the newest entry
-        self.undo_stack.append((action_name, data))
-
-        self.position = len(self.undo_stack) - 1
-
-        # print('Stored', action_name)
-
-    def redo(self):
-        """
-        Re-do table
-        :return: table instance
-        """
-        val = self.redo_stack.pop()
-        self.undo_stack.append(val)
-        return val
-
-    def undo(self):
-        """
-        Un-do table
-        :return: table instance
-        """
-        val = self.undo_stack.pop()
-        self.redo_stack.append(val)
-        return val
-
-    def can_redo(self):
-        """
-        is it possible to redo?
-        :return: True / False
-        """
-        return len(self.redo_stack) > 0
-
-    def can_undo(self):
-        """
-        Is it possible to undo?
-        :return: True / False
-        """
-        return len(self.undo_stack) > 0
+from GridCal.Gui.profiles_history import ObjectHistory, ProfileDelta
+from GridCalEngine.basic_structures import NumericVec
 
 
 class ProfilesModel(WrappableTableModel):
@@ -135,12 +71,9 @@ class ProfilesModel(WrappableTableModel):
 
         self.formatter = lambda x: "%.2f" % x
 
-        # contains copies of the table
+        # contains the changes of the table
         self.history = ObjectHistory(max_undo_states)
 
-        # add the initial state
-        # self.add_state(columns=range(self.columnCount()), action_name='initial')
-
         self.set_delegates()
 
     def set_delegates(self) -> None:
@@ -239,9 +172,12 @@ class ProfilesModel(WrappableTableModel):
             r = index.row()
             profile_attr_name = self.elements[index.column()].properties_with_profile[self.magnitude]
             profile = getattr(self.elements[index.column()], profile_attr_name)
+            old_value = profile[r]
             profile[r] = value
 
-            # self.add_state(columns=[c], action_name='')
+            if old_value != profile[r]:
+                self.history.add_state(action_name='edit',
+                                       data={c: ProfileDelta(col=c, indices=np.array([r]), values=[old_value])})
         else:
             pass  # the column cannot be edited
 
@@ -294,7 +230,8 @@ class ProfilesModel(WrappableTableModel):
 
             rows = text.split('\n')
 
-            mod_cols = list()
+            # column index -> modified array
+            arrays: Dict[int, NumericVec] = dict()
 
             # gather values
             for r, row in enumerate(rows):
@@ -315,14 +252,17 @@ class ProfilesModel(WrappableTableModel):
 
                     if parsed:
                         if c2 < n and r2 < nt:
-                            mod_cols.append(c2)
-                            prof = self.elements[c2].get_profile(magnitude=self.magnitude)
-                            arr = prof.toarray()
+                            arr = arrays.get(c2, None)
+                            if arr is None:
+                                arr = self.elements[c2].get_profile(magnitude=self.magnitude).toarray().copy()
+                                arrays[c2] = arr
                             arr[r2] = val2
-                            prof.set(arr)
                         else:
                             print('Out of profile bounds')
 
+            # set the modified columns at once
+            self.set_profiles(arrays=arrays, action_name='paste')
+
         else:
             # there are no elements
             pass
@@ -367,32 +307,34 @@ class ProfilesModel(WrappableTableModel):
             # there are no elements
             pass
 
-    def add_state(self, columns: List[int], action_name: str = ''):
+    def set_profiles(self, arrays: Dict[int, NumericVec], action_name: str = '') -> None:
         """
-        Compile data of an action and store the data in the undo history
-        :param columns: list of column indices changed
+        Set the profiles of several columns, storing the changes in the undo history
+        :param arrays: dictionary {column index -> new profile array}
         :param action_name: name of the action
-        :return: None
         """
-        data = dict()
+        data: Dict[int, ProfileDelta] = dict()
+
+        for col, arr in arrays.items():
+            profile = self.elements[col].get_profile(self.magnitude)
+
+            if profile is not None:
+                delta = ProfileDelta.from_arrays(col=col, old_arr=profile.toarray(), new_arr=arr)
+                profile.set(arr)
 
-        for col in columns:
-            # profile_property = self.elements[col].properties_with_profile[self.magnitude]
-            # data[col] = getattr(self.elements[col], profile_property).copy()
-            data[col] = self.elements[col].get_profile(self.magnitude)
-            # TODO: check if devices do not have a profile
+                if delta is not None:
+                    data[col] = delta
 
         self.history.add_state(action_name, data)
 
-    def restore(self, data: dict):
+    def restore(self, data: Dict[int, ProfileDelta]):
         """
-        Set profiles data from undo history
+        Apply the changes coming from the undo history
         :param data: dictionary comming from the history
         :return:
         """
-        for col, array in data.items():
-            profile_property = self.elements[col].properties_with_profile[self.magnitude]
-            setattr(self.elements[col], profile_property, array)
+        for col, delta in data.items():
+            delta.apply(profile=self.elements[col].get_profile(self.magnitude))
 
     def undo(self):
         """
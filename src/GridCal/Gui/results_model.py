@@ -113,22 +113,10 @@ class ResultsModel(WrappableTableModel):
         """
         if index.isValid():
 
-            val = self.table.data_c[index.row(), index.column()]
-
             if role == QtCore.Qt.ItemDataRole.DisplayRole:
 
-                if isinstance(val, str):
-                    return val
-                elif isinstance(val, complex):
-                    if val.real != 0 or val.imag != 0:
-                        return val.__format__(self.table.format_string)
-                    else:
-                        return '0'
-                else:
-                    if val != 0:
-                        return val.__format__(self.table.format_string)
-                    else:
-                        return '0'
+                # the values are computed and formatted by blocks
+                return self.table.get_string(index.row(), index.column())
 
             elif role == QtCore.Qt.ItemDataRole.BackgroundRole:
 
@@ -17,6 +17,7 @@
 from PySide6 import QtCore, QtWidgets, QtGui
 from GridCal.Gui.wrappable_table_model import WrappableTableModel
 from GridCal.Gui.results_model import ResultsModel
+from GridCal.Gui.object_model import ObjectsModel
 
 
 class HeaderViewWithWordWrap(QtWidgets.QHeaderView):
@@ -118,7 +119,11 @@ class HeaderViewWithWordWrap(QtWidgets.QHeaderView):
         """
         mdl = self.model()  # assign with typing
 
-        if isinstance(mdl, ResultsModel):
+        if isinstance(mdl, ObjectsModel):
+            # the model updates its layout, update() would discard the sorted columns cache
+            mdl.sort_column(c=i)
+
+        elif isinstance(mdl, ResultsModel):
             mdl.sort_column(c=i)
             mdl.update()
 
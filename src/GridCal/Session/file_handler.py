@@ -22,6 +22,8 @@ from GridCal.Session.session import SimulationSession
 from GridCalEngine.basic_structures import Logger
 from GridCalEngine.IO.gridcal.zip_interface import get_session_tree, load_session_driver_objects
 from GridCalEngine.IO.file_handler import FileOpen, FileSave, FileSavingOptions, FileOpenOptions
+from GridCalEngine.IO.gridcal.incremental_save import (ModelSaveState, take_journal_snapshot, write_journal,
+                                                       get_journal_file_name)
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.IO.cim.cgmes.cgmes_circuit import CgmesCircuit
 from GridCalEngine.data_logger import DataLogger
@@ -63,6 +65,9 @@ class FileOpenThread(QThread):
 
         self.json_files = dict()
 
+        # state of the opened .gridcal file, used to save incrementally
+        self.save_state: Union[ModelSaveState, None] = None
+
         self._previous_circuit = previous_circuit
 
         self.__cancel__ = False
@@ -128,6 +133,8 @@ class FileOpenThread(QThread):
 
         self.json_files = file_handler.json_files
 
+        self.save_state = file_handler.save_state
+
         self.cgmes_circuit = file_handler.cgmes_circuit
         self.cgmes_logger = file_handler.cgmes_logger
 
@@ -178,6 +185,19 @@ class FileSaveThread(QThread):
 
         self.error_msg = ''
 
+        self.file_handler = FileSave(circuit=self.circuit,
+                                     file_name=self.file_name,
+                                     options=self.options,
+                                     text_func=self.progress_text.emit,
+                                     progress_func=self.progress_signal.emit)
+
+        # the model snapshot is taken here, in the calling thread, so that the model
+        # can keep being edited while the file is written
+        self.file_handler.take_snapshot()
+
+        # state of the saved .gridcal file, None if the save failed
+        self.save_state: Union[ModelSaveState, None] = None
+
         self.__cancel__ = False
 
     def get_session_tree(self) -> Dict:
@@ -220,16 +240,13 @@ class FileSaveThread(QThread):
 
         self.logger = Logger()
 
-        file_handler = FileSave(circuit=self.circuit,
-                                file_name=self.file_name,
-                                options=self.options,
-                                text_func=self.progress_text.emit,
-                                progress_func=self.progress_signal.emit)
         try:
-            self.logger = file_handler.save()
+            self.logger = self.file_handler.save()
         except PermissionError:
             self.logger.add_error("File permission denied. Do you have the file open? Do you have write permissions?")
 
+        self.save_state = self.file_handler.save_state
+
         self.valid = True
 
         # post events
@@ -242,3 +259,63 @@ class FileSaveThread(QThread):
         Activate the cancel flag
         """
         self.__cancel__ = True
+
+
+class JournalSaveThread(QThread):
+    """
+    Thread to write the autosave journal of a model
+    """
+    progress_signal = Signal(float)
+    progress_text = Signal(str)
+    done_signal = Signal()
+
+    def __init__(self,
+                 circuit: MultiCircuit,
+                 file_name: Union[str, None],
+                 save_state: Union[ModelSaveState, None],
+                 json_files: Union[Dict[str, dict], None] = None):
+        """
+        Constructor
+        :param circuit: MultiCircuit instance
+        :param file_name: name of the file of the model (None or empty if it was never saved)
+        :param save_state: state of the last save of the file (None if it cannot be used)
+        :param json_files: configuration json files to save Dict[file_name, dictionary to save]
+        """
+        QThread.__init__(self)
+
+        self.journal_file_name = get_journal_file_name(file_name)
+
+        self.json_files = json_files
+
+        self.valid = False
+
+        self.logger = Logger()
+
+        # only the changes since the last save are taken
+        self.snapshot, self.manifest = take_journal_snapshot(circuit=circuit, save_state=save_state)
+
+        self.__cancel__ = False
+
+    def run(self) -> None:
+        """
+        run the journal writing
+        """
+        self.logger = Logger()
+
+        try:
+            write_journal(snapshot=self.snapshot,
+                          manifest=self.manifest,
+                          journal_file_name=self.journal_file_name,
+                          json_files=self.json_files)
+            self.valid = True
+        except (PermissionError, OSError) as e:
+            self.logger.add_error("Could not write the autosave journal", value=str(e))
+            self.valid = False
+
+        self.done_signal.emit()
+
+    def cancel(self):
+        """
+        Activate the cancel flag
+        """
+        self.__cancel__ = True
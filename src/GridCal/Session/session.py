@@ -20,7 +20,7 @@ from uuid import uuid4
 import pandas as pd
 from PySide6.QtCore import QThread, Signal
 from typing import Dict, Union, List, Tuple, Any, Generator
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from warnings import warn
 
 from GridCalEngine.Simulations import ContingencyAnalysisOptions, AvailableTransferCapacityOptions, \
@@ -125,6 +125,199 @@ class GcThread(QThread):
         self.driver.__cancel__ = True
 
 
+class ResultsLoadThread(QThread):
+    """
+    Thread that reads the results of a study stored in a file and fills the results of its driver
+    """
+    progress_signal = Signal(float)
+    progress_text = Signal(str)
+    done_signal = Signal()
+
+    def __init__(self,
+                 driver: DRIVER_OBJECTS,
+                 grid: MultiCircuit,
+                 data_loader: Callable[[], Mapping[str, pd.DataFrame]]):
+        """
+        Constructor
+        :param driver: driver whose results are filled
+        :param grid: MultiCircuit instance
+        :param data_loader: function that returns the dictionary of data coming from the file
+        """
+        QThread.__init__(self)
+
+        self.driver = driver
+        self.tpe = driver.tpe
+        self.grid = grid
+        self.data_loader = data_loader
+
+        self.valid = False
+
+        self.logger = Logger()
+
+        self.__cancel__ = False
+
+    def run(self) -> None:
+        """
+        Read the arrays one by one (this is the slow part) and fill the results
+        """
+        self.progress_text.emit(f'Loading {self.driver.tpe.value} results...')
+        self.progress_signal.emit(0.0)
+
+        data_dict = self.data_loader()
+        keys = list(data_dict.keys())
+
+        for i, key in enumerate(keys):
+            if self.__cancel__:
+                break
+
+            # accessing the array reads it from the file, and it stays in the data dictionary
+            _ = data_dict[key]
+            self.progress_signal.emit((i + 1) / len(keys) * 100.0)
+
+        if self.__cancel__:
+            self.progress_text.emit('Cancelled!')
+        else:
+            self.logger = fill_driver_from_disk_data(drv=self.driver, grid=self.grid, data_dict=data_dict)
+            self.valid = True
+            self.progress_text.emit('Done!')
+
+        self.progress_signal.emit(0.0)
+        self.done_signal.emit()
+
+    def cancel(self) -> None:
+        """
+        Cancel the loading
+        """
+        self.__cancel__ = True
+
+
+def create_driver_for_study(grid: MultiCircuit,
+                            study_name: str,
+                            data_dict: Mapping[str, pd.DataFrame]) -> Union[DRIVER_OBJECTS, None]:
+    """
+    Create the driver of a study stored in a file, with empty results
+    :param grid: MultiCircuit instance
+    :param study_name: name of the study (i.e. Power Flow)
+    :param data_dict: dictionary of data coming from the file
+    :return: Driver or None if the study cannot be retrieved from disk
+    """
+    time_indices = data_dict.get('time_indices', grid.get_all_time_indices())
+
+    # get the results' object dictionary
+    if study_name == AvailableTransferCapacityDriver.tpe.value:
+        drv = AvailableTransferCapacityDriver(grid=grid,
+                                              options=AvailableTransferCapacityOptions())
+
+    elif study_name == AvailableTransferCapacityTimeSeriesDriver.tpe.value:
+        drv = AvailableTransferCapacityTimeSeriesDriver(grid=grid,
+                                                        options=AvailableTransferCapacityOptions(),
+                                                        time_indices=time_indices,
+                                                        clustering_results=None)
+
+    elif study_name == ContingencyAnalysisDriver.tpe.value:
+        drv = ContingencyAnalysisDriver(grid=grid,
+                                        options=ContingencyAnalysisOptions())
+
+    elif study_name == ContingencyAnalysisTimeSeriesDriver.tpe.value:
+        drv = ContingencyAnalysisTimeSeriesDriver(grid=grid,
+                                                  options=ContingencyAnalysisOptions(),
+                                                  time_indices=time_indices,
+                                                  clustering_results=None)
+
+    elif study_name == ContinuationPowerFlowDriver.tpe.value:
+        n = grid.get_bus_number()
+        drv = ContinuationPowerFlowDriver(grid=grid,
+                                          options=ContinuationPowerFlowOptions(),
+                                          inputs=ContinuationPowerFlowInput(
+                                              Sbase=np.zeros(n), Vbase=np.zeros(n), Starget=np.zeros(n)
+                                          ),
+                                          pf_options=PowerFlowOptions(),
+                                          opf_results=None)
+
+    elif study_name == LinearAnalysisDriver.tpe.value:
+        drv = LinearAnalysisDriver(grid=grid, options=None)
+
+    elif study_name == ContinuationPowerFlowDriver.tpe.value:
+        drv = LinearAnalysisTimeSeriesDriver(grid=grid,
+                                             options=None,
+                                             time_indices=time_indices,
+                                             clustering_results=None)
+
+    elif study_name == OptimalPowerFlowDriver.tpe.value:
+        drv = OptimalPowerFlowDriver(grid=grid, options=None)
+
+    elif study_name == OptimalPowerFlowTimeSeriesDriver.tpe.value:
+        drv = OptimalPowerFlowTimeSeriesDriver(grid=grid,
+                                               options=None,
+                                               time_indices=time_indices,
+                                               clustering_results=None)
+
+    elif study_name == NodalCapacityTimeSeriesDriver.tpe.value:
+        drv = NodalCapacityTimeSeriesDriver(grid=grid,
+                                            options=None,
+                                            time_indices=time_indices,
+                                            clustering_results=None)
+
+    elif study_name == PowerFlowDriver.tpe.value:
+        drv = PowerFlowDriver(grid=grid, options=PowerFlowOptions())
+
+    elif study_name == PowerFlowTimeSeriesDriver.tpe.value:
+        drv = PowerFlowTimeSeriesDriver(grid=grid,
+                                        options=PowerFlowOptions(),
+                                        time_indices=time_indices,
+                                        clustering_results=None)
+
+    elif study_name == ShortCircuitDriver.tpe.value:
+        drv = ShortCircuitDriver(grid=grid,
+                                 options=None,
+                                 pf_options=None,
+                                 pf_results=None,
+                                 opf_results=None)
+
+    elif study_name == StochasticPowerFlowDriver.tpe.value:
+        drv = StochasticPowerFlowDriver(grid=grid, options=PowerFlowOptions())
+
+    elif study_name == ClusteringDriver.tpe.value:
+        drv = ClusteringDriver(grid=grid, options=ClusteringAnalysisOptions(0))
+
+    elif study_name == InvestmentsEvaluationDriver.tpe.value:
+        drv = InvestmentsEvaluationDriver(grid=grid,
+                                          options=InvestmentsEvaluationOptions(max_eval=0,
+                                                                               pf_options=PowerFlowOptions()), )
+
+    else:
+        warn(f"Session {study_name} not implemented for disk retrieval :/")
+        return None
+
+    return drv
+
+
+def fill_driver_from_disk_data(drv: DRIVER_OBJECTS,
+                               grid: MultiCircuit,
+                               data_dict: Mapping[str, pd.DataFrame]) -> Logger:
+    """
+    Fill the results of a driver with the data stored in a file
+    :param drv: driver to fill
+    :param grid: MultiCircuit instance
+    :param data_dict: dictionary of data coming from the file
+    :return: Logger
+    """
+    logger = Logger()
+
+    # fill in the saved results
+    drv.results.parse_saved_data(grid=grid, data_dict=data_dict, logger=logger)
+
+    # perform whatever operations are needed after loading
+    drv.results.consolidate_after_loading()
+
+    # parse the logger if available
+    logger_data = data_dict.get('logger', None)
+    if logger_data is not None:
+        drv.logger.parse_df(df=logger_data)
+
+    return logger
+
+
 class SimulationSession:
     """
     The simulation session is the simulation manager
@@ -144,7 +337,11 @@ class SimulationSession:
 
         # dictionary of drivers
         self.drivers: Dict[SimulationTypes, DRIVER_OBJECTS] = dict()
-        self.threads: Dict[SimulationTypes, GcThread] = dict()
+        self.threads: Dict[SimulationTypes, Union[GcThread, ResultsLoadThread]] = dict()
+
+        # drivers registered from a file whose results have not been read yet:
+        # driver type -> (grid, function that returns the dictionary of data coming from the file)
+        self.pending: Dict[SimulationTypes, Tuple[MultiCircuit, Callable[[], Mapping[str, pd.DataFrame]]]] = dict()
 
     def __str__(self):
         return self.name
@@ -153,7 +350,12 @@ class SimulationSession:
         """
         Delete all the drivers
         """
+        for thr in self.threads.values():
+            if isinstance(thr, ResultsLoadThread):
+                thr.cancel()
+
         self.drivers = dict()
+        self.pending = dict()
 
     def register(self, driver: DRIVER_OBJECTS):
         """
@@ -168,6 +370,9 @@ class SimulationSession:
         Get data to be saved
         :return: List[DriverToSave]
         """
+        # the results that were not read yet would be saved empty
+        self.load_all_pending()
+
         data = list()
         for tpe, drv in self.drivers.items():
             data.append(DriverToSave(name=self.name,
@@ -198,9 +403,10 @@ class SimulationSession:
         # check and kill
         if driver.tpe in self.drivers.keys():
             del self.drivers[driver.tpe]
-            if self.threads[driver.tpe].isRunning():
-                self.threads[driver.tpe].terminate()
-            del self.threads[driver.tpe]
+            self.pending.pop(driver.tpe, None)
+            prev_thr = self.threads.pop(driver.tpe, None)
+            if prev_thr is not None and prev_thr.isRunning():
+                prev_thr.terminate()
 
         # register
         self.drivers[driver.tpe] = driver
@@ -223,6 +429,7 @@ class SimulationSession:
         """
         for driver_type, drv in self.drivers.items():
             if hasattr(drv, 'results'):
+                self._ensure_loaded(driver_type)
                 yield drv, drv.results
             else:
                 yield drv, None
@@ -247,6 +454,7 @@ class SimulationSession:
 
         if drv is not None:
             if hasattr(drv, 'results'):
+                self._ensure_loaded(driver_type)
                 return drv, drv.results
             else:
                 return drv, None
@@ -262,6 +470,7 @@ class SimulationSession:
         if driver_type in self.drivers.keys():
             drv = self.drivers[driver_type]
             if hasattr(drv, 'results'):
+                self._ensure_loaded(driver_type)
                 return drv.results
             else:
                 return None
@@ -275,6 +484,7 @@ class SimulationSession:
         """
         if driver_type in self.drivers.keys():
             del self.drivers[driver_type]
+            self.pending.pop(driver_type, None)
 
     def delete_driver_by_name(self, study_name: str) -> None:
         """
@@ -282,11 +492,9 @@ class SimulationSession:
         :param study_name: driver name
         """
         for driver_type, drv in self.drivers.items():
-            if study_name == drv.tpe.value:
-                del self.drivers[driver_type]
-                return
-            if study_name == drv.name:
+            if study_name == drv.tpe.value or study_name == drv.name:
                 del self.drivers[driver_type]
+                self.pending.pop(driver_type, None)
                 return
 
     def get_driver_by_name(self,
@@ -313,6 +521,7 @@ class SimulationSession:
         """
         for driver_type, drv in self.drivers.items():
             if study_name == drv.tpe.value or study_name == drv.name:
+                self._ensure_loaded(driver_type)
                 if drv.results is not None:
                     return ResultsModel(drv.results.mdl(result_type=study_type))
                 else:
@@ -324,118 +533,126 @@ class SimulationSession:
     def register_driver_from_disk_data(self,
                                        grid: MultiCircuit,
                                        study_name: str,
-                                       data_dict: Dict[str, pd.DataFrame]) -> Logger:
+                                       data_dict: Mapping[str, pd.DataFrame]) -> Logger:
         """
         Create driver with the results
         :param grid: MultiCircuit instance
         :param study_name: name of the study (i.e. Power Flow)
         :param data_dict: dictionary of data coming from the file
         """
-        logger = Logger()
-
-        time_indices = data_dict.get('time_indices', grid.get_all_time_indices())
-
-        # get the results' object dictionary
-        if study_name == AvailableTransferCapacityDriver.tpe.value:
-            drv = AvailableTransferCapacityDriver(grid=grid,
-                                                  options=AvailableTransferCapacityOptions())
-
-        elif study_name == AvailableTransferCapacityTimeSeriesDriver.tpe.value:
-            drv = AvailableTransferCapacityTimeSeriesDriver(grid=grid,
-                                                            options=AvailableTransferCapacityOptions(),
-                                                            time_indices=time_indices,
-                                                            clustering_results=None)
-
-        elif study_name == ContingencyAnalysisDriver.tpe.value:
-            drv = ContingencyAnalysisDriver(grid=grid,
-                                            options=ContingencyAnalysisOptions())
-
-        elif study_name == ContingencyAnalysisTimeSeriesDriver.tpe.value:
-            drv = ContingencyAnalysisTimeSeriesDriver(grid=grid,
-                                                      options=ContingencyAnalysisOptions(),
-                                                      time_indices=time_indices,
-                                                      clustering_results=None)
-
-        elif study_name == ContinuationPowerFlowDriver.tpe.value:
-            n = grid.get_bus_number()
-            drv = ContinuationPowerFlowDriver(grid=grid,
-                                              options=ContinuationPowerFlowOptions(),
-                                              inputs=ContinuationPowerFlowInput(
-                                                  Sbase=np.zeros(n), Vbase=np.zeros(n), Starget=np.zeros(n)
-                                              ),
-                                              pf_options=PowerFlowOptions(),
-                                              opf_results=None)
-
-        elif study_name == LinearAnalysisDriver.tpe.value:
-            drv = LinearAnalysisDriver(grid=grid, options=None)
-
-        elif study_name == ContinuationPowerFlowDriver.tpe.value:
-            drv = LinearAnalysisTimeSeriesDriver(grid=grid,
-                                                 options=None,
-                                                 time_indices=time_indices,
-                                                 clustering_results=None)
-
-        elif study_name == OptimalPowerFlowDriver.tpe.value:
-            drv = OptimalPowerFlowDriver(grid=grid, options=None)
-
-        elif study_name == OptimalPowerFlowTimeSeriesDriver.tpe.value:
-            drv = OptimalPowerFlowTimeSeriesDriver(grid=grid,
-                                                   options=None,
-                                                   time_indices=time_indices,
-                                                   clustering_results=None)
-
-        elif study_name == NodalCapacityTimeSeriesDriver.tpe.value:
-            drv = NodalCapacityTimeSeriesDriver(grid=grid,
-                                                options=None,
-                                                time_indices=time_indices,
-                                                clustering_results=None)
-
-        elif study_name == PowerFlowDriver.tpe.value:
-            drv = PowerFlowDriver(grid=grid, options=PowerFlowOptions())
-
-        elif study_name == PowerFlowTimeSeriesDriver.tpe.value:
-            drv = PowerFlowTimeSeriesDriver(grid=grid,
-                                            options=PowerFlowOptions(),
-                                            time_indices=time_indices,
-                                            clustering_results=None)
+        drv = create_driver_for_study(grid=grid, study_name=study_name, data_dict=data_dict)
 
-        elif study_name == ShortCircuitDriver.tpe.value:
-            drv = ShortCircuitDriver(grid=grid,
-                                     options=None,
-                                     pf_options=None,
-                                     pf_results=None,
-                                     opf_results=None)
+        if drv is None:
+            return Logger()
 
-        elif study_name == StochasticPowerFlowDriver.tpe.value:
-            drv = StochasticPowerFlowDriver(grid=grid, options=PowerFlowOptions())
+        logger = fill_driver_from_disk_data(drv=drv, grid=grid, data_dict=data_dict)
 
-        elif study_name == ClusteringDriver.tpe.value:
-            drv = ClusteringDriver(grid=grid, options=ClusteringAnalysisOptions(0))
+        # register the driver
+        self.register(drv)
+        self.pending.pop(drv.tpe, None)
 
-        elif study_name == InvestmentsEvaluationDriver.tpe.value:
-            drv = InvestmentsEvaluationDriver(grid=grid,
-                                              options=InvestmentsEvaluationOptions(max_eval=0,
-                                                                                   pf_options=PowerFlowOptions()),)
+        return logger
 
-        else:
-            warn(f"Session {study_name} not implemented for disk retrieval :/")
-            return logger
+    def register_driver_from_disk(self,
+                                  grid: MultiCircuit,
+                                  study_name: str,
+                                  data_loader: Callable[[], Mapping[str, pd.DataFrame]]) -> bool:
+        """
+        Register the driver of a study stored in a file with empty results.
+        The results are only read the first time they are needed (see load_pending)
+        :param grid: MultiCircuit instance
+        :param study_name: name of the study (i.e. Power Flow)
+        :param data_loader: function that returns the dictionary of data coming from the file
+        :return: was the driver registered?
+        """
+        drv = create_driver_for_study(grid=grid, study_name=study_name, data_dict=data_loader())
 
-        # fill in the saved results
-        drv.results.parse_saved_data(grid=grid, data_dict=data_dict, logger=logger)
+        if drv is None:
+            return False
 
-        # perform whatever operations are needed after loading
-        drv.results.consolidate_after_loading()
+        self.register(drv)
+        self.pending[drv.tpe] = (grid, data_loader)
 
-        # parse the logger if available
-        logger_data = data_dict.get('logger', None)
-        if logger_data is not None:
-            drv.logger.parse_df(df=logger_data)
+        return True
 
-        # register the driver
-        self.register(drv)
+    def is_pending(self, driver_type: SimulationTypes) -> bool:
+        """
+        Are the results of the driver still to be read from the file?
+        :param driver_type: driver type
+        :return: True / False
+        """
+        return driver_type in self.pending
 
-        return logger
+    def load_pending(self,
+                     driver_type: SimulationTypes,
+                     post_func: Union[None, Callable] = None,
+                     prog_func: Union[None, Callable] = None,
+                     text_func: Union[None, Callable] = None) -> bool:
+        """
+        Read the results of a driver registered with register_driver_from_disk in a thread
+        :param driver_type: driver type
+        :param post_func: Function to run after it is done
+        :param prog_func: Function to display the progress
+        :param text_func: Function to display text
+        :return: was the loading launched? (False if there is nothing pending or if it is being loaded already)
+        """
+        if driver_type not in self.pending:
+            return False
+
+        thr = self.threads.get(driver_type, None)
+        if isinstance(thr, ResultsLoadThread) and thr.isRunning():
+            return False
+
+        grid, data_loader = self.pending[driver_type]
+
+        thr = ResultsLoadThread(driver=self.drivers[driver_type], grid=grid, data_loader=data_loader)
+
+        # this is connected first so that the pending state is up-to-date when post_func runs
+        thr.done_signal.connect(lambda: self._post_load(thr))
+
+        if prog_func is not None:
+            thr.progress_signal.connect(prog_func)
+        if text_func is not None:
+            thr.progress_text.connect(text_func)
+        if post_func is not None:
+            thr.done_signal.connect(post_func)
+
+        self.threads[driver_type] = thr
+        thr.start()
+
+        return True
+
+    def _post_load(self, thr: ResultsLoadThread) -> None:
+        """
+        Actions after a results loading thread finishes
+        :param thr: ResultsLoadThread
+        """
+        if thr.valid and self.drivers.get(thr.tpe, None) is thr.driver:
+            self.pending.pop(thr.tpe, None)
+
+    def _ensure_loaded(self, driver_type: SimulationTypes) -> None:
+        """
+        Read the pending results of a driver right now (waiting for the loading thread if there is one)
+        :param driver_type: driver type
+        """
+        if driver_type in self.pending:
+
+            thr = self.threads.get(driver_type, None)
+            if isinstance(thr, ResultsLoadThread) and thr.isRunning():
+                thr.wait()
+                if thr.valid:
+                    self.pending.pop(driver_type, None)
+                    return
+
+            grid, data_loader = self.pending.pop(driver_type)
+            fill_driver_from_disk_data(drv=self.drivers[driver_type], grid=grid, data_dict=data_loader())
+
+    def load_all_pending(self) -> None:
+        """
+        Read all the pending results right now (i.e. before saving them)
+        """
+        for driver_type in list(self.pending.keys()):
+            self._ensure_loaded(driver_type)
 
     def is_this_running(self, sim_tpe: SimulationTypes) -> bool:
         """
@@ -17,7 +17,6 @@
 
 import os
 import time
-from math import isclose
 from typing import List
 from PySide6.QtCore import QThread, Signal
 from PySide6 import QtGui
@@ -26,8 +25,8 @@ from PySide6.QtCore import Qt
 from GridCalEngine.basic_structures import Logger
 from GridCalEngine.enumerations import SyncIssueType
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.Devices.comparison import CircuitDiff, diff_circuits
 from GridCalEngine.IO.file_handler import FileOpen
-from GridCalEngine.Devices.Parents.editable_device import EditableDevice, DeviceType
 
 
 class SyncIssue:
@@ -100,119 +99,52 @@ class SyncIssue:
         setattr(self.my_elm, self.property_name, their_val)
 
 
-def compare_devices(dev1: EditableDevice, dev2: EditableDevice):
+def get_sync_issues(diff: CircuitDiff) -> List[SyncIssue]:
     """
-    Compare two devices and return the list of differences
-    :param dev1: Device 1
-    :param dev2: Device 2
-    :return: list of differences [property name, value1, value2]
-    """
-
-    differences = list()
-    if dev1.device_type == dev2.device_type:
-        for prop_name, value in dev1.registered_properties.items():
-
-            val1 = getattr(dev1, prop_name)
-            val2 = getattr(dev2, prop_name)
-
-            if value.tpe in [int, float]:
-                if not isclose(val1, val2, abs_tol=1e-6):
-                    differences.append([prop_name, val1, val2])
-            else:
-                if str(val1) != str(val2):
-                    differences.append([prop_name, val1, val2])
-
-    return differences
-
-
-def compare_devices_lists(dev_list1, dev_list2):
-    """
-    Compare two devices lists
-    :param dev_list1: list of devices 1
-    :param dev_list2: list of devices 2
+    Convert the differences between two circuits into synchronization issues
+    :param diff: CircuitDiff (A: my circuit, B: their circuit)
     :return: List of issues
     """
-
-    items_dict1 = {elm.name: elm for elm in dev_list1}
-    items_dict2 = {elm.name: elm for elm in dev_list2}
-
-    issues = list()  # device type, issue type, property, my value, their value, elm1, elm2
-
-    # check my buses against the file buses
-    for name1, elm1 in items_dict1.items():
-
-        if name1 in items_dict2.keys():
-
-            # get the other element
-            elm2 = items_dict2[name1]
-
-            # perform the comparison in the same types, compare
-            ls = compare_devices(elm1, elm2)
-            for prop, val1, val2 in ls:
-                issue = SyncIssue(device_type=elm1.device_type,
-                                  issue_type=SyncIssueType.Conflict,
-                                  property_name=prop,
-                                  my_elm=elm1,
-                                  their_elm=elm2)
-                issues.append(issue)
-
-            # if this is a bus, then examine the children
-            if elm1.device_type == DeviceType.BusDevice:
-
-                issues += compare_devices_lists(elm1.loads, elm2.loads)
-                issues += compare_devices_lists(elm1.generators, elm2.generators)
-                issues += compare_devices_lists(elm1.batteries, elm2.batteries)
-                issues += compare_devices_lists(elm1.static_generators, elm2.static_generators)
-                issues += compare_devices_lists(elm1.shunts, elm2.shunts)
-
-        else:
-            # my element has been deleted
-            issue = SyncIssue(device_type=elm1.device_type,
-                              issue_type=SyncIssueType.Deleted,
-                              property_name="",
-                              my_elm=elm1,
-                              their_elm=None)
-            issues.append(issue)
-
-    # check the file buses against mine, here we only need to check for disagreements in the existence
-    for name2, elm2 in items_dict2.items():
-        if name2 not in items_dict1.keys():
-            # new element added
-            issue = SyncIssue(device_type=elm2.device_type,
-                              issue_type=SyncIssueType.Added,
-                              property_name="",
-                              my_elm=None,
-                              their_elm=elm2)
-            issues.append(issue)
+    issues = list()
+
+    for dev_diff in diff.modified:
+        for prop in dev_diff.properties:
+            issues.append(SyncIssue(device_type=dev_diff.device_type,
+                                    issue_type=SyncIssueType.Conflict,
+                                    property_name=prop,
+                                    my_elm=dev_diff.elm_a,
+                                    their_elm=dev_diff.elm_b))
+
+    for dev_diff in diff.removed:
+        # my element has been deleted
+        issues.append(SyncIssue(device_type=dev_diff.device_type,
+                                issue_type=SyncIssueType.Deleted,
+                                property_name="",
+                                my_elm=dev_diff.elm_a,
+                                their_elm=None))
+
+    for dev_diff in diff.added:
+        # new element added
+        issues.append(SyncIssue(device_type=dev_diff.device_type,
+                                issue_type=SyncIssueType.Added,
+                                property_name="",
+                                my_elm=None,
+                                their_elm=dev_diff.elm_b))
 
     return issues
 
 
-def detect_changes_and_conflicts(current_circuit: MultiCircuit, file_circuit: MultiCircuit):
+def detect_changes_and_conflicts(current_circuit: MultiCircuit, file_circuit: MultiCircuit) -> List[SyncIssue]:
     """
     Detect changes
-    :param current_circuit:
-    :param file_circuit:
-    :return:
+    The devices are matched by idtag and compared by content hash, so all the device types are checked
+    :param current_circuit: my circuit
+    :param file_circuit: their circuit
+    :return: List of issues
     """
+    diff = diff_circuits(circuit_a=current_circuit, circuit_b=file_circuit, compare_profiles=True)
 
-    issues = list()  # device name, issue type, property, my value, their value, elm1, elm2
-
-    # buses
-    issues += compare_devices_lists(dev_list1=current_circuit.buses,
-                                    dev_list2=file_circuit.buses)
-
-    # Branches
-    issues += compare_devices_lists(dev_list1=current_circuit.lines,
-                                    dev_list2=file_circuit.lines)
-
-    issues += compare_devices_lists(dev_list1=current_circuit.transformers2w,
-                                    dev_list2=file_circuit.transformers2w)
-
-    issues += compare_devices_lists(dev_list1=current_circuit.hvdc_lines,
-                                    dev_list2=file_circuit.hvdc_lines)
-
-    return issues
+    return get_sync_issues(diff)
 
 
 def model_check(current_circuit: MultiCircuit, file_circuit: MultiCircuit):
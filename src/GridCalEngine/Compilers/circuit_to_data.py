@@ -109,6 +109,9 @@ def get_bus_data(circuit: MultiCircuit,
 
     substation_dict = {sub: i for i, sub in enumerate(circuit.substations)}
 
+    if time_series:
+        active_t = circuit.get_profiles_values_at(circuit.buses, 'active', t_idx, dtype=bool)
+
     for i, bus in enumerate(circuit.buses):
 
         # bus parameters
@@ -135,7 +138,7 @@ def get_bus_data(circuit: MultiCircuit,
         bus_data.areas[i] = areas_dict.get(bus.area, 0)
 
         if time_series:
-            bus_data.active[i] = bus.active_prof[t_idx]
+            bus_data.active[i] = active_t[i]
         else:
             bus_data.active[i] = bus.active
 
@@ -168,7 +171,18 @@ def get_load_data(circuit: MultiCircuit,
     data = ds.LoadData(nelm=circuit.get_load_like_device_number(), nbus=circuit.get_bus_number())
 
     ii = 0
-    for elm in circuit.get_loads():
+    devices = circuit.get_loads()
+    if time_series:
+        P_t = circuit.get_profiles_values_at(devices, 'P', t_idx)
+        Q_t = circuit.get_profiles_values_at(devices, 'Q', t_idx)
+        Ir_t = circuit.get_profiles_values_at(devices, 'Ir', t_idx)
+        Ii_t = circuit.get_profiles_values_at(devices, 'Ii', t_idx)
+        G_t = circuit.get_profiles_values_at(devices, 'G', t_idx)
+        B_t = circuit.get_profiles_values_at(devices, 'B', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+        cost_t = circuit.get_profiles_values_at(devices, 'Cost', t_idx)
+
+    for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
 
@@ -180,15 +194,15 @@ def get_load_data(circuit: MultiCircuit,
 
         if time_series:
             if opf_results is not None:
-                data.S[ii] = complex(elm.P_prof[t_idx], elm.Q_prof[t_idx]) - opf_results.load_shedding[t_idx, ii]
+                data.S[ii] = complex(P_t[k], Q_t[k]) - opf_results.load_shedding[t_idx, ii]
             else:
-                data.S[ii] = complex(elm.P_prof[t_idx], elm.Q_prof[t_idx])
+                data.S[ii] = complex(P_t[k], Q_t[k])
 
-            data.I[ii] = complex(elm.Ir_prof[t_idx], elm.Ii_prof[t_idx])
-            data.Y[ii] = complex(elm.G_prof[t_idx], elm.B_prof[t_idx])
+            data.I[ii] = complex(Ir_t[k], Ii_t[k])
+            data.Y[ii] = complex(G_t[k], B_t[k])
 
-            data.active[ii] = elm.active_prof[t_idx]
-            data.cost[ii] = elm.Cost_prof[t_idx]
+            data.active[ii] = active_t[k]
+            data.cost[ii] = cost_t[k]
 
         else:
             if opf_results is not None:
@@ -210,7 +224,14 @@ def get_load_data(circuit: MultiCircuit,
         data.C_bus_elm[i, ii] = 1
         ii += 1
 
-    for elm in circuit.get_static_generators():
+    devices = circuit.get_static_generators()
+    if time_series:
+        P_t = circuit.get_profiles_values_at(devices, 'P', t_idx)
+        Q_t = circuit.get_profiles_values_at(devices, 'Q', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+        cost_t = circuit.get_profiles_values_at(devices, 'Cost', t_idx)
+
+    for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
 
@@ -218,9 +239,9 @@ def get_load_data(circuit: MultiCircuit,
         data.idtag[ii] = elm.idtag
 
         if time_series:
-            data.S[ii] -= complex(elm.P_prof[t_idx], elm.Q_prof[t_idx])
-            data.active[ii] = elm.active_prof[t_idx]
-            data.cost[ii] = elm.Cost_prof[t_idx]
+            data.S[ii] -= complex(P_t[k], Q_t[k])
+            data.active[ii] = active_t[k]
+            data.cost[ii] = cost_t[k]
 
         else:
             data.S[ii] -= complex(elm.P, elm.Q)
@@ -236,7 +257,14 @@ def get_load_data(circuit: MultiCircuit,
         data.C_bus_elm[i, ii] = 1
         ii += 1
 
-    for elm in circuit.get_external_grids():
+    devices = circuit.get_external_grids()
+    if time_series:
+        P_t = circuit.get_profiles_values_at(devices, 'P', t_idx)
+        Q_t = circuit.get_profiles_values_at(devices, 'Q', t_idx)
+        Vm_t = circuit.get_profiles_values_at(devices, 'Vm', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+
+    for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
 
@@ -255,13 +283,13 @@ def get_load_data(circuit: MultiCircuit,
                                     bus_name=elm.bus.name,
                                     bus_data=bus_data,
                                     bus_voltage_used=bus_voltage_used,
-                                    candidate_Vm=elm.Vm_prof[t_idx] if time_series else elm.Vm,
+                                    candidate_Vm=Vm_t[k] if time_series else elm.Vm,
                                     use_stored_guess=use_stored_guess,
                                     logger=logger)
 
         if time_series:
-            data.S[ii] += complex(elm.P_prof[t_idx], elm.Q_prof[t_idx])
-            data.active[ii] = elm.active_prof[t_idx]
+            data.S[ii] += complex(P_t[k], Q_t[k])
+            data.active[ii] = active_t[k]
 
         else:
             data.S[ii] += complex(elm.P, elm.Q)
@@ -276,7 +304,14 @@ def get_load_data(circuit: MultiCircuit,
         data.C_bus_elm[i, ii] = 1
         ii += 1
 
-    for elm in circuit.get_current_injections():
+    devices = circuit.get_current_injections()
+    if time_series:
+        Ir_t = circuit.get_profiles_values_at(devices, 'Ir', t_idx)
+        Ii_t = circuit.get_profiles_values_at(devices, 'Ii', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+        cost_t = circuit.get_profiles_values_at(devices, 'Cost', t_idx)
+
+    for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
 
@@ -287,9 +322,9 @@ def get_load_data(circuit: MultiCircuit,
         data.mttr[ii] = elm.mttr
 
         if time_series:
-            data.I[ii] += complex(elm.Ir_prof[t_idx], elm.Ii_prof[t_idx])
-            data.active[ii] = elm.active_prof[t_idx]
-            data.cost[ii] = elm.Cost_prof[t_idx]
+            data.I[ii] += complex(Ir_t[k], Ii_t[k])
+            data.active[ii] = active_t[k]
+            data.cost[ii] = cost_t[k]
 
         else:
             data.I[ii] += complex(elm.Ir, elm.Ii)
@@ -337,7 +372,13 @@ def get_shunt_data(
                         nbus=circuit.get_bus_number())
 
     ii = 0
-    for k, elm in enumerate(circuit.get_shunts()):
+    devices = circuit.get_shunts()
+    if time_series:
+        G_t = circuit.get_profiles_values_at(devices, 'G', t_idx)
+        B_t = circuit.get_profiles_values_at(devices, 'B', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+
+    for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
 
@@ -348,8 +389,8 @@ def get_shunt_data(
         data.mttr[k] = elm.mttr
 
         if time_series:
-            data.active[k] = elm.active_prof[t_idx]
-            data.Y[k] = complex(elm.G_prof[t_idx], elm.B_prof[t_idx])
+            data.active[k] = active_t[k]
+            data.Y[k] = complex(G_t[k], B_t[k])
         else:
             data.active[k] = elm.active
             data.Y[k] = complex(elm.G, elm.B)
@@ -361,7 +402,15 @@ def get_shunt_data(
         data.C_bus_elm[i, k] = 1
         ii += 1
 
-    for elm in circuit.get_controllable_shunts():
+    devices = circuit.get_controllable_shunts()
+    if time_series:
+        G_t = circuit.get_profiles_values_at(devices, 'G', t_idx)
+        B_t = circuit.get_profiles_values_at(devices, 'B', t_idx)
+        Vset_t = circuit.get_profiles_values_at(devices, 'Vset', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+        cost_t = circuit.get_profiles_values_at(devices, 'Cost', t_idx)
+
+    for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
 
@@ -376,11 +425,11 @@ def get_shunt_data(
         data.qmax[ii] = elm.Bmax
 
         if time_series:
-            data.Y[ii] += complex(elm.G_prof[t_idx], elm.B_prof[t_idx])
-            data.active[ii] = elm.active_prof[t_idx]
-            data.cost[ii] = elm.Cost_prof[t_idx]
+            data.Y[ii] += complex(G_t[k], B_t[k])
+            data.active[ii] = active_t[k]
+            data.cost[ii] = cost_t[k]
 
-            if elm.is_controlled and elm.active_prof[t_idx]:
+            if elm.is_controlled and active_t[k]:
 
                 if elm.control_bus_prof[t_idx] is not None:
                     remote_control = True
@@ -395,7 +444,7 @@ def get_shunt_data(
                                         bus_name=elm.bus.name,
                                         bus_data=bus_data,
                                         bus_voltage_used=bus_voltage_used,
-                                        candidate_Vm=elm.Vset_prof[t_idx],
+                                        candidate_Vm=Vset_t[k],
                                         use_stored_guess=use_stored_guess,
                                         logger=logger)
 
@@ -466,6 +515,16 @@ def get_generator_data(
 
     data = ds.GeneratorData(nelm=len(devices), nbus=circuit.get_bus_number())
 
+    if time_series:
+        P_t = circuit.get_profiles_values_at(devices, 'P', t_idx)
+        Pf_t = circuit.get_profiles_values_at(devices, 'Pf', t_idx)
+        Vset_t = circuit.get_profiles_values_at(devices, 'Vset', t_idx)
+        cost0_t = circuit.get_profiles_values_at(devices, 'Cost0', t_idx)
+        cost1_t = circuit.get_profiles_values_at(devices, 'Cost', t_idx)
+        cost2_t = circuit.get_profiles_values_at(devices, 'Cost2', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+        srap_enabled_t = circuit.get_profiles_values_at(devices, 'srap_enabled', t_idx, dtype=bool)
+
     gen_index_dict: Dict[str, int] = dict()
     for k, elm in enumerate(devices):
 
@@ -505,19 +564,19 @@ def get_generator_data(
             if opf_results is not None:
                 data.p[k] = opf_results.generator_power[t_idx, k] - opf_results.generator_shedding[t_idx, k]
             else:
-                data.p[k] = elm.P_prof[t_idx]
+                data.p[k] = P_t[k]
 
-            data.active[k] = elm.active_prof[t_idx]
-            data.pf[k] = elm.Pf_prof[t_idx]
-            data.v[k] = elm.Vset_prof[t_idx]
+            data.active[k] = active_t[k]
+            data.pf[k] = Pf_t[k]
+            data.v[k] = Vset_t[k]
 
-            data.cost_0[k] = elm.Cost0_prof[t_idx]
-            data.cost_1[k] = elm.Cost_prof[t_idx]
-            data.cost_2[k] = elm.Cost2_prof[t_idx]
+            data.cost_0[k] = cost0_t[k]
+            data.cost_1[k] = cost1_t[k]
+            data.cost_2[k] = cost2_t[k]
 
-            if elm.active_prof[t_idx]:
+            if active_t[k]:
 
-                if elm.srap_enabled_prof[t_idx] and data.p[k] > 0.0:
+                if srap_enabled_t[k] and data.p[k] > 0.0:
                     bus_data.srap_availbale_power[i] += data.p[k]
 
                 if elm.is_controlled:
@@ -534,7 +593,7 @@ def get_generator_data(
                                             bus_name=elm.bus.name,
                                             bus_data=bus_data,
                                             bus_voltage_used=bus_voltage_used,
-                                            candidate_Vm=elm.Vset_prof[t_idx],
+                                            candidate_Vm=Vset_t[k],
                                             use_stored_guess=use_stored_guess,
                                             logger=logger)
 
@@ -627,6 +686,16 @@ def get_battery_data(
     data = ds.BatteryData(nelm=len(devices),
                           nbus=circuit.get_bus_number())
 
+    if time_series:
+        P_t = circuit.get_profiles_values_at(devices, 'P', t_idx)
+        Pf_t = circuit.get_profiles_values_at(devices, 'Pf', t_idx)
+        Vset_t = circuit.get_profiles_values_at(devices, 'Vset', t_idx)
+        cost0_t = circuit.get_profiles_values_at(devices, 'Cost0', t_idx)
+        cost1_t = circuit.get_profiles_values_at(devices, 'Cost', t_idx)
+        cost2_t = circuit.get_profiles_values_at(devices, 'Cost2', t_idx)
+        active_t = circuit.get_profiles_values_at(devices, 'active', t_idx, dtype=bool)
+        srap_enabled_t = circuit.get_profiles_values_at(devices, 'srap_enabled', t_idx, dtype=bool)
+
     for k, elm in enumerate(devices):
 
         i = bus_dict[elm.bus]
@@ -671,19 +740,19 @@ def get_battery_data(
             if opf_results is not None:
                 data.p[k] = opf_results.battery_power[t_idx, k]
             else:
-                data.p[k] = elm.P_prof[t_idx]
+                data.p[k] = P_t[k]
 
-            data.active[k] = elm.active_prof[t_idx]
-            data.pf[k] = elm.Pf_prof[t_idx]
-            data.v[k] = elm.Vset_prof[t_idx]
+            data.active[k] = active_t[k]
+            data.pf[k] = Pf_t[k]
+            data.v[k] = Vset_t[k]
 
-            data.cost_0[k] = elm.Cost0_prof[t_idx]
-            data.cost_1[k] = elm.Cost_prof[t_idx]
-            data.cost_2[k] = elm.Cost2_prof[t_idx]
+            data.cost_0[k] = cost0_t[k]
+            data.cost_1[k] = cost1_t[k]
+            data.cost_2[k] = cost2_t[k]
 
-            if elm.active_prof[t_idx]:
+            if active_t[k]:
 
-                if elm.srap_enabled_prof[t_idx] and data.p[k] > 0.0:
+                if srap_enabled_t[k] and data.p[k] > 0.0:
                     bus_data.srap_availbale_power[i] += data.p[k]
 
                 if elm.is_controlled:
@@ -701,7 +770,7 @@ def get_battery_data(
                                             bus_name=elm.bus.name,
                                             bus_data=bus_data,
                                             bus_voltage_used=bus_voltage_used,
-                                            candidate_Vm=elm.Vset_prof[t_idx],
+                                            candidate_Vm=Vset_t[k],
                                             use_stored_guess=use_stored_guess,
                                             logger=logger)
 
@@ -15,6 +15,7 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 from __future__ import annotations
+import copy
 from typing import TYPE_CHECKING, Dict, Union, List, Iterator
 from GridCalEngine.enumerations import DeviceType
 from GridCalEngine.basic_structures import Logger
@@ -87,6 +88,18 @@ class Associations:
         self._data: Dict[str, Association] = dict()
         self._device_type = device_type
 
+    def __deepcopy__(self, memo: Dict[int, object]) -> "Associations":
+        """
+        Deep copy, the associated objects are copied through the memo (i.e. mapped to their copies)
+        :param memo: deepcopy memo dictionary
+        :return: Associations
+        """
+        cpy = Associations(device_type=self._device_type)
+        memo[id(self)] = cpy
+        for key, val in self._data.items():
+            cpy._data[key] = Association(api_object=copy.deepcopy(val.api_object, memo), value=val.value)
+        return cpy
+
     @property
     def data(self) -> Dict[str, Association]:
         """
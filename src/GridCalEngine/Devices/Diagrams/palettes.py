@@ -14,10 +14,26 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+import numpy as np
+from typing import Callable, Union
 from GridCalEngine.enumerations import Colormaps
+from GridCalEngine.basic_structures import Vec, IntVec
+
+# edges and BGR colours of the step palettes, used by the vectorized versions
+GREEN_TO_RED_EDGES = np.array([-1.0, -0.818181818181818, -0.636363636363636, -0.454545454545454,
+                               -0.272727272727273, -0.0909090909090908, 0.0909090909090911, 0.272727272727273,
+                               0.454545454545455, 0.636363636363636, 0.818181818181818, 1.0])
 
+GREEN_TO_RED_BGR = np.array([(108, 135, 0), (107, 152, 64), (105, 169, 105), (104, 184, 145),
+                             (106, 198, 187), (114, 210, 229), (92, 183, 232), (78, 154, 232),
+                             (72, 125, 230), (74, 94, 223), (81, 61, 212)], dtype=np.uint8)
 
+HEATMAP_EDGES = np.array([0.0, 0.125, 0.25, 0.375, 0.5, 0.625, 0.75, 0.875, 1.0])
 
+HEATMAP_BGR = np.array([(92, 63, 0), (124, 75, 47), (145, 81, 102), (149, 81, 160),
+                        (135, 80, 212), (106, 93, 249), (67, 124, 255), (0, 166, 255)], dtype=np.uint8)
 
 
 def tso2_line_palette_bgr(x, warning_lvl=0.9, overload_lvl=1.15):
@@ -452,3 +468,144 @@ def red_to_blue_rgb(x):
         return 87, 117, 255
     else:
         return 0, 0, 0
+
+
+def step_palette_bgr_array(x: Vec, edges: Vec, colors: np.ndarray, default=(0, 0, 0)) -> np.ndarray:
+    """
+    Vectorized evaluation of a step palette, where the colour k is used in [edges[k], edges[k+1])
+    and the last interval is closed on the right
+    :param x: array of values
+    :param edges: array of interval edges (n + 1)
+    :param colors: (n, 3) array of BGR colours
+    :param default: BGR colour of the values out of range (or NaN)
+    :return: (len(x), 3) uint8 array of BGR colours
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(colors)
+    idx = np.searchsorted(edges, x, side='right') - 1
+    idx[x == edges[-1]] = n - 1
+    valid = (x >= edges[0]) & (x <= edges[-1])  # False for NaN
+
+    res = np.empty((len(x), 3), dtype=np.uint8)
+    res[:] = default
+    res[valid] = colors[idx[valid]]
+    return res
+
+
+def green_to_red_bgr_array(x: Vec) -> np.ndarray:
+    """
+    Vectorized version of green_to_red_bgr
+    :param x: array of values in [-1, 1]
+    :return: (len(x), 3) uint8 array of BGR colours
+    """
+    return step_palette_bgr_array(x=x, edges=GREEN_TO_RED_EDGES, colors=GREEN_TO_RED_BGR, default=(0, 0, 0))
+
+
+def heatmap_palette_bgr_array(x: Vec) -> np.ndarray:
+    """
+    Vectorized version of heatmap_palette_bgr
+    :param x: array of values in [0, 1]
+    :return: (len(x), 3) uint8 array of BGR colours
+    """
+    return step_palette_bgr_array(x=x, edges=HEATMAP_EDGES, colors=HEATMAP_BGR, default=(50, 50, 50))
+
+
+def tso_substation_palette_bgr_array(x: Vec) -> np.ndarray:
+    """
+    Vectorized version of tso_substation_palette_bgr
+    :param x: array of substation voltages in kV
+    :return: (len(x), 3) uint8 array of BGR colours
+    """
+    x = np.asarray(x, dtype=float)
+    res = np.zeros((len(x), 3), dtype=np.uint8)  # black
+    res[x >= 400] = (0, 57, 242)  # red
+    res[(150 <= x) & (x <= 220)] = (54, 181, 19)  # green
+    return res
+
+
+def tso_line_palette_bgr_array(v: Vec, loading: Vec, warning_lvl=0.9, overload_lvl=1.15) -> np.ndarray:
+    """
+    Vectorized version of tso_line_palette_bgr
+    :param v: array of line voltages in kV
+    :param loading: array of loadings in p.u.
+    :param warning_lvl: Warning level
+    :param overload_lvl: Overload level
+    :return: (len(v), 3) uint8 array of BGR colours
+    """
+    v = np.asarray(v, dtype=float)
+    loading = np.asarray(loading, dtype=float)
+
+    low = loading < warning_lvl
+    mid = (warning_lvl <= loading) & (loading <= overload_lvl)
+    high = loading > overload_lvl
+
+    res = np.zeros((len(v), 3), dtype=np.uint8)  # black
+
+    hv = v >= 400
+    res[hv] = (0, 57, 242)  # red (only for NaN loadings)
+    res[hv & low] = (177, 183, 245)
+    res[hv & mid] = (43, 57, 192)
+    res[hv & high] = (22, 30, 100)
+
+    mv = (150 <= v) & (v <= 220)
+    res[mv] = (54, 181, 19)  # green (only for NaN loadings)
+    res[mv & low] = (191, 223, 169)
+    res[mv & mid] = (96, 174, 39)
+    res[mv & high] = (50, 90, 20)
+
+    return res
+
+
+def get_rgba_array(x: Vec,
+                   cmap: Union[Colormaps, None],
+                   default_cmap: Callable,
+                   v: Union[Vec, None] = None,
+                   substation: bool = False) -> np.ndarray:
+    """
+    Vectorized evaluation of the results colours
+    :param x: array of values to colour (i.e. loading or normalized voltage)
+    :param cmap: Colormaps, if it is not one of the palettes, the default_cmap is used
+    :param default_cmap: matplotlib-like colormap (i.e. LinearSegmentedColormap) that accepts bytes=True
+    :param v: array of nominal voltages in kV, only used by the TSO line palette
+    :param substation: use the substation palette with the TSO Colormap?
+    :return: (len(x), 4) uint8 array of RGBA colours
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+
+    if cmap in (Colormaps.Green2Red, Colormaps.Heatmap, Colormaps.TSO):
+
+        if cmap == Colormaps.Green2Red:
+            bgr = green_to_red_bgr_array(x)
+        elif cmap == Colormaps.Heatmap:
+            bgr = heatmap_palette_bgr_array(x)
+        elif substation or v is None:
+            bgr = tso_substation_palette_bgr_array(x)
+        else:
+            bgr = tso_line_palette_bgr_array(v, x)
+
+        rgba = np.empty((n, 4), dtype=np.uint8)
+        rgba[:, :3] = bgr[:, ::-1]
+        rgba[:, 3] = 255
+        return rgba
+
+    else:
+        if n == 0:
+            return np.zeros((0, 4), dtype=np.uint8)
+
+        return np.asarray(default_cmap(x, bytes=True), dtype=np.uint8).reshape(n, 4)
+
+
+def pack_rgba_array(rgba: np.ndarray, width: Union[IntVec, None] = None) -> np.ndarray:
+    """
+    Pack an array of RGBA colours (and optionally a pen width) into one integer per element,
+    so that colour changes can be detected with a single vectorized comparison
+    :param rgba: (n, 4) uint8 array of RGBA colours
+    :param width: array of pen widths (optional)
+    :return: int64 array
+    """
+    rgba = rgba.astype(np.int64)
+    code = (rgba[:, 0] << 24) | (rgba[:, 1] << 16) | (rgba[:, 2] << 8) | rgba[:, 3]
+    if width is not None:
+        code |= (np.asarray(width).astype(np.int64) & 0xFFFF) << 32
+    return code
@@ -177,6 +177,29 @@ class GCProp:
         return "prop:" + self.name
 
 
+def get_sub_object_data(tpe: SubObjectType, obj: Any) -> Any:
+    """
+    Get the serialized contents of a sub-object, as stored in the files
+    :param tpe: SubObjectType
+    :param obj: sub-object (GeneratorQCurve, LineLocations, TapChanger, Associations, array, ...)
+    :return: list, dictionary or the object itself if it is not serialized
+    """
+    if obj is None:
+        return None
+
+    elif tpe in [SubObjectType.GeneratorQCurve, SubObjectType.LineLocations]:
+        return obj.to_list()
+
+    elif tpe in [SubObjectType.TapChanger, SubObjectType.Associations]:
+        return obj.to_dict()
+
+    elif tpe == SubObjectType.Array:
+        return list(obj)
+
+    else:
+        return obj
+
+
 def get_action_symbol(action: ActionType):
     """
 
@@ -238,6 +261,15 @@ class EditableDevice:
         # dictionary with property name -> profile name
         self.properties_with_profile: Dict[str, str] = dict()
 
+        # has the device changed since it was last saved? (new devices are always dirty)
+        self._dirty: bool = True
+
+        # (profile, version) of each profile when the device was last saved
+        self._saved_profiles: List[Tuple[Union[Profile, None], int]] = list()
+
+        # values of the properties and sub-objects (associations, locations, ...) when the device was last saved
+        self._saved_state: str = ""
+
         self.register(key='idtag', units='', tpe=str, definition='Unique ID', editable=False)
         self.register(key='name', units='', tpe=str, definition='Name of the device.')
         self.register(key='code', units='', tpe=str, definition='Secondary ID')
@@ -297,6 +329,7 @@ class EditableDevice:
         :param val: any string or None
         """
         self._idtag = parse_idtag(val)
+        self._dirty = True
 
     @property
     def code(self) -> str:
@@ -313,6 +346,7 @@ class EditableDevice:
         :param val: any string or None
         """
         self._code = val
+        self._dirty = True
 
     def flatten_idtag(self):
         """
@@ -421,6 +455,66 @@ class EditableDevice:
     @name.setter
     def name(self, val: str):
         self._name = val
+        self._dirty = True
+
+    def mark_dirty(self) -> None:
+        """
+        Flag the device as changed since it was last saved
+        (i.e. after modifying in place a mutable attribute)
+        """
+        self._dirty = True
+
+    def get_state_digest(self) -> str:
+        """
+        Get the serialized values of the registered properties, including the contents of the
+        mutable sub-objects (associations, line locations, Q curves, ...)
+        The plain attributes and the sub-objects modified in place do not flag the device as changed,
+        hence they must be compared at save time instead
+        :return: string
+        """
+        data = list()
+        for name, prop in self.registered_properties.items():
+            obj = getattr(self, name)
+
+            if isinstance(prop.tpe, SubObjectType):
+                data.append(get_sub_object_data(prop.tpe, obj))
+
+            elif isinstance(prop.tpe, DeviceType):
+                data.append(obj.idtag if hasattr(obj, 'idtag') else obj)
+
+            else:
+                data.append(obj)
+
+        return repr(data)
+
+    def clear_dirty(self) -> None:
+        """
+        Flag the device as saved, recording the state of its profiles, properties and sub-objects
+        """
+        self._dirty = False
+        self._saved_profiles = list()
+        for profile_name in self.properties_with_profile.values():
+            profile = getattr(self, profile_name, None)
+            self._saved_profiles.append((profile, profile.version if profile is not None else -1))
+        self._saved_state = self.get_state_digest()
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Has the device changed since it was last saved?
+        The profiles count as changed if they were replaced or modified,
+        and the properties and sub-objects if their values differ from the saved ones
+        :return: bool
+        """
+        if self._dirty or len(self._saved_profiles) != len(self.properties_with_profile):
+            return True
+
+        for profile_name, (profile0, version0) in zip(self.properties_with_profile.values(), self._saved_profiles):
+            profile = getattr(self, profile_name, None)
+            if profile is not profile0 or (profile is not None and profile.version != version0):
+                return True
+
+        return self.get_state_digest() != self._saved_state
 
     def get_save_data(self) -> List[Union[str, float, int, bool, object]]:
         """
@@ -557,6 +651,8 @@ class EditableDevice:
         :param prop: GCProp instance
         :param arr: Profile object or numpy array object
         """
+        self._dirty = True
+
         if isinstance(arr, np.ndarray):
             profile: Profile = getattr(self, prop.profile_name)
             profile.set(arr)
@@ -571,6 +667,8 @@ class EditableDevice:
         :param magnitude: snapshot magnitude
         :param arr: Profile object or numpy array object
         """
+        self._dirty = True
+
         if isinstance(arr, np.ndarray):
             prof_name = self.properties_with_profile[magnitude]
             profile: Profile = getattr(self, prof_name)
@@ -586,6 +684,7 @@ class EditableDevice:
         :param t_idx: Time index, None for Snapshot values
         :return: Whatever value is there
         """
+        self._dirty = True
 
         if t_idx is None:
             # set the snapshot value whatever it is
@@ -623,6 +722,8 @@ class EditableDevice:
         :param t_idx: time index
         :param value: Some value
         """
+        self._dirty = True
+
         if t_idx is None:
             # return the normal property
             setattr(self, prop.name, value)
@@ -641,6 +742,8 @@ class EditableDevice:
         :param property_name: name of the property
         :param value: Any
         """
+        self._dirty = True
+
         # set the snapshot value whatever it is
         setattr(self, property_name, value)
 
@@ -26,3 +26,4 @@ from GridCalEngine.Devices.Associations import *
 from GridCalEngine.Devices.Diagrams import *
 from GridCalEngine.Devices.Fluid import *
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.Devices.comparison import diff_circuits, CircuitDiff, DeviceDiff
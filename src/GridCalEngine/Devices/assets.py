@@ -20,8 +20,9 @@ import pandas as pd
 from typing import List, Dict, Tuple, Union, Any, Set, Generator
 import datetime as dateslib
 
-from GridCalEngine.basic_structures import IntVec, StrVec
+from GridCalEngine.basic_structures import IntVec, StrVec, Mat
 import GridCalEngine.Devices as dev
+from GridCalEngine.Devices.profiles_cache import ProfilesMatrixCache
 from GridCalEngine.Devices.types import ALL_DEV_TYPES, BRANCH_TYPES, INJECTION_DEVICE_TYPES, FLUID_TYPES
 from GridCalEngine.Devices.Parents.editable_device import GCPROP_TYPES
 from GridCalEngine.enumerations import DeviceType
@@ -58,6 +59,13 @@ class Assets:
         # snapshot time
         self._snapshot_time: dateslib.datetime = dateslib.datetime.now()  # dateslib.datetime(year=2000, month=1, day=1)
 
+        # cache of the (time, device) profile matrices
+        self._profiles_cache: ProfilesMatrixCache = ProfilesMatrixCache()
+
+        # if true, the time steps are gathered from the columnar profile matrices instead of device by device.
+        # This is much faster when compiling many time steps, at the expense of storing the matrices in memory
+        self.use_columnar_profiles: bool = False
+
         self._lines: List[dev.Line] = list()
 
         self._dc_lines: List[dev.DcLine] = list()
@@ -488,6 +496,8 @@ class Assets:
             for elm in elements:
                 elm.ensure_profiles_exist(index)
 
+        self._profiles_cache.invalidate()
+
     def set_time_profile(self, unix_data: IntVec):
         """
         Set unix array as time array
@@ -521,6 +531,50 @@ class Assets:
         for elm in self.items():
             elm.delete_profiles()
         self.time_profile = None
+        self._profiles_cache.invalidate()
+
+    def get_profiles_matrix(self, elements: List[ALL_DEV_TYPES], magnitude: str, dtype=float) -> Mat:
+        """
+        Get the (ntime, nelm) matrix of a profile magnitude for a list of devices of the same type.
+        The matrix is cached, and it is only rebuilt when the devices or their profiles change
+        :param elements: list of devices of the same type (i.e. self.loads)
+        :param magnitude: snapshot property name (i.e. "P")
+        :param dtype: data type of the matrix
+        :return: (ntime, nelm) matrix, do not modify it in-place
+        """
+        nt = self.get_time_number()
+
+        if len(elements) == 0:
+            return np.zeros((nt, 0), dtype=dtype)
+
+        return self._profiles_cache.get_matrix(device_type=elements[0].device_type,
+                                               elements=elements,
+                                               magnitude=magnitude,
+                                               nt=nt,
+                                               dtype=dtype)
+
+    def get_profiles_values_at(self, elements: List[ALL_DEV_TYPES], magnitude: str, t_idx: int, dtype=float):
+        """
+        Get the values of a profile magnitude at a time step for a list of devices of the same type
+        If use_columnar_profiles is True, this is a single gather from the cached profiles matrix
+        :param elements: list of devices of the same type (i.e. self.loads)
+        :param magnitude: snapshot property name (i.e. "P")
+        :param t_idx: time index
+        :param dtype: data type of the values
+        :return: array of values (nelm)
+        """
+        if self.use_columnar_profiles:
+            return self.get_profiles_matrix(elements=elements, magnitude=magnitude, dtype=dtype)[t_idx, :]
+        else:
+            return np.array([elm.get_profile(magnitude)[t_idx] for elm in elements], dtype=dtype)
+
+    def invalidate_profiles_cache(self, device_type: Union[DeviceType, None] = None) -> None:
+        """
+        Drop the cached profile matrices.
+        This is only needed if the profiles' arrays were modified in-place bypassing the Profile API
+        :param device_type: DeviceType to drop, if None all the matrices are dropped
+        """
+        self._profiles_cache.invalidate(device_type=device_type)
 
     # ------------------------------------------------------------------------------------------------------------------
     # Snapshot time
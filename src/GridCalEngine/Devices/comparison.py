@@ -16,6 +16,22 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 
+from __future__ import annotations
+
+import hashlib
+import numpy as np
+import pandas as pd
+from enum import Enum
+from operator import attrgetter
+from typing import List, Dict, Tuple, Union, Any, Hashable
+from GridCalEngine.basic_structures import Logger
+from GridCalEngine.enumerations import DeviceType
+from GridCalEngine.Devices.Parents.editable_device import EditableDevice, GCProp
+from GridCalEngine.Devices.Associations.association import Associations
+from GridCalEngine.Devices.Branches.line_locations import LineLocations
+from GridCalEngine.Devices.Branches.tap_changer import TapChanger
+from GridCalEngine.Devices.Injections.generator_q_curve import GeneratorQCurve
+from GridCalEngine.Devices.profile import Profile
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.Devices.types import ALL_DEV_TYPES
 
@@ -86,3 +102,397 @@ class CircuitComparison:
                     pass
 
 
+
+
+def get_value_key(value: Any, decimals: int = 6) -> Hashable:
+    """
+    Get a stable and hashable representation of a property value:
+    the floats are rounded, the devices are represented by their idtag, the enums by their value
+    and the sub-objects by their contents, serialized as in the files
+    :param value: property value
+    :param decimals: number of decimals to consider in the float values
+    :return: hashable value
+    """
+    if isinstance(value, float):
+        if value != value:
+            return 'nan'
+        return round(value, decimals) + 0.0  # + 0.0 turns -0.0 into 0.0
+
+    elif value is None or isinstance(value, (bool, int, str)):
+        return value
+
+    elif isinstance(value, (LineLocations, GeneratorQCurve)):
+        # the line locations are devices too, so they must be checked first
+        return get_value_key(value.to_list(), decimals)
+
+    elif isinstance(value, EditableDevice):
+        return value.idtag
+
+    elif isinstance(value, Enum):
+        return value.value
+
+    elif isinstance(value, Associations):
+        return tuple(sorted((key, get_value_key(val.value, decimals)) for key, val in value.data.items()))
+
+    elif isinstance(value, TapChanger):
+        return get_value_key(value.to_dict(), decimals)
+
+    elif isinstance(value, np.ndarray):
+        return get_value_key(value.tolist(), decimals)
+
+    elif isinstance(value, (list, tuple)):
+        return tuple(get_value_key(val, decimals) for val in value)
+
+    elif isinstance(value, dict):
+        return tuple(sorted((str(key), get_value_key(val, decimals)) for key, val in value.items()))
+
+    else:
+        return str(value)
+
+
+def get_array_digest(arr: np.ndarray, decimals: int = 6) -> str:
+    """
+    Get the digest of the values of an array
+    :param arr: numpy array
+    :param decimals: number of decimals to consider in the float values
+    :return: hexadecimal digest
+    """
+    if arr.dtype.kind in 'fc':
+        data = (np.round(arr, decimals) + 0.0).tobytes()
+    elif arr.dtype.kind in 'biu':
+        data = arr.astype(np.int64).tobytes()
+    else:
+        data = repr([get_value_key(val, decimals) for val in arr]).encode()
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def get_profile_digest(profile: Union[Profile, None],
+                       decimals: int = 6,
+                       memo: Union[Dict[int, str], None] = None) -> str:
+    """
+    Get the digest of a profile.
+    The sparse profiles are hashed from their sparse data without building the dense array,
+    so the same values stored sparse and dense have different digests (see profiles_equal)
+    :param profile: Profile
+    :param decimals: number of decimals to consider in the float values
+    :param memo: dictionary {id(dense array) -> digest} to hash the arrays shared by several profiles only once
+    :return: hexadecimal digest
+    """
+    if profile is None or profile.size() == 0:
+        return ''
+
+    if profile.is_sparse:
+        sp = profile.sparse_array
+        data = (sp.size(),
+                get_value_key(sp.default_value, decimals),
+                sorted((i, get_value_key(val, decimals)) for i, val in sp.get_map().items()))
+        return 's' + hashlib.blake2b(repr(data).encode(), digest_size=16).hexdigest()
+
+    else:
+        arr = profile.dense_array
+
+        if memo is None:
+            return 'd' + get_array_digest(arr, decimals)
+
+        digest = memo.get(id(arr), None)
+        if digest is None:
+            digest = 'd' + get_array_digest(arr, decimals)
+            memo[id(arr)] = digest
+        return digest
+
+
+def profiles_equal(profile_a: Union[Profile, None], profile_b: Union[Profile, None], decimals: int = 6) -> bool:
+    """
+    Compare the values of two profiles regardless of their sparse or dense storage
+    :param profile_a: Profile
+    :param profile_b: Profile
+    :param decimals: number of decimals to consider in the float values
+    :return: equal?
+    """
+    if profile_a is None or profile_b is None:
+        return profile_a is profile_b
+
+    if profile_a.size() != profile_b.size():
+        return False
+
+    return get_array_digest(profile_a.toarray(), decimals) == get_array_digest(profile_b.toarray(), decimals)
+
+
+def get_values_keys(elements: List[ALL_DEV_TYPES], prop: GCProp, decimals: int = 6) -> List[Hashable]:
+    """
+    Get the hashable values of a property for a list of devices, the float properties are rounded in bulk
+    :param elements: list of devices
+    :param prop: GCProp
+    :param decimals: number of decimals to consider in the float values
+    :return: list of hashable values (see get_value_key)
+    """
+    values = list(map(attrgetter(prop.name), elements))
+
+    if prop.tpe == float:
+        try:
+            arr = np.round(np.array(values, dtype=float), decimals) + 0.0
+        except (TypeError, ValueError):
+            arr = None
+
+        if arr is not None:
+            keys = arr.tolist()
+            if np.isnan(arr).any():
+                keys = ['nan' if val != val else val for val in keys]
+            return keys
+
+    return [get_value_key(value, decimals) for value in values]
+
+
+def get_devices_fingerprints(elements: List[ALL_DEV_TYPES],
+                             properties: List[GCProp],
+                             compare_profiles: bool = True,
+                             decimals: int = 6,
+                             memo: Union[Dict[int, str], None] = None
+                             ) -> Tuple[List[str], List[str], List[Tuple[Hashable, ...]]]:
+    """
+    Compute the content fingerprint of a list of devices of the same type, property by property (column-wise)
+    :param elements: list of devices
+    :param properties: list of properties to consider
+    :param compare_profiles: consider the profiles values?
+    :param decimals: number of decimals to consider in the float values
+    :param memo: dictionary {id(dense array) -> digest} shared between calls
+    :return: fingerprint columns names, stable hash of each device, fingerprint row of each device
+    """
+    names = list()
+    columns = list()
+
+    for prop in properties:
+        names.append(prop.name)
+        columns.append(get_values_keys(elements=elements, prop=prop, decimals=decimals))
+
+    if compare_profiles:
+        for prop in properties:
+            if prop.has_profile():
+                names.append(prop.profile_name)
+                columns.append([get_profile_digest(profile, decimals, memo)
+                                for profile in map(attrgetter(prop.profile_name), elements)])
+
+    rows = list(zip(*columns)) if len(columns) else [tuple() for _ in elements]
+
+    hashes = [hashlib.blake2b(repr(row).encode(), digest_size=16).hexdigest() for row in rows]
+
+    return names, hashes, rows
+
+
+class DeviceDiff:
+    """
+    Difference of a device between two circuits
+    """
+
+    def __init__(self,
+                 device_type: DeviceType,
+                 idtag: str,
+                 change: str,
+                 elm_a: Union[ALL_DEV_TYPES, None],
+                 elm_b: Union[ALL_DEV_TYPES, None],
+                 properties: Union[List[str], None] = None):
+        """
+        Constructor
+        :param device_type: DeviceType
+        :param idtag: idtag of the device
+        :param change: "added", "removed" or "modified"
+        :param elm_a: device in the circuit A (None if it was added)
+        :param elm_b: device in the circuit B (None if it was removed)
+        :param properties: names of the modified properties (the profiles are reported by their profile name)
+        """
+        self.device_type = device_type
+        self.idtag = idtag
+        self.change = change
+        self.elm_a = elm_a
+        self.elm_b = elm_b
+        self.properties: List[str] = properties if properties is not None else list()
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the device
+        :return: str
+        """
+        return self.elm_a.name if self.elm_a is not None else self.elm_b.name
+
+    def __str__(self) -> str:
+        return f"{self.change}::{self.device_type.value}::{self.name}"
+
+
+class CircuitDiff:
+    """
+    Differences between two circuits: the devices of B that are not in A (added),
+    the devices of A that are not in B (removed) and the devices with different content (modified)
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.added: List[DeviceDiff] = list()
+        self.removed: List[DeviceDiff] = list()
+        self.modified: List[DeviceDiff] = list()
+
+        # differences that are not related to a device (i.e. the time steps)
+        self.logger = Logger()
+
+    def is_equal(self) -> bool:
+        """
+        Are the circuits equal?
+        :return: bool
+        """
+        return (len(self.added) + len(self.removed) + len(self.modified)) == 0 and self.logger.error_count() == 0
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def items(self) -> List[DeviceDiff]:
+        """
+        All the differences
+        :return: list of DeviceDiff
+        """
+        return self.added + self.removed + self.modified
+
+    def get_logger(self) -> Logger:
+        """
+        Get the differences as a logger
+        :return: Logger
+        """
+        logger = Logger()
+        logger += self.logger
+
+        for diff in self.added:
+            logger.add_info("Added", device_class=diff.device_type.value, device=diff.name, value=diff.idtag)
+
+        for diff in self.removed:
+            logger.add_info("Removed", device_class=diff.device_type.value, device=diff.name, value=diff.idtag)
+
+        for diff in self.modified:
+            for prop_name in diff.properties:
+                val_a = getattr(diff.elm_a, prop_name)
+                val_b = getattr(diff.elm_b, prop_name)
+                if isinstance(val_a, Profile):
+                    # do not print the profiles
+                    val_a = "profile"
+                    val_b = "modified profile"
+                logger.add_info("Modified", device_class=diff.device_type.value, device=diff.name,
+                                device_property=prop_name,
+                                value=str(val_b),
+                                expected_value=str(val_a))
+
+        return logger
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Get the differences as a DataFrame
+        :return: DataFrame
+        """
+        data = [[diff.change, diff.device_type.value, diff.idtag, diff.name, ", ".join(diff.properties)]
+                for diff in self.items()]
+        return pd.DataFrame(data=data, columns=["change", "device type", "idtag", "name", "properties"])
+
+
+def diff_circuits(circuit_a: MultiCircuit,
+                  circuit_b: MultiCircuit,
+                  compare_profiles: bool = True,
+                  skip_internals: bool = False,
+                  decimals: int = 6) -> CircuitDiff:
+    """
+    Compute the differences between two circuits.
+    The devices are matched by idtag and compared through a content hash computed in bulk per device type,
+    the properties are only compared one by one for the devices whose hash differs.
+    :param circuit_a: base circuit
+    :param circuit_b: circuit to compare with the base
+    :param compare_profiles: compare the profiles too?
+    :param skip_internals: skip the properties that are not displayed
+    :param decimals: number of decimals to consider in the float values
+    :return: CircuitDiff
+    """
+    diff = CircuitDiff()
+
+    if circuit_a.get_time_number() != circuit_b.get_time_number():
+        diff.logger.add_error(msg="Different number of time steps",
+                              device_class="time",
+                              value=circuit_b.get_time_number(),
+                              expected_value=circuit_a.get_time_number())
+        compare_profiles = False
+
+    elif compare_profiles and circuit_a.get_time_number() > 0:
+        if not np.array_equal(circuit_a.get_unix_time(), circuit_b.get_unix_time()):
+            diff.logger.add_error(msg="Different time steps", device_class="time")
+
+    # digests of the dense arrays, these are shared among the copies of a circuit
+    memo: Dict[int, str] = dict()
+
+    for template_elm in circuit_a.template_items():
+
+        elms_a = circuit_a.get_elements_by_type(device_type=template_elm.device_type)
+        elms_b = circuit_b.get_elements_by_type(device_type=template_elm.device_type)
+
+        if len(elms_a) == 0 and len(elms_b) == 0:
+            continue
+
+        properties = [prop for prop in template_elm.property_list
+                      if prop.name != 'idtag' and (prop.display or not skip_internals)]
+
+        index_a: Dict[str, int] = {elm.idtag: i for i, elm in enumerate(elms_a)}
+        index_b: Dict[str, int] = {elm.idtag: i for i, elm in enumerate(elms_b)}
+
+        # only the devices present in both circuits need the fingerprints
+        common_a = [i for i, elm in enumerate(elms_a) if elm.idtag in index_b]
+        common_b = [index_b[elms_a[i].idtag] for i in common_a]
+
+        names, hashes_a, rows_a = get_devices_fingerprints(elements=[elms_a[i] for i in common_a],
+                                                           properties=properties,
+                                                           compare_profiles=compare_profiles,
+                                                           decimals=decimals,
+                                                           memo=memo)
+
+        _, hashes_b, rows_b = get_devices_fingerprints(elements=[elms_b[i] for i in common_b],
+                                                       properties=properties,
+                                                       compare_profiles=compare_profiles,
+                                                       decimals=decimals,
+                                                       memo=memo)
+
+        profile_names = {prop.profile_name for prop in properties if prop.has_profile()}
+
+        for k, (i, j) in enumerate(zip(common_a, common_b)):
+            if hashes_a[k] != hashes_b[k]:
+                changed = list()
+                for name, val_a, val_b in zip(names, rows_a[k], rows_b[k]):
+                    if val_a != val_b:
+                        if name in profile_names:
+                            # the digests depend on the storage, check the values
+                            if not profiles_equal(getattr(elms_a[i], name), getattr(elms_b[j], name), decimals):
+                                changed.append(name)
+                        else:
+                            changed.append(name)
+
+                if len(changed) == 0:
+                    continue
+
+                diff.modified.append(DeviceDiff(device_type=template_elm.device_type,
+                                                idtag=elms_a[i].idtag,
+                                                change="modified",
+                                                elm_a=elms_a[i],
+                                                elm_b=elms_b[j],
+                                                properties=changed))
+
+        for elm in elms_a:
+            if elm.idtag not in index_b:
+                diff.removed.append(DeviceDiff(device_type=template_elm.device_type,
+                                               idtag=elm.idtag,
+                                               change="removed",
+                                               elm_a=elm,
+                                               elm_b=None))
+
+        for elm in elms_b:
+            if elm.idtag not in index_a:
+                diff.added.append(DeviceDiff(device_type=template_elm.device_type,
+                                             idtag=elm.idtag,
+                                             change="added",
+                                             elm_a=None,
+                                             elm_b=elm))
+
+    return diff
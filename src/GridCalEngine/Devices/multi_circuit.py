@@ -21,7 +21,8 @@ import cmath
 import copy
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Union, Set
+from enum import Enum
+from typing import List, Dict, Tuple, Union, Set, Any
 from uuid import getnode as get_mac, uuid4
 import networkx as nx
 from matplotlib import pyplot as plt
@@ -29,6 +30,10 @@ from scipy.sparse import csc_matrix, lil_matrix
 
 from GridCalEngine.Devices.assets import Assets
 from GridCalEngine.Devices.Parents.editable_device import EditableDevice
+from GridCalEngine.Devices.profile import Profile
+from GridCalEngine.Devices.profiles_cache import ProfilesMatrixCache
+from GridCalEngine.Devices.Parents.load_parent import LoadParent
+from GridCalEngine.Devices.Parents.generator_parent import GeneratorParent
 from GridCalEngine.basic_structures import IntVec, Vec, Mat, CxVec, IntMat, CxMat
 
 import GridCalEngine.Devices as dev
@@ -131,6 +136,56 @@ def get_fused_device_lst(elm_list: List[INJECTION_DEVICE_TYPES], property_names:
         return list(), list()
 
 
+# attributes of the devices that are immutable or that are built in the constructor and never modified,
+# they are shared between a device and its fast copy
+_FAST_COPY_SHARED_TYPES = {str, int, float, bool, complex, type(None)}
+_FAST_COPY_SHARED_ATTRIBUTES = {'property_list', 'registered_properties', 'non_editable_properties',
+                                'properties_with_profile'}
+
+
+def _fast_copy_device_data(elm: EditableDevice, cpy: EditableDevice, memo: Dict[int, Any]) -> None:
+    """
+    Fill the copy of a device
+    :param elm: original device
+    :param cpy: empty copy of the device (created with __new__)
+    :param memo: dictionary of id(original object) -> copied object, it is used to map the references
+    """
+    data = cpy.__dict__
+    for key, value in elm.__dict__.items():
+
+        if type(value) in _FAST_COPY_SHARED_TYPES or key in _FAST_COPY_SHARED_ATTRIBUTES:
+            data[key] = value
+
+        else:
+            value_cpy = memo.get(id(value), None)
+
+            if value_cpy is not None:
+                # reference to another device (or an already copied object)
+                data[key] = value_cpy
+
+            elif isinstance(value, Profile):
+                value_cpy = value.copy_on_write()
+                memo[id(value)] = value_cpy
+                data[key] = value_cpy
+
+            elif isinstance(value, Enum):
+                data[key] = value
+
+            elif isinstance(value, EditableDevice):
+                # device that is not in the circuit lists (i.e. the line locations)
+                value_cpy = value.__class__.__new__(value.__class__)
+                memo[id(value)] = value_cpy
+                _fast_copy_device_data(elm=value, cpy=value_cpy, memo=memo)
+                data[key] = value_cpy
+
+            else:
+                data[key] = copy.deepcopy(value, memo)
+
+    # the copy has never been saved
+    data['_dirty'] = True
+    data['_saved_profiles'] = list()
+
+
 class MultiCircuit(Assets):
     """
     The concept of circuit should be easy enough to understand. It represents a set of
@@ -333,6 +388,59 @@ class MultiCircuit(Assets):
 
         return cpy
 
+    def fast_copy(self, include_diagrams: bool = True) -> "MultiCircuit":
+        """
+        Returns a copy of this circuit that is much faster to create than copy():
+        - The references between devices are mapped in a single pass over the devices.
+        - The profiles share their data with the original ones until either of them is modified (copy on write).
+        - The devices metadata (registered properties) is shared, since it is never modified.
+        Modifying the copy does not modify the original and vice versa.
+        :param include_diagrams: copy the diagrams too?
+        :return: MultiCircuit
+        """
+        # id(original object) -> copied object
+        memo: Dict[int, Any] = dict()
+
+        cpy = MultiCircuit.__new__(MultiCircuit)
+        data = dict()
+        to_fill: List[EditableDevice] = list()
+
+        # first create the empty copies of all the devices, so that the references can be mapped in any order
+        for key, value in self.__dict__.items():
+            if key != '_diagrams' and isinstance(value, list) and all(isinstance(elm, EditableDevice)
+                                                                      for elm in value):
+                lst = list()
+                for elm in value:
+                    elm_cpy = memo.get(id(elm), None)
+                    if elm_cpy is None:
+                        elm_cpy = elm.__class__.__new__(elm.__class__)
+                        memo[id(elm)] = elm_cpy
+                        to_fill.append(elm)
+                    lst.append(elm_cpy)
+                data[key] = lst
+
+        for elm in to_fill:
+            _fast_copy_device_data(elm=elm, cpy=memo[id(elm)], memo=memo)
+
+        for key, value in self.__dict__.items():
+            if key in data:
+                pass
+            elif key == '_diagrams':
+                data[key] = copy.deepcopy(value, memo) if include_diagrams else list()
+            elif key == '_profiles_cache':
+                data[key] = ProfilesMatrixCache()
+            elif key == 'logger':
+                data[key] = Logger()
+            elif key in ('_time_profile', 'template_objects_dict'):
+                # immutable or not modified
+                data[key] = value
+            else:
+                data[key] = copy.deepcopy(value, memo)
+
+        cpy.__dict__.update(data)
+
+        return cpy
+
     def build_graph(self) -> nx.MultiDiGraph:
         """
         Returns a networkx DiGraph object of the grid.
@@ -801,6 +909,25 @@ class MultiCircuit(Assets):
 
         return Cf, Ct, C
 
+    def get_bus_device_connectivity_matrix(self,
+                                           elements: List[INJECTION_DEVICE_TYPES],
+                                           bus_dict: Union[Dict[dev.Bus, int], None] = None) -> csc_matrix:
+        """
+        Get the bus-device connectivity of a list of injection devices
+        :param elements: list of injection devices
+        :param bus_dict: bus to index dictionary (optional)
+        :return: CSC sparse matrix (nbus, nelm)
+        """
+        if bus_dict is None:
+            bus_dict = self.get_bus_index_dict()
+
+        bus_idx = np.array([bus_dict.get(elm.bus, -1) for elm in elements], dtype=int)
+        elm_idx = np.arange(len(elements), dtype=int)
+        connected = bus_idx > -1
+
+        return csc_matrix((np.ones(connected.sum()), (bus_idx[connected], elm_idx[connected])),
+                          shape=(self.get_bus_number(), len(elements)))
+
     def get_adjacent_matrix(self) -> csc_matrix:
         """
         Get the bus adjacent matrix
@@ -1623,42 +1750,75 @@ class MultiCircuit(Assets):
 
         for elm in self.get_injection_devices():
             k = bus_dict[elm.bus]
-            val[k] = elm.get_S()
+            val[k] += elm.get_S()
 
         return val
 
-    def get_Sbus_prof(self) -> CxMat:
+    def get_Sprof_matrix(self, elements: List[INJECTION_DEVICE_TYPES]) -> Union[CxMat, None]:
         """
-        Get the complex bus power Injections
+        Get the complex power profiles of a list of injection devices of the same type
+        This is the columnar equivalent of calling get_Sprof() on each device
+        :param elements: list of injection devices of the same type
+        :return: (ntime, nelm) [MW + j MVAr] or None if the devices do not inject power
+        """
+        if len(elements) == 0:
+            return None
+
+        if isinstance(elements[0], LoadParent):
+            return (self.get_profiles_matrix(elements=elements, magnitude='P')
+                    + 1j * self.get_profiles_matrix(elements=elements, magnitude='Q'))
+
+        elif isinstance(elements[0], GeneratorParent):
+            return self.get_profiles_matrix(elements=elements, magnitude='P').astype(complex)
+
+        else:
+            return None
+
+    def get_Sbus_prof_from_lists(self,
+                                 devices_lists: List[List[INJECTION_DEVICE_TYPES]],
+                                 enabled_dispatch: Union[bool, None] = None) -> CxMat:
+        """
+        Aggregate the complex power profiles of several lists of injection devices per bus
+        :param devices_lists: list of lists of injection devices (each list of the same type)
+        :param enabled_dispatch: if not None, only the devices with this enabled_dispatch value are considered
         :return: (ntime, nbus) [MW + j MVAr]
         """
         val = np.zeros((self.get_time_number(), self.get_bus_number()), dtype=complex)
-
         bus_dict = self.get_bus_index_dict()
 
-        for elm in self.get_injection_devices():
-            k = bus_dict[elm.bus]
-            val[:, k] = elm.get_Sprof()
+        for elements in devices_lists:
+
+            S = self.get_Sprof_matrix(elements=elements)
+
+            if S is not None:
+                C_bus_dev = self.get_bus_device_connectivity_matrix(elements=elements, bus_dict=bus_dict)
+
+                if enabled_dispatch is not None:
+                    selected = np.array([elm.enabled_dispatch == enabled_dispatch for elm in elements], dtype=bool)
+                    C_bus_dev = C_bus_dev[:, selected]
+                    S = S[:, selected]
+
+                val += (C_bus_dev @ S.T).T
 
         return val
 
+    def get_Sbus_prof(self) -> CxMat:
+        """
+        Get the complex bus power Injections
+        :return: (ntime, nbus) [MW + j MVAr]
+        """
+        return self.get_Sbus_prof_from_lists(devices_lists=self.get_injection_devices_lists())
+
     def get_Sbus_prof_fixed(self) -> CxMat:
         """
         Get the complex bus power Injections considering those devices that cannot be dispatched
         This is, all devices except generators and batteries with enabled_dispatch=True
         :return: (ntime, nbus) [MW + j MVAr]
         """
-        val = np.zeros((self.get_time_number(), self.get_bus_number()), dtype=complex)
-        bus_dict = self.get_bus_index_dict()
-
-        for elm in self.get_load_like_devices():
-            k = bus_dict[elm.bus]
-            val[:, k] = elm.get_Sprof()
+        val = self.get_Sbus_prof_from_lists(devices_lists=self.get_load_like_devices_lists())
 
-        for elm in self.get_generation_like_devices():
-            if not elm.enabled_dispatch:
-                k = bus_dict[elm.bus]
-                val[:, k] = elm.get_Sprof()
+        val += self.get_Sbus_prof_from_lists(devices_lists=self.get_generation_like_lists(),
+                                             enabled_dispatch=False)
 
         return val
 
@@ -1668,15 +1828,8 @@ class MultiCircuit(Assets):
         This is, generators and batteries with enabled_dispatch=True
         :return: (ntime, nbus) [MW + j MVAr]
         """
-        val = np.zeros((self.get_time_number(), self.get_bus_number()), dtype=complex)
-        bus_dict = self.get_bus_index_dict()
-
-        for elm in self.get_generation_like_devices():
-            if elm.enabled_dispatch:
-                k = bus_dict[elm.bus]
-                val[:, k] = elm.get_Sprof()
-
-        return val
+        return self.get_Sbus_prof_from_lists(devices_lists=self.get_generation_like_lists(),
+                                             enabled_dispatch=True)
 
     def get_Pbus(self) -> Vec:
         """
@@ -1694,19 +1847,15 @@ class MultiCircuit(Assets):
 
     def get_branch_rates_prof_wo_hvdc(self) -> Mat:
         """
-        Get the complex bus power Injections
+        Get the branch rates profiles
         :return: (ntime, nbr) [MVA]
         """
-        val = np.zeros((self.get_time_number(), self.get_branch_number_wo_hvdc()))
-
-        for i, branch in enumerate(self.get_branches_wo_hvdc()):
-            val[:, i] = branch.rate_prof.toarray()
-
-        return val
+        return np.hstack([self.get_profiles_matrix(elements=branch_list, magnitude='rate')
+                          for branch_list in self.get_branch_lists_wo_hvdc()])
 
     def get_branch_rates_wo_hvdc(self) -> Vec:
         """
-        Get the complex bus power Injections
+        Get the branch rates
         :return: (nbr) [MVA]
         """
         val = np.zeros(self.get_branch_number_wo_hvdc())
@@ -1718,25 +1867,22 @@ class MultiCircuit(Assets):
 
     def get_branch_contingency_rates_prof_wo_hvdc(self) -> Mat:
         """
-        Get the complex bus power Injections
+        Get the branch contingency rates profiles
         :return: (ntime, nbr) [MVA]
         """
-        val = np.zeros((self.get_time_number(), self.get_branch_number_wo_hvdc()))
-
-        for i, branch in enumerate(self.get_branches_wo_hvdc()):
-            val[:, i] = branch.rate_prof.toarray() * branch.contingency_factor_prof.toarray()
-
-        return val
+        return np.hstack([self.get_profiles_matrix(elements=branch_list, magnitude='rate')
+                          * self.get_profiles_matrix(elements=branch_list, magnitude='contingency_factor')
+                          for branch_list in self.get_branch_lists_wo_hvdc()])
 
     def get_branch_contingency_rates_wo_hvdc(self) -> Vec:
         """
-        Get the complex bus power Injections
+        Get the branch contingency rates
         :return: (nbr) [MVA]
         """
         val = np.zeros(self.get_branch_number_wo_hvdc())
 
         for i, branch in enumerate(self.get_branches_wo_hvdc()):
-            val[i] = branch.rate_prof.toarray() * branch.contingency_factor.toarray()
+            val[i] = branch.rate * branch.contingency_factor
 
         return val
 
@@ -15,7 +15,7 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
-from typing import Union, Dict, Tuple, List, Any
+from typing import Union, Dict, Tuple, List, Any, Callable
 from collections import Counter
 import numpy as np
 import numba as nb
@@ -43,6 +43,24 @@ def compress_array_numba(arr, base):
     return data, indptr
 
 
+def get_most_frequent(arr: NumericVec) -> Tuple[Any, int, int]:
+    """
+    Get the most frequent value of an array
+    :param arr: vector
+    :return: most frequent value, its frequency, number of distinct values
+    """
+    if isinstance(arr, np.ndarray) and arr.dtype.kind in 'biuf':
+        # numeric arrays are counted in a vectorized fashion
+        values, counts = np.unique(arr, return_counts=True)
+        k = np.argmax(counts)
+        return values[k], int(counts[k]), len(values)
+    else:
+        # arrays of objects (enums, devices, ...) cannot be sorted, use a histogram
+        counts = Counter(arr)
+        most_common_element, most_common_count = counts.most_common(1)[0]
+        return most_common_element, most_common_count, len(counts)
+
+
 def check_if_sparse(arr: Union[NumericVec], sparsity: float = 0.8) -> Tuple[bool, Union[float, int]]:
     """
     Check if the array is sparse
@@ -60,36 +78,15 @@ def check_if_sparse(arr: Union[NumericVec], sparsity: float = 0.8) -> Tuple[bool
         min_elements = 1
 
     # if less than min_elements elements, it cannot be sparse
-    if len(arr) < min_elements:
+    if len(arr) < min_elements or len(arr) == 0:
         return False, 0
 
-    # declare the map to keep the frequency counter
-    cnt: Dict[Numeric, int] = dict()
-
-    for i, val in enumerate(arr):
+    max_val, max_freq, n_distinct = get_most_frequent(arr)
 
-        # add entry / increase entry (in the C++ map this works)
-        dval = cnt.get(val, 0)
-        cnt[val] = dval + 1
-
-        # do not check all the vector if the histogram size is telling us that it is not sparse
-        if len(cnt) > min_elements:
-            return False, 0.0
-
-    if len(cnt) > min_elements:
+    if n_distinct > min_elements:
         # is not sparse
         return False, 0.0
     else:
-        # variables to compare and keep the most frequent
-        max_val = 0  # value with the most frequency
-        max_freq: int = 0  # frequency of max_val
-
-        # determine the most frequent
-        for value, count in cnt.items():
-            if count > max_freq:
-                max_val = value
-                max_freq = count
-
         # it is sparse
         return True, max_val
 
@@ -117,7 +114,13 @@ class Profile:
 
         self._sparse_array: Union[SparseArray, None] = None
 
-        self._dense_array: Union[NumericVec, None] = None
+        self._dense_data: Union[NumericVec, None] = None
+
+        # function that provides the dense array when it is first accessed (lazy loading)
+        self._dense_loader: Union[Callable[[], NumericVec], None] = None
+
+        # size of the profile while the dense array is pending to be loaded
+        self._lazy_size: int = 0
 
         self._sparsity_threshold: float = sparsity_threshold
 
@@ -127,6 +130,12 @@ class Profile:
 
         self._default_value = default_value
 
+        # modification counter, increased every time the profile data changes
+        self._version: int = 0
+
+        # the data is shared with a copy of this profile, it must be copied before being modified in-place
+        self._copy_on_write: bool = False
+
         if arr is not None:
             self.set(arr=arr)
 
@@ -146,6 +155,68 @@ class Profile:
             "sparse_array": self._sparse_array.info() if self._sparse_array is not None else "None",
         }
 
+    @property
+    def _dense_array(self) -> Union[NumericVec, None]:
+        """
+        Dense array, loaded on first access if a loader was provided
+        :return: NumericVec or None
+        """
+        if self._dense_loader is not None:
+            self._dense_data = self._dense_loader()
+            self._dense_loader = None
+        return self._dense_data
+
+    @_dense_array.setter
+    def _dense_array(self, val: Union[NumericVec, None]):
+        """
+        Set the dense array, any pending loader is discarded
+        :param val: NumericVec or None
+        """
+        self._dense_data = val
+        self._dense_loader = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Is the profile data in memory? (False if it is pending to be lazily loaded)
+        :return: bool
+        """
+        return self._dense_loader is None
+
+    @property
+    def version(self) -> int:
+        """
+        Get the modification counter of this profile.
+        It changes every time the profile data is modified
+        :return: int
+        """
+        return self._version
+
+    def copy_on_write(self) -> "Profile":
+        """
+        Get a copy of this profile that shares the data until either of them is modified.
+        This is much cheaper than copying the arrays when most of the profiles are only read.
+        :return: Profile copy
+        """
+        cpy = Profile.__new__(Profile)
+        cpy.__dict__.update(self.__dict__)
+        cpy._copy_on_write = True
+        self._copy_on_write = True
+        return cpy
+
+    def _detach(self) -> None:
+        """
+        Take ownership of the data if it is shared with a copy, before modifying it in-place
+        """
+        if self._copy_on_write:
+            if self._sparse_array is not None:
+                self._sparse_array = self._sparse_array.copy()
+
+            if self._dense_array is not None:
+                self._dense_data = self._dense_data.copy()
+
+            self._copy_on_write = False
+
     def get_sparse_map(self) -> Dict[int, Numeric]:
         """
         Return the dictionary hosting the sparse data if this profile is sparse
@@ -178,8 +249,10 @@ class Profile:
         :return:
         """
         self._default_value = val
+        self._detach()
         if self.sparse_array is not None:
             self.sparse_array.default_value = self.default_value
+        self._version += 1
 
     @property
     def is_sparse(self) -> bool:
@@ -234,6 +307,7 @@ class Profile:
         else:
             self._sparse_array.create_from_dict(default_value=default_value, size=size, map_data=map_data)
         self._initialized = True
+        self._version += 1
 
     def create_dense(self, size: int, default_value: Numeric):
         """
@@ -245,6 +319,21 @@ class Profile:
         self._dense_array = np.full(size, default_value)
         self._sparse_array = None
         self._initialized = True
+        self._version += 1
+
+    def set_dense_loader(self, size: int, loader: Callable[[], NumericVec]):
+        """
+        Declare this profile as dense, with its data provided by a function the first time it is accessed
+        :param size: size of the profile
+        :param loader: function that returns the dense array
+        """
+        self._is_sparse = False
+        self._sparse_array = None
+        self._dense_data = None
+        self._dense_loader = loader
+        self._lazy_size = size
+        self._initialized = True
+        self._version += 1
 
     @property
     def sparsity(self) -> float:
@@ -265,11 +354,8 @@ class Profile:
         """
         if len(arr) > 0:
 
-            # Count occurrences of each element in the array
-            counts = Counter(arr)
-
             # Find the most frequent element
-            most_common_element, most_common_count = counts.most_common(1)[0]
+            most_common_element, most_common_count, _ = get_most_frequent(arr)
 
             # compute the sparsity factor
             sparsity_factor = most_common_count / len(arr)
@@ -311,6 +397,7 @@ class Profile:
             self._dense_array = arr
 
         self._initialized = True
+        self._version += 1
         return True
 
     def __eq__(self, other: "Profile") -> bool:
@@ -357,6 +444,8 @@ class Profile:
         """
         if isinstance(key, int):
 
+            self._detach()
+
             if self._is_sparse:
                 assert key < self._sparse_array.size()
                 self._sparse_array[key] = value
@@ -364,6 +453,8 @@ class Profile:
                 assert key < len(self._dense_array)
                 self._dense_array[key] = value
 
+            self._version += 1
+
         else:
             raise TypeError("Key must be an integer")
 
@@ -400,6 +491,7 @@ class Profile:
         """
         if isinstance(n, int):
             if self._initialized:
+                self._detach()
                 if self._is_sparse:
                     self._sparse_array.resize(n=n)
                 else:
@@ -409,6 +501,7 @@ class Profile:
                         new_arr = np.zeros(n, dtype=self._dense_array.dtype)
                         new_arr[:len(self._dense_array)] = self._dense_array
                         self._dense_array = new_arr  # this is to avoid ValueError when resizing a numpy array of Objects
+                self._version += 1
             else:
                 self._initialized = True
                 self.create_sparse(size=n, default_value=self.default_value)
@@ -420,10 +513,12 @@ class Profile:
         Resample this profile in-place
         :param indices: new indices
         """
+        self._detach()
         if self._is_sparse:
             self._sparse_array.resample(indices=indices)
         else:
             self._dense_array = self._dense_array[indices]
+        self._version += 1
 
     def fill(self, value: Any):
         """
@@ -432,18 +527,20 @@ class Profile:
         """
         check_type(dtype=self.dtype, value=value)
 
-        self.default_value = value
+        self.default_value = value  # this takes ownership of the data
         self._is_sparse = True
         if self._sparse_array is None:
             self._sparse_array = SparseArray(data_type=self.dtype)
         self._sparse_array.fill(value)
         self._dense_array = None
+        self._version += 1
 
     def scale(self, value: Union[float, int]):
         """
         Scale this profile with the same value
         :param value: any value
         """
+        self._detach()
         if self._is_sparse:
 
             # Scale the map
@@ -454,13 +551,20 @@ class Profile:
             # Scale the dense array
             self._dense_array *= value
 
+        self._version += 1
+
     def size(self) -> int:
         """
         Get the size
         :return: integer
         """
         if self._initialized:
-            return self._sparse_array.size() if self._is_sparse else len(self._dense_array)
+            if self._is_sparse:
+                return self._sparse_array.size()
+            elif self._dense_loader is not None:
+                return self._lazy_size
+            else:
+                return len(self._dense_array)
         else:
             return 0
 
@@ -505,7 +609,9 @@ class Profile:
         :param indptr: array of data indices
         :param data: array of data values
         """
+        self._detach()
         self._sparse_array.set_sparse_data_from_data(indptr=indptr, data=data)
+        self._version += 1
 
     def fix_nan(self, default_value: float = 0.0):
         """
@@ -514,5 +620,7 @@ class Profile:
         """
         if self.dtype == float:
             if not self._is_sparse:
+                self._detach()
                 if self._dense_array is not None:
                     np.nan_to_num(self._dense_array, nan=default_value)  # this is supposed to happen in-place
+                    self._version += 1
@@ -0,0 +1,128 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+import numpy as np
+from typing import List, Dict, Tuple, Union
+from GridCalEngine.Devices.profile import Profile
+from GridCalEngine.Devices.types import ALL_DEV_TYPES
+from GridCalEngine.enumerations import DeviceType
+from GridCalEngine.basic_structures import Mat
+
+
+class ProfilesMatrixEntry:
+    """
+    Columnar (time, device) matrix of a profile property of a device type,
+    along with the profiles and versions that were used to build it
+    """
+
+    def __init__(self, profiles: List[Profile], matrix: Mat):
+        """
+        Constructor
+        :param profiles: list of the profiles used to build the matrix (one per device)
+        :param matrix: (nt, ndev) matrix
+        """
+        # we keep the profile references, so that their identity cannot be recycled while cached
+        self.profiles: List[Profile] = profiles
+
+        self.versions: List[int] = [prof.version for prof in profiles]
+
+        self.matrix: Mat = matrix
+
+    def is_valid(self, profiles: List[Profile], nt: int) -> bool:
+        """
+        Check if this entry is still representative of the given profiles
+        :param profiles: list of the current profiles (one per device)
+        :param nt: number of time steps
+        :return: valid?
+        """
+        if self.matrix.shape[0] != nt or len(profiles) != len(self.profiles):
+            return False
+
+        for prof, prof0, version0 in zip(profiles, self.profiles, self.versions):
+            if prof is not prof0 or prof.version != version0:
+                return False
+
+        return True
+
+
+class ProfilesMatrixCache:
+    """
+    Cache of columnar (time, device) matrices built from the devices' profiles.
+    There is one matrix per device type and profile property, and it is rebuilt
+    only when the devices, their profiles or the number of time steps change.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._data: Dict[Tuple[DeviceType, str], ProfilesMatrixEntry] = dict()
+
+    def get_matrix(self,
+                   device_type: DeviceType,
+                   elements: List[ALL_DEV_TYPES],
+                   magnitude: str,
+                   nt: int,
+                   dtype=float) -> Mat:
+        """
+        Get the (nt, ndev) matrix of the profile of a magnitude for a list of devices
+        :param device_type: DeviceType of the devices (used as key)
+        :param elements: list of devices, all of the same type
+        :param magnitude: snapshot property name (i.e. "P")
+        :param nt: number of time steps
+        :param dtype: data type of the matrix
+        :return: (nt, ndev) matrix, do not modify it in-place
+        """
+        profiles = [elm.get_profile(magnitude) for elm in elements]
+
+        key = (device_type, magnitude)
+        entry = self._data.get(key, None)
+
+        if entry is not None:
+            if entry.is_valid(profiles=profiles, nt=nt):
+                return entry.matrix
+
+        matrix = np.zeros((nt, len(profiles)), dtype=dtype)
+        for k, prof in enumerate(profiles):
+            if prof.size() > 0:
+                matrix[:, k] = prof.toarray()
+            else:
+                # non initialized profiles behave as if they were filled with the default value
+                matrix[:, k] = prof.default_value
+
+        self._data[key] = ProfilesMatrixEntry(profiles=profiles, matrix=matrix)
+
+        return matrix
+
+    def invalidate(self, device_type: Union[DeviceType, None] = None) -> None:
+        """
+        Drop the cached matrices
+        :param device_type: DeviceType to drop, if None, all the cache is dropped
+        """
+        if device_type is None:
+            self._data.clear()
+        else:
+            for key in [k for k in self._data.keys() if k[0] == device_type]:
+                del self._data[key]
+
+    def __len__(self) -> int:
+        """
+        Number of cached matrices
+        :return: int
+        """
+        return len(self._data)
@@ -28,7 +28,7 @@ from GridCalEngine.basic_structures import Logger
 from GridCalEngine.data_logger import DataLogger
 from GridCalEngine.IO.gridcal.json_parser import save_json_file_v3
 from GridCalEngine.IO.gridcal.excel_interface import save_excel, load_from_xls, interpret_excel_v3, interprete_excel_v2
-from GridCalEngine.IO.gridcal.pack_unpack import gather_model_as_data_frames, parse_gridcal_data, gather_model_as_jsons
+from GridCalEngine.IO.gridcal.pack_unpack import gather_model_as_data_frames, parse_gridcal_data
 from GridCalEngine.IO.matpower.matpower_parser import interpret_data_v1, parse_matpower_file
 from GridCalEngine.IO.dgs.dgs_parser import dgs_to_circuit
 from GridCalEngine.IO.others.dpx_parser import load_dpx
@@ -41,7 +41,10 @@ from GridCalEngine.IO.epc.epc_parser import PowerWorldParser
 from GridCalEngine.IO.cim.cim16.cim_parser import CIMImport, CIMExport
 from GridCalEngine.IO.cim.cgmes.cgmes_circuit import CgmesCircuit, is_valid_cgmes
 from GridCalEngine.IO.cim.cgmes.cgmes_to_gridcal import cgmes_to_gridcal
-from GridCalEngine.IO.gridcal.zip_interface import save_gridcal_data_to_zip, get_frames_from_zip
+from GridCalEngine.IO.gridcal.zip_interface import get_frames_from_zip
+from GridCalEngine.IO.gridcal.incremental_save import (ModelSaveState, ModelSnapshot, JOURNAL_EXTENSION,
+                                                       take_model_snapshot, write_model_snapshot,
+                                                       get_frames_from_journal, clear_dirty_flags)
 from GridCalEngine.IO.gridcal.sqlite_interface import save_data_frames_to_sqlite, open_data_frames_from_sqlite
 from GridCalEngine.IO.gridcal.h5_interface import save_h5, open_h5
 from GridCalEngine.IO.raw.rawx_parser_writer import parse_rawx, write_rawx
@@ -50,7 +53,7 @@ from GridCalEngine.IO.cim.cgmes.cgmes_enums import cgmesProfile
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.Simulations.results_template import DriverToSave
 from GridCalEngine.Simulations.PowerFlow.power_flow_results import PowerFlowResults
-from GridCalEngine.enumerations import CGMESVersions, SimulationTypes
+from GridCalEngine.enumerations import CGMESVersions, SimulationTypes, FileCompression
 from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at
 
 if TYPE_CHECKING:
@@ -71,7 +74,11 @@ class FileSavingOptions:
                  cgmes_profiles: Union[None, List[cgmesProfile]] = None,
                  cgmes_one_file_per_profile: bool = False,
                  cgmes_map_areas_like_raw: bool = False,
-                 raw_version: str = "33"):
+                 raw_version: str = "33",
+                 compression: FileCompression = FileCompression.Deflated,
+                 compression_level: Union[int, None] = None,
+                 n_threads: Union[int, None] = None,
+                 save_state: Union[ModelSaveState, None] = None):
         """
         Constructor
         :param cgmes_boundary_set: CGMES boundary set zip file path
@@ -83,6 +90,10 @@ class FileSavingOptions:
         :param cgmes_one_file_per_profile: use one file per profile?
         :param cgmes_map_areas_like_raw: use map areas like raw?
         :param raw_version: Version to use when exporting raw/rawx files
+        :param compression: Compression of the .gridcal file members
+        :param compression_level: Compression level (deflate: 0~9, zstd: 1~22), None for the default
+        :param n_threads: Number of threads used to serialize the .gridcal file, None for the default
+        :param save_state: State of the last .gridcal file save, to only serialize the object types that changed
         """
 
         self.cgmes_version: CGMESVersions = cgmes_version
@@ -116,6 +127,14 @@ class FileSavingOptions:
 
         self.raw_version = raw_version
 
+        self.compression: FileCompression = compression
+
+        self.compression_level: Union[int, None] = compression_level
+
+        self.n_threads: Union[int, None] = n_threads
+
+        self.save_state: Union[ModelSaveState, None] = save_state
+
     def get_power_flow_results(self) -> Union[None, PowerFlowResults]:
         """
         Try to extract the power flow results
@@ -163,6 +182,9 @@ class FileOpen:
 
         self.json_files = dict()
 
+        # state of the opened .gridcal file, used to save incrementally
+        self.save_state: Union[ModelSaveState, None] = None
+
         self.logger = Logger()
 
         self.cgmes_logger = DataLogger()
@@ -245,6 +267,27 @@ class FileOpen:
                                                                            progress_func=progress_func,
                                                                            logger=self.logger)
                     # interpret file content
+                    if data_dictionary is not None:
+                        self.circuit = parse_gridcal_data(data=data_dictionary,
+                                                          text_func=text_func,
+                                                          progress_func=progress_func,
+                                                          logger=self.logger)
+
+                        # the model is now the one in the file
+                        clear_dirty_flags(self.circuit)
+                        self.save_state = ModelSaveState.from_circuit(circuit=self.circuit, file_name=self.file_name)
+                    else:
+                        self.logger.add("Error while reading the file :(")
+                        return None
+
+                elif file_extension.lower() == JOURNAL_EXTENSION:
+
+                    # open the autosave journal over the file it was taken from
+                    data_dictionary, self.json_files = get_frames_from_journal(self.file_name,
+                                                                               text_func=text_func,
+                                                                               progress_func=progress_func,
+                                                                               logger=self.logger)
+                    # interpret file content
                     if data_dictionary is not None:
                         self.circuit = parse_gridcal_data(data=data_dictionary,
                                                           text_func=text_func,
@@ -429,6 +472,23 @@ class FileSave:
 
         self.progress_func = progress_func
 
+        # state of the saved .gridcal file (None if the file could not be saved)
+        self.save_state: Union[ModelSaveState, None] = options.save_state
+
+        self._snapshot: Union[ModelSnapshot, None] = None
+
+    def take_snapshot(self) -> None:
+        """
+        Take the snapshot of the model to save in the .gridcal formats.
+        This must be called from the thread that edits the model, then the saving can run in any other thread.
+        """
+        if self.file_name.endswith('.gridcal'):
+            self._snapshot = take_model_snapshot(circuit=self.circuit, save_state=self.save_state)
+
+        elif self.file_name.endswith('.dgridcal'):
+            # this is not the file of the save state: keep the devices dirty for it
+            self._snapshot = take_model_snapshot(circuit=self.circuit, save_state=None, clear_dirty=False)
+
     def save(self) -> Logger:
         """
         Save the file in the corresponding format
@@ -491,20 +551,28 @@ class FileSave:
 
         logger = Logger()
 
-        dfs = gather_model_as_data_frames(self.circuit,
-                                          legacy=False)
-
-        model_data = gather_model_as_jsons(self.circuit)
-
-        save_gridcal_data_to_zip(dfs=dfs,
-                                 filename_zip=self.file_name,
-                                 model_data=model_data,
-                                 sessions_data=self.options.sessions_data,
-                                 diagrams=self.circuit.diagrams,
-                                 json_files=self.options.dictionary_of_json_files,
-                                 text_func=self.text_func,
-                                 progress_func=self.progress_func,
-                                 logger=logger)
+        if self._snapshot is None:
+            self.take_snapshot()
+
+        snapshot = self._snapshot
+        self._snapshot = None
+
+        try:
+            # only the object types that changed since the last save are serialized, the rest is copied
+            self.save_state = write_model_snapshot(snapshot=snapshot,
+                                                   file_name=self.file_name,
+                                                   sessions_data=self.options.sessions_data,
+                                                   json_files=self.options.dictionary_of_json_files,
+                                                   text_func=self.text_func,
+                                                   progress_func=self.progress_func,
+                                                   logger=logger,
+                                                   compression=self.options.compression,
+                                                   compression_level=self.options.compression_level,
+                                                   n_threads=self.options.n_threads)
+        except Exception as e:
+            # the devices are not dirty anymore, so the next save must be complete
+            self.save_state = None
+            raise e
 
         return logger
 
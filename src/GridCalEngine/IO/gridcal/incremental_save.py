@@ -0,0 +1,507 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+import os
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Union, Set, Callable, Any, Tuple
+from GridCalEngine.basic_structures import Logger, Mat
+from GridCalEngine.enumerations import FileCompression
+from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.Simulations.results_template import DriverToSave
+from GridCalEngine.IO.file_system import get_create_gridcal_folder
+from GridCalEngine.IO.gridcal.profile_blocks import ProfileBlocksCollector, PROFILES_BLOCKS_FOLDER
+from GridCalEngine.IO.gridcal.pack_unpack import (get_objects_dictionary, gather_model_as_data_frames,
+                                                  gather_model_as_jsons)
+from GridCalEngine.IO.gridcal.zip_interface import save_gridcal_data_to_zip, get_frames_from_zip
+
+# folder inside the .gridcal zip file where the object types are stored
+MODEL_DATA_FOLDER = "model_data"
+
+# extension of the autosave journals
+JOURNAL_EXTENSION = ".gridcal_autosave"
+
+# name of the json file of the journal that describes it
+JOURNAL_MANIFEST = "autosave_manifest"
+
+
+def get_object_type_names() -> List[str]:
+    """
+    Get the names of the object types stored in a .gridcal file
+    :return: list of names (i.e. bus, line, ...)
+    """
+    return [name for name in get_objects_dictionary().keys() if name != 'branch']
+
+
+def get_object_type_members(file_name_zip: str, object_types: Set[str]) -> List[str]:
+    """
+    Get the names of the members of a .gridcal file that store the given object types
+    (the model data and the profile blocks)
+    :param file_name_zip: name of the .gridcal file
+    :param object_types: names of the object types
+    :return: list of member names
+    """
+    members = list()
+    with zipfile.ZipFile(file_name_zip) as f_zip_ptr:
+        for name in f_zip_ptr.namelist():
+            path = name.split('/')
+            if len(path) == 2 and path[0] == MODEL_DATA_FOLDER:
+                if os.path.splitext(path[1])[0] in object_types:
+                    members.append(name)
+
+            elif len(path) == 3 and path[0] == PROFILES_BLOCKS_FOLDER:
+                if path[1] in object_types:
+                    members.append(name)
+
+    return members
+
+
+def clear_dirty_flags(circuit: MultiCircuit) -> None:
+    """
+    Flag all the devices of a circuit as saved
+    :param circuit: MultiCircuit
+    """
+    for object_type_name, object_sample in get_objects_dictionary().items():
+        if object_type_name != 'branch':
+            for elm in circuit.get_elements_by_type(object_sample.device_type):
+                elm.clear_dirty()
+
+
+class ModelSaveState:
+    """
+    Record of the model stored in a .gridcal file: the devices of each object type and the time steps.
+    It allows to find the object types that changed since, so that only those are serialized again.
+    """
+
+    def __init__(self,
+                 type_idtags: Dict[str, List[str]],
+                 unix_time: np.ndarray,
+                 file_name: Union[str, None] = None):
+        """
+        Constructor
+        :param type_idtags: object type name -> list of the idtags stored
+        :param unix_time: time steps stored
+        :param file_name: name of the .gridcal file
+        """
+        self.type_idtags: Dict[str, List[str]] = type_idtags
+
+        self.unix_time: np.ndarray = unix_time
+
+        self.file_name: Union[str, None] = None
+
+        # size and modification time of the file, to detect that it was modified by someone else
+        self.file_stat: Tuple[int, float] = (0, 0.0)
+
+        # does the file store the object types separately? (the legacy files do not)
+        self.has_model_data: bool = False
+
+        if file_name is not None:
+            self.set_file(file_name)
+
+    @staticmethod
+    def from_circuit(circuit: MultiCircuit, file_name: Union[str, None] = None) -> "ModelSaveState":
+        """
+        Record the current state of a circuit
+        :param circuit: MultiCircuit
+        :param file_name: name of the .gridcal file where the circuit is stored
+        :return: ModelSaveState
+        """
+        type_idtags = dict()
+        for object_type_name, object_sample in get_objects_dictionary().items():
+            if object_type_name != 'branch':
+                type_idtags[object_type_name] = [elm.idtag for elm in
+                                                 circuit.get_elements_by_type(object_sample.device_type)]
+
+        return ModelSaveState(type_idtags=type_idtags,
+                              unix_time=circuit.get_unix_time().copy(),
+                              file_name=file_name)
+
+    def set_file(self, file_name: str) -> None:
+        """
+        Set the file where the model was stored (once it is completely written)
+        :param file_name: name of the .gridcal file
+        """
+        self.file_name = file_name
+        stat = os.stat(file_name)
+        self.file_stat = (stat.st_size, stat.st_mtime)
+
+        with zipfile.ZipFile(file_name) as f_zip_ptr:
+            self.has_model_data = any(name.startswith(MODEL_DATA_FOLDER + '/') for name in f_zip_ptr.namelist())
+
+    def is_file_valid(self) -> bool:
+        """
+        Is the file still the one that was written? (then its members can be copied)
+        :return: bool
+        """
+        if self.file_name is None or not self.has_model_data or not os.path.isfile(self.file_name):
+            return False
+
+        stat = os.stat(self.file_name)
+        return (stat.st_size, stat.st_mtime) == self.file_stat
+
+    def get_changed_object_types(self, circuit: MultiCircuit) -> Set[str]:
+        """
+        Get the object types that changed since the state was recorded.
+        A type changed if its devices were added, removed or reordered, or if any of its devices is dirty.
+        If devices were removed, or the time steps changed, all the types are considered changed,
+        since other types may refer to the removed devices or store profiles of the old length.
+        :param circuit: MultiCircuit
+        :return: set of object type names
+        """
+        all_types = set(get_object_type_names())
+
+        unix_time = circuit.get_unix_time()
+        if len(unix_time) != len(self.unix_time) or not np.array_equal(unix_time, self.unix_time):
+            return all_types
+
+        changed = set()
+        for object_type_name, object_sample in get_objects_dictionary().items():
+            if object_type_name == 'branch':
+                continue
+
+            elements = circuit.get_elements_by_type(object_sample.device_type)
+            idtags0 = self.type_idtags.get(object_type_name, list())
+            idtags = [elm.idtag for elm in elements]
+
+            if idtags != idtags0:
+                if not set(idtags0).issubset(idtags):
+                    # something was removed
+                    return all_types
+                changed.add(object_type_name)
+
+            elif any(elm.is_dirty for elm in elements):
+                changed.add(object_type_name)
+
+        return changed
+
+
+class ModelSnapshot:
+    """
+    Copy of the data of a model to be written into a .gridcal file.
+    It only holds the data of the object types that changed, the rest is copied from the previous file.
+    The snapshot is taken quickly in the caller thread, so that it can be written in another thread
+    while the model keeps being edited.
+    """
+
+    def __init__(self,
+                 dfs: Dict[str, pd.DataFrame],
+                 model_data: Dict[str, Any],
+                 profile_blocks: Dict[str, Mat],
+                 diagrams: List[Dict[str, Any]],
+                 saved_object_types: Set[str],
+                 base_file_name: Union[str, None],
+                 state: ModelSaveState):
+        """
+        Constructor
+        :param dfs: dictionary of DataFrames (configuration)
+        :param model_data: json data of the changed object types
+        :param profile_blocks: binary profile blocks of the changed object types
+        :param diagrams: diagrams data
+        :param saved_object_types: names of the object types in model_data
+        :param base_file_name: file where the other object types are copied from (None if all the types are in here)
+        :param state: ModelSaveState of the model at the time of the snapshot
+        """
+        self.dfs = dfs
+        self.model_data = model_data
+        self.profile_blocks = profile_blocks
+        self.diagrams = diagrams
+        self.saved_object_types = saved_object_types
+        self.base_file_name = base_file_name
+        self.state = state
+
+    @property
+    def copied_object_types(self) -> Set[str]:
+        """
+        Object types that are copied from the base file
+        :return: set of names
+        """
+        if self.base_file_name is None:
+            return set()
+        else:
+            return set(get_object_type_names()) - self.saved_object_types
+
+
+def take_model_snapshot(circuit: MultiCircuit,
+                        save_state: Union[ModelSaveState, None] = None,
+                        increase_version: bool = True,
+                        clear_dirty: bool = True) -> ModelSnapshot:
+    """
+    Take a snapshot of the model to save.
+    If there is a valid save state, only the object types that changed since are gathered.
+    :param circuit: MultiCircuit
+    :param save_state: ModelSaveState of the last save, None to gather everything
+    :param increase_version: increase the model version?
+    :param clear_dirty: flag the devices as saved? (False if this is not a save of the file of save_state)
+    :return: ModelSnapshot
+    """
+    if save_state is not None and save_state.is_file_valid():
+        object_types = save_state.get_changed_object_types(circuit)
+        base_file_name = save_state.file_name
+    else:
+        object_types = set(get_object_type_names())
+        base_file_name = None
+
+    dfs = gather_model_as_data_frames(circuit, legacy=False, increase_version=increase_version)
+
+    # the numeric dense profiles are stored as binary blocks (vstack copies them)
+    profile_blocks = ProfileBlocksCollector()
+    model_data = gather_model_as_jsons(circuit, profile_blocks=profile_blocks, object_types_to_save=object_types)
+    blocks = profile_blocks.get_blocks()
+
+    diagrams = [diagram.get_data_dict() for diagram in circuit.diagrams]
+
+    state = ModelSaveState.from_circuit(circuit)
+
+    if clear_dirty:
+        # any change from now on makes the devices dirty again
+        clear_dirty_flags(circuit)
+
+    return ModelSnapshot(dfs=dfs,
+                         model_data=model_data,
+                         profile_blocks=blocks,
+                         diagrams=diagrams,
+                         saved_object_types=object_types,
+                         base_file_name=base_file_name,
+                         state=state)
+
+
+def write_model_snapshot(snapshot: ModelSnapshot,
+                         file_name: str,
+                         sessions_data: List[DriverToSave],
+                         json_files: Dict[str, dict],
+                         text_func: Union[None, Callable[[str], None]] = None,
+                         progress_func: Union[None, Callable[[float], None]] = None,
+                         logger: Logger = Logger(),
+                         compression: FileCompression = FileCompression.Deflated,
+                         compression_level: Union[int, None] = None,
+                         n_threads: Union[int, None] = None) -> ModelSaveState:
+    """
+    Write a snapshot into a .gridcal file
+    :param snapshot: ModelSnapshot
+    :param file_name: name of the .gridcal file
+    :param sessions_data: List of DriverToSave instances, representing the results drivers data
+    :param json_files: configuration json files to save Dict[file_name, dictionary to save]
+    :param text_func: pointer to function that prints the names
+    :param progress_func: pointer to function that prints the progress 0~100
+    :param logger: Logger object
+    :param compression: FileCompression
+    :param compression_level: compression level, None for the default
+    :param n_threads: number of threads used to serialize the members, None for the default
+    :return: ModelSaveState of the written file
+    """
+    copied_object_types = snapshot.copied_object_types
+
+    if len(copied_object_types):
+        copied_members = get_object_type_members(file_name_zip=snapshot.base_file_name,
+                                                 object_types=copied_object_types)
+    else:
+        copied_members = list()
+
+    save_gridcal_data_to_zip(dfs=snapshot.dfs,
+                             filename_zip=file_name,
+                             model_data=snapshot.model_data,
+                             sessions_data=sessions_data,
+                             diagrams=snapshot.diagrams,
+                             json_files=json_files,
+                             text_func=text_func,
+                             progress_func=progress_func,
+                             logger=logger,
+                             profile_blocks=snapshot.profile_blocks,
+                             compression=compression,
+                             compression_level=compression_level,
+                             n_threads=n_threads,
+                             base_file_zip=snapshot.base_file_name,
+                             copied_members=copied_members)
+
+    snapshot.state.set_file(file_name)
+
+    return snapshot.state
+
+
+def get_journal_file_name(file_name: Union[str, None]) -> str:
+    """
+    Get the name of the autosave journal of a file
+    :param file_name: name of the .gridcal file, None or empty for models that were never saved
+    :return: journal file name
+    """
+    if file_name:
+        if file_name.endswith('.gridcal'):
+            return file_name[:-len('.gridcal')] + JOURNAL_EXTENSION
+        else:
+            return file_name + JOURNAL_EXTENSION
+    else:
+        return os.path.join(get_create_gridcal_folder(), "untitled" + JOURNAL_EXTENSION)
+
+
+def get_journal_base_file_name(journal_file_name: str) -> str:
+    """
+    Get the name of the file of an autosave journal (the inverse of get_journal_file_name)
+    :param journal_file_name: journal file name
+    :return: name of the file, empty if the model was never saved
+    """
+    if journal_file_name == get_journal_file_name(None):
+        return ""
+
+    base_name = journal_file_name[:-len(JOURNAL_EXTENSION)]
+    if os.path.splitext(base_name)[1] == '':
+        return base_name + '.gridcal'
+    else:
+        return base_name
+
+
+def is_journal_newer(file_name: str) -> bool:
+    """
+    Is there an autosave journal newer than a file?
+    :param file_name: name of the .gridcal file
+    :return: bool
+    """
+    journal_file_name = get_journal_file_name(file_name)
+    if os.path.isfile(journal_file_name):
+        if os.path.isfile(file_name):
+            return os.path.getmtime(journal_file_name) > os.path.getmtime(file_name)
+        else:
+            return True
+    else:
+        return False
+
+
+def remove_journal(file_name: Union[str, None]) -> None:
+    """
+    Delete the autosave journal of a file if it exists
+    :param file_name: name of the .gridcal file, None or empty for models that were never saved
+    """
+    journal_file_name = get_journal_file_name(file_name)
+    if os.path.isfile(journal_file_name):
+        os.remove(journal_file_name)
+
+
+def take_journal_snapshot(circuit: MultiCircuit,
+                          save_state: Union[ModelSaveState, None]) -> Tuple[ModelSnapshot, Dict[str, Any]]:
+    """
+    Take a snapshot of the changes since the last save for an autosave journal
+    :param circuit: MultiCircuit
+    :param save_state: ModelSaveState of the last save (None if the model was never saved)
+    :return: ModelSnapshot, journal manifest
+    """
+    # the journal does not count as a save: the model version is kept and the devices stay dirty
+    snapshot = take_model_snapshot(circuit=circuit, save_state=save_state, increase_version=False, clear_dirty=False)
+
+    manifest = {
+        'base_file': snapshot.base_file_name,
+        'base_size': save_state.file_stat[0] if snapshot.base_file_name is not None else 0,
+        'base_mtime': save_state.file_stat[1] if snapshot.base_file_name is not None else 0.0,
+        'object_types': sorted(snapshot.saved_object_types),
+        'time': time.time()
+    }
+
+    # the journal only stores the changed object types, nothing is copied into it
+    snapshot.base_file_name = None
+
+    return snapshot, manifest
+
+
+def write_journal(snapshot: ModelSnapshot,
+                  manifest: Dict[str, Any],
+                  journal_file_name: str,
+                  json_files: Dict[str, dict] = None) -> None:
+    """
+    Write an autosave journal (this is crash-safe: the previous journal is replaced only once the new one is complete)
+    :param snapshot: ModelSnapshot from take_journal_snapshot
+    :param manifest: journal manifest from take_journal_snapshot
+    :param journal_file_name: name of the journal file
+    :param json_files: configuration json files to save Dict[file_name, dictionary to save]
+    """
+    json_files = dict() if json_files is None else dict(json_files)
+    json_files[JOURNAL_MANIFEST] = manifest
+
+    save_gridcal_data_to_zip(dfs=snapshot.dfs,
+                             filename_zip=journal_file_name,
+                             model_data=snapshot.model_data,
+                             sessions_data=list(),
+                             diagrams=snapshot.diagrams,
+                             json_files=json_files,
+                             profile_blocks=snapshot.profile_blocks,
+                             compression=FileCompression.Stored)
+
+
+def get_frames_from_journal(journal_file_name: str,
+                            text_func: Union[None, Callable[[str], None]] = None,
+                            progress_func: Union[None, Callable[[float], None]] = None,
+                            logger: Logger = Logger()) -> Tuple[Union[Dict[str, Any], None], Dict[str, dict]]:
+    """
+    Read an autosave journal applied over the file it was taken from.
+    The result is the same as get_frames_from_zip for the file with the autosaved changes.
+    :param journal_file_name: name of the journal file
+    :param text_func: pointer to function that prints the names
+    :param progress_func: pointer to function that prints the progress 0~100
+    :param logger: Logger
+    :return: data dictionary, json files dictionary (including the journal manifest)
+    """
+    data, json_files = get_frames_from_zip(journal_file_name,
+                                           text_func=text_func,
+                                           progress_func=progress_func,
+                                           logger=logger)
+
+    # the journal is overwritten by the next autosave: read its profile blocks now
+    for reader in data['model_profiles'].values():
+        reader.get_data()
+
+    manifest = json_files.get(JOURNAL_MANIFEST, None)
+
+    if manifest is None or manifest['base_file'] is None:
+        # the journal holds the complete model
+        return data, json_files
+
+    base_file_name = manifest['base_file']
+
+    if not os.path.isfile(base_file_name):
+        logger.add_error("The file of the autosave journal does not exist", value=base_file_name)
+        return None, json_files
+
+    stat = os.stat(base_file_name)
+    if (stat.st_size, stat.st_mtime) != (manifest['base_size'], manifest['base_mtime']):
+        logger.add_warning("The file changed after the autosave journal was written, "
+                           "the journal object types replace those of the file", value=base_file_name)
+
+    base_data, base_json_files = get_frames_from_zip(base_file_name,
+                                                     text_func=text_func,
+                                                     progress_func=progress_func,
+                                                     logger=logger)
+
+    # the journal object types replace those of the base file
+    object_types = set(manifest['object_types'])
+    for object_type_name in object_types:
+        base_data['model_data'][object_type_name] = data['model_data'].get(object_type_name, list())
+
+    base_data['model_profiles'] = {block_name: reader
+                                   for block_name, reader in base_data['model_profiles'].items()
+                                   if block_name.split('/')[0] not in object_types}
+    base_data['model_profiles'].update(data['model_profiles'])
+
+    # the time, configuration and diagrams are always in the journal
+    base_data['model_data']['time'] = data['model_data']['time']
+    base_data['diagrams'] = data['diagrams']
+    for key, value in data.items():
+        if key not in ('model_data', 'model_profiles', 'diagrams'):
+            base_data[key] = value
+
+    base_json_files.update(json_files)
+
+    return base_data, base_json_files
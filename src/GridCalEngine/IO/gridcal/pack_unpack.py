@@ -16,7 +16,7 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 import json
 import math
-from typing import Dict, Union, List, Tuple, Any, Callable
+from typing import Dict, Union, List, Tuple, Any, Callable, Set
 import pandas as pd
 import numpy as np
 from enum import EnumMeta as EnumType
@@ -26,8 +26,14 @@ import GridCalEngine.Devices as dev
 from GridCalEngine.Devices.Parents.editable_device import GCProp
 from GridCalEngine.Devices.profile import Profile
 from GridCalEngine.Devices.types import ALL_DEV_TYPES
+from GridCalEngine.IO.gridcal.profile_blocks import ProfileBlocksCollector, ProfileBlockReader, ProfileBlockRow
 from GridCalEngine.enumerations import (DiagramType, DeviceType, SubObjectType, TapPhaseControl, TapModuleControl)
 
+# version of the model data format, increased every time that a change cannot be read by the previous versions
+# 1: the profiles are stored in the json data
+# 2: the dense numeric profiles may be stored in binary blocks (dense_block)
+MODEL_DATA_FORMAT_VERSION = 2
+
 
 def get_objects_dictionary() -> Dict[str, ALL_DEV_TYPES]:
     """
@@ -127,11 +133,14 @@ def get_objects_dictionary() -> Dict[str, ALL_DEV_TYPES]:
     return object_types
 
 
-def gather_model_as_data_frames(circuit: MultiCircuit, legacy: bool = False) -> Dict[str, pd.DataFrame]:
+def gather_model_as_data_frames(circuit: MultiCircuit,
+                                legacy: bool = False,
+                                increase_version: bool = True) -> Dict[str, pd.DataFrame]:
     """
     Pack the circuit information into tables (DataFrames)
     :param circuit: MultiCircuit instance
     :param legacy: Generate the legacy object DataFrames
+    :param increase_version: increase the model version? (False for the autosave journals)
     :return: dictionary of DataFrames
     """
     dfs = dict()
@@ -144,7 +153,8 @@ def gather_model_as_data_frames(circuit: MultiCircuit, legacy: bool = False) ->
     obj.append(['Comments', str(circuit.comments)])
 
     # increase the model version
-    circuit.model_version += 1
+    if increase_version:
+        circuit.model_version += 1
 
     obj.append(['ModelVersion', str(circuit.model_version)])
     obj.append(['UserName', str(circuit.user_name)])
@@ -239,9 +249,14 @@ def gather_model_as_data_frames(circuit: MultiCircuit, legacy: bool = False) ->
     return dfs
 
 
-def profile_todict(profile: Profile) -> Dict[str, str]:
+def profile_todict(profile: Profile,
+                   profile_blocks: Union[ProfileBlocksCollector, None] = None,
+                   block_name: str = "") -> Dict[str, str]:
     """
     Get a dictionary representation of the profile
+    :param profile: Profile
+    :param profile_blocks: if provided, the dense data is stored in the binary blocks instead of the dictionary
+    :param block_name: name of the block where to store the dense data
     :return:
     """
     s = profile.size()
@@ -257,6 +272,20 @@ def profile_todict(profile: Profile) -> Dict[str, str]:
                 }
             }
         else:
+            if profile_blocks is not None:
+                row = profile_blocks.add(block_name=block_name, arr=profile.dense_array)
+
+                if row is not None:
+                    return {
+                        'is_sparse': False,
+                        'size': s,
+                        'default': profile.default_value,
+                        'dense_block': {
+                            'name': block_name,
+                            'row': row
+                        }
+                    }
+
             return {
                 'is_sparse': False,
                 'size': s,
@@ -340,12 +369,14 @@ def profile_todict_str(profile: Profile) -> Dict[str, str]:
 
 def get_profile_from_dict(profile: Profile,
                           data: Dict[str, Union[str, Union[Any, Dict[str, Any]]]],
-                          collection: Union[None, Dict[str, Any]] = None):
+                          collection: Union[None, Dict[str, Any]] = None,
+                          profile_blocks: Union[None, Dict[str, ProfileBlockReader]] = None):
     """
     Create a profile from json dict data
     :param profile: Profile object to fill in
     :param data: Json dict data
     :param collection: if the collection is provided, it will be used to convert idtags into objects
+    :param profile_blocks: dictionary of binary profile blocks readers, used if the dense data is in a block
     :return: None
     """
     default_value = data['default']
@@ -367,6 +398,17 @@ def get_profile_from_dict(profile: Profile,
                 default_value = profile.default_value
 
         profile.create_sparse(default_value=default_value, size=data['size'], map_data=map_data)
+
+    elif 'dense_block' in data:
+        # the dense data is stored in a binary block, that is loaded the first time the profile is accessed
+        block_data = data['dense_block']
+        reader = profile_blocks.get(block_data['name'], None) if profile_blocks is not None else None
+
+        if reader is None:
+            raise Exception(f"The profiles block {block_data['name']} was not found")
+
+        profile.set_dense_loader(size=int(data['size']),
+                                 loader=ProfileBlockRow(reader=reader, row=int(block_data['row'])))
     else:
 
         if collection is None:
@@ -379,10 +421,14 @@ def get_profile_from_dict(profile: Profile,
     profile.set_initialized()
 
 
-def gridcal_object_to_json(elm: ALL_DEV_TYPES) -> Dict[str, str]:
+def gridcal_object_to_json(elm: ALL_DEV_TYPES,
+                           profile_blocks: Union[ProfileBlocksCollector, None] = None,
+                           object_type_name: str = "") -> Dict[str, str]:
     """
 
     :param elm:
+    :param profile_blocks: if provided, the numeric dense profiles are collected here instead of the json
+    :param object_type_name: name of the object type, used to name the profile blocks
     :return:
     """
 
@@ -394,7 +440,11 @@ def gridcal_object_to_json(elm: ALL_DEV_TYPES) -> Dict[str, str]:
             data[name] = obj
 
             if prop.has_profile():
-                data[name + '_prof'] = profile_todict(elm.get_profile_by_prop(prop=prop))
+                data[name + '_prof'] = profile_todict(
+                    profile=elm.get_profile_by_prop(prop=prop),
+                    profile_blocks=profile_blocks,
+                    block_name=ProfileBlocksCollector.get_block_name(object_type_name, name)
+                )
 
         elif prop.tpe == SubObjectType.GeneratorQCurve:
             data[name] = obj.to_list()
@@ -429,10 +479,15 @@ def gridcal_object_to_json(elm: ALL_DEV_TYPES) -> Dict[str, str]:
     return data
 
 
-def gather_model_as_jsons(circuit: MultiCircuit) -> Dict[str, Dict[str, str]]:
+def gather_model_as_jsons(circuit: MultiCircuit,
+                          profile_blocks: Union[ProfileBlocksCollector, None] = None,
+                          object_types_to_save: Union[Set[str], None] = None) -> Dict[str, Dict[str, str]]:
     """
     Transform a MultiCircuit into a collection of Json files
-    :param circuit:
+    :param circuit: MultiCircuit
+    :param profile_blocks: if provided, the numeric dense profiles are collected here
+                           as binary blocks instead of being written in the json
+    :param object_types_to_save: names of the object types to gather, None for all of them
     :return:
     """
 
@@ -449,6 +504,9 @@ def gather_model_as_jsons(circuit: MultiCircuit) -> Dict[str, Dict[str, str]]:
     # generic object iteration
     for object_type_name, object_sample in object_types.items():
 
+        if object_types_to_save is not None and object_type_name not in object_types_to_save:
+            continue
+
         object_json = list()
 
         lists_of_objects = circuit.get_elements_by_type(object_sample.device_type)
@@ -456,11 +514,16 @@ def gather_model_as_jsons(circuit: MultiCircuit) -> Dict[str, Dict[str, str]]:
         if len(lists_of_objects) > 0:
 
             for k, elm in enumerate(lists_of_objects):
-                obj_data = gridcal_object_to_json(elm)
+                obj_data = gridcal_object_to_json(elm,
+                                                  profile_blocks=profile_blocks,
+                                                  object_type_name=object_type_name)
                 object_json.append(obj_data)
 
         data[object_type_name] = object_json
 
+    # format version, checked when reading
+    data['format'] = {'version': MODEL_DATA_FORMAT_VERSION}
+
     # time
     unix_time = circuit.get_unix_time()
     data['time'] = {'unix': unix_time.tolist(),
@@ -978,7 +1041,8 @@ def search_and_apply_json_profile(json_entry: Dict[str, Dict[str, Union[str, Uni
                                   gc_prop: GCProp,
                                   elm: ALL_DEV_TYPES,
                                   property_value: Any,
-                                  collection: Union[None, Dict[str, Any]] = None) -> None:
+                                  collection: Union[None, Dict[str, Any]] = None,
+                                  profile_blocks: Union[None, Dict[str, ProfileBlockReader]] = None) -> None:
     """
     Search from the property profiles into the json and apply it
     :param json_entry: Json entry of an object
@@ -986,6 +1050,7 @@ def search_and_apply_json_profile(json_entry: Dict[str, Dict[str, Union[str, Uni
     :param elm: THe device to set the profile into
     :param property_value: The snapshot value
     :param collection: if the collection is provided, it will be used to convert idtags into objects
+    :param profile_blocks: dictionary of binary profile blocks readers
     :return: None
     """
     if gc_prop.has_profile():
@@ -999,14 +1064,16 @@ def search_and_apply_json_profile(json_entry: Dict[str, Dict[str, Union[str, Uni
             # the profile was not found, so we fill it with the default stuff
             profile.fill(property_value)
         else:
-            get_profile_from_dict(profile=profile, data=json_profile, collection=collection)
+            get_profile_from_dict(profile=profile, data=json_profile, collection=collection,
+                                  profile_blocks=profile_blocks)
 
 
 def parse_object_type_from_json(template_elm: ALL_DEV_TYPES,
                                 data_list: List[Dict[str, Dict[str, str]]],
                                 elements_dict_by_type: Dict[DeviceType, Dict[str, ALL_DEV_TYPES]],
                                 time_profile: pd.DatetimeIndex,
-                                logger: Logger):
+                                logger: Logger,
+                                profile_blocks: Union[None, Dict[str, ProfileBlockReader]] = None):
     """
 
     :param template_elm:
@@ -1014,6 +1081,7 @@ def parse_object_type_from_json(template_elm: ALL_DEV_TYPES,
     :param elements_dict_by_type:
     :param time_profile:
     :param logger:
+    :param profile_blocks: dictionary of binary profile blocks readers
     :return:
     """
     # dictionary to be filled with this type of objects
@@ -1131,7 +1199,8 @@ def parse_object_type_from_json(template_elm: ALL_DEV_TYPES,
                                 search_and_apply_json_profile(json_entry=json_entry,
                                                               gc_prop=gc_prop,
                                                               elm=elm,
-                                                              property_value=val)
+                                                              property_value=val,
+                                                              profile_blocks=profile_blocks)
 
                             elif gc_prop.tpe == float:
                                 # set the value directly
@@ -1140,7 +1209,8 @@ def parse_object_type_from_json(template_elm: ALL_DEV_TYPES,
                                 search_and_apply_json_profile(json_entry=json_entry,
                                                               gc_prop=gc_prop,
                                                               elm=elm,
-                                                              property_value=val)
+                                                              property_value=val,
+                                                              profile_blocks=profile_blocks)
 
                             elif gc_prop.tpe == int:
                                 # set the value directly
@@ -1149,7 +1219,8 @@ def parse_object_type_from_json(template_elm: ALL_DEV_TYPES,
                                 search_and_apply_json_profile(json_entry=json_entry,
                                                               gc_prop=gc_prop,
                                                               elm=elm,
-                                                              property_value=val)
+                                                              property_value=val,
+                                                              profile_blocks=profile_blocks)
 
                             elif gc_prop.tpe == bool:
                                 # set the value directly
@@ -1158,7 +1229,8 @@ def parse_object_type_from_json(template_elm: ALL_DEV_TYPES,
                                 search_and_apply_json_profile(json_entry=json_entry,
                                                               gc_prop=gc_prop,
                                                               elm=elm,
-                                                              property_value=val)
+                                                              property_value=val,
+                                                              profile_blocks=profile_blocks)
 
                             elif isinstance(gc_prop.tpe, EnumType):
 
@@ -1376,10 +1448,17 @@ def parse_gridcal_data(data: Dict[str, Union[str, float, pd.DataFrame, Dict[str,
     # New way of parsing information from .model files.
     # These files are just .json stored in the model_data inside the zip file
     model_data = data.get('model_data', None)
+    profile_blocks = data.get('model_profiles', None)
     if model_data is not None:
 
         if len(model_data) > 0:
 
+            format_data = model_data.get('format', None)
+            format_version = int(format_data['version']) if format_data is not None else 1
+            if format_version > MODEL_DATA_FORMAT_VERSION:
+                raise Exception(f"The model data format version {format_version} is newer than the supported "
+                                f"version {MODEL_DATA_FORMAT_VERSION}, please update GridCal to open this file")
+
             tdata = model_data.get('time', None)
             if tdata is not None:
                 circuit.set_unix_time(arr=tdata['unix'])
@@ -1408,7 +1487,8 @@ def parse_gridcal_data(data: Dict[str, Union[str, float, pd.DataFrame, Dict[str,
                                                                         data_list=data_list,
                                                                         elements_dict_by_type=elements_dict_by_type,
                                                                         time_profile=circuit.time_profile,
-                                                                        logger=logger)
+                                                                        logger=logger,
+                                                                        profile_blocks=profile_blocks)
 
                     # set/augment the dictionary per type for later
                     prev_dict = elements_dict_by_type.get(template_elm.device_type, dict())
@@ -0,0 +1,187 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from __future__ import annotations
+
+import zipfile
+import zlib
+import numpy as np
+from typing import Dict, List, Tuple, Union
+from GridCalEngine.basic_structures import Mat, NumericVec
+
+# folder inside the .gridcal zip file where the binary profile blocks are stored
+PROFILES_BLOCKS_FOLDER = "model_profiles"
+
+
+class ProfileBlocksCollector:
+    """
+    Collector of dense profiles to be stored as binary columnar blocks.
+    There is one block per object type and property, and each profile is one row of its block,
+    so that every profile is a contiguous slice of the block once loaded.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # block name -> list of arrays (rows)
+        self._rows: Dict[str, List[NumericVec]] = dict()
+
+    @staticmethod
+    def get_block_name(object_type_name: str, property_name: str) -> str:
+        """
+        Compose the block name
+        :param object_type_name: name of the object type (i.e. bus)
+        :param property_name: name of the property (i.e. active)
+        :return: block name
+        """
+        return object_type_name + "/" + property_name
+
+    def add(self, block_name: str, arr: NumericVec) -> Union[int, None]:
+        """
+        Add a dense profile array to a block
+        :param block_name: name of the block
+        :param arr: dense array of the profile
+        :return: row index of the profile in the block, None if the array cannot be stored in the block
+        """
+        if not isinstance(arr, np.ndarray) or arr.ndim != 1 or arr.dtype.kind not in 'biuf':
+            # only numeric arrays can be stored in binary form
+            return None
+
+        rows = self._rows.get(block_name, None)
+
+        if rows is None:
+            self._rows[block_name] = [arr]
+            return 0
+        else:
+            if len(arr) != len(rows[0]) or arr.dtype != rows[0].dtype:
+                # all the rows of a block must be alike
+                return None
+
+            rows.append(arr)
+            return len(rows) - 1
+
+    def get_blocks(self) -> Dict[str, Mat]:
+        """
+        Get the blocks
+        :return: dictionary of block name -> (n_profiles, nt) matrix
+        """
+        return {name: np.vstack(rows) for name, rows in self._rows.items()}
+
+    def __len__(self) -> int:
+        """
+        Number of blocks
+        :return: int
+        """
+        return len(self._rows)
+
+
+class ProfileBlockReader:
+    """
+    Lazy reader of a binary profiles block stored inside a .gridcal file.
+    The block is only read from the file the first time one of its rows is requested.
+    """
+
+    def __init__(self, file_name_zip: str, member_name: str, crc: int):
+        """
+        Constructor
+        :param file_name_zip: name of the zip file
+        :param member_name: name of the block file inside the zip file
+        :param crc: CRC of the member when the file was opened, used to detect if the file changed since
+        """
+        self.file_name_zip = file_name_zip
+
+        self.member_name = member_name
+
+        self.crc = crc
+
+        self._data: Union[Mat, None] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Has the block been read already?
+        :return: bool
+        """
+        return self._data is not None
+
+    def get_data(self) -> Mat:
+        """
+        Get the (n_profiles, nt) block, reading it from the file if needed
+        :return: Mat
+        """
+        if self._data is None:
+            try:
+                with zipfile.ZipFile(self.file_name_zip) as f_zip_ptr:
+                    info = f_zip_ptr.getinfo(self.member_name)
+
+                    if info.CRC != self.crc:
+                        raise Exception(f"The file {self.file_name_zip} changed since it was opened, "
+                                        f"the profiles of {self.member_name} cannot be read")
+
+                    with f_zip_ptr.open(self.member_name) as file_pointer:
+                        self._data = np.load(file_pointer)
+
+            except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile, zlib.error) as e:
+                # the file was moved, deleted or overwritten since it was opened
+                raise Exception(f"The profiles of {self.member_name} could not be read "
+                                f"from {self.file_name_zip}: {e}") from e
+
+        return self._data
+
+    def get_row(self, row: int) -> NumericVec:
+        """
+        Get a row of the block
+        :param row: row index
+        :return: view of the block row
+        """
+        return self.get_data()[row, :]
+
+
+class ProfileBlockRow:
+    """
+    Callable that provides a profile array from a row of a profiles block
+    """
+
+    def __init__(self, reader: ProfileBlockReader, row: int):
+        """
+        Constructor
+        :param reader: ProfileBlockReader
+        :param row: row index of the profile in the block
+        """
+        self.reader = reader
+
+        self.row = row
+
+    def __call__(self) -> NumericVec:
+        """
+        Get the profile array
+        :return: NumericVec
+        """
+        return self.reader.get_row(self.row)
+
+
+def get_block_name_from_member(member_name: str) -> Tuple[bool, str]:
+    """
+    Get the block name from the name of a file inside the zip file
+    :param member_name: name of the file inside the zip (without extension)
+    :return: is a profiles block?, block name
+    """
+    prefix = PROFILES_BLOCKS_FOLDER + "/"
+    if member_name.startswith(prefix):
+        return True, member_name[len(prefix):]
+    else:
+        return False, ""
@@ -21,192 +21,548 @@ import numpy as np
 import chardet
 import pandas as pd
 import zipfile
+import struct
+import time
+import zlib
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from warnings import warn
-from typing import List, Dict, Union, Callable
-from GridCalEngine.basic_structures import Logger
+from typing import List, Dict, Union, Callable, Tuple, Iterator
+from GridCalEngine.basic_structures import Logger, Mat
+from GridCalEngine.enumerations import FileCompression
 from GridCalEngine.IO.gridcal.generic_io_functions import parse_config_df, CustomJSONizer
+from GridCalEngine.IO.gridcal.profile_blocks import (PROFILES_BLOCKS_FOLDER, ProfileBlockReader,
+                                                     get_block_name_from_member)
 from GridCalEngine.Simulations.results_template import DriverToSave
 import GridCalEngine.Devices as dev
 
+try:
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
-def save_results_in_zip(f_zip_ptr: zipfile.ZipFile,
-                        filename_zip: str,
-                        sessions_data: List[DriverToSave],
-                        text_func: Union[None, Callable[[str], None]] = None,
-                        progress_func: Union[None, Callable[[float], None]] = None):
+# zip file member: (name inside the zip file, content, zip compression type)
+ZipMember = Tuple[str, Union[str, bytes], int]
+
+# zip file member already compressed: (ZipInfo with the CRC and sizes filled in, compressed content)
+RawZipMember = Tuple[zipfile.ZipInfo, bytes]
+
+# function that serializes one or more zip file members
+ZipMembersProducer = Callable[[], List[Union[ZipMember, RawZipMember]]]
+
+
+def get_default_number_of_threads() -> int:
     """
+    Number of threads used by default to serialize the zip file members
+    :return: int
+    """
+    return min(8, os.cpu_count() or 1)
 
-    :param f_zip_ptr:
-    :param filename_zip:
-    :param sessions_data:
-    :param text_func:
-    :param progress_func:
-    :return:
+
+def get_zip_compression(compression: FileCompression) -> int:
+    """
+    Get the zip compression type of the non-parquet members
+    :param compression: FileCompression
+    :return: zipfile compression type
     """
-    # pre-count the sessions
-    n_items = len(sessions_data)
+    if compression == FileCompression.Stored:
+        return zipfile.ZIP_STORED
+    else:
+        return zipfile.ZIP_DEFLATED
 
-    # save sessions
-    for i, session_data in enumerate(sessions_data):
 
-        if session_data.results is not None:
+def get_parquet_compression(compression: FileCompression,
+                            compression_level: Union[int, None] = None) -> Tuple[Union[str, None], Union[int, None]]:
+    """
+    Get the internal compression of the parquet members.
+    The parquet members are compressed internally, so they are stored in the zip file without further compression
+    :param compression: FileCompression
+    :param compression_level: compression level, None for the default
+    :return: parquet compression codec, compression level
+    """
+    if compression == FileCompression.Stored:
+        return None, None
+    elif compression == FileCompression.Zstd:
+        return 'zstd', compression_level
+    else:
+        return 'snappy', None
 
-            # traverse the registered results
-            for arr_name, arr_prop in session_data.results.data_variables.items():
 
-                filename = 'sessions/' + session_data.name + '/' + session_data.tpe.value + '/' + arr_name
+def df_to_parquet_bytes(df: pd.DataFrame,
+                        compression: FileCompression,
+                        compression_level: Union[int, None] = None) -> bytes:
+    """
+    Serialize a DataFrame into parquet
+    :param df: DataFrame
+    :param compression: FileCompression
+    :param compression_level: compression level, None for the default
+    :return: bytes
+    """
+    if not all(isinstance(c, str) for c in df.columns):
+        # fastparquet only accepts string column names (i.e. those of the results arrays)
+        df = df.rename(columns=str)
+
+    with BytesIO() as buffer:
+        if compression == FileCompression.Zstd:
+            codec, level = get_parquet_compression(compression=compression, compression_level=compression_level)
+            if level is not None and PYARROW_AVAILABLE:
+                # only pyarrow accepts the compression level, fastparquet uses its default
+                df.to_parquet(buffer, engine='pyarrow', compression=codec, compression_level=level)
+            else:
+                df.to_parquet(buffer, compression=codec)
+        else:
+            df.to_parquet(buffer)
+        return buffer.getvalue()
+
+
+def read_raw_member(f_zip_ptr: zipfile.ZipFile, member_name: str) -> RawZipMember:
+    """
+    Read the compressed content of a zip file member, without decompressing it
+    :param f_zip_ptr: zip file opened for reading
+    :param member_name: name of the member
+    :return: RawZipMember
+    """
+    info = f_zip_ptr.getinfo(member_name)
+
+    # skip the local file header, its name and extra field lengths may differ from the central directory ones
+    f_zip_ptr.fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, f_zip_ptr.fp.read(zipfile.sizeFileHeader))
+    name_length, extra_length = header[10], header[11]
+    f_zip_ptr.fp.seek(name_length + extra_length, os.SEEK_CUR)
+    data = f_zip_ptr.fp.read(info.compress_size)
+
+    zinfo = zipfile.ZipInfo(filename=info.filename, date_time=info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.external_attr = info.external_attr
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    return zinfo, data
+
+
+def compress_member(member: ZipMember, compression_level: Union[int, None] = None) -> RawZipMember:
+    """
+    Compress a zip file member, filling in its CRC and sizes.
+    This is the expensive part of writestr, and zlib releases the GIL, so it runs in parallel in the worker threads
+    :param member: ZipMember
+    :param compression_level: compression level of the deflated members, None for the default
+    :return: RawZipMember
+    """
+    filename, content, compress_type = member
+    data = content.encode('utf-8') if isinstance(content, str) else content
+
+    zinfo = zipfile.ZipInfo(filename=filename, date_time=time.localtime(time.time())[:6])
+    zinfo.compress_type = compress_type
+    zinfo.external_attr = 0o600 << 16  # permissions: ?rw-------, as writestr does
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+
+    if compress_type == zipfile.ZIP_DEFLATED:
+        # raw deflate stream (no zlib header), as stored in the zip files
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if compression_level is None else compression_level,
+                                      zlib.DEFLATED, -15)
+        data = compressor.compress(data) + compressor.flush()
+
+    elif compress_type != zipfile.ZIP_STORED:
+        raise ValueError(f"Unsupported zip compression type {compress_type}")
+
+    zinfo.compress_size = len(data)
+    return zinfo, data
+
+
+def write_raw_member(f_zip_ptr: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: bytes):
+    """
+    Write an already compressed member into a zip file (the counterpart of writestr without compression)
+    :param f_zip_ptr: zip file opened for writing
+    :param zinfo: ZipInfo with the compression type, CRC and sizes filled in
+    :param data: compressed content
+    """
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    zinfo.flag_bits = 0x00
+
+    f_zip_ptr.fp.seek(f_zip_ptr.start_dir)
+    zinfo.header_offset = f_zip_ptr.fp.tell()
+    f_zip_ptr.fp.write(zinfo.FileHeader(zip64))
+    f_zip_ptr.fp.write(data)
+    f_zip_ptr.start_dir = f_zip_ptr.fp.tell()
+
+    f_zip_ptr.filelist.append(zinfo)
+    f_zip_ptr.NameToInfo[zinfo.filename] = zinfo
+
+
+def write_zip_members(f_zip_ptr: zipfile.ZipFile,
+                      filename_zip: str,
+                      producers: List[ZipMembersProducer],
+                      compression: FileCompression = FileCompression.Deflated,
+                      compression_level: Union[int, None] = None,
+                      n_threads: Union[int, None] = None,
+                      text_func: Union[None, Callable[[str], None]] = None,
+                      progress_func: Union[None, Callable[[float], None]] = None):
+    """
+    Serialize and compress the zip members in worker threads and write them in order into the zip file.
+    Only a bounded number of serialized members is kept in memory at any time.
+    :param f_zip_ptr: zip file opened for writing
+    :param filename_zip: name of the zip file (for the messages)
+    :param producers: list of functions that serialize the members
+    :param compression: FileCompression
+    :param compression_level: compression level of the deflated members, None for the default
+    :param n_threads: number of worker threads, None for the default
+    :param text_func: pointer to function that prints the names
+    :param progress_func: pointer to function that prints the progress 0~100
+    """
+    n = len(producers)
+    if n_threads is None:
+        n_threads = get_default_number_of_threads()
+
+    deflate_level = compression_level if compression == FileCompression.Deflated else None
+
+    def produce(producer: ZipMembersProducer) -> List[RawZipMember]:
+        """
+        Serialize and compress the members of a producer (this runs in the worker threads)
+        :param producer: ZipMembersProducer
+        :return: list of compressed members
+        """
+        return [member if isinstance(member[0], zipfile.ZipInfo) else compress_member(member, deflate_level)
+                for member in producer()]
+
+    def write(k: int, members: List[RawZipMember]):
+        """
+        Write the members of a producer
+        :param k: producer index
+        :param members: list of compressed members
+        """
+        for zinfo, data in members:
+
+            if text_func is not None:
+                text_func('Flushing ' + zinfo.filename + ' to ' + filename_zip + '...')
+
+            write_raw_member(f_zip_ptr=f_zip_ptr, zinfo=zinfo, data=data)
+
+        if progress_func is not None:
+            progress_func((k + 1) / n * 100)
+
+    if n_threads > 1 and n > 1:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            pending = deque()
+            i = 0
+            for producer in producers:
+                pending.append(executor.submit(produce, producer))
+
+                if len(pending) >= 2 * n_threads:
+                    write(i, pending.popleft().result())
+                    i += 1
+
+            while len(pending):
+                write(i, pending.popleft().result())
+                i += 1
+    else:
+        for i, producer in enumerate(producers):
+            write(i, produce(producer))
+
+
+def get_results_producers(sessions_data: List[DriverToSave],
+                          compression: FileCompression = FileCompression.Deflated,
+                          compression_level: Union[int, None] = None) -> List[ZipMembersProducer]:
+    """
+    Get the functions that serialize the results of the sessions
+    :param sessions_data: List of DriverToSave instances
+    :param compression: FileCompression
+    :param compression_level: compression level, None for the default
+    :return: list of producers
+    """
+    producers: List[ZipMembersProducer] = list()
+
+    def array_producer(filename: str, arr: np.ndarray) -> ZipMembersProducer:
+        """
+        Get the serialization function of a results array
+        :param filename: name of the file (without extension)
+        :param arr: array to save
+        :return: producer
+        """
+
+        def producer() -> List[ZipMember]:
+            try:
+                if np.iscomplexobj(arr):
+                    data = df_to_parquet_bytes(df=pd.DataFrame(data=np.c_[arr.real, arr.imag]),
+                                               compression=compression,
+                                               compression_level=compression_level)
+                    return [(filename + "__complex__.parquet", data, zipfile.ZIP_STORED)]
+                else:
+                    data = df_to_parquet_bytes(df=pd.DataFrame(data=arr),
+                                               compression=compression,
+                                               compression_level=compression_level)
+                    return [(filename + ".parquet", data, zipfile.ZIP_STORED)]
 
-                if text_func is not None:
-                    text_func('Flushing ' + filename + ' to ' + filename_zip + '...')
+            except ValueError as e:
+                warn(str(e))
+                return list()
+
+        return producer
 
-                # get the array
-                arr = getattr(session_data.results, arr_name)
+    def logger_producer(filename: str, logger: Logger) -> ZipMembersProducer:
+        """
+        Get the serialization function of a session logger
+        :param filename: name of the file
+        :param logger: Logger
+        :return: producer
+        """
 
-                with BytesIO() as buffer:
-                    # pack the array into a DataFrame
+        def producer() -> List[ZipMember]:
+            data = df_to_parquet_bytes(df=logger.to_df(),
+                                       compression=compression,
+                                       compression_level=compression_level)
+            return [(filename, data, zipfile.ZIP_STORED)]
 
-                    try:
-                        if np.iscomplexobj(arr):
-                            filename += "__complex__"
-                            pd.DataFrame(data=np.c_[arr.real, arr.imag]).to_parquet(buffer)
-                        else:
-                            pd.DataFrame(data=arr).to_parquet(buffer)
+        return producer
 
-                        # save the buffer to the zip file
-                        f_zip_ptr.writestr(filename + ".parquet", buffer.getvalue())
+    for session_data in sessions_data:
 
-                    except ValueError as e:
-                        warn(str(e))
+        if session_data.results is not None:
 
-                if progress_func is not None:
-                    progress_func((i + 1) / n_items * 100)
+            # traverse the registered results
+            for arr_name, arr_prop in session_data.results.data_variables.items():
+                filename = 'sessions/' + session_data.name + '/' + session_data.tpe.value + '/' + arr_name
+                producers.append(array_producer(filename=filename,
+                                                arr=getattr(session_data.results, arr_name)))
 
         # save logger
         if session_data.logger is not None:
             filename = 'sessions/' + session_data.name + '/' + session_data.tpe.value + '/logger.parquet'
-            with BytesIO() as buffer:
-                # save the DataFrame to the buffer, protocol4 is to be compatible with python 3.6
-                session_data.logger.to_df().to_parquet(buffer)
-                # save the buffer to the zip file
-                f_zip_ptr.writestr(filename, buffer.getvalue())
+            producers.append(logger_producer(filename=filename, logger=session_data.logger))
+
+    return producers
+
+
+def save_results_in_zip(f_zip_ptr: zipfile.ZipFile,
+                        filename_zip: str,
+                        sessions_data: List[DriverToSave],
+                        text_func: Union[None, Callable[[str], None]] = None,
+                        progress_func: Union[None, Callable[[float], None]] = None,
+                        compression: FileCompression = FileCompression.Deflated,
+                        compression_level: Union[int, None] = None,
+                        n_threads: Union[int, None] = None):
+    """
+    Save the sessions results in a zip file
+    :param f_zip_ptr: zip file opened for writing
+    :param filename_zip: name of the zip file
+    :param sessions_data: List of DriverToSave instances
+    :param text_func: pointer to function that prints the names
+    :param progress_func: pointer to function that prints the progress 0~100
+    :param compression: FileCompression
+    :param compression_level: compression level, None for the default
+    :param n_threads: number of worker threads, None for the default
+    """
+    write_zip_members(f_zip_ptr=f_zip_ptr,
+                      filename_zip=filename_zip,
+                      producers=get_results_producers(sessions_data=sessions_data,
+                                                      compression=compression,
+                                                      compression_level=compression_level),
+                      compression=compression,
+                      compression_level=compression_level,
+                      n_threads=n_threads,
+                      text_func=text_func,
+                      progress_func=progress_func)
 
 
 def save_gridcal_data_to_zip(dfs: Dict[str, pd.DataFrame],
                              filename_zip: str,
                              model_data: Dict[str, Dict[str, str]],
                              sessions_data: List[DriverToSave],
-                             diagrams: List[Union[dev.MapDiagram, dev.SchematicDiagram]],
+                             diagrams: List[Union[dev.MapDiagram, dev.SchematicDiagram, Dict]],
                              json_files: Dict[str, dict],
                              text_func: Union[None, Callable[[str], None]] = None,
                              progress_func: Union[None, Callable[[float], None]] = None,
-                             logger=Logger()):
+                             logger=Logger(),
+                             profile_blocks: Union[None, Dict[str, Mat]] = None,
+                             compression: FileCompression = FileCompression.Deflated,
+                             compression_level: Union[int, None] = None,
+                             n_threads: Union[int, None] = None,
+                             base_file_zip: Union[str, None] = None,
+                             copied_members: Union[List[str], None] = None):
     """
-    Save a list of DataFrames to a zip file without saving to disk the csv files
+    Save a list of DataFrames to a zip file without saving to disk the csv files.
+    The file is written under a temporary name and renamed at the end, so that an interrupted save
+    never leaves a broken file behind.
     :param dfs: dictionary of pandas dataFrames {name: DataFrame}
     :param filename_zip: file name where to save all
     :param model_data: dictionary of json data opposed to the dataframes collection
     :param sessions_data: List of DriverToSave instances, representing the results drivers data
-    :param diagrams: List of Diagram objects
+    :param diagrams: List of Diagram objects (or their data dictionaries)
     :param json_files: List of configuration json files to save Dict[file_name, dictionary to save]
     :param text_func: pointer to function that prints the names
     :param progress_func: pointer to function that prints the progress 0~100
     :param logger: Logger object
+    :param profile_blocks: dictionary of binary profile blocks {block name: (n_profiles, nt) matrix}
+    :param compression: FileCompression
+    :param compression_level: compression level (deflate: 0~9, zstd: 1~22), None for the default
+    :param n_threads: number of threads used to serialize the members, None for the default
+    :param base_file_zip: zip file where the copied members are taken from (it may be filename_zip itself)
+    :param copied_members: names of the members copied as they are from base_file_zip
     """
-
-    n = len(dfs)
-    n_failed = 0
-    # open zip file for writing
-    with zipfile.ZipFile(filename_zip, 'w', zipfile.ZIP_DEFLATED) as f_zip_ptr:
-
-        # save the config files
-        for name, value in json_files.items():
-            filename = name + ".json"
-            f_zip_ptr.writestr(filename, json.dumps(value))
-
-        # save the GridCal object as json data
-        for object_type_name, object_data in model_data.items():
+    zip_compression = get_zip_compression(compression)
+    producers: List[ZipMembersProducer] = list()
+    failed_profiles = list()
+
+    # copy the unchanged members of the previous file
+    def copy_producer(member_name: str) -> ZipMembersProducer:
+        """
+        Get the copy function of a member of the base file
+        :param member_name: name of the member
+        :return: producer
+        """
+
+        def producer() -> List[RawZipMember]:
+            # the compressed bytes are copied as they are, without decompressing and compressing them again
+            with zipfile.ZipFile(base_file_zip) as f_base_ptr:
+                return [read_raw_member(f_zip_ptr=f_base_ptr, member_name=member_name)]
+
+        return producer
+
+    if base_file_zip is not None and copied_members is not None:
+        for member_name in copied_members:
+            producers.append(copy_producer(member_name=member_name))
+
+    # save the config files
+    for name, value in json_files.items():
+        producers.append(lambda name=name, value=value: [(name + ".json", json.dumps(value), zip_compression)])
+
+    # save the GridCal object as json data
+    def model_producer(object_type_name: str, object_data) -> ZipMembersProducer:
+        """
+        Get the serialization function of the model data of an object type
+        :param object_type_name: name of the object type
+        :param object_data: json data
+        :return: producer
+        """
+
+        def producer() -> List[ZipMember]:
             filename = "model_data/" + object_type_name + ".model"
             try:
-                f_zip_ptr.writestr(filename, json.dumps(object_data, indent=4, cls=CustomJSONizer))
+                return [(filename, json.dumps(object_data, indent=4, cls=CustomJSONizer), zip_compression)]
             except TypeError as e:
                 logger.add_error(msg=str(e), device_class=object_type_name)
                 warn(f"{object_type_name}: {e}")
+                return list()
 
-        # save diagrams
-        for diagram in diagrams:
-            filename = "diagrams/" + diagram.idtag + ".diagram"
-            f_zip_ptr.writestr(filename, json.dumps(diagram.get_data_dict(), indent=4))
+        return producer
 
-        # for each DataFrame and name...
-        i = 0
-        for name, df in dfs.items():
+    for object_type_name, object_data in model_data.items():
+        producers.append(model_producer(object_type_name=object_type_name, object_data=object_data))
 
-            if text_func is not None:
-                text_func('Flushing ' + name + ' to ' + filename_zip + '...')
-
-            if progress_func is not None:
-                progress_func((i + 1) / n * 100)
+    # save the binary profile blocks referenced from the model data
+    def block_producer(block_name: str, block: Mat) -> ZipMembersProducer:
+        """
+        Get the serialization function of a binary profiles block
+        :param block_name: name of the block
+        :param block: (n_profiles, nt) matrix
+        :return: producer
+        """
 
+        def producer() -> List[ZipMember]:
+            with BytesIO() as buffer:
+                np.save(buffer, block, allow_pickle=False)
+                return [(PROFILES_BLOCKS_FOLDER + "/" + block_name + ".npy", buffer.getvalue(), zip_compression)]
+
+        return producer
+
+    if profile_blocks is not None:
+        for block_name, block in profile_blocks.items():
+            producers.append(block_producer(block_name=block_name, block=block))
+
+    # save diagrams
+    for diagram in diagrams:
+        diagram_data = diagram if isinstance(diagram, dict) else diagram.get_data_dict()
+        producers.append(lambda diagram_data=diagram_data: [("diagrams/" + diagram_data['idtag'] + ".diagram",
+                                                             json.dumps(diagram_data, indent=4),
+                                                             zip_compression)])
+
+    # for each DataFrame and name...
+    def df_producer(name: str, df: pd.DataFrame) -> ZipMembersProducer:
+        """
+        Get the serialization function of a DataFrame
+        :param name: name of the DataFrame
+        :param df: DataFrame
+        :return: producer
+        """
+
+        def producer() -> List[ZipMember]:
             if name.endswith('_prof'):
-
-                # compose the csv file name
-                filename = name + ".parquet"
-
-                # open a string buffer
                 try:  # try parquet file
-                    with BytesIO() as buffer:
-                        # save the DataFrame to the buffer, protocol4 is to be compatible with python 3.6
-                        df.to_parquet(buffer)
-                        # save the buffer to the zip file
-                        f_zip_ptr.writestr(filename, buffer.getvalue())
+                    data = df_to_parquet_bytes(df=df, compression=compression, compression_level=compression_level)
+                    return [(name + ".parquet", data, zipfile.ZIP_STORED)]
 
                 except:  # otherwise just use csv
-                    n_failed += 1
-                    filename = name + ".csv"
+                    failed_profiles.append(name)
                     with StringIO() as buffer:
                         df.to_csv(buffer, index=False)  # save the DataFrame to the buffer
-                        f_zip_ptr.writestr(filename, buffer.getvalue())  # save the buffer to the zip file
+                        return [(name + ".csv", buffer.getvalue(), zip_compression)]
             else:
-                # compose the csv file name
-                filename = name + ".csv"
-
-                # open a string buffer
                 with StringIO() as buffer:
                     df.to_csv(buffer, index=False)  # save the DataFrame to the buffer
-                    f_zip_ptr.writestr(filename, buffer.getvalue())  # save the buffer to the zip file
+                    return [(name + ".csv", buffer.getvalue(), zip_compression)]
 
-            i += 1
+        return producer
 
-        # Save the results into the zip file
-        save_results_in_zip(f_zip_ptr=f_zip_ptr,
-                            filename_zip=filename_zip,
-                            sessions_data=sessions_data,
-                            text_func=text_func,
-                            progress_func=progress_func)
+    for name, df in dfs.items():
+        producers.append(df_producer(name=name, df=df))
+
+    # Save the results into the zip file
+    producers += get_results_producers(sessions_data=sessions_data,
+                                       compression=compression,
+                                       compression_level=compression_level)
 
-    if n_failed:
+    # open a temporary zip file for writing, next to the final one
+    tmp_filename_zip = filename_zip + ".tmp"
+    try:
+        with zipfile.ZipFile(tmp_filename_zip, 'w', zip_compression) as f_zip_ptr:
+            write_zip_members(f_zip_ptr=f_zip_ptr,
+                              filename_zip=filename_zip,
+                              producers=producers,
+                              compression=compression,
+                              compression_level=compression_level,
+                              n_threads=n_threads,
+                              text_func=text_func,
+                              progress_func=progress_func)
+
+        os.replace(tmp_filename_zip, filename_zip)
+    finally:
+        if os.path.exists(tmp_filename_zip):
+            os.remove(tmp_filename_zip)
+
+    if len(failed_profiles):
         print('Failed to pickle several profiles, but saved them as csv.\nFor improved speed install Pandas >= 1.2')
 
 
 def save_results_only(filename_zip: str,
                       sessions_data: List[DriverToSave],
                       text_func: Union[None, Callable[[str], None]] = None,
-                      progress_func: Union[None, Callable[[float], None]] = None):
+                      progress_func: Union[None, Callable[[float], None]] = None,
+                      compression: FileCompression = FileCompression.Deflated,
+                      compression_level: Union[int, None] = None,
+                      n_threads: Union[int, None] = None):
     """
     Save the results into a new file
     :param filename_zip: name of the zip file
     :param sessions_data: Sessions to save
     :param text_func: Text progress function
     :param progress_func: Numerical progress function
+    :param compression: FileCompression
+    :param compression_level: compression level, None for the default
+    :param n_threads: number of threads used to serialize the members, None for the default
     """
     # open zip file for writing
-    with zipfile.ZipFile(filename_zip, 'w', zipfile.ZIP_DEFLATED) as f_zip_ptr:
+    with zipfile.ZipFile(filename_zip, 'w', get_zip_compression(compression)) as f_zip_ptr:
         # Save the results into the zip file
         save_results_in_zip(f_zip_ptr=f_zip_ptr,
                             filename_zip=filename_zip,
                             sessions_data=sessions_data,
                             text_func=text_func,
-                            progress_func=progress_func)
+                            progress_func=progress_func,
+                            compression=compression,
+                            compression_level=compression_level,
+                            n_threads=n_threads)
 
 
 def read_data_frame_from_zip(file_pointer,
@@ -291,7 +647,8 @@ def get_frames_from_zip(file_name_zip: str,
     :return: list of DataFrames
     """
     data = {'diagrams': list(),
-            'model_data': dict()}
+            'model_data': dict(),
+            'model_profiles': dict()}
     json_files = dict()
 
     # open the zip file
@@ -316,6 +673,18 @@ def get_frames_from_zip(file_name_zip: str,
         if progress_func is not None:
             progress_func((i + 1) / n * 100)
 
+        if name.lower().startswith('sessions/'):
+            # the results are only read when requested, see load_session_driver_objects
+            continue
+
+        is_block, block_name = get_block_name_from_member(name)
+        if is_block:
+            # binary profile blocks are read the first time any of their profiles is accessed
+            data['model_profiles'][block_name] = ProfileBlockReader(file_name_zip=file_name_zip,
+                                                                    member_name=file_name,
+                                                                    crc=zip_file_pointer.getinfo(file_name).CRC)
+            continue
+
         # create a buffer to read the file
         file_pointer = zip_file_pointer.open(file_name)
 
@@ -410,40 +779,90 @@ def get_session_tree(file_name_zip: str):
     return data
 
 
+class ZipResultsData(Mapping):
+    """
+    Read-only dictionary of the results arrays of a study stored in a zip file.
+    Each array is only read from the file the first time it is requested.
+    """
+
+    def __init__(self, file_name_zip: str, members: Dict[str, str]):
+        """
+        Constructor
+        :param file_name_zip: name of the zip file
+        :param members: dictionary of array name -> name of the file inside the zip file
+        """
+        self.file_name_zip = file_name_zip
+
+        self.members = members
+
+        self._data: Dict[str, Union[None, pd.DataFrame]] = dict()
+
+    def is_loaded(self, key: str) -> bool:
+        """
+        Has the array been read already?
+        :param key: array name
+        :return: bool
+        """
+        return key in self._data
+
+    def __getitem__(self, key: str) -> Union[None, pd.DataFrame]:
+        """
+        Get an array, reading it from the file if needed
+        :param key: array name
+        :return: DataFrame or None if it could not be read
+        """
+        if key not in self._data:
+            member_name = self.members[key]  # raises KeyError if the array does not exist
+            _, extension = os.path.splitext(member_name)
+
+            with zipfile.ZipFile(self.file_name_zip) as zip_file_pointer:
+                with zip_file_pointer.open(member_name) as file_pointer:
+                    self._data[key] = read_data_frame_from_zip(file_pointer, extension)
+
+        return self._data[key]
+
+    def __contains__(self, key: str) -> bool:
+        # check the members without reading the array
+        return key in self.members
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.members)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
 def load_session_driver_objects(file_name_zip: str,
                                 session_name: str,
-                                study_name: str) -> Dict[str, Union[None, pd.DataFrame]]:
+                                study_name: str) -> Union[ZipResultsData, Dict[str, Union[None, pd.DataFrame]]]:
     """
-    Get the sessions structure
-    :param file_name_zip:
-    :param session_name:
-    :param study_name:
-    :return: Dict[str, Union[None, pd.DataFrame]]
+    Get the results of a study stored in the file.
+    The arrays are only read from the file when they are accessed
+    :param file_name_zip: name of the zip file
+    :param session_name: name of the session
+    :param study_name: name of the study
+    :return: ZipResultsData (dictionary-like array name -> DataFrame)
     """
     try:
         zip_file_pointer = zipfile.ZipFile(file_name_zip)
     except zipfile.BadZipFile:
         return dict()
 
-    data = dict()
+    members = dict()
 
     # traverse the zip names and pick all those that start with sessions_data/session_name/study_name
-    for name in zip_file_pointer.namelist():
-        if '/' in name:
-            path = name.split('/')
-            if len(path) > 3:
-                if path[0].lower() == 'sessions' and session_name == path[1] and study_name == path[2]:
-                    # create a buffer to read the file
-                    file_pointer = zip_file_pointer.open(name)
-
-                    # split the file name into name and extension
-                    _, extension = os.path.splitext(name)
-                    arr_name = path[3].replace(extension, '')
-
-                    # read the data
-                    data[arr_name] = read_data_frame_from_zip(file_pointer, extension)
-
-    return data
+    with zip_file_pointer:
+        for name in zip_file_pointer.namelist():
+            if '/' in name:
+                path = name.split('/')
+                if len(path) > 3:
+                    if path[0].lower() == 'sessions' and session_name == path[1] and study_name == path[2]:
+                        # split the file name into name and extension
+                        _, extension = os.path.splitext(name)
+                        arr_name = path[3].replace(extension, '')
+                        members[arr_name] = name
+
+    return ZipResultsData(file_name_zip=file_name_zip, members=members)
 
 
 def get_xml_content(file_ptr: zipfile.ZipExtFile) -> List[str]:
@@ -17,6 +17,7 @@
 from __future__ import annotations
 import numpy as np
 import numba as nb
+import scipy.sparse as sp
 from typing import Tuple, List, Union, TYPE_CHECKING
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at
@@ -152,24 +153,58 @@ def compute_alpha(ptdf, P0, Pgen, Pinstalled, Pload, bus_a1_idx, bus_a2_idx, dT=
     return alpha
 
 
-@nb.njit()
-def compute_atc_list(br_idx: IntVec, contingency_br_idx: IntVec, lodf: Mat, alpha: Vec, flows: Vec, rates: Vec,
-                     contingency_rates: Vec, base_exchange: float, threshold: float,
-                     time_idx: int) -> List[
-    Tuple[int, int, int, float, float, float, float, float, float, float, float, float, float, float, float]]:
+def get_pruned_lodf(lodf: Union[Mat, sp.spmatrix],
+                    br_idx: IntVec,
+                    contingency_br_idx: IntVec,
+                    threshold: float) -> Tuple[IntVec, IntVec, Vec]:
     """
-    Compute all lines' available transfer capacity (ATC)
-    :param br_idx: array of branch indices to analyze
+    Get the LODF entries that are relevant for the ATC: the monitored rows and contingency columns
+    where abs(lodf[m, c]) > threshold and m != c. Only those entries of the LODF are read.
+    :param lodf: Line outage distribution factors (n-branch, n-branch), dense or sparse
+    :param br_idx: array of monitored branch indices
     :param contingency_br_idx: array of branch indices to fail
-    :param lodf: Line outage distribution factors (n-branch, n-outage branch)
-    :param alpha: Branch sensitivities to the exchange [p.u.]
-    :param flows: Branches power injected at the "from" side [MW]
-    :param rates: all Branches rates vector
-    :param contingency_rates: all Branches contingency rates vector
-    :param base_exchange: amount already exchanges between areas
+    :param threshold: LODF threshold
+    :return: CSR structure of the pruned LODF, with one row per monitored branch:
+             indptr (len(br_idx) + 1), contingency branch indices, LODF values
+    """
+    if sp.issparse(lodf):
+        sub = sp.csr_matrix(lodf)[br_idx, :][:, contingency_br_idx].tocoo()
+        order = np.lexsort((sub.col, sub.row))
+        rows = sub.row[order]
+        cols = sub.col[order]
+        values = sub.data[order]
+    else:
+        sub = lodf[np.ix_(br_idx, contingency_br_idx)]
+        rows, cols = np.nonzero(np.abs(sub) > threshold)
+        values = sub[rows, cols]
+
+    keep = (np.abs(values) > threshold) & (br_idx[rows] != contingency_br_idx[cols])
+    rows = rows[keep]
+
+    indptr = np.zeros(len(br_idx) + 1, dtype=int)
+    indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(br_idx)))
+
+    return indptr, contingency_br_idx[cols[keep]], values[keep]
+
+
+@nb.njit(parallel=True, cache=True)
+def compute_atc_report(br_idx: IntVec, lodf_indptr: IntVec, lodf_c_idx: IntVec, lodf_values: Vec,
+                       alpha: Mat, flows: Mat, rates: Mat, contingency_rates: Mat,
+                       base_exchange: Vec, time_idx: IntVec, threshold: float) -> Mat:
+    """
+    Compute all lines' available transfer capacity (ATC) for a number of time steps sharing the same LODF
+    :param br_idx: array of branch indices to analyze
+    :param lodf_indptr: pruned LODF row pointers (len(br_idx) + 1), see get_pruned_lodf
+    :param lodf_c_idx: pruned LODF contingency branch indices
+    :param lodf_values: pruned LODF values
+    :param alpha: Branch sensitivities to the exchange (nt, n-branch) [p.u.]
+    :param flows: Branches power injected at the "from" side (nt, n-branch) [MW]
+    :param rates: all Branches rates (nt, n-branch)
+    :param contingency_rates: all Branches contingency rates (nt, n-branch)
+    :param base_exchange: amount already exchanged between areas (nt)
+    :param time_idx: time index of each of the time steps (nt)
     :param threshold: value that determines if a line is studied for the ATC calculation
-    :param time_idx: time index of the calculation
-    :return: List of:
+    :return: report matrix (n-entries, 15) grouped by time step and monitored branch, where the columns are:
         time_idx,  # 0
         monitored index,  # 1
         contingency index,  # 2
@@ -186,65 +221,110 @@ def compute_atc_list(br_idx: IntVec, contingency_br_idx: IntVec, lodf: Mat, alph
         contingency loading,  # 13
         base_exchange #14
     """
-
-    results = list()
-
-    for im, m in enumerate(br_idx):  # for each branch
-
-        # if abs(alpha[m]) > threshold and abs(flows[m]) < rates[m]:  # if the branch is relevant enough for the ATC...
-        if abs(alpha[m]) > threshold:  # if the branch is relevant enough for the ATC...
+    nt = alpha.shape[0]
+    nm = len(br_idx)
+    n = nt * nm
+
+    # count the entries of every (time, monitored branch) pair
+    counts = np.zeros(n, dtype=np.int64)
+    for k in nb.prange(n):
+        it = k // nm
+        m = br_idx[k % nm]
+
+        if abs(alpha[it, m]) > threshold:  # if the branch is relevant enough for the ATC...
+            cnt = 0
+            for p in range(lodf_indptr[k % nm], lodf_indptr[k % nm + 1]):
+                beta = alpha[it, m] + lodf_values[p] * alpha[it, lodf_c_idx[p]]
+                if abs(beta) > threshold:
+                    cnt += 1
+            counts[k] = cnt
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+
+    report = np.empty((offsets[n], 15))
+
+    # fill in the report at the precomputed positions
+    for k in nb.prange(n):
+
+        if counts[k] > 0:
+            it = k // nm
+            im = k % nm
+            m = br_idx[im]
+            a = alpha[it, m]
 
             # compute the ATC in "N"
-            if alpha[m] == 0:
+            if a == 0:
                 atc_n = np.inf
-            elif alpha[m] > 0:
-                atc_n = (rates[m] - flows[m]) / alpha[m]
+            elif a > 0:
+                atc_n = (rates[it, m] - flows[it, m]) / a
             else:
-                atc_n = (-rates[m] - flows[m]) / alpha[m]
+                atc_n = (-rates[it, m] - flows[it, m]) / a
 
             # explore the ATC in "N-1"
-            for ic, c in enumerate(contingency_br_idx):  # for each contingency
+            i = offsets[k]
+            for p in range(lodf_indptr[im], lodf_indptr[im + 1]):  # for each relevant contingency
+                c = lodf_c_idx[p]
+                lodf_mc = lodf_values[p]
 
                 # compute the exchange sensitivity in contingency conditions
-                beta = alpha[m] + lodf[m, c] * alpha[c]
+                beta = a + lodf_mc * alpha[it, c]
 
-                if m != c and abs(lodf[m, c]) > threshold and abs(beta) > threshold:
+                if abs(beta) > threshold:
 
                     # compute the contingency flow
-                    contingency_flow = flows[m] + lodf[m, c] * flows[c]
-
-                    # now here, do compare with the base situation
-                    # if abs(contingency_flow) <= contingency_rates[m]:
+                    contingency_flow = flows[it, m] + lodf_mc * flows[it, c]
 
                     # compute the ATC in "N-1"
                     if beta == 0:
                         atc_mc = np.inf
                     elif beta > 0:
-                        atc_mc = (contingency_rates[m] - contingency_flow) / beta
+                        atc_mc = (contingency_rates[it, m] - contingency_flow) / beta
                     else:
-                        atc_mc = (-contingency_rates[m] - contingency_flow) / beta
+                        atc_mc = (-contingency_rates[it, m] - contingency_flow) / beta
 
                     final_atc = min(atc_mc, atc_n)
-                    ntc = final_atc + base_exchange
-
-                    # refine the ATC to the most restrictive value every time
-                    results.append((time_idx,  # 0
-                                    m,  # 1
-                                    c,  # 2
-                                    alpha[m],  # 3
-                                    beta,  # 4
-                                    lodf[m, c],  # 5
-                                    atc_n,  # 6
-                                    atc_mc,  # 7
-                                    final_atc,  # 8
-                                    ntc,  # 9
-                                    flows[m],  # 10
-                                    contingency_flow,  # 11
-                                    flows[m] / (rates[m] + 1e-9) * 100.0,  # 12
-                                    contingency_flow / (contingency_rates[m] + 1e-9) * 100.0,  # 13
-                                    base_exchange))  # 14
-
-    return results
+
+                    report[i, 0] = time_idx[it]
+                    report[i, 1] = m
+                    report[i, 2] = c
+                    report[i, 3] = a
+                    report[i, 4] = beta
+                    report[i, 5] = lodf_mc
+                    report[i, 6] = atc_n
+                    report[i, 7] = atc_mc
+                    report[i, 8] = final_atc
+                    report[i, 9] = final_atc + base_exchange[it]
+                    report[i, 10] = flows[it, m]
+                    report[i, 11] = contingency_flow
+                    report[i, 12] = flows[it, m] / (rates[it, m] + 1e-9) * 100.0
+                    report[i, 13] = contingency_flow / (contingency_rates[it, m] + 1e-9) * 100.0
+                    report[i, 14] = base_exchange[it]
+                    i += 1
+
+    return report
+
+
+def sort_and_curtail_atc_report(report: Mat, max_report_elements: int = 0) -> Mat:
+    """
+    Sort the ATC report by NTC within each time step, and keep the most restrictive entries
+    :param report: report matrix produced by compute_atc_report
+    :param max_report_elements: maximum number of entries per time step (<= 0 to keep all)
+    :return: sorted and curtailed report
+    """
+    if report.shape[0] == 0:
+        return report
+
+    report = report[np.lexsort((report[:, 9], report[:, 0])), :]
+
+    if max_report_elements > 0:
+        # position of each entry within its time step
+        n = report.shape[0]
+        starts = np.r_[0, np.nonzero(np.diff(report[:, 0]))[0] + 1]
+        position = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+        report = report[position < max_report_elements, :]
+
+    return report
 
 
 class AvailableTransferCapacityResults(ResultsTemplate):
@@ -508,25 +588,26 @@ class AvailableTransferCapacityDriver(DriverTemplate):
                                   * self.options.Pf_hvdc[self.options.idx_hvdc_br]).sum()
 
         # compute ATC
-        report = compute_atc_list(br_idx=br_idx,
-                                  contingency_br_idx=con_br_idx,
-                                  lodf=linear.LODF,
-                                  alpha=alpha,
-                                  flows=flows,
-                                  rates=nc.Rates,
-                                  contingency_rates=nc.ContingencyRates,
-                                  base_exchange=base_exchange,
-                                  time_idx=0,
-                                  threshold=self.options.threshold)
-        if len(report):
-            report = np.array(report, dtype=object)
-            # sort by NTC
-            report = report[report[:, 9].argsort()]
-            # curtail report
-            if self.options.max_report_elements > 0:
-                report = report[:self.options.max_report_elements, :]
-        else:
-            report = np.zeros((0, 15), dtype=object)
+        lodf_indptr, lodf_c_idx, lodf_values = get_pruned_lodf(lodf=linear.LODF,
+                                                               br_idx=br_idx,
+                                                               contingency_br_idx=con_br_idx,
+                                                               threshold=self.options.threshold)
+
+        report = compute_atc_report(br_idx=br_idx,
+                                    lodf_indptr=lodf_indptr,
+                                    lodf_c_idx=lodf_c_idx,
+                                    lodf_values=lodf_values,
+                                    alpha=alpha.reshape(1, -1),
+                                    flows=np.asarray(flows, dtype=float).reshape(1, -1),
+                                    rates=nc.Rates.reshape(1, -1),
+                                    contingency_rates=nc.ContingencyRates.reshape(1, -1),
+                                    base_exchange=np.array([base_exchange], dtype=float),
+                                    time_idx=np.zeros(1, dtype=int),
+                                    threshold=self.options.threshold)
+
+        # sort by NTC and curtail the report
+        report = sort_and_curtail_atc_report(report=report,
+                                             max_report_elements=self.options.max_report_elements)
 
         # post-process and store the results
         self.results.raw_report = report
@@ -43,7 +43,8 @@ class AvailableTransferCapacityOptions(OptionsTemplate):
                  mode: AvailableTransferMode = AvailableTransferMode.Generation,
                  max_report_elements: int = -1,
                  use_clustering: bool = False,
-                 cluster_number: int = 200):
+                 cluster_number: int = 200,
+                 time_steps_batch_size: int = 64):
         """
         Available Transfer Capacity Options
         :param distributed_slack: Distribute the slack effect?
@@ -64,6 +65,8 @@ class AvailableTransferCapacityOptions(OptionsTemplate):
         :param mode: AvailableTransferMode
         :param max_report_elements: maximum number of elements to show in the report (-1 for all)
         :param use_clustering: Use clustering?
+        :param cluster_number: number of clusters
+        :param time_steps_batch_size: maximum number of time steps evaluated per ATC kernel call
         """
         OptionsTemplate.__init__(self, name="AvailableTransferCapacityOptions")
 
@@ -91,6 +94,7 @@ class AvailableTransferCapacityOptions(OptionsTemplate):
         self.max_report_elements = max_report_elements
         self.use_clustering = use_clustering
         self.cluster_number = cluster_number
+        self.time_steps_batch_size = time_steps_batch_size
 
         self.register(key="distributed_slack", tpe=bool)
         self.register(key="correct_values", tpe=bool)
@@ -111,3 +115,4 @@ class AvailableTransferCapacityOptions(OptionsTemplate):
         self.register(key="max_report_elements", tpe=int)
         self.register(key="use_clustering", tpe=bool)
         self.register(key="cluster_number", tpe=int)
+        self.register(key="time_steps_batch_size", tpe=int)
@@ -21,10 +21,11 @@ from typing import Union, List
 
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at
-from GridCalEngine.Simulations.LinearFactors.linear_analysis_options import LinearAnalysisOptions
-from GridCalEngine.Simulations.LinearFactors.linear_analysis_ts_driver import LinearAnalysisTimeSeriesDriver
+from GridCalEngine.DataStructures.numerical_circuit import NumericalCircuit
 from GridCalEngine.Simulations.LinearFactors.linear_analysis import LinearAnalysis
-from GridCalEngine.Simulations.ATC.available_transfer_capacity_driver import compute_atc_list, compute_alpha
+from GridCalEngine.Simulations.ATC.available_transfer_capacity_driver import (compute_atc_report, compute_alpha,
+                                                                              get_pruned_lodf,
+                                                                              sort_and_curtail_atc_report)
 from GridCalEngine.Simulations.ATC.available_transfer_capacity_options import AvailableTransferCapacityOptions
 from GridCalEngine.Simulations.results_table import ResultsTable
 from GridCalEngine.Simulations.results_template import ResultsTemplate
@@ -34,6 +35,18 @@ from GridCalEngine.basic_structures import Vec, Mat, IntVec, StrVec, DateVec
 from GridCalEngine.enumerations import StudyResultsType, AvailableTransferMode, ResultTypes, DeviceType, SimulationTypes
 
 
+def get_linear_structure_key(nc: NumericalCircuit) -> bytes:
+    """
+    Get a key that changes whenever the PTDF and LODF of the numerical circuit would change
+    :param nc: NumericalCircuit
+    :return: bytes
+    """
+    return b''.join((nc.branch_data.active.tobytes(),
+                     nc.branch_data.tap_module.tobytes(),
+                     nc.bus_data.active.tobytes(),
+                     np.asarray(nc.bus_types).tobytes()))
+
+
 class AvailableTransferCapacityTimeSeriesResults(ResultsTemplate):
     """
     AvailableTransferCapacityTimeSeriesResults
@@ -253,22 +266,13 @@ class AvailableTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
                       AvailableTransferMode.Load: 2,
                       AvailableTransferMode.GenerationAndLoad: 3}
 
-        # declare the linear analysis
         self.report_text("Analyzing...")
         self.report_progress(0.0)
 
-        la_options = LinearAnalysisOptions(
-            distribute_slack=self.options.distributed_slack,
-            correct_values=self.options.correct_values,
-        )
-
-        la_driver = LinearAnalysisTimeSeriesDriver(
-            grid=self.grid,
-            options=la_options,
-            time_indices=self.time_indices
-        )
-
-        la_driver.run()
+        if self.options.use_provided_flows and self.options.Pf is None:
+            msg = 'The option to use the provided flows is enabled, but no flows are available'
+            self.logger.add_error(msg)
+            raise Exception(msg)
 
         # get the branch indices to analyze
         nc = compile_numerical_circuit_at(self.grid, logger=self.logger)
@@ -278,29 +282,68 @@ class AvailableTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
         # declare the results
         self.results.clear()
 
+        # the time steps are evaluated in batches that share the same PTDF and LODF
+        reports: List[Mat] = list()
+        batch = {'t': list(), 'alpha': list(), 'flows': list(), 'base_exchange': list()}
+        structure_key = None
+        lodf_indptr, lodf_c_idx, lodf_values = None, None, None
+        linear_analysis = None
+
+        def flush_batch():
+            """
+            Compute the ATC of the accumulated time steps
+            """
+            if len(batch['t']):
+                t_idx = np.array(batch['t'], dtype=int)
+                report = compute_atc_report(br_idx=br_idx,
+                                            lodf_indptr=lodf_indptr,
+                                            lodf_c_idx=lodf_c_idx,
+                                            lodf_values=lodf_values,
+                                            alpha=np.array(batch['alpha']),
+                                            flows=np.array(batch['flows'], dtype=float),
+                                            rates=self.results.rates[t_idx, :],
+                                            contingency_rates=self.results.contingency_rates[t_idx, :],
+                                            base_exchange=np.array(batch['base_exchange'], dtype=float),
+                                            time_idx=t_idx,
+                                            threshold=self.options.threshold)
+
+                # sort by NTC and curtail the report per time step
+                reports.append(sort_and_curtail_atc_report(report=report,
+                                                           max_report_elements=self.options.max_report_elements))
+
+                for val in batch.values():
+                    val.clear()
+
         for it, t in enumerate(self.time_indices):
 
             self.report_text('Available transfer capacity at ' + str(self.grid.time_profile[t]))
 
             nc = compile_numerical_circuit_at(circuit=self.grid, t_idx=t)
 
-            linear_analysis = LinearAnalysis(
-                numerical_circuit=nc,
-                distributed_slack=True,
-                correct_values=False,
-            )
-            linear_analysis.run()
+            # the linear factors are only recomputed when the topology changes
+            key = get_linear_structure_key(nc)
+            if key != structure_key or len(batch['t']) >= self.options.time_steps_batch_size:
+                flush_batch()
+
+                if key != structure_key:
+                    linear_analysis = LinearAnalysis(
+                        numerical_circuit=nc,
+                        distributed_slack=self.options.distributed_slack,
+                        correct_values=self.options.correct_values,
+                    )
+                    linear_analysis.run()
+
+                    lodf_indptr, lodf_c_idx, lodf_values = get_pruned_lodf(lodf=linear_analysis.LODF,
+                                                                           br_idx=br_idx,
+                                                                           contingency_br_idx=con_br_idx,
+                                                                           threshold=self.options.threshold)
+                    structure_key = key
 
             P: Vec = nc.Sbus.real
 
             # get flow
             if self.options.use_provided_flows:
                 flows_t = self.options.Pf[t, :]
-
-                if self.options.Pf is None:
-                    msg = 'The option to use the provided flows is enabled, but no flows are available'
-                    self.logger.add_error(msg)
-                    raise Exception(msg)
             else:
                 flows_t: Vec = linear_analysis.get_flows(P)
 
@@ -323,38 +366,24 @@ class AvailableTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
                     base_exchange += (self.options.inter_area_hvdc_branch_sense * self.options.Pf_hvdc[
                         t, self.options.idx_hvdc_br]).sum()
 
-            # compute ATC
-            report = compute_atc_list(br_idx=br_idx,
-                                      contingency_br_idx=con_br_idx,
-                                      lodf=linear_analysis.LODF,
-                                      alpha=alpha,
-                                      flows=flows_t,
-                                      rates=self.results.rates[t, :],
-                                      contingency_rates=self.results.contingency_rates[t, :],
-                                      base_exchange=base_exchange,
-                                      time_idx=t,
-                                      threshold=self.options.threshold)
-
-            report = np.array(report, dtype=object)
-
-            # sort by NTC
-            report = report[report[:, 9].argsort()]
-
-            # curtail report
-            if self.options.max_report_elements > 0:
-                report = report[:self.options.max_report_elements, :]
-
-            # post-process and store the results
-            if self.results.raw_report is None:
-                self.results.raw_report = report
-            else:
-                self.results.raw_report = np.r_[self.results.raw_report, report]
+            batch['t'].append(t)
+            batch['alpha'].append(alpha)
+            batch['flows'].append(flows_t)
+            batch['base_exchange'].append(base_exchange)
 
-            self.report_progress2(t, len(self.time_indices))
+            self.report_progress2(it, len(self.time_indices))
 
             if self.__cancel__:
                 break
 
+        flush_batch()
+
+        # post-process and store the results
+        if len(reports):
+            self.results.raw_report = np.concatenate(reports, axis=0)
+        else:
+            self.results.raw_report = np.zeros((0, 15))
+
         self.report_text('Building the report...')
         self.results.make_report()
 
@@ -16,6 +16,10 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu, SuperLU
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, List, Dict, Union, Any
 
 from GridCalEngine.enumerations import CpfParametrization, CpfStopAt
 from GridCalEngine.Simulations.Derivatives.ac_jacobian import AC_jacobianVc
@@ -23,7 +27,6 @@ from GridCalEngine.Simulations.PowerFlow.NumericalMethods.discrete_controls impo
 from GridCalEngine.Topology.simulation_indices import compile_types
 from GridCalEngine.Simulations.PowerFlow.NumericalMethods.common_functions import (polar_to_rect, compute_power)
 from GridCalEngine.basic_structures import Vec, CxVec, IntVec
-from GridCalEngine.Utils.Sparse.csc2 import spsolve_csc, extend
 
 np.set_printoptions(precision=8, suppress=True, linewidth=320)
 
@@ -43,6 +46,7 @@ class CpfNumericResults:
         self.losses = list()
         self.normF = list()
         self.success = list()
+        self.n_factorizations = 0
 
     def add(self, v: CxVec, sbus: CxVec, Sf: CxVec, St: CxVec, lam: float,
             losses: CxVec, loading: CxVec, normf: float, converged: bool):
@@ -255,100 +259,239 @@ def cpf_p_jac(parametrization: CpfParametrization, z, V, lam, Vprv, lamprv,
     return dP_dV, dP_dlam
 
 
-def predictor(V, lam, Ybus, Sxfr,
-              idx_dtheta: IntVec, idx_dVm: IntVec, idx_dP: IntVec, idx_dQ: IntVec,
-              step: float, z, Vprv, lamprv,
-              parametrization: CpfParametrization):
+class CpfJacobianSolver:
     """
-    Computes a prediction (approximation) to the next solution of the
-    continuation power flow using a normalized tangent predictor.
+    Linear solver of the augmented continuation power flow system
+
+        | J      dF_dlam | |dx  |   | f |
+        | dP_dV  dP_dlam | |dlam| = | p |
+
+    The power flow Jacobian J keeps its sparsity pattern while the bus types do not change, so the fill-reducing
+    ordering is computed once, the Jacobian values are scattered into the symmetrically permuted pattern and only
+    the numeric factorization is repeated. The border (dF_dlam, dP_dV, dP_dlam) is eliminated by block elimination
+    with one step of iterative refinement, so a factorization of J is shared by the predictor and the corrector.
+    """
+
+    def __init__(self, Ybus: sp.csc_matrix, idx_dtheta: IntVec, idx_dVm: IntVec, idx_dQ: IntVec):
+        """
+        CpfJacobianSolver constructor
+        :param Ybus: Admittance matrix
+        :param idx_dtheta: vector of indices of PV|PQ|PQV|P buses
+        :param idx_dVm: vector of indices of PQ|P buses
+        :param idx_dQ: vector of indices of PQ|PQV buses
+        """
+        self.Ybus = Ybus.tocsc()
+        self.idx_dtheta = idx_dtheta
+        self.idx_dVm = idx_dVm
+        self.idx_dQ = idx_dQ
+
+        # symmetric permutation of the Jacobian and its permuted sparsity pattern
+        self.q: IntVec = np.zeros(0, dtype=int)
+        self.data_map: IntVec = np.zeros(0, dtype=int)
+        self.indices: IntVec = np.zeros(0, dtype=np.int32)
+        self.indptr: IntVec = np.zeros(0, dtype=np.int32)
+
+        self.J: Union[sp.csc_matrix, None] = None
+        self.lu: Union[SuperLU, None] = None
+
+        # number of voltage updates since the last factorization
+        self.age = 0
+
+        self.n_factorizations = 0
+
+    def analyze(self, J: sp.csc_matrix) -> None:
+        """
+        Compute the fill-reducing ordering of the Jacobian pattern and the scattering of its values
+        :param J: Jacobian
+        """
+        # splu sorts the indices of its argument in place, and the values of J come unsorted
+        self.q = np.argsort(splu(J.copy(), permc_spec='MMD_AT_PLUS_A').perm_c)
+
+        # permute the positions of the values to know where every value of J lands
+        pos = sp.csc_matrix((np.arange(1, J.nnz + 1, dtype=float), J.indices, J.indptr), shape=J.shape)
+        pos = pos[self.q, :][:, self.q].tocsc()
+        pos.sort_indices()
+
+        self.data_map = pos.data.astype(int) - 1
+        self.indices = pos.indices
+        self.indptr = pos.indptr
+
+    def factorize(self, V: CxVec) -> bool:
+        """
+        Compute and factorize the Jacobian at the given voltage
+        :param V: Voltage
+        :return: success?
+        """
+        Jc = AC_jacobianVc(self.Ybus, V, self.idx_dtheta, self.idx_dVm, self.idx_dQ)
+        self.J = sp.csc_matrix((Jc.data[:Jc.nnz], Jc.indices[:Jc.nnz], Jc.indptr), shape=(Jc.n_rows, Jc.n_cols))
+
+        if len(self.data_map) != self.J.nnz:
+            self.analyze(self.J)
+
+        Jp = sp.csc_matrix((self.J.data[self.data_map], self.indices, self.indptr), shape=self.J.shape)
+
+        self.age = 0
+        self.n_factorizations += 1
+        try:
+            self.lu = splu(Jp, permc_spec='NATURAL')
+            return True
+        except RuntimeError:
+            # exactly singular
+            self.lu = None
+            return False
+
+    def solve_j(self, f: Vec) -> Vec:
+        """
+        Solve J x = f with the current factorization
+        :param f: right hand side
+        :return: x
+        """
+        x = np.empty_like(f)
+        x[self.q] = self.lu.solve(f[self.q])
+        return x
+
+    def solve(self, dF_dlam: Vec, dP_dV: Vec, dP_dlam: float, f: Vec, p: float) -> Tuple[Vec, float, bool]:
+        """
+        Solve the augmented system by block elimination
+        :param dF_dlam: last column
+        :param dP_dV: last row
+        :param dP_dlam: corner value
+        :param f: right hand side of the power flow equations
+        :param p: right hand side of the parametrization equation
+        :return: dx, dlam, success?
+        """
+        if self.lu is None:
+            return np.full(len(f), np.nan), np.nan, False
+
+        u = self.solve_j(dF_dlam)
+        den = dP_dlam - np.dot(dP_dV, u)
+        if den == 0.0 or not np.isfinite(den):
+            return np.full(len(f), np.nan), np.nan, False
+
+        def eliminate(f_: Vec, p_: float) -> Tuple[Vec, float]:
+            v = self.solve_j(f_)
+            y = (p_ - np.dot(dP_dV, v)) / den
+            return v - u * y, y
+
+        dx, dlam = eliminate(f, p)
+
+        # one step of iterative refinement, the elimination is ill-conditioned when J is close to singular (nose)
+        rf = f - self.J @ dx - dF_dlam * dlam
+        rp = p - np.dot(dP_dV, dx) - dP_dlam * dlam
+        ddx, ddlam = eliminate(rf, rp)
+
+        dx += ddx
+        dlam += ddlam
+        ok = np.all(np.isfinite(dx)) and np.isfinite(dlam)
+
+        return dx, dlam, ok
+
+
+def tangent(V: CxVec, lam: float, Sxfr: CxVec, solver: CpfJacobianSolver,
+            idx_dtheta: IntVec, idx_dVm: IntVec, idx_dP: IntVec, idx_dQ: IntVec,
+            z: Vec, Vprv: CxVec, lamprv: float, parametrization: CpfParametrization) -> Tuple[Vec, bool]:
+    """
+    Computes the normalized tangent vector of the continuation curve at the current solution
     :param V: complex bus voltage vector at current solution
     :param lam: scalar lambda value at current solution
-    :param Ybus: complex bus admittance matrix
     :param Sxfr: complex vector of scheduled transfers (difference between bus Injections in base and target cases)
+    :param solver: CpfJacobianSolver with a factorization of the Jacobian at (or close to) the current solution
     :param idx_dtheta: vector of indices of PV|PQ|PQV|P buses
     :param idx_dVm: vector of indices of PQ|P buses
     :param idx_dP: vector of indices of PV|PQ|PQV|P buses
     :param idx_dQ: vector of indices of PQ|PQV buses
-    :param step: continuation step length
     :param z: normalized tangent prediction vector from previous step
     :param Vprv: complex bus voltage vector at previous solution
     :param lamprv: scalar lambda value at previous solution
     :param parametrization: Value of cpf parametrization option.
-    :return: V0 : predicted complex bus voltage vector
-             LAM0 : predicted lambda continuation parameter
-             Z : the normalized tangent prediction vector
+    :return: normalized tangent vector, success?
     """
-
-    # sizes
     nb = len(V)
-    # npv = len(pv)
-    # npq = len(pq)
-    # pvpq = np.r_[pv, pq]
-    # nj = npv + npq * 2
 
-    # compute Jacobian for the power flow equations
-    J = AC_jacobianVc(Ybus, V, idx_dtheta, idx_dVm, idx_dQ)
+    if solver.lu is None:
+        solver.factorize(V)
 
-    dF_dlam = -np.r_[
-        Sxfr[idx_dP].real,
-        Sxfr[idx_dQ].imag
-    ]
+    dF_dlam = -np.r_[Sxfr[idx_dP].real, Sxfr[idx_dQ].imag]
 
     dP_dV, dP_dlam = cpf_p_jac(parametrization, z, V, lam, Vprv, lamprv, idx_dtheta, idx_dVm)
 
-    # linear operator for computing the tangent predictor
-    '''
-    J2 = [   J   dF_dlam
-           dP_dV dP_dlam ]
-    '''
+    # increase in the direction of lambda
+    dx, dlam, ok = solver.solve(dF_dlam, dP_dV, dP_dlam, np.zeros(len(dF_dlam)), 1.0)
 
-    # last_col = np.empty((nj, 1))
-    # last_col[:, 0] = dF_dlam
-    #
-    # last_row = np.empty((1, nj + 1))
-    # last_row[0, :nj] = dP_dV
-    # last_row[0, nj] = dP_dlam
+    if ok:
+        z_new = np.zeros(2 * nb + 1)
+        z_new[np.r_[idx_dtheta, nb + idx_dVm]] = dx
+        z_new[2 * nb] = dlam
 
-    J2 = extend(J, dF_dlam, dP_dV, dP_dlam)
+        # normalize the tangent vector (dividing by the euclidean norm)
+        z_new /= np.linalg.norm(z_new)
 
-    Va_prev = np.angle(V)
-    Vm_prev = np.abs(V)
+        return z_new, True
+    else:
+        return z, False
 
-    # compute normalized tangent predictor
-    s = np.zeros(len(idx_dP) + len(idx_dQ) + 1)
 
-    # increase in the direction of lambda
-    s[len(idx_dP) + len(idx_dQ)] = 1
+def predictor(V: CxVec, lam: float, z: Vec, step: float,
+              idx_dtheta: IntVec, idx_dVm: IntVec) -> Tuple[CxVec, float]:
+    """
+    Computes a prediction (approximation) to the next solution of the
+    continuation power flow along the normalized tangent vector.
+    :param V: complex bus voltage vector at current solution
+    :param lam: scalar lambda value at current solution
+    :param z: normalized tangent vector at the current solution
+    :param step: continuation step length
+    :param idx_dtheta: vector of indices of PV|PQ|PQV|P buses
+    :param idx_dVm: vector of indices of PQ|P buses
+    :return: V0 : predicted complex bus voltage vector
+             LAM0 : predicted lambda continuation parameter
+    """
+    nb = len(V)
+    Va0 = np.angle(V)
+    Vm0 = np.abs(V)
 
-    # tangent vector
-    z[np.r_[idx_dP, nb + idx_dQ, 2 * nb]], ok = spsolve_csc(J2, s)
+    # prediction for next step
+    Va0[idx_dtheta] += step * z[idx_dtheta]
+    Vm0[idx_dVm] += step * z[idx_dVm + nb]
+    lam0 = lam + step * z[2 * nb]
+    V0 = polar_to_rect(Vm0, Va0)
 
-    if ok:
-        # normalize_string tangent predictor  (dividing by the euclidean norm)
-        z /= np.linalg.norm(z)
+    return V0, lam0
 
-        Va0 = Va_prev
-        Vm0 = Vm_prev
-        # lam0 = lam
 
-        # prediction for next step
-        Va0[idx_dtheta] = Va_prev[idx_dtheta] + step * z[idx_dtheta]
-        Vm0[idx_dVm] = Vm_prev[idx_dVm] + step * z[idx_dVm + nb]
-        lam0 = lam + step * z[2 * nb]
-        V0 = Vm0 * np.exp(1j * Va0)
+def adapt_step_size(z: Vec, z_prev: Vec, step: float, error_tol: float, step_min: float, step_max: float) -> float:
+    """
+    Curvature based step size: the curvature of the continuation curve is estimated from the angle between
+    consecutive tangent vectors, and the step is the one that keeps the distance between the tangent prediction
+    and the curve (curvature * step^2 / 2) at the error tolerance
+    :param z: normalized tangent vector at the current solution
+    :param z_prev: normalized tangent vector at the previous solution
+    :param step: step length between both solutions
+    :param error_tol: admissible prediction error
+    :param step_min: minimum step size
+    :param step_max: maximum step size
+    :return: new step length
+    """
+    angle = np.arccos(np.clip(np.dot(z, z_prev), -1.0, 1.0))
+    curvature = angle / step
 
-        return V0, lam0, z
+    if curvature > 0:
+        new_step = np.sqrt(2.0 * error_tol / curvature)
     else:
-        return V, lam, z
+        new_step = step_max
+
+    # do not change the step too abruptly
+    new_step = min(max(new_step, 0.5 * step), 2.0 * step)
+
+    return min(max(new_step, step_min), step_max)
 
 
 def corrector(Ybus, Sbus: CxVec, V0: CxVec,
               idx_dtheta: IntVec, idx_dVm: IntVec, idx_dP: IntVec, idx_dQ: IntVec,
               lam0, Sxfr, Vprv, lamprv, z, step, parametrization, tol, max_it,
-              verbose, mu_0=1.0, acceleration_parameter=0.5):
+              verbose, solver: CpfJacobianSolver, reuse_ratio: float = 0.1,
+              mu_0=1.0, acceleration_parameter=0.5):
     """
-    Solves the corrector step of a continuation power flow using a full Newton method
+    Solves the corrector step of a continuation power flow using a Newton method
     with selected parametrization scheme.
 
     solves for bus voltages and lambda given the full system admittance
@@ -360,6 +503,9 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
     swing bus, as well as an initial guess for remaining magnitudes and
     angles.
 
+    The Jacobian factorization of the solver is reused while the mismatch contracts
+    by at least reuse_ratio per iteration, and refactorized otherwise.
+
      Uses default options if this parameter is not given. Returns the
      final complex voltages, a flag which indicates whether it converged or not,
      the number of iterations performed, and the final lambda.
@@ -381,6 +527,8 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
     :param tol: Tolerance (p.u.)
     :param max_it: max iterations
     :param verbose: print information?
+    :param solver: CpfJacobianSolver (its factorization is updated)
+    :param reuse_ratio: maximum mismatch ratio between iterations to keep using the same factorization
     :param mu_0:
     :param acceleration_parameter:
     :return: Voltage, converged, iterations, lambda, power error, calculated power
@@ -394,13 +542,6 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
     lam = lam0  # set lam to initial lam0
     dVa = np.zeros_like(Va)
     dVm = np.zeros_like(Vm)
-    # dlam = 0
-
-    # set up indexing for updating V
-    # npv = len(pv)
-    # npq = len(pq)
-    # pvpq = np.r_[pv, pq]
-    # nj = npv + npq * 2
 
     # j1:j2 - V angle of pv and pq buses
     j1 = 0
@@ -411,7 +552,6 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
     # evaluate F(x0, lam0), including Sxfr transfer/loading
     Scalc = V * np.conj(Ybus * V)
     mismatch = Scalc - Sbus - lam * Sxfr
-    # F = np.r_[mismatch[pvpq].real, mismatch[pq].imag]
 
     # evaluate P(x0, lambda0)
     P = cpf_p(parametrization, step, z, V, lam, Vprv, lamprv, idx_dtheta, idx_dVm)
@@ -424,7 +564,7 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
     ]
 
     # check tolerance
-    normF = np.linalg.norm(F, np.Inf)
+    normF = np.linalg.norm(F, np.inf)
     converged = normF < tol
     if verbose:
         print('\nConverged!\n')
@@ -434,39 +574,34 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
         Sxfr[idx_dQ].imag
     ]
 
+    # the first iteration uses the factorization of the predictor
+    refactorize = solver.lu is None
+
     # do Newton iterations
     while not converged and i < max_it:
 
         # update iteration counter
         i += 1
 
-        # evaluate Jacobian
-        J = AC_jacobianVc(Ybus, V, idx_dtheta, idx_dVm, idx_dQ)
+        # evaluate and factorize the Jacobian only if the last one is not good enough
+        if refactorize:
+            solver.factorize(V)
 
         dP_dV, dP_dlam = cpf_p_jac(parametrization, z, V, lam, Vprv, lamprv, idx_dtheta, idx_dVm)
 
-        # augment J with real/imag - Sxfr and z^T
-        '''
-        J = [   J   dF_dlam 
-              dP_dV dP_dlam ]
-        '''
-        # J = sp.vstack([sp.hstack([J, dF_dlam.reshape(nj, 1)]),
-        #                sp.hstack([dP_dV, dP_dlam])], format="csc")
-
-        # last_col = np.empty((nj, 1))
-        # last_col[:, 0] = dF_dlam
-        #
-        # last_row = np.empty((1, nj + 1))
-        # last_row[0, :nj] = dP_dV
-        # last_row[0, nj] = dP_dlam
+        # compute update step
+        dx, dlam, ok = solver.solve(dF_dlam, dP_dV, dP_dlam, F[:-1], F[-1])
 
-        J = extend(J, dF_dlam, dP_dV, dP_dlam)
+        if not ok:
+            if solver.age > 0:
+                # the old factorization is not usable, try again with a fresh one
+                refactorize = True
+                continue
+            else:
+                return V, converged, i, lam, normF, Scalc
 
-        # compute update step
-        dx, ok = spsolve_csc(J, F)
         dVa[idx_dtheta] = dx[j1:j2]
         dVm[idx_dVm] = dx[j2:j3]
-        dlam = dx[j3]
 
         # set the restoration values
         prev_Vm = Vm.copy()
@@ -505,7 +640,7 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
             F = np.r_[mismatch[idx_dP].real, mismatch[idx_dQ].imag, P]
 
             # check for convergence
-            normF_new = np.linalg.norm(F, np.Inf)
+            normF_new = np.linalg.norm(F, np.inf)
 
             back_track_condition = normF_new > normF
             mu *= acceleration_parameter
@@ -515,13 +650,25 @@ def corrector(Ybus, Sbus: CxVec, V0: CxVec,
                 print('\n#3d        #10.3e', i, normF)
 
         if l_iter > 1 and back_track_condition:
-            # this means that not even the backtracking was able to correct the solution so, restore and end
+            # this means that not even the backtracking was able to correct the solution so, restore
             Va = prev_Va.copy()
             Vm = prev_Vm.copy()
+            lam = prev_lam
             V = Vm * np.exp(1.0j * Va)
 
+            if solver.age > 0:
+                # the direction came from an old factorization, try again with a fresh one
+                refactorize = True
+                Scalc = compute_power(Ybus, V)
+                mismatch = Scalc - Sbus - lam * Sxfr
+                P = cpf_p(parametrization, step, z, V, lam, Vprv, lamprv, idx_dtheta, idx_dVm)
+                F = np.r_[mismatch[idx_dP].real, mismatch[idx_dQ].imag, P]
+                continue
+
             return V, converged, i, lam, normF, Scalc
         else:
+            solver.age += 1
+            refactorize = normF_new > reuse_ratio * normF
             normF = normF_new
 
         converged = normF < tol
@@ -542,7 +689,7 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
                     adapt_step, step_min, step_max, error_tol=1e-3, tol=1e-6, max_it=20,
                     stop_at=CpfStopAt.Nose, control_q=False, control_remote_voltage: bool = True,
                     qmax_bus=None, qmin_bus=None, original_bus_types=None, base_overload_number=0,
-                    verbose=False, call_back_fx=None) -> CpfNumericResults:
+                    verbose=False, call_back_fx=None, reuse_ratio: float = 0.1) -> CpfNumericResults:
     """
     Runs a full AC continuation power flow using a normalized tangent
     predictor and selected approximation_order scheme.
@@ -568,7 +715,7 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
     :param adapt_step: use adaptive step size?
     :param step_min: minimum step size
     :param step_max: maximum step size
-    :param error_tol: Error tolerance
+    :param error_tol: Admissible tangent prediction error used to adapt the step size
     :param tol: Solutions tolerance
     :param max_it: Maximum iterations
     :param stop_at:  Value of Lambda to stop at. It can be a number or {'NOSE', 'FULL'}
@@ -580,6 +727,7 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
     :param base_overload_number: number of overloads in the base situation (used when stop_at=CpfStopAt.ExtraOverloads)
     :param verbose: Display additional intermediate information?
     :param call_back_fx: Function to call on every iteration passing the lambda parameter
+    :param reuse_ratio: maximum mismatch ratio between corrector iterations to keep using the same factorization
     :return: CpfNumericResults instance
 
 
@@ -606,7 +754,6 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
     V_prev = V  # V at previous step
     continuation = True
     cont_steps = 0
-    # pvpq = np.r_[pv, pq]
 
     idx_dtheta = np.r_[pv, pq, pqv, p]
     idx_dVm = np.r_[pq, p]
@@ -615,6 +762,9 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
 
     bus_types = original_bus_types.copy()
 
+    # the Jacobian factorizations are shared by the predictor and the corrector
+    solver = CpfJacobianSolver(Ybus=Ybus, idx_dtheta=idx_dtheta, idx_dVm=idx_dVm, idx_dQ=idx_dQ)
+
     z = np.zeros(2 * nb + 1)
     z[2 * nb] = 1.0
 
@@ -629,69 +779,86 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
         cont_steps += 1
 
         # prediction for next step -------------------------------------------------------------------------------------
-        V0, lam0, z = predictor(V=V,
-                                lam=lam,
-                                Ybus=Ybus,
-                                Sxfr=Sxfr,
-                                idx_dtheta=idx_dtheta,
-                                idx_dVm=idx_dVm,
-                                idx_dP=idx_dP,
-                                idx_dQ=idx_dQ,
-                                step=step,
-                                z=z,
-                                Vprv=V_prev,
-                                lamprv=lam_prev,
-                                parametrization=approximation_order)
+        z_prev = z
+        z, ok = tangent(V=V,
+                        lam=lam,
+                        Sxfr=Sxfr,
+                        solver=solver,
+                        idx_dtheta=idx_dtheta,
+                        idx_dVm=idx_dVm,
+                        idx_dP=idx_dP,
+                        idx_dQ=idx_dQ,
+                        z=z,
+                        Vprv=V_prev,
+                        lamprv=lam_prev,
+                        parametrization=approximation_order)
+
+        if adapt_step and ok and cont_steps > 1:
+            step = adapt_step_size(z=z, z_prev=z_prev, step=step,
+                                   error_tol=error_tol, step_min=step_min, step_max=step_max)
 
         # save previous voltage, lambda before updating
         V_prev = V.copy()
         lam_prev = lam
 
-        # correction ---------------------------------------------------------------------------------------------------
-        V, success, i, lam, normF, Scalc = corrector(Ybus=Ybus,
-                                                     Sbus=Sbus_base,
-                                                     V0=V0,
-                                                     idx_dtheta=idx_dtheta,
-                                                     idx_dVm=idx_dVm,
-                                                     idx_dP=idx_dP,
-                                                     idx_dQ=idx_dQ,
-                                                     lam0=lam0,
-                                                     Sxfr=Sxfr,
-                                                     Vprv=V_prev,
-                                                     lamprv=lam_prev,
-                                                     z=z,
-                                                     step=step,
-                                                     parametrization=approximation_order,
-                                                     tol=tol,
-                                                     max_it=max_it,
-                                                     verbose=verbose)
-
-        if distributed_slack:
-            # Distribute the slack power
-            slack_power = Scalc[vd].real.sum()
-
-            if total_installed_power > 0.0:
-                delta = slack_power * bus_installed_power / total_installed_power
-
-                # rerun with the slack distributed and replace the results
-                # also, initialize with the last voltage
-                V, success, i, lam, normF, Scalc = corrector(Ybus=Ybus,
-                                                             Sbus=Sbus_base + delta,
-                                                             V0=V,
-                                                             idx_dtheta=idx_dtheta,
-                                                             idx_dVm=idx_dVm,
-                                                             idx_dP=idx_dP,
-                                                             idx_dQ=idx_dQ,
-                                                             lam0=lam0,
-                                                             Sxfr=Sxfr,
-                                                             Vprv=V_prev,
-                                                             lamprv=lam_prev,
-                                                             z=z,
-                                                             step=step,
-                                                             parametrization=approximation_order,
-                                                             tol=tol,
-                                                             max_it=max_it,
-                                                             verbose=verbose)
+        retry = True
+        while retry:
+            V0, lam0 = predictor(V=V_prev, lam=lam_prev, z=z, step=step, idx_dtheta=idx_dtheta, idx_dVm=idx_dVm)
+
+            # correction -----------------------------------------------------------------------------------------------
+            V, success, i, lam, normF, Scalc = corrector(Ybus=Ybus,
+                                                         Sbus=Sbus_base,
+                                                         V0=V0,
+                                                         idx_dtheta=idx_dtheta,
+                                                         idx_dVm=idx_dVm,
+                                                         idx_dP=idx_dP,
+                                                         idx_dQ=idx_dQ,
+                                                         lam0=lam0,
+                                                         Sxfr=Sxfr,
+                                                         Vprv=V_prev,
+                                                         lamprv=lam_prev,
+                                                         z=z,
+                                                         step=step,
+                                                         parametrization=approximation_order,
+                                                         tol=tol,
+                                                         max_it=max_it,
+                                                         verbose=verbose,
+                                                         solver=solver,
+                                                         reuse_ratio=reuse_ratio)
+
+            if distributed_slack:
+                # Distribute the slack power
+                slack_power = Scalc[vd].real.sum()
+
+                if total_installed_power > 0.0:
+                    delta = slack_power * bus_installed_power / total_installed_power
+
+                    # rerun with the slack distributed and replace the results
+                    # also, initialize with the last voltage
+                    V, success, i, lam, normF, Scalc = corrector(Ybus=Ybus,
+                                                                 Sbus=Sbus_base + delta,
+                                                                 V0=V,
+                                                                 idx_dtheta=idx_dtheta,
+                                                                 idx_dVm=idx_dVm,
+                                                                 idx_dP=idx_dP,
+                                                                 idx_dQ=idx_dQ,
+                                                                 lam0=lam0,
+                                                                 Sxfr=Sxfr,
+                                                                 Vprv=V_prev,
+                                                                 lamprv=lam_prev,
+                                                                 z=z,
+                                                                 step=step,
+                                                                 parametrization=approximation_order,
+                                                                 tol=tol,
+                                                                 max_it=max_it,
+                                                                 verbose=verbose,
+                                                                 solver=solver,
+                                                                 reuse_ratio=reuse_ratio)
+
+            # when the corrector fails, retry from the last solution with half the step length
+            retry = not success and adapt_step and step > step_min
+            if retry:
+                step = max(0.5 * step, step_min)
 
         if success:
 
@@ -748,6 +915,14 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
                 Sxfr = Sbus_target - Sbus
 
                 vd, pq, pv, pqv, p, pqpv = compile_types(Pbus=Sbus.real, types=types_new,)
+
+                # the Jacobian structure changes with the bus types
+                idx_dtheta = np.r_[pv, pq, pqv, p]
+                idx_dVm = np.r_[pq, p]
+                idx_dP = idx_dtheta
+                idx_dQ = np.r_[pq, pqv]
+                results.n_factorizations += solver.n_factorizations
+                solver = CpfJacobianSolver(Ybus=Ybus, idx_dtheta=idx_dtheta, idx_dVm=idx_dVm, idx_dQ=idx_dQ)
             else:
                 if verbose:
                     print('Q controls Ok')
@@ -789,28 +964,6 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
             else:
                 raise Exception(f'Stop point {stop_at.value} not recognised.')
 
-            if adapt_step and continuation:
-
-                # Adapt step size
-                fx = (np.r_[np.angle(V[idx_dtheta]), np.abs(V[idx_dVm]), lam]
-                      - np.r_[np.angle(V0[idx_dtheta]), np.abs(V0[idx_dVm]), lam0])
-                cpf_error = np.linalg.norm(fx, np.Inf)
-
-                if cpf_error == 0:
-                    cpf_error = 1e-20
-
-                if cpf_error < error_tol:
-                    # Increase step size
-                    step = step * error_tol / cpf_error
-                    if step > step_max:
-                        step = step_max
-
-                else:
-                    # Decrease step size
-                    step = step * error_tol / cpf_error
-                    if step < step_min:
-                        step = step_min
-
             # call callback function
             if call_back_fx is not None:
                 call_back_fx(lam)
@@ -820,4 +973,34 @@ def continuation_nr(Ybus, Cf, Ct, Yf, Yt, branch_rates, Sbase, Sbus_base, Sbus_t
             if verbose:
                 print('step ', cont_steps, ' : lambda = ', lam, ', corrector did not converge in ', i, ' iterations\n')
 
+    results.n_factorizations += solver.n_factorizations
+
     return results
+
+
+def continuation_nr_direction(Sbus_target: CxVec, kwargs: Dict[str, Any]) -> CpfNumericResults:
+    """
+    Run the continuation power flow towards one target injection, this is the function run by the worker processes
+    :param Sbus_target: Power array of the case to be solved
+    :param kwargs: rest of the continuation_nr arguments
+    :return: CpfNumericResults instance
+    """
+    return continuation_nr(Sbus_target=Sbus_target, **kwargs)
+
+
+def continuation_nr_directions(Sbus_targets: List[CxVec], n_workers: int = 1, **kwargs) -> List[CpfNumericResults]:
+    """
+    Run the continuation power flow towards several target injections (transfer directions)
+    :param Sbus_targets: list of power arrays of the cases to be solved
+    :param n_workers: number of worker processes, 1 to run in this process
+    :param kwargs: rest of the continuation_nr arguments (call_back_fx is not passed to the worker processes)
+    :return: list of CpfNumericResults, one per target
+    """
+    if n_workers <= 1 or len(Sbus_targets) < 2:
+        return [continuation_nr_direction(Sbus_target, kwargs) for Sbus_target in Sbus_targets]
+
+    kwargs = {key: val for key, val in kwargs.items() if key != 'call_back_fx'}
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(continuation_nr_direction, Sbus_target, kwargs) for Sbus_target in Sbus_targets]
+        return [future.result() for future in futures]
@@ -15,14 +15,18 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
-
+import math
+import cmath
 import numpy as np
+import numba as nb
 import pandas as pd
+import scipy.sparse as sp
 from scipy.sparse.linalg import splu
-from scipy.sparse import csr_matrix as sparse
 from enum import Enum
+from typing import List, Union
 from warnings import warn
 from matplotlib import pyplot as plt
+from GridCalEngine.basic_structures import Vec, CxVec, IntVec, BoolVec, Mat, CxMat
 
 
 class DiffEqSolver(Enum):
@@ -30,7 +34,8 @@ class DiffEqSolver(Enum):
     DiffEqSolver
     """
     EULER = 1,
-    RUNGE_KUTTA = 2
+    RUNGE_KUTTA = 2,
+    RUNGE_KUTTA_ADAPTIVE = 3  # Bogacki-Shampine 3(2) with error control
 
 
 class DynamicModels(Enum):
@@ -64,8 +69,8 @@ class TransientStabilityEvents:
         Add elements
         :param t: time in seconds
         :param evt_type: event type
-        :param obj: object selected
-        :param param: extra parameters
+        :param obj: object selected (bus index for the bus events, branch index for the line events)
+        :param param: extra parameters (fault admittance in p.u. for the bus short circuits)
         """
 
         if evt_type not in self.events_available:
@@ -86,20 +91,43 @@ class TransientStabilityEvents:
         self.object.pop(i)
         self.params.pop(i)
 
+    def get_sorted_indices(self) -> IntVec:
+        """
+        Get the event indices sorted by time (stable, so simultaneous events keep their order)
+        :return: indices
+        """
+        return np.argsort(np.array(self.time, dtype=float), kind='stable')
+
 
 class TransientStabilityResults:
 
-    def __init__(self):
-
+    def __init__(self, n_time: int = 0, n_bus: int = 0, n_machines: int = 0):
+        """
+        Transient stability results, preallocated for the known number of recorded steps
+        :param n_time: number of recorded time steps
+        :param n_bus: number of buses
+        :param n_machines: number of dynamic devices
+        """
         self.name = "Transient stability"
 
-        self.voltage = None
+        self.voltage: CxMat = np.zeros((n_time, n_bus), dtype=complex)
+
+        self.omega: Mat = np.zeros((n_time, n_machines))
 
-        self.omega = None
+        self.time: Vec = np.zeros(n_time)
 
-        self.time = None
+        # number of factorizations of the augmented admittance matrix
+        self.n_factorizations = 0
 
-        self.available_results = ['Bus voltage']
+        # number of derivative evaluations (network solutions)
+        self.n_evaluations = 0
+
+        # rotor angle stability: largest angle separation (rad), and time at which the criterion was reached
+        self.stable = True
+        self.max_angle_separation = 0.0
+        self.t_separation = np.nan
+
+        self.available_results = ['Bus voltage', 'Machine speed']
 
     def plot(self, result_type, ax=None, indices=None, names=None, LINEWIDTH=2):
         """
@@ -127,6 +155,12 @@ class TransientStabilityResults:
                 y_label = '(p.u.)'
                 title = 'Bus voltage module'
 
+            elif result_type == 'Machine speed':
+
+                y = self.omega[:, indices]
+                y_label = '(p.u.)'
+                title = 'Machine speed'
+
             else:
                 pass
 
@@ -149,7 +183,406 @@ class TransientStabilityResults:
             return None
 
 
-class SynchronousMachineOrder4:
+########################################################################################################################
+# Numba kernels: every model type is stored as struct-of-arrays and its states as a (n_states, n_machines) matrix
+########################################################################################################################
+
+
+@nb.njit(cache=True)
+def sm4_currents(V: CxVec, bus_idx: IntVec, x: Mat, Ra: Vec, Xdp: Vec, Xqp: Vec, Yg: CxVec, speed_volt: BoolVec,
+                 Id: Vec, Iq: Vec, P: Vec, Q: Vec, I: CxVec):
+    """
+    Norton current injections of the 4th order synchronous machines
+    :param V: bus voltages
+    :param bus_idx: machine bus indices
+    :param x: states [Eqp, Edp, omega, delta]
+    :param Ra: armature resistance
+    :param Xdp: d-axis transient reactance
+    :param Xqp: q-axis transient reactance
+    :param Yg: Norton admittances
+    :param speed_volt: include the speed-voltage term?
+    :param Id: d-axis currents (output)
+    :param Iq: q-axis currents (output)
+    :param P: active power (output)
+    :param Q: reactive power (output)
+    :param I: bus current injections (the machine currents are added)
+    """
+    for k in range(len(bus_idx)):
+        vt = V[bus_idx[k]]
+        vm = abs(vt)
+        va = math.atan2(vt.imag, vt.real)
+        Eqp = x[0, k]
+        Edp = x[1, k]
+        delta = x[3, k]
+        w = x[2, k] if speed_volt[k] else 1.0
+
+        # terminal voltage in the dq reference frame
+        Vd = vm * math.sin(delta - va)
+        Vq = vm * math.cos(delta - va)
+
+        # Norton equivalent current injection in the dq frame
+        Id[k] = (Eqp - Ra[k] / (Xqp[k] * w) * (Vd - Edp) - Vq / w) / (Xdp[k] + Ra[k] ** 2 / (w * w * Xqp[k]))
+        Iq[k] = (Vd / w + Ra[k] * Id[k] / w - Edp) / Xqp[k]
+
+        P[k] = (Vd + Ra[k] * Id[k]) * Id[k] + (Vq + Ra[k] * Iq[k]) * Iq[k]
+        Q[k] = Vq * Id[k] - Vd * Iq[k]
+
+        # Norton equivalent current injection in the network frame
+        I[bus_idx[k]] += (Iq[k] - 1j * Id[k]) * cmath.exp(1j * delta) + Yg[k] * vt
+
+
+@nb.njit(cache=True)
+def sm4_derivatives(x: Mat, Vfd: Vec, Xd: Vec, Xdp: Vec, Xq: Vec, Xqp: Vec, Td0p: Vec, Tq0p: Vec, H: Vec, Pm: Vec,
+                    omega_n: float, Id: Vec, Iq: Vec, P: Vec, dx: Mat):
+    """
+    State derivatives of the 4th order synchronous machines
+    :param x: states [Eqp, Edp, omega, delta]
+    :param Vfd: field voltage
+    :param Xd: d-axis reactance
+    :param Xdp: d-axis transient reactance
+    :param Xq: q-axis reactance
+    :param Xqp: q-axis transient reactance
+    :param Td0p: d-axis transient open loop time constant
+    :param Tq0p: q-axis transient open loop time constant
+    :param H: inertia constant
+    :param Pm: mechanical power
+    :param omega_n: nominal angular speed
+    :param Id: d-axis currents
+    :param Iq: q-axis currents
+    :param P: active power
+    :param dx: state derivatives (output)
+    """
+    for k in range(x.shape[1]):
+        dx[0, k] = (Vfd[k] - (Xd[k] - Xdp[k]) * Id[k] - x[0, k]) / Td0p[k]
+        dx[1, k] = ((Xq[k] - Xqp[k]) * Iq[k] - x[1, k]) / Tq0p[k]
+        dx[2, k] = 0.5 / H[k] * (Pm[k] / x[2, k] - P[k])
+        dx[3, k] = omega_n * (x[2, k] - 1.0)
+
+
+@nb.njit(cache=True)
+def sm6_currents(V: CxVec, bus_idx: IntVec, x: Mat, Ra: Vec, Xdpp: Vec, Xqpp: Vec, gamma_d1: Vec, gamma_q1: Vec,
+                 Yg: CxVec, speed_volt: BoolVec, Id: Vec, Iq: Vec, P: Vec, Q: Vec, I: CxVec):
+    """
+    Norton current injections of the 6th order Sauer-Pai synchronous machines
+    :param V: bus voltages
+    :param bus_idx: machine bus indices
+    :param x: states [Eqp, Edp, phid_pp, phiq_pp, omega, delta]
+    :param Ra: armature resistance
+    :param Xdpp: d-axis subtransient reactance
+    :param Xqpp: q-axis subtransient reactance
+    :param gamma_d1: d-axis internal coefficient
+    :param gamma_q1: q-axis internal coefficient
+    :param Yg: Norton admittances
+    :param speed_volt: include the speed-voltage term?
+    :param Id: d-axis currents (output)
+    :param Iq: q-axis currents (output)
+    :param P: active power (output)
+    :param Q: reactive power (output)
+    :param I: bus current injections (the machine currents are added)
+    """
+    for k in range(len(bus_idx)):
+        vt = V[bus_idx[k]]
+        vm = abs(vt)
+        va = math.atan2(vt.imag, vt.real)
+        Eqp = x[0, k]
+        Edp = x[1, k]
+        phid_pp = x[2, k]
+        phiq_pp = x[3, k]
+        delta = x[5, k]
+        w = x[4, k] if speed_volt[k] else 1.0
+
+        Vd = vm * math.sin(delta - va)
+        Vq = vm * math.cos(delta - va)
+
+        Id[k] = (-Vq / w + gamma_d1[k] * Eqp + (1.0 - gamma_d1[k]) * phid_pp
+                 - Ra[k] / (w * Xqpp[k]) * (Vd - gamma_q1[k] * Edp + (1.0 - gamma_q1[k]) * phiq_pp)) \
+                / (Xdpp[k] + Ra[k] ** 2 / (w * w * Xqpp[k]))
+
+        Iq[k] = (Vd / w + (Ra[k] * Id[k] / w) - gamma_q1[k] * Edp + (1.0 - gamma_q1[k]) * phiq_pp) / Xqpp[k]
+
+        P[k] = (Vd + Ra[k] * Id[k]) * Id[k] + (Vq + Ra[k] * Iq[k]) * Iq[k]
+        Q[k] = Vq * Id[k] - Vd * Iq[k]
+
+        I[bus_idx[k]] += (Iq[k] - 1j * Id[k]) * cmath.exp(1j * delta) + Yg[k] * vt
+
+
+@nb.njit(cache=True)
+def sm6_derivatives(x: Mat, Vfd: Vec, Xa: Vec, Xd: Vec, Xdp: Vec, Xq: Vec, Xqp: Vec, Td0p: Vec, Tq0p: Vec,
+                    Td0pp: Vec, Tq0pp: Vec, gamma_d1: Vec, gamma_d2: Vec, gamma_q1: Vec, gamma_q2: Vec,
+                    H: Vec, Pm: Vec, omega_n: float, Id: Vec, Iq: Vec, P: Vec, dx: Mat):
+    """
+    State derivatives of the 6th order Sauer-Pai synchronous machines
+    :param x: states [Eqp, Edp, phid_pp, phiq_pp, omega, delta]
+    :param dx: state derivatives (output)
+    """
+    for k in range(x.shape[1]):
+        Eqp = x[0, k]
+        Edp = x[1, k]
+        phid_pp = x[2, k]
+        phiq_pp = x[3, k]
+        omega = x[4, k]
+
+        dx[0, k] = (Vfd[k] - (Xd[k] - Xdp[k]) * (Id[k] - gamma_d2[k] * phid_pp
+                                                 - (1.0 - gamma_d1[k]) * Id[k] + gamma_d2[k] * Eqp) - Eqp) / Td0p[k]
+
+        dx[1, k] = ((Xq[k] - Xqp[k]) * (Iq[k] - gamma_q2[k] * phiq_pp
+                                        - (1.0 - gamma_q1[k]) * Iq[k] - gamma_q2[k] * Edp) - Edp) / Tq0p[k]
+
+        dx[2, k] = (Eqp - (Xdp[k] - Xa[k]) * Id[k] - phid_pp) / Td0pp[k]
+
+        dx[3, k] = (-Edp - (Xqp[k] - Xa[k]) * Iq[k] - phiq_pp) / Tq0pp[k]
+
+        dx[4, k] = 0.5 / H[k] * (Pm[k] / omega - P[k])
+
+        dx[5, k] = omega_n * (omega - 1.0)
+
+
+@nb.njit(cache=True)
+def vsc_currents(V: CxVec, bus_idx: IntVec, Edq: CxVec, Yg: CxVec, Ia: CxVec, I: CxVec):
+    """
+    Norton current injections of the average voltage source converters
+    :param V: bus voltages
+    :param bus_idx: converter bus indices
+    :param Edq: internal emf
+    :param Yg: Norton admittances
+    :param Ia: converter currents (output)
+    :param I: bus current injections (the converter currents are added)
+    """
+    for k in range(len(bus_idx)):
+        vt = V[bus_idx[k]]
+        Ia[k] = (Edq[k] - vt) * Yg[k]
+        I[bus_idx[k]] += Ia[k] + Yg[k] * vt
+
+
+@nb.njit(cache=True)
+def external_grid_currents(V: CxVec, bus_idx: IntVec, x: Mat, Eq: Vec, Xdp: Vec, P: Vec, I: CxVec):
+    """
+    Norton current injections of the external grids
+    :param V: bus voltages
+    :param bus_idx: grid bus indices
+    :param x: states [omega, delta]
+    :param Eq: internal emf module
+    :param Xdp: transient reactance
+    :param P: active power (output)
+    :param I: bus current injections (the grid currents are added)
+    """
+    for k in range(len(bus_idx)):
+        vt = V[bus_idx[k]]
+        delta = x[1, k]
+        P[k] = abs(vt) * Eq[k] * math.sin(delta - math.atan2(vt.imag, vt.real)) / Xdp[k]
+        I[bus_idx[k]] += Eq[k] * cmath.exp(1j * delta) / (1j * Xdp[k])
+
+
+@nb.njit(cache=True)
+def external_grid_derivatives(x: Mat, H: Vec, Pm: Vec, omega_n: float, P: Vec, dx: Mat):
+    """
+    State derivatives of the external grids (swing equation)
+    :param x: states [omega, delta]
+    :param H: inertia constant
+    :param Pm: mechanical power
+    :param omega_n: nominal angular speed
+    :param P: active power
+    :param dx: state derivatives (output)
+    """
+    for k in range(x.shape[1]):
+        dx[0, k] = 0.5 / H[k] * (Pm[k] / x[0, k] - P[k])
+        dx[1, k] = omega_n * (x[0, k] - 1.0)
+
+
+@nb.njit(cache=True)
+def motor_currents(V: CxVec, bus_idx: IntVec, Ed: Vec, Eq: Vec, Rs: Vec, Xp: Vec, Yg: CxVec, start: BoolVec,
+                   Id: Vec, Iq: Vec, P: Vec, Q: Vec, Te: Vec, I: CxVec):
+    """
+    Norton current injections of the asynchronous motors (single and double cage)
+    The dq frame rotates with the network, with the q-axis aligned with the real axis.
+    :param V: bus voltages
+    :param bus_idx: motor bus indices
+    :param Ed: d-axis internal emf (Ed' for the single cage, Ed'' for the double cage)
+    :param Eq: q-axis internal emf (Eq' for the single cage, Eq'' for the double cage)
+    :param Rs: stator resistance
+    :param Xp: internal reactance (X' for the single cage, X'' for the double cage)
+    :param Yg: Norton admittances
+    :param start: is the motor started?
+    :param Id: d-axis currents (output)
+    :param Iq: q-axis currents (output)
+    :param P: active power (output)
+    :param Q: reactive power (output)
+    :param Te: electrical torque (output)
+    :param I: bus current injections (the motor currents are added)
+    """
+    for k in range(len(bus_idx)):
+        vt = V[bus_idx[k]]
+
+        if start[k]:
+            Vd = -vt.imag
+            Vq = vt.real
+
+            Iq[k] = (Rs[k] / Xp[k] * (Vq - Eq[k]) - Vd + Ed[k]) / (Xp[k] + Rs[k] ** 2 / Xp[k])
+            Id[k] = (Vq - Eq[k] - Rs[k] * Iq[k]) / Xp[k]
+
+            P[k] = -(Vd * Id[k] + Vq * Iq[k])
+            Q[k] = -(Vq * Id[k] - Vd * Iq[k])
+            Te[k] = Ed[k] * Id[k] + Eq[k] * Iq[k]
+
+            # the motor draws (Iq - j Id), the Norton source is that injection plus Yg * vt
+            I[bus_idx[k]] += -(Iq[k] - 1j * Id[k]) + Yg[k] * vt
+        else:
+            # a stopped motor draws nothing: cancel its Norton admittance
+            Id[k] = 0.0
+            Iq[k] = 0.0
+            P[k] = 0.0
+            Q[k] = 0.0
+            Te[k] = 0.0
+            I[bus_idx[k]] += Yg[k] * vt
+
+
+@nb.njit(cache=True)
+def sam_derivatives(x: Mat, X0: Vec, Xp: Vec, T0p: Vec, H: Vec, a: Vec, mva_factor: Vec, start: BoolVec,
+                    omega_n: float, Id: Vec, Iq: Vec, Te: Vec, dx: Mat):
+    """
+    State derivatives of the single cage asynchronous motors
+    :param x: states [Edp, Eqp, slip]
+    :param X0: open circuit reactance
+    :param Xp: transient reactance
+    :param T0p: transient open circuit time constant
+    :param H: inertia constant
+    :param a: mechanical load torque coefficient
+    :param mva_factor: machine base over system base
+    :param start: is the motor started?
+    :param omega_n: nominal angular speed
+    :param Id: d-axis currents
+    :param Iq: q-axis currents
+    :param Te: electrical torque
+    :param dx: state derivatives (output)
+    """
+    for k in range(x.shape[1]):
+        if start[k]:
+            Edp = x[0, k]
+            Eqp = x[1, k]
+            s = x[2, k]
+            dx[0, k] = (omega_n * s * Eqp - (Edp + (X0[k] - Xp[k]) * Iq[k]) / T0p[k]) * mva_factor[k]
+            dx[1, k] = (-omega_n * s * Edp - (Eqp - (X0[k] - Xp[k]) * Id[k]) / T0p[k]) * mva_factor[k]
+            dx[2, k] = (a[k] * (1.0 - s) ** 2 - Te[k]) / (2.0 * H[k])
+        else:
+            dx[0, k] = 0.0
+            dx[1, k] = 0.0
+            dx[2, k] = 0.0
+
+
+@nb.njit(cache=True)
+def dam_derivatives(x: Mat, X0: Vec, Xp: Vec, Xpp: Vec, T0p: Vec, T0pp: Vec, H: Vec, a: Vec, mva_factor: Vec,
+                    start: BoolVec, omega_n: float, Id: Vec, Iq: Vec, Te: Vec, dx: Mat):
+    """
+    State derivatives of the double cage asynchronous motors
+    :param x: states [Edp, Eqp, Edpp, Eqpp, slip]
+    :param dx: state derivatives (output)
+    """
+    for k in range(x.shape[1]):
+        if start[k]:
+            Edp = x[0, k]
+            Eqp = x[1, k]
+            Edpp = x[2, k]
+            Eqpp = x[3, k]
+            s = x[4, k]
+            f_eqp = (-omega_n * s * Edp - (Eqp - (X0[k] - Xp[k]) * Id[k]) / T0p[k]) * mva_factor[k]
+            f_edp = (omega_n * s * Eqp - (Edp + (X0[k] - Xp[k]) * Iq[k]) / T0p[k]) * mva_factor[k]
+            dx[0, k] = f_edp
+            dx[1, k] = f_eqp
+            dx[2, k] = f_edp + (-omega_n * s * (Eqp - Eqpp)
+                                + (Edp - Edpp - (Xp[k] - Xpp[k]) * Iq[k]) / T0pp[k]) * mva_factor[k]
+            dx[3, k] = f_eqp + (omega_n * s * (Edp - Edpp)
+                                + (Eqp - Eqpp + (Xp[k] - Xpp[k]) * Id[k]) / T0pp[k]) * mva_factor[k]
+            dx[4, k] = (a[k] * (1.0 - s) ** 2 - Te[k]) / (2.0 * H[k])
+        else:
+            for i in range(5):
+                dx[i, k] = 0.0
+
+
+########################################################################################################################
+# Model groups
+########################################################################################################################
+
+
+class DynamicModelGroup:
+    """
+    Group of dynamic devices of the same model type stored as struct-of-arrays
+    The states are held by the simulation in one flat vector; each group sees its part as a (n_states, n) matrix
+    """
+    n_states = 0
+
+    def __init__(self, bus_idx: IntVec):
+        """
+
+        :param bus_idx: bus index of every device of the group
+        """
+        self.bus_idx: IntVec = np.array(bus_idx, dtype=int)
+
+        self.n = len(self.bus_idx)
+
+        # states (n_states, n)
+        self.x: Mat = np.zeros((self.n_states, self.n))
+
+    def get_yg(self) -> CxVec:
+        """
+        Get the Norton admittances to add to the augmented admittance matrix
+        :return: shunt admittance per device
+        """
+        return np.zeros(self.n, dtype=complex)
+
+    def initialise(self, vt0: CxVec, S0: CxVec):
+        """
+        Initialise the signals and states from the load flow voltage and complex power injection
+        :param vt0: complex initial voltage per device
+        :param S0: complex initial power per device
+        """
+        pass
+
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
+        """
+        Compute the algebraic signals and add the Norton current injections of the group to I
+        :param V: bus voltages
+        :param x: states of the group (n_states, n)
+        :param I: bus current injections
+        """
+        pass
+
+    def derivatives(self, x: Mat, dx: Mat):
+        """
+        Compute the state derivatives (calc_currents must have been called with the same states)
+        :param x: states of the group (n_states, n)
+        :param dx: state derivatives (output)
+        """
+        pass
+
+    def get_speed(self, x: Mat) -> Vec:
+        """
+        Rotor speed of every device of the group
+        :param x: states of the group (n_states, n)
+        :return: speed (p.u.)
+        """
+        return np.ones(self.n)
+
+    def get_angle(self, x: Mat) -> Union[Vec, None]:
+        """
+        Rotor angle of every device of the group
+        :param x: states of the group (n_states, n)
+        :return: delta (rad), None if the model has no rotor angle
+        """
+        return None
+
+    def check_diffs(self):
+        """
+        Check if differential equations are zero (on initialisation)
+        """
+        if self.n_states > 0:
+            dx = np.zeros_like(self.x)
+            self.derivatives(self.x, dx)
+            if np.any(np.round(dx, 6) != 0):
+                warn('{}: differential equations not zero on initialisation, '
+                     'max derivative {}'.format(self.__class__.__name__, np.max(np.abs(dx))))
+
+
+class SynchronousMachineOrder4(DynamicModelGroup):
     """
     4th Order Synchronous Machine Model
     https://wiki.openelectrical.org/index.php?title=Synchronous_Machine_Models#4th_Order_.28Two-Axis.29_Model
@@ -169,10 +602,13 @@ class SynchronousMachineOrder4:
     Td0pp = 0.0575
     Tq0pp = 0.0575
     H = 2
+
+    states: [Eqp, Edp, omega, delta]
     """
+    n_states = 4
 
     def __init__(self, H, Ra, Xd, Xdp, Xdpp, Xq, Xqp, Xqpp, Td0p, Tq0p, base_mva, Sbase, bus_idx, fn=50,
-                 speed_volt=False, solver=DiffEqSolver.RUNGE_KUTTA):
+                 speed_volt=False):
         """
 
         :param H: is the machine inertia constant (MWs/MVA)
@@ -187,60 +623,20 @@ class SynchronousMachineOrder4:
         :param Tq0p: q-axis transient open loop time constant (s)
         :param base_mva: machine base power
         :param Sbase: system base power (100 MVA usually)
+        :param bus_idx: bus indices
         :param fn: frequency
-        :param speed_volt: include speed-voltage term option?
-        :param solver: DiffEqSolver
+        :param speed_volt: include speed-voltage term option? (per machine)
         """
+        DynamicModelGroup.__init__(self, bus_idx=bus_idx)
 
-        self.solver = solver
-
-        self.bus_idx = bus_idx
-
-        self.Vfd = 0.0
-
-        self.Id = 0.0
-        self.Iq = 0.0
-
-        # stator voltage (d, q axis)
-        self.Vd = 0.0
-        self.Vq = 0.0
-
-        self.Vt = 0.0
-
-        self.P = 0.0
-        self.Q = 0.0
-
-        self.Pm = 0.0
-
-        self.omega = 0.0
-        self.delta = 0.0
-        self.Eqp = 0.0
-        self.Edp = 0.0
-
-        self.Vang = 0.0
-
-        self.Tm = 0.0
-        self.In = 0.0
-        self.Im = 0.0
-
-        self.omega_prev = 0.0
-        self.delta_prev = 0.0
-        self.Eqp_prev = 0.0
-        self.Edp_prev = 0.0
-
-        self.arr_Eqp = np.zeros(3)
-        self.arr_Edp = np.zeros(3)
-        self.arr_omega = np.zeros(3)
-        self.arr_delta = np.zeros(3)
-
-        self.Td0p = Td0p
-        self.Tq0p = Tq0p
+        self.Td0p = np.array(Td0p, dtype=float)
+        self.Tq0p = np.array(Tq0p, dtype=float)
 
         # angular speed (w = 2·pi·f)
-        self.omega_n = 2.0 * np.ones_like(H) * np.pi * fn
+        self.omega_n = 2.0 * np.pi * fn
 
         # Check for speed-voltage term option
-        self.speed_volt = speed_volt  # True / False
+        self.speed_volt = np.zeros(self.n, dtype=bool) | np.array(speed_volt, dtype=bool)
 
         # Convert impedances and H to system MVA base
         self.H = H * base_mva / Sbase
@@ -255,19 +651,26 @@ class SynchronousMachineOrder4:
         # Equivalent Norton impedance for Ybus
         self.Yg = self.get_yg()
 
-    def get_yg(self):
+        # signals
+        self.Vfd = np.zeros(self.n)
+        self.Pm = np.zeros(self.n)
+        self.Id = np.zeros(self.n)
+        self.Iq = np.zeros(self.n)
+        self.P = np.zeros(self.n)
+        self.Q = np.zeros(self.n)
+
+    def get_yg(self) -> CxVec:
         """
         Get the generator admittance
         :return: shunt admittance
         """
         return (self.Ra - 1j * 0.5 * (self.Xdp + self.Xqp)) / (self.Ra ** 2.0 + (self.Xdp * self.Xqp))
 
-    def initialise(self, vt0, S0):
+    def initialise(self, vt0: CxVec, S0: CxVec):
         """
         Initialise machine signals and states based on load flow voltage and complex power injection
         :param vt0: complex initial voltage
         :param S0: complex initial power
-        :return:
         """
 
         # Calculate initial armature current
@@ -276,161 +679,86 @@ class SynchronousMachineOrder4:
 
         # Calculate steady state machine emf (i.e. voltage behind synchronous reactance)
         Eq0 = vt0 + (self.Ra + 1j * self.Xq) * Ia0
-        self.delta = np.angle(Eq0)
+        delta = np.angle(Eq0)
 
         # Convert currents to rotor reference frame
-        self.Id = np.abs(Ia0) * np.sin(self.delta - phi0)
-        self.Iq = np.abs(Ia0) * np.cos(self.delta - phi0)
+        self.Id = np.abs(Ia0) * np.sin(delta - phi0)
+        self.Iq = np.abs(Ia0) * np.cos(delta - phi0)
 
         # Convert voltages to rotor reference frame
-        self.Vd = np.abs(vt0) * np.sin(self.delta - np.angle(vt0))
-        self.Vq = np.abs(vt0) * np.cos(self.delta - np.angle(vt0))
+        Vd = np.abs(vt0) * np.sin(delta - np.angle(vt0))
+        Vq = np.abs(vt0) * np.cos(delta - np.angle(vt0))
 
         # Calculate machine state variables and Vfd
-        self.Eqp = self.Vq + self.Ra * self.Iq + self.Xdp * self.Id
-        self.Edp = self.Vd + self.Ra * self.Id - self.Xqp * self.Iq
-        self.Vfd = np.abs(self.Eqp) + (self.Xd - self.Xdp) * self.Id
+        Eqp = Vq + self.Ra * self.Iq + self.Xdp * self.Id
+        Edp = Vd + self.Ra * self.Id - self.Xqp * self.Iq
+        self.Vfd = np.abs(Eqp) + (self.Xd - self.Xdp) * self.Id
 
         # Calculate active and reactive power
-        self.P = (self.Vd + self.Ra * self.Id) * self.Id + (self.Vq + self.Ra * self.Iq) * self.Iq
-        self.Q = self.Vq * self.Id - self.Vd * self.Iq
+        self.P = (Vd + self.Ra * self.Id) * self.Id + (Vq + self.Ra * self.Iq) * self.Iq
+        self.Q = Vq * self.Id - Vd * self.Iq
+        self.Pm = self.P.copy()
 
-        # Initialise the rest
-        self.Vt = np.abs(vt0)
-        self.Pm = self.P
-        self.omega = 1
+        self.x = np.array([Eqp, Edp, np.ones(self.n), delta]).reshape(self.n_states, self.n)
 
         self.check_diffs()
 
-    def calc_currents(self, Vbus, Ibus):
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
         """
         Calculate machine current Injections (in network reference frame)
-        :param vt: complex initial voltage
-        :return:
+        :param V: bus voltages
+        :param x: states
+        :param I: bus current injections
         """
+        sm4_currents(V, self.bus_idx, x, self.Ra, self.Xdp, self.Xqp, self.Yg, self.speed_volt,
+                     self.Id, self.Iq, self.P, self.Q, I)
 
-        vt = Vbus[self.bus_idx]
-
-        # Calculate terminal voltage in dq reference frame
-        self.Vd = np.abs(vt) * np.sin(self.delta - np.angle(vt))
-        self.Vq = np.abs(vt) * np.cos(self.delta - np.angle(vt))
-
-        # Check if speed-voltage term should be included
-        k = np.where(self.speed_volt == False)[0]
-        omega = self.omega
-        omega[k] = np.ones_like(k)
-
-        # Calculate Id and Iq (Norton equivalent current injection in dq frame)
-        self.Id = (self.Eqp - self.Ra / (self.Xqp * omega) * (self.Vd - self.Edp) - self.Vq / omega) / (
-                    self.Xdp + self.Ra ** 2 / (omega * omega * self.Xqp))
-        self.Iq = (self.Vd / omega + self.Ra * self.Id / omega - self.Edp) / self.Xqp
-
-        # Calculate power output
-        self.P = (self.Vd + self.Ra * self.Id) * self.Id + (self.Vq + self.Ra * self.Iq) * self.Iq
-        self.Q = self.Vq * self.Id - self.Vd * self.Iq
-
-        # Calculate machine current injection (Norton equivalent current injection in network frame)
-        self.In = (self.Iq - 1j * self.Id) * np.exp(1j * self.delta)
-        self.Im = self.In + self.Yg * vt
-
-        self.Vt = np.abs(vt)
-        self.Vang = np.angle(vt)
-
-        # apply th currents to the passed vector
-        Ibus[self.bus_idx] = self.Im
-
-    def check_diffs(self):
+    def derivatives(self, x: Mat, dx: Mat):
         """
-        Check if differential equations are zero (on initialisation)
+        Compute the states derivatives
+        :param x: states
+        :param dx: derivatives
         """
+        sm4_derivatives(x, self.Vfd, self.Xd, self.Xdp, self.Xq, self.Xqp, self.Td0p, self.Tq0p, self.H, self.Pm,
+                        self.omega_n, self.Id, self.Iq, self.P, dx)
 
-        # State variables
-        dEqp = (self.Vfd - (self.Xd - self.Xdp) * self.Id - self.Eqp) / self.Td0p
-        dEdp = ((self.Xq - self.Xqp) * self.Iq - self.Edp) / self.Tq0p
-
-        if np.all(np.round(dEdp, 6)) != 0 or np.all(np.round(dEqp, 6)) != 0:
-            warn('Warning: differential equations not zero on initialisation...')
-            print('dEdp = ' + str(dEdp) + ', dEqp = ' + str(dEqp))
-
-    def function(self, h, Eqp, Edp, omega):
+    def get_speed(self, x: Mat) -> Vec:
         """
-        Compute the magnitude's derivatives
-        :param Eqp:
-        :param Edp:
-        :param omega:
-        :return:
+        Rotor speed
+        :param x: states
+        :return: omega
         """
-        # Electrical differential equations
-        f1 = (self.Vfd - (self.Xd - self.Xdp) * self.Id - Eqp) / self.Td0p
+        return x[2, :]
 
-        f2 = ((self.Xq - self.Xqp) * self.Iq - Edp) / self.Tq0p
-
-        # Swing equation
-        f3 = 1.0 / (2.0 * self.H) * (self.Pm / omega - self.P)
-
-        f4 = self.omega_n * (omega - 1.0)
-
-        return h * f1, h * f2, h * f3, h * f4
-
-    def solve(self, h):
+    def get_angle(self, x: Mat) -> Vec:
         """
-        Solve using Runge-Kutta
-        Args:
-            h: step size
-
-        Returns: self.Eqp, self.Edp, self.omega, self.delta
+        Rotor angle
+        :param x: states
+        :return: delta
         """
-        # step 1
-        k1_Eqp, k1_Edp, k1_omega, k1_delta = self.function(h, self.Eqp, self.Edp, self.omega)
-
-        # step 2
-        k2_Eqp, k2_Edp, k2_omega, k2_delta = self.function(h, self.Eqp + 0.5 * k1_Eqp,
-                                                           self.Edp + 0.5 * k1_Edp,
-                                                           self.omega + 0.5 * k1_omega)
-
-        # step 3
-        k3_Eqp, k3_Edp, k3_omega, k3_delta = self.function(h, self.Eqp + 0.5 * k2_Eqp,
-                                                           self.Edp + 0.5 * k2_Edp,
-                                                           self.omega + 0.5 * k2_omega)
-
-        # step 4
-        k4_Eqp, k4_Edp, k4_omega, k4_delta = self.function(h, self.Eqp + 0.5 * k3_Eqp,
-                                                           self.Edp + 0.5 * k3_Edp,
-                                                           self.omega + 0.5 * k3_omega)
-        a = 1.0 / 6.0
-
-        # Tm = Pm / omega_0
-
-        # update the values
-
-        self.Eqp += a * (k1_Eqp + 2.0 * k2_Eqp + 2.0 * k3_Eqp + k4_Eqp)
+        return x[3, :]
 
-        self.Edp += a * (k1_Edp + 2.0 * k2_Edp + 2.0 * k3_Edp + k4_Edp)
 
-        self.omega += a * (k1_omega + 2.0 * k2_omega + 2.0 * k3_omega + k4_omega)
-
-        self.delta += a * (k1_delta + 2.0 * k2_delta + 2.0 * k3_delta + k4_delta)
-
-        return self.Eqp, self.Edp, self.omega, self.delta
-
-
-class SynchronousMachineOrder6SauerPai:
+class SynchronousMachineOrder6SauerPai(DynamicModelGroup):
     """
     PYPOWER-Dynamics
     6th Order Synchronous Machine Model
     Based on Sauer-Pai model
-    Sauer, P.W., Pai, M. A., "Power System Dynamics and Stability", Stipes Publishing, 2006 
+    Sauer, P.W., Pai, M. A., "Power System Dynamics and Stability", Stipes Publishing, 2006
+
+    states: [Eqp, Edp, phid_pp, phiq_pp, omega, delta]
     """
+    n_states = 6
 
     def __init__(self, H, Ra, Xa, Xd, Xdp, Xdpp, Xq, Xqp, Xqpp, Td0p, Tq0p, Td0pp, Tq0pp, base_mva, Sbase, bus_idx,
                  fn=50, speed_volt=False):
 
-        self.omega_n = 2 * np.pi * fn
+        DynamicModelGroup.__init__(self, bus_idx=bus_idx)
 
-        self.bus_idx = bus_idx
+        self.omega_n = 2 * np.pi * fn
 
-        # Check for speed-voltage term option 
-        self.speed_volt = speed_volt
+        # Check for speed-voltage term option
+        self.speed_volt = np.zeros(self.n, dtype=bool) | np.array(speed_volt, dtype=bool)
 
         self.H = H * base_mva / Sbase
         self.Ra = Ra * Sbase / base_mva
@@ -442,7 +770,10 @@ class SynchronousMachineOrder6SauerPai:
         self.Xqp = Xqp * Sbase / base_mva
         self.Xqpp = Xqpp * Sbase / base_mva
 
-        self.Td0p, self.Tq0p, self.Td0pp, self.Tq0pp = Td0p, Tq0p, Td0pp, Tq0pp
+        self.Td0p = np.array(Td0p, dtype=float)
+        self.Tq0p = np.array(Tq0p, dtype=float)
+        self.Td0pp = np.array(Td0pp, dtype=float)
+        self.Tq0pp = np.array(Tq0pp, dtype=float)
 
         # Internal variables
         self.gamma_d1 = (self.Xdpp - self.Xa) / (self.Xdp - self.Xa)
@@ -451,39 +782,28 @@ class SynchronousMachineOrder6SauerPai:
         self.gamma_q2 = (1 - self.gamma_q1) / (self.Xqp - self.Xa)
 
         # Equivalent Norton impedance for Ybus modification
-        self.Yg = (self.Ra - 1j * 0.5 * (self.Xdpp + self.Xqpp)) / (self.Ra ** 2 + (self.Xdpp * self.Xqpp))
+        self.Yg = self.get_yg()
 
-        # results
-        self.Vfd = 0
-        self.Id = 0
-        self.Iq = 0
-        self.Vd = 0
-        self.Vq = 0
-        self.Vt = 0
-        self.Vang = 0
-        self.P = 0
-        self.Q = 0
-        self.Pm = 0
-        self.Tm = 0
-        self.omega = 1
-        self.delta = 0
-        self.Eqp = 0
-        self.phiq_pp = 0
-        self.Edp = 0
-        self.phid_pp = 0
-        self.In = 0
-        self.Im = 0
-
-    def get_yg(self):
+        # signals
+        self.Vfd = np.zeros(self.n)
+        self.Pm = np.zeros(self.n)
+        self.Id = np.zeros(self.n)
+        self.Iq = np.zeros(self.n)
+        self.P = np.zeros(self.n)
+        self.Q = np.zeros(self.n)
+
+    def get_yg(self) -> CxVec:
         """
         Get the generator admittance
         :return: shunt admittance
         """
-        return (self.Ra - 1j * 0.5 * (self.Xdp + self.Xqp)) / (self.Ra ** 2.0 + (self.Xdp * self.Xqp))
+        return (self.Ra - 1j * 0.5 * (self.Xdpp + self.Xqpp)) / (self.Ra ** 2 + (self.Xdpp * self.Xqpp))
 
-    def initialise(self, vt0, S0):
+    def initialise(self, vt0: CxVec, S0: CxVec):
         """
         Initialise machine signals and states based on load flow voltage and complex power injection
+        :param vt0: complex initial voltage
+        :param S0: complex initial power
         """
 
         # Calculate initial armature current
@@ -492,262 +812,152 @@ class SynchronousMachineOrder6SauerPai:
 
         # Calculate steady state machine emf (i.e. voltage behind synchronous reactance)
         Eq0 = vt0 + (self.Ra + 1j * self.Xq) * Ia0
-        self.delta = np.angle(Eq0)
+        delta = np.angle(Eq0)
 
         # Convert currents to rotor reference frame
-        self.Id = np.abs(Ia0) * np.sin(self.delta - phi0)
-        self.Iq = np.abs(Ia0) * np.cos(self.delta - phi0)
+        self.Id = np.abs(Ia0) * np.sin(delta - phi0)
+        self.Iq = np.abs(Ia0) * np.cos(delta - phi0)
 
-        self.Vd = np.abs(vt0) * np.sin(self.delta - np.angle(vt0))
-        self.Vq = np.abs(vt0) * np.cos(self.delta - np.angle(vt0))
+        Vd = np.abs(vt0) * np.sin(delta - np.angle(vt0))
+        Vq = np.abs(vt0) * np.cos(delta - np.angle(vt0))
 
         # Calculate machine state variables and Vfd
-        self.Edp = self.Vd - self.Xqpp * self.Iq + self.Ra * self.Id - (1 - self.gamma_q1) * (
-                    self.Xqp - self.Xa) * self.Iq
-        self.Eqp = self.Vq + self.Xdpp * self.Id + self.Ra * self.Iq + (1 - self.gamma_d1) * (
-                    self.Xdp - self.Xa) * self.Id
-        self.phid_pp = self.Eqp - (self.Xdp - self.Xa) * self.Id
-        self.phiq_pp = -self.Edp - (self.Xqp - self.Xa) * self.Iq
-        self.Vfd = self.Eqp + (self.Xd - self.Xdp) * (
-                    self.Id - self.gamma_d2 * self.phid_pp - (1 - self.gamma_d1) * self.Id + self.gamma_d2 * self.Eqp)
+        Edp = Vd - self.Xqpp * self.Iq + self.Ra * self.Id - (1 - self.gamma_q1) * (self.Xqp - self.Xa) * self.Iq
+        Eqp = Vq + self.Xdpp * self.Id + self.Ra * self.Iq + (1 - self.gamma_d1) * (self.Xdp - self.Xa) * self.Id
+        phid_pp = Eqp - (self.Xdp - self.Xa) * self.Id
+        phiq_pp = -Edp - (self.Xqp - self.Xa) * self.Iq
+        self.Vfd = Eqp + (self.Xd - self.Xdp) * (self.Id - self.gamma_d2 * phid_pp
+                                                 - (1 - self.gamma_d1) * self.Id + self.gamma_d2 * Eqp)
 
         # Calculate active and reactive power
-        self.P = self.Vd * self.Id + self.Vq * self.Iq
-        self.Q = self.Vq * self.Id - self.Vd * self.Iq
+        self.P = Vd * self.Id + Vq * self.Iq
+        self.Q = Vq * self.Id - Vd * self.Iq
+        self.Pm = self.P.copy()
 
-        # Initialise signals, states and parameters
-        self.Vt = np.abs(vt0)
-        self.Vang = 0
-        self.Pm = self.P
-        self.Tm = self.P
-        self.omega = 1
+        self.x = np.array([Eqp, Edp, phid_pp, phiq_pp, np.ones(self.n), delta]).reshape(self.n_states, self.n)
 
         self.check_diffs()
 
-    def check_diffs(self):
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
         """
-        Check if differential equations are zero (on initialisation)
+        Calculate machine current Injections (in network reference frame)
+        :param V: bus voltages
+        :param x: states
+        :param I: bus current injections
         """
+        sm6_currents(V, self.bus_idx, x, self.Ra, self.Xdpp, self.Xqpp, self.gamma_d1, self.gamma_q1, self.Yg,
+                     self.speed_volt, self.Id, self.Iq, self.P, self.Q, I)
 
-        dEqp = (self.Vfd - (self.Xd - self.Xdp)
-                * (self.Id - self.gamma_d2 * self.phid_pp - (1 - self.gamma_d1)
-                   * self.Id + self.gamma_d2 * self.Eqp) - self.Eqp) / self.Td0p
-        dEdp = ((self.Xq - self.Xqp)
-                * (self.Iq - self.gamma_q2 * self.phiq_pp - (1 - self.gamma_q1)
-                   * self.Iq - self.gamma_q2 * self.Edp) - self.Edp) / self.Tq0p
-        dphid_pp = (self.Eqp - (self.Xdp - self.Xa) * self.Id - self.phid_pp) / self.Td0pp
-        dphiq_pp = (-self.Edp - (self.Xqp - self.Xa) * self.Iq - self.phiq_pp) / self.Tq0pp
-
-        if (np.all(np.round(dEdp, 6)) != 0
-                or np.all(np.round(dEqp, 6)) != 0
-                or np.all(np.round(dphid_pp, 6)) != 0
-                or np.all(np.round(dphiq_pp, 6)) != 0):
-            print('Warning: differential equations not zero on initialisation...')
-            print('dEdp = ' + str(dEdp) + ', dEqp = ' + str(dEqp) + ', dphid_pp = ' + str(
-                dphid_pp) + ', dphiq_pp = ' + str(dphiq_pp))
-
-    def calc_currents(self, vt):
+    def derivatives(self, x: Mat, dx: Mat):
         """
-        Calculate machine current Injections (in network reference frame)
+        Compute the states derivatives
+        :param x: states
+        :param dx: derivatives
         """
+        sm6_derivatives(x, self.Vfd, self.Xa, self.Xd, self.Xdp, self.Xq, self.Xqp, self.Td0p, self.Tq0p,
+                        self.Td0pp, self.Tq0pp, self.gamma_d1, self.gamma_d2, self.gamma_q1, self.gamma_q2,
+                        self.H, self.Pm, self.omega_n, self.Id, self.Iq, self.P, dx)
 
-        # Calculate terminal voltage in dq reference frame
-        self.Vd = np.abs(vt) * np.sin(self.delta - np.angle(vt))
-        self.Vq = np.abs(vt) * np.cos(self.delta - np.angle(vt))
-
-        # Check if speed-voltage term should be included
-        if self.speed_volt:
-            omega = self.omega
-        else:
-            omega = 1
-
-        # Calculate Id and Iq (Norton equivalent current injection in dq frame)
-        self.Id = (-self.Vq / omega + self.gamma_d1 * self.Eqp + (1 - self.gamma_d1) * self.phid_pp
-                   - self.Ra / (omega * self.Xqpp)
-                   * (self.Vd - self.gamma_q1 * self.Edp + (1 - self.gamma_q1) * self.phiq_pp)) \
-                  / (self.Xdpp + self.Ra ** 2 / (omega * omega * self.Xqpp))
-
-        self.Iq = (self.Vd / omega + (self.Ra * self.Id / omega) - self.gamma_q1 * self.Edp
-                   + (1 - self.gamma_q1) * self.phiq_pp) / self.Xqpp
-
-        # Calculate power output
-        self.P = (self.Vd + self.Ra * self.Id) * self.Id + (self.Vq + self.Ra * self.Iq) * self.Iq
-        self.Q = self.Vq * self.Id - self.Vd * self.Iq
-        # self.S = np.complex(p, q)
-
-        # Calculate machine current injection (Norton equivalent current injection in network frame)
-        delta = self.delta
-        self.In = (self.Iq - 1j * self.Id) * np.exp(1j * self.delta)
-        self.Im = self.In + self.Yg * vt
-
-        # Update signals
-        self.Vt = np.abs(vt)
-        self.Vang = np.angle(vt)
-
-        return self.Im
-
-    def function(self, Eqp, Edp, omega):
+    def get_speed(self, x: Mat) -> Vec:
         """
-        Solve machine differential equations for the next stage in the integration step
-        :param Eqp:
-        :param Edp:
-        :param omega:
-        :return:
+        Rotor speed
+        :param x: states
+        :return: omega
         """
+        return x[4, :]
 
-        # Eq'
-        f1 = (self.Vfd
-              - (self.Xd - self.Xdp) * (self.Id - self.gamma_d2 * self.phid_pp
-                                        - (1 - self.gamma_d1) * self.Id + self.gamma_d2 * Eqp) - Eqp) / self.Td0p
-
-        # Ed'
-        f2 = ((self.Xq - self.Xqp) * (self.Iq - self.gamma_q2 * self.phiq_pp
-                                      - (1 - self.gamma_q1) * self.Iq - self.gamma_q2 * Edp) - Edp) / self.Tq0p
-
-        # phi d pp
-        f3 = (Eqp - (self.Xdp - self.Xa) * self.Id - self.phid_pp) / self.Td0pp
-
-        # phi_q''
-        f4 = (-Edp - (self.Xqp - self.Xa) * self.Iq - self.phiq_pp) / self.Tq0pp
-
-        # omega
-        f5 = 0.5 / self.H * (self.Pm / omega - self.P)
-
-        # delta
-        f6 = self.omega_n * (omega - 1)
-
-        return f1, f2, f3, f4, f5, f6
+    def get_angle(self, x: Mat) -> Vec:
+        """
+        Rotor angle
+        :param x: states
+        :return: delta
+        """
+        return x[5, :]
 
 
-class VoltageSourceConverterAverage:
+class VoltageSourceConverterAverage(DynamicModelGroup):
     """
     Voltage Source Converter Model Class
     Average model of a VSC in voltage-control mode (i.e. controlled voltage source behind an impedance).
     Copyright (C) 2014-2015 Julius Susanto. All rights reserved.
+
+    The model has no states: the emf is constant
     """
+    n_states = 0
 
     def __init__(self, Rl, Xl, fn, bus_idx):
-        self.bus_idx = bus_idx
+        DynamicModelGroup.__init__(self, bus_idx=bus_idx)
 
         self.Rl = Rl
         self.Xl = Xl
         self.fn = fn
 
-        self.Edq = 0.0
-        self.delta = 0.0
-        self.omega = 0.0
-        self.Id = 0.0
-        self.Iq = 0.0
-        self.Vt = 0.0
-        self.Ed = 0.0
-        self.Eq = 0.0
-        self.Vd = 0.0
-        self.Vq = 0.0
-
-        self.In = 0.0
-        self.Im = 0.0
+        self.Edq = np.zeros(self.n, dtype=complex)
+        self.Ia = np.zeros(self.n, dtype=complex)
 
         # Equivalent Norton impedance for Ybus modification
         self.Yg = self.get_yg()
 
-    def get_yg(self):
+    def get_yg(self) -> CxVec:
         """
         Get the generator admittance
         :return: shunt admittance
         """
         return 1 / (self.Rl + 1j * self.Xl)
 
-    def initialise(self, vt0, S0):
+    def initialise(self, vt0: CxVec, S0: CxVec):
         """
         Initialise converter emf based on load flow voltage and grid current injection
         :param vt0: complex voltage
         :param S0: complex power
         """
         # Calculate initial armature current
-        Ia0 = np.conj(S0 / vt0)
-        phi0 = np.angle(Ia0)
+        self.Ia = np.conj(S0 / vt0)
 
         # Calculate steady state machine emf (i.e. voltage behind synchronous reactance)
-        self.Edq = vt0 + (self.Rl + 1j * self.Xl) * Ia0
-        self.delta = np.angle(self.Edq)
-
-        # Convert currents to rotor reference frame
-        self.Id = np.abs(Ia0) * np.sin(self.delta - phi0)
-        self.Iq = np.abs(Ia0) * np.cos(self.delta - phi0)
+        self.Edq = vt0 + (self.Rl + 1j * self.Xl) * self.Ia
 
-        # Initialise signals, states and parameters
-        self.Vt = np.abs(vt0)
-        self.Ed = np.real(self.Edq)
-        self.Eq = np.imag(self.Edq)
-        self.omega = 1.0
-
-    def calc_currents(self, vt):
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
         """
         Solve grid current Injections (in network reference frame)
-        :param vt: complex voltage
-        :return:
-        """
-        self.Edq = self.Ed + 1j * self.Eq
-        self.delta = np.angle(self.Edq)
-
-        # Calculate terminal voltage in dq reference frame
-        self.Vd = np.abs(vt) * np.sin(self.delta - np.angle(vt))
-        self.Vq = np.abs(vt) * np.cos(self.delta - np.angle(vt))
-
-        # Calculate Id and Iq (Norton equivalent current injection in dq frame)
-        Ia = (self.Edq - vt) / (self.Rl + 1j * self.Xl)
-        phi = np.angle(Ia)
-        self.Id = np.abs(Ia) * np.sin(self.delta - phi)
-        self.Iq = np.abs(Ia) * np.cos(self.delta - phi)
-
-        # Calculate machine current injection (Norton equivalent current injection in network frame)
-        self.In = (self.Iq - 1j * self.Id) * np.exp(1j * self.delta)
-        self.Im = self.In + self.Yg * vt
-        self.Vt = np.abs(vt)
-
-        # self.delta = delta
-
-        return self.Im
-
-    def function(self, h, d):
-        """
-        Solve machine differential equations for the next stage in the integration step
-        :param h: solve step in seconds
+        :param V: bus voltages
+        :param x: states (none)
+        :param I: bus current injections
         """
-
-        # State variables do not change in this model
-        pass
+        vsc_currents(V, self.bus_idx, self.Edq, self.Yg, self.Ia, I)
 
 
-class ExternalGrid:
+class ExternalGrid(DynamicModelGroup):
     """
     External Grid Model Class
     Grid is modelled as a constant voltage behind a transient reactance
     and two differential equations representing the swing equations.
+
+    states: [omega, delta]
     """
+    n_states = 2
 
     def __init__(self, Xdp, H, fn, bus_idx):
-        self.bus_idx = bus_idx
+        DynamicModelGroup.__init__(self, bus_idx=bus_idx)
 
         self.Xdp = Xdp
         self.H = H
         self.fn = fn
+        self.omega_n = 2 * np.pi * fn
 
         # result values
-        self.Vt = 0
-        self.P = 0
-        self.Pm = 0
-        self.Eq = 0
-        self.omega = 0
-        self.delta = 0
+        self.P = np.zeros(self.n)
+        self.Pm = np.zeros(self.n)
+        self.Eq = np.zeros(self.n)
 
-    def initialise(self, vt0, S0):
+    def initialise(self, vt0: CxVec, S0: CxVec):
         """
         Initialise grid emf based on load flow voltage and grid current injection
+        :param vt0: complex voltage
+        :param S0: complex power
         """
         # Calculate initial armature current
         Ia0 = np.conj(S0 / vt0)
-        phi0 = np.angle(Ia0)
 
         # Calculate steady state machine emf (i.e. voltage behind synchronous reactance)
         Eq0 = vt0 + 1j * self.Xdp * Ia0
@@ -756,76 +966,79 @@ class ExternalGrid:
         p0 = 1 / self.Xdp * np.abs(vt0) * np.abs(Eq0) * np.sin(delta0 - np.angle(vt0))
 
         # Initialise signals, states and parameters
-        self.Vt = np.abs(vt0)
         self.P = p0
-        self.Pm = p0
+        self.Pm = p0.copy()
         self.Eq = np.abs(Eq0)
-        self.omega = 1
-        self.delta = delta0
+        self.x = np.array([np.ones(self.n), delta0]).reshape(self.n_states, self.n)
 
-    def get_yg(self):
+    def get_yg(self) -> CxVec:
         """
         Return the shunt admittance
-        Returns:
-
+        :return: shunt admittance
         """
         return 1 / (1j * self.Xdp)
 
-    def calc_currents(self, vt):
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
         """
         Solve grid current Injections (in network reference frame)
+        :param V: bus voltages
+        :param x: states
+        :param I: bus current injections
         """
+        external_grid_currents(V, self.bus_idx, x, self.Eq, self.Xdp, self.P, I)
 
-        self.P = np.abs(vt) * self.Eq * np.sin(self.delta - np.angle(vt)) / self.Xdp
-
-        # Update signals
-        self.Vt = np.abs(vt)
-
-        i_grid = self.Eq * np.exp(1j * self.delta) / (1j * self.Xdp)
-
-        return i_grid
-
-    def function(self, Eqp, Edp, omega):
+    def derivatives(self, x: Mat, dx: Mat):
         """
-        Solve machine differential equations for the next stage in the integration step
+        Compute the states derivatives
+        :param x: states
+        :param dx: derivatives
         """
+        external_grid_derivatives(x, self.H, self.Pm, self.omega_n, self.P, dx)
 
-        # Solve swing equation
-        f1 = 1 / (2 * self.H) * (self.Pm / omega - self.P)
-
-        f2 = 2 * np.pi * self.fn * (omega - 1.0)
-
-        f3 = np.zeros_like(Eqp)
-
-        f4 = np.zeros_like(Eqp)
+    def get_speed(self, x: Mat) -> Vec:
+        """
+        Speed
+        :param x: states
+        :return: omega
+        """
+        return x[0, :]
 
-        return f1, f2, f3, f4
+    def get_angle(self, x: Mat) -> Vec:
+        """
+        Rotor angle
+        :param x: states
+        :return: delta
+        """
+        return x[1, :]
 
 
-class SingleCageAsynchronousMotor:
+class SingleCageAsynchronousMotor(DynamicModelGroup):
     """
     Single Cage Asynchronous Motor Model
 
     Model equations based on section 15.2.4 of:
     Milano, F., "Power System Modelling and Scripting", Springer-Verlag, 2010
 
+    states: [Edp, Eqp, slip]
     """
+    n_states = 3
 
     def __init__(self, H, Rr, Xr, Rs, Xs, a, Xm, MVA_Rating, Sbase, bus_idx, fn=50):
         """
-        
-        :param H: 
-        :param Rr: 
-        :param Xr: 
-        :param Rs: 
-        :param Xs: 
-        :param a: 
-        :param Xm: 
+
+        :param H: inertia constant
+        :param Rr: rotor resistance
+        :param Xr: rotor reactance
+        :param Rs: stator resistance
+        :param Xs: stator reactance
+        :param a: mechanical load torque coefficient
+        :param Xm: magnetizing reactance
+        :param MVA_Rating: machine base power
         :param Sbase: System base power
+        :param bus_idx: bus indices
         :param fn: system frequency
         """
-
-        self.bus_idx = bus_idx
+        DynamicModelGroup.__init__(self, bus_idx=bus_idx)
 
         self.omega_n = 2 * np.pi * fn
 
@@ -839,6 +1052,7 @@ class SingleCageAsynchronousMotor:
         self.Xm = Xm * 100 / self.base_mva
         self.Rr = Rr * 100 / self.base_mva
         self.Xr = Xr * 100 / self.base_mva
+        self.mva_factor = self.base_mva / self.Sbase
 
         # Calculate internal parameters
         self.X0 = self.Xs + self.Xm
@@ -846,158 +1060,79 @@ class SingleCageAsynchronousMotor:
         self.T0p = (self.Xr + self.Xm) / (self.omega_n * self.Rr)
 
         # Motor start signal
-        self.start = 0
+        self.start = np.zeros(self.n, dtype=bool)
 
-        # Equivalent Norton impedance for Ybus modification (NOTE: currently not used)
-        self.Ym = self.Rs - 1j * self.Xs
+        # Equivalent Norton admittance: the stator impedance behind the transient emf
+        self.Yg = self.get_yg()
 
         # results
-        self.Id = np.zeros_like(H)
-        self.Iq = np.zeros_like(H)
-        self.Vd = np.zeros_like(H)
-        self.Vq = np.zeros_like(H)
-        self.Vt = np.zeros_like(H)
-        self.P = np.zeros_like(H)
-        self.Q = np.zeros_like(H)
-        self.Te = np.zeros_like(H)
-        self.slip = np.zeros_like(H)
-        self.Eqp = np.zeros_like(H)
-        self.Edp = np.zeros_like(H)
-        self.omega = 1 - self.slip
-        self.Im = np.zeros_like(H)
-        self.In = np.zeros_like(H)
-        self.Vang = np.zeros_like(H)
-
-    def get_yg(self):
+        self.Id = np.zeros(self.n)
+        self.Iq = np.zeros(self.n)
+        self.P = np.zeros(self.n)
+        self.Q = np.zeros(self.n)
+        self.Te = np.zeros(self.n)
+
+    def get_yg(self) -> CxVec:
         """
-        Get the generator admittance
+        Get the motor admittance
         :return: shunt admittance
         """
-        return 1 / (self.Rr + 1j * self.Xr)
+        return 1 / (self.Rs + 1j * self.Xp)
 
-    def initialise(self, vt0, S0):
+    def initialise(self, vt0: CxVec, S0: CxVec):
         """
         Initialise machine signals and states based on load flow voltage and complex power injection
         NOTE: currently only initialised at standstill
+        :param vt0: complex voltage
+        :param S0: complex power
         """
-
-        # Initialise signals, states and parameters
-        self.Id = 0
-        self.Iq = 0
-        self.Vd = 0
-        self.Vq = 0
-        self.Vt = np.abs(vt0)
-        self.P = 0
-        self.Q = 0
-        self.Te = 0
-        self.omega = 1 - 0
-
-        self.slip = 1
-        self.Eqp = 0
-        self.Edp = 0
+        self.x = np.zeros((self.n_states, self.n))
+        self.x[2, :] = 1.0  # slip
 
         self.check_diffs()
 
-    def calc_tmech(self, s):
-        """
-        Calculate mechanical load torque (with a quadratic load model)
-        :param s: slip
-        :return: 
-        """
-
-        Tm = self.a * (1 - s) ** 2
-
-        return Tm
-
-    def calc_currents(self, vt):
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
         """
         Calculate machine current Injections (in network reference frame)
+        :param V: bus voltages
+        :param x: states
+        :param I: bus current injections
         """
+        motor_currents(V, self.bus_idx, x[0, :], x[1, :], self.Rs, self.Xp, self.Yg, self.start,
+                       self.Id, self.Iq, self.P, self.Q, self.Te, I)
 
-        if self.start == 1:
-            # Calculate terminal voltage in dq reference frame (set to rotate with q-axis)
-            self.Vd = -np.abs(vt) * np.sin(np.angle(vt))
-            self.Vq = np.abs(vt) * np.cos(np.angle(vt))
-
-            # Calculate Id and Iq (Norton equivalent current injection in dq frame)
-            self.Iq = (self.Rs / self.Xp * (self.Vq - self.Eqp) - self.Vd + self.Edp) / (
-                        self.Xp + self.Rs ** 2 / self.Xp)
-            self.Id = (self.Vq - self.Eqp - self.Rs * self.Iq) / self.Xp
-
-            # Calculate power output and electrical torque
-            self.P = -(self.Vd * self.Id + self.Vq * self.Iq)
-            self.Q = -(self.Vq * self.Id - self.Vd * self.Iq)
-            self.Te = (self.Edp * self.Id + self.Eqp * self.Iq)  # / self.omega_n
-
-            # Calculate machine current injection (Norton equivalent current injection in network frame)
-            self.In = (self.Id + 1j * self.Iq) * np.exp(1j * (-np.pi / 2))
-            self.Im = -self.In  # + self.Ym * vt
-
-            # Update signals
-            self.Vt = np.abs(vt)
-            self.Vang = np.angle(vt)
-            self.omega = 1 - self.slip
-
-        else:
-            self.Im = 0
-
-        return self.Im
-
-    def function(self, Edp, Eqp):
+    def derivatives(self, x: Mat, dx: Mat):
         """
-        Solve machine differential equations for the next stage in the integration step
+        Compute the states derivatives
+        :param x: states
+        :param dx: derivatives
         """
+        sam_derivatives(x, self.X0, self.Xp, self.T0p, self.H, self.a, self.mva_factor, self.start,
+                        self.omega_n, self.Id, self.Iq, self.Te, dx)
 
-        if self.start == 1:
-
-            # Eq'
-            f1 = (-self.omega_n * self.slip * Edp - (
-                        Eqp - (self.X0 - self.Xp) * self.Id) / self.T0p) * self.base_mva / self.Sbase
-
-            # Ed'
-            f2 = (self.omega_n * self.slip * Eqp - (
-                        Edp + (self.X0 - self.Xp) * self.Iq) / self.T0p) * self.base_mva / self.Sbase
-
-            # Tm
-            Tm = self.calc_tmech(self.slip)
-            f3 = (Tm - self.Te) / (2 * self.H)
-
-        else:
-            f1 = np.zeros_like(Edp)
-            f2 = np.zeros_like(Edp)
-            f3 = np.zeros_like(Edp)
-
-        return f1, f2, f3
-
-    def check_diffs(self):
+    def get_speed(self, x: Mat) -> Vec:
         """
-        Check if differential equations are zero (on initialisation)
+        Rotor speed
+        :param x: states
+        :return: 1 - slip
         """
-
-        # State variables
-        dEdp = self.omega_n * self.slip * self.Eqp - (self.Edp + (self.X0 - self.Xp) * self.Iq) / self.T0p
-        dEqp = -self.omega_n * self.slip * self.Edp - (self.Eqp - (self.X0 - self.Xp) * self.Id) / self.T0p
-        ds = self.calc_tmech(1) - self.Te
-
-        if (np.all(np.round(dEdp, 6)) != 0
-                or np.all(np.round(dEqp, 6)) != 0
-                or np.all(np.round(ds, 6)) != 0):
-            warn('Warning: differential equations not zero on initialisation...')
-            print('dEdp = ', dEdp, ', dEqp = ', dEqp, ', ds = ', ds)
+        return 1.0 - x[2, :]
 
 
-class DoubleCageAsynchronousMotor:
+class DoubleCageAsynchronousMotor(DynamicModelGroup):
     """
     Double Cage Asynchronous Machine Model
 
     Model equations based on section 15.2.5 of:
     Milano, F., "Power System Modelling and Scripting", Springer-Verlag, 2010
 
+    states: [Edp, Eqp, Edpp, Eqpp, slip]
     """
+    n_states = 5
 
     def __init__(self, H, Rr, Xr, Rs, Xs, a, Xm, Rr2, Xr2, MVA_Rating, Sbase, bus_idx, fn=50):
 
-        self.bus_idx = bus_idx
+        DynamicModelGroup.__init__(self, bus_idx=bus_idx)
 
         self.omega_n = 2 * np.pi * fn
 
@@ -1013,231 +1148,333 @@ class DoubleCageAsynchronousMotor:
         self.Xr = Xr * self.Sbase / self.base_mva
         self.Rr2 = Rr2 * self.Sbase / self.base_mva
         self.Xr2 = Xr2 * self.Sbase / self.base_mva
+        self.mva_factor = self.base_mva / self.Sbase
 
         # Calculate internal parameters
         self.X0 = self.Xs + self.Xm
         self.Xp = self.Xs + self.Xr * self.Xm / (self.Xr + self.Xm)
         self.Xpp = self.Xs + self.Xr * self.Xr2 * self.Xm / (
-                    self.Xr * self.Xr2 + self.Xm * self.Xr + self.Xm * self.Xr2)
+                self.Xr * self.Xr2 + self.Xm * self.Xr + self.Xm * self.Xr2)
         self.T0p = (self.Xr + self.Xm) / (self.omega_n * self.Rr)
         self.T0pp = (self.Xr2 + (self.Xr * self.Xm) / (self.Xr + self.Xm)) / (self.omega_n * self.Rr2)
 
         # Motor start signal
-        self.start = 0
+        self.start = np.zeros(self.n, dtype=bool)
 
-        # Equivalent Norton impedance for Ybus modification (NOTE: currently not used)
-        self.Ym = self.Rs - 1j * self.Xs
+        # Equivalent Norton admittance: the stator impedance behind the subtransient emf
+        self.Yg = self.get_yg()
 
         # results
-        self.Id = 0
-        self.Iq = 0
-        self.Vd = 0
-        self.Vq = 0
-        self.Vt = 0
-        self.P = 0
-        self.Q = 0
-        self.Te = 0
-        self.slip = 0
-        self.Eqp = 0
-        self.Edp = 0
-        self.Eqpp = 0
-        self.Edpp = 0
-        self.omega = 1 - self.slip
-        self.Im = 0.0
-        self.In = 0.0
-        self.Vang = 0.0
-
-    def get_yg(self):
+        self.Id = np.zeros(self.n)
+        self.Iq = np.zeros(self.n)
+        self.P = np.zeros(self.n)
+        self.Q = np.zeros(self.n)
+        self.Te = np.zeros(self.n)
+
+    def get_yg(self) -> CxVec:
         """
-        Get the generator admittance
+        Get the motor admittance
         :return: shunt admittance
         """
-        return 1 / (self.Rr + 1j * self.Xr)
+        return 1 / (self.Rs + 1j * self.Xpp)
 
-    def initialise(self, vt0, S0):
+    def initialise(self, vt0: CxVec, S0: CxVec):
         """
         Initialise machine signals and states based on load flow voltage and complex power injection
         NOTE: currently only initialised at standstill
+        :param vt0: complex voltage
+        :param S0: complex power
         """
-
-        # Initialise signals, states and parameters
-        self.Id = 0
-        self.Iq = 0
-        self.Vd = 0
-        self.Vq = 0
-        self.Vt = np.abs(vt0)
-        self.P = 0
-        self.Q = 0
-        self.Te = 0
-        self.slip = 1
-        self.omega = 1 - self.slip
-
-        self.Eqp = 0
-        self.Edp = 0
-        self.Eqpp = 0
-        self.Edpp = 0
+        self.x = np.zeros((self.n_states, self.n))
+        self.x[4, :] = 1.0  # slip
 
         self.check_diffs()
 
-    def calc_tmech(self, s):
+    def calc_currents(self, V: CxVec, x: Mat, I: CxVec):
+        """
+        Calculate machine current Injections (in network reference frame)
+        :param V: bus voltages
+        :param x: states
+        :param I: bus current injections
+        """
+        motor_currents(V, self.bus_idx, x[2, :], x[3, :], self.Rs, self.Xpp, self.Yg, self.start,
+                       self.Id, self.Iq, self.P, self.Q, self.Te, I)
+
+    def derivatives(self, x: Mat, dx: Mat):
+        """
+        Compute the states derivatives
+        :param x: states
+        :param dx: derivatives
+        """
+        dam_derivatives(x, self.X0, self.Xp, self.Xpp, self.T0p, self.T0pp, self.H, self.a, self.mva_factor,
+                        self.start, self.omega_n, self.Id, self.Iq, self.Te, dx)
+
+    def get_speed(self, x: Mat) -> Vec:
         """
-        Calculate mechanical load torque (with a quadratic load model)
+        Rotor speed
+        :param x: states
+        :return: 1 - slip
         """
+        return 1.0 - x[4, :]
+
+
+########################################################################################################################
+# Simulation
+########################################################################################################################
 
-        Tm = self.a * (1 - s) ** 2
 
-        return Tm
+class DynamicNetwork:
+    """
+    Augmented network of the dynamic simulation
+    The augmented admittance matrix (Ybus + loads + Norton admittances) is factorized once and the
+    factorization is reused until a switching event modifies the matrix. The factorizations are cached
+    by switching state, so the copies of the network (one per simulated scenario) share them.
+    """
 
-    def calc_currents(self, vt):
+    def __init__(self, Ybus: sp.csc_matrix, Y_shunt: CxVec, groups: List[DynamicModelGroup],
+                 Yf: Union[sp.csr_matrix, None] = None, Yt: Union[sp.csr_matrix, None] = None,
+                 Cf: Union[sp.csr_matrix, None] = None, Ct: Union[sp.csr_matrix, None] = None,
+                 max_err: float = 1e-6, max_iter: int = 20):
         """
-        Calculate machine current Injections (in network reference frame)
+
+        :param Ybus: network admittance matrix
+        :param Y_shunt: loads and Norton admittances per bus
+        :param groups: non-empty model groups
+        :param Yf: from admittance matrix (only needed for line events)
+        :param Yt: to admittance matrix (only needed for line events)
+        :param Cf: from connectivity matrix (only needed for line events)
+        :param Ct: to connectivity matrix (only needed for line events)
+        :param max_err: maximum voltage mismatch of the network iterations
+        :param max_iter: maximum number of network iterations
         """
+        self.Ybus = Ybus.tocsc()
+        self.Y_shunt = Y_shunt
+        self.groups = groups
+        self.Yf = Yf
+        self.Yt = Yt
+        self.Cf = Cf
+        self.Ct = Ct
+        self.max_err = max_err
+        self.max_iter = max_iter
 
-        if self.start == 1:
-            # Calculate terminal voltage in dq reference frame (set to rotate with q-axis)
-            self.Vd = -np.abs(vt) * np.sin(np.angle(vt))
-            self.Vq = np.abs(vt) * np.cos(np.angle(vt))
+        self.n = self.Ybus.shape[0]
 
-            # Calculate Id and Iq (Norton equivalent current injection in dq frame)
-            self.Iq = (self.Rs / self.Xpp * (self.Vq - self.Eqpp) - self.Vd + self.Edpp) / (
-                        self.Xpp + self.Rs ** 2 / self.Xpp)
-            self.Id = (self.Vq - self.Eqpp - self.Rs * self.Iq) / self.Xpp
+        # bus faults {bus: admittance} and failed branches
+        self.faults = dict()
+        self.failed_branches = set()
 
-            # Calculate power output and electrical torque
-            self.P = -(self.Vd * self.Id + self.Vq * self.Iq)
-            self.Q = -(self.Vq * self.Id - self.Vd * self.Iq)
-            self.Te = self.Edpp * self.Id + self.Eqpp * self.Iq
+        self.n_factorizations = 0
+        self.n_evaluations = 0
 
-            # Calculate machine current injection (Norton equivalent current injection in network frame)
-            self.In = (self.Id + 1j * self.Iq) * np.exp(1j * (-np.pi / 2))
-            self.Im = -self.In  # + self.Ym * vt
+        # factorizations per switching state, shared by the copies
+        self._lu_cache = dict()
+        self.lu = None
+        self.factorize()
 
-            # Update signals
-            self.Vt = np.abs(vt)
-            self.Vang = np.angle(vt)
-            self.omega = 1 - self.slip
+        # state slices per group in the flat state vector
+        self.slices = list()
+        a = 0
+        for grp in self.groups:
+            b = a + grp.n_states * grp.n
+            self.slices.append((a, b))
+            a = b
+        self.n_states = a
 
-        else:
-            self.Im = 0
+        # initial (pre-disturbance) states and voltages
+        self.x0: Vec = np.zeros(self.n_states)
+        self.V0: CxVec = np.zeros(self.n, dtype=complex)
+
+        # device indices per group
+        self.n_machines = 0
+        self.machine_idx: List[IntVec] = [np.zeros(grp.n, dtype=int) for grp in self.groups]
+
+        self.V: CxVec = np.zeros(self.n, dtype=complex)
+        self.I: CxVec = np.zeros(self.n, dtype=complex)
+
+    def __getstate__(self):
+        """
+        The factorizations cannot be pickled, they are rebuilt on demand
+        """
+        state = self.__dict__.copy()
+        state['lu'] = None
+        state['_lu_cache'] = dict()
+        return state
 
-        return self.Im
+    def __setstate__(self, state):
+        """
+        Restore the pickled state and factorize the current switching state
+        """
+        self.__dict__.update(state)
+        self.factorize()
 
-    def solve_step(self, Edp, Eqp, Edpp, Eqpp):
+    def copy(self) -> "DynamicNetwork":
         """
-        Solve machine differential equations for the next stage in the integration step
+        Copy of the network at its initial state, the parameters, the model groups and the
+        cached factorizations are shared (the groups signals are recomputed at every evaluation)
+        :return: DynamicNetwork
         """
+        cpy = DynamicNetwork.__new__(DynamicNetwork)
+        cpy.__dict__.update(self.__dict__)
+        cpy.faults = dict()
+        cpy.failed_branches = set()
+        cpy.n_factorizations = 0
+        cpy.n_evaluations = 0
+        cpy.V = self.V0.copy()
+        cpy.I = np.zeros(self.n, dtype=complex)
+        cpy.factorize()
+        return cpy
 
-        if self.start == 1:
+    def factorize(self):
+        """
+        Build and factorize the augmented admittance matrix, or take it from the cache
+        """
+        key = (tuple(sorted(self.faults.items())), tuple(sorted(self.failed_branches)))
+        lu = self._lu_cache.get(key, None)
 
-            # Eq'
-            f1 = (-self.omega_n * self.slip * Edp - (
-                        Eqp - (self.X0 - self.Xp) * self.Id) / self.T0p) * self.base_mva / self.Sbase
-            # k_Eqp = h * f1
+        if lu is None:
+            y = self.Y_shunt.copy()
+            for bus, y_fault in self.faults.items():
+                y[bus] += y_fault
 
-            # Ed'
-            f2 = (self.omega_n * self.slip * Eqp - (
-                        Edp + (self.X0 - self.Xp) * self.Iq) / self.T0p) * self.base_mva / self.Sbase
-            # k_Edp = h * f2
+            Yaug = self.Ybus + sp.diags(y)
+
+            if len(self.failed_branches):
+                br = np.array(list(self.failed_branches), dtype=int)
+                Yaug = Yaug - self.Cf[br, :].T @ self.Yf[br, :] - self.Ct[br, :].T @ self.Yt[br, :]
+
+            lu = splu(sp.csc_matrix(Yaug))
+            self._lu_cache[key] = lu
+            self.n_factorizations += 1
+
+        self.lu = lu
+
+    def apply_event(self, event_type: str, obj: int, param):
+        """
+        Apply a switching event and refactorize the augmented admittance matrix
+        :param event_type: one of TransientStabilityEvents.events_available
+        :param obj: bus or branch index
+        :param param: fault admittance for the bus short circuits (p.u.)
+        """
+        if event_type == 'Bus short circuit':
+            self.faults[obj] = 1e6 if param is None else param
 
-            # Eq''
-            f3 = f1 + (self.omega_n * self.slip * (Edp - Edpp) + (
-                    Eqp - Eqpp + (self.Xp - self.Xpp) * self.Id) / self.T0pp) * self.base_mva / self.Sbase
-            # k_Eqpp = h * f3
+        elif event_type == 'Bus recovery':
+            self.faults.pop(obj, None)
 
-            # Ed''
-            f4 = f2 + (-self.omega_n * self.slip * (Eqp - Eqpp) + (
-                    Edp - Edpp - (self.Xp - self.Xpp) * self.Iq) / self.T0pp) * self.base_mva / self.Sbase
-            # k_Edpp = h * f4
+        elif event_type in ['Line failure', 'Line recovery']:
+            if self.Yf is None or self.Yt is None or self.Cf is None or self.Ct is None:
+                raise Exception('The line events need the branch admittance and connectivity matrices')
 
-            # Mechanical equation
-            Tm = self.calc_tmech(self.slip)
-            f5 = (Tm - self.Te) / (2 * self.H)
-            # k_s = h * f5
+            if event_type == 'Line failure':
+                self.failed_branches.add(obj)
+            else:
+                self.failed_branches.discard(obj)
 
         else:
-            f1 = np.zeros_like(Edp)
-            f2 = np.zeros_like(Edp)
-            f3 = np.zeros_like(Edp)
-            f4 = np.zeros_like(Edp)
-            f5 = np.zeros_like(Edp)
+            raise Exception('Event not supported!')
 
-        return f1, f2, f3, f4, f5
+        self.factorize()
 
-    def check_diffs(self):
+    def group_states(self, x: Vec) -> List[Mat]:
         """
-        Check if differential equations are zero (on initialisation)
+        Views of the flat state vector per group
+        :param x: flat state vector
+        :return: list of (n_states, n) matrices
         """
+        return [x[a:b].reshape(grp.n_states, grp.n) for grp, (a, b) in zip(self.groups, self.slices)]
 
-        # State variables
-        # Eqp_0 = self.Eqp
-        # Edp_0 = self.Edp
-        # self.slip = self.slip
-        # 
-        # Id = self.Id
-        # Iq = self.Iq
-        # Te = self.Te
-        # 
-        # Rs = self.Rs
-        # X0 = self.X0
-        # T0p = self.T0p
-        # Xp = self.Xp
+    def solve(self, x: Vec) -> CxVec:
+        """
+        Solve the network voltages for the given states
+        The machine injections depend on the voltage, so the solution is iterated with the same factorization
+        :param x: flat state vector
+        :return: bus voltages
+        """
+        xs = self.group_states(x)
+        V = self.V
+        for it in range(self.max_iter):
+            self.I.fill(0.0)
+            for grp, xg in zip(self.groups, xs):
+                grp.calc_currents(V, xg, self.I)
 
-        dEdp = self.omega_n * self.slip * self.Eqp - (self.Edp + (self.X0 - self.Xp) * self.Iq) / self.T0p
-        dEqp = -self.omega_n * self.slip * self.Edp - (self.Eqp - (self.X0 - self.Xp) * self.Id) / self.T0p
-        ds = self.calc_tmech(1) - self.Te
+            V_new = self.lu.solve(self.I)
+            err = np.max(np.abs(V_new - V)) if self.n else 0.0
+            V = V_new
+            if err < self.max_err:
+                break
 
-        if (np.all(np.round(dEdp, 6)) != 0
-                or np.all(np.round(dEqp, 6)) != 0
-                or np.all(np.round(ds, 6)) != 0):
-            print('Warning: differential equations not zero on initialisation...')
-            print('dEdp = ' + str(dEdp) + ', dEqp = ' + str(dEqp) + ', ds = ' + str(ds))
+        self.V = V
+        return V
 
+    def f(self, x: Vec) -> Vec:
+        """
+        Compute the state derivatives, solving the network first
+        :param x: flat state vector
+        :return: flat derivatives vector
+        """
+        self.solve(x)
 
-def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devices=list(), bus_indices=list(),
-                       callback=None):
+        # update the algebraic signals to the converged voltage
+        self.I.fill(0.0)
+        dx = np.zeros_like(x)
+        for grp, xg, dxg in zip(self.groups, self.group_states(x), self.group_states(dx)):
+            grp.calc_currents(self.V, xg, self.I)
+            grp.derivatives(xg, dxg)
+
+        self.n_evaluations += 1
+        return dx
+
+    def get_speed(self, x: Vec) -> Vec:
+        """
+        Speed of every machine in the original device order
+        :param x: flat state vector
+        :return: speeds
+        """
+        w = np.ones(self.n_machines)
+        for grp, xg, idx in zip(self.groups, self.group_states(x), self.machine_idx):
+            w[idx] = grp.get_speed(xg)
+        return w
+
+    def get_angle_separation(self, x: Vec) -> float:
+        """
+        Largest rotor angle difference between the machines that have a rotor angle
+        :param x: flat state vector
+        :return: separation (rad)
+        """
+        lo = np.inf
+        hi = -np.inf
+        for grp, xg in zip(self.groups, self.group_states(x)):
+            delta = grp.get_angle(xg)
+            if delta is not None and len(delta):
+                lo = min(lo, delta.min())
+                hi = max(hi, delta.max())
+
+        return hi - lo if hi >= lo else 0.0
+
+
+def build_dynamic_network(n, Vbus, Sbus, Ybus, Sbase, fBase, dynamic_devices=list(), bus_indices=list(),
+                          Yf=None, Yt=None, Cf=None, Ct=None, max_err=1e-6, max_iter=20) -> DynamicNetwork:
     """
-    Dynamic transient simulation of a power system
+    Initialise the dynamic devices from the power flow solution and factorize the augmented network
     Args:
         n: number of nodes
-        Vbus:
-        Ybus:
-        Sbase:
+        Vbus: initial voltages (power flow solution)
+        Sbus: initial power injections (power flow solution)
+        Ybus: admittance matrix
+        Sbase: base power
         fBase: base frequency i.e. 50Hz
-        t_sim:
-        h:
         dynamic_devices: objects of each machine
-        bus_indices:
+        bus_indices: bus index of each machine
+        Yf, Yt, Cf, Ct: branch matrices, only needed for line events
+        max_err: maximum voltage mismatch of the network iterations
+        max_iter: maximum number of network iterations per derivatives evaluation
 
-    Returns:
+    Returns: DynamicNetwork at the initial state
 
     """
-    max_err = 1e-3
-    max_iter = 20
 
     # compose dynamic controllers
-    '''
-    class DynamicModels(Enum):
-    NoModel = 0,
-    SM4 = 1,
-    SM6b = 2,
-    VSC = 3,
-    EG = 4,
-    SAM = 5,
-    DAM = 6  
-    '''
-    sm4_idx = list()
-    sm6b_idx = list()
-    vsc_idx = list()
-    eg_idx = list()
-    sam_idx = list()
-    dam_idx = list()
-
-    sm4_bus_idx = list()
-    sm6b_bus_idx = list()
-    vsc_bus_idx = list()
-    eg_bus_idx = list()
-    sam_bus_idx = list()
-    dam_bus_idx = list()
+    model_indices = {model: list() for model in DynamicModels}
 
     n_obj = len(dynamic_devices)
     H = np.zeros(n_obj)
@@ -1265,98 +1502,87 @@ def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devi
     Xr2 = np.zeros(n_obj)
     speed_volt = np.zeros(n_obj, dtype=bool)
 
-    machine_types = [None] * n_obj
-
     # extract the parameters from the objects into the arrays
     for k, machine in enumerate(dynamic_devices):
 
-        # store the machine model in a list for later
-        machine_types[k] = machine.machine_model
-
-        # store the machine data into the representing vector
-        if machine.machine_model == DynamicModels.NoModel:  # no model
-            pass
-
-        elif machine.machine_model == DynamicModels.SynchronousGeneratorOrder4:  # fourth order synchronous machine
-
-            H[k] = dynamic_devices[k].H
-            Ra[k] = dynamic_devices[k].Ra
-            Xd[k] = dynamic_devices[k].Xd
-            Xa[k] = dynamic_devices[k].Xa
-            Xdp[k] = dynamic_devices[k].Xdp
-            Xdpp[k] = dynamic_devices[k].Xdpp
-            Xq[k] = dynamic_devices[k].Xq
-            Xqp[k] = dynamic_devices[k].Xqp
-            Xqpp[k] = dynamic_devices[k].Xqpp
-            Td0p[k] = dynamic_devices[k].Td0p
-            Tq0p[k] = dynamic_devices[k].Tq0p
-            base_mva[k] = dynamic_devices[k].Snom
-            speed_volt[k] = dynamic_devices[k].speed_volt
-            sm4_idx.append(k)
-            sm4_bus_idx.append(bus_indices[k])
+        # store the machine index per model
+        model_indices[machine.machine_model].append(k)
+
+        if machine.machine_model == DynamicModels.SynchronousGeneratorOrder4:  # fourth order synchronous machine
+
+            H[k] = machine.H
+            Ra[k] = machine.Ra
+            Xd[k] = machine.Xd
+            Xdp[k] = machine.Xdp
+            Xdpp[k] = machine.Xdpp
+            Xq[k] = machine.Xq
+            Xqp[k] = machine.Xqp
+            Xqpp[k] = machine.Xqpp
+            Td0p[k] = machine.Td0p
+            Tq0p[k] = machine.Tq0p
+            base_mva[k] = machine.Snom
+            speed_volt[k] = machine.speed_volt
 
         elif machine.machine_model == DynamicModels.SynchronousGeneratorOrder6:  # sixth order synchronous machine
 
-            H[k] = dynamic_devices[k].H
-            Ra[k] = dynamic_devices[k].Ra
-            Xd[k] = dynamic_devices[k].Xd
-            Xdp[k] = dynamic_devices[k].Xdp
-            Xdpp[k] = dynamic_devices[k].Xdpp
-            Xq[k] = dynamic_devices[k].Xq
-            Xqp[k] = dynamic_devices[k].Xqp
-            Xqpp[k] = dynamic_devices[k].Xqpp
-            Td0p[k] = dynamic_devices[k].Td0p
-            Tq0p[k] = dynamic_devices[k].Tq0p
-            Td0pp[k] = dynamic_devices[k].Td0pp
-            Tq0pp[k] = dynamic_devices[k].Tq0pp
-            base_mva[k] = dynamic_devices[k].Snom
-            speed_volt[k] = dynamic_devices[k].speed_volt
-            sm6b_idx.append(k)
-            sm6b_bus_idx.append(bus_indices[k])
+            H[k] = machine.H
+            Ra[k] = machine.Ra
+            Xa[k] = machine.Xa
+            Xd[k] = machine.Xd
+            Xdp[k] = machine.Xdp
+            Xdpp[k] = machine.Xdpp
+            Xq[k] = machine.Xq
+            Xqp[k] = machine.Xqp
+            Xqpp[k] = machine.Xqpp
+            Td0p[k] = machine.Td0p
+            Tq0p[k] = machine.Tq0p
+            Td0pp[k] = machine.Td0pp
+            Tq0pp[k] = machine.Tq0pp
+            base_mva[k] = machine.Snom
+            speed_volt[k] = machine.speed_volt
 
         elif machine.machine_model == DynamicModels.VoltageSourceConverter:  # voltage source converter
 
             # R1, X1, fn
-            Ra[k] = dynamic_devices[k].R1
-            Xd[k] = dynamic_devices[k].X1
-            vsc_idx.append(k)
-            vsc_bus_idx.append(bus_indices[k])
+            Ra[k] = machine.R1
+            Xd[k] = machine.X1
 
         elif machine.machine_model == DynamicModels.ExternalGrid:  # external grid
             # Xdp, H
-            H[k] = dynamic_devices[k].H
-            Xdp[k] = dynamic_devices[k].Xdp
-            eg_idx.append(k)
-            eg_bus_idx.append(bus_indices[k])
+            H[k] = machine.H
+            Xdp[k] = machine.Xdp
 
         elif machine.machine_model == DynamicModels.AsynchronousSingleCageMotor:  # single cage asynchronous motor
             # H, Rr, Xr, Rs, Xs, a, Xm, Sbase, MVA_Rating
-            H[k] = dynamic_devices[k].H
-            Rr[k] = dynamic_devices[k].Rr
-            Xr[k] = dynamic_devices[k].Xr
-            Rs[k] = dynamic_devices[k].Rs
-            Xs[k] = dynamic_devices[k].Xs
-            Xq[k] = dynamic_devices[k].Xq
-            a[k] = dynamic_devices[k].a
-            Xm[k] = dynamic_devices[k].Xm
-            base_mva[k] = dynamic_devices[k].MVA_Rating
-            sam_idx.append(k)
-            sam_bus_idx.append(bus_indices[k])
+            H[k] = machine.H
+            Rr[k] = machine.Rr
+            Xr[k] = machine.Xr
+            Rs[k] = machine.Rs
+            Xs[k] = machine.Xs
+            a[k] = machine.a
+            Xm[k] = machine.Xm
+            base_mva[k] = machine.MVA_Rating
 
         elif machine.machine_model == DynamicModels.AsynchronousDoubleCageMotor:  # double cage asynchronous motor
             # H, Rr, Xr, Rs, Xs, a, Xm, Rr2, Xr2, MVA_Rating, Sbase
-            H[k] = dynamic_devices[k].H
-            Rr[k] = dynamic_devices[k].Rr
-            Xr[k] = dynamic_devices[k].Xr
-            Rs[k] = dynamic_devices[k].Rs
-            Xs[k] = dynamic_devices[k].Xs
-            Rr2[k] = dynamic_devices[k].Rr2
-            Xr2[k] = dynamic_devices[k].Xr2
-            a[k] = dynamic_devices[k].a
-            Xm[k] = dynamic_devices[k].Xm
-            base_mva[k] = dynamic_devices[k].MVA_Rating
-            dam_idx.append(k)
-            dam_bus_idx.append(bus_indices[k])
+            H[k] = machine.H
+            Rr[k] = machine.Rr
+            Xr[k] = machine.Xr
+            Rs[k] = machine.Rs
+            Xs[k] = machine.Xs
+            Rr2[k] = machine.Rr2
+            Xr2[k] = machine.Xr2
+            a[k] = machine.a
+            Xm[k] = machine.Xm
+            base_mva[k] = machine.MVA_Rating
+
+    bus_indices = np.array(bus_indices, dtype=int)
+    sm4_idx = np.array(model_indices[DynamicModels.SynchronousGeneratorOrder4], dtype=int)
+    sm6b_idx = np.array(model_indices[DynamicModels.SynchronousGeneratorOrder6], dtype=int)
+    vsc_idx = np.array(model_indices[DynamicModels.VoltageSourceConverter], dtype=int)
+    eg_idx = np.array(model_indices[DynamicModels.ExternalGrid], dtype=int)
+    sam_idx = np.array(model_indices[DynamicModels.AsynchronousSingleCageMotor], dtype=int)
+    dam_idx = np.array(model_indices[DynamicModels.AsynchronousDoubleCageMotor], dtype=int)
 
     # create the controllers
     sm4 = SynchronousMachineOrder4(H=H[sm4_idx],
@@ -1366,12 +1592,12 @@ def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devi
                                    Xdpp=Xdpp[sm4_idx],
                                    Xq=Xq[sm4_idx],
                                    Xqp=Xqp[sm4_idx],
-                                   Xqpp=Xqp[sm4_idx],
+                                   Xqpp=Xqpp[sm4_idx],
                                    Td0p=Td0p[sm4_idx],
                                    Tq0p=Tq0p[sm4_idx],
                                    base_mva=base_mva[sm4_idx],
                                    Sbase=Sbase,
-                                   bus_idx=sm4_bus_idx,
+                                   bus_idx=bus_indices[sm4_idx],
                                    fn=fBase,
                                    speed_volt=speed_volt[sm4_idx])
 
@@ -1390,13 +1616,13 @@ def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devi
                                            Tq0pp=Tq0pp[sm6b_idx],
                                            base_mva=base_mva[sm6b_idx],
                                            Sbase=Sbase,
-                                           bus_idx=sm6b_bus_idx,
+                                           bus_idx=bus_indices[sm6b_idx],
                                            fn=fBase,
                                            speed_volt=speed_volt[sm6b_idx])
 
-    vsc = VoltageSourceConverterAverage(Rl=Ra[vsc_idx], Xl=Xd[vsc_idx], fn=fBase, bus_idx=vsc_bus_idx)
+    vsc = VoltageSourceConverterAverage(Rl=Ra[vsc_idx], Xl=Xd[vsc_idx], fn=fBase, bus_idx=bus_indices[vsc_idx])
 
-    exg = ExternalGrid(Xdp=Xdp[eg_idx], H=H[eg_idx], fn=fBase, bus_idx=eg_bus_idx)
+    exg = ExternalGrid(Xdp=Xdp[eg_idx], H=H[eg_idx], fn=fBase, bus_idx=bus_indices[eg_idx])
 
     sam = SingleCageAsynchronousMotor(H=H[sam_idx],
                                       Rr=Rr[sam_idx],
@@ -1407,7 +1633,7 @@ def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devi
                                       Xm=Xm[sam_idx],
                                       MVA_Rating=base_mva[sam_idx],
                                       Sbase=Sbase,
-                                      bus_idx=sam_bus_idx,
+                                      bus_idx=bus_indices[sam_idx],
                                       fn=fBase)
 
     dam = DoubleCageAsynchronousMotor(H=H[dam_idx],
@@ -1421,71 +1647,277 @@ def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devi
                                       Xr2=Xr2[dam_idx],
                                       MVA_Rating=base_mva[dam_idx],
                                       Sbase=Sbase,
-                                      bus_idx=dam_bus_idx,
+                                      bus_idx=bus_indices[dam_idx],
                                       fn=fBase)
 
-    # modify Ybus to add the admittances
+    all_groups = [sm4, sm6, vsc, exg, sam, dam]
+    all_idx = [sm4_idx, sm6b_idx, vsc_idx, eg_idx, sam_idx, dam_idx]
+    groups = [grp for grp in all_groups if grp.n > 0]
+    machine_idx = [idx for grp, idx in zip(all_groups, all_idx) if grp.n > 0]
 
+    # the buses without machines hold their net injection as a constant admittance load,
+    # the machines of a bus share its net injection evenly
+    n_per_bus = np.bincount(bus_indices, minlength=n) if n_obj else np.zeros(n, dtype=int)
+    no_machine = n_per_bus == 0
     Y_shunt = np.zeros(n, dtype=complex)
-    load_idx = np.where(Sbus > 0)[0]
-    Y_shunt[load_idx] = Sbus[load_idx] / np.power(Vbus[load_idx], 2)  # add loads as admittances
+    Y_shunt[no_machine] = -np.conj(Sbus[no_machine]) / np.power(np.abs(Vbus[no_machine]), 2)
+    S_machine = Sbus[bus_indices] / np.maximum(n_per_bus[bus_indices], 1) if n_obj else np.zeros(0, dtype=complex)
+
+    # initialize machines and add their Norton admittances
+    for grp, idx in zip(groups, machine_idx):
+        grp.initialise(vt0=Vbus[grp.bus_idx], S0=S_machine[idx])
+        np.add.at(Y_shunt, grp.bus_idx, grp.get_yg() * np.ones(grp.n))
+
+    # factorize the augmented admittance matrix
+    network = DynamicNetwork(Ybus=Ybus, Y_shunt=Y_shunt, groups=groups, Yf=Yf, Yt=Yt, Cf=Cf, Ct=Ct,
+                             max_err=max_err, max_iter=max_iter)
+    network.V0 = Vbus.astype(complex).copy()
+    network.V = network.V0.copy()
+    network.n_machines = n_obj
+    network.machine_idx = machine_idx
+
+    # flat state vector
+    for grp, (i, j) in zip(groups, network.slices):
+        network.x0[i:j] = grp.x.ravel()
+
+    return network
+
+
+def simulate(network: DynamicNetwork, t_sim, h, callback=None, solver: DiffEqSolver = DiffEqSolver.RUNGE_KUTTA,
+             events: Union[TransientStabilityEvents, None] = None, h_out=None,
+             rtol=1e-4, atol=1e-6, h_min=1e-5, h_max=0.05,
+             max_angle_separation: Union[float, None] = None) -> TransientStabilityResults:
+    """
+    Integrate the dynamic network from its initial state
+    Args:
+        network: DynamicNetwork (its switching state is modified by the events, pass a copy to reuse it)
+        t_sim: simulation time (s)
+        h: integration step (s); initial step for the adaptive solver
+        callback: function(txt, progress) to report progress
+        solver: DiffEqSolver
+        events: TransientStabilityEvents
+        h_out: results sampling interval (s), defaults to h
+        rtol: relative tolerance of the adaptive solver
+        atol: absolute tolerance of the adaptive solver
+        h_min: minimum step of the adaptive solver (s)
+        h_max: maximum step of the adaptive solver (s)
+        max_angle_separation: the simulation stops as unstable when the rotor angle separation exceeds this (rad)
+
+    Returns: TransientStabilityResults
 
-    Y_shunt[sm4.bus_idx] += sm4.get_yg()
-    Y_shunt[sm6.bus_idx] += sm6.get_yg()
-    Y_shunt[vsc.bus_idx] += vsc.get_yg()
-    Y_shunt[exg.bus_idx] += exg.get_yg()
-    Y_shunt[sam.bus_idx] += sam.get_yg()
-    Y_shunt[dam.bus_idx] += dam.get_yg()
+    """
+    n = network.n
+    n_obj = network.n_machines
+    x = network.x0.copy()
 
-    ib = range(n)
-    Ydiag = sparse((Y_shunt, (ib, ib)))
+    # events sorted by time
+    if events is not None:
+        evt_order = events.get_sorted_indices()
+        evt_time = np.array(events.time, dtype=float)[evt_order]
+    else:
+        evt_order = np.zeros(0, dtype=int)
+        evt_time = np.zeros(0)
+    evt_ptr = 0
 
-    # factorize the impedance matrix
-    Zbus = splu(Ybus + Ydiag)
+    def apply_events_until(t_now: float, ptr: int) -> int:
+        """
+        Apply the pending events with time <= t_now
+        """
+        while ptr < len(evt_order) and evt_time[ptr] <= t_now + 1e-12:
+            e = evt_order[ptr]
+            network.apply_event(events.event_type[e], events.object[e], events.params[e])
+            ptr += 1
+        return ptr
 
-    # copy the initial voltage
-    V = Vbus.copy()
-    I = np.zeros(n, dtype=complex)
+    # preallocate the results
+    if h_out is None:
+        h_out = h
 
-    # initialize machines
-    sm4.initialise(vt0=Vbus[sm4_bus_idx], S0=Sbus[sm4_bus_idx])
-    sm6.initialise(vt0=Vbus[sm6b_bus_idx], S0=Sbus[sm6b_bus_idx])
-    vsc.initialise(vt0=Vbus[vsc_bus_idx], S0=Sbus[vsc_bus_idx])
-    exg.initialise(vt0=Vbus[eg_bus_idx], S0=Sbus[eg_bus_idx])
-    sam.initialise(vt0=Vbus[sam_bus_idx], S0=Sbus[sam_bus_idx])
-    dam.initialise(vt0=Vbus[dam_bus_idx], S0=Sbus[dam_bus_idx])
+    if solver == DiffEqSolver.RUNGE_KUTTA_ADAPTIVE:
+        n_sub = 1
+    else:
+        n_sub = max(1, int(round(h_out / h)))
+        h_out = n_sub * h
 
-    voltages = list()
-    omegas = list()
+    n_out = int(np.floor(t_sim / h_out + 1e-9)) + 1
+    res = TransientStabilityResults(n_time=n_out, n_bus=n, n_machines=n_obj)
+    res.time = np.arange(n_out) * h_out
 
-    # iterate
-    t = 0.0
-    time = list()
-    while t < t_sim:
+    report_every = max(1, n_out // 100)
 
-        sm4.solve(h)
+    def check_separation(x_now: Vec, t_now: float) -> bool:
+        """
+        Track the rotor angle separation and tell if the instability criterion is reached
+        """
+        sep = network.get_angle_separation(x_now)
+        res.max_angle_separation = max(res.max_angle_separation, sep)
+        if max_angle_separation is not None and sep > max_angle_separation:
+            res.stable = False
+            res.t_separation = t_now
+            return True
+        return False
 
-        # compute machine currents
+    def report(i_out: int):
+        """
+        Report the progress
+        """
+        if callback is not None and i_out % report_every == 0:
+            callback('Running transient stability t:' + str(res.time[i_out]), i_out / n_out * 100)
+
+    if solver in [DiffEqSolver.EULER, DiffEqSolver.RUNGE_KUTTA]:
 
-        sm4.calc_currents(V, I)
+        n_steps = (n_out - 1) * n_sub + 1
+        i_out = 0
+        for i in range(n_steps):
+            t = i * h
 
-        # solve voltages
-        V = Zbus.solve(I)
+            evt_ptr = apply_events_until(t, evt_ptr)
 
-        voltages.append(V)
-        omegas.append(sm4.omega)
-        time.append(t)
+            # the first stage solves the network for the current states
+            k1 = network.f(x)
 
-        t += h
+            if i % n_sub == 0:
+                res.voltage[i_out, :] = network.V
+                res.omega[i_out, :] = network.get_speed(x)
+                report(i_out)
+                i_out += 1
 
-        if callback is not None:
-            progress = t / t_sim * 100
-            txt = 'Running transient stability t:' + str(t)
-            callback(txt, progress)
+            if check_separation(x, t):
+                break
 
-    res = TransientStabilityResults()
-    res.voltage = np.array(voltages)
-    res.omegas = np.array(omegas)
-    res.time = np.array(time)
+            if i == n_steps - 1:
+                break
+
+            if solver == DiffEqSolver.EULER:
+                x = x + h * k1
+            else:
+                k2 = network.f(x + 0.5 * h * k1)
+                k3 = network.f(x + 0.5 * h * k2)
+                k4 = network.f(x + h * k3)
+                x = x + h / 6.0 * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+
+    elif solver == DiffEqSolver.RUNGE_KUTTA_ADAPTIVE:
+
+        t = 0.0
+        t_end = res.time[-1]
+        evt_ptr = apply_events_until(t, evt_ptr)
+        k1 = network.f(x)
+        V = network.V.copy()
+        w = network.get_speed(x)
+        res.voltage[0, :] = V
+        res.omega[0, :] = w
+        i_out = 1
+        h_try = min(h, h_max)
+
+        while i_out < n_out:
+
+            # do not step over the events
+            t_stop = t_end
+            if evt_ptr < len(evt_time):
+                t_stop = min(t_stop, evt_time[evt_ptr])
+            h_step = min(h_try, t_stop - t)
+            land = h_step >= t_stop - t - 1e-12
+
+            # Bogacki-Shampine 3(2)
+            k2 = network.f(x + 0.5 * h_step * k1)
+            k3 = network.f(x + 0.75 * h_step * k2)
+            x_new = x + h_step * (2.0 / 9.0 * k1 + 1.0 / 3.0 * k2 + 4.0 / 9.0 * k3)
+            k4 = network.f(x_new)
+            err_vec = h_step * (-5.0 / 72.0 * k1 + 1.0 / 12.0 * k2 + 1.0 / 9.0 * k3 - 1.0 / 8.0 * k4)
+            scale = atol + rtol * np.maximum(np.abs(x), np.abs(x_new))
+            err = np.sqrt(np.mean((err_vec / scale) ** 2)) if len(x) else 0.0
+
+            if err <= 1.0 or h_step <= h_min:
+                # accept the step
+                t_new = t_stop if land else t + h_step
+                V_new = network.V.copy()
+                w_new = network.get_speed(x_new)
+
+                # interpolate the results at the output times within the step
+                while i_out < n_out and res.time[i_out] <= t_new + 1e-12:
+                    alpha = (res.time[i_out] - t) / (t_new - t) if t_new > t else 1.0
+                    res.voltage[i_out, :] = V + alpha * (V_new - V)
+                    res.omega[i_out, :] = w + alpha * (w_new - w)
+                    report(i_out)
+                    i_out += 1
+
+                t = t_new
+                x = x_new
+                V = V_new
+                w = w_new
+                k1 = k4  # first same as last
+
+                if check_separation(x, t):
+                    break
+
+                if land and evt_ptr < len(evt_time) and evt_time[evt_ptr] <= t + 1e-12:
+                    evt_ptr = apply_events_until(t, evt_ptr)
+                    k1 = network.f(x)
+                    V = network.V.copy()
+
+                    # like the fixed step solvers, record the post-event voltages at the event time
+                    if abs(res.time[i_out - 1] - t) <= 1e-12:
+                        res.voltage[i_out - 1, :] = V
+
+            # next step size
+            factor = 5.0 if err == 0.0 else min(5.0, max(0.2, 0.9 * err ** (-1.0 / 3.0)))
+            h_try = min(max(h_step * factor, h_min), h_max)
+
+    else:
+        raise Exception('Solver not supported: {}'.format(solver))
+
+    if not res.stable:
+        # drop the steps that were not simulated
+        res.voltage = res.voltage[:i_out, :]
+        res.omega = res.omega[:i_out, :]
+        res.time = res.time[:i_out]
+
+    res.n_factorizations = network.n_factorizations
+    res.n_evaluations = network.n_evaluations
 
     return res
+
+
+def dynamic_simulation(n, Vbus, Sbus, Ybus, Sbase, fBase, t_sim, h, dynamic_devices=list(), bus_indices=list(),
+                       callback=None, solver: DiffEqSolver = DiffEqSolver.RUNGE_KUTTA,
+                       events: Union[TransientStabilityEvents, None] = None,
+                       Yf=None, Yt=None, Cf=None, Ct=None,
+                       max_err=1e-6, max_iter=20, h_out=None,
+                       rtol=1e-4, atol=1e-6, h_min=1e-5, h_max=0.05,
+                       max_angle_separation: Union[float, None] = None) -> TransientStabilityResults:
+    """
+    Dynamic transient simulation of a power system
+    Args:
+        n: number of nodes
+        Vbus: initial voltages (power flow solution)
+        Sbus: initial power injections (power flow solution)
+        Ybus: admittance matrix
+        Sbase: base power
+        fBase: base frequency i.e. 50Hz
+        t_sim: simulation time (s)
+        h: integration step (s); initial step for the adaptive solver
+        dynamic_devices: objects of each machine
+        bus_indices: bus index of each machine
+        callback: function(txt, progress) to report progress
+        solver: DiffEqSolver
+        events: TransientStabilityEvents
+        Yf, Yt, Cf, Ct: branch matrices, only needed for line events
+        max_err: maximum voltage mismatch of the network iterations
+        max_iter: maximum number of network iterations per derivatives evaluation
+        h_out: results sampling interval (s), defaults to h
+        rtol: relative tolerance of the adaptive solver
+        atol: absolute tolerance of the adaptive solver
+        h_min: minimum step of the adaptive solver (s)
+        h_max: maximum step of the adaptive solver (s)
+        max_angle_separation: the simulation stops as unstable when the rotor angle separation exceeds this (rad)
+
+    Returns: TransientStabilityResults
+
+    """
+    network = build_dynamic_network(n=n, Vbus=Vbus, Sbus=Sbus, Ybus=Ybus, Sbase=Sbase, fBase=fBase,
+                                    dynamic_devices=dynamic_devices, bus_indices=bus_indices,
+                                    Yf=Yf, Yt=Yt, Cf=Cf, Ct=Ct, max_err=max_err, max_iter=max_iter)
+
+    return simulate(network=network, t_sim=t_sim, h=h, callback=callback, solver=solver, events=events,
+                    h_out=h_out, rtol=rtol, atol=atol, h_min=h_min, h_max=h_max,
+                    max_angle_separation=max_angle_separation)
@@ -17,7 +17,8 @@
 
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.Simulations.PowerFlow.power_flow_driver import PowerFlowResults
-from GridCalEngine.Simulations.Dynamics.dynamic_modules import dynamic_simulation
+from GridCalEngine.Simulations.Dynamics.dynamic_modules import (dynamic_simulation, DiffEqSolver,
+                                                                 TransientStabilityEvents)
 from GridCalEngine.Simulations.driver_template import DriverTemplate
 
 ########################################################################################################################
@@ -27,7 +28,10 @@ from GridCalEngine.Simulations.driver_template import DriverTemplate
 
 class TransientStabilityOptions:
 
-    def __init__(self, h=0.001, t_sim=15, max_err=0.0001, max_iter=25):
+    def __init__(self, h=0.001, t_sim=15, max_err=0.0001, max_iter=25,
+                 solver: DiffEqSolver = DiffEqSolver.RUNGE_KUTTA,
+                 h_out=None, rtol=1e-4, atol=1e-6, h_min=1e-5, h_max=0.05,
+                 events: TransientStabilityEvents = None):
 
         # step length (s)
         self.h = h
@@ -41,6 +45,21 @@ class TransientStabilityOptions:
         # Maximum number of network iterations
         self.max_iter = max_iter
 
+        # integration method
+        self.solver = solver
+
+        # results sampling interval (s), None to record every step
+        self.h_out = h_out
+
+        # adaptive step error tolerances and step limits (s)
+        self.rtol = rtol
+        self.atol = atol
+        self.h_min = h_min
+        self.h_max = h_max
+
+        # switching events
+        self.events = events
+
 
 class TransientStability(DriverTemplate):
 
@@ -102,7 +121,16 @@ class TransientStability(DriverTemplate):
                                      h=self.options.h,
                                      dynamic_devices=dynamic_devices,
                                      bus_indices=bus_indices,
-                                     callback=self.status)
+                                     callback=self.status,
+                                     solver=self.options.solver,
+                                     events=self.options.events,
+                                     max_err=self.options.max_err,
+                                     max_iter=self.options.max_iter,
+                                     h_out=self.options.h_out,
+                                     rtol=self.options.rtol,
+                                     atol=self.options.atol,
+                                     h_min=self.options.h_min,
+                                     h_max=self.options.h_max)
 
         self.results = res
         self.toc()
@@ -0,0 +1,467 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+Batch transient stability screening of bus faults.
+The pre-fault power flow and the initialised machine states are shared by all the scenarios, every
+scenario is simulated on a copy of the same dynamic network (sharing its cached factorizations),
+the simulation stops as soon as the rotor angle separation criterion is reached, and the critical
+clearing times are found by bisection of the clearing time.
+"""
+from __future__ import annotations
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Union, Any
+from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at
+from GridCalEngine.Simulations.PowerFlow.power_flow_results import PowerFlowResults
+from GridCalEngine.Simulations.Dynamics.dynamic_modules import (DynamicNetwork, DiffEqSolver,
+                                                                 TransientStabilityEvents,
+                                                                 build_dynamic_network, simulate)
+from GridCalEngine.Simulations.driver_template import DriverTemplate
+from GridCalEngine.Simulations.options_template import OptionsTemplate
+from GridCalEngine.Simulations.results_table import ResultsTable
+from GridCalEngine.Simulations.results_template import ResultsTemplate
+from GridCalEngine.basic_structures import Vec, Mat, IntVec, CxVec, BoolVec, StrVec
+from GridCalEngine.enumerations import SimulationTypes, StudyResultsType, ResultTypes, DeviceType
+
+
+class TransientStabilityScreeningOptions(OptionsTemplate):
+    """
+    Transient stability screening options
+    """
+
+    def __init__(self,
+                 t_sim: float = 3.0,
+                 h: float = 0.005,
+                 solver: DiffEqSolver = DiffEqSolver.RUNGE_KUTTA,
+                 fault_time: float = 0.0,
+                 max_angle_separation: float = 180.0,
+                 compute_cct: bool = False,
+                 cct_max: float = 1.0,
+                 cct_tolerance: float = 0.005,
+                 trajectory_step: Union[float, None] = None,
+                 n_workers: int = 1,
+                 max_err: float = 1e-6,
+                 max_iter: int = 20):
+        """
+        TransientStabilityScreeningOptions
+        :param t_sim: simulated time of every scenario (s)
+        :param h: integration step (s)
+        :param solver: DiffEqSolver
+        :param fault_time: time at which the faults are applied (s)
+        :param max_angle_separation: rotor angle separation that marks a scenario as unstable (deg)
+        :param compute_cct: find the critical clearing time of every distinct fault by bisection
+        :param cct_max: largest clearing time searched (s)
+        :param cct_tolerance: bisection tolerance of the critical clearing times (s)
+        :param trajectory_step: sampling interval of the stored trajectories (s), None to store none
+        :param n_workers: number of worker processes, 1 to simulate in this process
+        :param max_err: maximum voltage mismatch of the network iterations
+        :param max_iter: maximum number of network iterations
+        """
+        OptionsTemplate.__init__(self, name="TransientStabilityScreeningOptions")
+
+        self.t_sim = t_sim
+
+        self.h = h
+
+        self.solver = solver
+
+        self.fault_time = fault_time
+
+        self.max_angle_separation = max_angle_separation
+
+        self.compute_cct = compute_cct
+
+        self.cct_max = cct_max
+
+        self.cct_tolerance = cct_tolerance
+
+        self.trajectory_step = trajectory_step
+
+        self.n_workers = n_workers
+
+        self.max_err = max_err
+
+        self.max_iter = max_iter
+
+        self.register(key="t_sim", tpe=float)
+        self.register(key="h", tpe=float)
+        self.register(key="solver", tpe=DiffEqSolver)
+        self.register(key="fault_time", tpe=float)
+        self.register(key="max_angle_separation", tpe=float)
+        self.register(key="compute_cct", tpe=bool)
+        self.register(key="cct_max", tpe=float)
+        self.register(key="cct_tolerance", tpe=float)
+        self.register(key="trajectory_step", tpe=float)
+        self.register(key="n_workers", tpe=int)
+        self.register(key="max_err", tpe=float)
+        self.register(key="max_iter", tpe=int)
+
+
+# summary of a scenario: stable, max angle separation (deg), separation time, min post-fault voltage,
+# max speed deviation, trajectory (time, speeds, voltage modules) or None
+ScenarioSummary = Tuple[bool, float, float, float, float, Union[Tuple[Vec, Mat, Mat], None]]
+
+
+def simulate_fault(network: DynamicNetwork,
+                   bus: int,
+                   z_fault: complex,
+                   clearing_time: float,
+                   options: TransientStabilityScreeningOptions,
+                   store_trajectory: bool = False) -> ScenarioSummary:
+    """
+    Simulate a cleared bus fault on a copy of the network
+    :param network: DynamicNetwork at its initial state (not modified)
+    :param bus: faulted bus index
+    :param z_fault: fault impedance (p.u.), 0 for a bolted fault
+    :param clearing_time: time from the fault to its clearing (s)
+    :param options: TransientStabilityScreeningOptions
+    :param store_trajectory: return the trajectory sampled at options.trajectory_step
+    :return: ScenarioSummary
+    """
+    y_fault = 1.0 / z_fault if abs(z_fault) > 0 else 1e6
+
+    events = TransientStabilityEvents()
+    events.add(options.fault_time, 'Bus short circuit', int(bus), y_fault)
+    events.add(options.fault_time + clearing_time, 'Bus recovery', int(bus), None)
+
+    store_trajectory = store_trajectory and options.trajectory_step is not None
+    res = simulate(network=network.copy(),
+                   t_sim=options.t_sim,
+                   h=options.h,
+                   solver=options.solver,
+                   events=events,
+                   h_out=options.trajectory_step if store_trajectory else None,
+                   max_angle_separation=np.deg2rad(options.max_angle_separation))
+
+    vm = np.abs(res.voltage)
+    post = res.time > options.fault_time + clearing_time
+    min_voltage = float(vm[post, :].min()) if post.any() else np.nan
+    max_speed_dev = float(np.abs(res.omega - 1.0).max()) if res.omega.size else 0.0
+
+    if store_trajectory:
+        trajectory = (res.time.copy(), res.omega.astype(np.float32), vm.astype(np.float32))
+    else:
+        trajectory = None
+
+    return (res.stable, float(np.rad2deg(res.max_angle_separation)), res.t_separation,
+            min_voltage, max_speed_dev, trajectory)
+
+
+def screen_scenarios(network: DynamicNetwork,
+                     buses: IntVec,
+                     z_faults: CxVec,
+                     clearing_times: Vec,
+                     options: TransientStabilityScreeningOptions) -> List[ScenarioSummary]:
+    """
+    Simulate a list of scenarios, this is the function run by the worker processes
+    :param network: DynamicNetwork at its initial state
+    :param buses: faulted bus of every scenario
+    :param z_faults: fault impedance of every scenario (p.u.)
+    :param clearing_times: clearing time of every scenario (s)
+    :param options: TransientStabilityScreeningOptions
+    :return: summary of every scenario
+    """
+    return [simulate_fault(network, bus, z, tc, options, store_trajectory=True)
+            for bus, z, tc in zip(buses, z_faults, clearing_times)]
+
+
+def find_critical_clearing_time(network: DynamicNetwork,
+                                bus: int,
+                                z_fault: complex,
+                                options: TransientStabilityScreeningOptions) -> Tuple[float, int]:
+    """
+    Find the critical clearing time of a bus fault by bisection
+    :param network: DynamicNetwork at its initial state
+    :param bus: faulted bus index
+    :param z_fault: fault impedance (p.u.)
+    :param options: TransientStabilityScreeningOptions
+    :return: critical clearing time (s), inf if the fault is stable at cct_max, 0 if unstable at once;
+             number of simulations
+    """
+    n_sim = 1
+    if simulate_fault(network, bus, z_fault, options.cct_max, options)[0]:
+        return np.inf, n_sim
+
+    lo = 0.0
+    hi = options.cct_max
+    while hi - lo > options.cct_tolerance:
+        mid = 0.5 * (lo + hi)
+        n_sim += 1
+        if simulate_fault(network, bus, z_fault, mid, options)[0]:
+            lo = mid
+        else:
+            hi = mid
+
+    return lo, n_sim
+
+
+def screen_critical_clearing_times(network: DynamicNetwork,
+                                   buses: IntVec,
+                                   z_faults: CxVec,
+                                   options: TransientStabilityScreeningOptions) -> List[Tuple[float, int]]:
+    """
+    Find the critical clearing times of a list of faults, this is the function run by the worker processes
+    :param network: DynamicNetwork at its initial state
+    :param buses: faulted bus of every fault
+    :param z_faults: fault impedance of every fault (p.u.)
+    :param options: TransientStabilityScreeningOptions
+    :return: critical clearing time and number of simulations of every fault
+    """
+    return [find_critical_clearing_time(network, bus, z, options) for bus, z in zip(buses, z_faults)]
+
+
+def run_in_chunks(fn, network: DynamicNetwork, arrays: List[np.ndarray], options: TransientStabilityScreeningOptions,
+                  n_workers: int) -> List[Any]:
+    """
+    Run a screening function over chunks of its input arrays in worker processes
+    :param fn: screen_scenarios or screen_critical_clearing_times
+    :param network: DynamicNetwork at its initial state
+    :param arrays: per item input arrays
+    :param options: TransientStabilityScreeningOptions
+    :param n_workers: number of worker processes, 1 to run in this process
+    :return: concatenated outputs, in the order of the items
+    """
+    n = len(arrays[0])
+    if n_workers <= 1 or n < 2:
+        return fn(network, *arrays, options)
+
+    # one chunk of items per task, so that the network is sent a few times only
+    n_chunks = min(n, 4 * n_workers)
+    chunks = np.array_split(np.arange(n), n_chunks)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(fn, network, *[arr[chunk] for arr in arrays], options) for chunk in chunks]
+
+        results = list()
+        for future in futures:
+            results += future.result()
+
+    return results
+
+
+class TransientStabilityScreeningResults(ResultsTemplate):
+    """
+    Transient stability screening results
+    """
+
+    def __init__(self, n_scenarios: int, n_faults: int, bus_names: StrVec):
+        """
+        TransientStabilityScreeningResults
+        :param n_scenarios: number of scenarios
+        :param n_faults: number of distinct faults (bus, impedance) for the critical clearing times
+        :param bus_names: bus names
+        """
+        ResultsTemplate.__init__(self,
+                                 name='Transient stability screening',
+                                 available_results={
+                                     ResultTypes.ReportsResults: [ResultTypes.TransientStabilityScreeningReport,
+                                                                  ResultTypes.CriticalClearingTimes]
+                                 },
+                                 time_array=None,
+                                 clustering_results=None,
+                                 study_results_type=StudyResultsType.TransientStabilityScreening)
+
+        self.bus_names = bus_names
+
+        # scenarios
+        self.fault_bus: IntVec = np.zeros(n_scenarios, dtype=int)
+        self.fault_impedance: CxVec = np.zeros(n_scenarios, dtype=complex)
+        self.clearing_time: Vec = np.zeros(n_scenarios)
+        self.stable: BoolVec = np.ones(n_scenarios, dtype=bool)
+        self.max_angle_separation: Vec = np.zeros(n_scenarios)  # (deg)
+        self.t_separation: Vec = np.full(n_scenarios, np.nan)  # time at which the criterion was reached (s)
+        self.min_voltage: Vec = np.zeros(n_scenarios)  # after the clearing (p.u.)
+        self.max_speed_deviation: Vec = np.zeros(n_scenarios)  # (p.u.)
+
+        # optional downsampled trajectories per scenario: (time, speeds, voltage modules) or None
+        self.trajectories: List[Union[Tuple[Vec, Mat, Mat], None]] = [None] * n_scenarios
+
+        # critical clearing times of the distinct faults
+        self.cct_bus: IntVec = np.zeros(n_faults, dtype=int)
+        self.cct_impedance: CxVec = np.zeros(n_faults, dtype=complex)
+        self.cct: Vec = np.zeros(n_faults)
+
+        self.n_simulations = 0
+
+        self.register(name='bus_names', tpe=StrVec)
+        self.register(name='fault_bus', tpe=IntVec)
+        self.register(name='fault_impedance', tpe=CxVec)
+        self.register(name='clearing_time', tpe=Vec)
+        self.register(name='stable', tpe=BoolVec)
+        self.register(name='max_angle_separation', tpe=Vec)
+        self.register(name='t_separation', tpe=Vec)
+        self.register(name='min_voltage', tpe=Vec)
+        self.register(name='max_speed_deviation', tpe=Vec)
+        self.register(name='cct_bus', tpe=IntVec)
+        self.register(name='cct_impedance', tpe=CxVec)
+        self.register(name='cct', tpe=Vec)
+
+    def set_scenario(self, i: int, summary: ScenarioSummary) -> None:
+        """
+        Store the summary of a scenario
+        :param i: scenario index
+        :param summary: ScenarioSummary
+        """
+        (self.stable[i], self.max_angle_separation[i], self.t_separation[i],
+         self.min_voltage[i], self.max_speed_deviation[i], self.trajectories[i]) = summary
+
+    def mdl(self, result_type: ResultTypes) -> ResultsTable:
+        """
+        Get the results table
+        :param result_type: ResultTypes
+        :return: ResultsTable
+        """
+        if result_type == ResultTypes.TransientStabilityScreeningReport:
+            data = np.c_[self.bus_names[self.fault_bus],
+                         self.fault_impedance.real,
+                         self.fault_impedance.imag,
+                         self.clearing_time,
+                         self.stable,
+                         self.max_angle_separation,
+                         self.t_separation,
+                         self.min_voltage,
+                         self.max_speed_deviation]
+            return ResultsTable(data=data,
+                                index=np.arange(len(self.fault_bus)),
+                                columns=np.array(['Bus', 'R fault (p.u.)', 'X fault (p.u.)', 'Clearing time (s)',
+                                                  'Stable', 'Max angle separation (deg)', 'Separation time (s)',
+                                                  'Min post-fault voltage (p.u.)', 'Max speed deviation (p.u.)']),
+                                title=result_type.value,
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.NoDevice)
+
+        elif result_type == ResultTypes.CriticalClearingTimes:
+            return ResultsTable(data=np.c_[self.cct_impedance.real, self.cct_impedance.imag, self.cct],
+                                index=self.bus_names[self.cct_bus],
+                                columns=np.array(['R fault (p.u.)', 'X fault (p.u.)', 'Critical clearing time (s)']),
+                                title=result_type.value,
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.BusDevice)
+
+        else:
+            raise Exception('Result type not understood:' + str(result_type))
+
+
+class TransientStabilityScreening(DriverTemplate):
+    """
+    Batch screening of bus faults for transient stability
+    """
+    tpe = SimulationTypes.TransientStabilityScreening_run
+    name = tpe.value
+
+    def __init__(self,
+                 grid: MultiCircuit,
+                 pf_res: PowerFlowResults,
+                 dynamic_devices: List[Any],
+                 scenarios: List[Tuple[int, complex, float]],
+                 options: Union[TransientStabilityScreeningOptions, None] = None):
+        """
+        TransientStabilityScreening constructor
+        :param grid: MultiCircuit instance
+        :param pf_res: pre-fault power flow results
+        :param dynamic_devices: dynamic model data of every generator of the grid (None for the generators
+                                without model), see dynamic_simulation
+        :param scenarios: list of (fault bus index, fault impedance (p.u.), clearing time (s))
+        :param options: TransientStabilityScreeningOptions
+        """
+        DriverTemplate.__init__(self, grid=grid)
+
+        self.pf_res = pf_res
+
+        self.dynamic_devices = dynamic_devices
+
+        self.scenarios = scenarios
+
+        self.options = options if options is not None else TransientStabilityScreeningOptions()
+
+        self.results: Union[TransientStabilityScreeningResults, None] = None
+
+    def get_steps(self):
+        """
+        Get time steps list of strings
+        """
+        return list()
+
+    def build_network(self) -> DynamicNetwork:
+        """
+        Initialise the machines from the pre-fault power flow and factorize the pre-fault network
+        :return: DynamicNetwork
+        """
+        nc = compile_numerical_circuit_at(self.grid, t_idx=None, logger=self.logger)
+        V = self.pf_res.voltage
+        S = V * np.conj(nc.Ybus @ V)
+
+        gen_bus = nc.generator_data.get_bus_indices()
+        idx = [i for i, dev in enumerate(self.dynamic_devices) if dev is not None]
+
+        return build_dynamic_network(n=nc.nbus, Vbus=V, Sbus=S, Ybus=nc.Ybus, Sbase=nc.Sbase,
+                                     fBase=self.grid.fBase,
+                                     dynamic_devices=[self.dynamic_devices[i] for i in idx],
+                                     bus_indices=gen_bus[idx],
+                                     max_err=self.options.max_err, max_iter=self.options.max_iter)
+
+    def run(self):
+        """
+        Run the screening
+        """
+        self.tic()
+        self.report_text('Initialising the dynamic models...')
+
+        network = self.build_network()
+
+        buses = np.array([sc[0] for sc in self.scenarios], dtype=int)
+        z_faults = np.array([sc[1] for sc in self.scenarios], dtype=complex)
+        clearing_times = np.array([sc[2] for sc in self.scenarios], dtype=float)
+
+        # distinct faults for the critical clearing times
+        if self.options.compute_cct and len(buses):
+            faults = np.unique(np.c_[buses, z_faults.real, z_faults.imag], axis=0)
+            cct_bus = faults[:, 0].astype(int)
+            cct_z = faults[:, 1] + 1j * faults[:, 2]
+        else:
+            cct_bus = np.zeros(0, dtype=int)
+            cct_z = np.zeros(0, dtype=complex)
+
+        self.results = TransientStabilityScreeningResults(n_scenarios=len(buses),
+                                                          n_faults=len(cct_bus),
+                                                          bus_names=np.array(self.grid.get_bus_names()))
+        self.results.fault_bus = buses
+        self.results.fault_impedance = z_faults
+        self.results.clearing_time = clearing_times
+        self.results.cct_bus = cct_bus
+        self.results.cct_impedance = cct_z
+
+        self.report_text(f'Screening {len(buses)} scenarios...')
+        summaries = run_in_chunks(fn=screen_scenarios, network=network, arrays=[buses, z_faults, clearing_times],
+                                  options=self.options, n_workers=self.options.n_workers)
+        for i, summary in enumerate(summaries):
+            self.results.set_scenario(i, summary)
+        self.results.n_simulations = len(summaries)
+        self.report_progress(50.0 if len(cct_bus) else 100.0)
+
+        if len(cct_bus) and not self.is_cancel():
+            self.report_text(f'Finding the critical clearing times of {len(cct_bus)} faults...')
+            ccts = run_in_chunks(fn=screen_critical_clearing_times, network=network, arrays=[cct_bus, cct_z],
+                                 options=self.options, n_workers=self.options.n_workers)
+            for i, (cct, n_sim) in enumerate(ccts):
+                self.results.cct[i] = cct
+                self.results.n_simulations += n_sim
+            self.report_progress(100.0)
+
+        self.toc()
@@ -15,9 +15,10 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 from __future__ import annotations
-from typing import TYPE_CHECKING, Union, List
+from typing import TYPE_CHECKING, Union, List, Dict, Tuple, Any
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from GridCalEngine.Simulations.driver_template import DriverTemplate
 from GridCalEngine.Simulations.results_template import ResultsTemplate
 from GridCalEngine.Simulations.results_table import ResultsTable
@@ -84,9 +85,6 @@ class InputsAnalysisResults(ResultsTemplate):
         self.static_gen_data = self.get_static_generators_df()
 
         self.bus_dict = self.grid.get_bus_index_dict()
-        self.bus_area_indices = self.get_bus_area_indices()
-        self.bus_zone_indices = self.get_bus_zone_indices()
-        self.bus_country_indices = self.get_bus_country_indices()
 
     def get_generators_df(self) -> pd.DataFrame:
         """
@@ -223,78 +221,102 @@ class InputsAnalysisResults(ResultsTemplate):
 
         return df
 
+    def get_bus_group_indices(self, groups: List[Any], attr: str) -> IntVec:
+        """
+        Get the group index of every bus
+        :param groups: list of grouping devices (zones, areas, ...)
+        :param attr: bus attribute that points to the group (i.e. "zone")
+        :return: array of group indices, -1 for the buses without group
+        """
+        d = {elm: i for i, elm in enumerate(groups)}
+        return np.array([d.get(getattr(bus, attr), -1) for bus in self.grid.buses], dtype=int)
+
     def get_bus_zone_indices(self) -> IntVec:
         """
 
         :return:
         """
-        d = {elm: i for i, elm in enumerate(self.grid.zones)}
-        return np.array([d.get(bus.zone, "") for bus in self.grid.buses])
+        return self.get_bus_group_indices(self.grid.zones, 'zone')
 
     def get_bus_area_indices(self) -> IntVec:
         """
 
         :return:
         """
-        d = {elm: i for i, elm in enumerate(self.grid.areas)}
-        return np.array([d.get(bus.area, "") for bus in self.grid.buses])
+        return self.get_bus_group_indices(self.grid.areas, 'area')
 
     def get_bus_country_indices(self) -> IntVec:
         """
 
         :return:
         """
-        d = {elm: i for i, elm in enumerate(self.grid.countries)}
-        return np.array([d.get(bus.country, "") for bus in self.grid.buses])
+        return self.get_bus_group_indices(self.grid.countries, 'country')
 
     def get_bus_substation_indices(self) -> IntVec:
         """
 
         :return:
         """
-        d = {elm: i for i, elm in enumerate(self.grid.substations)}
-        return np.array([d.get(bus.substation, "") for bus in self.grid.buses])
+        return self.get_bus_group_indices(self.grid.substations, 'substation')
 
-    def get_collection_attr_series(self, elms, magnitude: str, aggregation="Area"):
+    def get_aggregation(self, aggregation: str) -> Tuple[IntVec, List[str]]:
         """
-
-        :param elms:
-        :param magnitude:snaphot property name
-        :param aggregation:
-        :return:
+        Get the bus to group indices and the group names of an aggregation
+        :param aggregation: "Zone", "Area", "Substation" or "Country"
+        :return: bus group indices (-1 for no group), group names
         """
         if aggregation == 'Zone':
-            d2 = self.get_bus_zone_indices()
-            headers = [e.name for e in self.grid.zones]
-            ne = len(self.grid.zones)
-
+            groups = self.grid.zones
+            attr = 'zone'
         elif aggregation == 'Area':
-            d2 = self.get_bus_area_indices()
-            headers = [e.name for e in self.grid.areas]
-            ne = len(self.grid.areas)
-
+            groups = self.grid.areas
+            attr = 'area'
         elif aggregation == 'Substation':
-            d2 = self.get_bus_substation_indices()
-            headers = [e.name for e in self.grid.substations]
-            ne = len(self.grid.substations)
-
+            groups = self.grid.substations
+            attr = 'substation'
         elif aggregation == 'Country':
-            d2 = self.get_bus_country_indices()
-            headers = [e.name for e in self.grid.countries]
-            ne = len(self.grid.countries)
-
+            groups = self.grid.countries
+            attr = 'country'
         else:
             raise Exception('Unknown Aggregation. Possible aggregations are Zone, Area, Substation, Country')
 
+        # computed every time, since the devices may be moved to other buses and the buses to other groups
+        return self.get_bus_group_indices(groups, attr), [e.name for e in groups]
+
+    def get_aggregation_matrix(self, elms: List[Any], bus_group: IntVec, n_groups: int) -> sp.csc_matrix:
+        """
+        Get the sparse (device, group) matrix that sums the devices into the groups of an aggregation
+        :param elms: list of devices
+        :param bus_group: group index of every bus (-1 for no group)
+        :param n_groups: number of groups
+        :return: CSC matrix
+        """
+        dev_bus = np.array([self.bus_dict[elm.bus] for elm in elms], dtype=int)
+        dev_group = bus_group[dev_bus]
+        idx = np.where(dev_group >= 0)[0]
+        return sp.csc_matrix((np.ones(len(idx)), (idx, dev_group[idx])), shape=(len(elms), n_groups))
+
+    def get_collection_attr_series(self, elms, magnitude: str, aggregation="Area"):
+        """
+        Get the time series of a magnitude summed by group
+        :param elms: list of devices (several device types are allowed)
+        :param magnitude:snaphot property name
+        :param aggregation: "Zone", "Area", "Substation" or "Country"
+        :return: (time, group) array, group names
+        """
+        bus_group, headers = self.get_aggregation(aggregation)
+
         nt = self.grid.get_time_number()
-        x = np.zeros((nt, ne))
+        x = np.zeros((nt, len(headers)))
 
+        # split by device type, so that the cached (time, device) profile matrices are used
+        groups: Dict[DeviceType, List[Any]] = dict()
         for elm in elms:
-            i = self.bus_dict[elm.bus]
-            i2 = d2[i]
-            if i2 != "":
-                i3 = int(i2)
-                x[:, i3] += elm.get_profile(magnitude=magnitude).toarray()
+            groups.setdefault(elm.device_type, list()).append(elm)
+
+        for group in groups.values():
+            profiles = self.grid.get_profiles_matrix(elements=group, magnitude=magnitude)
+            x += profiles @ self.get_aggregation_matrix(elms=group, bus_group=bus_group, n_groups=len(headers))
 
         return x, headers
 
@@ -109,7 +109,10 @@ class OptimalNetTransferCapacityDriver(DriverTemplate):
         self.results.contingency_rates = opf_vars.branch_vars.contingency_rates[0, :]
         self.results.alpha = opf_vars.branch_vars.alpha[0, :]
         self.results.monitor_logic = opf_vars.branch_vars.monitor_logic[0, :]
-        self.results.contingency_flows_list = opf_vars.branch_vars.contingency_flow_data
+        self.results.contingency_monitored_idx = opf_vars.branch_vars.contingency_monitored_idx
+        self.results.contingency_group_idx = opf_vars.branch_vars.contingency_group_idx
+        self.results.contingency_flows = opf_vars.branch_vars.contingency_flows
+        self.results.contingency_flow_slacks = opf_vars.branch_vars.contingency_flow_slacks
 
         self.results.hvdc_Pf = opf_vars.hvdc_vars.flows[0, :]
         self.results.hvdc_loading = opf_vars.hvdc_vars.loading[0, :]
@@ -34,13 +34,22 @@ from GridCalEngine.DataStructures.branch_data import BranchData
 from GridCalEngine.DataStructures.hvdc_data import HvdcData
 from GridCalEngine.DataStructures.bus_data import BusData
 from GridCalEngine.basic_structures import Logger, Vec, IntVec, BoolVec, StrVec, CxMat
-from GridCalEngine.Utils.MIP.selected_interface import LpExp, LpVar, LpModel, lpDot, set_var_bounds, join
+from GridCalEngine.Utils.MIP.selected_interface import (LpExp, LpVar, LpCst, LpModel, lpDot, set_var_bounds, join,
+                                                        set_cst_rhs, set_cst_coefficient)
 from GridCalEngine.enumerations import TapPhaseControl, HvdcControlType, AvailableTransferMode
 from GridCalEngine.Simulations.LinearFactors.linear_analysis import LinearAnalysis, LinearMultiContingencies
 from GridCalEngine.Simulations.ATC.available_transfer_capacity_driver import compute_alpha
 from GridCalEngine.IO.file_system import opf_file_path
 
 
+TRANSFER_MODE_2_INT = {
+    AvailableTransferMode.Generation: 0,
+    AvailableTransferMode.InstalledPower: 1,
+    AvailableTransferMode.Load: 2,
+    AvailableTransferMode.GenerationAndLoad: 3
+}
+
+
 def formulate_monitorization_logic(monitor_only_sensitive_branches: bool,
                                    monitor_only_ntc_load_rule_branches: bool,
                                    monitor_loading: BoolVec,
@@ -305,6 +314,10 @@ class BusNtcVars:
         self.delta_p = np.zeros((nt, n_elm), dtype=object)
         self.proportions = np.zeros((nt, n_elm), dtype=float)
 
+        # nodal injection vars and their balance constraints (P = Pset + proportion · ΔP)
+        self.injections = np.zeros((nt, n_elm), dtype=object)
+        self.injections_balance = np.zeros((nt, n_elm), dtype=object)
+
     def get_values(self, Sbase: float, model: LpModel) -> "BusNtcVars":
         """
         Return an instance of this class where the arrays content are not LP vars but their value
@@ -366,6 +379,16 @@ class BranchNtcVars:
         # t, m, c, contingency, negative_slack, positive_slack
         self.contingency_flow_data: List[Tuple[int, int, int, Union[float, LpVar, LpExp], LpVar, LpVar]] = list()
 
+        # upper and lower rate constraints of each entry of contingency_flow_data
+        self.contingency_flow_constraints: List[Tuple[LpCst, LpCst]] = list()
+
+        # contingency flow values in columnar form (filled by get_values)
+        self.contingency_time_idx: IntVec = np.zeros(0, dtype=int)
+        self.contingency_monitored_idx: IntVec = np.zeros(0, dtype=int)
+        self.contingency_group_idx: IntVec = np.zeros(0, dtype=int)
+        self.contingency_flows: Vec = np.zeros(0, dtype=float)
+        self.contingency_flow_slacks: Vec = np.zeros(0, dtype=float)
+
         self.inter_space_branches: List[Tuple[int, float]] = list()  # index, sense
 
     def get_values(self, Sbase: float, model: LpModel) -> "BranchNtcVars":
@@ -390,19 +413,24 @@ class BranchNtcVars:
                 data.flow_constraints_ub[t, i] = model.get_value(self.flow_constraints_ub[t, i])
                 data.flow_constraints_lb[t, i] = model.get_value(self.flow_constraints_lb[t, i])
 
-        for i in range(len(self.contingency_flow_data)):
-            t, m, c, var, neg_slack, pos_slack = self.contingency_flow_data[i]
-            self.contingency_flow_data[i] = (t, m, c,
-                                             model.get_value(var) * Sbase,
-                                             model.get_value(neg_slack) * Sbase,
-                                             model.get_value(pos_slack) * Sbase)
+        n_cf = len(self.contingency_flow_data)
+        data.contingency_time_idx = np.empty(n_cf, dtype=int)
+        data.contingency_monitored_idx = np.empty(n_cf, dtype=int)
+        data.contingency_group_idx = np.empty(n_cf, dtype=int)
+        data.contingency_flows = np.empty(n_cf, dtype=float)
+        data.contingency_flow_slacks = np.empty(n_cf, dtype=float)
+        for i, (t, m, c, var, neg_slack, pos_slack) in enumerate(self.contingency_flow_data):
+            data.contingency_time_idx[i] = t
+            data.contingency_monitored_idx[i] = m
+            data.contingency_group_idx[i] = c
+            data.contingency_flows[i] = model.get_value(var) * Sbase
+            data.contingency_flow_slacks[i] = (model.get_value(pos_slack) - model.get_value(neg_slack)) * Sbase
 
         # format the arrays appropriately
         data.flows = data.flows.astype(float, copy=False)
         data.flow_slacks_pos = data.flow_slacks_pos.astype(float, copy=False)
         data.flow_slacks_neg = data.flow_slacks_neg.astype(float, copy=False)
         data.tap_angles = data.tap_angles.astype(float, copy=False)
-        data.contingency_flow_data = self.contingency_flow_data
 
         # compute loading
         data.loading = data.flows / (data.rates + 1e-20)
@@ -412,7 +440,9 @@ class BranchNtcVars:
     def add_contingency_flow(self, t: int, m: int, c: int,
                              flow_var: Union[float, LpVar, LpExp],
                              neg_slack: LpVar,
-                             pos_slack: LpVar):
+                             pos_slack: LpVar,
+                             upper_cst: LpCst | None = None,
+                             lower_cst: LpCst | None = None):
         """
         Add contingency flow
         :param t: time index
@@ -421,8 +451,11 @@ class BranchNtcVars:
         :param flow_var: flow var
         :param neg_slack: negative flow slack variable
         :param pos_slack: positive flow slack variable
+        :param upper_cst: upper contingency rate constraint
+        :param lower_cst: lower contingency rate constraint
         """
         self.contingency_flow_data.append((t, m, c, flow_var, neg_slack, pos_slack))
+        self.contingency_flow_constraints.append((upper_cst, lower_cst))
 
     def get_total_flow_slack(self):
         """
@@ -445,6 +478,9 @@ class HvdcNtcVars:
         """
         self.flows = np.zeros((nt, n_elm), dtype=object)
 
+        # flow constraints of the free (angle droop) HVDC lines
+        self.flow_constraints = np.zeros((nt, n_elm), dtype=object)
+
         self.rates = np.zeros((nt, n_elm), dtype=float)
         self.loading = np.zeros((nt, n_elm), dtype=float)
 
@@ -649,11 +685,12 @@ def add_linear_injections_formulation(t: Union[int, None],
             ub=bus_pmax_t[k],
             name=join("inj_p", [t, k], "_")
         )
+        ntc_vars.bus_vars.injections[t, k] = ntc_vars.bus_vars.Pcalc[t, k]
 
         # we compute the injections power:
         # P = Pset + proportion · ΔP
         # the proportion is positive for the sending buses and negative for the receiving buses
-        prob.add_cst(
+        ntc_vars.bus_vars.injections_balance[t, k] = prob.add_cst(
             cst=ntc_vars.bus_vars.Pcalc[t, k] == p_bus_t[k] + proportions[k] * ntc_vars.bus_vars.delta_p[t, k],
             name=join("bus_balance", [t, k], "_")
         )
@@ -661,6 +698,55 @@ def add_linear_injections_formulation(t: Union[int, None],
     return f_obj
 
 
+def get_ntc_monitored_branches(branch_data_t: BranchData,
+                               monitor_only_sensitive_branches: bool,
+                               monitor_only_ntc_load_rule_branches: bool,
+                               alpha: Vec,
+                               alpha_threshold: float,
+                               structural_ntc: float,
+                               ntc_load_rule: float) -> BoolVec:
+    """
+    Get the branches whose rate is enforced in the N condition
+    :param branch_data_t: BranchData
+    :param monitor_only_sensitive_branches: exclude the branches with not enough sensitivity to the exchange?
+    :param monitor_only_ntc_load_rule_branches: exclude the branches that cannot limit the exchange by the CEP rule?
+    :param alpha: Array of branch sensitivity to the exchange in n condition
+    :param alpha_threshold: branch sensitivity to the exchange threshold
+    :param structural_ntc: Maximum NTC available by thermal interconnection rates.
+    :param ntc_load_rule: percentage of loading reserved to exchange flow (Clean Energy Package rule by ACER).
+    :return: boolean array of monitored branches
+    """
+    # Monitoring logic: Avoid unrealistic ntc flows over CEP rule limit in N condition
+    if monitor_only_ntc_load_rule_branches:
+        """
+        Calculo el porcentaje del ratio de la línea que se reserva al intercambio según la regla de ACER, 
+        y paso dicho valor a la frontera, y si el valor es mayor que el máximo intercambio estructural 
+        significa que la linea no puede limitar el intercambio
+        Ejemplo:
+            ntc_load_rule = 0.7
+            rate = 1700
+            alpha = 0.05
+            structural_rate = 5200
+            0.7 * 1700 --> 1190 mw para el intercambio
+            1190 / 0.05 --> 23.800 MW en la frontera en N
+            23.800 >>>> 5200 --> esta linea no puede ser declarada como limitante en la NTC en N.
+           """
+        monitor_by_load_rule_n = ntc_load_rule * branch_data_t.rates / (alpha + 1e-20) <= structural_ntc
+    else:
+        monitor_by_load_rule_n = np.ones(branch_data_t.nelm, dtype=bool)
+
+    # Monitoring logic: Exclude branches with not enough sensibility to exchange in N condition
+    if monitor_only_sensitive_branches:
+        monitor_by_sensitivity_n = alpha > alpha_threshold
+    else:
+        monitor_by_sensitivity_n = np.ones(branch_data_t.nelm, dtype=bool)
+
+    return (branch_data_t.active.astype(bool)
+            & branch_data_t.monitor_loading.astype(bool)
+            & monitor_by_sensitivity_n
+            & monitor_by_load_rule_n)
+
+
 def add_linear_branches_formulation(t_idx: int,
                                     Sbase: float,
                                     branch_data_t: BranchData,
@@ -697,6 +783,14 @@ def add_linear_branches_formulation(t_idx: int,
     """
     f_obj = 0.0
 
+    monitored = get_ntc_monitored_branches(branch_data_t=branch_data_t,
+                                           monitor_only_sensitive_branches=monitor_only_sensitive_branches,
+                                           monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
+                                           alpha=alpha,
+                                           alpha_threshold=alpha_threshold,
+                                           structural_ntc=structural_ntc,
+                                           ntc_load_rule=ntc_load_rule)
+
     # for each branch
     for m in range(branch_data_t.nelm):
         fr = branch_data_t.F[m]
@@ -754,33 +848,8 @@ def add_linear_branches_formulation(t_idx: int,
                                                              bus_vars.theta[t_idx, to]),
                     name=join("Branch_flow_set_", [t_idx, m], "_"))
 
-            # Monitoring logic: Avoid unrealistic ntc flows over CEP rule limit in N condition
-            if monitor_only_ntc_load_rule_branches:
-                """
-                Calculo el porcentaje del ratio de la línea que se reserva al intercambio según la regla de ACER, 
-                y paso dicho valor a la frontera, y si el valor es mayor que el máximo intercambio estructural 
-                significa que la linea no puede limitar el intercambio
-                Ejemplo:
-                    ntc_load_rule = 0.7
-                    rate = 1700
-                    alpha = 0.05
-                    structural_rate = 5200
-                    0.7 * 1700 --> 1190 mw para el intercambio
-                    1190 / 0.05 --> 23.800 MW en la frontera en N
-                    23.800 >>>> 5200 --> esta linea no puede ser declarada como limitante en la NTC en N.
-                   """
-                monitor_by_load_rule_n = ntc_load_rule * branch_data_t.rates[m] / (alpha[m] + 1e-20) <= structural_ntc
-            else:
-                monitor_by_load_rule_n = True
-
-            # Monitoring logic: Exclude branches with not enough sensibility to exchange in N condition
-            if monitor_only_sensitive_branches:
-                monitor_by_sensitivity_n = alpha[m] > alpha_threshold
-            else:
-                monitor_by_sensitivity_n = True
-
             # add the rate constraint if the branch is monitored
-            if branch_data_t.monitor_loading[m] and monitor_by_sensitivity_n and monitor_by_load_rule_n:
+            if monitored[m]:
                 if isinstance(branch_vars.flows[t_idx, m], LpVar):
                     branch_vars.flows[t_idx, m].bounds(low=-rate_pu, up=rate_pu)
 
@@ -862,24 +931,26 @@ def add_linear_branches_contingencies_formulation(t_idx: int,
                     pos_slack = prob.add_var(0, 1e20, join("br_cst_flow_pos_sl_", [t_idx, m, c]))
                     neg_slack = prob.add_var(0, 1e20, join("br_cst_flow_neg_sl_", [t_idx, m, c]))
 
-                    # register the contingency data to evaluate the result at the end
-                    branch_vars.add_contingency_flow(t=t_idx, m=m, c=c,
-                                                     flow_var=contingency_flow,
-                                                     neg_slack=neg_slack,
-                                                     pos_slack=pos_slack)
-
                     # add upper rate constraint
-                    prob.add_cst(
+                    upper_cst = prob.add_cst(
                         cst=contingency_flow + pos_slack - neg_slack <= branch_data_t.contingency_rates[m] / Sbase,
                         name=join("br_cst_flow_upper_lim_", [t_idx, m, c])
                     )
 
                     # add lower rate constraint
-                    prob.add_cst(
+                    lower_cst = prob.add_cst(
                         cst=contingency_flow + pos_slack - neg_slack >= -branch_data_t.contingency_rates[m] / Sbase,
                         name=join("br_cst_flow_lower_lim_", [t_idx, m, c])
                     )
 
+                    # register the contingency data to evaluate the result at the end
+                    branch_vars.add_contingency_flow(t=t_idx, m=m, c=c,
+                                                     flow_var=contingency_flow,
+                                                     neg_slack=neg_slack,
+                                                     pos_slack=pos_slack,
+                                                     upper_cst=upper_cst,
+                                                     lower_cst=lower_cst)
+
                     f_obj += pos_slack + neg_slack
 
     # copy the contingency rates
@@ -929,7 +1000,7 @@ def add_linear_hvdc_formulation(t_idx: int,
 
                 # convert MW/deg to pu/rad
                 droop = hvdc_data_t.get_angle_droop_in_pu_rad_at(m, Sbase)
-                prob.add_cst(
+                hvdc_vars.flow_constraints[t_idx, m] = prob.add_cst(
                     cst=hvdc_vars.flows[t_idx, m] == P0 + droop * (
                                 vars_bus.theta[t_idx, fr] - vars_bus.theta[t_idx, to]),
                     name=join("hvdc_flow_cst_", [t_idx, m], "_")
@@ -1009,6 +1080,183 @@ def add_linear_node_balance(t_idx: int,
         set_var_bounds(var=bus_vars.theta[t_idx, i], lb=0.0, ub=0.0)
 
 
+def add_ntc_time_step_formulation(t_idx: int,
+                                  grid: MultiCircuit,
+                                  nc: NumericalCircuit,
+                                  mip_vars: NtcVars,
+                                  lp_model: LpModel,
+                                  zonal_grouping: ZonalGrouping,
+                                  skip_generation_limits: bool,
+                                  consider_contingencies: bool,
+                                  contingency_groups_used: List[ContingencyGroup],
+                                  alpha_threshold: float,
+                                  lodf_threshold: float,
+                                  bus_a1_idx: IntVec,
+                                  bus_a2_idx: IntVec,
+                                  transfer_method: AvailableTransferMode,
+                                  monitor_only_sensitive_branches: bool,
+                                  monitor_only_ntc_load_rule_branches: bool,
+                                  ntc_load_rule: float,
+                                  logger: Logger) -> Tuple[Union[LpExp, float], Union[LinearAnalysis, None]]:
+    """
+    Formulate the NTC problem of one time step
+    :param t_idx: time index in the LP structures
+    :param grid: MultiCircuit instance
+    :param nc: NumericalCircuit compiled at the time step
+    :param mip_vars: NtcVars structure
+    :param lp_model: LpModel
+    :param zonal_grouping: Zonal grouping?
+    :param skip_generation_limits: Skip the generation limits?
+    :param consider_contingencies: Consider the contingencies?
+    :param contingency_groups_used: List of contingency groups to simulate
+    :param alpha_threshold: threshold to consider the exchange sensitivity
+    :param lodf_threshold: threshold to consider LODF sensitivities
+    :param bus_a1_idx: array of bus indices in the area 1
+    :param bus_a2_idx: array of bus indices in the area 2
+    :param transfer_method: AvailableTransferMode
+    :param monitor_only_sensitive_branches
+    :param monitor_only_ntc_load_rule_branches
+    :param ntc_load_rule: Amount of exchange branches power that should be dedicated to exchange
+    :param logger: logger instance
+    :return: objective function of the time step, LinearAnalysis used (None for the copper plate)
+    """
+    f_obj = 0.0
+    ls = None
+
+    # formulate the bus angles ---------------------------------------------------------------------------------
+    for k in range(nc.bus_data.nbus):
+        mip_vars.bus_vars.theta[t_idx, k] = lp_model.add_var(
+            lb=nc.bus_data.angle_min[k],
+            ub=nc.bus_data.angle_max[k],
+            name=join("th_", [t_idx, k], "_")
+        )
+
+    # formulate injections -------------------------------------------------------------------------------------
+
+    # magic scaling: the demand must be exactly (to the solver tolerance) the same as the demand
+    Pbus = nc.Pbus.copy()
+    Ptotal = np.sum(Pbus)
+    Pbus[nc.vd] -= Ptotal / len(nc.vd)
+
+    f_obj += add_linear_injections_formulation(
+        t=t_idx,
+        Sbase=nc.Sbase,
+        gen_data_t=nc.generator_data,
+        load_data_t=nc.load_data,
+        bus_data_t=nc.bus_data,
+        p_bus_t=Pbus,
+        bus_a1_idx=bus_a1_idx,
+        bus_a2_idx=bus_a2_idx,
+        transfer_method=transfer_method,
+        skip_generation_limits=skip_generation_limits,
+        ntc_vars=mip_vars,
+        prob=lp_model,
+        logger=logger
+    )
+
+    # formulate hvdc -------------------------------------------------------------------------------------------
+    f_obj += add_linear_hvdc_formulation(
+        t_idx=t_idx,
+        Sbase=nc.Sbase,
+        hvdc_data_t=nc.hvdc_data,
+        hvdc_vars=mip_vars.hvdc_vars,
+        vars_bus=mip_vars.bus_vars,
+        prob=lp_model,
+    )
+
+    if zonal_grouping == ZonalGrouping.NoGrouping:
+
+        # declare the linear analysis
+        ls = LinearAnalysis(numerical_circuit=nc,
+                            distributed_slack=False,
+                            correct_values=True)
+
+        # compute the PTDF and LODF
+        ls.run()
+
+        # compute the sensitivity to the exchange
+        alpha = compute_alpha(ptdf=ls.PTDF,
+                              lodf=ls.LODF,
+                              P0=nc.Sbus.real,
+                              Pinstalled=nc.bus_installed_power,
+                              Pgen=nc.generator_data.get_injections_per_bus().real,
+                              Pload=nc.load_data.get_injections_per_bus().real,
+                              bus_a1_idx=bus_a1_idx,
+                              bus_a2_idx=bus_a2_idx,
+                              mode=TRANSFER_MODE_2_INT[transfer_method])
+        mip_vars.branch_vars.alpha[t_idx, :] = alpha
+
+        # compute the structural NTC: this is the sum of ratings in the inter area
+        structural_ntc = nc.get_structural_ntc(bus_a1_idx=bus_a1_idx, bus_a2_idx=bus_a2_idx)
+        mip_vars.structural_ntc[t_idx] = structural_ntc
+
+        # formulate branches -----------------------------------------------------------------------------------
+
+        f_obj += add_linear_branches_formulation(
+            t_idx=t_idx,
+            Sbase=nc.Sbase,
+            branch_data_t=nc.branch_data,
+            branch_vars=mip_vars.branch_vars,
+            bus_vars=mip_vars.bus_vars,
+            prob=lp_model,
+            monitor_only_sensitive_branches=monitor_only_sensitive_branches,
+            monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
+            alpha=alpha,
+            alpha_threshold=alpha_threshold,
+            structural_ntc=float(structural_ntc),
+            ntc_load_rule=ntc_load_rule,
+            inf=1e20,
+            add_flow_slacks=False,
+        )
+
+        # formulate nodes ---------------------------------------------------------------------------------------
+        add_linear_node_balance(t_idx=t_idx,
+                                Bbus=nc.Bbus,
+                                vd=nc.vd,
+                                bus_data=nc.bus_data,
+                                bus_vars=mip_vars.bus_vars,
+                                prob=lp_model)
+
+        # formulate contingencies --------------------------------------------------------------------------------
+
+        if consider_contingencies:
+
+            if len(contingency_groups_used) > 0:
+
+                # declare the multi-contingencies analysis and compute
+                mctg = LinearMultiContingencies(grid=grid,
+                                                contingency_groups_used=contingency_groups_used)
+                mctg.compute(lodf=ls.LODF,
+                             ptdf=ls.PTDF,
+                             ptdf_threshold=lodf_threshold,
+                             lodf_threshold=lodf_threshold)
+
+                # formulate the contingencies
+                f_obj += add_linear_branches_contingencies_formulation(
+                    t_idx=t_idx,
+                    Sbase=nc.Sbase,
+                    branch_data_t=nc.branch_data,
+                    branch_vars=mip_vars.branch_vars,
+                    bus_vars=mip_vars.bus_vars,
+                    prob=lp_model,
+                    linear_multicontingencies=mctg,
+                    monitor_only_sensitive_branches=monitor_only_sensitive_branches,
+                    monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
+                    structural_ntc=structural_ntc,
+                    ntc_load_rule=ntc_load_rule,
+                    alpha_threshold=alpha_threshold,
+                )
+
+            else:
+                logger.add_warning(msg="Contingencies enabled, but no contingency groups provided")
+
+    elif zonal_grouping == ZonalGrouping.All:
+        # this is the copper plate approach
+        pass
+
+    return f_obj, ls
+
+
 def run_linear_ntc_opf_ts(grid: MultiCircuit,
                           time_indices: Union[IntVec, None],
                           solver_type: MIPSolvers = MIPSolvers.HIGHS,
@@ -1055,13 +1303,6 @@ def run_linear_ntc_opf_ts(grid: MultiCircuit,
     :param robust: Robust optimization?
     :return: NtcVars class with the results
     """
-    mode_2_int = {
-        AvailableTransferMode.Generation: 0,
-        AvailableTransferMode.InstalledPower: 1,
-        AvailableTransferMode.Load: 2,
-        AvailableTransferMode.GenerationAndLoad: 3
-    }
-
     bus_dict = {bus: i for i, bus in enumerate(grid.buses)}
     areas_dict = {elm: i for i, elm in enumerate(grid.areas)}
 
@@ -1113,136 +1354,28 @@ def run_linear_ntc_opf_ts(grid: MultiCircuit,
             mip_vars.hvdc_vars.inter_space_hvdc = nc.hvdc_data.get_inter_areas(bus_idx_from=bus_a1_idx_set,
                                                                                bus_idx_to=bus_a2_idx_set)
 
-        # formulate the bus angles ---------------------------------------------------------------------------------
-        for k in range(nc.bus_data.nbus):
-            mip_vars.bus_vars.theta[t_idx, k] = lp_model.add_var(
-                lb=nc.bus_data.angle_min[k],
-                ub=nc.bus_data.angle_max[k],
-                name=join("th_", [t_idx, k], "_")
-            )
-
-        # formulate injections -------------------------------------------------------------------------------------
-
-        # magic scaling: the demand must be exactly (to the solver tolerance) the same as the demand
-        Pbus = nc.Pbus.copy()
-        Ptotal = np.sum(Pbus)
-        Pbus[nc.vd] -= Ptotal / len(nc.vd)
-
-        f_obj += add_linear_injections_formulation(
-            t=t_idx,
-            Sbase=nc.Sbase,
-            gen_data_t=nc.generator_data,
-            load_data_t=nc.load_data,
-            bus_data_t=nc.bus_data,
-            p_bus_t=Pbus,
+        # formulate the time step --------------------------------------------------------------------------------
+        f_obj_t, _ = add_ntc_time_step_formulation(
+            t_idx=t_idx,
+            grid=grid,
+            nc=nc,
+            mip_vars=mip_vars,
+            lp_model=lp_model,
+            zonal_grouping=zonal_grouping,
+            skip_generation_limits=skip_generation_limits,
+            consider_contingencies=consider_contingencies,
+            contingency_groups_used=contingency_groups_used,
+            alpha_threshold=alpha_threshold,
+            lodf_threshold=lodf_threshold,
             bus_a1_idx=bus_a1_idx,
             bus_a2_idx=bus_a2_idx,
             transfer_method=transfer_method,
-            skip_generation_limits=skip_generation_limits,
-            ntc_vars=mip_vars,
-            prob=lp_model,
+            monitor_only_sensitive_branches=monitor_only_sensitive_branches,
+            monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
+            ntc_load_rule=ntc_load_rule,
             logger=logger
         )
-
-        # formulate hvdc -------------------------------------------------------------------------------------------
-        f_obj += add_linear_hvdc_formulation(
-            t_idx=t_idx,
-            Sbase=nc.Sbase,
-            hvdc_data_t=nc.hvdc_data,
-            hvdc_vars=mip_vars.hvdc_vars,
-            vars_bus=mip_vars.bus_vars,
-            prob=lp_model,
-        )
-
-        if zonal_grouping == ZonalGrouping.NoGrouping:
-
-            # declare the linear analysis
-            ls = LinearAnalysis(numerical_circuit=nc,
-                                distributed_slack=False,
-                                correct_values=True)
-
-            # compute the PTDF and LODF
-            ls.run()
-
-            # compute the sensitivity to the exchange
-            alpha = compute_alpha(ptdf=ls.PTDF,
-                                  lodf=ls.LODF,
-                                  P0=nc.Sbus.real,
-                                  Pinstalled=nc.bus_installed_power,
-                                  Pgen=nc.generator_data.get_injections_per_bus().real,
-                                  Pload=nc.load_data.get_injections_per_bus().real,
-                                  bus_a1_idx=bus_a1_idx,
-                                  bus_a2_idx=bus_a2_idx,
-                                  mode=mode_2_int[transfer_method])
-            mip_vars.branch_vars.alpha[t_idx, :] = alpha
-
-            # compute the structural NTC: this is the sum of ratings in the inter area
-            structural_ntc = nc.get_structural_ntc(bus_a1_idx=bus_a1_idx, bus_a2_idx=bus_a2_idx)
-            mip_vars.structural_ntc[t_idx] = structural_ntc
-
-            # formulate branches -----------------------------------------------------------------------------------
-
-            f_obj += add_linear_branches_formulation(
-                t_idx=t_idx,
-                Sbase=nc.Sbase,
-                branch_data_t=nc.branch_data,
-                branch_vars=mip_vars.branch_vars,
-                bus_vars=mip_vars.bus_vars,
-                prob=lp_model,
-                monitor_only_sensitive_branches=monitor_only_sensitive_branches,
-                monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
-                alpha=alpha,
-                alpha_threshold=alpha_threshold,
-                structural_ntc=float(structural_ntc),
-                ntc_load_rule=ntc_load_rule,
-                inf=1e20,
-                add_flow_slacks=False,
-            )
-
-            # formulate nodes ---------------------------------------------------------------------------------------
-            add_linear_node_balance(t_idx=t_idx,
-                                    Bbus=nc.Bbus,
-                                    vd=nc.vd,
-                                    bus_data=nc.bus_data,
-                                    bus_vars=mip_vars.bus_vars,
-                                    prob=lp_model)
-
-            # formulate contingencies --------------------------------------------------------------------------------
-
-            if consider_contingencies:
-
-                if len(contingency_groups_used) > 0:
-
-                    # declare the multi-contingencies analysis and compute
-                    mctg = LinearMultiContingencies(grid=grid,
-                                                    contingency_groups_used=contingency_groups_used)
-                    mctg.compute(lodf=ls.LODF,
-                                 ptdf=ls.PTDF,
-                                 ptdf_threshold=lodf_threshold,
-                                 lodf_threshold=lodf_threshold)
-
-                    # formulate the contingencies
-                    f_obj += add_linear_branches_contingencies_formulation(
-                        t_idx=t_idx,
-                        Sbase=nc.Sbase,
-                        branch_data_t=nc.branch_data,
-                        branch_vars=mip_vars.branch_vars,
-                        bus_vars=mip_vars.bus_vars,
-                        prob=lp_model,
-                        linear_multicontingencies=mctg,
-                        monitor_only_sensitive_branches=monitor_only_sensitive_branches,
-                        monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
-                        structural_ntc=structural_ntc,
-                        ntc_load_rule=ntc_load_rule,
-                        alpha_threshold=alpha_threshold,
-                    )
-
-                else:
-                    logger.add_warning(msg="Contingencies enabled, but no contingency groups provided")
-
-        elif zonal_grouping == ZonalGrouping.All:
-            # this is the copper plate approach
-            pass
+        f_obj += f_obj_t
 
         if progress_func is not None:
             progress_func((t_idx + 1) / nt * 100.0)
@@ -1287,3 +1420,391 @@ def run_linear_ntc_opf_ts(grid: MultiCircuit,
     logger += lp_model.logger
 
     return vars_v
+
+
+def get_ntc_structure_signature(nc: NumericalCircuit, proportions: Vec) -> bytes:
+    """
+    Get a signature of everything that determines the structure of the NTC LP of a time step:
+    the variables, the constraints and their coefficients (except the injection proportions).
+    Time steps with the same signature can share the LP model, updating only its bounds and right-hand sides.
+    :param nc: NumericalCircuit compiled at the time step
+    :param proportions: injection proportions of the exchange at the time step
+    :return: signature
+    """
+    return b''.join([
+        nc.bus_data.active.astype(bool).tobytes(),
+        nc.branch_data.active.astype(bool).tobytes(),
+        nc.branch_data.monitor_loading.astype(bool).tobytes(),
+        nc.branch_data.X.tobytes(),
+        nc.branch_data.R.tobytes(),
+        nc.branch_data.tap_module.tobytes(),
+        str(list(nc.branch_data.tap_phase_control_mode)).encode(),
+        nc.hvdc_data.active.astype(bool).tobytes(),
+        nc.hvdc_data.dispatchable.astype(bool).tobytes(),
+        nc.hvdc_data.angle_droop.tobytes(),
+        str(list(nc.hvdc_data.control_mode)).encode(),
+        np.asarray(nc.vd, dtype=int).tobytes(),
+        (proportions != 0).tobytes()
+    ])
+
+
+class NtcTimeStepModel:
+    """
+    NTC LP model of a single time step, formulated once for a grid structure
+    and updated in place (bounds, right-hand sides and injection proportions)
+    for the following time steps that share that structure
+    """
+
+    def __init__(self,
+                 grid: MultiCircuit,
+                 nc: NumericalCircuit,
+                 signature: bytes,
+                 solver_type: MIPSolvers = MIPSolvers.HIGHS,
+                 zonal_grouping: ZonalGrouping = ZonalGrouping.NoGrouping,
+                 skip_generation_limits: bool = False,
+                 consider_contingencies: bool = False,
+                 contingency_groups_used: List[ContingencyGroup] = (),
+                 alpha_threshold: float = 0.001,
+                 lodf_threshold: float = 0.001,
+                 bus_a1_idx: IntVec | None = None,
+                 bus_a2_idx: IntVec | None = None,
+                 transfer_method: AvailableTransferMode = AvailableTransferMode.InstalledPower,
+                 monitor_only_sensitive_branches: bool = True,
+                 monitor_only_ntc_load_rule_branches: bool = False,
+                 ntc_load_rule: float = 0.7,
+                 logger: Logger = Logger()):
+        """
+        Formulate the model with the values of the time step nc was compiled at
+        :param grid: MultiCircuit instance
+        :param nc: NumericalCircuit compiled at the first time step
+        :param signature: structure signature of the time step (see get_ntc_structure_signature)
+        :param solver_type: MIP solver to use
+        :param zonal_grouping: Zonal grouping?
+        :param skip_generation_limits: Skip the generation limits?
+        :param consider_contingencies: Consider the contingencies?
+        :param contingency_groups_used: List of contingency groups to simulate
+        :param alpha_threshold: threshold to consider the exchange sensitivity
+        :param lodf_threshold: threshold to consider LODF sensitivities
+        :param bus_a1_idx: array of bus indices in the area 1
+        :param bus_a2_idx: array of bus indices in the area 2
+        :param transfer_method: AvailableTransferMode
+        :param monitor_only_sensitive_branches
+        :param monitor_only_ntc_load_rule_branches
+        :param ntc_load_rule: Amount of exchange branches power that should be dedicated to exchange
+        :param logger: logger instance
+        """
+        self.signature = signature
+        self.zonal_grouping = zonal_grouping
+        self.skip_generation_limits = skip_generation_limits
+        self.alpha_threshold = alpha_threshold
+        self.bus_a1_idx = bus_a1_idx
+        self.bus_a2_idx = bus_a2_idx
+        self.transfer_method = transfer_method
+        self.monitor_only_sensitive_branches = monitor_only_sensitive_branches
+        self.monitor_only_ntc_load_rule_branches = monitor_only_ntc_load_rule_branches
+        self.ntc_load_rule = ntc_load_rule
+        self.logger = logger
+
+        # number of solutions done with this model
+        self.n_solved = 0
+
+        self.lp_model: LpModel = LpModel(solver_type)
+
+        self.mip_vars = NtcVars(nt=1,
+                                nbus=grid.get_bus_number(),
+                                ng=grid.get_generators_number(),
+                                nb=grid.get_batteries_number(),
+                                nl=grid.get_load_like_device_number(),
+                                nbr=grid.get_branch_number_wo_hvdc(),
+                                n_hvdc=grid.get_hvdc_number(),
+                                model=self.lp_model)
+
+        # find the inter space branches given the bus indices of each space
+        bus_a1_idx_set = set(bus_a1_idx)
+        bus_a2_idx_set = set(bus_a2_idx)
+        self.mip_vars.branch_vars.inter_space_branches = nc.branch_data.get_inter_areas(bus_idx_from=bus_a1_idx_set,
+                                                                                        bus_idx_to=bus_a2_idx_set)
+        self.mip_vars.hvdc_vars.inter_space_hvdc = nc.hvdc_data.get_inter_areas(bus_idx_from=bus_a1_idx_set,
+                                                                                bus_idx_to=bus_a2_idx_set)
+
+        f_obj, self.linear_analysis = add_ntc_time_step_formulation(
+            t_idx=0,
+            grid=grid,
+            nc=nc,
+            mip_vars=self.mip_vars,
+            lp_model=self.lp_model,
+            zonal_grouping=zonal_grouping,
+            skip_generation_limits=skip_generation_limits,
+            consider_contingencies=consider_contingencies,
+            contingency_groups_used=contingency_groups_used,
+            alpha_threshold=alpha_threshold,
+            lodf_threshold=lodf_threshold,
+            bus_a1_idx=bus_a1_idx,
+            bus_a2_idx=bus_a2_idx,
+            transfer_method=transfer_method,
+            monitor_only_sensitive_branches=monitor_only_sensitive_branches,
+            monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
+            ntc_load_rule=ntc_load_rule,
+            logger=logger
+        )
+
+        self.lp_model.minimize(f_obj)
+
+    def update(self, nc: NumericalCircuit, proportions: Vec) -> None:
+        """
+        Set the values of another time step with the same structure signature
+        :param nc: NumericalCircuit compiled at the time step
+        :param proportions: injection proportions of the exchange at the time step
+        """
+        Sbase = nc.Sbase
+        bus_vars = self.mip_vars.bus_vars
+        branch_vars = self.mip_vars.branch_vars
+        hvdc_vars = self.mip_vars.hvdc_vars
+
+        # bus angles ---------------------------------------------------------------------------------------------------
+        for k in range(nc.bus_data.nbus):
+            set_var_bounds(var=bus_vars.theta[0, k], lb=nc.bus_data.angle_min[k], ub=nc.bus_data.angle_max[k])
+
+        for i in nc.vd:
+            set_var_bounds(var=bus_vars.theta[0, i], lb=0.0, ub=0.0)
+
+        # injections ---------------------------------------------------------------------------------------------------
+        bus_pref_t, bus_pmax_t, bus_pmin_t = get_transfer_power_scaling_per_bus(
+            bus_data_t=nc.bus_data,
+            gen_data_t=nc.generator_data,
+            load_data_t=nc.load_data,
+            transfer_method=self.transfer_method,
+            skip_generation_limits=self.skip_generation_limits,
+            inf_value=self.lp_model.INFINITY,
+            Sbase=Sbase
+        )
+
+        # magic scaling: the demand must be exactly (to the solver tolerance) the same as the demand
+        Pbus = nc.Pbus.copy()
+        Pbus[nc.vd] -= np.sum(Pbus) / len(nc.vd)
+
+        bus_vars.proportions[0, :] = proportions
+
+        for k in range(nc.bus_data.nbus):
+            set_var_bounds(var=bus_vars.injections[0, k], lb=bus_pmin_t[k], ub=bus_pmax_t[k])
+            set_cst_rhs(cst=bus_vars.injections_balance[0, k], rhs=Pbus[k])
+            set_cst_coefficient(cst=bus_vars.injections_balance[0, k], var=bus_vars.delta_p[0, k],
+                                value=-proportions[k])
+
+        # hvdc ---------------------------------------------------------------------------------------------------------
+        hvdc_data_t = nc.hvdc_data
+        for m in range(hvdc_data_t.nelm):
+            hvdc_vars.rates[0, m] = hvdc_data_t.rate[m]
+
+            if hvdc_data_t.active[m]:
+                rate_pu = hvdc_data_t.rate[m] / Sbase
+
+                if hvdc_data_t.control_mode[m] == HvdcControlType.type_0_free:
+                    set_var_bounds(var=hvdc_vars.flows[0, m], lb=-rate_pu, ub=rate_pu)
+                    set_cst_rhs(cst=hvdc_vars.flow_constraints[0, m], rhs=hvdc_data_t.Pset[m] / Sbase)
+
+                elif hvdc_data_t.dispatchable[m]:
+                    set_var_bounds(var=hvdc_vars.flows[0, m], lb=-rate_pu, ub=rate_pu)
+
+                else:
+                    P0 = np.clip(hvdc_data_t.Pset[m] / Sbase, -rate_pu, rate_pu)
+                    set_var_bounds(var=hvdc_vars.flows[0, m], lb=P0, ub=P0)
+
+        if self.zonal_grouping == ZonalGrouping.NoGrouping:
+            ls = self.linear_analysis
+
+            # branches -------------------------------------------------------------------------------------------------
+            alpha = compute_alpha(ptdf=ls.PTDF,
+                                  lodf=ls.LODF,
+                                  P0=nc.Sbus.real,
+                                  Pinstalled=nc.bus_installed_power,
+                                  Pgen=nc.generator_data.get_injections_per_bus().real,
+                                  Pload=nc.load_data.get_injections_per_bus().real,
+                                  bus_a1_idx=self.bus_a1_idx,
+                                  bus_a2_idx=self.bus_a2_idx,
+                                  mode=TRANSFER_MODE_2_INT[self.transfer_method])
+            branch_vars.alpha[0, :] = alpha
+
+            structural_ntc = nc.get_structural_ntc(bus_a1_idx=self.bus_a1_idx, bus_a2_idx=self.bus_a2_idx)
+            self.mip_vars.structural_ntc[0] = structural_ntc
+
+            branch_data_t = nc.branch_data
+            monitored = get_ntc_monitored_branches(
+                branch_data_t=branch_data_t,
+                monitor_only_sensitive_branches=self.monitor_only_sensitive_branches,
+                monitor_only_ntc_load_rule_branches=self.monitor_only_ntc_load_rule_branches,
+                alpha=alpha,
+                alpha_threshold=self.alpha_threshold,
+                structural_ntc=float(structural_ntc),
+                ntc_load_rule=self.ntc_load_rule
+            )
+
+            branch_vars.rates[0, :] = branch_data_t.rates
+            for m in range(branch_data_t.nelm):
+                if branch_data_t.active[m]:
+                    if monitored[m]:
+                        rate_pu = branch_data_t.rates[m] / Sbase
+                        set_var_bounds(var=branch_vars.flows[0, m], lb=-rate_pu, ub=rate_pu)
+                    else:
+                        set_var_bounds(var=branch_vars.flows[0, m], lb=-1e20, ub=1e20)
+
+                    if branch_data_t.tap_phase_control_mode[m] == TapPhaseControl.Pf:
+                        set_var_bounds(var=branch_vars.tap_angles[0, m],
+                                       lb=branch_data_t.tap_angle_min[m],
+                                       ub=branch_data_t.tap_angle_max[m])
+
+            # contingencies --------------------------------------------------------------------------------------------
+            for (t, m, c, flow, neg_slack, pos_slack), (upper_cst, lower_cst) in zip(
+                    branch_vars.contingency_flow_data, branch_vars.contingency_flow_constraints):
+                set_cst_rhs(cst=upper_cst, rhs=branch_data_t.contingency_rates[m] / Sbase)
+                set_cst_rhs(cst=lower_cst, rhs=-branch_data_t.contingency_rates[m] / Sbase)
+
+            branch_vars.contingency_rates[0, :] = branch_data_t.contingency_rates
+
+    def solve(self, Sbase: float, robust: bool = False, verbose: int = 0, warm_start: bool = True) -> NtcVars:
+        """
+        Solve the model with its current values
+        :param Sbase: base power (100 MVA)
+        :param robust: Robust optimization?
+        :param verbose: Verbosity level
+        :param warm_start: start from the basis of the previous solution of this model?
+        :return: NtcVars with the values of the solution
+        """
+        status = self.lp_model.solve(robust=robust,
+                                     show_logs=verbose > 0,
+                                     warm_start=warm_start and self.n_solved > 0)
+        self.n_solved += 1
+
+        if status == LpModel.OPTIMAL:
+            self.mip_vars.acceptable_solution = True
+        else:
+            self.logger.add_error('The problem does not have an optimal solution.',
+                                  value=self.lp_model.status2string(status))
+            self.mip_vars.acceptable_solution = False
+
+        vars_v = self.mip_vars.get_values(Sbase=Sbase, model=self.lp_model)
+        vars_v.power_shift = vars_v.bus_vars.delta_p[:, self.bus_a1_idx]
+        vars_v.model = None
+
+        return vars_v
+
+    @property
+    def relaxed(self) -> bool:
+        """
+        Was the model relaxed to find a solution? (then it cannot be reused)
+        :return:
+        """
+        return len(self.lp_model.relaxed_slacks) > 0
+
+
+def run_linear_ntc_opf_ts_reusing_models(grid: MultiCircuit,
+                                         time_indices: IntVec,
+                                         solver_type: MIPSolvers = MIPSolvers.HIGHS,
+                                         zonal_grouping: ZonalGrouping = ZonalGrouping.NoGrouping,
+                                         skip_generation_limits: bool = False,
+                                         consider_contingencies: bool = False,
+                                         contingency_groups_used: List[ContingencyGroup] = (),
+                                         alpha_threshold: float = 0.001,
+                                         lodf_threshold: float = 0.001,
+                                         bus_a1_idx: IntVec | None = None,
+                                         bus_a2_idx: IntVec | None = None,
+                                         transfer_method: AvailableTransferMode = AvailableTransferMode.InstalledPower,
+                                         monitor_only_sensitive_branches: bool = True,
+                                         monitor_only_ntc_load_rule_branches: bool = False,
+                                         ntc_load_rule: float = 0.7,  # 70%
+                                         logger: Logger = Logger(),
+                                         progress_func: Union[None, Callable[[float], None]] = None,
+                                         is_cancel: Union[None, Callable[[], bool]] = None,
+                                         verbose: int = 0,
+                                         robust: bool = False,
+                                         warm_start: bool = True) -> Tuple[List[NtcVars], int]:
+    """
+    Solve the NTC problem of each time step independently, formulating the LP model only
+    when the grid structure changes and otherwise updating the previous one in place
+    :param grid: MultiCircuit instance
+    :param time_indices: Time indices (in the general scheme)
+    :param solver_type: MIP solver to use
+    :param zonal_grouping: Zonal grouping?
+    :param skip_generation_limits: Skip the generation limits?
+    :param consider_contingencies: Consider the contingencies?
+    :param contingency_groups_used: List of contingency groups to simulate
+    :param alpha_threshold: threshold to consider the exchange sensitivity
+    :param lodf_threshold: threshold to consider LODF sensitivities
+    :param bus_a1_idx: array of bus indices in the area 1
+    :param bus_a2_idx: array of bus indices in the area 2
+    :param transfer_method: AvailableTransferMode
+    :param monitor_only_sensitive_branches
+    :param monitor_only_ntc_load_rule_branches
+    :param ntc_load_rule: Amount of exchange branches power that should be dedicated to exchange
+    :param logger: logger instance
+    :param progress_func: function to report progress
+    :param is_cancel: function that returns True to stop before the next time step
+    :param verbose: Verbosity level
+    :param robust: Robust optimization?
+    :param warm_start: start each solution from the basis of the previous one when the model is reused?
+    :return: list of NtcVars with the results (one time step each), number of LP models formulated
+    """
+    bus_dict = {bus: i for i, bus in enumerate(grid.buses)}
+    areas_dict = {elm: i for i, elm in enumerate(grid.areas)}
+
+    model: Union[NtcTimeStepModel, None] = None
+    n_models = 0
+    results = list()
+
+    for t_idx, t in enumerate(time_indices):
+
+        nc: NumericalCircuit = compile_numerical_circuit_at(circuit=grid,
+                                                            t_idx=t,
+                                                            bus_dict=bus_dict,
+                                                            areas_dict=areas_dict,
+                                                            logger=logger)
+
+        bus_pref_t, _, _ = get_transfer_power_scaling_per_bus(bus_data_t=nc.bus_data,
+                                                              gen_data_t=nc.generator_data,
+                                                              load_data_t=nc.load_data,
+                                                              transfer_method=transfer_method,
+                                                              skip_generation_limits=skip_generation_limits,
+                                                              inf_value=LpModel.INFINITY,
+                                                              Sbase=nc.Sbase)
+
+        proportions = get_exchange_proportions(power=bus_pref_t,
+                                               bus_a1_idx=bus_a1_idx,
+                                               bus_a2_idx=bus_a2_idx,
+                                               logger=logger)
+
+        signature = get_ntc_structure_signature(nc=nc, proportions=proportions)
+
+        if model is None or model.signature != signature or model.relaxed:
+            model = NtcTimeStepModel(grid=grid,
+                                     nc=nc,
+                                     signature=signature,
+                                     solver_type=solver_type,
+                                     zonal_grouping=zonal_grouping,
+                                     skip_generation_limits=skip_generation_limits,
+                                     consider_contingencies=consider_contingencies,
+                                     contingency_groups_used=contingency_groups_used,
+                                     alpha_threshold=alpha_threshold,
+                                     lodf_threshold=lodf_threshold,
+                                     bus_a1_idx=bus_a1_idx,
+                                     bus_a2_idx=bus_a2_idx,
+                                     transfer_method=transfer_method,
+                                     monitor_only_sensitive_branches=monitor_only_sensitive_branches,
+                                     monitor_only_ntc_load_rule_branches=monitor_only_ntc_load_rule_branches,
+                                     ntc_load_rule=ntc_load_rule,
+                                     logger=Logger())
+            n_models += 1
+        else:
+            model.update(nc=nc, proportions=proportions)
+
+        results.append(model.solve(Sbase=grid.Sbase, robust=robust, verbose=verbose, warm_start=warm_start))
+
+        logger += model.logger
+        model.logger = Logger()
+
+        if progress_func is not None:
+            progress_func((t_idx + 1) / len(time_indices) * 100.0)
+
+        if is_cancel is not None and is_cancel():
+            break
+
+    return results, n_models
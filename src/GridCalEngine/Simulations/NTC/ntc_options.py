@@ -40,6 +40,8 @@ class OptimalNetTransferCapacityOptions(OptionsTemplate):
                  branch_rating_contribution: float = 70 / 100.0,
                  use_branch_rating_contribution: bool = False,
                  consider_contingencies: bool = False,
+                 reuse_model: bool = True,
+                 n_workers: int = 1,
                  opf_options: OptimalPowerFlowOptions | None = None,
                  lin_options: LinearAnalysisOptions | None = None, ):
         """
@@ -55,6 +57,8 @@ class OptimalNetTransferCapacityOptions(OptionsTemplate):
         :param branch_rating_contribution:
         :param use_branch_rating_contribution:
         :param consider_contingencies:
+        :param reuse_model: (time series) formulate the LP once per grid structure and update it between time steps
+        :param n_workers: (time series) number of processes to solve the time steps with (1 to use this process)
         :param opf_options: OptimalPowerFlowOptions
         :param lin_options: LinearAnalysisOptions
         """
@@ -72,6 +76,8 @@ class OptimalNetTransferCapacityOptions(OptionsTemplate):
         self.branch_rating_contribution: float = branch_rating_contribution
         self.use_branch_rating_contribution: bool = use_branch_rating_contribution
         self.consider_contingencies: bool = consider_contingencies
+        self.reuse_model: bool = reuse_model
+        self.n_workers: int = n_workers
 
         if opf_options is None:
             self.opf_options = OptimalPowerFlowOptions()
@@ -94,5 +100,7 @@ class OptimalNetTransferCapacityOptions(OptionsTemplate):
         self.register(key="branch_rating_contribution", tpe=float)
         self.register(key="use_branch_rating_contribution", tpe=bool)
         self.register(key="consider_contingencies", tpe=bool)
+        self.register(key="reuse_model", tpe=bool)
+        self.register(key="n_workers", tpe=int)
         self.register(key="opf_options", tpe=DeviceType.SimulationOptionsDevice)
         self.register(key="lin_options", tpe=DeviceType.SimulationOptionsDevice)
@@ -116,8 +116,12 @@ class OptimalNetTransferCapacityResults(ResultsTemplate):
         self.inter_space_branches: List[tuple[int, float]] = list()  # index, sense
         self.inter_space_hvdc: List[tuple[int, float]] = list()  # index, sense
 
-        # t, m, c, contingency, negative_slack, positive_slack
-        self.contingency_flows_list = list()
+        # contingency flows in columnar form: monitored branch index, contingency group index,
+        # contingency flow (MW) and its slack (MW)
+        self.contingency_monitored_idx = np.zeros(0, dtype=int)
+        self.contingency_group_idx = np.zeros(0, dtype=int)
+        self.contingency_flows = np.zeros(0, dtype=float)
+        self.contingency_flow_slacks = np.zeros(0, dtype=float)
 
         self.converged = False
 
@@ -149,7 +153,10 @@ class OptimalNetTransferCapacityResults(ResultsTemplate):
         self.register(name='hvdc_losses', tpe=Vec)
 
         self.register(name='converged', tpe=bool)
-        self.register(name='contingency_flows_list', tpe=list)
+        self.register(name='contingency_monitored_idx', tpe=IntVec)
+        self.register(name='contingency_group_idx', tpe=IntVec)
+        self.register(name='contingency_flows', tpe=Vec)
+        self.register(name='contingency_flow_slacks', tpe=Vec)
 
         self.register(name='sending_bus_idx', tpe=list)
         self.register(name='receiving_bus_idx', tpe=list)
@@ -371,9 +378,12 @@ class OptimalNetTransferCapacityResults(ResultsTemplate):
             columns = ['Monitored index', 'Contingency group index',
                        'Contingency branch', 'Contingency group',
                        'Flow (MW)', 'Loading (%)']
-            for t, m, c, contingency, negative_slack, positive_slack in self.contingency_flows_list:
+            for m, c, contingency, slack in zip(self.contingency_monitored_idx,
+                                                self.contingency_group_idx,
+                                                self.contingency_flows,
+                                                self.contingency_flow_slacks):
                 index.append("")
-                flow_c = contingency - negative_slack + positive_slack
+                flow_c = contingency + slack
                 loading_c = abs(flow_c) / self.contingency_rates[m] * 100
                 data.append([
                     m, c, self.branch_names[m], self.contingency_group_names[c],
@@ -16,18 +16,38 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 import numpy as np
-from typing import Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, List, Tuple, Dict, Any
 
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
-from GridCalEngine.Simulations.NTC.ntc_opf import run_linear_ntc_opf_ts
+from GridCalEngine.Simulations.NTC.ntc_opf import run_linear_ntc_opf_ts, run_linear_ntc_opf_ts_reusing_models, NtcVars
 from GridCalEngine.Simulations.NTC.ntc_driver import OptimalNetTransferCapacityOptions
 from GridCalEngine.Simulations.NTC.ntc_ts_results import OptimalNetTransferCapacityTimeSeriesResults
 from GridCalEngine.Simulations.driver_template import TimeSeriesDriverTemplate
 from GridCalEngine.Simulations.Clustering.clustering_results import ClusteringResults
-from GridCalEngine.basic_structures import Logger
+from GridCalEngine.basic_structures import Logger, IntVec
 from GridCalEngine.enumerations import SimulationTypes
 
 
+def run_ntc_time_steps_chunk(grid: MultiCircuit,
+                             time_indices: IntVec,
+                             kwargs: Dict[str, Any]) -> Tuple[List[NtcVars], int, Logger]:
+    """
+    Solve the NTC of a chunk of consecutive time steps reusing the LP models, this is the function run by
+    the worker processes
+    :param grid: MultiCircuit instance
+    :param time_indices: time indices of the chunk
+    :param kwargs: rest of the run_linear_ntc_opf_ts_reusing_models arguments
+    :return: list of NtcVars (one per time step), number of LP models formulated, logger
+    """
+    logger = Logger()
+    opf_vars_list, n_models = run_linear_ntc_opf_ts_reusing_models(grid=grid,
+                                                                   time_indices=time_indices,
+                                                                   logger=logger,
+                                                                   **kwargs)
+    return opf_vars_list, n_models, logger
+
+
 class OptimalNetTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
     tpe = SimulationTypes.OptimalNetTransferCapacityTimeSeries_run
 
@@ -59,6 +79,104 @@ class OptimalNetTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
         self.installed_alpha = None
         self.installed_alpha_n1 = None
 
+        # number of LP models formulated in the last run
+        self.n_models = 0
+
+    def fill_time_step(self, t_idx: int, opf_vars: NtcVars) -> None:
+        """
+        Copy the solution of a time step into the results
+        :param t_idx: time index (position in time_indices)
+        :param opf_vars: NtcVars with the solution of that time step only
+        """
+        if t_idx == 0:
+            # one time results
+            self.results.rates = opf_vars.branch_vars.rates[0, :]
+            self.results.contingency_rates = opf_vars.branch_vars.contingency_rates[0, :]
+            self.results.sending_bus_idx = self.options.sending_bus_idx
+            self.results.receiving_bus_idx = self.options.receiving_bus_idx
+            self.results.inter_space_branches = opf_vars.branch_vars.inter_space_branches
+            self.results.inter_space_hvdc = opf_vars.hvdc_vars.inter_space_hvdc
+
+        self.results.voltage[t_idx, :] = opf_vars.get_voltages()[0, :]
+        self.results.Sbus[t_idx, :] = opf_vars.bus_vars.Pcalc[0, :]
+        self.results.dSbus[t_idx, :] = opf_vars.bus_vars.delta_p[0, :]
+        self.results.bus_shadow_prices[t_idx, :] = opf_vars.bus_vars.shadow_prices[0, :]
+        self.results.load_shedding[t_idx, :] = opf_vars.bus_vars.load_shedding[0, :]
+
+        self.results.Sf[t_idx, :] = opf_vars.branch_vars.flows[0, :]
+        self.results.St[t_idx, :] = -opf_vars.branch_vars.flows[0, :]
+        self.results.overloads[t_idx, :] = (opf_vars.branch_vars.flow_slacks_pos[0, :]
+                                            - opf_vars.branch_vars.flow_slacks_neg[0, :])
+        self.results.loading[t_idx, :] = opf_vars.branch_vars.loading[0, :]
+        self.results.phase_shift[t_idx, :] = opf_vars.branch_vars.tap_angles[0, :]
+
+        self.results.alpha[t_idx, :] = opf_vars.branch_vars.alpha[0, :]
+        self.results.monitor_logic[t_idx, :] = opf_vars.branch_vars.monitor_logic[0, :]
+
+        self.results.add_contingency_flows(t_idx=t_idx,
+                                           monitored_idx=opf_vars.branch_vars.contingency_monitored_idx,
+                                           group_idx=opf_vars.branch_vars.contingency_group_idx,
+                                           flows=opf_vars.branch_vars.contingency_flows,
+                                           slacks=opf_vars.branch_vars.contingency_flow_slacks)
+
+        self.results.hvdc_Pf[t_idx, :] = opf_vars.hvdc_vars.flows[0, :]
+        self.results.hvdc_loading[t_idx, :] = opf_vars.hvdc_vars.loading[0, :]
+
+        self.results.converged[t_idx] = opf_vars.acceptable_solution
+
+    def opf_reusing_models(self):
+        """
+        Solve the time steps reusing the LP model between the time steps with the same grid structure,
+        optionally splitting the time steps in chunks of consecutive steps solved in parallel processes
+        """
+        kwargs = dict(solver_type=self.options.opf_options.mip_solver,
+                      zonal_grouping=self.options.opf_options.zonal_grouping,
+                      skip_generation_limits=self.options.skip_generation_limits,
+                      consider_contingencies=self.options.consider_contingencies,
+                      contingency_groups_used=self.options.opf_options.contingency_groups_used,
+                      lodf_threshold=self.options.lin_options.lodf_threshold,
+                      bus_a1_idx=self.options.sending_bus_idx,
+                      bus_a2_idx=self.options.receiving_bus_idx,
+                      verbose=self.options.opf_options.verbose,
+                      robust=self.options.opf_options.robust)
+
+        nt = len(self.time_indices)
+        n_workers = min(self.options.n_workers, nt)
+
+        if n_workers > 1:
+            self.report_text(f'Optimal net transfer capacity time series with {n_workers} processes...')
+
+            # consecutive time steps per chunk, so that each worker reuses its model as much as possible
+            chunks = np.array_split(self.time_indices, n_workers)
+
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(run_ntc_time_steps_chunk, self.grid, chunk, kwargs) for chunk in chunks]
+
+                t_idx = 0
+                for future in futures:
+                    opf_vars_list, n_models, logger = future.result()
+                    self.n_models += n_models
+                    self.logger += logger
+
+                    for opf_vars in opf_vars_list:
+                        self.fill_time_step(t_idx=t_idx, opf_vars=opf_vars)
+                        t_idx += 1
+
+                    self.report_progress2(t_idx, nt)
+
+        else:
+            self.report_text('Optimal net transfer capacity time series...')
+
+            opf_vars_list, self.n_models = run_linear_ntc_opf_ts_reusing_models(grid=self.grid,
+                                                                                time_indices=self.time_indices,
+                                                                                logger=self.logger,
+                                                                                progress_func=self.report_progress,
+                                                                                is_cancel=self.is_cancel,
+                                                                                **kwargs)
+
+            for t_idx, opf_vars in enumerate(opf_vars_list):
+                self.fill_time_step(t_idx=t_idx, opf_vars=opf_vars)
+
     def opf(self):
         """
         Run thread
@@ -77,6 +195,14 @@ class OptimalNetTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
             clustering_results=self.clustering_results,
         )
 
+        self.n_models = 0
+
+        if self.options.reuse_model:
+            self.opf_reusing_models()
+            self.results.trim_contingency_flows()
+            self.report_text('Done!')
+            return
+
         for t_idx, t in enumerate(self.time_indices):
 
             opf_vars = run_linear_ntc_opf_ts(
@@ -97,38 +223,9 @@ class OptimalNetTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
                 verbose=self.options.opf_options.verbose,
                 robust=self.options.opf_options.robust
             )
+            self.n_models += 1
 
-            if t_idx == 0:
-                # one time results
-                self.results.rates = opf_vars.branch_vars.rates[0, :]
-                self.results.contingency_rates = opf_vars.branch_vars.contingency_rates[0, :]
-                self.results.sending_bus_idx = self.options.sending_bus_idx
-                self.results.receiving_bus_idx = self.options.receiving_bus_idx
-                self.results.inter_space_branches = opf_vars.branch_vars.inter_space_branches
-                self.results.inter_space_hvdc = opf_vars.hvdc_vars.inter_space_hvdc
-
-            self.results.voltage[t_idx, :] = opf_vars.get_voltages()[0, :]
-            self.results.Sbus[t_idx, :] = opf_vars.bus_vars.Pcalc[0, :]
-            self.results.dSbus[t_idx, :] = opf_vars.bus_vars.delta_p[0, :]
-            self.results.bus_shadow_prices[t_idx, :] = opf_vars.bus_vars.shadow_prices[0, :]
-            self.results.load_shedding[t_idx, :] = opf_vars.bus_vars.load_shedding[0, :]
-
-            self.results.Sf[t_idx, :] = opf_vars.branch_vars.flows[0, :]
-            self.results.St[t_idx, :] = -opf_vars.branch_vars.flows[0, :]
-            self.results.overloads[t_idx, :] = (opf_vars.branch_vars.flow_slacks_pos[0, :]
-                                                - opf_vars.branch_vars.flow_slacks_neg[0, :])
-            self.results.loading[t_idx, :] = opf_vars.branch_vars.loading[0, :]
-            self.results.phase_shift[t_idx, :] = opf_vars.branch_vars.tap_angles[0, :]
-
-            self.results.alpha[t_idx, :] = opf_vars.branch_vars.alpha[0, :]
-            self.results.monitor_logic[t_idx, :] = opf_vars.branch_vars.monitor_logic[0, :]
-
-            self.results.contingency_flows_list += opf_vars.branch_vars.contingency_flow_data
-
-            self.results.hvdc_Pf[t_idx, :] = opf_vars.hvdc_vars.flows[0, :]
-            self.results.hvdc_loading[t_idx, :] = opf_vars.hvdc_vars.loading[0, :]
-
-            self.results.converged[t_idx] = opf_vars.acceptable_solution
+            self.fill_time_step(t_idx=t_idx, opf_vars=opf_vars)
 
             # update progress bar
             self.report_progress2(t_idx, len(self.time_indices))
@@ -142,6 +239,7 @@ class OptimalNetTransferCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
             if self.__cancel__:
                 break
 
+        self.results.trim_contingency_flows()
         self.report_text('Done!')
 
     def run(self):
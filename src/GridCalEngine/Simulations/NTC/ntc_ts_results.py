@@ -120,8 +120,15 @@ class OptimalNetTransferCapacityTimeSeriesResults(ResultsTemplate):
         self.inter_space_branches: List[tuple[int, float]] = list()  # index, sense
         self.inter_space_hvdc: List[tuple[int, float]] = list()  # index, sense
 
-        # t, m, c, contingency, negative_slack, positive_slack
-        self.contingency_flows_list = list()
+        # contingency flows in columnar form: time index, monitored branch index, contingency group index,
+        # contingency flow (MW) and its slack (MW). The arrays are preallocated and grown as needed
+        # by add_contingency_flows, n_contingency_flows is the number of entries in use
+        self.n_contingency_flows = 0
+        self.contingency_time_idx = np.zeros(0, dtype=int)
+        self.contingency_monitored_idx = np.zeros(0, dtype=int)
+        self.contingency_group_idx = np.zeros(0, dtype=int)
+        self.contingency_flows = np.zeros(0, dtype=float)
+        self.contingency_flow_slacks = np.zeros(0, dtype=float)
 
         self.converged = np.zeros(nt, dtype=bool)
 
@@ -159,7 +166,53 @@ class OptimalNetTransferCapacityTimeSeriesResults(ResultsTemplate):
         self.register(name='inter_space_hvdc', tpe=list)
 
         self.register(name='converged', tpe=BoolVec)
-        self.register(name='contingency_flows_list', tpe=list)
+        self.register(name='n_contingency_flows', tpe=int)
+        self.register(name='contingency_time_idx', tpe=IntVec)
+        self.register(name='contingency_monitored_idx', tpe=IntVec)
+        self.register(name='contingency_group_idx', tpe=IntVec)
+        self.register(name='contingency_flows', tpe=Vec)
+        self.register(name='contingency_flow_slacks', tpe=Vec)
+
+    def add_contingency_flows(self, t_idx: int, monitored_idx: IntVec, group_idx: IntVec,
+                              flows: Vec, slacks: Vec) -> None:
+        """
+        Store the contingency flows of a time step.
+        The first call preallocates room for all the time steps assuming the same number of entries per step
+        :param t_idx: time index (position in time_indices)
+        :param monitored_idx: monitored branch indices
+        :param group_idx: contingency group indices
+        :param flows: contingency flows (MW)
+        :param slacks: contingency flow slacks (MW)
+        """
+        n = len(flows)
+        a = self.n_contingency_flows
+        b = a + n
+
+        if b > len(self.contingency_flows):
+            capacity = max(b, len(self.time_indices) * n, 2 * len(self.contingency_flows))
+            self.contingency_time_idx = np.resize(self.contingency_time_idx, capacity)
+            self.contingency_monitored_idx = np.resize(self.contingency_monitored_idx, capacity)
+            self.contingency_group_idx = np.resize(self.contingency_group_idx, capacity)
+            self.contingency_flows = np.resize(self.contingency_flows, capacity)
+            self.contingency_flow_slacks = np.resize(self.contingency_flow_slacks, capacity)
+
+        self.contingency_time_idx[a:b] = t_idx
+        self.contingency_monitored_idx[a:b] = monitored_idx
+        self.contingency_group_idx[a:b] = group_idx
+        self.contingency_flows[a:b] = flows
+        self.contingency_flow_slacks[a:b] = slacks
+        self.n_contingency_flows = b
+
+    def trim_contingency_flows(self) -> None:
+        """
+        Drop the preallocated room of the contingency flow arrays that was not used
+        """
+        n = self.n_contingency_flows
+        self.contingency_time_idx = self.contingency_time_idx[:n]
+        self.contingency_monitored_idx = self.contingency_monitored_idx[:n]
+        self.contingency_group_idx = self.contingency_group_idx[:n]
+        self.contingency_flows = self.contingency_flows[:n]
+        self.contingency_flow_slacks = self.contingency_flow_slacks[:n]
 
     def mdl(self, result_type) -> ResultsTable:
         """
@@ -358,9 +411,14 @@ class OptimalNetTransferCapacityTimeSeriesResults(ResultsTemplate):
             columns = ['Time index', 'Monitored index', 'Contingency group index',
                        'Time array', 'Contingency branch', 'Contingency group',
                        'Flow (MW)', 'Loading (%)']
-            for t, m, c, contingency, negative_slack, positive_slack in self.contingency_flows_list:
+            n = self.n_contingency_flows
+            for t, m, c, contingency, slack in zip(self.contingency_time_idx[:n],
+                                                   self.contingency_monitored_idx[:n],
+                                                   self.contingency_group_idx[:n],
+                                                   self.contingency_flows[:n],
+                                                   self.contingency_flow_slacks[:n]):
                 cols.append("")
-                flow_c = contingency - negative_slack + positive_slack
+                flow_c = contingency + slack
                 loading_c = abs(flow_c) / self.contingency_rates[m] * 100
                 data.append([
                     t, m, c, str(self.time_array[t]), self.branch_names[m], self.contingency_group_names[c],
@@ -32,13 +32,20 @@ class NodalCapacityOptions(OptionsTemplate):
                  opf_options: Union[None, OptimalPowerFlowOptions] = None,
                  capacity_nodes_idx: Union[None, IntVec] = None,
                  nodal_capacity_sign: float = 1.0,
-                 method: NodalCapacityMethod = NodalCapacityMethod.LinearOptimization):
+                 method: NodalCapacityMethod = NodalCapacityMethod.LinearOptimization,
+                 n_clusters: int = 0,
+                 screening_tolerance: float = 0.05,
+                 n_workers: int = 1):
         """
 
         :param opf_options: OPF options
         :param capacity_nodes_idx: array of bus indices to optimize
         :param nodal_capacity_sign: if > 0 the generation is maximized, if < 0 the load is maximized
         :param method: NodalCapacityMethod
+        :param n_clusters: number of representative time steps solved exactly by the nonlinear optimization,
+                           the rest are screened with sensitivities. 0 to solve all the distinct time steps.
+        :param screening_tolerance: relative capacity change of a screened time step above which it is solved exactly
+        :param n_workers: number of worker processes for the nonlinear methods, 1 to run in this process
         """
         OptionsTemplate.__init__(self, name="NodalCapacityOptions")
 
@@ -46,8 +53,14 @@ class NodalCapacityOptions(OptionsTemplate):
         self.capacity_nodes_idx = capacity_nodes_idx if capacity_nodes_idx is not None else np.zeros(0, dtype=int)
         self.method: NodalCapacityMethod = method
         self.nodal_capacity_sign = nodal_capacity_sign
+        self.n_clusters = n_clusters
+        self.screening_tolerance = screening_tolerance
+        self.n_workers = n_workers
 
         self.register(key="opf_options", tpe=DeviceType.SimulationOptionsDevice)
         self.register(key="capacity_nodes_idx", tpe=SubObjectType.Array)
         self.register(key="method", tpe=NodalCapacityMethod)
         self.register(key="nodal_capacity_sign", tpe=float)
+        self.register(key="n_clusters", tpe=int)
+        self.register(key="screening_tolerance", tpe=float)
+        self.register(key="n_workers", tpe=int)
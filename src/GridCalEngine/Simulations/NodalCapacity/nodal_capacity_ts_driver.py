@@ -18,12 +18,15 @@ import datetime
 
 import numpy as np
 import pandas as pd
-from typing import Union, List
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, List, Dict, Tuple, Callable, Any
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.DataStructures.numerical_circuit import NumericalCircuit, compile_numerical_circuit_at
 from GridCalEngine.enumerations import EngineType, SimulationTypes
 from GridCalEngine.Simulations.OPF.opf_options import OptimalPowerFlowOptions
 from GridCalEngine.Simulations.OPF.linear_opf_ts import run_linear_opf_ts
-from GridCalEngine.Simulations.OPF.NumericalMethods.ac_opf import run_nonlinear_opf
+from GridCalEngine.Simulations.OPF.NumericalMethods.ac_opf import run_nonlinear_opf, NonlinearOPFResults
 from GridCalEngine.Simulations.NodalCapacity.nodal_capacity_options import NodalCapacityOptions
 from GridCalEngine.Simulations.NodalCapacity.nodal_capacity_ts_results import NodalCapacityTimeSeriesResults
 from GridCalEngine.Simulations.PowerFlow.power_flow_options import PowerFlowOptions
@@ -31,12 +34,220 @@ from GridCalEngine.Simulations.PowerFlow.power_flow_driver import PowerFlowDrive
 from GridCalEngine.Simulations.ContinuationPowerFlow.continuation_power_flow_driver import ContinuationPowerFlowDriver
 from GridCalEngine.Simulations.ContinuationPowerFlow.continuation_power_flow_options import ContinuationPowerFlowOptions
 from GridCalEngine.Simulations.ContinuationPowerFlow.continuation_power_flow_input import ContinuationPowerFlowInput
+from GridCalEngine.Simulations.ContinuationPowerFlow.continuation_power_flow_results import ContinuationPowerFlowResults
+from GridCalEngine.Simulations.LinearFactors.linear_analysis import LinearAnalysis
+from GridCalEngine.Simulations.Clustering.clustering import kmeans_sampling
 from GridCalEngine.Simulations.driver_template import TimeSeriesDriverTemplate
 from GridCalEngine.Simulations.Clustering.clustering_results import ClusteringResults
-from GridCalEngine.basic_structures import IntVec
+from GridCalEngine.Utils.NumericalMethods.ips import IpsSolution
+from GridCalEngine.basic_structures import IntVec, Vec, Mat, Logger
 from GridCalEngine.enumerations import NodalCapacityMethod, CpfStopAt, CpfParametrization
 
 
+def get_nodal_capacity_inputs(grid: MultiCircuit, time_indices: IntVec) -> Mat:
+    """
+    Get the numeric profiles of the buses, the injection devices and the branches at some time steps.
+    Time steps with equal rows pose the same nodal capacity problem.
+    :param grid: MultiCircuit
+    :param time_indices: time indices
+    :return: (len(time_indices), number of profiled values) matrix
+    """
+    columns = list()
+    for elements in [grid.get_buses()] + grid.get_injection_devices_lists() + grid.get_branch_lists():
+        if len(elements) > 0:
+            for magnitude in elements[0].properties_with_profile.keys():
+                default_value = elements[0].get_profile(magnitude).default_value
+                if isinstance(default_value, (bool, int, float, np.number, np.bool_)):
+                    columns.append(grid.get_profiles_matrix(elements=elements, magnitude=magnitude)[time_indices, :])
+
+    if len(columns) > 0:
+        return np.hstack(columns)
+    else:
+        return np.zeros((len(time_indices), 0))
+
+
+def get_cpf_structure_signature(nc: NumericalCircuit) -> bytes:
+    """
+    Get a signature of the grid structure that the continuation power flow of a time step depends on
+    (the base and target injections are those of the snapshot)
+    :param nc: NumericalCircuit compiled at the time step
+    :return: signature
+    """
+    return b''.join([
+        nc.bus_data.active.astype(bool).tobytes(),
+        nc.bus_data.bus_types.tobytes(),
+        nc.branch_data.active.astype(bool).tobytes(),
+        nc.branch_data.R.tobytes(),
+        nc.branch_data.X.tobytes(),
+        nc.branch_data.G.tobytes(),
+        nc.branch_data.B.tobytes(),
+        nc.branch_data.tap_module.tobytes(),
+        nc.branch_data.tap_angle.tobytes(),
+        nc.branch_rates.tobytes(),
+        nc.hvdc_data.active.astype(bool).tobytes(),
+        nc.Yshunt_from_devices.tobytes(),
+        nc.Qmax_bus.tobytes(),
+        nc.Qmin_bus.tobytes(),
+        nc.bus_installed_power.tobytes()
+    ])
+
+
+def get_flow_headroom(Pf: Vec, beta: Vec, Pmax: Vec, eps: float = 1e-9) -> float:
+    """
+    Get the largest capacity increment that keeps -Pmax <= Pf + increment * beta <= Pmax
+    :param Pf: branch active power flows
+    :param beta: branch flow sensitivities to the capacity
+    :param Pmax: branch active power limits
+    :param eps: sensitivities below this value are ignored
+    :return: capacity increment (negative if the flows are beyond their limits), inf if the flows do not limit it
+    """
+    pos = beta > eps
+    neg = beta < -eps
+    s = np.r_[(Pmax[pos] - Pf[pos]) / beta[pos], (-Pmax[neg] - Pf[neg]) / beta[neg]]
+    return s.min() if len(s) > 0 else np.inf
+
+
+def run_nonlinear_nodal_capacity_steps(grid: MultiCircuit,
+                                       time_indices: List[Union[int, None]],
+                                       opf_options: OptimalPowerFlowOptions,
+                                       pf_options: PowerFlowOptions,
+                                       nodal_capacity_sign: float,
+                                       capacity_nodes_idx: IntVec,
+                                       warm_starts: Union[List[Union[List[IpsSolution], None]], None] = None,
+                                       logger: Logger = Logger(),
+                                       progress_func: Union[Callable[[int, int], None], None] = None,
+                                       is_cancel: Union[Callable[[], bool], None] = None) -> List[NonlinearOPFResults]:
+    """
+    Nonlinear nodal capacity of a list of time steps.
+    Every time step is warm-started from the solution of the last converged time step.
+    :param grid: MultiCircuit
+    :param time_indices: time indices to solve (None for the snapshot)
+    :param opf_options: OptimalPowerFlowOptions
+    :param pf_options: PowerFlowOptions
+    :param nodal_capacity_sign: if > 0 the generation is maximized, if < 0 the load is maximized
+    :param capacity_nodes_idx: array of bus indices to optimize
+    :param warm_starts: interior point solutions to warm-start each time step from instead of the previous one
+    :param logger: Logger
+    :param progress_func: function called with the number of solved time steps and the total
+    :param is_cancel: function that returns True if the simulation was cancelled
+    :return: list of NonlinearOPFResults, one per solved time step
+    """
+    results = list()
+    previous: Union[NonlinearOPFResults, None] = None
+
+    for i, t in enumerate(time_indices):
+
+        if warm_starts is not None and warm_starts[i] is not None:
+            warm_start = warm_starts[i]
+        else:
+            warm_start = previous.ips_solutions if previous is not None else None
+
+        res = run_nonlinear_opf(grid=grid,
+                                opf_options=opf_options,
+                                pf_options=pf_options,
+                                t_idx=t,
+                                # for the first power flow, use the given strategy
+                                # for the successive ones, use the previous solution
+                                pf_init=opf_options.ips_init_with_pf if previous is None else True,
+                                Sbus_pf0=previous.S * grid.Sbase if previous is not None else None,
+                                voltage_pf0=previous.V if previous is not None else None,
+                                optimize_nodal_capacity=True,
+                                nodal_capacity_sign=nodal_capacity_sign,
+                                capacity_nodes_idx=capacity_nodes_idx,
+                                warm_start=warm_start,
+                                logger=logger)
+
+        # only the point and the multipliers are needed to warm-start
+        res.ips_solutions = [replace(sol, structs=None) for sol in res.ips_solutions]
+        results.append(res)
+
+        if res.converged:
+            previous = res
+
+        if progress_func is not None:
+            progress_func(i, len(time_indices))
+
+        if is_cancel is not None and is_cancel():
+            break
+
+    return results
+
+
+def run_nonlinear_nodal_capacity_chunk(grid: MultiCircuit,
+                                       time_indices: List[Union[int, None]],
+                                       warm_starts: Union[List[Union[List[IpsSolution], None]], None],
+                                       kwargs: Dict[str, Any]) -> Tuple[List[NonlinearOPFResults], Logger]:
+    """
+    Nonlinear nodal capacity of a chunk of time steps, this is the function run by the worker processes
+    :param grid: MultiCircuit
+    :param time_indices: time indices of the chunk
+    :param warm_starts: interior point solutions to warm-start each time step from (optional)
+    :param kwargs: rest of the run_nonlinear_nodal_capacity_steps arguments
+    :return: list of NonlinearOPFResults, logger
+    """
+    logger = Logger()
+    results = run_nonlinear_nodal_capacity_steps(grid=grid,
+                                                 time_indices=time_indices,
+                                                 warm_starts=warm_starts,
+                                                 logger=logger,
+                                                 **kwargs)
+    return results, logger
+
+
+def run_cpf_nodal_capacity_steps(grid: MultiCircuit,
+                                 time_indices: List[Union[int, None]],
+                                 vc_options: ContinuationPowerFlowOptions,
+                                 vc_inputs: ContinuationPowerFlowInput,
+                                 pf_options: PowerFlowOptions,
+                                 logger: Logger = Logger(),
+                                 progress_func: Union[Callable[[int, int], None], None] = None,
+                                 is_cancel: Union[Callable[[], bool], None] = None
+                                 ) -> List[ContinuationPowerFlowResults]:
+    """
+    Continuation power flow of a list of time steps
+    :param grid: MultiCircuit
+    :param time_indices: time indices to solve (None for the snapshot)
+    :param vc_options: ContinuationPowerFlowOptions
+    :param vc_inputs: ContinuationPowerFlowInput
+    :param pf_options: PowerFlowOptions
+    :param logger: Logger
+    :param progress_func: function called with the number of solved time steps and the total
+    :param is_cancel: function that returns True if the simulation was cancelled
+    :return: list of ContinuationPowerFlowResults, one per solved time step
+    """
+    vc = ContinuationPowerFlowDriver(grid=grid,
+                                     options=vc_options,
+                                     inputs=vc_inputs,
+                                     pf_options=pf_options)
+    results = list()
+    for i, t in enumerate(time_indices):
+        results.append(vc.run_at(t_idx=t))
+
+        if progress_func is not None:
+            progress_func(i, len(time_indices))
+
+        if is_cancel is not None and is_cancel():
+            break
+
+    logger += vc.logger
+    return results
+
+
+def run_cpf_nodal_capacity_chunk(grid: MultiCircuit,
+                                 time_indices: List[Union[int, None]],
+                                 kwargs: Dict[str, Any]) -> Tuple[List[ContinuationPowerFlowResults], Logger]:
+    """
+    Continuation power flow of a chunk of time steps, this is the function run by the worker processes
+    :param grid: MultiCircuit
+    :param time_indices: time indices of the chunk
+    :param kwargs: rest of the run_cpf_nodal_capacity_steps arguments
+    :return: list of ContinuationPowerFlowResults, logger
+    """
+    logger = Logger()
+    results = run_cpf_nodal_capacity_steps(grid=grid, time_indices=time_indices, logger=logger, **kwargs)
+    return results, logger
+
+
 class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
     name = 'Nodal capacity time series'
     tpe = SimulationTypes.NodalCapacityTimeSeries_run
@@ -220,9 +431,192 @@ class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
 
         return self.results
 
+    def set_nonlinear_opf_step(self, it: int, res: NonlinearOPFResults) -> None:
+        """
+        Set the results of a time step from the nonlinear OPF results
+        :param it: time step position
+        :param res: NonlinearOPFResults
+        """
+        Sbase = self.grid.Sbase
+        self.results.voltage[it, :] = res.V
+        self.results.Sbus[it, :] = res.S * Sbase
+        self.results.bus_shadow_prices[it, :] = res.lam_p
+        self.results.nodal_capacity[it, :] = res.nodal_capacity
+        # self.results.load_shedding = npa_res.load_shedding[0, :]
+        # self.results.battery_power = npa_res.battery_p[0, :]
+        # self.results.battery_energy = npa_res.battery_energy[0, :]
+        self.results.generator_power[it, :] = res.Pg * Sbase
+        self.results.generator_cost[it, :] = res.Pcost
+
+        self.results.Sf[it, :] = res.Sf * Sbase
+        self.results.St[it, :] = res.St * Sbase
+        self.results.overloads[it, :] = (res.sl_sf - res.sl_st) * Sbase
+        self.results.loading[it, :] = res.loading
+        self.results.phase_shift[it, :] = res.tap_phase
+
+        self.results.hvdc_Pf[it, :] = res.hvdc_Pf
+        self.results.hvdc_loading[it, :] = res.hvdc_loading
+        self.results.converged[it] = res.converged
+
+    def solve_non_linear_steps(self,
+                               positions: IntVec,
+                               warm_starts: Union[List[Union[List[IpsSolution], None]], None] = None
+                               ) -> Dict[int, NonlinearOPFResults]:
+        """
+        Solve the nonlinear nodal capacity of some time steps exactly, in parallel chunks if so configured
+        :param positions: positions of the time steps to solve
+        :param warm_starts: interior point solutions to warm-start each time step from (optional)
+        :return: dictionary of time step position -> NonlinearOPFResults
+        """
+        has_ts, t_indices = self.get_time_indices()
+        time_indices = [t_indices[p] for p in positions]
+        kwargs = dict(opf_options=self.opf_options,
+                      pf_options=self.pf_options,
+                      nodal_capacity_sign=self.options.nodal_capacity_sign,
+                      capacity_nodes_idx=self.options.capacity_nodes_idx)
+
+        n = len(positions)
+        n_workers = min(self.options.n_workers, n)
+        solved: Dict[int, NonlinearOPFResults] = dict()
+
+        if n_workers > 1:
+            # consecutive time steps per chunk, so that each one warm-starts from a similar one
+            chunks = np.array_split(np.arange(n), n_workers)
+
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(run_nonlinear_nodal_capacity_chunk,
+                                           self.grid,
+                                           [time_indices[i] for i in chunk],
+                                           [warm_starts[i] for i in chunk] if warm_starts is not None else None,
+                                           kwargs)
+                           for chunk in chunks]
+
+                n_solved = 0
+                for chunk, future in zip(chunks, futures):
+                    res_list, logger = future.result()
+                    self.logger += logger
+
+                    for i, res in zip(chunk, res_list):
+                        solved[positions[i]] = res
+
+                    n_solved += len(chunk)
+                    self.report_progress2(n_solved - 1, n)
+
+        else:
+            res_list = run_nonlinear_nodal_capacity_steps(grid=self.grid,
+                                                          time_indices=time_indices,
+                                                          warm_starts=warm_starts,
+                                                          logger=self.logger,
+                                                          progress_func=self.report_progress2,
+                                                          is_cancel=self.is_cancel,
+                                                          **kwargs)
+            for p, res in zip(positions, res_list):
+                solved[p] = res
+
+        return solved
+
+    def screen_non_linear_step(self,
+                               pos: int,
+                               rep: int,
+                               rep_res: NonlinearOPFResults,
+                               sensitivities_cache: Dict[int, Tuple[Mat, IntVec, IntVec, IntVec, Vec, Vec]],
+                               Pbus: Mat,
+                               Pgen: Mat,
+                               rates: Mat,
+                               eps: float = 1e-4) -> Tuple[NonlinearOPFResults, bool]:
+        """
+        Estimate the nodal capacity of a time step from the exact solution of its representative time step,
+        using the PTDF sensitivities of the flows to the injections and to the capacity:
+        - If the representative was limited by the flows, the capacity follows the change of the flow headroom.
+        - If it was limited by the slack generation, the capacity follows the change of the injections balance.
+        - Otherwise, the capacity is only reduced when the flows become limiting.
+        :param pos: time step position
+        :param rep: position of the representative time step
+        :param rep_res: NonlinearOPFResults of the representative time step
+        :param sensitivities_cache: dictionary of representative position ->
+                                    (PTDF, monitored branch indices, slack generators bus and indices, their Pmin and Pmax)
+        :param Pbus: (nt, nbus) active power injections profiles (MW)
+        :param Pgen: (nt, ngen) generators active power profiles (MW)
+        :param rates: (nt, nbr) branch rates profiles (MW)
+        :param eps: headroom (p.u.) below which the representative is considered limited by the flows or the slack
+        :return: estimated NonlinearOPFResults, whether the estimated change exceeds the screening tolerance
+        """
+        t = self.time_indices[pos]
+        t_rep = self.time_indices[rep]
+        Sbase = self.grid.Sbase
+        cap_idx = self.options.capacity_nodes_idx
+        sign = self.options.nodal_capacity_sign
+
+        data = sensitivities_cache.get(rep, None)
+        if data is None:
+            nc = compile_numerical_circuit_at(circuit=self.grid, t_idx=t_rep, logger=self.logger)
+            linear_analysis = LinearAnalysis(numerical_circuit=nc, distributed_slack=False)
+            linear_analysis.run()
+            slack_bus_idx, slack_gens = np.where(nc.generator_data.C_bus_elm[nc.vd, :].toarray() == 1)
+            data = (linear_analysis.PTDF,
+                    nc.branch_data.get_monitor_enabled_indices(),
+                    nc.vd[slack_bus_idx],
+                    slack_gens,
+                    nc.generator_data.pmin[slack_gens] / Sbase,
+                    nc.generator_data.pmax[slack_gens] / Sbase)
+            sensitivities_cache[rep] = data
+        PTDF, mon, slack_bus, slack_gens, Pmin_slack, Pmax_slack = data
+
+        # direction of the capacity: that of the representative, or evenly spread if there was none
+        cap_rep = rep_res.nodal_capacity / Sbase
+        q_rep = -sign * cap_rep.sum()
+        if abs(q_rep) > 1e-9:
+            direction = cap_rep / q_rep
+        else:
+            direction = np.full(len(cap_idx), -sign / max(len(cap_idx), 1))
+        beta = PTDF[:, cap_idx] @ direction
+
+        # active power limits, keeping the reactive power flows of the representative
+        Qf = rep_res.Sf.imag
+        Pmax_rep = np.sqrt(np.maximum(np.power(rates[t_rep, :] / Sbase, 2) - np.power(Qf, 2), 0.0))
+        Pmax = np.sqrt(np.maximum(np.power(rates[t, :] / Sbase, 2) - np.power(Qf, 2), 0.0))
+
+        # change of the injections, but the slack generators are dispatched by the OPF instead
+        dS = (Pbus[t, :] - Pbus[t_rep, :]) / Sbase
+        dS[slack_bus] -= (Pgen[t, slack_gens] - Pgen[t_rep, slack_gens]) / Sbase
+        dPf = PTDF @ dS
+        s_rep = get_flow_headroom(Pf=rep_res.Sf.real[mon], beta=beta[mon], Pmax=Pmax_rep[mon])
+        s = get_flow_headroom(Pf=rep_res.Sf.real[mon] + dPf[mon], beta=beta[mon], Pmax=Pmax[mon])
+
+        Pg_slack = rep_res.Pg[slack_gens]
+        slack_limited = len(slack_gens) > 0 and np.all((Pg_slack - Pmin_slack <= eps) |
+                                                       (Pmax_slack - Pg_slack <= eps))
+
+        if s_rep <= eps:
+            dq = s if np.isfinite(s) else 0.0
+        elif slack_limited:
+            # the capacity injection (-sign per unit) compensates the change of the rest of the injections
+            dq = min(self.options.nodal_capacity_sign * dS.sum(), s)
+        else:
+            dq = min(s, 0.0)
+
+        dPf += dq * beta
+        dS[cap_idx] += dq * direction
+        Sf = rep_res.Sf + dPf
+
+        res = replace(rep_res,
+                      S=rep_res.S + dS,
+                      Sf=Sf,
+                      St=rep_res.St - dPf,
+                      loading=np.abs(Sf) / (rates[t, :] / Sbase + 1e-9),
+                      nodal_capacity=rep_res.nodal_capacity + dq * direction * Sbase,
+                      ips_solutions=None)
+
+        solve_exactly = abs(dq) > self.options.screening_tolerance * max(abs(q_rep), 1.0 / Sbase)
+
+        return res, solve_exactly
+
     def non_linear_opf(self, remote=False, batteries_energy_0=None):
         """
-        Run a power flow for every circuit
+        Run the nonlinear nodal capacity for every time step.
+        The time steps with the same inputs are solved once, every time step is warm-started from the previous
+        solution and, if so configured, only the representatives of clusters of similar time steps are solved
+        exactly, the rest are screened with sensitivities.
         :param remote: is this function being called from the time series?
         :param batteries_energy_0: initial state of the batteries, if None the default values are taken
         :return: OptimalPowerFlowResults object
@@ -234,56 +628,80 @@ class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
 
         has_ts, t_indices = self.get_time_indices()
 
-        self.report_progress(0.0)
-        for it, t in enumerate(t_indices):
-
-            # report progress
-            if has_ts:
-                self.report_text('Nonlinear OPF at ' + str(self.grid.time_profile[t]) + '...')
-                self.report_progress2(it, len(self.time_indices))
-            else:
-                self.report_text('Nonlinear OPF at the snapshot...')
-                self.report_progress2(it, 1)
-
-            # run opf
-            res = run_nonlinear_opf(grid=self.grid,
-                                    opf_options=self.opf_options,
-                                    pf_options=self.pf_options,
-                                    t_idx=t,
-                                    # for the first power flow, use the given strategy
-                                    # for the successive ones, use the previous solution
-                                    pf_init=self.opf_options.ips_init_with_pf if it == 0 else True,
-                                    Sbus_pf0=self.results.Sbus[it - 1, :] if it > 0 else None,
-                                    voltage_pf0=self.results.voltage[it - 1, :] if it > 0 else None,
-                                    optimize_nodal_capacity=True,
-                                    nodal_capacity_sign=self.options.nodal_capacity_sign,
-                                    capacity_nodes_idx=self.options.capacity_nodes_idx,
-                                    logger=self.logger)
-
-            # set the results
-            Sbase = self.grid.Sbase
-            self.results.voltage[it, :] = res.V
-            self.results.Sbus[it, :] = res.S * Sbase
-            self.results.bus_shadow_prices[it, :] = res.lam_p
-            self.results.nodal_capacity[it, :] = res.nodal_capacity
-            # self.results.load_shedding = npa_res.load_shedding[0, :]
-            # self.results.battery_power = npa_res.battery_p[0, :]
-            # self.results.battery_energy = npa_res.battery_energy[0, :]
-            self.results.generator_power[it, :] = res.Pg * Sbase
-            self.results.generator_cost[it, :] = res.Pcost
-
-            self.results.Sf[it, :] = res.Sf * Sbase
-            self.results.St[it, :] = res.St * Sbase
-            self.results.overloads[it, :] = (res.sl_sf - res.sl_st) * Sbase
-            self.results.loading[it, :] = res.loading
-            self.results.phase_shift[it, :] = res.tap_phase
-
-            self.results.hvdc_Pf[it, :] = res.hvdc_Pf
-            self.results.hvdc_loading[it, :] = res.hvdc_loading
-            self.results.converged[it] = res.converged
-
-            if self.__cancel__:
-                return self.results
+        if has_ts:
+            # the time steps with the same inputs share the solution
+            inputs = get_nodal_capacity_inputs(grid=self.grid, time_indices=self.time_indices)
+            _, first_idx, inverse = np.unique(inputs, axis=0, return_index=True, return_inverse=True)
+            self.results.representative_idx = first_idx[inverse.ravel()]
+            distinct = np.sort(first_idx)
+        else:
+            inputs = np.zeros((1, 0))
+            distinct = np.zeros(1, dtype=int)
+
+        # representative of every distinct time step
+        cluster_rep = distinct.copy()
+        if 0 < self.options.n_clusters < len(distinct):
+            x = inputs[distinct, :]
+            std = x.std(axis=0)
+            x = (x[:, std > 0] - x[:, std > 0].mean(axis=0)) / std[std > 0]
+            centroid_idx, _, _ = kmeans_sampling(x_input=x, n_points=self.options.n_clusters)
+
+            # assign every distinct time step to the closest representative
+            dist = np.full(len(distinct), np.inf)
+            for c in centroid_idx:
+                d = np.sum(np.power(x - x[c, :], 2), axis=1)
+                closer = d < dist
+                dist[closer] = d[closer]
+                cluster_rep[closer] = distinct[c]
+
+        exact = np.unique(cluster_rep)
+
+        self.report_text('Nonlinear OPF of the representative time steps...')
+        solved = self.solve_non_linear_steps(positions=exact)
+
+        # screen the rest of the time steps with sensitivities
+        screened: Dict[int, NonlinearOPFResults] = dict()
+        to_solve = list()
+        if len(exact) < len(distinct) and not self.__cancel__:
+            self.report_text('Screening the rest of the time steps...')
+            sensitivities_cache: Dict[int, Tuple[Mat, IntVec, IntVec, IntVec, Vec, Vec]] = dict()
+            # net injections: generation minus load
+            Pbus = (self.grid.get_Sbus_prof_from_lists(devices_lists=self.grid.get_generation_like_lists()).real
+                    - self.grid.get_Sbus_prof_from_lists(devices_lists=self.grid.get_load_like_devices_lists()).real)
+            Pgen = self.grid.get_profiles_matrix(elements=self.grid.get_generators(), magnitude='P')
+            rates = self.grid.get_branch_rates_prof_wo_hvdc()
+
+            for pos, rep in zip(distinct, cluster_rep):
+                if pos != rep and rep in solved:
+                    screened[pos], solve_exactly = self.screen_non_linear_step(pos=pos,
+                                                                               rep=rep,
+                                                                               rep_res=solved[rep],
+                                                                               sensitivities_cache=sensitivities_cache,
+                                                                               Pbus=Pbus,
+                                                                               Pgen=Pgen,
+                                                                               rates=rates)
+                    if solve_exactly or not solved[rep].converged:
+                        to_solve.append((pos, rep))
+
+        if len(to_solve) > 0 and not self.__cancel__:
+            # the screening is not accurate enough for these, solve them warm-started from their representatives
+            self.report_text('Nonlinear OPF of the time steps beyond the screening tolerance...')
+            solved.update(self.solve_non_linear_steps(positions=np.array([p for p, r in to_solve], dtype=int),
+                                                      warm_starts=[solved[r].ips_solutions if solved[r].converged else None
+                                                                   for p, r in to_solve]))
+
+        # set the results
+        rep_of = {pos: rep for pos, rep in zip(distinct, cluster_rep)}
+        for it in range(len(t_indices)):
+            pos = self.results.representative_idx[it]
+            res = solved.get(pos, None)
+            if res is None:
+                res = screened.get(pos, None)
+                if res is None:
+                    # cancelled
+                    continue
+                self.results.representative_idx[it] = rep_of[pos]
+            self.set_nonlinear_opf_step(it=it, res=res)
 
         # Compute the emissions, fuel costs and energy used
         (self.results.system_fuel,
@@ -301,7 +719,9 @@ class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
 
     def cpf(self, remote=False, batteries_energy_0=None):
         """
-        Run a power flow for every circuit
+        Run the continuation power flow for every time step.
+        The base and target injections are those of the snapshot, hence the continuation power flow of a time step
+        only depends on its grid structure: each distinct structure is solved once.
         :param remote: is this function being called from the time series?
         :param batteries_energy_0: initial state of the batteries, if None the default values are taken
         :return: OptimalPowerFlowResults object
@@ -340,29 +760,70 @@ class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
                                                Vbase=power_flow.results.voltage,
                                                Starget=target_power)
 
-        # declare the CPF driver and run
-        vc = ContinuationPowerFlowDriver(grid=self.grid,
-                                         options=vc_options,
-                                         inputs=vc_inputs,
-                                         pf_options=pf_options)
-        vc.run()
-
-        self.report_progress(0.0)
+        # find the time steps with the same grid structure
+        signatures: Dict[bytes, int] = dict()
         for it, t in enumerate(t_indices):
+            nc = compile_numerical_circuit_at(circuit=self.grid,
+                                              t_idx=t,
+                                              apply_temperature=pf_options.apply_temperature_correction,
+                                              branch_tolerance_mode=pf_options.branch_impedance_tolerance_mode,
+                                              logger=self.logger)
+            self.results.representative_idx[it] = signatures.setdefault(get_cpf_structure_signature(nc), it)
+
+        distinct = np.unique(self.results.representative_idx)
+        time_indices = [t_indices[p] for p in distinct]
+        kwargs = dict(vc_options=vc_options, vc_inputs=vc_inputs, pf_options=pf_options)
+
+        n = len(distinct)
+        n_workers = min(self.options.n_workers, n)
+        solved: Dict[int, ContinuationPowerFlowResults] = dict()
+
+        self.report_text('Continuation power flow of the distinct grid structures...')
+        self.report_progress(0.0)
+        if n_workers > 1:
+            chunks = np.array_split(np.arange(n), n_workers)
+
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(run_cpf_nodal_capacity_chunk,
+                                           self.grid,
+                                           [time_indices[i] for i in chunk],
+                                           kwargs)
+                           for chunk in chunks]
+
+                n_solved = 0
+                for chunk, future in zip(chunks, futures):
+                    res_list, logger = future.result()
+                    self.logger += logger
+
+                    for i, res in zip(chunk, res_list):
+                        solved[distinct[i]] = res
+
+                    n_solved += len(chunk)
+                    self.report_progress2(n_solved - 1, n)
+        else:
+            res_list = run_cpf_nodal_capacity_steps(grid=self.grid,
+                                                    time_indices=time_indices,
+                                                    logger=self.logger,
+                                                    progress_func=self.report_progress2,
+                                                    is_cancel=self.is_cancel,
+                                                    **kwargs)
+            for p, res in zip(distinct, res_list):
+                solved[p] = res
+
+        # set the results
+        Sbase = self.grid.Sbase
+        for it in range(len(t_indices)):
+            res = solved.get(self.results.representative_idx[it], None)
+
+            if res is None:
+                # cancelled
+                continue
+
+            if len(res.voltages) == 0:
+                # the continuation power flow could not even start
+                self.results.converged[it] = False
+                continue
 
-            # report progress
-            if has_ts:
-                self.report_text('Nonlinear OPF at ' + str(self.grid.time_profile[t]) + '...')
-                self.report_progress2(it, len(self.time_indices))
-            else:
-                self.report_text('Nonlinear OPF at the snapshot...')
-                self.report_progress2(it, 1)
-
-            # run opf
-            res = vc.run_at(t_idx=t)
-
-            # set the results
-            Sbase = self.grid.Sbase
             self.results.voltage[it, :] = res.voltages[-1, :]
             self.results.Sbus[it, :] = res.Sbus[-1, :] * Sbase
             # self.results.bus_shadow_prices[it, :] = res.lam_p
@@ -382,9 +843,6 @@ class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
             # self.results.hvdc_loading[it, :] = res.hvdc_loading
             self.results.converged[it] = res.converged[-1]
 
-            if self.__cancel__:
-                return self.results
-
         if not remote:
             self.report_progress(0.0)
             self.report_text('Running all in an external solver, this may take a while...')
@@ -398,54 +856,42 @@ class NodalCapacityTimeSeriesDriver(TimeSeriesDriverTemplate):
         if self.progress_text:
             self.report_text("Creating report")
 
-        nt = len(self.time_indices)
-        for t, t_idx in enumerate(self.time_indices):
-
-            self.report_progress2(t, nt)
-
-            t_name = str(self.results.time_array[t])
-
-            for gen_name, gen_shedding in zip(self.results.generator_names, self.results.generator_shedding[t, :]):
-                if gen_shedding > eps:
-                    self.logger.add_warning("Generation shedding {}".format(t_name),
-                                            device=gen_name,
-                                            value=gen_shedding,
-                                            expected_value=0.0)
-
-            for load_name, load_shedding in zip(self.results.load_names, self.results.load_shedding[t, :]):
-                if load_shedding > eps:
-                    self.logger.add_warning("Load shedding {}".format(t_name),
-                                            device=load_name,
-                                            value=load_shedding,
-                                            expected_value=0.0)
-
-            for fluid_node_name, fluid_node_spillage in zip(self.results.fluid_node_names,
-                                                            self.results.fluid_node_spillage[t, :]):
-                if fluid_node_spillage > eps:
-                    self.logger.add_warning("Fluid node spillage {}".format(t_name),
-                                            device=fluid_node_name,
-                                            value=fluid_node_spillage,
-                                            expected_value=0.0)
-
-            for name, val in zip(self.results.branch_names, self.results.loading[t, :]):
-                if val > (1.0 + eps):
-                    self.logger.add_warning("Overload {}".format(t_name),
-                                            device=name,
-                                            value=val * 100,
-                                            expected_value=100.0)
-
-            va = np.angle(self.results.voltage[t, :])
-            for i, bus in enumerate(self.grid.buses):
-                if va[i] > bus.angle_max:
-                    self.logger.add_warning("Overvoltage {}".format(t_name),
-                                            device=bus.name,
-                                            value=va[i],
-                                            expected_value=bus.angle_max)
-                elif va[i] < bus.angle_min:
-                    self.logger.add_warning("Undervoltage {}".format(t_name),
-                                            device=bus.name,
-                                            value=va[i],
-                                            expected_value=bus.angle_min)
+        t_names = [str(t) for t in self.results.time_array]
+
+        for title, names, values in [("Generation shedding", self.results.generator_names,
+                                      self.results.generator_shedding),
+                                     ("Load shedding", self.results.load_names,
+                                      self.results.load_shedding),
+                                     ("Fluid node spillage", self.results.fluid_node_names,
+                                      self.results.fluid_node_spillage)]:
+            for t, k in zip(*np.nonzero(values > eps)):
+                self.logger.add_warning("{} {}".format(title, t_names[t]),
+                                        device=names[k],
+                                        value=values[t, k],
+                                        expected_value=0.0)
+
+        for t, k in zip(*np.nonzero(self.results.loading > (1.0 + eps))):
+            self.logger.add_warning("Overload {}".format(t_names[t]),
+                                    device=self.results.branch_names[k],
+                                    value=self.results.loading[t, k] * 100,
+                                    expected_value=100.0)
+
+        va = np.angle(self.results.voltage)
+        buses = self.grid.get_buses()
+        angle_max = np.array([bus.angle_max for bus in buses])
+        angle_min = np.array([bus.angle_min for bus in buses])
+
+        for t, i in zip(*np.nonzero(va > angle_max)):
+            self.logger.add_warning("Overvoltage {}".format(t_names[t]),
+                                    device=buses[i].name,
+                                    value=va[t, i],
+                                    expected_value=angle_max[i])
+
+        for t, i in zip(*np.nonzero(va < angle_min)):
+            self.logger.add_warning("Undervoltage {}".format(t_names[t]),
+                                    device=buses[i].name,
+                                    value=va[t, i],
+                                    expected_value=angle_min[i])
 
     def run(self):
         """
@@ -116,11 +116,15 @@ class NodalCapacityTimeSeriesResults(OptimalPowerFlowTimeSeriesResults):
 
         self.nodal_capacity = np.zeros((nt, len(self.capacity_nodes_idx)), dtype=float)
 
+        # position of the time step whose exact solution gives the results of every time step
+        self.representative_idx = np.arange(nt, dtype=int)
+
         # hack the available results to add another entry
         self.available_results[ResultTypes.BusResults].append(ResultTypes.BusNodalCapacity)
 
         self.register(name='capacity_nodes_idx', tpe=IntVec)
         self.register(name='nodal_capacity', tpe=Mat)
+        self.register(name='representative_idx', tpe=IntVec)
 
     def mdl(self, result_type) -> "ResultsTable":
         """
@@ -17,9 +17,9 @@
 import numpy as np
 import timeit
 import pandas as pd
-from typing import Tuple
+from typing import Tuple, List
 from dataclasses import dataclass
-from GridCalEngine.Utils.NumericalMethods.ips import interior_point_solver, IpsFunctionReturn
+from GridCalEngine.Utils.NumericalMethods.ips import interior_point_solver, IpsFunctionReturn, IpsSolution
 import GridCalEngine.Utils.NumericalMethods.autodiff as ad
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at, NumericalCircuit
@@ -421,6 +421,7 @@ class NonlinearOPFResults:
     error: float = None
     converged: bool = None
     iterations: int = None
+    ips_solutions: List[IpsSolution] = None
 
     def initialize(self, nbus: int, nbr: int, ng: int, nhvdc: int, ncap: int):
         """
@@ -454,6 +455,7 @@ class NonlinearOPFResults:
         self.error: float = 0.0
         self.converged: bool = False
         self.iterations: int = 0
+        self.ips_solutions: List[IpsSolution] = list()
 
     def merge(self,
               other: "NonlinearOPFResults",
@@ -500,6 +502,9 @@ class NonlinearOPFResults:
             self.sl_st[il_idx] = other.sl_st
             self.sl_vmax[bus_idx] = other.sl_vmax
             self.sl_vmin[bus_idx] = other.sl_vmin
+
+        if other.ips_solutions is not None:
+            self.ips_solutions += other.ips_solutions
         self.error: float = 0.0
         self.converged: bool = False
         self.iterations: int = 0
@@ -525,6 +530,7 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
                           optimize_nodal_capacity: bool = False,
                           nodal_capacity_sign: float = 1.0,
                           capacity_nodes_idx: Union[IntVec, None] = None,
+                          warm_start: Union[IpsSolution, None] = None,
                           logger: Logger = Logger()) -> NonlinearOPFResults:
     """
 
@@ -540,6 +546,8 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
     :param optimize_nodal_capacity:
     :param nodal_capacity_sign:
     :param capacity_nodes_idx:
+    :param warm_start: interior point solution of a problem with the same structure (i.e. the previous time step)
+                       used as initial point and multipliers. Ignored if the sizes do not match.
     :param logger: Logger
     :return: NonlinearOPFResults
     """
@@ -720,6 +728,28 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
     # number of variables
     NV = len(x0)
 
+    if warm_start is not None and len(warm_start.x) == NV:
+        # start from the previous solution instead, moved inside the bounds of this problem
+        (Va_w, Vm_w, Pg_w, Qg_w, sl_sf_w, sl_st_w,
+         sl_vmax_w, sl_vmin_w, slcap_w, tapm_w, tapt_w, Pfdc_w) = x2var(warm_start.x, nVa=nbus, nVm=nbus,
+                                                                        nPg=n_gen_disp, nQg=n_gen_disp,
+                                                                        M=n_br_mon, npq=npq, ntapm=ntapm,
+                                                                        ntapt=ntapt, ndc=n_disp_hvdc,
+                                                                        nslcap=nslcap,
+                                                                        acopf_mode=opf_options.acopf_mode)
+        x0 = var2x(Va=Va_w,
+                   Vm=np.clip(Vm_w, Vm_min, Vm_max),
+                   Pg=np.clip(Pg_w, Pg_min[gen_disp_idx], Pg_max[gen_disp_idx]),
+                   Qg=np.clip(Qg_w, Qg_min[gen_disp_idx], Qg_max[gen_disp_idx]),
+                   sl_sf=sl_sf_w,
+                   sl_st=sl_st_w,
+                   sl_vmax=sl_vmax_w,
+                   sl_vmin=sl_vmin_w,
+                   slcap=slcap_w,
+                   tapm=np.clip(tapm_w, tapm_min, tapm_max),
+                   tapt=np.clip(tapt_w, tapt_min, tapt_max),
+                   Pfdc=np.clip(Pfdc_w, -P_hvdc_max, P_hvdc_max))
+
     loadtimeEnd = timeit.default_timer()
     times = np.array([])
     print(f'\tLoad time (s): {loadtimeEnd - loadtimeStart}')
@@ -740,7 +770,8 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
                                        verbose=opf_options.verbose,
                                        max_iter=opf_options.ips_iterations,
                                        tol=opf_options.ips_tolerance,
-                                       trust=opf_options.ips_trust_radius)
+                                       trust=opf_options.ips_trust_radius,
+                                       warm_start=warm_start)
 
     else:
         if use_autodiff:
@@ -756,7 +787,8 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
                                            verbose=opf_options.verbose,
                                            max_iter=opf_options.ips_iterations,
                                            tol=opf_options.ips_tolerance,
-                                           trust=opf_options.ips_trust_radius)
+                                           trust=opf_options.ips_trust_radius,
+                                           warm_start=warm_start)
         else:
             # run the solver with the analytic derivatives
             result, times = interior_point_solver(x0=x0, n_x=NV, n_eq=NE, n_ineq=NI,
@@ -777,7 +809,8 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
                                                   verbose=opf_options.verbose,
                                                   max_iter=opf_options.ips_iterations,
                                                   tol=opf_options.ips_tolerance,
-                                                  trust=opf_options.ips_trust_radius)
+                                                  trust=opf_options.ips_trust_radius,
+                                                  warm_start=warm_start)
 
     # convert the solution to the problem variables
     (Va, Vm, Pg_dis, Qg_dis, sl_sf, sl_st,
@@ -969,7 +1002,8 @@ def ac_optimal_power_flow(nc: NumericalCircuit,
                                nodal_capacity=nodal_capacity,
                                error=result.error,
                                converged=result.converged,
-                               iterations=result.iterations)
+                               iterations=result.iterations,
+                               ips_solutions=[result])
 
 
 def run_nonlinear_opf(grid: MultiCircuit,
@@ -985,6 +1019,7 @@ def run_nonlinear_opf(grid: MultiCircuit,
                       optimize_nodal_capacity: bool = False,
                       nodal_capacity_sign: float = 1.0,
                       capacity_nodes_idx: Union[IntVec, None] = None,
+                      warm_start: Union[List[IpsSolution], None] = None,
                       logger: Logger = Logger()) -> NonlinearOPFResults:
     """
     Run optimal power flow for a MultiCircuit
@@ -1001,6 +1036,7 @@ def run_nonlinear_opf(grid: MultiCircuit,
     :param optimize_nodal_capacity:
     :param nodal_capacity_sign:
     :param capacity_nodes_idx:
+    :param warm_start: interior point solutions of every island of a previous run (results.ips_solutions)
     :param logger: Logger object
     :return: NonlinearOPFResults
     """
@@ -1055,6 +1091,8 @@ def run_nonlinear_opf(grid: MultiCircuit,
                                            optimize_nodal_capacity=optimize_nodal_capacity,
                                            nodal_capacity_sign=nodal_capacity_sign,
                                            capacity_nodes_idx=capacity_nodes_idx_isl,
+                                           warm_start=(warm_start[i] if warm_start is not None
+                                                       and len(warm_start) == len(islands) else None),
                                            logger=logger)
 
         results.merge(other=island_res,
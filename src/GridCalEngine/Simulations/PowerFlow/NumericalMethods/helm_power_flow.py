@@ -187,6 +187,34 @@ def sigma_function(coeff_matU, coeff_matX, order, V_slack):
 
 
 # @nb.njit("(c16[:])(c16[:, :], c16[:, :], i8, i8[:])")
+def sigma_function_batch(coeff_matU, coeff_matX, order, V_slack):
+    """
+    Vectorized sigma_function for a batch of coefficient matrices of the same order and size
+    :param coeff_matU: (nbatch, ncoeff, nbus) array with voltage coefficients
+    :param coeff_matX: (nbatch, ncoeff, nbus) array with inverse conjugated voltage coefficients
+    :param order: should be prof - 1
+    :param V_slack: (nbatch) slack bus voltage of every item
+    :return: (nbatch, nbus) sigma complex values
+    """
+    V0 = V_slack[:, np.newaxis, np.newaxis]
+    M = int(order / 2) - 1 if order % 2 == 0 else int(order / 2)
+
+    # (nbatch, nbus, 2M+1) series, so that every (item, bus) system is solved in a single batched call
+    a = np.transpose(coeff_matU[:, 1:2 * M + 2, :] / V0, (0, 2, 1))
+    b = np.transpose(coeff_matX[:, 0:2 * M + 1, :] / V0, (0, 2, 1))
+
+    C = np.zeros(a.shape + (2 * M + 1,), dtype=complex)
+    for i in range(2 * M + 1):
+        if i < M:
+            C[:, :, 1 + i:, i] = a[:, :, :2 * M - i]
+        else:
+            C[:, :, i - M:, i] = - b[:, :, :3 * M - i + 1]
+
+    lhs = np.linalg.solve(C, -a[..., np.newaxis])[..., 0]
+
+    return lhs[..., M:].sum(axis=-1) / (lhs[..., :M].sum(axis=-1) + 1)
+
+
 @nb.njit(cache=True)
 def conv1_old(A, B, c, indices):
     """
@@ -257,8 +285,74 @@ def conv3(A, B, c, indices):
     return suma
 
 
+class HelmJosepFactorization:
+    """
+    Constant part of the HELM formulation of a grid structure: the factorized system matrix and the terms [0].
+    They only depend on the series admittances and on the bus types, so they can be shared by the simulations
+    that only change the injections, the voltage set points or the shunts.
+    """
+
+    def __init__(self, Yseries, pq, pv, sl, pqpv):
+        """
+        Build the reduced system and factorize it
+        :param Yseries: Admittance matrix of the series elements
+        :param pq: list of pq nodes
+        :param pv: list of pv nodes
+        :param sl: list of slack nodes
+        :param pqpv: sorted list of pq and pv nodes
+        """
+        self.npqpv = len(pqpv)
+        npv = len(pv)
+        nsl = len(sl)
+        n = Yseries.shape[0]
+
+        # build the reduced system
+        Yred = Yseries[np.ix_(pqpv, pqpv)]  # admittance matrix without slack buses
+        self.Yslack = -Yseries[np.ix_(pqpv, sl)]  # yes, it is the negative of this
+        G = Yred.real.copy()  # real parts of Yij
+        B = Yred.imag.copy()  # imaginary parts of Yij
+
+        # indices 0 based in the internal scheme
+        nsl_counted = np.zeros(n, dtype=int)
+        compt = 0
+        for i in range(n):
+            if i in sl:
+                compt += 1
+            nsl_counted[i] = compt
+
+        self.pq_ = pq - nsl_counted[pq]
+        self.pv_ = pv - nsl_counted[pv]
+        self.no_slack_ = np.sort(np.r_[self.pq_, self.pv_])
+
+        # .......................CALCULATION OF TERMS [0] --------------------------------------------------------------
+        self.U0 = np.zeros(self.npqpv, dtype=complex)
+        if nsl > 1:
+            self.U0[:] = spsolve(Yred, self.Yslack.sum(axis=1))
+        else:
+            self.U0[:] = spsolve(Yred, self.Yslack)
+
+        self.X0 = 1 / np.conj(self.U0)
+
+        # Form the system matrix (MAT)
+        pv_ = self.pv_
+        Upv = self.U0[pv_]
+        Xpv = self.X0[pv_]
+        VRE = coo_matrix((2 * Upv.real, (np.arange(npv), pv_)), shape=(npv, self.npqpv)).tocsc()
+        VIM = coo_matrix((2 * Upv.imag, (np.arange(npv), pv_)), shape=(npv, self.npqpv)).tocsc()
+        XIM = coo_matrix((-Xpv.imag, (pv_, np.arange(npv))), shape=(self.npqpv, npv)).tocsc()
+        XRE = coo_matrix((Xpv.real, (pv_, np.arange(npv))), shape=(self.npqpv, npv)).tocsc()
+        EMPTY = csc_matrix((npv, npv))
+
+        self.MAT = vs((hs((G, -B, XIM)),
+                       hs((B, G, XRE)),
+                       hs((VRE, VIM, EMPTY))), format='csc')
+
+        # factorize (only once)
+        self.mat_factorized = factorized(self.MAT)
+
+
 def helm_coefficients_josep(Ybus, Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, tolerance=1e-6, max_coeff=30, verbose=False,
-                            logger: Logger = None):
+                            logger: Logger = None, factorization: HelmJosepFactorization = None):
     """
     Holomorphic Embedding LoadFlow Method as formulated by Josep Fanals Batllori in 2020
     THis function just returns the coefficients for further usage in other routines
@@ -275,12 +369,11 @@ def helm_coefficients_josep(Ybus, Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, toler
     :param max_coeff: maximum number of coefficients
     :param verbose: print intermediate information
     :param logger: Logger object to store the debug info
+    :param factorization: HelmJosepFactorization of the same Yseries and bus types, if None it is computed
     :return: U, X, Q, V, iterations
     """
 
     npqpv = len(pqpv)
-    npv = len(pv)
-    nsl = len(sl)
     n = Yseries.shape[0]
 
     # --------------------------- PREPARING IMPLEMENTATION -------------------------------------------------------------
@@ -298,11 +391,10 @@ def helm_coefficients_josep(Ybus, Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, toler
                           columns=['Ysh', 'P0', 'Q0', 'V0'])
         logger.add_debug(df.to_string())
 
-    # build the reduced system
-    Yred = Yseries[np.ix_(pqpv, pqpv)]  # admittance matrix without slack buses
-    Yslack = -Yseries[np.ix_(pqpv, sl)]  # yes, it is the negative of this
-    G = Yred.real.copy()  # real parts of Yij
-    B = Yred.imag.copy()  # imaginary parts of Yij
+    if factorization is None:
+        factorization = HelmJosepFactorization(Yseries=Yseries, pq=pq, pv=pv, sl=sl, pqpv=pqpv)
+
+    Yslack = factorization.Yslack
     vec_P = S0.real[pqpv]
     vec_Q = S0.imag[pqpv]
     Vslack = V0[sl]
@@ -310,26 +402,13 @@ def helm_coefficients_josep(Ybus, Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, toler
     Vm0 = np.abs(V0[pqpv])
     vec_W = Vm0 * Vm0
 
-    # indices 0 based in the internal scheme
-    nsl_counted = np.zeros(n, dtype=int)
-    compt = 0
-    for i in range(n):
-        if i in sl:
-            compt += 1
-        nsl_counted[i] = compt
-
-    pq_ = pq - nsl_counted[pq]
-    pv_ = pv - nsl_counted[pv]
-    no_slack_ = np.sort(np.r_[pq_, pv_])
+    pq_ = factorization.pq_
+    pv_ = factorization.pv_
+    no_slack_ = factorization.no_slack_
 
     # .......................CALCULATION OF TERMS [0] ------------------------------------------------------------------
-
-    if nsl > 1:
-        U[0, :] = spsolve(Yred, Yslack.sum(axis=1))
-    else:
-        U[0, :] = spsolve(Yred, Yslack)
-
-    X[0, :] = 1 / np.conj(U[0, :])
+    U[0, :] = factorization.U0
+    X[0, :] = factorization.X0
 
     # .......................CALCULATION OF TERMS [1] ------------------------------------------------------------------
     valor = np.zeros(npqpv, dtype=complex)
@@ -354,29 +433,12 @@ def helm_coefficients_josep(Ybus, Yseries, V0, S0, Ysh0, pq, pv, sl, pqpv, toler
         vec_W[pv_] - (U[0, pv_] * U[0, pv_]).real  # vec_W[pv_] - 1.0
     ]
 
-    # Form the system matrix (MAT)
-    Upv = U[0, pv_]
-    Xpv = X[0, pv_]
-    VRE = coo_matrix((2 * Upv.real, (np.arange(npv), pv_)), shape=(npv, npqpv)).tocsc()
-    VIM = coo_matrix((2 * Upv.imag, (np.arange(npv), pv_)), shape=(npv, npqpv)).tocsc()
-    XIM = coo_matrix((-Xpv.imag, (pv_, np.arange(npv))), shape=(npqpv, npv)).tocsc()
-    XRE = coo_matrix((Xpv.real, (pv_, np.arange(npv))), shape=(npqpv, npv)).tocsc()
-    EMPTY = csc_matrix((npv, npv))
-
-    MAT = vs((hs((G, -B, XIM)),
-              hs((B, G, XRE)),
-              hs((VRE, VIM, EMPTY))), format='csc')
-
     if verbose:
-        logger.add_debug("MAT", MAT.toarray())
-
-    # factorize (only once)
-    # MAT_LU = factorized(MAT.tocsc())
+        logger.add_debug("MAT", factorization.MAT.toarray())
 
     # solve
-    mat_factorized = factorized(MAT)
+    mat_factorized = factorization.mat_factorized
     LHS = mat_factorized(RHS)
-    # LHS = spsolve(MAT, RHS)
 
     # update coefficients
     U[1, :] = LHS[:npqpv] + 1j * LHS[npqpv:2 * npqpv]
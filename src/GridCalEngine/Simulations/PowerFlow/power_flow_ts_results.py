@@ -358,7 +358,8 @@ class PowerFlowTimeSeriesResults(ResultsTemplate):
 
         if result_type == ResultTypes.BusVoltageModule:
 
-            return ResultsTable(data=np.abs(self.voltage),
+            return ResultsTable(data=self.voltage,
+                                transform=np.abs,
                                 index=pd.to_datetime(self.time_array),
                                 idx_device_type=DeviceType.TimeDevice,
                                 columns=self.bus_names,
@@ -369,7 +370,8 @@ class PowerFlowTimeSeriesResults(ResultsTemplate):
 
         elif result_type == ResultTypes.BusVoltageAngle:
 
-            return ResultsTable(data=np.angle(self.voltage, deg=True),
+            return ResultsTable(data=self.voltage,
+                                transform=lambda x: np.angle(x, deg=True),
                                 index=pd.to_datetime(self.time_array),
                                 idx_device_type=DeviceType.TimeDevice,
                                 columns=self.bus_names,
@@ -523,7 +525,8 @@ class PowerFlowTimeSeriesResults(ResultsTemplate):
 
         elif result_type == ResultTypes.BranchLoading:
 
-            return ResultsTable(data=np.abs(self.loading) * 100,
+            return ResultsTable(data=self.loading,
+                                transform=lambda x: np.abs(x) * 100,
                                 index=pd.to_datetime(self.time_array),
                                 idx_device_type=DeviceType.TimeDevice,
                                 columns=self.branch_names,
@@ -567,7 +570,8 @@ class PowerFlowTimeSeriesResults(ResultsTemplate):
 
         elif result_type == ResultTypes.BranchVoltage:
 
-            return ResultsTable(data=np.abs(self.Vbranch),
+            return ResultsTable(data=self.Vbranch,
+                                transform=np.abs,
                                 index=pd.to_datetime(self.time_array),
                                 idx_device_type=DeviceType.TimeDevice,
                                 columns=self.branch_names,
@@ -214,7 +214,7 @@ class ShortCircuitDriver(DriverTemplate):
 
             # if there are branch indices where to perform short circuits, modify the grid accordingly
 
-            grid = self.grid.copy()
+            grid = self.grid.fast_copy(include_diagrams=False)
 
             sc_bus_index = list()
 
@@ -1,2 +1,5 @@
 
-from GridCalEngine.Simulations.SigmaAnalysis.sigma_analysis_driver import SigmaAnalysisResults, SigmaAnalysisDriver
\ No newline at end of file
+from GridCalEngine.Simulations.SigmaAnalysis.sigma_analysis_driver import SigmaAnalysisResults, SigmaAnalysisDriver
+from GridCalEngine.Simulations.SigmaAnalysis.sigma_analysis_ts_driver import (SigmaAnalysisTimeSeriesOptions,
+                                                                              SigmaAnalysisTimeSeriesResults,
+                                                                              SigmaAnalysisTimeSeriesDriver)
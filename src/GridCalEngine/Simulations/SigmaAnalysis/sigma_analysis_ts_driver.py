@@ -0,0 +1,483 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+Sigma analysis of a time series.
+The island split, the admittances and the HELM system factorization of every island are kept while the grid
+structure does not change between time steps, so that each time step only compiles its injections and runs the
+HELM coefficients recursion. The sigma coordinates of the time steps are evaluated in batches, and only the
+sigma distance and the worst buses of every time step are stored.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Union, Callable
+from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.DataStructures.numerical_circuit import NumericalCircuit, compile_numerical_circuit_at
+from GridCalEngine.Simulations.PowerFlow.power_flow_options import PowerFlowOptions
+from GridCalEngine.Simulations.PowerFlow.NumericalMethods.helm_power_flow import (HelmJosepFactorization,
+                                                                                  helm_coefficients_josep,
+                                                                                  sigma_function_batch)
+from GridCalEngine.Simulations.SigmaAnalysis.sigma_analysis_driver import sigma_distance
+from GridCalEngine.Simulations.Clustering.clustering_results import ClusteringResults
+from GridCalEngine.Simulations.driver_template import TimeSeriesDriverTemplate
+from GridCalEngine.Simulations.options_template import OptionsTemplate
+from GridCalEngine.Simulations.results_table import ResultsTable
+from GridCalEngine.Simulations.results_template import ResultsTemplate
+from GridCalEngine.basic_structures import Vec, Mat, IntVec, IntMat, BoolVec, StrVec, Logger, DateVec
+from GridCalEngine.enumerations import SimulationTypes, StudyResultsType, ResultTypes, DeviceType
+
+
+class SigmaAnalysisTimeSeriesOptions(OptionsTemplate):
+    """
+    Sigma analysis time series options
+    """
+
+    def __init__(self,
+                 pf_options: PowerFlowOptions = PowerFlowOptions(),
+                 n_worst: int = 5,
+                 batch_size: int = 16,
+                 n_workers: int = 1):
+        """
+        SigmaAnalysisTimeSeriesOptions
+        :param pf_options: PowerFlowOptions (tolerance, max_iter as the maximum number of coefficients, ...)
+        :param n_worst: number of buses with the lowest sigma distance stored per time step
+        :param batch_size: number of time steps whose sigma coordinates are evaluated together
+        :param n_workers: number of worker processes, 1 to run in this process
+        """
+        OptionsTemplate.__init__(self, name="SigmaAnalysisTimeSeriesOptions")
+
+        self.pf_options = pf_options
+
+        self.n_worst = n_worst
+
+        self.batch_size = batch_size
+
+        self.n_workers = n_workers
+
+        self.register(key="pf_options", tpe=DeviceType.SimulationOptionsDevice)
+        self.register(key="n_worst", tpe=int)
+        self.register(key="batch_size", tpe=int)
+        self.register(key="n_workers", tpe=int)
+
+
+def get_sigma_structure_signature(nc: NumericalCircuit) -> bytes:
+    """
+    Get a signature of everything that determines the islands, the admittances and the bus types of a time step.
+    Time steps with the same signature can share the HELM system factorizations.
+    :param nc: NumericalCircuit compiled at the time step
+    :return: signature
+    """
+    return b''.join([
+        nc.bus_data.active.astype(bool).tobytes(),
+        nc.bus_data.bus_types.tobytes(),
+        nc.branch_data.active.astype(bool).tobytes(),
+        nc.branch_data.R.tobytes(),
+        nc.branch_data.X.tobytes(),
+        nc.branch_data.G.tobytes(),
+        nc.branch_data.B.tobytes(),
+        nc.branch_data.tap_module.tobytes(),
+        nc.branch_data.tap_angle.tobytes(),
+        nc.hvdc_data.active.astype(bool).tobytes(),
+        nc.Yshunt_from_devices.tobytes()
+    ])
+
+
+class SigmaIsland:
+    """
+    Constant data of an island for the time steps that share the grid structure
+    """
+
+    def __init__(self, island: NumericalCircuit):
+        """
+        SigmaIsland
+        :param island: island NumericalCircuit
+        """
+        self.original_bus_idx: IntVec = island.original_bus_idx
+        self.nbus = island.nbus
+        self.Ybus = island.Ybus
+        self.Yseries = island.Yseries
+        self.Yshunt = island.Yshunt
+        self.pq = island.pq
+        self.pv = island.pv
+        self.vd = island.vd
+        self.pqpv = island.pqpv
+        self.factorization = HelmJosepFactorization(Yseries=self.Yseries, pq=self.pq, pv=self.pv,
+                                                    sl=self.vd, pqpv=self.pqpv)
+
+
+class SigmaBatch:
+    """
+    HELM coefficients of a batch of time steps, waiting for their sigma coordinates
+    """
+
+    def __init__(self, nbus: int):
+        """
+        SigmaBatch
+        :param nbus: number of buses of the grid
+        """
+        self.nbus = nbus
+
+        # time step position -> bus distances
+        self.distances: Dict[int, Vec] = dict()
+
+        # (island, order) -> list of (time step position, U, X, slack voltage)
+        self.items: Dict[Tuple[int, int], List[Tuple[int, np.ndarray, np.ndarray, complex]]] = dict()
+
+        self.islands: Dict[int, SigmaIsland] = dict()
+
+    def add_step(self, pos: int) -> None:
+        """
+        Add a time step, with the default distance of the buses without sigma
+        :param pos: time step position
+        """
+        self.distances[pos] = np.full(self.nbus, 0.25)
+
+    def add(self, pos: int, island: SigmaIsland, U: np.ndarray, X: np.ndarray, order: int, V_slack: complex) -> None:
+        """
+        Add the coefficients of an island at a time step
+        :param pos: time step position
+        :param island: SigmaIsland
+        :param U: voltage coefficients
+        :param X: inverse conjugated voltage coefficients
+        :param order: sigma order (number of coefficients - 1)
+        :param V_slack: slack voltage of the island
+        """
+        self.islands[id(island)] = island
+        M = int(order / 2) - 1 if order % 2 == 0 else int(order / 2)
+        n_rows = 2 * M + 2  # the coefficients used by the sigma function
+        self.items.setdefault((id(island), order), list()).append((pos, U[:n_rows, :], X[:n_rows, :], V_slack))
+
+    def __len__(self):
+        return len(self.distances)
+
+    def evaluate(self) -> Dict[int, Vec]:
+        """
+        Evaluate the sigma distances of the batch
+        :return: time step position -> bus distances
+        """
+        for (island_id, order), items in self.items.items():
+            island = self.islands[island_id]
+            U = np.array([it[1] for it in items])
+            X = np.array([it[2] for it in items])
+            V_slack = np.array([it[3] for it in items])
+
+            try:
+                sigma = sigma_function_batch(U, X, order, V_slack)
+            except np.linalg.LinAlgError:
+                # solve item by item, the singular ones get no sigma
+                sigma = np.zeros((len(items), len(island.pqpv)), dtype=complex)
+                for k in range(len(items)):
+                    try:
+                        sigma[k, :] = sigma_function_batch(U[[k]], X[[k]], order, V_slack[[k]])[0, :]
+                    except np.linalg.LinAlgError:
+                        pass
+
+            sig_re = np.zeros(island.nbus)
+            sig_im = np.zeros(island.nbus)
+            for k, it in enumerate(items):
+                sig_re[island.pqpv] = sigma[k, :].real
+                sig_im[island.pqpv] = sigma[k, :].imag
+                self.distances[it[0]][island.original_bus_idx] = sigma_distance(sig_re, sig_im)
+
+        distances = self.distances
+        self.distances = dict()
+        self.items = dict()
+        self.islands = dict()
+        return distances
+
+
+def run_sigma_time_steps(grid: MultiCircuit,
+                         time_indices: IntVec,
+                         options: SigmaAnalysisTimeSeriesOptions,
+                         logger: Logger = Logger(),
+                         progress_func: Union[Callable[[int, int], None], None] = None,
+                         is_cancel: Union[Callable[[], bool], None] = None
+                         ) -> Tuple[Vec, IntMat, Mat, BoolVec, int]:
+    """
+    Sigma analysis of a list of time steps, reusing the islands and the HELM factorizations while the grid
+    structure does not change. This is also the function run by the worker processes.
+    :param grid: MultiCircuit
+    :param time_indices: time indices to simulate
+    :param options: SigmaAnalysisTimeSeriesOptions
+    :param logger: Logger
+    :param progress_func: function called with the number of simulated time steps and the total
+    :param is_cancel: function that returns True if the simulation was cancelled
+    :return: sigma distance per step (lowest bus distance), worst bus indices and distances per step,
+             convergence per step, number of structures factorized
+    """
+    pf_options = options.pf_options
+    nt = len(time_indices)
+    nbus = grid.get_bus_number()
+    n_worst = min(options.n_worst, nbus)
+
+    distance = np.zeros(nt)
+    worst_idx = np.zeros((nt, n_worst), dtype=int)
+    worst_dist = np.zeros((nt, n_worst))
+    converged = np.ones(nt, dtype=bool)
+    n_structures = 0
+
+    signature = None
+    islands: List[SigmaIsland] = list()
+    batch = SigmaBatch(nbus=nbus)
+
+    def flush():
+        """
+        Evaluate the batch and store the reduced results of its time steps
+        """
+        for pos, d in batch.evaluate().items():
+            worst = np.argsort(d)[:n_worst]
+            distance[pos] = d[worst[0]]
+            worst_idx[pos, :] = worst
+            worst_dist[pos, :] = d[worst]
+
+    for pos, t in enumerate(time_indices):
+
+        nc = compile_numerical_circuit_at(circuit=grid,
+                                          t_idx=t,
+                                          apply_temperature=pf_options.apply_temperature_correction,
+                                          branch_tolerance_mode=pf_options.branch_impedance_tolerance_mode,
+                                          opf_results=None,
+                                          logger=logger)
+
+        sig = get_sigma_structure_signature(nc)
+        if sig != signature:
+            # the structure changed: evaluate the pending steps with the previous islands and factorize again
+            flush()
+            signature = sig
+            islands = [SigmaIsland(island) for island in
+                       nc.split_into_islands(ignore_single_node_islands=pf_options.ignore_single_node_islands)
+                       if len(island.vd) > 0 and island.nbus > 1]
+            n_structures += 1
+
+            if len(islands) == 0:
+                logger.add_error('There are no slack nodes', value=t)
+
+        batch.add_step(pos)
+        Sbus = nc.Sbus
+        Vbus = nc.bus_data.Vbus
+
+        for island in islands:
+            idx = island.original_bus_idx
+            V0 = Vbus[idx]
+            U, X, Q, V, iter_, conv = helm_coefficients_josep(Ybus=island.Ybus,
+                                                              Yseries=island.Yseries,
+                                                              V0=V0,
+                                                              S0=Sbus[idx],
+                                                              Ysh0=island.Yshunt,
+                                                              pq=island.pq,
+                                                              pv=island.pv,
+                                                              sl=island.vd,
+                                                              pqpv=island.pqpv,
+                                                              tolerance=pf_options.tolerance,
+                                                              max_coeff=pf_options.max_iter,
+                                                              verbose=False,
+                                                              logger=logger,
+                                                              factorization=island.factorization)
+            converged[pos] &= bool(conv)
+
+            if iter_ > 1:
+                batch.add(pos=pos, island=island, U=U, X=X, order=iter_ - 1, V_slack=V0[island.vd[0]])
+
+        if len(batch) >= options.batch_size:
+            flush()
+
+        if progress_func is not None:
+            progress_func(pos + 1, nt)
+
+        if is_cancel is not None and is_cancel():
+            break
+
+    flush()
+
+    return distance, worst_idx, worst_dist, converged, n_structures
+
+
+def run_sigma_time_steps_chunk(grid: MultiCircuit,
+                               time_indices: IntVec,
+                               options: SigmaAnalysisTimeSeriesOptions
+                               ) -> Tuple[Vec, IntMat, Mat, BoolVec, int, Logger]:
+    """
+    Sigma analysis of a chunk of consecutive time steps, this is the function run by the worker processes
+    :param grid: MultiCircuit
+    :param time_indices: time indices of the chunk
+    :param options: SigmaAnalysisTimeSeriesOptions
+    :return: run_sigma_time_steps outputs and the logger
+    """
+    logger = Logger()
+    return run_sigma_time_steps(grid=grid, time_indices=time_indices, options=options, logger=logger) + (logger,)
+
+
+class SigmaAnalysisTimeSeriesResults(ResultsTemplate):
+    """
+    Sigma analysis time series results
+    """
+
+    def __init__(self, bus_names: StrVec, time_array: DateVec, n_worst: int):
+        """
+        SigmaAnalysisTimeSeriesResults
+        :param bus_names: bus names
+        :param time_array: time array of the simulated time steps
+        :param n_worst: number of worst buses stored per time step
+        """
+        ResultsTemplate.__init__(self,
+                                 name='Sigma analysis time series',
+                                 available_results={
+                                     ResultTypes.SeriesResults: [ResultTypes.SigmaDistanceTimeSeries,
+                                                                 ResultTypes.SigmaWorstBuses]
+                                 },
+                                 time_array=time_array,
+                                 clustering_results=None,
+                                 study_results_type=StudyResultsType.SigmaAnalysisTimeSeries)
+
+        nt = len(time_array)
+
+        self.bus_names = bus_names
+
+        # lowest sigma distance of the buses, negative values are out of the solvability region
+        self.distance: Vec = np.zeros(nt)
+
+        self.worst_bus_idx: IntMat = np.zeros((nt, n_worst), dtype=int)
+
+        self.worst_distances: Mat = np.zeros((nt, n_worst))
+
+        self.converged: BoolVec = np.ones(nt, dtype=bool)
+
+        self.n_structures = 0
+
+        self.register(name='bus_names', tpe=StrVec)
+        self.register(name='distance', tpe=Vec)
+        self.register(name='worst_bus_idx', tpe=IntMat)
+        self.register(name='worst_distances', tpe=Mat)
+        self.register(name='converged', tpe=BoolVec)
+        self.register(name='n_structures', tpe=int)
+
+    def mdl(self, result_type: ResultTypes) -> ResultsTable:
+        """
+        Get the results table
+        :param result_type: ResultTypes
+        :return: ResultsTable
+        """
+        index = pd.to_datetime(self.time_array)
+
+        if result_type == ResultTypes.SigmaDistanceTimeSeries:
+            return ResultsTable(data=np.c_[self.distance, self.bus_names[self.worst_bus_idx[:, 0]], self.converged],
+                                index=index,
+                                idx_device_type=DeviceType.TimeDevice,
+                                columns=np.array(['Sigma distance', 'Worst bus', 'Converged']),
+                                cols_device_type=DeviceType.NoDevice,
+                                title=result_type.value,
+                                units='(p.u.)')
+
+        elif result_type == ResultTypes.SigmaWorstBuses:
+            n_worst = self.worst_bus_idx.shape[1]
+            data = np.empty((len(index), 2 * n_worst), dtype=object)
+            data[:, 0::2] = self.bus_names[self.worst_bus_idx]
+            data[:, 1::2] = self.worst_distances
+            columns = np.array([name for i in range(n_worst) for name in (f'Bus {i + 1}', f'Distance {i + 1}')])
+            return ResultsTable(data=data,
+                                index=index,
+                                idx_device_type=DeviceType.TimeDevice,
+                                columns=columns,
+                                cols_device_type=DeviceType.NoDevice,
+                                title=result_type.value,
+                                units='(p.u.)')
+
+        else:
+            raise Exception('Result type not understood:' + str(result_type))
+
+
+class SigmaAnalysisTimeSeriesDriver(TimeSeriesDriverTemplate):
+    """
+    Sigma analysis of the time series
+    """
+    tpe = SimulationTypes.SigmaAnalysisTimeSeries_run
+    name = tpe.value
+
+    def __init__(self,
+                 grid: MultiCircuit,
+                 options: Union[SigmaAnalysisTimeSeriesOptions, None] = None,
+                 time_indices: Union[IntVec, None] = None,
+                 clustering_results: Union[ClusteringResults, None] = None):
+        """
+        SigmaAnalysisTimeSeriesDriver constructor
+        :param grid: MultiCircuit instance
+        :param options: SigmaAnalysisTimeSeriesOptions
+        :param time_indices: array of time indices to simulate, None for all
+        :param clustering_results: ClusteringResults instance (optional)
+        """
+        TimeSeriesDriverTemplate.__init__(self,
+                                          grid=grid,
+                                          time_indices=grid.get_all_time_indices() if time_indices is None
+                                          else time_indices,
+                                          clustering_results=clustering_results)
+
+        self.options = SigmaAnalysisTimeSeriesOptions() if options is None else options
+
+        self.results: Union[SigmaAnalysisTimeSeriesResults, None] = None
+
+    def run(self):
+        """
+        Run the sigma analysis of the time steps
+        """
+        self.tic()
+
+        nt = len(self.time_indices)
+        self.results = SigmaAnalysisTimeSeriesResults(bus_names=np.array(self.grid.get_bus_names()),
+                                                      time_array=self.grid.time_profile[self.time_indices],
+                                                      n_worst=min(self.options.n_worst,
+                                                                  self.grid.get_bus_number()))
+        n_workers = min(self.options.n_workers, nt)
+
+        if n_workers > 1:
+            self.report_text(f'Sigma analysis time series with {n_workers} processes...')
+
+            # consecutive time steps per chunk, so that each worker reuses its factorizations as much as possible
+            chunks = np.array_split(self.time_indices, n_workers)
+
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(run_sigma_time_steps_chunk, self.grid, chunk, self.options)
+                           for chunk in chunks]
+
+                a = 0
+                for future in futures:
+                    distance, worst_idx, worst_dist, converged, n_structures, logger = future.result()
+                    b = a + len(distance)
+                    self.results.distance[a:b] = distance
+                    self.results.worst_bus_idx[a:b, :] = worst_idx
+                    self.results.worst_distances[a:b, :] = worst_dist
+                    self.results.converged[a:b] = converged
+                    self.results.n_structures += n_structures
+                    self.logger += logger
+                    a = b
+                    self.report_progress2(a, nt)
+
+        else:
+            self.report_text('Sigma analysis time series...')
+            (self.results.distance,
+             self.results.worst_bus_idx,
+             self.results.worst_distances,
+             self.results.converged,
+             self.results.n_structures) = run_sigma_time_steps(grid=self.grid,
+                                                               time_indices=self.time_indices,
+                                                               options=self.options,
+                                                               logger=self.logger,
+                                                               progress_func=self.report_progress2,
+                                                               is_cancel=self.is_cancel)
+
+        self.toc()
@@ -18,5 +18,7 @@
 from GridCalEngine.Simulations.Stochastic.stochastic_power_flow_driver import StochasticPowerFlowDriver, StochasticPowerFlowResults, StochasticPowerFlowInput, StochasticPowerFlowType
 from GridCalEngine.Simulations.Stochastic.blackout_driver import CascadingDriver, CascadingResults, CascadeType, CascadingReportElement
 from GridCalEngine.Simulations.Stochastic.reliability_driver import ReliabilityStudy
+from GridCalEngine.Simulations.Stochastic.reliability_options import ReliabilityOptions
+from GridCalEngine.Simulations.Stochastic.reliability_results import ReliabilityResults
 from GridCalEngine.Simulations.Stochastic.reliability_iterable import ReliabilityIterable, get_transition_probabilities
 
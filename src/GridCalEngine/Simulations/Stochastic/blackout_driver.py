@@ -16,17 +16,20 @@
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
 
-
-from GridCalEngine.Simulations.PowerFlow.power_flow_worker import PowerFlowOptions
-from GridCalEngine.Simulations.PowerFlow.power_flow_driver import PowerFlowDriver
+from GridCalEngine.Simulations.PowerFlow.power_flow_worker import PowerFlowOptions, single_island_pf
 from GridCalEngine.Simulations.Stochastic.stochastic_power_flow_results import StochasticPowerFlowResults
 from GridCalEngine.Simulations.Stochastic.stochastic_power_flow_driver import StochasticPowerFlowDriver
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at, NumericalCircuit
-from GridCalEngine.enumerations import SimulationTypes
+from GridCalEngine.basic_structures import IntVec, Vec
+from GridCalEngine.enumerations import SimulationTypes, BusMode
 from GridCalEngine.Simulations.driver_template import DriverTemplate
 
 
@@ -40,23 +43,37 @@ class CascadeType(Enum):
 
 
 class CascadingReportElement:
-
-    def __init__(self, removed_idx, pf_results, criteria):
+    """
+    Compact record of a cascade stage
+    """
+
+    def __init__(self, removed_idx: IntVec, criteria: str,
+                 n_islands: int = 1,
+                 loading: Union[Vec, None] = None,
+                 Vm: Union[Vec, None] = None,
+                 load_shed: float = 0.0,
+                 pf_results=None):
         """
         CascadingReportElement constructor
         :param removed_idx: list of removed branch indices
-        :param pf_results: power flow results object
         :param criteria: criteria used in the end
+        :param n_islands: number of energized islands after the stage
+        :param loading: branches loading module after the stage (stored as float32)
+        :param Vm: buses voltage module after the stage (stored as float32)
+        :param load_shed: load disconnected so far (MW)
+        :param pf_results: power flow results object (only for the latin hypercube cascades)
         """
-        self.removed_idx = removed_idx
-        self.pf_results = pf_results
+        self.removed_idx = np.asarray(removed_idx, dtype=np.int32)
         self.criteria = criteria
+        self.n_islands = n_islands
+        self.loading = None if loading is None else np.abs(loading).astype(np.float32)
+        self.Vm = None if Vm is None else np.asarray(Vm, dtype=np.float32)
+        self.load_shed = load_shed
+        self.pf_results = pf_results
 
 
 class CascadingResults:
 
-    # TODO: refactor this class
-
     def __init__(self, cascade_type: CascadeType):
         """
         Cascading results constructor
@@ -64,7 +81,11 @@ class CascadingResults:
         """
         self.cascade_type = cascade_type
 
-        self.events = list()
+        # stages of the cascade
+        self.events: List[CascadingReportElement] = list()
+
+        # stages of the cascades of several initiating events
+        self.cascades: List[List[CascadingReportElement]] = list()
 
     def get_failed_idx(self):
         """
@@ -72,14 +93,10 @@ class CascadingResults:
         Returns:
             array of all failed Branches
         """
-        res = None
-        for i in range(len(self.events)):
-            if i == 0:
-                res = self.events[i][0]
-            else:
-                res = np.r_[res, self.events[i][0]]
+        if len(self.events) == 0:
+            return None
 
-        return res
+        return np.concatenate([event.removed_idx for event in self.events])
 
     def get_table(self):
         """
@@ -88,9 +105,34 @@ class CascadingResults:
         """
         dta = list()
         for i in range(len(self.events)):
-            dta.append(['Step ' + str(i + 1), len(self.events[i].removed_idx), self.events[i].criteria])
+            dta.append(['Step ' + str(i + 1), len(self.events[i].removed_idx), self.events[i].criteria,
+                        self.events[i].n_islands, self.events[i].load_shed])
 
-        return pd.DataFrame(data=dta, columns=['Cascade step', 'Elements failed', 'Criteria'])
+        return pd.DataFrame(data=dta, columns=['Cascade step', 'Elements failed', 'Criteria',
+                                               'Islands', 'Load shed (MW)'])
+
+    def get_cascades_table(self, branch_names=None) -> pd.DataFrame:
+        """
+        Get the summary of the cascades of several initiating events
+        :param branch_names: names of the branches (optional)
+        :return: DataFrame
+        """
+        dta = list()
+        for stages in self.cascades:
+            initiating = stages[0].removed_idx if len(stages) else np.zeros(0, dtype=int)
+            if branch_names is not None:
+                name = ", ".join(str(branch_names[i]) for i in initiating)
+            else:
+                name = ", ".join(str(i) for i in initiating)
+
+            dta.append([name,
+                        len(stages),
+                        int(sum(len(stage.removed_idx) for stage in stages)),
+                        stages[-1].n_islands if len(stages) else 0,
+                        stages[-1].load_shed if len(stages) else 0.0])
+
+        return pd.DataFrame(data=dta, columns=['Initiating event', 'Stages', 'Elements failed',
+                                               'Islands', 'Load shed (MW)'])
 
     def plot(self):
 
@@ -98,13 +140,342 @@ class CascadingResults:
         pass
 
 
+########################################################################################################################
+# Incremental cascading engine
+########################################################################################################################
+
+
+class CascadeIsland:
+    """
+    Island of the cascading simulation: the NumericalCircuit slice of the island,
+    which is kept while the island does not split
+    """
+
+    def __init__(self, nc: NumericalCircuit, bus_idx: IntVec):
+        """
+        Constructor
+        :param nc: complete NumericalCircuit
+        :param bus_idx: buses of the island
+        """
+        self.bus_idx = bus_idx
+
+        if len(bus_idx) == nc.nbus:
+            self.nc = nc
+            self.br_idx = np.arange(nc.nbr)
+        else:
+            self.br_idx = nc.branch_data.get_island(bus_idx)
+            self.nc = nc.get_island(bus_idx)
+
+        # global branch index -> island branch index
+        self.br_local: Dict[int, int] = {int(k): i for i, k in enumerate(self.br_idx)}
+
+        self.energized = self.ensure_slack()
+
+    def ensure_slack(self) -> bool:
+        """
+        An island that lost its slack takes the voltage controlled bus with the largest installed power as slack
+        :return: can the island be energized?
+        """
+        if len(self.nc.vd) > 0:
+            return True
+
+        pv = self.nc.pv
+        if len(pv) == 0:
+            # no generation to hold the island
+            return False
+
+        i = pv[np.argmax(self.nc.bus_data.installed_power[pv])]
+        self.nc.bus_data.bus_types[i] = BusMode.Slack_tpe.value
+        self.nc.simulation_indices_ = None
+        return True
+
+    def trip(self, br_idx: IntVec) -> None:
+        """
+        Disable branches of the island without splitting it, only this island's admittances are recomputed
+        :param br_idx: global branch indices
+        """
+        local = [self.br_local[int(k)] for k in br_idx if int(k) in self.br_local]
+        self.nc.branch_data.active[local] = 0
+        self.nc.reset_calculations()
+
+
+class IncrementalCascade:
+    """
+    Cascading failure simulation over a compiled NumericalCircuit.
+    The branches are tripped by updating their active flags, only the islands touched by the tripped
+    branches are re-labelled, re-sliced (if they split) and re-solved, and every power flow is warm-started
+    from the voltages of the previous stage.
+    """
+
+    def __init__(self, nc: NumericalCircuit, options: PowerFlowOptions):
+        """
+        Constructor, this modifies the active flags of the given NumericalCircuit
+        :param nc: NumericalCircuit
+        :param options: PowerFlowOptions
+        """
+        self.nc = nc
+        self.options = options
+
+        self.V = nc.Vbus.copy()
+        self.loading = np.zeros(nc.nbr, dtype=complex)
+        self.energized = np.ones(nc.nbus, dtype=bool)
+        self.bus_load = - nc.load_data.get_injections_per_bus().real  # MW
+
+        self.labels = np.zeros(nc.nbus, dtype=int)
+        self.islands: Dict[int, CascadeIsland] = dict()
+        self._next_label = 0
+        self._dirty = set()
+
+        n, labels = self.get_components(bus_idx=np.arange(nc.nbus))
+        for k in range(n):
+            self.add_island(bus_idx=np.where(labels == k)[0])
+
+        self.solve()
+
+    def get_components(self, bus_idx: IntVec):
+        """
+        Get the connected components of a set of buses through the active branches
+        :param bus_idx: bus indices
+        :return: number of components, component of every bus
+        """
+        active = self.nc.branch_data.active != 0
+        F = self.nc.branch_data.F
+        T = self.nc.branch_data.T
+
+        pos = np.full(self.nc.nbus, -1, dtype=int)
+        pos[bus_idx] = np.arange(len(bus_idx))
+        br = np.where(active & (pos[F] >= 0) & (pos[T] >= 0))[0]
+
+        m = len(bus_idx)
+        adj = sp.csr_matrix((np.ones(len(br)), (pos[F[br]], pos[T[br]])), shape=(m, m))
+        return connected_components(adj, directed=False)
+
+    def add_island(self, bus_idx: IntVec) -> None:
+        """
+        Create an island and flag it to be solved
+        :param bus_idx: buses of the island
+        """
+        label = self._next_label
+        self._next_label += 1
+        self.islands[label] = CascadeIsland(nc=self.nc, bus_idx=bus_idx)
+        self.labels[bus_idx] = label
+        self._dirty.add(label)
+
+    @property
+    def n_islands(self) -> int:
+        """
+        Number of energized islands
+        :return: int
+        """
+        return sum(1 for island in self.islands.values() if island.energized)
+
+    @property
+    def load_shed(self) -> float:
+        """
+        Load of the de-energized buses (MW)
+        :return: float
+        """
+        return float(self.bus_load[~self.energized].sum())
+
+    def trip(self, br_idx: IntVec) -> None:
+        """
+        Trip branches, the affected islands are split if needed
+        :param br_idx: branch indices
+        """
+        active = self.nc.branch_data.active
+        br_idx = np.asarray(br_idx, dtype=int)
+        br_idx = br_idx[active[br_idx] != 0]
+        active[br_idx] = 0
+
+        for label in np.unique(self.labels[self.nc.branch_data.F[br_idx]]):
+            island = self.islands[label]
+
+            if not island.energized:
+                continue
+
+            n, labels = self.get_components(bus_idx=island.bus_idx)
+
+            if n == 1:
+                island.trip(br_idx)
+                self._dirty.add(label)
+            else:
+                del self.islands[label]
+                for k in range(n):
+                    self.add_island(bus_idx=island.bus_idx[labels == k])
+
+    def de_energize(self, island: CascadeIsland) -> None:
+        """
+        Black out an island
+        :param island: CascadeIsland
+        """
+        island.energized = False
+        self.energized[island.bus_idx] = False
+        self.V[island.bus_idx] = 0.0
+        self.loading[island.br_idx] = 0.0
+
+    def solve(self) -> None:
+        """
+        Solve the islands that changed since the last call
+        """
+        for label in self._dirty:
+            island = self.islands.get(label, None)
+
+            if island is None:
+                continue
+
+            if not island.energized:
+                self.de_energize(island)
+                continue
+
+            res = single_island_pf(nc=island.nc,
+                                   options=self.options,
+                                   voltage_solution=self.V[island.bus_idx],  # warm start
+                                   S0=island.nc.Sbus)
+
+            if res.converged:
+                self.V[island.bus_idx] = res.voltage
+                self.loading[island.br_idx] = res.loading
+            else:
+                # voltage collapse of the island
+                self.de_energize(island)
+
+        self._dirty.clear()
+
+    def get_overloaded(self, threshold: float = 1.0) -> IntVec:
+        """
+        Get the active branches whose loading exceeds the threshold
+        :param threshold: loading threshold (p.u.)
+        :return: branch indices
+        """
+        return np.where((np.abs(self.loading) > threshold) & (self.nc.branch_data.active != 0))[0]
+
+    def get_stage(self, removed_idx: IntVec, criteria: str) -> CascadingReportElement:
+        """
+        Get the compact record of the current state
+        :param removed_idx: branches tripped in the stage
+        :param criteria: tripping criteria
+        :return: CascadingReportElement
+        """
+        return CascadingReportElement(removed_idx=removed_idx,
+                                      criteria=criteria,
+                                      n_islands=self.n_islands,
+                                      loading=self.loading,
+                                      Vm=np.abs(self.V),
+                                      load_shed=self.load_shed)
+
+
+def simulate_cascade(nc: NumericalCircuit,
+                     options: PowerFlowOptions,
+                     initiating_idx: Union[IntVec, None] = None,
+                     max_additional_islands: int = 1,
+                     max_stages: int = 100,
+                     overload_threshold: float = 1.0) -> List[CascadingReportElement]:
+    """
+    Simulate a cascade: trip the initiating branches, then trip the overloaded branches stage by stage
+    until no branch is overloaded or the grid splits into too many islands
+    :param nc: NumericalCircuit (its active flags are modified)
+    :param options: PowerFlowOptions
+    :param initiating_idx: branches that trip first, if None the most loaded branch trips
+    :param max_additional_islands: number of islands that shall be formed to consider a blackout
+    :param max_stages: maximum number of stages
+    :param overload_threshold: loading over which a branch trips (p.u.)
+    :return: list of stages
+    """
+    engine = IncrementalCascade(nc=nc, options=options)
+    n0 = engine.n_islands
+    stages = list()
+
+    if initiating_idx is None:
+        idx = np.array([np.argmax(np.abs(engine.loading))], dtype=int)
+        criteria = 'Loading'
+    else:
+        idx = np.asarray(initiating_idx, dtype=int)
+        criteria = 'Initiating event'
+
+    while len(idx) > 0 and len(stages) < max_stages:
+        engine.trip(idx)
+        engine.solve()
+        stages.append(engine.get_stage(removed_idx=idx, criteria=criteria))
+
+        if engine.n_islands > n0 + max_additional_islands:
+            break
+
+        idx = engine.get_overloaded(threshold=overload_threshold)
+        criteria = 'Overload'
+
+    return stages
+
+
+def simulate_cascades(nc: NumericalCircuit,
+                      options: PowerFlowOptions,
+                      initiating_events: List[IntVec],
+                      max_additional_islands: int = 1,
+                      max_stages: int = 100,
+                      overload_threshold: float = 1.0) -> List[List[CascadingReportElement]]:
+    """
+    Simulate the cascades of several initiating events, this is the function run by the worker processes
+    :param nc: NumericalCircuit (not modified)
+    :param options: PowerFlowOptions
+    :param initiating_events: list of arrays of branch indices
+    :param max_additional_islands: number of islands that shall be formed to consider a blackout
+    :param max_stages: maximum number of stages
+    :param overload_threshold: loading over which a branch trips (p.u.)
+    :return: stages of every cascade
+    """
+    return [simulate_cascade(nc=nc.copy(),
+                             options=options,
+                             initiating_idx=event,
+                             max_additional_islands=max_additional_islands,
+                             max_stages=max_stages,
+                             overload_threshold=overload_threshold)
+            for event in initiating_events]
+
+
+def run_cascades(nc: NumericalCircuit,
+                 options: PowerFlowOptions,
+                 initiating_events: List[IntVec],
+                 max_additional_islands: int = 1,
+                 max_stages: int = 100,
+                 overload_threshold: float = 1.0,
+                 n_workers: int = 1) -> List[List[CascadingReportElement]]:
+    """
+    Simulate the cascades of several initiating events, spread over worker processes
+    :param nc: NumericalCircuit (not modified)
+    :param options: PowerFlowOptions
+    :param initiating_events: list of arrays of branch indices
+    :param max_additional_islands: number of islands that shall be formed to consider a blackout
+    :param max_stages: maximum number of stages
+    :param overload_threshold: loading over which a branch trips (p.u.)
+    :param n_workers: number of worker processes, 1 to simulate in this process
+    :return: stages of every cascade, in the order of the initiating events
+    """
+    if n_workers <= 1 or len(initiating_events) < 2:
+        return simulate_cascades(nc, options, initiating_events, max_additional_islands, max_stages,
+                                 overload_threshold)
+
+    # one chunk of events per task, so that the circuit is sent a few times only
+    n_chunks = min(len(initiating_events), 4 * n_workers)
+    chunks = [list(chunk) for chunk in np.array_split(np.arange(len(initiating_events)), n_chunks)]
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(simulate_cascades, nc, options, [initiating_events[i] for i in chunk],
+                                   max_additional_islands, max_stages, overload_threshold)
+                   for chunk in chunks]
+
+        results = list()
+        for future in futures:
+            results += future.result()
+
+    return results
+
+
 class CascadingDriver(DriverTemplate):
     tpe = SimulationTypes.Cascade_run
 
-    # TODO: re-make this simulation class
-
     def __init__(self, grid: MultiCircuit, options: PowerFlowOptions, triggering_idx=None, max_additional_islands=1,
-                 cascade_type_: CascadeType = CascadeType.LatinHypercube, n_lhs_samples_=1000):
+                 cascade_type_: CascadeType = CascadeType.LatinHypercube, n_lhs_samples_=1000,
+                 initiating_events: Union[List[IntVec], None] = None, overload_threshold: float = 1.0,
+                 max_stages: int = 100, n_workers: int = 1):
         """
         Constructor
         Args:
@@ -114,6 +485,10 @@ class CascadingDriver(DriverTemplate):
             max_additional_islands: number of islands that shall be formed to consider a blackout
             cascade_type_: Cascade simulation kind
             n_lhs_samples_: number of latin hypercube samples if using LHS cascade
+            initiating_events: list of arrays of branch indices, every one starts a cascade (PowerFlow type only)
+            overload_threshold: loading over which a branch trips (p.u.)
+            max_stages: maximum number of stages of every cascade
+            n_workers: number of worker processes to simulate the initiating events
         """
 
         DriverTemplate.__init__(self, grid=grid)
@@ -134,6 +509,17 @@ class CascadingDriver(DriverTemplate):
 
         self.n_lhs_samples = n_lhs_samples_
 
+        self.initiating_events = initiating_events
+
+        self.overload_threshold = overload_threshold
+
+        self.max_stages = max_stages
+
+        self.n_workers = n_workers
+
+        # incremental engine used by the step by step runs
+        self.engine: Union[IncrementalCascade, None] = None
+
         self.results = CascadingResults(self.cascade_type)
 
     @staticmethod
@@ -213,69 +599,91 @@ class CascadingDriver(DriverTemplate):
         Returns:
             Nothing
         """
+        if self.engine is None:
+            nc = compile_numerical_circuit_at(self.grid, t_idx=None, logger=self.logger)
+            self.engine = IncrementalCascade(nc=nc, options=self.options)
 
-        # initialize the simulator
-        if self.cascade_type is CascadeType.PowerFlow:
-            model_simulator = PowerFlowDriver(self.grid, self.options)
-
-        elif self.cascade_type is CascadeType.LatinHypercube:
-            model_simulator = StochasticPowerFlowDriver(self.grid,
-                                                        self.options,
-                                                        sampling_points=self.n_lhs_samples)
-
-        else:
-            model_simulator = PowerFlowDriver(self.grid, self.options)
-
-        # For every circuit, run a power flow
-        # for c in self.grid.circuits:
-        model_simulator.run()
-
-        if self.current_step == 0:
+        if self.current_step == 0 and self.triggering_idx is not None:
             # the first iteration try to trigger the selected indices, if any
-            idx, criteria = self.remove_elements(self.grid, idx=self.triggering_idx,
-                                                 loading_vector=model_simulator.results.loading)
+            idx = np.asarray(self.triggering_idx, dtype=int)
+            criteria = 'Initiating event'
         else:
             # cascade normally
-            idx, criteria = self.remove_elements(self.grid, loading_vector=model_simulator.results.loading)
+            idx = self.engine.get_overloaded(threshold=self.overload_threshold)
+            criteria = 'Overload'
+
+            if len(idx) == 0:
+                idx = np.array([np.argmax(np.abs(self.engine.loading))], dtype=int)
+                criteria = 'Loading'
 
-        # store the removed indices and the results
-        entry = CascadingReportElement(idx, model_simulator.results, criteria)
-        self.results.events.append(entry)
+        self.engine.trip(idx)
+        self.engine.solve()
+
+        # store the removed indices and the compact results
+        self.results.events.append(self.engine.get_stage(removed_idx=idx, criteria=criteria))
 
         # increase the step number
         self.current_step += 1
 
-        # print(model_simulator.results.get_convergence_report())
-
         # send the finnish signal
         self.report_done()
 
-    def run(self):
+    def run_incremental(self):
         """
-        Run the monte carlo simulation
-        @return:
+        Run the cascades with the incremental engine
         """
-        self.tic()
-        self.__cancel__ = False
-
-        # compile
-        # print('Compiling...', end='')
         nc = compile_numerical_circuit_at(self.grid, t_idx=None, logger=self.logger)
-        calculation_inputs = nc.split_into_islands(ignore_single_node_islands=self.options.ignore_single_node_islands)
 
-        self.results = CascadingResults(self.cascade_type)
-
-        # initialize the simulator
-        if self.cascade_type is CascadeType.PowerFlow:
-            model_simulator = PowerFlowDriver(self.grid, self.options)
+        if self.initiating_events is None:
+            events = [self.triggering_idx]
+        else:
+            events = self.initiating_events
 
-        elif self.cascade_type is CascadeType.LatinHypercube:
-            model_simulator = StochasticPowerFlowDriver(self.grid,
-                                                        self.options,
-                                                        sampling_points=self.n_lhs_samples)
+        self.report_text('Running cascading failure...')
 
+        if self.n_workers > 1 and len(events) > 1:
+            self.results.cascades = run_cascades(nc=nc,
+                                                 options=self.options,
+                                                 initiating_events=events,
+                                                 max_additional_islands=self.max_additional_islands,
+                                                 max_stages=self.max_stages,
+                                                 overload_threshold=self.overload_threshold,
+                                                 n_workers=self.n_workers)
         else:
-            model_simulator = PowerFlowDriver(self.grid, self.options)
+            for i, event in enumerate(events):
+                self.results.cascades.append(simulate_cascade(nc=nc.copy(),
+                                                              options=self.options,
+                                                              initiating_idx=event,
+                                                              max_additional_islands=self.max_additional_islands,
+                                                              max_stages=self.max_stages,
+                                                              overload_threshold=self.overload_threshold))
+                self.report_progress2(i + 1, len(events))
+
+                if self.__cancel__:
+                    break
+
+        # the events are the stages of the first cascade
+        if len(self.results.cascades):
+            self.results.events = self.results.cascades[0]
+
+            self.logger.add_info("Info",
+                                 device="Number of islands",
+                                 value=self.results.events[-1].n_islands if len(self.results.events) else 0)
+
+        self.logger.add_info("Info",
+                             device="Cascades",
+                             value=len(self.results.cascades))
+
+    def run_stochastic(self):
+        """
+        Run the latin hypercube based cascade
+        """
+        nc = compile_numerical_circuit_at(self.grid, t_idx=None, logger=self.logger)
+        calculation_inputs = nc.split_into_islands(ignore_single_node_islands=self.options.ignore_single_node_islands)
+
+        model_simulator = StochasticPowerFlowDriver(self.grid,
+                                                    self.options,
+                                                    sampling_points=self.n_lhs_samples)
 
         self.report_progress(0.0)
         self.report_text('Running cascading failure...')
@@ -284,8 +692,6 @@ class CascadingDriver(DriverTemplate):
         if n_grids > len(self.grid.buses):  # safety check
             n_grids = len(self.grid.buses) - 1
 
-        # print('n grids: ', n_grids)
-
         it = 0
         while len(calculation_inputs) <= n_grids and it <= n_grids:
 
@@ -297,7 +703,10 @@ class CascadingDriver(DriverTemplate):
                                                           max_val=1.0, min_prob=0.1)
 
             # store the removed indices and the results
-            entry = CascadingReportElement(idx, model_simulator.results, criteria)
+            entry = CascadingReportElement(removed_idx=idx,
+                                           criteria=criteria,
+                                           n_islands=len(calculation_inputs),
+                                           pf_results=model_simulator.results)
             self.results.events.append(entry)
 
             # recompile grid
@@ -317,6 +726,22 @@ class CascadingDriver(DriverTemplate):
         self.logger.add_info("Info",
                              device="Steps",
                              value=it)
+
+    def run(self):
+        """
+        Run the cascading simulation
+        @return:
+        """
+        self.tic()
+        self.__cancel__ = False
+
+        self.results = CascadingResults(self.cascade_type)
+
+        if self.cascade_type is CascadeType.LatinHypercube:
+            self.run_stochastic()
+        else:
+            self.run_incremental()
+
         self.toc()
 
     def get_failed_idx(self):
@@ -14,202 +14,495 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+Sequential Monte Carlo adequacy assessment.
+Every sample is a year: the up/down timelines of the branches and generators are sampled
+from exponential times to failure and to repair, the distinct system states are solved
+only once, and the loss of load indices (LOLE, EENS) are averaged over the years until
+the estimate converges.
+"""
+from __future__ import annotations
 
 import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
 
-from GridCalEngine.Simulations.PowerFlow.power_flow_worker import PowerFlowOptions
 from GridCalEngine.Devices.multi_circuit import MultiCircuit
 from GridCalEngine.DataStructures.numerical_circuit import NumericalCircuit, compile_numerical_circuit_at
-from GridCalEngine.enumerations import DeviceType
 from GridCalEngine.Simulations.driver_template import DriverTemplate
+from GridCalEngine.Simulations.Stochastic.reliability_options import ReliabilityOptions
+from GridCalEngine.Simulations.Stochastic.reliability_results import (ReliabilityResults,
+                                                                      get_coefficient_of_variation)
+from GridCalEngine.basic_structures import Vec, Mat, IntVec, BoolVec
+from GridCalEngine.enumerations import SimulationTypes, DeviceType
 
 
-def get_failure_time(mttf):
+def sample_up_states(mttf: Vec, mttr: Vec, t_start: Vec, horizon: float,
+                     rng: np.random.Generator) -> np.ndarray:
     """
-    Get an array of possible failure times
-    :param mttf: mean time to failure
+    Sample the up/down state of a group of devices at the start of every time step of a year.
+    The times to failure and to repair are exponential draws, the transition times are their
+    cumulative sum, and the down intervals are mapped to the time steps with a difference array.
+    :param mttf: Mean time to failure of the devices (h), the devices with mttf <= 0 never fail
+    :param mttr: Mean time to repair of the devices (h)
+    :param t_start: start of every time step since the beginning of the year (h)
+    :param horizon: length of the year (h)
+    :param rng: numpy random generator
+    :return: (nt, n) boolean matrix, True where the device is available
     """
-    n_samples = len(mttf)
-    return -1.0 * mttf * np.log(np.random.rand(n_samples))
+    nt = len(t_start)
+    n = len(mttf)
 
+    idx = np.where((mttf > 0) & (mttr > 0))[0]
 
-def get_repair_time(mttr):
-    """
-    Get an array of possible repair times
-    :param mttr: mean time to recovery
-    """
-    n_samples = len(mttr)
-    return -1.0 * mttr * np.log(np.random.rand(n_samples))
+    if len(idx) == 0 or nt == 0:
+        return np.ones((nt, n), dtype=bool)
 
+    lbda = mttf[idx]
+    mu = mttr[idx]
 
-def get_reliability_events(horizon, mttf, mttr, tpe: DeviceType):
-    """
-    Get random fail-repair events until a given time horizon in hours
+    # number of fail-repair cycles drawn at once, the devices that did not reach the horizon draw more
+    cycle = lbda + mu
+    n_cycles = int(min(np.ceil(horizon / cycle.min() + 3.0 * np.sqrt(horizon / cycle.min())), 10000)) + 1
 
-    :param horizon: maximum horizon in hours
-    :param mttf: Mean time to failure (h)
-    :param mttr: Mean time to repair (h)
-    :param tpe: device type (DeviceType)
-    :return: list of events, each event tuple has: (time in hours, element index, activation state (True/False))
-    """
-    n_samples = len(mttf)
-    t = np.zeros(n_samples)
-    done = np.zeros(n_samples, dtype=bool)
-    events = list()
+    starts = list()
+    ends = list()
+    cols = list()
 
-    if mttf.all() == 0.0:
-        return events
+    t0 = np.zeros(len(idx))
+    rows = np.arange(len(idx))
+    while len(rows) > 0:
+        ttf = rng.exponential(1.0, size=(len(rows), n_cycles)) * lbda[rows, np.newaxis]
+        ttr = rng.exponential(1.0, size=(len(rows), n_cycles)) * mu[rows, np.newaxis]
 
-    not_done = np.where(done == False)[0]
-    not_done_s = set(not_done)
-    while len(not_done) > 0:  # if all event get to the horizon, finnish the sampling
+        repair = t0[rows, np.newaxis] + np.cumsum(ttf + ttr, axis=1)
+        fail = repair - ttr
 
-        # simulate failure
-        t[not_done] += get_failure_time(mttf[not_done])
-        idx = np.where(t >= horizon)[0]
-        done[idx] = True
+        r, c = np.nonzero(fail < horizon)
+        starts.append(fail[r, c])
+        ends.append(repair[r, c])
+        cols.append(idx[rows[r]])
 
-        # store failure events
-        events += [(t[i], tpe, i, False) for i in (not_done_s - set(idx))]
+        last = repair[:, -1]
+        pending = last < horizon
+        t0[rows[pending]] = last[pending]
+        rows = rows[pending]
 
-        # simulate repair
-        t[not_done] += get_repair_time(mttr[not_done])
-        idx = np.where(t >= horizon)[0]
-        done[idx] = True
+    # a device is down at the steps that start within [failure, repair)
+    a = np.searchsorted(t_start, np.concatenate(starts), side='left')
+    b = np.searchsorted(t_start, np.concatenate(ends), side='left')
+    cols = np.concatenate(cols)
+    valid = a < b
 
-        # store recovery events
-        events += [(t[i], tpe, i, True) for i in (not_done_s - set(idx))]
+    diff = np.zeros((nt + 1, n), dtype=np.int32)
+    np.add.at(diff, (a[valid], cols[valid]), 1)
+    np.add.at(diff, (b[valid], cols[valid]), -1)
 
-        # update not done
-        not_done = np.where(done == False)[0]
-        not_done_s = set(not_done)
+    return np.cumsum(diff[:-1, :], axis=0) == 0
 
-    # sort in place
-    # events.sort(key=lambda tup: tup[0])
-    return events
 
+def get_distinct_states(br_up: np.ndarray, gen_up: np.ndarray) -> Tuple[List[bytes], IntVec]:
+    """
+    Find the distinct system states of a year.
+    Every state is the packed bits of the branches and generators availability
+    :param br_up: (nt, nbr) branches availability
+    :param gen_up: (nt, ngen) generators availability
+    :return: list of state keys (bytes), state index of every time step
+    """
+    packed = np.packbits(np.hstack((br_up, gen_up)), axis=1)
 
-def get_reliability_scenario(nc: NumericalCircuit, horizon=10000):
+    # view every row as a single item to find the unique rows
+    rows = np.ascontiguousarray(packed).view(np.dtype((np.void, packed.shape[1]))).ravel()
+    unique_rows, inverse = np.unique(rows, return_inverse=True)
+
+    return [row.tobytes() for row in unique_rows], inverse.ravel()
+
+
+class AdequacyData:
+    """
+    Compact numerical data of the adequacy problem, this is what is sent to the worker processes
+    """
+
+    def __init__(self,
+                 F: IntVec,
+                 T: IntVec,
+                 b: Vec,
+                 rates: Vec,
+                 br_active: BoolVec,
+                 br_mttf: Vec,
+                 br_mttr: Vec,
+                 gen_bus: IntVec,
+                 gen_mttf: Vec,
+                 gen_mttr: Vec,
+                 gen_available: Mat,
+                 bus_load: Mat,
+                 step_hours: Vec,
+                 Sbase: float = 100.0):
+        """
+        Constructor
+        :param F: branches "from" bus indices
+        :param T: branches "to" bus indices
+        :param b: branches series susceptance (p.u.)
+        :param rates: branches rates (MW)
+        :param br_active: branches active state
+        :param br_mttf: branches mean time to failure (h)
+        :param br_mttr: branches mean time to repair (h)
+        :param gen_bus: generators bus indices
+        :param gen_mttf: generators mean time to failure (h)
+        :param gen_mttr: generators mean time to repair (h)
+        :param gen_available: (nt, ngen) power available from the generators (MW)
+        :param bus_load: (nt, nbus) load per bus (MW)
+        :param step_hours: duration of every time step (h)
+        :param Sbase: base power (MVA)
+        """
+        self.F = F
+        self.T = T
+        self.b = b
+        self.rates = rates
+        self.br_active = br_active
+        self.br_mttf = br_mttf
+        self.br_mttr = br_mttr
+        self.gen_bus = gen_bus
+        self.gen_mttf = gen_mttf
+        self.gen_mttr = gen_mttr
+        self.gen_available = gen_available
+        self.bus_load = bus_load
+        self.step_hours = step_hours
+        self.Sbase = Sbase
+
+        self.t_start = np.r_[0.0, np.cumsum(step_hours)[:-1]]
+        self.horizon = float(np.sum(step_hours))
+
+    @property
+    def nbus(self) -> int:
+        return self.bus_load.shape[1]
+
+    @property
+    def nbr(self) -> int:
+        return len(self.F)
+
+    @property
+    def ngen(self) -> int:
+        return len(self.gen_bus)
+
+
+def get_load_like_p_prof(grid: MultiCircuit) -> Mat:
+    """
+    Get the active power consumption profiles of the load-like devices, in the order of the compiled load data
+    (loads, static generators, external grids and current injections), considering their active profiles
+    :param grid: MultiCircuit
+    :return: (ntime, n load-like devices) [MW]
+    """
+    blocks = list()
+    for elements in grid.get_load_like_devices_lists():
+        active = grid.get_profiles_matrix(elements=elements, magnitude='active', dtype=bool)
+
+        if len(elements) == 0 or elements[0].device_type == DeviceType.CurrentInjectionDevice:
+            # the current injections do not have a constant power
+            blocks.append(np.zeros(active.shape))
+        elif elements[0].device_type == DeviceType.StaticGeneratorDevice:
+            # the static generators are negative loads
+            blocks.append(-grid.get_profiles_matrix(elements=elements, magnitude='P') * active)
+        else:
+            blocks.append(grid.get_profiles_matrix(elements=elements, magnitude='P') * active)
+
+    return np.hstack(blocks)
+
+
+def get_adequacy_data(grid: MultiCircuit, nc: NumericalCircuit, horizon: float = 8760.0) -> AdequacyData:
+    """
+    Gather the adequacy data of a grid.
+    If the grid has time series, every time step is a step of the simulated year (so the indices refer
+    to the length of the time series), otherwise the snapshot values are used for every hour of the horizon.
+    The dispatchable generators are available up to their Pmax, the rest at their P (profile)
+    :param grid: MultiCircuit
+    :param nc: NumericalCircuit compiled at the snapshot
+    :param horizon: length of the year in hours when the grid has no time series
+    :return: AdequacyData
     """
-    Get reliability events
-    :param nc: numerical circuit instance
-    :param horizon: time horizon in hours
-    :return: dictionary of events, each event tuple has:
-    (time in hours, DataType, element index, activation state (True/False))
+    gen_bus = np.asarray(nc.generator_data.C_bus_elm.tocsc().argmax(axis=0)).ravel()
+    load_bus = np.asarray(nc.load_data.C_bus_elm.tocsc().argmax(axis=0)).ravel()
+    gen_active = nc.generator_data.active.astype(bool)
+    load_active = nc.load_data.active.astype(bool)
+    dispatchable = nc.generator_data.dispatchable.astype(bool)
+
+    if grid.has_time_series:
+        nt = grid.get_time_number()
+        load_p = get_load_like_p_prof(grid)
+        gen_p = grid.get_profiles_matrix(elements=grid.generators, magnitude='P')
+
+        unix_time = grid.get_unix_time()
+        if nt > 1:
+            step_hours = np.diff(unix_time) / 3600.0
+            step_hours = np.r_[step_hours, step_hours[-1]]
+        else:
+            step_hours = np.ones(nt)
+    else:
+        nt = int(np.ceil(horizon))
+        load_p = np.tile(nc.load_data.S.real * load_active, (nt, 1))
+        gen_p = np.tile(nc.generator_data.p, (nt, 1))
+        step_hours = np.ones(nt)
+
+    gen_available = np.where(dispatchable, nc.generator_data.pmax, np.maximum(gen_p, 0.0)) * gen_active
+
+    bus_load = np.zeros((nt, nc.nbus))
+    np.add.at(bus_load.T, load_bus, load_p.T)
+
+    x = nc.branch_data.X
+    b = np.zeros(nc.nbr)
+    b[x != 0] = 1.0 / x[x != 0]
+
+    return AdequacyData(F=nc.branch_data.F,
+                        T=nc.branch_data.T,
+                        b=b,
+                        rates=nc.branch_data.rates,
+                        br_active=nc.branch_data.active.astype(bool),
+                        br_mttf=nc.branch_data.mttf,
+                        br_mttr=nc.branch_data.mttr,
+                        gen_bus=gen_bus,
+                        gen_mttf=nc.generator_data.mttf * gen_active,
+                        gen_mttr=nc.generator_data.mttr,
+                        gen_available=gen_available,
+                        bus_load=bus_load,
+                        step_hours=step_hours,
+                        Sbase=nc.Sbase)
+
+
+class AdequacyState:
+    """
+    Solution of a system state: the islands formed by the available branches and,
+    optionally, the factorized DC power flow of the state, which is reused for all
+    the time steps in which the state occurs
     """
-    all_events = list()
 
-    # TODO: Add MTTF and MTTR to data devices
+    def __init__(self, data: AdequacyData, br_up: BoolVec, gen_up: BoolVec, compute_flows: bool = True):
+        """
+        Solve the state
+        :param data: AdequacyData
+        :param br_up: branches availability
+        :param gen_up: generators availability
+        :param compute_flows: factorize the DC power flow of the state
+        """
+        nbus = data.nbus
+        self.gen_up = gen_up
+        self.br_idx = np.where(br_up & data.br_active)[0]
+        F = data.F[self.br_idx]
+        T = data.T[self.br_idx]
+
+        adj = sp.csr_matrix((np.ones(len(self.br_idx)), (F, T)), shape=(nbus, nbus))
+        self.n_islands, self.labels = connected_components(adj, directed=False)
+
+        # bus-island and generator-island membership
+        self.C_bus_isl = sp.csc_matrix((np.ones(nbus), (np.arange(nbus), self.labels)),
+                                       shape=(nbus, self.n_islands))
+        self.gen_isl = self.labels[data.gen_bus]
+
+        self.factor = None
+        self.Bf = None
+        self.pqpv = None
+
+        if compute_flows and len(self.br_idx) > 0:
+            nbr = len(self.br_idx)
+            A = sp.csc_matrix((np.r_[np.ones(nbr), -np.ones(nbr)],
+                               (np.r_[np.arange(nbr), np.arange(nbr)], np.r_[F, T])),
+                              shape=(nbr, nbus))
+            self.Bf = sp.diags(data.b[self.br_idx]) @ A
+            Bbus = (A.T @ self.Bf).tocsc()
+
+            # the first bus of every island is its angle reference
+            _, slack = np.unique(self.labels, return_index=True)
+            self.pqpv = np.setdiff1d(np.arange(nbus), slack)
+
+            if len(self.pqpv):
+                self.factor = splu(Bbus[np.ix_(self.pqpv, self.pqpv)].tocsc())
+
+    def evaluate(self, data: AdequacyData, steps: IntVec) -> Tuple[Mat, Union[Mat, None]]:
+        """
+        Evaluate the time steps in which this state occurs.
+        The load that exceeds the available generation of an island is shed proportionally to the bus loads,
+        and the generators of the island are scaled to the served load.
+        :param data: AdequacyData
+        :param steps: time step indices
+        :return: (k, nbus) shed load (MW), (k, nbr) overloaded branches (or None)
+        """
+        bus_load = data.bus_load[steps, :]
+        gen_p = data.gen_available[steps, :] * self.gen_up
 
-    # Branches
-    all_events += get_reliability_events(horizon,
-                                         nc.branch_data.mttf,
-                                         nc.branch_data.mttr,
-                                         DeviceType.BranchDevice)
+        load_isl = bus_load @ self.C_bus_isl
+        gen_isl = np.zeros((len(steps), self.n_islands))
+        np.add.at(gen_isl.T, self.gen_isl, gen_p.T)
 
-    all_events += get_reliability_events(horizon,
-                                         nc.generator_data.mttf,
-                                         nc.generator_data.mttr,
-                                         DeviceType.GeneratorDevice)
+        shed_isl = np.maximum(load_isl - gen_isl, 0.0)
+        shed_share = np.divide(shed_isl, load_isl, out=np.zeros_like(shed_isl), where=load_isl > 0)
+        bus_shed = bus_load * shed_share[:, self.labels]
 
-    all_events += get_reliability_events(horizon,
-                                         nc.battery_data.mttf,
-                                         nc.battery_data.mttr,
-                                         DeviceType.BatteryDevice)
+        if self.Bf is None:
+            return bus_shed, None
 
-    all_events += get_reliability_events(horizon,
-                                         nc.load_data.mttf,
-                                         nc.load_data.mttr,
-                                         DeviceType.LoadDevice)
+        # scale the generation of every island to its served load
+        gen_scale = np.divide(load_isl - shed_isl, gen_isl, out=np.zeros_like(gen_isl), where=gen_isl > 0)
+        bus_gen = np.zeros_like(bus_load)
+        np.add.at(bus_gen.T, data.gen_bus, (gen_p * gen_scale[:, self.gen_isl]).T)
 
-    all_events += get_reliability_events(horizon,
-                                         nc.shunt_data.mttf,
-                                         nc.shunt_data.mttr,
-                                         DeviceType.ShuntDevice)
+        P = (bus_gen - bus_load + bus_shed) / data.Sbase
+        theta = np.zeros_like(P)
+        if self.factor is not None:
+            theta[:, self.pqpv] = self.factor.solve(np.ascontiguousarray(P[:, self.pqpv].T)).T
 
-    # sort all
-    all_events.sort(key=lambda tup: tup[0])
+        flows = (self.Bf @ theta.T).T * data.Sbase
+        overloads = np.zeros((len(steps), data.nbr), dtype=bool)
+        rates = data.rates[self.br_idx]
+        overloads[:, self.br_idx] = (np.abs(flows) > rates) & (rates > 0)
 
-    return all_events
+        return bus_shed, overloads
 
 
-def run_events(nc: NumericalCircuit, events_list: list):
+def simulate_years(data: AdequacyData,
+                   n_years: int,
+                   seed: Union[np.random.SeedSequence, int],
+                   compute_overloads: bool = True,
+                   max_cached_states: int = 20000) -> Tuple[Vec, Vec, Vec, Vec, int, int]:
     """
-
-    :param nc:
-    :param events_list:
+    Simulate a batch of years, this is the function run by the worker processes.
+    The solved states are shared by the years of the batch.
+    :param data: AdequacyData
+    :param n_years: number of years
+    :param seed: random seed
+    :param compute_overloads: compute the DC power flows to count the branch overloads
+    :param max_cached_states: maximum number of solved states kept
+    :return: loss of load hours per year, energy not supplied per year,
+             energy not supplied per bus (sum of the years), overload hours per branch (sum of the years),
+             number of distinct states, number of solved states
     """
-    for t, tpe, i, state in events_list:
+    rng = np.random.default_rng(seed)
+    cache: Dict[bytes, AdequacyState] = dict()
 
-        # Set the state of the event
-        if tpe == DeviceType.BusDevice:
-            pass
+    lol_hours = np.zeros(n_years)
+    ens = np.zeros(n_years)
+    bus_ens = np.zeros(data.nbus)
+    branch_overload_hours = np.zeros(data.nbr)
+    n_distinct = 0
+    n_solved = 0
 
-        elif tpe == DeviceType.BranchDevice:
-            nc.branch_data.active[i] = state
+    for y in range(n_years):
+        br_up = sample_up_states(data.br_mttf, data.br_mttr, data.t_start, data.horizon, rng)
+        gen_up = sample_up_states(data.gen_mttf, data.gen_mttr, data.t_start, data.horizon, rng)
 
-        elif tpe == DeviceType.GeneratorDevice:
-            nc.generator_data.active[i] = state
+        keys, inverse = get_distinct_states(br_up, gen_up)
+        n_distinct += len(keys)
 
-        elif tpe == DeviceType.BatteryDevice:
-            nc.battery_data.active[i] = state
+        # group the time steps by state
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.r_[0, np.cumsum(np.bincount(inverse, minlength=len(keys)))]
 
-        elif tpe == DeviceType.ShuntDevice:
-            nc.shunt_data.active[i] = state
+        for s, key in enumerate(keys):
+            steps = order[bounds[s]:bounds[s + 1]]
 
-        elif tpe == DeviceType.LoadDevice:
-            nc.load_data.active[i] = state
+            state = cache.get(key, None)
+            if state is None:
+                state = AdequacyState(data=data, br_up=br_up[steps[0], :], gen_up=gen_up[steps[0], :],
+                                      compute_flows=compute_overloads)
+                n_solved += 1
+                if len(cache) < max_cached_states:
+                    cache[key] = state
 
-        else:
-            pass
+            bus_shed, overloads = state.evaluate(data=data, steps=steps)
+
+            hours = data.step_hours[steps]
+            shed = bus_shed.sum(axis=1)
+            lol_hours[y] += hours[shed > 1e-6].sum()
+            ens[y] += shed @ hours
+            bus_ens += hours @ bus_shed
 
-        # compile the grid information
-        calculation_islands = nc.split_into_islands()
+            if overloads is not None:
+                branch_overload_hours += hours @ overloads
+
+    return lol_hours, ens, bus_ens, branch_overload_hours, n_distinct, n_solved
 
 
 class ReliabilityStudy(DriverTemplate):
+    """
+    Sequential Monte Carlo adequacy study
+    """
+    tpe = SimulationTypes.Reliability_run
+    name = tpe.value
 
-    def __init__(self, circuit: MultiCircuit, pf_options: PowerFlowOptions):
+    def __init__(self, grid: MultiCircuit, options: Union[ReliabilityOptions, None] = None):
         """
-        ContinuationPowerFlowDriver constructor
-        @param circuit: NumericalCircuit instance
-        @param pf_options: power flow options instance
+        ReliabilityStudy constructor
+        :param grid: MultiCircuit instance
+        :param options: ReliabilityOptions
         """
-        DriverTemplate.__init__(self, grid=circuit)
-
-        # voltage stability options
-        self.pf_options = pf_options
-
-        self.results = list()
+        DriverTemplate.__init__(self, grid=grid)
 
-        self.__cancel__ = False
+        self.options = options if options is not None else ReliabilityOptions()
 
-    def progress_callback(self, lmbda: float):
-        """
-        Send progress report
-        :param lmbda: lambda value
-        :return: None
-        """
-        self.report_text('Running voltage collapse lambda:' + "{0:.2f}".format(lmbda) + '...')
+        self.results: Union[ReliabilityResults, None] = None
 
     def run(self):
         """
-        run the voltage collapse simulation
-        @return:
+        Run the sequential Monte Carlo simulation.
+        The years are simulated in rounds of batches (one batch per worker) until
+        the coefficient of variation of the EENS is below the tolerance or the maximum
+        number of years is reached
         """
         self.tic()
 
-        # compile the numerical circuit
-        numerical_circuit = compile_numerical_circuit_at(self.grid, t_idx=None, logger=self.logger)
-
-        evt = get_reliability_scenario(numerical_circuit,
-                                       horizon=1)
-
-        run_events(nc=numerical_circuit, events_list=evt)
+        nc = compile_numerical_circuit_at(self.grid, t_idx=None, logger=self.logger)
+        data = get_adequacy_data(grid=self.grid, nc=nc, horizon=self.options.horizon)
+
+        self.results = ReliabilityResults(nbus=nc.nbus,
+                                          nbr=nc.nbr,
+                                          bus_names=nc.bus_data.names,
+                                          branch_names=nc.branch_data.names,
+                                          confidence=self.options.confidence)
+
+        n_workers = max(1, self.options.n_workers)
+        batch_size = max(1, self.options.years_per_batch)
+        seed_sequence = np.random.SeedSequence(self.options.seed)
+        executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+
+        try:
+            while self.results.n_years < self.options.max_years and not self.is_cancel():
+
+                remaining = self.options.max_years - self.results.n_years
+                sizes = list()
+                while remaining > 0 and len(sizes) < n_workers:
+                    sizes.append(min(batch_size, remaining))
+                    remaining -= sizes[-1]
+
+                seeds = seed_sequence.spawn(len(sizes))
+
+                if executor is None:
+                    batches = [simulate_years(data, n, seed, self.options.compute_overloads,
+                                              self.options.max_cached_states)
+                               for n, seed in zip(sizes, seeds)]
+                else:
+                    batches = list(executor.map(simulate_years,
+                                                [data] * len(sizes), sizes, seeds,
+                                                [self.options.compute_overloads] * len(sizes),
+                                                [self.options.max_cached_states] * len(sizes)))
+
+                for lol_hours, ens, bus_ens, branch_overload_hours, n_distinct, n_solved in batches:
+                    self.results.append_years(lol_hours=lol_hours, ens=ens, bus_ens=bus_ens,
+                                              branch_overload_hours=branch_overload_hours)
+                    self.results.n_distinct_states += n_distinct
+                    self.results.n_solved_states += n_solved
+
+                cov = get_coefficient_of_variation(self.results.ens)
+                self.report_progress2(self.results.n_years, self.options.max_years)
+                self.report_text(f"Reliability: {self.results.n_years} years, "
+                                 f"LOLE {self.results.lole:.3f} h/year, EENS {self.results.eens:.3f} MWh/year")
+
+                # without any loss of load the estimate cannot converge, so the maximum number of years is simulated
+                if self.results.n_years >= self.options.min_years and cov < self.options.tolerance:
+                    self.results.converged = True
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         self.toc()
-
-    def cancel(self):
-        self.__cancel__ = True
-
-
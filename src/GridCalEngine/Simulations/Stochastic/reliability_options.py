@@ -0,0 +1,80 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+from GridCalEngine.Simulations.options_template import OptionsTemplate
+
+
+class ReliabilityOptions(OptionsTemplate):
+    """
+    Sequential Monte Carlo adequacy options
+    """
+
+    def __init__(self,
+                 max_years: int = 1000,
+                 min_years: int = 20,
+                 tolerance: float = 0.05,
+                 confidence: float = 0.95,
+                 years_per_batch: int = 10,
+                 n_workers: int = 1,
+                 seed: int = 0,
+                 horizon: float = 8760.0,
+                 compute_overloads: bool = True,
+                 max_cached_states: int = 20000):
+        """
+        ReliabilityOptions
+        :param max_years: maximum number of simulated years
+        :param min_years: minimum number of simulated years before checking the convergence
+        :param tolerance: convergence tolerance of the coefficient of variation of the EENS estimate
+        :param confidence: confidence level of the reported intervals (i.e. 0.95)
+        :param years_per_batch: number of years simulated by every batch (by every worker process)
+        :param n_workers: number of worker processes, 1 to simulate in this process
+        :param seed: random seed, the same seed reproduces the same results
+        :param horizon: length of the year in hours when the grid has no time series
+        :param compute_overloads: compute the DC power flows of the states to count the branch overloads
+        :param max_cached_states: maximum number of solved system states kept by every batch
+        """
+        OptionsTemplate.__init__(self, name="ReliabilityOptions")
+
+        self.max_years = max_years
+
+        self.min_years = min_years
+
+        self.tolerance = tolerance
+
+        self.confidence = confidence
+
+        self.years_per_batch = years_per_batch
+
+        self.n_workers = n_workers
+
+        self.seed = seed
+
+        self.horizon = horizon
+
+        self.compute_overloads = compute_overloads
+
+        self.max_cached_states = max_cached_states
+
+        self.register(key="max_years", tpe=int)
+        self.register(key="min_years", tpe=int)
+        self.register(key="tolerance", tpe=float)
+        self.register(key="confidence", tpe=float)
+        self.register(key="years_per_batch", tpe=int)
+        self.register(key="n_workers", tpe=int)
+        self.register(key="seed", tpe=int)
+        self.register(key="horizon", tpe=float)
+        self.register(key="compute_overloads", tpe=bool)
+        self.register(key="max_cached_states", tpe=int)
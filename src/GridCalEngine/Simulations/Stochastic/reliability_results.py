@@ -0,0 +1,221 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import numpy as np
+from typing import Tuple
+from scipy.stats import norm
+from GridCalEngine.Simulations.results_table import ResultsTable
+from GridCalEngine.Simulations.results_template import ResultsTemplate
+from GridCalEngine.basic_structures import Vec, Mat, StrVec
+from GridCalEngine.enumerations import StudyResultsType, ResultTypes, DeviceType
+
+
+def get_confidence_interval(samples: Vec, confidence: float = 0.95) -> Tuple[float, float, float]:
+    """
+    Get the mean of the yearly samples and its confidence interval (normal approximation)
+    :param samples: yearly samples
+    :param confidence: confidence level (i.e. 0.95)
+    :return: mean, lower bound, upper bound
+    """
+    n = len(samples)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+
+    mean = float(np.mean(samples))
+
+    if n > 1:
+        half_width = norm.ppf(0.5 + confidence / 2.0) * float(np.std(samples, ddof=1)) / np.sqrt(n)
+    else:
+        half_width = 0.0
+
+    return mean, mean - half_width, mean + half_width
+
+
+def get_coefficient_of_variation(samples: Vec) -> float:
+    """
+    Get the coefficient of variation of the mean estimate of the yearly samples,
+    this is the usual convergence criterion of the Monte Carlo adequacy studies
+    :param samples: yearly samples
+    :return: std(mean) / mean, inf if the mean is zero
+    """
+    n = len(samples)
+    mean = np.mean(samples) if n > 0 else 0.0
+
+    if n < 2 or mean == 0.0:
+        return np.inf
+
+    return float(np.std(samples, ddof=1) / np.sqrt(n) / mean)
+
+
+class ReliabilityResults(ResultsTemplate):
+    """
+    Sequential Monte Carlo adequacy results
+    """
+
+    def __init__(self, nbus: int, nbr: int, bus_names: StrVec, branch_names: StrVec, confidence: float = 0.95):
+        """
+        ReliabilityResults
+        :param nbus: number of buses
+        :param nbr: number of branches
+        :param bus_names: bus names
+        :param branch_names: branch names
+        :param confidence: confidence level of the intervals
+        """
+        ResultsTemplate.__init__(self,
+                                 name='Reliability',
+                                 available_results={
+                                     ResultTypes.ReportsResults: [ResultTypes.ReliabilityIndices,
+                                                                  ResultTypes.ReliabilityConvergence],
+                                     ResultTypes.BusResults: [ResultTypes.LoadShedding],
+                                     ResultTypes.BranchResults: [ResultTypes.BranchOverloads]
+                                 },
+                                 time_array=None,
+                                 clustering_results=None,
+                                 study_results_type=StudyResultsType.Reliability)
+
+        self.bus_names = bus_names
+        self.branch_names = branch_names
+        self.confidence = confidence
+
+        # yearly samples
+        self.lol_hours: Vec = np.zeros(0)  # loss of load hours of every simulated year (h)
+        self.ens: Vec = np.zeros(0)  # energy not supplied of every simulated year (MWh)
+
+        # expected values per year
+        self.bus_eens: Vec = np.zeros(nbus)  # expected energy not supplied per bus (MWh/year)
+        self.branch_overload_hours: Vec = np.zeros(nbr)  # expected overload hours per branch (h/year)
+
+        # convergence history: simulated years, LOLE, EENS, coefficient of variation of the EENS
+        self.convergence: Mat = np.zeros((0, 4))
+
+        self.n_distinct_states = 0
+        self.n_solved_states = 0
+        self.converged = False
+
+        self.register(name='bus_names', tpe=StrVec)
+        self.register(name='branch_names', tpe=StrVec)
+        self.register(name='lol_hours', tpe=Vec)
+        self.register(name='ens', tpe=Vec)
+        self.register(name='bus_eens', tpe=Vec)
+        self.register(name='branch_overload_hours', tpe=Vec)
+        self.register(name='convergence', tpe=Mat)
+
+    @property
+    def n_years(self) -> int:
+        """
+        Number of simulated years
+        :return: int
+        """
+        return len(self.ens)
+
+    @property
+    def lole(self) -> float:
+        """
+        Loss of load expectation (h/year)
+        :return: float
+        """
+        return float(np.mean(self.lol_hours)) if self.n_years else 0.0
+
+    @property
+    def eens(self) -> float:
+        """
+        Expected energy not supplied (MWh/year)
+        :return: float
+        """
+        return float(np.mean(self.ens)) if self.n_years else 0.0
+
+    def get_lole_interval(self) -> Tuple[float, float, float]:
+        """
+        LOLE and its confidence interval
+        :return: mean, lower bound, upper bound (h/year)
+        """
+        return get_confidence_interval(self.lol_hours, self.confidence)
+
+    def get_eens_interval(self) -> Tuple[float, float, float]:
+        """
+        EENS and its confidence interval
+        :return: mean, lower bound, upper bound (MWh/year)
+        """
+        return get_confidence_interval(self.ens, self.confidence)
+
+    def append_years(self, lol_hours: Vec, ens: Vec, bus_ens: Vec, branch_overload_hours: Vec) -> None:
+        """
+        Append the results of a batch of simulated years
+        :param lol_hours: loss of load hours of every year of the batch
+        :param ens: energy not supplied of every year of the batch
+        :param bus_ens: energy not supplied per bus, summed over the years of the batch
+        :param branch_overload_hours: overload hours per branch, summed over the years of the batch
+        """
+        n0 = self.n_years
+        n1 = n0 + len(ens)
+
+        # the expected values are running means over the years
+        self.bus_eens = (self.bus_eens * n0 + bus_ens) / n1
+        self.branch_overload_hours = (self.branch_overload_hours * n0 + branch_overload_hours) / n1
+
+        self.lol_hours = np.r_[self.lol_hours, lol_hours]
+        self.ens = np.r_[self.ens, ens]
+
+        self.convergence = np.r_[self.convergence, [[n1, self.lole, self.eens,
+                                                      get_coefficient_of_variation(self.ens)]]]
+
+    def mdl(self, result_type: ResultTypes) -> ResultsTable:
+        """
+        Get the results table
+        :param result_type: ResultTypes
+        :return: ResultsTable
+        """
+        if result_type == ResultTypes.ReliabilityIndices:
+            lole = self.get_lole_interval()
+            eens = self.get_eens_interval()
+            return ResultsTable(data=np.array([lole, eens]),
+                                index=np.array(['LOLE (h/year)', 'EENS (MWh/year)']),
+                                columns=np.array(['Expected value',
+                                                  f'Lower bound ({self.confidence * 100:.0f}%)',
+                                                  f'Upper bound ({self.confidence * 100:.0f}%)']),
+                                title=result_type.value,
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.NoDevice)
+
+        elif result_type == ResultTypes.ReliabilityConvergence:
+            return ResultsTable(data=self.convergence[:, 1:],
+                                index=self.convergence[:, 0].astype(int),
+                                columns=np.array(['LOLE (h/year)', 'EENS (MWh/year)', 'EENS coefficient of variation']),
+                                title=result_type.value,
+                                xlabel='Simulated years',
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.NoDevice)
+
+        elif result_type == ResultTypes.LoadShedding:
+            return ResultsTable(data=self.bus_eens.reshape(-1, 1),
+                                index=self.bus_names,
+                                columns=np.array(['EENS']),
+                                title=result_type.value,
+                                units='(MWh/year)',
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.BusDevice)
+
+        elif result_type == ResultTypes.BranchOverloads:
+            return ResultsTable(data=self.branch_overload_hours.reshape(-1, 1),
+                                index=self.branch_names,
+                                columns=np.array(['Overload hours']),
+                                title=result_type.value,
+                                units='(h/year)',
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.BranchDevice)
+
+        else:
+            raise Exception('Result type not understood:' + str(result_type))
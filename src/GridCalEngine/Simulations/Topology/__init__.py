@@ -18,3 +18,6 @@
 from GridCalEngine.Simulations.Topology.topology_reduction_driver import TopologyReduction, TopologyReductionOptions, DeleteAndReduce
 from GridCalEngine.Simulations.Topology.node_groups_driver import NodeGroupsDriver
 from GridCalEngine.Simulations.Topology.topology_processor_driver import TopologyProcessorDriver
+from GridCalEngine.Simulations.Topology.network_equivalent_driver import (NetworkEquivalentDriver, NetworkEquivalentOptions,
+                                                                         NetworkEquivalentResults,
+                                                                         build_network_equivalent)
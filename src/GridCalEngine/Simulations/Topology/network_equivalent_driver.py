@@ -0,0 +1,494 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+Network equivalents of an external set of buses.
+The external buses are eliminated by Kron reduction of the admittance matrix (or of the DC susceptance matrix),
+which only fills in the block of the boundary buses (the retained buses connected to the external ones).
+The fill-in is exported as equivalent branches and shunts, and the external injections of the base case
+are reallocated to the boundary buses (Ward), or aggregated into an equivalent generator connected through a
+zero power balance network (REI), so that the equivalent reproduces the base case exactly.
+"""
+from __future__ import annotations
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from typing import List, Tuple, Union
+from GridCalEngine.Devices.multi_circuit import MultiCircuit
+from GridCalEngine.Devices.Substation.bus import Bus
+from GridCalEngine.Devices.Branches.line import Line
+from GridCalEngine.Devices.Injections.shunt import Shunt
+from GridCalEngine.Devices.Injections.generator import Generator
+from GridCalEngine.Devices.Injections.static_generator import StaticGenerator
+from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at
+from GridCalEngine.Simulations.PowerFlow.power_flow_driver import PowerFlowDriver
+from GridCalEngine.Simulations.PowerFlow.power_flow_options import PowerFlowOptions
+from GridCalEngine.Simulations.driver_template import DriverTemplate
+from GridCalEngine.Simulations.options_template import OptionsTemplate
+from GridCalEngine.Simulations.results_table import ResultsTable
+from GridCalEngine.Simulations.results_template import ResultsTemplate
+from GridCalEngine.basic_structures import Vec, IntVec, CxVec, CxMat, BoolVec, StrVec, Logger
+from GridCalEngine.enumerations import (SimulationTypes, StudyResultsType, ResultTypes, DeviceType, SolverType,
+                                        NetworkEquivalentMethod)
+
+
+def get_boundary_buses(Y: sp.csc_matrix, external: IntVec) -> IntVec:
+    """
+    Get the retained buses connected to the external buses
+    :param Y: admittance (or susceptance) matrix
+    :param external: external bus indices
+    :return: boundary bus indices (sorted)
+    """
+    is_external = np.zeros(Y.shape[0], dtype=bool)
+    is_external[external] = True
+    rows = sp.csc_matrix(Y)[:, external].tocoo().row
+    return np.unique(rows[~is_external[rows]])
+
+
+def kron_reduction(Y: sp.csc_matrix, I: Union[CxVec, Vec], keep: IntVec, eliminate: IntVec) -> Tuple[CxMat, CxVec]:
+    """
+    Kron reduction of a set of buses, with the Ward reallocation of their current injections:
+        Y_eq = Y_kk - Y_ke · Y_ee^-1 · Y_ek
+        I_eq = - Y_ke · Y_ee^-1 · I_e
+    :param Y: admittance matrix (complex), or susceptance matrix (real) for the DC equivalent
+    :param I: current injections (complex), or power injections (real) for the DC equivalent
+    :param keep: indices of the buses connected to the eliminated ones (only their block is filled in)
+    :param eliminate: indices of the buses to eliminate
+    :return: dense equivalent matrix of the kept buses, injections reallocated to the kept buses
+    """
+    Y = sp.csc_matrix(Y)
+    Y_ee = Y[eliminate, :][:, eliminate].tocsc()
+    Y_ek = Y[eliminate, :][:, keep].toarray()
+    Y_ke = Y[keep, :][:, eliminate].tocsr()
+
+    lu = splu(Y_ee)
+    Y_eq = Y[keep, :][:, keep].toarray() - Y_ke @ lu.solve(Y_ek)
+    I_eq = - Y_ke @ lu.solve(np.asarray(I[eliminate], dtype=Y_ee.dtype))
+
+    return Y_eq, I_eq
+
+
+def get_equivalent_elements(D: CxMat, threshold: float = 1e-6) -> Tuple[IntVec, IntVec, CxVec, CxVec]:
+    """
+    Decompose the admittance fill-in of a set of buses into series branches and shunts
+    :param D: dense admittance (or susceptance) fill-in among the buses
+    :param threshold: series admittances below this value (p.u.) are dropped
+    :return: from and to positions of the branches, series admittances, shunt admittance per bus
+    """
+    n = D.shape[0]
+    f, t = np.triu_indices(n, k=1)
+    y = - 0.5 * (D[f, t] + D[t, f])  # the asymmetry of phase shifters is averaged
+
+    y_bus = np.zeros((n, n), dtype=D.dtype)
+    y_bus[f, t] = y
+    y_bus[t, f] = y
+    y_sh = np.diag(D) - y_bus.sum(axis=1)  # the dropped branches are removed with their diagonal terms
+
+    idx = np.where(np.abs(y) > threshold)[0]
+
+    return f[idx], t[idx], y[idx], y_sh
+
+
+def add_zero_power_balance_network(Y: sp.csc_matrix, V: CxVec, I: CxVec, gen_buses: IntVec,
+                                   load_buses: IntVec) -> Tuple[sp.csc_matrix, CxVec, complex]:
+    """
+    REI transformation of the external injections:
+    the injections of the external load buses are turned into constant admittances, and the injections of the
+    external generator buses are moved to a single REI bus through a zero power balance network, which connects
+    every generator bus to a grounded bus G (V=0), and G to the REI bus.
+    :param Y: admittance matrix
+    :param V: base case voltages
+    :param I: base case current injections
+    :param gen_buses: external generator bus indices
+    :param load_buses: rest of the external bus indices
+    :return: admittance matrix augmented with the buses G (n) and REI (n + 1), REI bus voltage, REI bus current
+    """
+    n = Y.shape[0]
+
+    # the loads as admittances: -V·conj(y·V) = S
+    y_load = np.zeros(n + 2, dtype=complex)
+    y_load[load_buses] = - I[load_buses] / V[load_buses]
+
+    # zero power balance network: the generator buses inject their current into G, and the REI bus takes it out
+    I_rei = I[gen_buses].sum()
+    S_rei = (V[gen_buses] * np.conj(I[gen_buses])).sum()
+    V_rei = S_rei / np.conj(I_rei)
+    y_g = - I[gen_buses] / V[gen_buses]
+    y_rei = I_rei / V_rei
+
+    g = n
+    r = n + 1
+    rows = np.r_[gen_buses, np.full(len(gen_buses), g), gen_buses, np.full(len(gen_buses), g), g, r, g, r]
+    cols = np.r_[gen_buses, np.full(len(gen_buses), g), np.full(len(gen_buses), g), gen_buses, g, r, r, g]
+    vals = np.r_[y_g, y_g, -y_g, -y_g, y_rei, y_rei, -y_rei, -y_rei]
+
+    Y_aug = sp.block_diag((Y, sp.csc_matrix((2, 2), dtype=complex))).tocsc()
+    Y_aug = Y_aug + sp.csc_matrix((vals, (rows, cols)), shape=(n + 2, n + 2)) + sp.diags(y_load)
+
+    return Y_aug.tocsc(), V_rei, I_rei
+
+
+def build_network_equivalent(grid: MultiCircuit,
+                             external: IntVec,
+                             V: CxVec,
+                             method: NetworkEquivalentMethod = NetworkEquivalentMethod.Ward,
+                             threshold: float = 1e-6,
+                             logger: Logger = Logger()) -> Tuple[MultiCircuit, IntVec, List[str]]:
+    """
+    Build the equivalent of a grid where a set of external buses is replaced by equivalent devices
+    connected to the boundary buses. The HVDC lines with an end at an external bus are removed.
+    :param grid: MultiCircuit (not modified)
+    :param external: indices of the external buses
+    :param V: base case voltages (p.u.), for the PTDF method only their angles are used (DC base case)
+    :param method: NetworkEquivalentMethod
+    :param threshold: equivalent series admittances below this value (p.u.) are not exported
+    :param logger: Logger
+    :return: equivalent MultiCircuit, boundary bus indices in the original grid,
+             idtags of the devices added to the equivalent
+    """
+    external = np.sort(np.asarray(external, dtype=int))
+    nc = compile_numerical_circuit_at(grid, t_idx=None, logger=logger)
+    n = nc.nbus
+
+    retained = np.setdiff1d(np.arange(n), external)
+    retained_pos = np.full(n, -1, dtype=int)
+    retained_pos[retained] = np.arange(len(retained))
+
+    if method == NetworkEquivalentMethod.PTDF:
+        Y = sp.csc_matrix(nc.Bbus)
+        I = Y @ np.angle(V)
+    else:
+        Y = nc.Ybus
+        I = Y @ V
+
+    boundary = get_boundary_buses(Y, external)
+    keep = boundary
+    eliminate = external
+    V_rei = 0j
+    I_rei = 0j
+
+    if method == NetworkEquivalentMethod.REI:
+        is_gen = np.zeros(n, dtype=bool)
+        is_gen[np.r_[nc.vd, nc.pv]] = True
+        gen_buses = external[is_gen[external]]
+        if len(gen_buses):
+            Y, V_rei, I_rei = add_zero_power_balance_network(Y=Y, V=V, I=I, gen_buses=gen_buses,
+                                                             load_buses=external[~is_gen[external]])
+            keep = np.r_[boundary, n + 1]
+            eliminate = np.r_[external, n]
+            I = np.zeros(n + 2, dtype=complex)  # every external injection is in the augmented network
+        else:
+            logger.add_warning('There are no generators in the external grid, the REI equivalent is a Ward one')
+
+    Y_eq, I_eq = kron_reduction(Y=Y, I=I, keep=keep, eliminate=eliminate)
+
+    # retained grid -------------------------------------------------------------------------------------------------
+    eq_grid = grid.fast_copy(include_diagrams=False)
+    eq_grid.name = grid.name + ' equivalent'
+    buses = list(eq_grid.get_buses())
+    for i in external:
+        eq_grid.delete_bus(buses[i], delete_associated=True)
+    buses = eq_grid.get_buses()
+
+    eq_buses = [buses[retained_pos[i]] for i in boundary]
+    if len(keep) > len(boundary):
+        rei_bus = Bus(name='REI equivalent', Vnom=eq_buses[0].Vnom if len(eq_buses) else 1.0)
+        eq_grid.add_bus(rei_bus)
+        eq_buses.append(rei_bus)
+
+    nc_red = compile_numerical_circuit_at(eq_grid, t_idx=None, logger=logger)
+    Y_red = sp.csc_matrix(nc_red.Bbus if method == NetworkEquivalentMethod.PTDF else nc_red.Ybus)
+    pos = [eq_grid.get_buses().index(bus) for bus in eq_buses]
+    D = Y_eq - Y_red[pos, :][:, pos].toarray()
+
+    # equivalent devices -------------------------------------------------------------------------------------------
+    added = list()
+    Sbase = grid.Sbase
+    f, t, y, y_sh = get_equivalent_elements(D=D, threshold=threshold)
+    for k, (i, j) in enumerate(zip(f, t)):
+        if method == NetworkEquivalentMethod.PTDF:
+            r, x = 0.0, 1.0 / y[k]
+        else:
+            z = 1.0 / y[k]
+            r, x = z.real, z.imag
+        elm = Line(bus_from=eq_buses[i], bus_to=eq_buses[j], name=f'Equivalent {eq_buses[i].name}-{eq_buses[j].name}',
+                   r=r, x=x, b=0.0, rate=9999.0)
+        eq_grid.add_line(elm, logger=logger)
+        added.append(elm.idtag)
+
+    if method != NetworkEquivalentMethod.PTDF:
+        for i, ysh in enumerate(y_sh):
+            if abs(ysh) > threshold:
+                elm = Shunt(name=f'Equivalent shunt {eq_buses[i].name}', G=ysh.real * Sbase, B=ysh.imag * Sbase)
+                eq_grid.add_shunt(bus=eq_buses[i], api_obj=elm)
+                added.append(elm.idtag)
+
+    # reallocated injections
+    if method == NetworkEquivalentMethod.PTDF:
+        S_eq = I_eq[:len(boundary)].astype(complex)
+    else:
+        S_eq = V[boundary] * np.conj(I_eq[:len(boundary)])
+
+    # the slack is moved to the equivalent generator or to the boundary bus with the largest injection
+    retained_slack = np.any(retained_pos[nc.vd] >= 0)
+    slack = -1 if retained_slack else (len(boundary) if len(keep) > len(boundary) else int(np.argmax(np.abs(S_eq))))
+
+    for i, bus in enumerate(eq_buses[:len(boundary)]):
+        if i == slack:
+            elm = Generator(name=f'Equivalent slack {bus.name}', P=S_eq[i].real * Sbase, vset=np.abs(V[boundary[i]]))
+            eq_grid.add_generator(bus=bus, api_obj=elm)
+            bus.is_slack = True
+            added.append(elm.idtag)
+        elif abs(S_eq[i]) > 0:
+            elm = StaticGenerator(name=f'Equivalent injection {bus.name}', P=S_eq[i].real * Sbase,
+                                  Q=S_eq[i].imag * Sbase)
+            eq_grid.add_static_generator(bus=bus, api_obj=elm)
+            added.append(elm.idtag)
+
+    if len(keep) > len(boundary):
+        S_rei = V_rei * np.conj(I_rei)
+        elm = Generator(name='REI generator', P=S_rei.real * Sbase, vset=np.abs(V_rei))
+        eq_grid.add_generator(bus=eq_buses[-1], api_obj=elm)
+        eq_buses[-1].is_slack = slack == len(boundary)
+        added.append(elm.idtag)
+
+    return eq_grid, boundary, added
+
+
+class NetworkEquivalentOptions(OptionsTemplate):
+    """
+    Network equivalent options
+    """
+
+    def __init__(self,
+                 external_buses_idx: IntVec = None,
+                 method: NetworkEquivalentMethod = NetworkEquivalentMethod.Ward,
+                 threshold: float = 1e-6,
+                 pf_options: PowerFlowOptions = PowerFlowOptions()):
+        """
+        NetworkEquivalentOptions
+        :param external_buses_idx: indices of the buses to replace by the equivalent
+        :param method: NetworkEquivalentMethod
+        :param threshold: equivalent series admittances below this value (p.u.) are not exported
+        :param pf_options: options of the base case power flow (the PTDF method always runs a DC power flow)
+        """
+        OptionsTemplate.__init__(self, name="NetworkEquivalentOptions")
+
+        self.external_buses_idx = (np.zeros(0, dtype=int) if external_buses_idx is None
+                                   else np.asarray(external_buses_idx, dtype=int))
+
+        self.method = method
+
+        self.threshold = threshold
+
+        self.pf_options = pf_options
+
+        self.register(key="external_buses_idx", tpe=IntVec)
+        self.register(key="method", tpe=NetworkEquivalentMethod)
+        self.register(key="threshold", tpe=float)
+        self.register(key="pf_options", tpe=DeviceType.SimulationOptionsDevice)
+
+
+class NetworkEquivalentResults(ResultsTemplate):
+    """
+    Network equivalent results: comparison of the retained grid between the full model and the equivalent
+    """
+
+    def __init__(self, bus_names: StrVec, branch_names: StrVec):
+        """
+        NetworkEquivalentResults
+        :param bus_names: names of the retained buses
+        :param branch_names: names of the retained branches
+        """
+        ResultsTemplate.__init__(self,
+                                 name='Network equivalent',
+                                 available_results={
+                                     ResultTypes.ReportsResults: [ResultTypes.NetworkEquivalentBranchErrors,
+                                                                  ResultTypes.NetworkEquivalentBusErrors]
+                                 },
+                                 time_array=None,
+                                 clustering_results=None,
+                                 study_results_type=StudyResultsType.NetworkEquivalent)
+
+        nbus = len(bus_names)
+        nbr = len(branch_names)
+
+        self.bus_names = bus_names
+        self.branch_names = branch_names
+
+        self.is_boundary_bus: BoolVec = np.zeros(nbus, dtype=bool)
+        self.V_full: CxVec = np.zeros(nbus, dtype=complex)
+        self.V_eq: CxVec = np.zeros(nbus, dtype=complex)
+
+        self.is_boundary_branch: BoolVec = np.zeros(nbr, dtype=bool)
+        self.Sf_full: CxVec = np.zeros(nbr, dtype=complex)  # (MVA)
+        self.Sf_eq: CxVec = np.zeros(nbr, dtype=complex)  # (MVA)
+
+        # equivalent grid
+        self.grid: Union[MultiCircuit, None] = None
+        self.n_equivalent_devices = 0
+
+        self.register(name='bus_names', tpe=StrVec)
+        self.register(name='branch_names', tpe=StrVec)
+        self.register(name='is_boundary_bus', tpe=BoolVec)
+        self.register(name='V_full', tpe=CxVec)
+        self.register(name='V_eq', tpe=CxVec)
+        self.register(name='is_boundary_branch', tpe=BoolVec)
+        self.register(name='Sf_full', tpe=CxVec)
+        self.register(name='Sf_eq', tpe=CxVec)
+        self.register(name='n_equivalent_devices', tpe=int)
+
+    @property
+    def flow_error(self) -> CxVec:
+        """
+        Branch flow error of the equivalent (MVA)
+        """
+        return self.Sf_eq - self.Sf_full
+
+    @property
+    def max_boundary_flow_error(self) -> float:
+        """
+        Largest flow error of the branches connected to the boundary buses (MVA)
+        """
+        err = np.abs(self.flow_error[self.is_boundary_branch])
+        return float(err.max()) if len(err) else 0.0
+
+    def mdl(self, result_type: ResultTypes) -> ResultsTable:
+        """
+        Get the results table
+        :param result_type: ResultTypes
+        :return: ResultsTable
+        """
+        if result_type == ResultTypes.NetworkEquivalentBranchErrors:
+            err = self.flow_error
+            data = np.c_[self.is_boundary_branch,
+                         self.Sf_full.real, self.Sf_eq.real, err.real,
+                         self.Sf_full.imag, self.Sf_eq.imag, err.imag]
+            return ResultsTable(data=data,
+                                index=self.branch_names,
+                                columns=np.array(['Boundary', 'Pf full (MW)', 'Pf equivalent (MW)', 'Pf error (MW)',
+                                                  'Qf full (MVAr)', 'Qf equivalent (MVAr)', 'Qf error (MVAr)']),
+                                title=result_type.value,
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.BranchDevice)
+
+        elif result_type == ResultTypes.NetworkEquivalentBusErrors:
+            vm_full = np.abs(self.V_full)
+            vm_eq = np.abs(self.V_eq)
+            data = np.c_[self.is_boundary_bus, vm_full, vm_eq, vm_eq - vm_full]
+            return ResultsTable(data=data,
+                                index=self.bus_names,
+                                columns=np.array(['Boundary', 'Vm full (p.u.)', 'Vm equivalent (p.u.)',
+                                                  'Vm error (p.u.)']),
+                                title=result_type.value,
+                                cols_device_type=DeviceType.NoDevice,
+                                idx_device_type=DeviceType.BusDevice)
+
+        else:
+            raise Exception('Result type not understood:' + str(result_type))
+
+
+class NetworkEquivalentDriver(DriverTemplate):
+    """
+    Build the equivalent of the external part of a grid and compare it with the full model
+    """
+    tpe = SimulationTypes.NetworkEquivalent_run
+    name = tpe.value
+
+    def __init__(self, grid: MultiCircuit, options: NetworkEquivalentOptions):
+        """
+        NetworkEquivalentDriver constructor
+        :param grid: MultiCircuit instance (not modified)
+        :param options: NetworkEquivalentOptions
+        """
+        DriverTemplate.__init__(self, grid=grid)
+
+        self.options = options
+
+        self.results: Union[NetworkEquivalentResults, None] = None
+
+    def get_steps(self):
+        """
+        Get time steps list of strings
+        """
+        return list()
+
+    def run_power_flow(self, grid: MultiCircuit) -> PowerFlowDriver:
+        """
+        Run the power flow of the base case
+        :param grid: MultiCircuit
+        :return: PowerFlowDriver with its results
+        """
+        if self.options.method == NetworkEquivalentMethod.PTDF:
+            options = PowerFlowOptions(solver_type=SolverType.DC)
+        else:
+            options = self.options.pf_options
+        pf = PowerFlowDriver(grid=grid, options=options)
+        pf.run()
+        return pf
+
+    def run(self):
+        """
+        Run the equivalent
+        """
+        self.tic()
+        self.report_text('Running the base case...')
+        pf_full = self.run_power_flow(self.grid)
+        self.report_progress(25.0)
+
+        self.report_text('Building the equivalent...')
+        eq_grid, boundary, added = build_network_equivalent(grid=self.grid,
+                                                            external=self.options.external_buses_idx,
+                                                            V=pf_full.results.voltage,
+                                                            method=self.options.method,
+                                                            threshold=self.options.threshold,
+                                                            logger=self.logger)
+        self.report_progress(50.0)
+
+        self.report_text('Running the equivalent...')
+        pf_eq = self.run_power_flow(eq_grid)
+        self.report_progress(75.0)
+
+        # compare the retained buses and branches
+        added = set(added)
+        bus_idx = {bus.idtag: i for i, bus in enumerate(self.grid.get_buses())}
+        branch_idx = {br.idtag: i for i, br in enumerate(self.grid.get_branches_wo_hvdc())}
+        eq_buses = [(i, bus) for i, bus in enumerate(eq_grid.get_buses()) if bus.idtag in bus_idx]
+        eq_branches = [(i, br) for i, br in enumerate(eq_grid.get_branches_wo_hvdc()) if br.idtag not in added]
+
+        self.results = NetworkEquivalentResults(bus_names=np.array([bus.name for _, bus in eq_buses]),
+                                                branch_names=np.array([br.name for _, br in eq_branches]))
+        self.results.grid = eq_grid
+        self.results.n_equivalent_devices = len(added)
+
+        i_eq = np.array([i for i, _ in eq_buses], dtype=int)
+        i_full = np.array([bus_idx[bus.idtag] for _, bus in eq_buses], dtype=int)
+        self.results.V_full = pf_full.results.voltage[i_full]
+        self.results.V_eq = pf_eq.results.voltage[i_eq]
+        self.results.is_boundary_bus = np.isin(i_full, boundary)
+
+        k_eq = np.array([i for i, _ in eq_branches], dtype=int)
+        k_full = np.array([branch_idx[br.idtag] for _, br in eq_branches], dtype=int)
+        self.results.Sf_full = pf_full.results.Sf[k_full]
+        self.results.Sf_eq = pf_eq.results.Sf[k_eq]
+        boundary_tags = {self.grid.get_buses()[i].idtag for i in boundary}
+        self.results.is_boundary_branch = np.array([br.bus_from.idtag in boundary_tags or
+                                                    br.bus_to.idtag in boundary_tags for _, br in eq_branches],
+                                                   dtype=bool)
+
+        self.report_progress(100.0)
+        self.toc()
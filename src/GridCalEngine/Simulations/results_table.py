@@ -15,20 +15,71 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
-from typing import Union, List
+from typing import Union, List, Callable, Dict, Tuple, Any
 import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
 from GridCalEngine.enumerations import ResultTypes, DeviceType
-from GridCalEngine.basic_structures import StrVec, Mat, Vec
+from GridCalEngine.basic_structures import StrVec, Mat, Vec, IntVec, StrMat
 from GridCalEngine.Devices.types import ALL_DEV_TYPES
 
 
+def format_value(val: Any, format_string: str) -> str:
+    """
+    Format a results value for display
+    :param val: value
+    :param format_string: format string (i.e. '.6f')
+    :return: string
+    """
+    if isinstance(val, str):
+        return val
+    elif isinstance(val, complex):
+        if val.real != 0 or val.imag != 0:
+            return val.__format__(format_string)
+        else:
+            return '0'
+    else:
+        if val != 0:
+            return val.__format__(format_string)
+        else:
+            return '0'
+
+
+def format_block(block: Mat, format_string: str) -> StrMat:
+    """
+    Format a block of results for display
+    :param block: 2D array of values
+    :param format_string: format string (i.e. '.6f')
+    :return: 2D object array of strings
+    """
+    if block.dtype.kind in 'biuf':
+        # vectorized formatting
+        out = np.char.mod('%' + format_string, block.astype(float)).astype(object)
+        out[block == 0] = '0'
+    else:
+        out = np.empty(block.shape, dtype=object)
+        for i in range(block.shape[0]):
+            for j in range(block.shape[1]):
+                out[i, j] = format_value(block[i, j], format_string)
+
+    return out
+
+
 class ResultsTable:
     """
-    Class to populate a Qt table view with data from the results
+    Class to populate a Qt table view with data from the results.
+    The displayed data is a lazy view over the source array: transposing, sorting, converting to abs
+    or to CDF only record the operation, and the values are computed by blocks when they are displayed.
+    The whole array is only computed when data_c is accessed.
     """
 
+    # size of the blocks computed and formatted at once for display
+    BLOCK_ROWS = 512
+    BLOCK_COLS = 32
+
+    # maximum number of blocks kept in memory
+    MAX_BLOCKS = 256
+
     def __init__(self,
                  data: Union[Mat, Vec],
                  columns: StrVec,
@@ -42,7 +93,8 @@ class ResultsTable:
                  editable=False,
                  palette=None,
                  editable_min_idx: int = -1,
-                 decimals: int = 6):
+                 decimals: int = 6,
+                 transform: Union[Callable[[Mat], Mat], None] = None):
         """
         ResultsTable constructor
         :param data:
@@ -55,19 +107,32 @@ class ResultsTable:
         :param editable:
         :param editable_min_idx:
         :param decimals:
+        :param transform: element-wise function applied lazily to the data (i.e. np.abs),
+                          so that the transformed array is not allocated as a whole
         """
+        # lazy operations over the source data
+        self._transform: Union[Callable[[Mat], Mat], None] = transform
+        self._transposed = False
+        self._cdf = False
+        self._row_idx: Union[IntVec, None] = None
+
+        # computed blocks for display
+        self._blocks: Dict[Tuple[int, int], Mat] = dict()
+        self._strings: Dict[Tuple[int, int], StrMat] = dict()
+        self._cdf_columns: Dict[int, Vec] = dict()
+
         if data.ndim == 1:
             # assert compatible dimensions
             assert len(data) == len(index)
 
-            self.data_c = data.reshape(-1, 1)
+            self._data = data.reshape(-1, 1)
 
         elif data.ndim == 2:
             # assert compatible dimensions
             assert data.shape[0] == len(index)
             assert data.shape[1] == len(columns)
 
-            self.data_c = data
+            self._data = data
         else:
             raise Exception("Unsupported number of dimensions {}".format(data.ndim))
 
@@ -81,7 +146,7 @@ class ResultsTable:
         self.x_label = xlabel
         self.y_label = ylabel
         self.units = units
-        self.r, self.c = self.data_c.shape
+        self.r, self.c = self._data.shape
         self.isDate = False
         if self.r > 0 and self.c > 0:
             if isinstance(self.index_c[0], np.datetime64):
@@ -99,6 +164,160 @@ class ResultsTable:
         self._col_devices = list()
         self._idx_devices = list()
 
+    @property
+    def is_lazy(self) -> bool:
+        """
+        Is there any pending lazy operation over the source data?
+        :return: bool
+        """
+        return (self._transform is not None or self._transposed or self._cdf or self._row_idx is not None)
+
+    @property
+    def data_c(self) -> Mat:
+        """
+        Get the displayed data as a whole, computing the pending lazy operations
+        :return: Mat
+        """
+        if self.is_lazy:
+            self._data = self._compute(rows=slice(None), cols=slice(None))
+            self._reset_lazy()
+
+        return self._data
+
+    @data_c.setter
+    def data_c(self, val: Mat):
+        """
+        Set the displayed data
+        :param val: Mat
+        """
+        self._data = val
+        self._reset_lazy()
+        self.r, self.c = self._data.shape
+
+    def _reset_lazy(self) -> None:
+        """
+        Forget the lazy operations and the computed blocks
+        """
+        self._transform = None
+        self._transposed = False
+        self._cdf = False
+        self._row_idx = None
+        self._cdf_columns.clear()
+        self._clear_blocks()
+
+    def _clear_blocks(self) -> None:
+        """
+        Forget the computed blocks
+        """
+        self._blocks.clear()
+        self._strings.clear()
+
+    def _get_base(self, rows: Union[slice, IntVec], cols: Union[slice, IntVec]) -> Mat:
+        """
+        Get values of the source data, transposed and transformed if needed
+        :param rows: rows (in the displayed orientation)
+        :param cols: columns (in the displayed orientation)
+        :return: 2D array
+        """
+        if self._transposed:
+            block = self._data[cols, :][:, rows].T
+        else:
+            block = self._data[rows, :][:, cols]
+
+        if self._transform is not None:
+            block = self._transform(block)
+
+        return block
+
+    def _get_cdf_column(self, j: int) -> Vec:
+        """
+        Get a sorted column for the CDF display
+        :param j: column index
+        :return: sorted column values
+        """
+        arr = self._cdf_columns.get(j, None)
+
+        if arr is None:
+            arr = np.sort(self._get_base(rows=slice(None), cols=slice(j, j + 1))[:, 0], axis=0)
+            self._cdf_columns[j] = arr
+
+        return arr
+
+    def _compute(self, rows: Union[slice, IntVec], cols: Union[slice, IntVec]) -> Mat:
+        """
+        Compute a block of the displayed data
+        :param rows: displayed rows
+        :param cols: displayed columns
+        :return: 2D array
+        """
+        if self._row_idx is not None:
+            rows = self._row_idx[rows]
+
+        if self._cdf:
+            col_indices = np.arange(self.c)[cols]
+            if len(col_indices):
+                return np.stack([self._get_cdf_column(j) for j in col_indices], axis=1)[rows, :]
+            else:
+                return np.zeros((len(np.arange(self.r)[rows]), 0), dtype=self._data.dtype)
+        else:
+            return self._get_base(rows=rows, cols=cols)
+
+    def _get_block(self, r: int, c: int) -> Tuple[Tuple[int, int], Mat]:
+        """
+        Get the block that contains a cell
+        :param r: row index
+        :param c: column index
+        :return: block key, block
+        """
+        key = (r // self.BLOCK_ROWS, c // self.BLOCK_COLS)
+        block = self._blocks.get(key, None)
+
+        if block is None:
+            if len(self._blocks) >= self.MAX_BLOCKS:
+                self._clear_blocks()
+
+            r0 = key[0] * self.BLOCK_ROWS
+            c0 = key[1] * self.BLOCK_COLS
+            block = self._compute(rows=slice(r0, min(r0 + self.BLOCK_ROWS, self.r)),
+                                  cols=slice(c0, min(c0 + self.BLOCK_COLS, self.c)))
+            self._blocks[key] = block
+
+        return key, block
+
+    def get_value(self, r: int, c: int) -> Any:
+        """
+        Get a displayed value
+        :param r: row index
+        :param c: column index
+        :return: value
+        """
+        key, block = self._get_block(r, c)
+        return block[r % self.BLOCK_ROWS, c % self.BLOCK_COLS]
+
+    def get_string(self, r: int, c: int) -> str:
+        """
+        Get a displayed value formatted as string
+        :param r: row index
+        :param c: column index
+        :return: string
+        """
+        key, block = self._get_block(r, c)
+        strings = self._strings.get(key, None)
+
+        if strings is None:
+            strings = format_block(block, self.format_string)
+            self._strings[key] = strings
+
+        return strings[r % self.BLOCK_ROWS, c % self.BLOCK_COLS]
+
+    def get_column(self, c: int) -> Vec:
+        """
+        Get a displayed column without computing the rest of the data
+        :param c: column index
+        :return: array
+        """
+        return self._compute(rows=slice(None), cols=slice(c, c + 1))[:, 0]
+
     @property
     def col_devices(self):
         """
@@ -133,8 +352,13 @@ class ResultsTable:
         """
         Transpose the results in-place
         """
-        self.data_c = self.data_c.transpose()
-        self.r, self.c = self.data_c.shape
+        if self._cdf or self._row_idx is not None:
+            # the sorted data is not a simple view of the source anymore
+            self._data = self.data_c
+
+        self._transposed = not self._transposed
+        self._clear_blocks()
+        self.r, self.c = self.c, self.r
         self.x_label, self.y_label = self.y_label, self.x_label
         self.cols_c, self.index_c = self.index_c, self.cols_c
         self._col_devices, self._idx_devices = self._idx_devices, self._col_devices
@@ -146,18 +370,21 @@ class ResultsTable:
         :param max_to_min:
         :return:
         """
+        column = self.get_column(c)
         try:
-            sorting_arr = self.data_c[:, c].astype(float)
+            sorting_arr = column.astype(float)
         except ValueError:
             print("Not a float column...")
-            sorting_arr = self.data_c[:, c]
+            sorting_arr = column
 
         if max_to_min:
             idx = sorting_arr.argsort()[::-1]
         else:
             idx = sorting_arr.argsort()
 
-        self.data_c = self.data_c[idx]
+        # compose the rows permutation instead of copying the data
+        self._row_idx = idx if self._row_idx is None else self._row_idx[idx]
+        self._clear_blocks()
         self.index_c = self.index_c[idx]
 
     def slice_cols(self, col_idx) -> "ResultsTable":
@@ -166,7 +393,7 @@ class ResultsTable:
         :param col_idx: indices of the columns
         :return: Nothing
         """
-        sliced_model = ResultsTable(data=self.data_c[:, col_idx],
+        sliced_model = ResultsTable(data=self._compute(rows=slice(None), cols=np.array(col_idx, dtype=int)),
                                     columns=np.array([self.cols_c[i] for i in col_idx]),
                                     index=np.array(self.index_c),
                                     palette=None,
@@ -188,7 +415,7 @@ class ResultsTable:
         :param idx: indices of the columns
         :return: Nothing
         """
-        sliced_model = ResultsTable(data=self.data_c[idx, :],
+        sliced_model = ResultsTable(data=self._compute(rows=np.array(idx, dtype=int), cols=slice(None)),
                                     columns=self.cols_c,
                                     index=np.array([self.index_c[i] for i in idx]),
                                     palette=None,
@@ -211,7 +438,8 @@ class ResultsTable:
         :param col_idx: indices of the columns
         :return: ResultsTable
         """
-        sliced_model = ResultsTable(data=self.data_c[row_idx, :][:, col_idx],
+        sliced_model = ResultsTable(data=self._compute(rows=np.array(row_idx, dtype=int),
+                                                       cols=np.array(col_idx, dtype=int)),
                                     columns=np.array([self.cols_c[i] for i in col_idx]),
                                     index=np.array([self.index_c[i] for i in row_idx]),
                                     palette=None,
@@ -274,7 +502,10 @@ class ResultsTable:
         Is the data complex?
         :return:
         """
-        return self.data_c.dtype == complex
+        if self.r > 0 and self.c > 0:
+            return self._compute(rows=slice(0, 1), cols=slice(0, 1)).dtype == complex
+        else:
+            return self._data.dtype == complex
 
     def get_data(self):
         """
@@ -307,14 +538,17 @@ class ResultsTable:
         """
 
         # calculate the proportional values of samples
-        n = self.data_c.shape[0]
+        n = self.r
         if n > 1:
             self.index_c = np.arange(n, dtype=float) / (n - 1)
         else:
             self.index_c = np.arange(n, dtype=float)
 
-        for i in range(self.data_c.shape[1]):
-            self.data_c[:, i] = np.sort(self.data_c[:, i], axis=0)
+        # the columns are sorted when they are displayed, the order of the rows does not matter anymore
+        self._cdf = True
+        self._row_idx = None
+        self._cdf_columns.clear()
+        self._clear_blocks()
 
         self.x_label = 'Probability of value<=x'
 
@@ -323,10 +557,23 @@ class ResultsTable:
         Convert the data to abs
         :return:
         """
+        if self._cdf:
+            # the abs must be applied before sorting the columns
+            self._data = self.data_c
+
         try:
-            self.data_c = np.abs(self.data_c)
+            np.abs(self._data[:1, :1])
         except TypeError:
             print('Could not convert to abs :/')
+            return
+
+        prev_transform = self._transform
+        if prev_transform is None:
+            self._transform = np.abs
+        else:
+            self._transform = lambda x: np.abs(prev_transform(x))
+
+        self._clear_blocks()
 
     def to_df(self) -> pd.DataFrame:
         """
@@ -404,11 +651,11 @@ class ResultsTable:
         :param stacked: Stack plot?
         :param title: Title of the plot
         """
-        index, columns, data = self.get_data()
+        index = self.index_c
 
         # columns = [columns[device_idx]]
         columns = [self.title] if title == "" else [title]
-        data = data[:, device_idx]
+        data = np.array(self.get_column(device_idx))
 
         if ax is None:
             fig = plt.figure(figsize=(12, 6))
@@ -378,20 +378,23 @@ class ResultsTemplate:
         """
 
         :param grid: MultiCircuit
-        :param data_dict: Dictionary with the info loaded from disk
+        :param data_dict: Dictionary with the info loaded from disk (it may read the arrays lazily)
         :param logger: Logger
         :return:
         """
         self.time_array = grid.get_time_array()
 
-        for arr_name, df in data_dict.items():
+        for key in data_dict.keys():
 
-            is_complex = '__complex__' in arr_name
-            arr_name = arr_name.replace('__complex__', '')
+            is_complex = '__complex__' in key
+            arr_name = key.replace('__complex__', '')
 
             # try to get the property of the saved file
             res_prop: ResultsProperty = self.data_variables.get(arr_name, None)
 
+            # only the arrays that are registered are read
+            df = data_dict[key] if res_prop is not None else None
+
             if df is not None and res_prop is not None:
 
                 # it may be complex...
@@ -83,6 +83,28 @@ def set_var_bounds(var: LpVar, lb: float, ub: float):
         var.lowBound = lb
 
 
+def set_cst_rhs(cst: LpCst, rhs: float):
+    """
+    Modify the right-hand side of a constraint
+    :param cst: LpCst instance to modify
+    :param rhs: right-hand side value
+    """
+    if isinstance(cst, LpCst):
+        cst.changeRHS(rhs)
+
+
+def set_cst_coefficient(cst: LpCst, var: LpVar, value: float):
+    """
+    Modify the coefficient of a variable in a constraint
+    :param cst: LpCst instance to modify
+    :param var: LpVar whose coefficient is changed
+    :param value: coefficient value
+    """
+    if isinstance(cst, LpCst) and isinstance(var, LpVar):
+        cst[var] = value
+        cst.modified = True
+
+
 class LpModel:
     """
     LPModel implementation for PuLP
@@ -154,7 +176,8 @@ class LpModel:
         if isinstance(cst, bool):
             return 0
         else:
-            return self.model.addConstraint(constraint=cst, name=name)
+            self.model.addConstraint(constraint=cst, name=name)
+            return cst
 
     @staticmethod
     def sum(cst) -> LpExp:
@@ -197,19 +220,25 @@ class LpModel:
             raise Exception('PuLP Unsupported MIP solver ' + self.solver_type.value)
 
     def solve(self, robust: bool = False, show_logs: bool = False,
-              progress_text: Callable[[str], None] | None = None) -> int:
+              progress_text: Callable[[str], None] | None = None,
+              warm_start: bool = False) -> int:
         """
         Solve the model
         :param robust: In this interface, this is useless
         :param show_logs: In this interface, this is useless
         :param progress_text: progress function pointer
+        :param warm_start: if the model was solved before with HiGHS, update the solver model in place
+                           and start from the previous basis instead of building it again
         :return:
         """
         if progress_text is not None:
             progress_text(f"Solving model with {self.solver_type.value}...")
 
         # solve the model
-        status = self.model.solve(solver=self.get_solver(show_logs=show_logs))
+        if warm_start and isinstance(self.model.solver, HiGHS) and self.model.solverModel is not None:
+            status = self.model.solver.actualResolve(self.model)
+        else:
+            status = self.model.solve(solver=self.get_solver(show_logs=show_logs))
 
         if status != self.OPTIMAL:
             self.originally_infeasible = True
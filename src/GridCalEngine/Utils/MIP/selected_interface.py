@@ -25,7 +25,8 @@ from GridCalEngine.basic_structures import ObjVec, ObjMat, Vec
 
 # from GridCalEngine.Utils.MIP.SimpleMip import LpExp, LpVar, LpModel, get_available_mip_solvers, set_var_bounds
 # from GridCalEngine.Utils.MIP.ortools_interface import LpExp, LpVar, LpModel, get_available_mip_solvers, set_var_bounds
-from GridCalEngine.Utils.MIP.pulp_interface import LpExp, LpVar, LpModel, get_available_mip_solvers, set_var_bounds
+from GridCalEngine.Utils.MIP.pulp_interface import (LpExp, LpVar, LpCst, LpModel, get_available_mip_solvers,
+                                                    set_var_bounds, set_cst_rhs, set_cst_coefficient)
 
 
 def join(init: str, vals: List[int], sep="_"):
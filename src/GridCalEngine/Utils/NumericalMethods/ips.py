@@ -244,7 +244,8 @@ def interior_point_solver(x0: Vec,
                           pf_init=False,
                           trust=0.9,
                           verbose: int = 0,
-                          step_control=False) -> Tuple[IpsSolution, Vec]:
+                          step_control=False,
+                          warm_start: Union[IpsSolution, None] = None) -> Tuple[IpsSolution, Vec]:
     """
     Solve a non-linear problem of the form:
 
@@ -288,6 +289,8 @@ def interior_point_solver(x0: Vec,
     :param trust: Amount of trust in the initial Newton derivative length estimation
     :param verbose: 0 to 3 (the larger, the more verbose)
     :param step_control: Use step control to improve the solution process control
+    :param warm_start: solution of a previous problem with the same structure (i.e. the previous time step),
+                       its equality multipliers initialize the solver. Ignored if the sizes do not match.
     :return: IpsSolution
     """
 
@@ -330,6 +333,10 @@ def interior_point_solver(x0: Vec,
         z_inv = diags(1.0 / z)
         kk = np.flatnonzero((gamma / z) > z0)
         mu[kk] = gamma / z[kk]
+        if warm_start is not None and len(warm_start.lam) == n_eq:
+            # warm start: re-use the equality multipliers of the previous solution, the inequality
+            # multipliers and slacks are centered again since the previous ones lie on the boundary
+            lam = warm_start.lam.copy()
         mu_diag = diags(mu)
 
     ret, _ = func(x, mu, lam, True, False, *arg)
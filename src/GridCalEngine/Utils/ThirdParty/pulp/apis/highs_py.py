@@ -29,6 +29,7 @@
 # More instructions on: https://www.highs.dev
 from __future__ import annotations
 from math import inf
+import numpy as np
 from typing import Tuple, TYPE_CHECKING
 import GridCalEngine.Utils.ThirdParty.pulp.constants as constants
 from GridCalEngine.Utils.ThirdParty.pulp.apis.lp_solver_cmd import LpSolver
@@ -305,7 +306,7 @@ class HiGHS(LpSolver):
                 var.modified = False
 
             for constraint in lp.constraints.values():
-                constraint.modifier = False
+                constraint.modified = False
 
             lp.assignStatus(status, sol_status)
 
@@ -313,11 +314,75 @@ class HiGHS(LpSolver):
         else:
             raise Exception("HIGHSPY not available")
 
-    def actualResolve(self, lp: LpProblem, **kwargs):
+    def updateSolverModel(self, lp: LpProblem):
+        """
+        Push the current bounds, costs, right-hand sides and the coefficients of the
+        modified constraints into the existing HiGHS model, keeping its basis
+        :param lp:
         """
+        inf = highspy.kHighsInf
+
+        obj_mult = -1 if lp.sense == constants.LpMaximize else 1
+
+        variables = lp.variables()
+        n_col = len(variables)
+        col_idx = np.empty(n_col, dtype=np.int32)
+        col_lb = np.empty(n_col, dtype=float)
+        col_ub = np.empty(n_col, dtype=float)
+        col_cost = np.empty(n_col, dtype=float)
+        for i, var in enumerate(variables):
+            col_idx[i] = var.index
+            col_lb[i] = -inf if var.lowBound is None else var.lowBound
+            col_ub[i] = inf if var.upBound is None else var.upBound
+            col_cost[i] = obj_mult * lp.objective.get(var, 0.0)
+
+        lp.solverModel.changeColsBounds(n_col, col_idx, col_lb, col_ub)
+        lp.solverModel.changeColsCost(n_col, col_idx, col_cost)
+
+        n_row = len(lp.constraints)
+        row_idx = np.arange(n_row, dtype=np.int32)
+        row_lb = np.empty(n_row, dtype=float)
+        row_ub = np.empty(n_row, dtype=float)
+        for i, constraint in enumerate(lp.constraints.values()):
+            lb = constraint.getLb()
+            ub = constraint.getUb()
+            row_lb[i] = -inf if lb is None else lb
+            row_ub[i] = inf if ub is None else ub
+
+            if constraint.modified:
+                for var, coefficient in constraint.items():
+                    lp.solverModel.changeCoeff(i, var.index, coefficient)
+
+        lp.solverModel.changeRowsBounds(n_row, row_idx, row_lb, row_ub)
 
+    def actualResolve(self, lp: LpProblem, **kwargs):
+        """
+        Solve again a problem that was solved before with this solver,
+        updating the HiGHS model in place so that the previous basis is used as starting point.
+        If variables or constraints were added since, the model is built from scratch.
         :param lp:
         :param kwargs:
         :return:
         """
-        raise constants.PulpSolverError("HiGHS: Resolving is not supported")
+        if HIGHSPY_AVAILABLE:
+            if (lp.solverModel is None
+                    or lp.solverModel.getNumCol() != lp.numVariables()
+                    or lp.solverModel.getNumRow() != lp.numConstraints()):
+                return self.actualSolve(lp)
+
+            self.updateSolverModel(lp)
+            self.callSolver(lp)
+
+            status, sol_status = self.findSolutionValues(lp)
+
+            for var in lp.variables():
+                var.modified = False
+
+            for constraint in lp.constraints.values():
+                constraint.modified = False
+
+            lp.assignStatus(status, sol_status)
+
+            return status
+        else:
+            raise Exception("HIGHSPY not available")
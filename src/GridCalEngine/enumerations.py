@@ -85,6 +85,28 @@ class CpfParametrization(Enum):
     PseudoArcLength = 'Pseudo Arc Length'
 
 
+class NetworkEquivalentMethod(Enum):
+    """
+    Methods to build an equivalent of the external network
+    """
+    Ward = 'Ward (Kron)'
+    REI = 'REI'
+    PTDF = 'PTDF preserving DC'
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return str(self)
+
+    @staticmethod
+    def argparse(s):
+        try:
+            return NetworkEquivalentMethod[s]
+        except KeyError:
+            return s
+
+
 class ExternalGridMode(Enum):
     """
     Modes of operation of external grids
@@ -1199,6 +1221,7 @@ class StudyResultsType(Enum):
     ContingencyAnalysis = 'ContingencyAnalysis'
     ContingencyAnalysisTimeSeries = 'ContingencyAnalysisTimeSeries'
     SigmaAnalysis = 'SigmaAnalysis'
+    SigmaAnalysisTimeSeries = 'SigmaAnalysisTimeSeries'
     LinearAnalysis = 'LinearAnalysis'
     LinearAnalysisTimeSeries = 'LinearAnalysisTimeSeries'
     AvailableTransferCapacity = 'AvailableTransferCapacity'
@@ -1210,6 +1233,9 @@ class StudyResultsType(Enum):
     NetTransferCapacity = 'NetTransferCapacity'
     NetTransferCapacityTimeSeries = 'NetTransferCapacityTimeSeries'
     StochasticPowerFlow = 'StochasticPowerFlow'
+    Reliability = 'Reliability'
+    TransientStabilityScreening = 'TransientStabilityScreening'
+    NetworkEquivalent = 'NetworkEquivalent'
 
     def __str__(self):
         return self.value
@@ -1574,6 +1600,8 @@ class ResultTypes(Enum):
     SigmaImag = 'Sigma imaginary'
     SigmaDistances = 'Sigma distances'
     SigmaPlusDistances = 'Sigma + distances'
+    SigmaDistanceTimeSeries = 'Sigma distance'
+    SigmaWorstBuses = 'Sigma worst buses'
 
     # ATC
     AvailableTransferCapacityMatrix = 'Available transfer capacity'
@@ -1607,6 +1635,18 @@ class ResultTypes(Enum):
     # Clustering
     ClusteringReport = 'Clustering time series report'
 
+    # reliability
+    ReliabilityIndices = 'Reliability indices'
+    ReliabilityConvergence = 'Reliability convergence'
+
+    # transient stability screening
+    TransientStabilityScreeningReport = 'Transient stability screening report'
+    CriticalClearingTimes = 'Critical clearing times'
+
+    # network equivalents
+    NetworkEquivalentBranchErrors = 'Equivalent branch flow errors'
+    NetworkEquivalentBusErrors = 'Equivalent bus voltage errors'
+
     # inputs analysis
     ZoneAnalysis = 'Zone analysis'
     CountryAnalysis = 'Country analysis'
@@ -1737,13 +1777,16 @@ class SimulationTypes(Enum):
     ContinuationPowerFlow_run = 'Voltage collapse'
     LatinHypercube_run = 'Latin Hypercube'
     StochasticPowerFlow = 'Stochastic Power Flow'
+    Reliability_run = 'Reliability'
     Cascade_run = 'Cascade'
     OPF_run = 'Optimal power flow'
     OPF_NTC_run = 'Optimal net transfer capacity'
     OPF_NTC_TS_run = 'Optimal net transfer capacity time series'
     OPFTimeSeries_run = 'Optimal power flow time series'
     TransientStability_run = 'Transient stability'
+    TransientStabilityScreening_run = 'Transient stability screening'
     TopologyReduction_run = 'Topology reduction'
+    NetworkEquivalent_run = 'Network equivalent'
     LinearAnalysis_run = 'Linear analysis'
     LinearAnalysis_TS_run = 'Linear analysis time series'
     NonLinearAnalysis_run = 'Nonlinear analysis'
@@ -1754,6 +1797,7 @@ class SimulationTypes(Enum):
     NetTransferCapacity_run = 'Available transfer capacity'
     NetTransferCapacityTS_run = 'Available transfer capacity time series'
     SigmaAnalysis_run = "Sigma Analysis"
+    SigmaAnalysisTimeSeries_run = "Sigma Analysis time series"
     NodeGrouping_run = "Node groups"
     InputsAnalysis_run = 'Inputs Analysis'
     OptimalNetTransferCapacityTimeSeries_run = 'Optimal net transfer capacity time series'
@@ -1912,3 +1956,38 @@ class SubstationTypes(Enum):
         :return:
         """
         return list(map(lambda c: c.value, cls))
+
+
+class FileCompression(Enum):
+    """
+    Compression of the .gridcal zip file members
+    """
+    Stored = 'Stored'
+    Deflated = 'Deflated'
+    Zstd = 'Zstd'
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self):
+        return str(self)
+
+    @staticmethod
+    def argparse(s):
+        """
+
+        :param s:
+        :return:
+        """
+        try:
+            return FileCompression[s]
+        except KeyError:
+            return s
+
+    @classmethod
+    def list(cls):
+        """
+
+        :return:
+        """
+        return list(map(lambda c: c.value, cls))
@@ -0,0 +1,139 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import scipy.sparse as sp
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.ATC.available_transfer_capacity_driver import (compute_atc_report, get_pruned_lodf,
+                                                                              sort_and_curtail_atc_report)
+
+
+def atc_reference(br_idx, contingency_br_idx, lodf, alpha, flows, rates, contingency_rates, base_exchange,
+                  threshold, time_idx):
+    """
+    Straight forward ATC computation to compare with
+    """
+    results = list()
+    for m in br_idx:
+        if abs(alpha[m]) > threshold:
+            if alpha[m] > 0:
+                atc_n = (rates[m] - flows[m]) / alpha[m]
+            else:
+                atc_n = (-rates[m] - flows[m]) / alpha[m]
+
+            for c in contingency_br_idx:
+                beta = alpha[m] + lodf[m, c] * alpha[c]
+                if m != c and abs(lodf[m, c]) > threshold and abs(beta) > threshold:
+                    contingency_flow = flows[m] + lodf[m, c] * flows[c]
+                    if beta > 0:
+                        atc_mc = (contingency_rates[m] - contingency_flow) / beta
+                    else:
+                        atc_mc = (-contingency_rates[m] - contingency_flow) / beta
+                    final_atc = min(atc_mc, atc_n)
+                    results.append((time_idx, m, c, alpha[m], beta, lodf[m, c], atc_n, atc_mc, final_atc,
+                                    final_atc + base_exchange, flows[m], contingency_flow,
+                                    flows[m] / (rates[m] + 1e-9) * 100.0,
+                                    contingency_flow / (contingency_rates[m] + 1e-9) * 100.0,
+                                    base_exchange))
+    return np.array(results)
+
+
+def test_atc_kernel() -> None:
+    """
+    Check the parallel ATC kernel against a straight forward implementation,
+    with dense and sparse LODF and several time steps per call
+    """
+    np.random.seed(0)
+    nbr = 40
+    nt = 3
+    threshold = 0.05
+    lodf = np.random.uniform(-1, 1, (nbr, nbr))
+    lodf[np.abs(lodf) < 0.5] = 0.0  # make it sparse-ish
+    np.fill_diagonal(lodf, -1.0)
+    alpha = np.random.uniform(-0.5, 0.5, (nt, nbr))
+    flows = np.random.uniform(-100, 100, (nt, nbr))
+    rates = np.full((nt, nbr), 200.0)
+    contingency_rates = np.full((nt, nbr), 250.0)
+    base_exchange = np.array([10.0, 20.0, 30.0])
+    time_idx = np.array([4, 5, 7])
+    br_idx = np.arange(0, nbr, 2)
+    con_br_idx = np.arange(nbr)
+
+    expected = np.concatenate([atc_reference(br_idx, con_br_idx, lodf, alpha[t], flows[t], rates[t],
+                                             contingency_rates[t], base_exchange[t], threshold, time_idx[t])
+                               for t in range(nt)], axis=0)
+
+    for lodf_ in [lodf, sp.csc_matrix(lodf)]:
+        indptr, c_idx, values = get_pruned_lodf(lodf=lodf_, br_idx=br_idx, contingency_br_idx=con_br_idx,
+                                                threshold=threshold)
+
+        report = compute_atc_report(br_idx=br_idx, lodf_indptr=indptr, lodf_c_idx=c_idx, lodf_values=values,
+                                    alpha=alpha, flows=flows, rates=rates, contingency_rates=contingency_rates,
+                                    base_exchange=base_exchange, time_idx=time_idx, threshold=threshold)
+
+        assert report.shape == expected.shape
+        assert np.allclose(report, expected)
+
+    # curtail the report to the 3 most restrictive entries per time step
+    curtailed = sort_and_curtail_atc_report(report=expected, max_report_elements=3)
+    assert curtailed.shape[0] == 3 * nt
+    for t in time_idx:
+        rep_t = curtailed[curtailed[:, 0] == t, :]
+        exp_t = expected[expected[:, 0] == t, :]
+        assert np.allclose(rep_t[:, 9], np.sort(exp_t[:, 9])[:3])
+
+
+def test_atc_time_series() -> None:
+    """
+    Check that the ATC time series driver runs and that its first time step matches the snapshot ATC
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    nbus = grid.get_bus_number()
+    bus_idx_from = np.arange(0, nbus // 2)
+    bus_idx_to = np.arange(nbus // 2, nbus)
+
+    nc = gce.compile_numerical_circuit_at(grid)
+    F = nc.branch_data.F
+    T = nc.branch_data.T
+    inter = np.where(((F < nbus // 2) & (T >= nbus // 2)) | ((F >= nbus // 2) & (T < nbus // 2)))[0]
+    sense = np.where(F[inter] < nbus // 2, 1, -1)
+
+    options = gce.AvailableTransferCapacityOptions(bus_idx_from=bus_idx_from,
+                                                   bus_idx_to=bus_idx_to,
+                                                   idx_br=inter,
+                                                   sense_br=sense,
+                                                   mode=gce.AvailableTransferMode.GenerationAndLoad,
+                                                   time_steps_batch_size=2)
+
+    ts_driver = gce.AvailableTransferCapacityTimeSeriesDriver(grid=grid,
+                                                              options=options,
+                                                              time_indices=grid.get_all_time_indices()[:5])
+    ts_driver.run()
+
+    raw = ts_driver.results.raw_report
+    assert raw.shape[0] > 0
+    assert set(np.unique(raw[:, 0]).astype(int)) <= set(range(5))
+
+    # the time series ATC at t=0 is the snapshot ATC when the snapshot equals the first time step
+    grid.set_state(t=0)
+    driver = gce.AvailableTransferCapacityDriver(grid=grid, options=options)
+    driver.run()
+
+    raw0 = raw[raw[:, 0] == 0, :]
+    assert np.allclose(raw0[:, 9], driver.results.raw_report[:, 9])
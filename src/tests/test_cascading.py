@@ -0,0 +1,78 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.Stochastic.blackout_driver import (IncrementalCascade, CascadingDriver,
+                                                                  simulate_cascades, run_cascades)
+
+
+def test_incremental_cascade_matches_power_flow() -> None:
+    """
+    The incrementally updated islands give the same voltages as a power flow of the grid without the tripped branches
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    options = gce.PowerFlowOptions(control_q=False)  # the reactive limits make the solution path dependent
+
+    nc = gce.compile_numerical_circuit_at(grid)
+    engine = IncrementalCascade(nc=nc, options=options)
+
+    # trip a branch that keeps the grid connected
+    engine.trip([0])
+    engine.solve()
+    assert engine.n_islands == 1
+
+    grid.get_branches_wo_hvdc()[0].active = False
+    pf = gce.PowerFlowDriver(grid=grid, options=options)
+    pf.run()
+
+    assert np.allclose(engine.V, pf.results.voltage, atol=1e-6)
+    assert np.allclose(np.abs(engine.loading), np.abs(pf.results.loading), atol=1e-5)
+
+
+def test_cascades() -> None:
+    """
+    Cascades of several initiating events, in this process and in worker processes
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    options = gce.PowerFlowOptions()
+    nc = gce.compile_numerical_circuit_at(grid)
+
+    events = [np.array([k]) for k in range(0, nc.nbr, 5)]
+    cascades = simulate_cascades(nc=nc, options=options, initiating_events=events)
+    assert len(cascades) == len(events)
+
+    # the circuit given is not modified
+    assert nc.branch_data.active.all()
+
+    for stages, event in zip(cascades, events):
+        assert np.array_equal(stages[0].removed_idx, event)
+        assert stages[-1].loading.dtype == np.float32
+        assert stages[-1].load_shed >= 0.0
+
+    cascades2 = run_cascades(nc=nc, options=options, initiating_events=events, n_workers=2)
+    for stages, stages2 in zip(cascades, cascades2):
+        assert len(stages) == len(stages2)
+        assert np.allclose(stages[-1].Vm, stages2[-1].Vm)
+
+    # the driver step by step
+    driver = CascadingDriver(grid=grid, options=options)
+    for i in range(3):
+        driver.perform_step_run()
+    assert len(driver.get_table()) == 3
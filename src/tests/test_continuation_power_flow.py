@@ -17,6 +17,7 @@
 import os
 from GridCalEngine.api import *
 from GridCalEngine.Utils.zip_file_mgmt import open_data_frame_from_zip
+from GridCalEngine.Simulations.ContinuationPowerFlow.continuation_power_flow import continuation_nr_directions
 
 
 def test_cpf():
@@ -62,5 +63,67 @@ def test_cpf():
     assert np.abs(np.real(vc.results.Sf)[:500] - data.values[:500]).max()
 
 
+def get_ieee39_cpf_arguments():
+    """
+    Arguments of continuation_nr for the IEEE 39 bus grid, departing from its power flow solution
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = FileOpen(fname).open()
+    pf = PowerFlowDriver(grid, PowerFlowOptions(SolverType.NR, control_q=False))
+    pf.run()
+    nc = compile_numerical_circuit_at(grid)
+
+    return dict(Ybus=nc.Ybus, Cf=nc.Cf, Ct=nc.Ct, Yf=nc.Yf, Yt=nc.Yt, branch_rates=nc.branch_rates,
+                Sbase=nc.Sbase, Sbus_base=pf.results.Sbus / nc.Sbase, V=pf.results.voltage,
+                distributed_slack=False, bus_installed_power=nc.bus_installed_power,
+                vd=nc.vd, pv=nc.pv, pq=nc.pq, pqv=nc.pqv, p=nc.p, step=0.01, adapt_step=True,
+                step_min=0.0001, step_max=0.2, original_bus_types=nc.bus_types)
+
+
+def test_cpf_parametrizations_and_factorizations():
+    """
+    The natural and the pseudo arc length parametrizations reach the same nose point, the points of the curve
+    solve the power flow equations, and the Jacobian is not factorized at every corrector iteration
+    """
+    kwargs = get_ieee39_cpf_arguments()
+    Sbus = kwargs['Sbus_base']
+    pvpq = np.r_[kwargs['pv'], kwargs['pq']]
+
+    lmax = list()
+    for order in [CpfParametrization.Natural, CpfParametrization.PseudoArcLength]:
+        res = continuation_nr_directions(Sbus_targets=[2 * Sbus], approximation_order=order, **kwargs)[0]
+        lmax.append(max(res.lmbda))
+
+        for V, lam in zip(res.V, res.lmbda):
+            mis = V * np.conj(kwargs['Ybus'] @ V) - Sbus * (1 + lam)
+            assert np.abs(mis[pvpq].real).max() < 1e-5
+            assert np.abs(mis[kwargs['pq']].imag).max() < 1e-5
+
+    # the pseudo arc length passes the nose
+    assert res.lmbda[-1] < res.lmbda[-2]
+    assert res.n_factorizations < len(res)
+
+    assert abs(lmax[0] - lmax[1]) < 1e-3
+
+
+def test_cpf_directions_in_parallel():
+    """
+    The transfer directions run in worker processes give the same curves as when run in this process
+    """
+    kwargs = get_ieee39_cpf_arguments()
+    Sbus = kwargs['Sbus_base']
+    targets = [2 * Sbus, Sbus + 0.5 * Sbus.real, Sbus + 0.5 * 1j * Sbus.imag]
+
+    serial = continuation_nr_directions(Sbus_targets=targets, n_workers=1,
+                                        approximation_order=CpfParametrization.PseudoArcLength, **kwargs)
+    pool = continuation_nr_directions(Sbus_targets=targets, n_workers=2,
+                                      approximation_order=CpfParametrization.PseudoArcLength, **kwargs)
+
+    assert len(serial) == len(pool) == 3
+    for a, b in zip(serial, pool):
+        assert np.allclose(a.lmbda, b.lmbda)
+        assert np.allclose(np.array(a.V), np.array(b.V))
+
+
 if __name__ == '__main__':
     test_cpf()
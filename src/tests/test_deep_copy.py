@@ -57,3 +57,40 @@ def test_multi_circuit_deep_copy() -> bool:
         assert np.all(np.isclose(elm.P_prof.toarray() * 3.0, elm_copy.P_prof.toarray()))
 
     return True
+
+
+def test_multi_circuit_fast_copy() -> None:
+    """
+    Check that the fast copy is equal to the original circuit, and that modifying
+    the copy (including the copy-on-write profiles) does not modify the original
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    main_circuit = FileOpen(fname).open()
+
+    main_circuit_cpy = main_circuit.fast_copy()
+
+    equal, logger = main_circuit.compare_circuits(main_circuit_cpy, detailed_profile_comparison=True)
+    assert equal
+
+    # the references point to the copied devices
+    bus_ids = {id(bus) for bus in main_circuit_cpy.buses}
+    for elm in main_circuit_cpy.get_loads():
+        assert id(elm.bus) in bus_ids
+
+    for elm in main_circuit_cpy.lines:
+        assert id(elm.bus_from) in bus_ids and id(elm.bus_to) in bus_ids
+
+    # modify the copy
+    for elm in main_circuit_cpy.buses:
+        elm.active = False
+
+    for elm in main_circuit_cpy.get_loads():
+        elm.P_prof *= 2.0
+        elm.Q_prof[0] = 1234.0
+
+    for elm, elm_copy in zip(main_circuit.buses, main_circuit_cpy.buses):
+        assert elm.active != elm_copy.active
+
+    for elm, elm_copy in zip(main_circuit.get_loads(), main_circuit_cpy.get_loads()):
+        assert np.all(np.isclose(elm.P_prof.toarray() * 2.0, elm_copy.P_prof.toarray()))
+        assert elm.Q_prof[0] != 1234.0
@@ -47,3 +47,58 @@ def test_add_stuff_roundtrip() -> None:
         comp_logger.print()
 
     assert ok_compare
+
+
+def test_diff_circuits() -> None:
+    """
+    The hash-indexed diff reports the added, removed and modified devices with the changed properties
+    """
+    grid1 = gce.open_file(filename=os.path.join("data", "grids", "IEEE57.gridcal"))
+    grid2 = grid1.fast_copy()
+
+    diff = gce.diff_circuits(grid1, grid2)
+    assert diff.is_equal()
+
+    new_bus = gce.Bus(name="new bus")
+    grid2.add_bus(new_bus)
+    removed_line = grid2.lines[3]
+    grid2.delete_line(removed_line)
+    grid2.loads[0].P += 1.0
+    grid2.generators[0].Vset = 1.05
+
+    if grid2.get_time_number() > 0:
+        grid2.loads[1].P_prof[0] = 1000.0
+
+    diff = gce.diff_circuits(grid1, grid2)
+    assert not diff.is_equal()
+    assert [d.idtag for d in diff.added] == [new_bus.idtag]
+    assert [d.idtag for d in diff.removed] == [removed_line.idtag]
+
+    modified = {d.idtag: d.properties for d in diff.modified}
+    assert modified[grid1.loads[0].idtag] == ['P']
+    assert modified[grid1.generators[0].idtag] == ['Vset']
+
+    if grid2.get_time_number() > 0:
+        assert modified[grid1.loads[1].idtag] == ['P_prof']
+
+
+def test_diff_circuits_sub_objects() -> None:
+    """
+    The in-place edits of the sub-objects (line locations, tap changers, ...) are reported by the diff
+    """
+    grid1 = gce.open_file(filename=os.path.join("data", "grids", "IEEE57.gridcal"))
+    grid1.lines[0].locations.add(sequence=0, latitude=40.0, longitude=-3.0)
+    grid2 = grid1.fast_copy()
+
+    assert gce.diff_circuits(grid1, grid2).is_equal()
+
+    grid2.lines[0].locations.data[0].lat = 41.0
+    tap_changer = grid2.transformers2w[0].tap_changer
+    tap_changer.tap_position = tap_changer.tap_position + 1
+
+    diff = gce.diff_circuits(grid1, grid2)
+    assert not diff.is_equal()
+
+    modified = {d.idtag: d.properties for d in diff.modified}
+    assert modified[grid1.lines[0].idtag] == ['locations']
+    assert modified[grid1.transformers2w[0].idtag] == ['tap_changer']
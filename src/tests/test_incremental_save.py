@@ -0,0 +1,139 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import shutil
+import zipfile
+import tempfile
+import GridCalEngine.api as gce
+from GridCalEngine.IO.file_handler import FileOpen, FileSave, FileSavingOptions
+from GridCalEngine.IO.gridcal.zip_interface import read_raw_member
+from GridCalEngine.IO.gridcal.incremental_save import (take_journal_snapshot, write_journal,
+                                                       get_journal_file_name)
+
+
+def test_dirty_flags() -> None:
+    """
+    Check that the devices are flagged dirty by the setters and the profile edits
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    file_handler = FileOpen(fname)
+    grid = file_handler.open()
+
+    assert file_handler.save_state is not None
+    assert len(file_handler.save_state.get_changed_object_types(grid)) == 0
+
+    grid.buses[3].name = "renamed"
+    grid.loads[0].P_prof[2] = 123.0
+
+    assert grid.buses[3].is_dirty
+    assert grid.loads[0].is_dirty
+    assert not grid.lines[0].is_dirty
+    assert file_handler.save_state.get_changed_object_types(grid) == {'bus', 'load'}
+
+
+def test_incremental_save_and_journal() -> None:
+    """
+    Save only the changed object types, then recover the later changes from an autosave journal
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        fname = os.path.join(folder, 'IEEE39_1W.gridcal')
+        shutil.copy(os.path.join('data', 'grids', 'IEEE39_1W.gridcal'), fname)
+
+        file_handler = FileOpen(fname)
+        grid = file_handler.open()
+
+        # the file is in the legacy format, so the first save is complete
+        saver = FileSave(circuit=grid,
+                         file_name=fname,
+                         options=FileSavingOptions(save_state=file_handler.save_state))
+        saver.save()
+
+        with zipfile.ZipFile(fname) as f:
+            line_data = f.read('model_data/line.model')
+            line_info, line_raw = read_raw_member(f_zip_ptr=f, member_name='model_data/line.model')
+
+        grid.loads[0].P_prof[2] = 123.0
+        grid.add_bus(gce.Bus(name="new bus"))
+
+        saver = FileSave(circuit=grid,
+                         file_name=fname,
+                         options=FileSavingOptions(save_state=saver.save_state))
+        saver.save()
+
+        # the unchanged object types are copied as they were, without compressing them again
+        with zipfile.ZipFile(fname) as f:
+            assert f.testzip() is None
+            assert f.read('model_data/line.model') == line_data
+            info, raw = read_raw_member(f_zip_ptr=f, member_name='model_data/line.model')
+            assert raw == line_raw
+            assert info.CRC == line_info.CRC
+
+        assert len(saver.save_state.get_changed_object_types(grid)) == 0
+
+        grid2 = gce.open_file(fname)
+        equal, logger = grid.compare_circuits(grid2, detailed_profile_comparison=True)
+        assert equal
+        assert grid2.loads[0].P_prof[2] == 123.0
+
+        # autosave the later changes into a journal
+        grid.generators[0].P = 55.0
+        snapshot, manifest = take_journal_snapshot(circuit=grid, save_state=saver.save_state)
+        assert manifest['object_types'] == ['generator']
+
+        journal_name = get_journal_file_name(fname)
+        write_journal(snapshot=snapshot, manifest=manifest, journal_file_name=journal_name)
+
+        grid3 = FileOpen(journal_name).open()
+        equal, logger = grid.compare_circuits(grid3, detailed_profile_comparison=True)
+        assert equal
+        assert grid3.generators[0].P == 55.0
+
+
+def test_in_place_association_edits_are_saved() -> None:
+    """
+    Editing in place the associations of a device flags it as changed, so that the incremental save keeps the edit
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        fname = os.path.join(folder, 'IEEE39_1W.gridcal')
+        shutil.copy(os.path.join('data', 'grids', 'IEEE39_1W.gridcal'), fname)
+
+        file_handler = FileOpen(fname)
+        grid = file_handler.open()
+
+        fuel = gce.Fuel(name="coal")
+        grid.add_fuel(fuel)
+        grid.generators[0].fuels.add_object(fuel, 1.0)
+
+        saver = FileSave(circuit=grid,
+                         file_name=fname,
+                         options=FileSavingOptions(save_state=file_handler.save_state))
+        saver.save()
+        assert not grid.generators[0].is_dirty
+
+        # the same edit as the associations table
+        grid.generators[0].fuels.at_key(fuel.idtag).value = 0.5
+
+        assert grid.generators[0].is_dirty
+        assert saver.save_state.get_changed_object_types(grid) == {'generator'}
+
+        saver = FileSave(circuit=grid,
+                         file_name=fname,
+                         options=FileSavingOptions(save_state=saver.save_state))
+        saver.save()
+
+        grid2 = gce.open_file(fname)
+        assert grid2.generators[0].fuels.at_key(fuel.idtag).value == 0.5
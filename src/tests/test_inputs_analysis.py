@@ -0,0 +1,95 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.InputsAnalysis.inputs_analysis_driver import InputsAnalysisDriver
+
+
+def test_aggregated_series() -> None:
+    """
+    The aggregated series match the sum of the profiles of the devices of every group,
+    and the buses without group are left out
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    areas = [gce.Area(name=f'A{i}') for i in range(3)]
+    zones = [gce.Zone(name=f'Z{i}') for i in range(4)]
+    for elm in areas:
+        grid.add_area(elm)
+    for elm in zones:
+        grid.add_zone(elm)
+
+    for i, bus in enumerate(grid.buses):
+        bus.area = areas[i % 3] if i % 5 else None
+        bus.zone = zones[i % 4]
+
+    driver = InputsAnalysisDriver(grid=grid)
+    res = driver.results
+
+    generators = grid.get_generators() + grid.get_batteries() + grid.get_static_generators()
+    for aggregation, groups, attr in [('Area', grid.areas, 'area'), ('Zone', grid.zones, 'zone')]:
+        for elms in [generators, grid.get_loads()]:
+            x, headers = res.get_collection_attr_series(elms, 'P', aggregation)
+
+            expected = np.zeros((grid.get_time_number(), len(groups)))
+            for elm in elms:
+                group = getattr(elm.bus, attr)
+                if group is not None:
+                    expected[:, groups.index(group)] += elm.get_profile('P').toarray()
+
+            assert headers == [e.name for e in groups]
+            assert np.allclose(x, expected)
+
+    # the balance is the generation minus the load
+    gen, _ = res.get_collection_attr_series(generators, 'P', 'Zone')
+    load, _ = res.get_collection_attr_series(grid.get_loads(), 'P', 'Zone')
+    df = res.mdl(gce.ResultTypes.ZoneBalanceAnalysis).to_df()
+    assert np.allclose(df.values, gen - load)
+
+
+def test_aggregated_series_follow_the_grid_edits() -> None:
+    """
+    The aggregated series reflect the devices moved to other buses and the buses moved to other groups
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    zones = [gce.Zone(name=f'Z{i}') for i in range(2)]
+    for elm in zones:
+        grid.add_zone(elm)
+    for i, bus in enumerate(grid.buses):
+        bus.zone = zones[i % 2]
+
+    res = InputsAnalysisDriver(grid=grid).results
+    loads = grid.get_loads()
+    res.get_collection_attr_series(loads, 'P', 'Zone')
+
+    # move a load to a bus of the other zone, and a bus to the other zone
+    load = loads[0]
+    load.bus = next(bus for bus in grid.buses if bus.zone != load.bus.zone)
+    other = next(elm.bus for elm in loads[1:] if elm.bus is not load.bus)
+    other.zone = zones[1] if other.zone == zones[0] else zones[0]
+
+    x, _ = res.get_collection_attr_series(loads, 'P', 'Zone')
+
+    expected = np.zeros((grid.get_time_number(), len(grid.zones)))
+    for elm in loads:
+        expected[:, grid.zones.index(elm.bus.zone)] += elm.get_profile('P').toarray()
+
+    assert np.allclose(x, expected)
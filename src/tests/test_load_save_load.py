@@ -15,7 +15,15 @@
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 import os
+import copy
+import json
+import zipfile
+import shutil
+import tempfile
+import pytest
+import numpy as np
 import GridCalEngine.api as gce
+from GridCalEngine.IO.gridcal.zip_interface import get_session_tree, load_session_driver_objects
 
 
 def test_load_save_load() -> None:
@@ -88,3 +96,118 @@ def test_load_save_load2() -> None:
     equal, logger = grid2.compare_circuits(grid1, detailed_profile_comparison=True)
 
     assert equal
+
+
+def test_binary_profiles_roundtrip() -> None:
+    """
+    This test checks that the dense profiles are saved as binary blocks,
+    that they are lazily loaded and that the loaded grid is equal to the original one
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid1 = gce.open_file(fname)
+
+    fname2 = 'IEEE39_1W_binary_profiles.gridcal'
+    gce.save_file(grid=grid1, filename=fname2)
+
+    with zipfile.ZipFile(fname2) as f_zip_ptr:
+        names = f_zip_ptr.namelist()
+        assert 'model_profiles/load/P.npy' in names
+
+        # the load profiles are referenced in the json instead of being written there
+        loads_data = json.loads(f_zip_ptr.read('model_data/load.model'))
+        assert 'dense_block' in loads_data[0]['P_prof']
+        assert 'dense_data' not in loads_data[0]['P_prof']
+
+    grid2 = gce.open_file(fname2)
+
+    # the profiles are only read when accessed
+    prof = grid2.loads[0].P_prof
+    assert not prof.is_loaded
+    assert prof.size() == grid1.get_time_number()
+    assert np.allclose(prof.toarray(), grid1.loads[0].P_prof.toarray())
+    assert prof.is_loaded
+
+    equal, logger = grid1.compare_circuits(grid2, detailed_profile_comparison=True)
+
+    if not equal:
+        logger.print()
+
+    assert equal
+
+    os.remove(fname2)
+
+
+def test_binary_profiles_format_version_and_missing_file() -> None:
+    """
+    The files newer than the supported format are rejected with a clear error,
+    and so are the lazy profiles whose file disappeared since it was opened
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        fname = os.path.join(folder, 'IEEE39_1W.gridcal')
+        grid1 = gce.open_file(os.path.join('data', 'grids', 'IEEE39_1W.gridcal'))
+        gce.save_file(grid=grid1, filename=fname)
+
+        # copy the file with a newer format version
+        fname_new = os.path.join(folder, 'IEEE39_1W_new_format.gridcal')
+        with zipfile.ZipFile(fname) as f_in, zipfile.ZipFile(fname_new, 'w', zipfile.ZIP_DEFLATED) as f_out:
+            for name in f_in.namelist():
+                if name == 'model_data/format.model':
+                    f_out.writestr(name, json.dumps({'version': 1000}))
+                else:
+                    f_out.writestr(name, f_in.read(name))
+
+        with pytest.raises(Exception, match='format version'):
+            gce.open_file(fname_new)
+
+        # the profiles are read lazily, so they fail if the file is gone
+        fname_moved = os.path.join(folder, 'IEEE39_1W_moved.gridcal')
+        shutil.copy(fname, fname_moved)
+        grid2 = gce.open_file(fname_moved)
+        os.remove(fname_moved)
+
+        with pytest.raises(Exception, match='IEEE39_1W_moved.gridcal'):
+            grid2.loads[0].P_prof.toarray()
+
+
+def test_save_compression_and_lazy_results() -> None:
+    """
+    This test checks that the file can be saved with the different compression options
+    using several threads, and that the results are only read when requested
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid1 = gce.open_file(fname)
+    pf_results = gce.power_flow(grid1)
+
+    for compression in [gce.FileCompression.Stored, gce.FileCompression.Deflated, gce.FileCompression.Zstd]:
+
+        fname2 = f'IEEE39_1W_{compression.name}.gridcal'
+
+        options = gce.FileSavingOptions(compression=compression, n_threads=4)
+        options.sessions_data.append(gce.DriverToSave(name="GUI session",
+                                                      tpe=gce.SimulationTypes.PowerFlow_run,
+                                                      results=pf_results,
+                                                      logger=gce.Logger()))
+        gce.FileSave(circuit=grid1, file_name=fname2, options=options).save()
+
+        grid2 = gce.open_file(fname2)
+        equal, logger = grid1.compare_circuits(grid2, detailed_profile_comparison=True)
+        assert equal
+
+        # the results are listed but not read until accessed
+        tree = get_session_tree(fname2)
+        assert gce.SimulationTypes.PowerFlow_run.value in tree["GUI session"]
+
+        data = load_session_driver_objects(file_name_zip=fname2,
+                                           session_name="GUI session",
+                                           study_name=gce.SimulationTypes.PowerFlow_run.value)
+        assert 'Sf__complex__' in data
+        assert not data.is_loaded('Sf__complex__')
+
+        results2 = copy.deepcopy(pf_results)
+        results2.voltage = np.zeros_like(pf_results.voltage)
+        results2.Sf = np.zeros_like(pf_results.Sf)
+        results2.parse_saved_data(grid=grid1, data_dict=data)
+        assert np.allclose(results2.voltage, pf_results.voltage)
+        assert np.allclose(results2.Sf, pf_results.Sf)
+
+        os.remove(fname2)
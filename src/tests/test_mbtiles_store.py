@@ -0,0 +1,111 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import tempfile
+from GridCal.Gui.Diagrams.MapWidget.Tiles.mbtiles_store import (MBTilesStore, resolve_tiles_location,
+                                                                geo_to_tile_index)
+from GridCal.Gui.Diagrams.MapWidget.Tiles.pycacheback import PyCacheBack
+
+
+class BytesCache(PyCacheBack):
+    """
+    In-memory cache where the values are bytes
+    """
+
+    def _size_of(self, value) -> int:
+        return len(value)
+
+
+def test_mbtiles_store():
+    """
+    Check storing, reading and bulk importing tiles in an MBTiles file
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, 'osm.mbtiles')
+        store = MBTilesStore(file_path=file_path, name='osm')
+
+        assert store.get_metadata()['name'] == 'osm'
+        assert not store.has(3, 1, 2)
+        assert store.get(3, 1, 2) is None
+
+        store.put(3, 1, 2, b'tile_3_1_2')
+        assert store.has(3, 1, 2)
+        assert store.get(3, 1, 2) == b'tile_3_1_2'
+
+        # the rows are stored in the TMS scheme (from the bottom)
+        row = store._conn.execute("SELECT tile_row FROM tiles").fetchone()[0]
+        assert row == 2 ** 3 - 1 - 2
+
+        # overwrite
+        store.put(3, 1, 2, b'new')
+        assert store.get(3, 1, 2) == b'new'
+        assert len(store) == 1
+
+        # tiles directory with the on-disk cache layout
+        tiles_dir = os.path.join(folder, 'osm')
+        for level, x, y in [(1, 0, 0), (1, 1, 1), (2, 3, 3)]:
+            os.makedirs(os.path.join(tiles_dir, str(level), str(x)), exist_ok=True)
+            with open(os.path.join(tiles_dir, str(level), str(x), f'{y}.png'), 'wb') as f:
+                f.write(f'{level}_{x}_{y}'.encode())
+
+        # import the north-west quadrant only
+        n = store.import_directory(tiles_dir=tiles_dir, levels=[1, 2], extent=(-179.0, -1.0, 1.0, 80.0))
+        assert n == 1
+        assert store.get(1, 0, 0) == b'1_0_0'
+
+        # import everything
+        n = store.import_directory(tiles_dir=tiles_dir, levels=[1, 2])
+        assert n == 3
+        assert store.get(2, 3, 3) == b'2_3_3'
+        assert len(store) == 4
+
+        store.close()
+
+        # the MBTiles file next to the directory is preferred
+        assert resolve_tiles_location(tiles_dir) == file_path
+        assert resolve_tiles_location(os.path.join(folder, 'other')) == os.path.join(folder, 'other')
+
+    assert geo_to_tile_index(-180.0, 85.0, 2) == (0, 0)
+    assert geo_to_tile_index(179.9, -85.0, 2) == (3, 3)
+
+
+def test_cache_bytes_limit():
+    """
+    Check that the in-memory cache is bounded by the size of its values, discarding the least recently used first
+    """
+    cache = BytesCache(max_lru=100, max_bytes=30)
+
+    cache.put_in_memory('a', b'0' * 10)
+    cache.put_in_memory('b', b'0' * 10)
+    cache.put_in_memory('c', b'0' * 10)
+    assert cache.memory_size == 30
+
+    # use 'a' so that 'b' is the least recently used
+    assert cache.get_from_memory('a') is not None
+
+    cache.put_in_memory('d', b'0' * 10)
+    assert cache.memory_size == 30
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache and 'd' in cache
+
+    # replacing a value updates the size
+    cache.put_in_memory('a', b'0' * 5)
+    assert cache.memory_size == 25
+
+    cache.pop('a')
+    assert cache.memory_size == 20
+    assert cache.get_from_memory('a') is None
@@ -0,0 +1,93 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.enumerations import NetworkEquivalentMethod
+from GridCalEngine.Simulations.Topology.network_equivalent_driver import (NetworkEquivalentDriver,
+                                                                         NetworkEquivalentOptions)
+
+
+def run_equivalent(grid: gce.MultiCircuit, external, method: NetworkEquivalentMethod) -> NetworkEquivalentDriver:
+    """
+    Run the network equivalent driver
+    """
+    options = NetworkEquivalentOptions(external_buses_idx=external,
+                                       method=method,
+                                       pf_options=gce.PowerFlowOptions(control_q=False))
+    driver = NetworkEquivalentDriver(grid=grid, options=options)
+    driver.run()
+    return driver
+
+
+def test_equivalents_reproduce_the_base_case() -> None:
+    """
+    Every equivalent reproduces the flows and voltages of the retained grid in the base case,
+    whether the slack bus is retained or replaced by the equivalent
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    nbus = len(grid.buses)
+
+    # the second external set contains the slack bus (bus 30)
+    for external in [np.r_[0:9, 29, 38], np.r_[3:14, 30, 31]]:
+        for method in NetworkEquivalentMethod:
+            driver = run_equivalent(grid, external, method)
+            res = driver.results
+
+            assert len(grid.buses) == nbus  # the original grid is not modified
+            assert len(res.grid.buses) == nbus - len(external) + (1 if method == NetworkEquivalentMethod.REI else 0)
+            assert res.is_boundary_branch.any()
+            assert res.max_boundary_flow_error < 1e-6
+            assert np.allclose(res.Sf_eq, res.Sf_full, atol=1e-6)
+            assert np.allclose(np.abs(res.V_eq), np.abs(res.V_full), atol=1e-8)
+
+            assert res.mdl(gce.ResultTypes.NetworkEquivalentBranchErrors).to_df().shape[0] == len(res.branch_names)
+            assert res.mdl(gce.ResultTypes.NetworkEquivalentBusErrors).to_df().shape[0] == len(res.bus_names)
+
+
+def test_dc_equivalent_preserves_the_ptdf() -> None:
+    """
+    The DC equivalent keeps the PTDF of the retained branches with respect to the retained buses
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    external = np.r_[0:9, 29, 38]
+
+    driver = run_equivalent(grid, external, NetworkEquivalentMethod.PTDF)
+    eq_grid = driver.results.grid
+
+    ptdf = list()
+    for g in [grid, eq_grid]:
+        la = gce.LinearAnalysisDriver(grid=g, options=gce.LinearAnalysisOptions(distribute_slack=False))
+        la.run()
+        ptdf.append(la.results.PTDF)
+    ptdf_full, ptdf_eq = ptdf
+
+    bus_idx = {bus.idtag: i for i, bus in enumerate(grid.buses)}
+    br_idx = {br.idtag: i for i, br in enumerate(grid.get_branches_wo_hvdc())}
+    eq_bus = [(i, bus_idx[bus.idtag]) for i, bus in enumerate(eq_grid.buses)]
+    eq_br = [(k, br_idx[br.idtag]) for k, br in enumerate(eq_grid.get_branches_wo_hvdc()) if br.idtag in br_idx]
+
+    k_eq, k_full = np.array(eq_br).T
+    i_eq, i_full = np.array(eq_bus).T
+    assert np.allclose(ptdf_eq[np.ix_(k_eq, i_eq)], ptdf_full[np.ix_(k_full, i_full)], atol=1e-8)
+
+    # the equivalent only adds branches among the boundary buses
+    n_boundary = driver.results.is_boundary_bus.sum()
+    n_added = len(eq_grid.get_branches_wo_hvdc()) - len(eq_br)
+    assert 0 < n_added <= n_boundary * (n_boundary - 1) // 2
@@ -0,0 +1,111 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.OPF.NumericalMethods.ac_opf import run_nonlinear_opf
+from GridCalEngine.Simulations.NodalCapacity.nodal_capacity_options import NodalCapacityOptions
+from GridCalEngine.Simulations.NodalCapacity.nodal_capacity_ts_driver import NodalCapacityTimeSeriesDriver
+from GridCalEngine.enumerations import NodalCapacityMethod, AcOpfMode
+
+
+def get_options(method: NodalCapacityMethod, n_clusters: int = 0) -> NodalCapacityOptions:
+    """
+    Nodal capacity options at bus 15 of the IEEE39
+    """
+    opf_options = gce.OptimalPowerFlowOptions(solver=gce.SolverType.NONLINEAR_OPF,
+                                              ips_tolerance=1e-6,
+                                              ips_iterations=50,
+                                              acopf_mode=AcOpfMode.ACOPFstd)
+    opf_options.power_flow_options.control_Q = False
+
+    return NodalCapacityOptions(opf_options=opf_options,
+                                capacity_nodes_idx=np.array([15]),
+                                nodal_capacity_sign=-1.0,
+                                method=method,
+                                n_clusters=n_clusters)
+
+
+def test_nonlinear_nodal_capacity_ts() -> None:
+    """
+    The warm-started nodal capacity time series matches the independent nonlinear OPF of every time step,
+    the repeated time steps are solved once, and the screened time steps stay close to the exact ones
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    time_indices = np.array([0, 1, 2, 0, 1])
+    driver = NodalCapacityTimeSeriesDriver(grid=grid,
+                                           options=get_options(NodalCapacityMethod.NonlinearOptimization),
+                                           time_indices=time_indices)
+    driver.run()
+    res = driver.results
+
+    assert np.array_equal(res.representative_idx, [0, 1, 2, 0, 1])
+    assert np.allclose(res.nodal_capacity[3:, :], res.nodal_capacity[:2, :])
+
+    options = get_options(NodalCapacityMethod.NonlinearOptimization)
+    for k, t in enumerate(time_indices[:3]):
+        expected = run_nonlinear_opf(grid=grid,
+                                     opf_options=options.opf_options,
+                                     pf_options=options.opf_options.power_flow_options,
+                                     t_idx=t,
+                                     pf_init=True,
+                                     optimize_nodal_capacity=True,
+                                     nodal_capacity_sign=-1.0,
+                                     capacity_nodes_idx=options.capacity_nodes_idx)
+        assert expected.converged
+        # the interior point stops at a slightly different point of the flat optimum depending on the start
+        assert np.allclose(res.nodal_capacity[k, :], expected.nodal_capacity, rtol=1e-2)
+
+    # only some representatives are solved exactly, the rest are screened or solved if the screening is not enough
+    time_indices = np.arange(6)
+    exact = NodalCapacityTimeSeriesDriver(grid=grid,
+                                          options=get_options(NodalCapacityMethod.NonlinearOptimization),
+                                          time_indices=time_indices)
+    exact.run()
+
+    clustered = NodalCapacityTimeSeriesDriver(grid=grid,
+                                              options=get_options(NodalCapacityMethod.NonlinearOptimization,
+                                                                  n_clusters=2),
+                                              time_indices=time_indices)
+    clustered.run()
+
+    assert len(np.unique(clustered.results.representative_idx)) < len(time_indices)
+    assert np.allclose(clustered.results.nodal_capacity, exact.results.nodal_capacity, rtol=0.05)
+
+
+def test_cpf_nodal_capacity_ts() -> None:
+    """
+    The continuation power flow is solved once per grid structure
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    branch = grid.get_branches_wo_hvdc()[5]
+    branch.active_prof[2] = False
+
+    driver = NodalCapacityTimeSeriesDriver(grid=grid,
+                                           options=get_options(NodalCapacityMethod.CPF),
+                                           time_indices=np.arange(4))
+    driver.run()
+    res = driver.results
+
+    assert np.array_equal(res.representative_idx, [0, 0, 2, 0])
+    assert res.converged[[0, 1, 3]].all()
+    assert np.allclose(res.voltage[1, :], res.voltage[0, :])
+    assert np.allclose(res.voltage[3, :], res.voltage[0, :])
@@ -102,3 +102,60 @@ def test_ntc_ieee_14() -> None:
     res = drv.results
 
     assert res.converged
+
+
+def test_ntc_time_series_reusing_models() -> None:
+    """
+    Reusing the LP model between time steps (also in parallel processes) gives the same results
+    as formulating every time step, and the model is only formulated again when the topology changes
+    """
+    fname = os.path.join('data', 'grids', 'IEEE14 - ntc areas_voltages_hvdc_shifter_l10free.gridcal')
+
+    grid = gce.open_file(fname)
+
+    # disconnect a branch for a few hours
+    branch = grid.get_branches_wo_hvdc()[5]
+    for t in range(8, 12):
+        branch.active_prof[t] = False
+
+    info = grid.get_inter_aggregation_info(objects_from=[grid.areas[0]],
+                                           objects_to=[grid.areas[1]])
+
+    results = list()
+    n_models = list()
+    for reuse_model, n_workers in [(False, 1), (True, 1), (True, 2)]:
+        ntc_options = gce.OptimalNetTransferCapacityOptions(
+            sending_bus_idx=info.idx_bus_from,
+            receiving_bus_idx=info.idx_bus_to,
+            consider_contingencies=True,
+            reuse_model=reuse_model,
+            n_workers=n_workers,
+            opf_options=gce.OptimalPowerFlowOptions(contingency_groups_used=grid.contingency_groups),
+        )
+
+        drv = gce.OptimalNetTransferCapacityTimeSeriesDriver(grid, ntc_options, time_indices=np.arange(16))
+        drv.run()
+        results.append(drv.results)
+        n_models.append(drv.n_models)
+
+    assert n_models[0] == 16
+    assert n_models[1] == 3  # before, during and after the outage
+
+    base = results[0]
+    assert base.converged.all()
+    assert np.isclose(base.Sf[9, 5], 0.0)
+
+    # the contingency flows of every time step are stored
+    assert base.n_contingency_flows == len(base.contingency_flows)
+    assert np.array_equal(np.unique(base.contingency_time_idx), np.arange(16))
+
+    for res in results[1:]:
+        assert res.converged.all()
+        assert np.allclose(res.Sf, base.Sf, atol=1e-6)
+        assert np.allclose(res.dSbus, base.dSbus, atol=1e-6)
+        assert np.array_equal(res.contingency_time_idx, base.contingency_time_idx)
+        assert np.array_equal(res.contingency_monitored_idx, base.contingency_monitored_idx)
+        assert np.allclose(res.contingency_flows, base.contingency_flows, atol=1e-6)
+
+    report = results[1].mdl(gce.ResultTypes.ContingencyFlowsReport).to_df()
+    assert report.shape[0] == base.n_contingency_flows
@@ -0,0 +1,79 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import numpy as np
+import pandas as pd
+import GridCalEngine.api as gce
+from GridCal.Gui.objects_columns import ObjectsColumnsCache
+
+
+def test_objects_columns_cache():
+    """
+    Check that the columnar cache of the objects table matches the values of the objects,
+    at the snapshot and at a time index, and that it sorts and invalidates correctly
+    """
+    grid = gce.MultiCircuit()
+    grid.time_profile = pd.date_range('2024-01-01', periods=4, freq='h')
+
+    for i in range(600):
+        bus = gce.Bus(name=f"Bus {i}")
+        grid.add_bus(bus)
+        load = gce.Load(name=f"Load {i}", P=float((i * 7) % 13), Q=1.0)
+        grid.add_load(bus, load)
+        load.P_prof[2] = -float(i)
+
+    loads = grid.get_loads()
+    props = [p for p in loads[0].property_list if p.display]
+    cache = ObjectsColumnsCache(objects=loads, property_list=props, block_size=100)
+
+    p_col = [p.name for p in props].index('P')
+    bus_col = [p.name for p in props].index('bus')
+
+    # values at the snapshot and at a time index
+    for t_idx in [None, 2]:
+        for j, prop in enumerate(props):
+            for i in [0, 150, 599]:
+                expected = loads[i].get_value(prop=prop, t_idx=t_idx)
+                if prop.tpe is gce.Bus:
+                    expected = expected.name
+                assert cache.get_value(i, j, t_idx) == expected
+                assert cache.get_string(i, j, t_idx) == str(expected)
+
+    # the strings are formatted lazily by blocks
+    assert cache._formatted[(None, p_col)].sum() == 3
+
+    # sorting
+    idx = cache.get_sorting(col=p_col, t_idx=None, max_to_min=False)
+    values = np.array([elm.P for elm in loads])
+    assert np.all(np.diff(values[idx]) >= 0)
+
+    idx = cache.get_sorting(col=p_col, t_idx=2, max_to_min=True)
+    cache.permute(idx)
+    assert cache.objects[0] is loads[0]
+    assert cache.get_value(0, p_col, 2) == 0.0
+    assert cache.get_value(599, p_col, 2) == -599.0
+    assert cache.get_string(599, bus_col, None) == "Bus 599"
+    assert [elm.name for elm in loads[:2]] == ["Load 0", "Load 1"]  # the original list is untouched
+
+    # invalidation after an edit
+    cache.objects[0].P = 100.0
+    assert cache.get_value(0, p_col, None) != 100.0
+    cache.invalidate(col=p_col)
+    assert cache.get_value(0, p_col, None) == 100.0
+
+    data = cache.get_strings_matrix(t_idx=2)
+    assert data.shape == (600, len(props))
+    assert data[1, p_col] == "-1.0"
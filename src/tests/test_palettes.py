@@ -0,0 +1,75 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap
+import GridCalEngine.Devices.Diagrams.palettes as palettes
+
+
+def test_vectorized_palettes():
+    """
+    Check that the vectorized palettes match the scalar ones, including the edges and the out-of-range values
+    """
+    x = np.r_[np.linspace(-1.5, 1.5, 301),
+              palettes.GREEN_TO_RED_EDGES,
+              palettes.HEATMAP_EDGES,
+              np.nan]
+
+    res = palettes.green_to_red_bgr_array(x)
+    expected = np.array([palettes.green_to_red_bgr(val) for val in x])
+    assert np.array_equal(res, expected)
+
+    res = palettes.heatmap_palette_bgr_array(x)
+    expected = np.array([palettes.heatmap_palette_bgr(val) for val in x])
+    assert np.array_equal(res, expected)
+
+    v = np.array([0.4, 10.0, 132.0, 150.0, 220.0, 380.0, 400.0, 750.0])
+    res = palettes.tso_substation_palette_bgr_array(v)
+    expected = np.array([palettes.tso_substation_palette_bgr(val) for val in v])
+    assert np.array_equal(res, expected)
+
+    vv, ll = np.meshgrid(v, np.r_[np.linspace(0, 2, 21), 0.9, 1.15, np.nan])
+    res = palettes.tso_line_palette_bgr_array(vv.ravel(), ll.ravel())
+    expected = np.array([palettes.tso_line_palette_bgr(a, b) for a, b in zip(vv.ravel(), ll.ravel())])
+    assert np.array_equal(res, expected)
+
+
+def test_rgba_array_and_packing():
+    """
+    Check the RGBA arrays used to colour the diagrams and the detection of colour changes
+    """
+    cmap = LinearSegmentedColormap.from_list('lcolors', [(0.0, 'gray'), (0.5, 'green'), (1.0, 'red')])
+    x = np.linspace(0, 1.2, 13)
+
+    # default colormap
+    rgba = palettes.get_rgba_array(x=x, cmap=None, default_cmap=cmap)
+    expected = np.array([np.array(cmap(val)) * 255 for val in x])
+    assert rgba.dtype == np.uint8
+    assert np.allclose(rgba, expected, atol=1)
+
+    # palette
+    rgba = palettes.get_rgba_array(x=x, cmap=palettes.Colormaps.Heatmap, default_cmap=cmap)
+    expected = np.array([palettes.heatmap_palette_bgr(val)[::-1] + (255,) for val in x])
+    assert np.array_equal(rgba, expected)
+
+    # the codes only change where the colour (or the width) changes
+    codes1 = palettes.pack_rgba_array(rgba, width=np.full(len(x), 3))
+    rgba2 = rgba.copy()
+    rgba2[4, 1] += 1
+    codes2 = palettes.pack_rgba_array(rgba2, width=np.full(len(x), 3))
+    codes3 = palettes.pack_rgba_array(rgba, width=np.r_[4, np.full(len(x) - 1, 3)])
+    assert np.array_equal(np.where(codes1 != codes2)[0], [4])
+    assert np.array_equal(np.where(codes1 != codes3)[0], [0])
@@ -14,8 +14,11 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program; if not, write to the Free Software Foundation,
 # Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
 import math
 import numpy as np
+import pandas as pd
+import GridCalEngine.api as gce
 from GridCalEngine.Devices.profile import Profile, SparseArray, check_if_sparse
 
 
@@ -177,3 +180,57 @@ def test_profile2():
 
     # x is fully sparse, the size should be 1
     assert len(profile._sparse_array._map) == 1  # only one value is different
+
+
+def test_profiles_matrix_aggregation():
+    """
+    Test that the cached profile matrices aggregate the devices sharing a bus
+    and that they are rebuilt when a profile changes
+    :return:
+    """
+    nt = 24
+    grid = gce.MultiCircuit()
+    bus1 = grid.add_bus(gce.Bus(name="B1"))
+    bus2 = grid.add_bus(gce.Bus(name="B2"))
+    load1 = grid.add_load(bus1, gce.Load(name="L1", P=10, Q=2))
+    load2 = grid.add_load(bus1, gce.Load(name="L2", P=5, Q=1))
+    gen = grid.add_generator(bus2, gce.Generator(name="G1", P=15))
+    grid.format_profiles(pd.date_range(start="2024-01-01", periods=nt, freq="h"))
+
+    load1.P_prof.set(np.linspace(0, 10, nt))
+
+    Sbus = grid.get_Sbus_prof()
+    expected = load1.get_Sprof() + load2.get_Sprof()
+    assert np.allclose(Sbus[:, 0], expected)  # the loads sharing the bus are summed
+    assert np.allclose(Sbus[:, 1], gen.get_Sprof())
+
+    # modifying a profile must invalidate the cached matrix
+    load2.P_prof[3] = 100.0
+    Sbus = grid.get_Sbus_prof()
+    assert np.isclose(Sbus[3, 0], load1.P_prof[3] + 100.0 + 1j * (load1.Q_prof[3] + load2.Q_prof[3]))
+
+    # dispatchable + non-dispatchable must be the total
+    assert np.allclose(grid.get_Sbus_prof_fixed() + grid.get_Sbus_prof_dispatchable(), Sbus)
+
+
+def test_columnar_profiles_compilation():
+    """
+    Test that compiling a time step from the columnar profiles store
+    produces the same data as compiling it device by device
+    :return:
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.FileOpen(fname).open()
+
+    for t_idx in [0, 5, 10]:
+        grid.use_columnar_profiles = False
+        nc1 = gce.compile_numerical_circuit_at(grid, t_idx=t_idx)
+
+        grid.use_columnar_profiles = True
+        nc2 = gce.compile_numerical_circuit_at(grid, t_idx=t_idx)
+
+        assert np.allclose(nc1.Sbus, nc2.Sbus)
+        assert np.array_equal(nc1.bus_data.active, nc2.bus_data.active)
+        assert np.array_equal(nc1.load_data.active, nc2.load_data.active)
+        assert np.allclose(nc1.generator_data.p, nc2.generator_data.p)
+        assert np.allclose(nc1.generator_data.v, nc2.generator_data.v)
@@ -0,0 +1,99 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import numpy as np
+from GridCalEngine.Devices.profile import Profile
+from GridCal.Gui.profiles_history import ObjectHistory, ProfileDelta
+
+
+def make_profile(arr: np.ndarray) -> Profile:
+    """
+    Create a float profile from an array
+    :param arr: values
+    :return: Profile
+    """
+    prof = Profile(default_value=0.0, data_type=float)
+    prof.create_dense(size=len(arr), default_value=0.0)
+    prof.set(arr)
+    return prof
+
+
+def test_profile_delta_undo_redo():
+    """
+    Check that the deltas undo and redo the changes and that they only store the changed values
+    """
+    nt = 8760
+    original = np.random.rand(nt)
+    prof = make_profile(original.copy())
+
+    history = ObjectHistory(max_undo_states=10)
+
+    # change a few scattered values
+    new_arr = original.copy()
+    new_arr[[3, 100, 5000]] = -1.0
+    delta = ProfileDelta.from_arrays(col=0, old_arr=prof.toarray(), new_arr=new_arr)
+    prof.set(new_arr)
+    history.add_state('edit', {0: delta})
+    assert len(delta.values) == 3
+    assert delta.nbytes < 100
+
+    # change the whole column
+    new_arr2 = new_arr * 2.0
+    delta2 = ProfileDelta.from_arrays(col=0, old_arr=prof.toarray(), new_arr=new_arr2)
+    prof.set(new_arr2)
+    history.add_state('*', {0: delta2})
+    assert isinstance(delta2.indices, slice)  # contiguous block: no indices are stored
+
+    # undo twice
+    _, data = history.undo()
+    data[0].apply(prof)
+    assert np.array_equal(prof.toarray(), new_arr)
+
+    _, data = history.undo()
+    data[0].apply(prof)
+    assert np.array_equal(prof.toarray(), original)
+    assert not history.can_undo()
+
+    # redo once
+    _, data = history.redo()
+    data[0].apply(prof)
+    assert np.array_equal(prof.toarray(), new_arr)
+
+    # a new state discards the redo states
+    history.add_state('edit', {0: ProfileDelta(col=0, indices=np.array([0]), values=[prof[0]])})
+    assert not history.can_redo()
+
+    # NaN to NaN is not a change
+    a = np.array([np.nan, 1.0, 2.0])
+    b = np.array([np.nan, 1.0, 3.0])
+    assert ProfileDelta.from_arrays(col=0, old_arr=a, new_arr=b).values.tolist() == [2.0]
+    assert ProfileDelta.from_arrays(col=0, old_arr=a, new_arr=a.copy()) is None
+
+
+def test_history_memory_bound():
+    """
+    Check that the history discards the oldest states when it uses too much memory
+    """
+    nt = 1000
+    history = ObjectHistory(max_undo_states=100, max_memory_mb=3 * nt * 8 / (1024 * 1024))
+
+    for i in range(10):
+        delta = ProfileDelta(col=i, indices=np.arange(nt), values=np.zeros(nt))
+        history.add_state(str(i), {i: delta})
+
+    assert len(history.undo_stack) == 3
+    assert history.memory == 3 * nt * 8
+    assert history.undo()[0] == '9'
@@ -0,0 +1,102 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.Stochastic import ReliabilityStudy, ReliabilityOptions
+from GridCalEngine.Simulations.Stochastic.reliability_driver import sample_up_states, get_adequacy_data
+from GridCalEngine.DataStructures.numerical_circuit import compile_numerical_circuit_at
+
+
+def test_sample_up_states() -> None:
+    """
+    The sampled unavailability of the devices matches the analytical one: mttr / (mttf + mttr)
+    """
+    rng = np.random.default_rng(1)
+    mttf = np.array([100.0, 500.0, 0.0])
+    mttr = np.array([10.0, 100.0, 10.0])
+    t_start = np.arange(1000000, dtype=float)
+
+    up = sample_up_states(mttf=mttf, mttr=mttr, t_start=t_start, horizon=len(t_start), rng=rng)
+
+    unavailability = 1.0 - up.mean(axis=0)
+    expected = mttr[:2] / (mttf[:2] + mttr[:2])
+    assert np.allclose(unavailability[:2], expected, rtol=0.1)
+    assert up[:, 2].all()  # mttf = 0 means that the device never fails
+
+
+def test_reliability_study() -> None:
+    """
+    Sequential Monte Carlo adequacy study of the IEEE 39 bus grid with unreliable generators
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    for gen in grid.generators:
+        gen.mttf = 1000.0
+        gen.mttr = 50.0
+        # Pmax set below the dispatched P: little spare capacity, so the generator outages shed load
+        gen.Pmax = 0.8 * gen.P
+
+    for branch in grid.get_branches_wo_hvdc():
+        branch.mttf = 5000.0
+        branch.mttr = 20.0
+
+    options = ReliabilityOptions(max_years=100, min_years=20, tolerance=0.01, seed=3)
+    driver = ReliabilityStudy(grid=grid, options=options)
+    driver.run()
+    res = driver.results
+
+    assert res.n_years == 100
+    assert res.eens > 0.0
+    assert np.isclose(res.eens, res.bus_eens.sum())
+
+    # the distinct states are solved only once
+    assert res.n_solved_states < res.n_distinct_states
+
+    eens, lower, upper = res.get_eens_interval()
+    assert lower <= eens <= upper
+
+    # the same seed gives the same results
+    driver2 = ReliabilityStudy(grid=grid, options=options)
+    driver2.run()
+    assert np.allclose(driver2.results.ens, res.ens)
+
+
+def test_adequacy_data_with_load_like_devices() -> None:
+    """
+    The bus loads of the adequacy data match the compiled load data at every time step,
+    with static generators and devices switched off by their active profiles
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+
+    bus = grid.loads[3].bus
+    grid.add_static_generator(bus, gce.StaticGenerator(name="sgen", P=50.0, Q=0.0))
+    grid.static_generators[0].P_prof[5] = 80.0
+    grid.loads[0].active_prof[2] = False
+
+    data = get_adequacy_data(grid=grid, nc=compile_numerical_circuit_at(grid, t_idx=None))
+
+    for t in [0, 2, 5]:
+        nc = compile_numerical_circuit_at(grid, t_idx=t)
+        expected = nc.load_data.C_bus_elm @ (nc.load_data.S.real * nc.load_data.active)
+        assert np.allclose(data.bus_load[t, :], expected)
+
+    driver = ReliabilityStudy(grid=grid, options=ReliabilityOptions(max_years=5, min_years=5, seed=3))
+    driver.run()
+    assert driver.results.n_years == 5
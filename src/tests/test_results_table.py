@@ -0,0 +1,93 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import numpy as np
+from GridCalEngine.enumerations import DeviceType
+from GridCalEngine.Simulations.results_table import ResultsTable
+
+
+def make_table(data: np.ndarray, transform=None) -> ResultsTable:
+    """
+    Create a results table
+    :param data: data
+    :param transform: lazy transformation
+    :return: ResultsTable
+    """
+    return ResultsTable(data=data,
+                        columns=np.array([f"c{i}" for i in range(data.shape[1])]),
+                        index=np.array([f"r{i}" for i in range(data.shape[0])]),
+                        title="test",
+                        cols_device_type=DeviceType.BusDevice,
+                        idx_device_type=DeviceType.TimeDevice,
+                        transform=transform)
+
+
+def test_lazy_results_table():
+    """
+    Check that the lazy operations of the results table match the eager computations,
+    and that the source array is never modified
+    """
+    np.random.seed(0)
+    nt, n = 1200, 70
+    source = np.random.randn(nt, n) + 1j * np.random.randn(nt, n)
+    source_copy = source.copy()
+
+    # lazy transform
+    table = make_table(source, transform=np.abs)
+    assert table.get_value(1000, 65) == np.abs(source[1000, 65])
+    assert table.get_string(3, 2) == format(np.abs(source[3, 2]), '.6f')
+    assert not table.is_complex()
+
+    # transpose + sort
+    table.transpose()
+    assert (table.r, table.c) == (n, nt)
+    table.sort_column(c=700, max_to_min=True)
+    expected = np.abs(source).T
+    idx = np.argsort(expected[:, 700])[::-1]
+    expected = expected[idx, :]
+    assert np.all(table.index_c == np.array([f"c{i}" for i in range(n)])[idx])
+    assert table.get_value(5, 1100) == expected[5, 1100]
+
+    # second sort composes the permutation
+    table.sort_column(c=3, max_to_min=False)
+    idx2 = np.argsort(expected[:, 3])
+    expected = expected[idx2, :]
+    assert table.get_value(10, 3) == expected[10, 3]
+    assert np.array_equal(table.data_c, expected)
+
+    # abs + cdf of the complex data
+    table = make_table(source)
+    assert table.is_complex()
+    table.sort_column(c=1)
+    table.convert_to_abs()
+    table.convert_to_cdf()
+    expected = np.sort(np.abs(source), axis=0)
+    assert table.get_value(nt - 1, 50) == expected[nt - 1, 50]
+    assert np.array_equal(table.get_column(7), expected[:, 7])
+    assert len(table._cdf_columns) == ResultsTable.BLOCK_COLS + 1  # only the displayed columns were sorted
+    assert np.array_equal(table.data_c, expected)
+
+    # slicing
+    table = make_table(source, transform=np.abs)
+    sliced = table.slice_all(row_idx=[4, 2], col_idx=[9, 1, 3])
+    assert np.array_equal(sliced.data_c, np.abs(source)[[4, 2], :][:, [9, 1, 3]])
+
+    # the source was never modified
+    assert np.array_equal(source, source_copy)
+
+    # zeros are displayed as '0'
+    table = make_table(np.zeros((3, 2)))
+    assert table.get_string(1, 1) == '0'
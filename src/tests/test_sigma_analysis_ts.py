@@ -0,0 +1,61 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.SigmaAnalysis.sigma_analysis_driver import multi_island_sigma
+from GridCalEngine.Simulations.SigmaAnalysis.sigma_analysis_ts_driver import (SigmaAnalysisTimeSeriesDriver,
+                                                                              SigmaAnalysisTimeSeriesOptions)
+
+
+def test_sigma_time_series() -> None:
+    """
+    The batched sigma analysis of the time series matches the snapshot sigma analysis of every time step,
+    factorizing once per grid structure, and the parallel run gives the same results
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    time_indices = np.arange(12)
+
+    # change the topology in the middle of the horizon
+    branch = grid.get_branches_wo_hvdc()[5]
+    for t in range(4, 8):
+        branch.active_prof[t] = False
+
+    options = SigmaAnalysisTimeSeriesOptions(n_worst=3, batch_size=5)
+    driver = SigmaAnalysisTimeSeriesDriver(grid=grid, options=options, time_indices=time_indices)
+    driver.run()
+    res = driver.results
+
+    assert res.n_structures == 3
+    assert res.converged.all()
+
+    pf_options = gce.PowerFlowOptions()
+    for k, t in enumerate(time_indices):
+        grid.set_state(t)
+        expected = multi_island_sigma(grid, pf_options)
+        assert np.isclose(res.distance[k], expected.distances.min())
+        assert np.allclose(res.worst_distances[k, :], np.sort(expected.distances)[:3])
+        assert np.allclose(expected.distances[res.worst_bus_idx[k, :]], res.worst_distances[k, :])
+
+    options_par = SigmaAnalysisTimeSeriesOptions(n_worst=3, batch_size=5, n_workers=2)
+    driver_par = SigmaAnalysisTimeSeriesDriver(grid=grid, options=options_par, time_indices=time_indices)
+    driver_par.run()
+    assert np.allclose(driver_par.results.distance, res.distance)
+    assert np.array_equal(driver_par.results.worst_bus_idx, res.worst_bus_idx)
+
+    assert res.mdl(gce.ResultTypes.SigmaWorstBuses).to_df().shape == (len(time_indices), 6)
@@ -0,0 +1,167 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+import os
+from types import SimpleNamespace
+import numpy as np
+import GridCalEngine.api as gce
+from GridCalEngine.Simulations.Dynamics.dynamic_modules import (dynamic_simulation, DynamicModels, DiffEqSolver,
+                                                                 TransientStabilityEvents)
+from GridCalEngine.Simulations.Dynamics.transient_stability_screening_driver import (
+    TransientStabilityScreening, TransientStabilityScreeningOptions)
+
+
+def get_ieee39_case():
+    """
+    IEEE 39 bus power flow solution with a 4th order synchronous machine per generator
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    pf = gce.PowerFlowDriver(grid=grid, options=gce.PowerFlowOptions(control_q=False))
+    pf.run()
+
+    nc = gce.compile_numerical_circuit_at(grid)
+    V = pf.results.voltage
+    S = V * np.conj(nc.Ybus @ V)
+    bus_idx = nc.generator_data.get_bus_indices()
+
+    machines = [SimpleNamespace(machine_model=DynamicModels.SynchronousGeneratorOrder4,
+                                H=5.0, Ra=0.0, Xd=1.68, Xdp=0.32, Xdpp=0.2, Xq=1.61, Xqp=0.32, Xqpp=0.2,
+                                Td0p=5.5, Tq0p=4.60375, Snom=1000.0, speed_volt=False)
+                for _ in bus_idx]
+
+    return nc, V, S, machines, bus_idx
+
+
+def test_steady_state() -> None:
+    """
+    Without events, the machines initialised from the power flow stay in steady state
+    """
+    nc, V, S, machines, bus_idx = get_ieee39_case()
+
+    res = dynamic_simulation(n=nc.nbus, Vbus=V, Sbus=S, Ybus=nc.Ybus, Sbase=nc.Sbase, fBase=50.0,
+                             t_sim=1.0, h=0.01, dynamic_devices=machines, bus_indices=bus_idx)
+
+    assert res.voltage.shape == (101, nc.nbus)
+    assert res.omega.shape == (101, len(machines))
+    assert np.allclose(res.voltage, V[np.newaxis, :], atol=1e-8)
+    assert np.allclose(res.omega, 1.0, atol=1e-8)
+    assert res.n_factorizations == 1
+
+
+def test_bus_fault_fixed_and_adaptive_steps() -> None:
+    """
+    A cleared bus fault simulated with fixed steps and with adaptive steps gives the same trajectories,
+    and the augmented admittance matrix is only factorized once per switching state
+    """
+    nc, V, S, machines, bus_idx = get_ieee39_case()
+
+    events = TransientStabilityEvents()
+    events.add(0.1, 'Bus short circuit', 15, None)
+    events.add(0.2, 'Bus recovery', 15, None)
+
+    results = list()
+    for solver in [DiffEqSolver.RUNGE_KUTTA, DiffEqSolver.RUNGE_KUTTA_ADAPTIVE]:
+        res = dynamic_simulation(n=nc.nbus, Vbus=V, Sbus=S, Ybus=nc.Ybus, Sbase=nc.Sbase, fBase=50.0,
+                                 t_sim=2.0, h=0.005, h_out=0.01, dynamic_devices=machines, bus_indices=bus_idx,
+                                 solver=solver, events=events, rtol=1e-6, atol=1e-8)
+        assert res.voltage.shape == (201, nc.nbus)
+        assert res.n_factorizations == 2  # the recovery reuses the pre-fault factorization
+        results.append(res)
+
+    rk4, adaptive = results
+
+    # the faulted bus collapses during the fault
+    assert np.all(np.abs(rk4.voltage[10:20, 15]) < 1e-3)
+    assert np.all(np.abs(adaptive.voltage[10:20, 15]) < 1e-3)
+
+    # the machines accelerate
+    assert np.all(rk4.omega[20, :] > 1.0)
+
+    assert np.allclose(rk4.omega, adaptive.omega, atol=1e-4)
+    assert np.allclose(np.abs(rk4.voltage[20:, :]), np.abs(adaptive.voltage[20:, :]), atol=1e-3)
+
+    # the adaptive steps need fewer network solutions
+    assert adaptive.n_evaluations < rk4.n_evaluations
+
+
+def get_ieee39_screening(scenarios, options: TransientStabilityScreeningOptions) -> TransientStabilityScreening:
+    """
+    Transient stability screening driver of the IEEE 39 bus grid with a machine per generator
+    """
+    fname = os.path.join('data', 'grids', 'IEEE39_1W.gridcal')
+    grid = gce.open_file(fname)
+    pf = gce.PowerFlowDriver(grid=grid, options=gce.PowerFlowOptions(control_q=False))
+    pf.run()
+
+    machines = [SimpleNamespace(machine_model=DynamicModels.SynchronousGeneratorOrder4,
+                                H=5.0, Ra=0.0, Xd=1.68, Xdp=0.32, Xdpp=0.2, Xq=1.61, Xqp=0.32, Xqpp=0.2,
+                                Td0p=5.5, Tq0p=4.60375, Snom=1000.0, speed_volt=False)
+                for _ in grid.get_generators()]
+
+    return TransientStabilityScreening(grid=grid, pf_res=pf.results, dynamic_devices=machines,
+                                       scenarios=scenarios, options=options)
+
+
+def test_screening_and_critical_clearing_times() -> None:
+    """
+    A short fault is stable, a long fault separates the machines and its simulation stops early,
+    and the critical clearing time lies between both clearing times
+    """
+    scenarios = [(15, 0.0, 0.05), (15, 0.0, 0.6), (3, 0.0, 0.05)]
+    options = TransientStabilityScreeningOptions(t_sim=2.0, h=0.005, compute_cct=True, cct_max=0.6,
+                                                 cct_tolerance=0.01, trajectory_step=0.05)
+    driver = get_ieee39_screening(scenarios, options)
+    driver.run()
+    res = driver.results
+
+    assert np.array_equal(res.stable, [True, False, True])
+    assert res.max_angle_separation[1] >= 180.0
+    assert res.t_separation[1] < 2.0
+    assert np.isnan(res.t_separation[0])
+
+    # the stored trajectories are downsampled, and the unstable one is cut at the separation
+    t0, omega0, vm0 = res.trajectories[0]
+    assert len(t0) == 41
+    assert omega0.shape == (41, 10) and vm0.shape == (41, 39)
+    assert res.trajectories[1][0][-1] <= res.t_separation[1] + 0.05
+
+    assert np.array_equal(res.cct_bus, [3, 15])
+    i15 = 1
+    assert 0.05 <= res.cct[i15] < 0.6
+
+    # the reports are built
+    assert res.mdl(gce.ResultTypes.TransientStabilityScreeningReport).to_df().shape[0] == 3
+    assert res.mdl(gce.ResultTypes.CriticalClearingTimes).to_df().shape[0] == 2
+
+
+def test_screening_process_pool() -> None:
+    """
+    Running the scenarios in worker processes gives the same results as running them in this process
+    """
+    scenarios = [(bus, 0.0, tc) for bus in [3, 15, 25] for tc in [0.05, 0.3]]
+
+    results = list()
+    for n_workers in [1, 2]:
+        options = TransientStabilityScreeningOptions(t_sim=1.0, h=0.01, n_workers=n_workers)
+        driver = get_ieee39_screening(scenarios, options)
+        driver.run()
+        results.append(driver.results)
+
+    serial, pool = results
+    assert np.array_equal(serial.stable, pool.stable)
+    assert np.allclose(serial.max_angle_separation, pool.max_angle_separation)
+    assert np.allclose(serial.min_voltage, pool.min_voltage)
@@ -0,0 +1,101 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+Benchmark of the MultiCircuit copies and comparisons.
+It generates a meshed grid with time series and compares the time of MultiCircuit.copy()
+and MultiCircuit.fast_copy(). Then it times the hash-indexed diff_circuits of the fast copy
+against the original, and the equality is also checked with compare_circuits on a smaller grid,
+since that comparison is slow.
+"""
+import time
+import numpy as np
+import pandas as pd
+import GridCalEngine.api as gce
+
+
+def make_mesh_grid(n_buses: int = 20000, n_time: int = 8760) -> gce.MultiCircuit:
+    """
+    Generate a meshed grid with loads, generators and profiles
+    :param n_buses: number of buses
+    :param n_time: number of time steps
+    :return: MultiCircuit
+    """
+    grid = gce.MultiCircuit()
+    grid.time_profile = pd.date_range(start='2024-01-01', periods=n_time, freq='h')
+    nx = int(np.ceil(np.sqrt(n_buses)))
+    rng = np.random.default_rng(0)
+
+    buses = list()
+    for i in range(n_buses):
+        bus = gce.Bus(name=f"Bus {i}", Vnom=20.0)
+        grid.add_bus(bus)
+        buses.append(bus)
+
+        if i % 3 == 0:
+            load = gce.Load(name=f"Load {i}", P=1.0, Q=0.2)
+            grid.add_load(bus, load)
+            load.P_prof = rng.random(n_time)
+
+        if i % 50 == 0:
+            gen = gce.Generator(name=f"Gen {i}", P=20.0)
+            grid.add_generator(bus, gen)
+            gen.P_prof = 20.0 * rng.random(n_time)
+
+    for i in range(n_buses):
+        if (i + 1) % nx != 0 and i + 1 < n_buses:
+            grid.add_line(gce.Line(bus_from=buses[i], bus_to=buses[i + 1], name=f"Line h{i}", r=0.01, x=0.05))
+
+        if i + nx < n_buses:
+            grid.add_line(gce.Line(bus_from=buses[i], bus_to=buses[i + nx], name=f"Line v{i}", r=0.01, x=0.05))
+
+    return grid
+
+
+def run_benchmark(n_buses: int = 20000, n_time: int = 8760) -> None:
+    """
+    Run the benchmark
+    :param n_buses: number of buses of the generated grid
+    :param n_time: number of time steps
+    """
+    grid = make_mesh_grid(n_buses=n_buses, n_time=n_time)
+    print(f"{grid.get_bus_number()} buses, {len(grid.lines)} lines, {len(grid.loads)} loads, "
+          f"{len(grid.generators)} generators, {n_time} time steps")
+
+    t0 = time.perf_counter()
+    grid.copy()
+    print(f"copy():      {time.perf_counter() - t0:8.3f} s")
+
+    t0 = time.perf_counter()
+    grid_cpy = grid.fast_copy()
+    print(f"fast_copy(): {time.perf_counter() - t0:8.3f} s")
+
+    grid_cpy.loads[5].P_prof[7] = 3.0
+    grid_cpy.lines[4].R = 0.02
+
+    t0 = time.perf_counter()
+    diff = gce.diff_circuits(grid, grid_cpy)
+    print(f"diff_circuits(): {time.perf_counter() - t0:8.3f} s")
+    print(diff.to_df())
+
+    grid = make_mesh_grid(n_buses=500, n_time=100)
+    grid_cpy = grid.fast_copy()
+    equal, logger = grid.compare_circuits(grid_cpy, detailed_profile_comparison=True)
+    print("The fast copy is equal to the original" if equal else "The fast copy differs from the original!")
+
+
+if __name__ == '__main__':
+    run_benchmark(n_buses=20000, n_time=8760)
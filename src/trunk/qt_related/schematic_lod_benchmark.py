@@ -0,0 +1,134 @@
+# GridCal
+# Copyright (C) 2015 - 2024 Santiago Peñate Vera
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+"""
+Benchmark of the schematic rendering of a large generated grid.
+It opens a meshed grid of 20k buses and measures the frame times while zooming through
+the levels of detail, with and without the level of detail handling.
+"""
+import sys
+import time
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+import GridCalEngine.api as gce
+from GridCal.Gui.Diagrams.SchematicWidget.schematic_widget import SchematicWidget, generate_schematic_diagram
+
+
+def make_mesh_grid(n_buses: int = 20000, spacing: int = 200) -> gce.MultiCircuit:
+    """
+    Generate a meshed grid with loads and generators
+    :param n_buses: number of buses
+    :param spacing: distance between buses in the schematic (px)
+    :return: MultiCircuit
+    """
+    grid = gce.MultiCircuit()
+    nx = int(np.ceil(np.sqrt(n_buses)))
+
+    buses = list()
+    for i in range(n_buses):
+        bus = gce.Bus(name=f"Bus {i}", Vnom=20.0)
+        bus.x = (i % nx) * spacing
+        bus.y = (i // nx) * spacing
+        grid.add_bus(bus)
+        buses.append(bus)
+
+        if i % 3 == 0:
+            grid.add_load(bus, gce.Load(name=f"Load {i}", P=1.0, Q=0.2))
+
+        if i % 50 == 0:
+            grid.add_generator(bus, gce.Generator(name=f"Gen {i}", P=20.0))
+
+    for i in range(n_buses):
+        if (i + 1) % nx != 0 and i + 1 < n_buses:
+            grid.add_line(gce.Line(bus_from=buses[i], bus_to=buses[i + 1], name=f"Line h{i}", r=0.01, x=0.05))
+
+        if i + nx < n_buses:
+            grid.add_line(gce.Line(bus_from=buses[i], bus_to=buses[i + nx], name=f"Line v{i}", r=0.01, x=0.05))
+
+    return grid
+
+
+def measure_frames(widget: SchematicWidget, app: QApplication, n_frames: int = 10) -> float:
+    """
+    Measure the average time to paint the viewport
+    :param widget: SchematicWidget
+    :param app: QApplication
+    :param n_frames: number of frames to average
+    :return: average frame time (s)
+    """
+    app.processEvents()
+    t0 = time.perf_counter()
+    for _ in range(n_frames):
+        widget.editor_graphics_view.viewport().repaint()
+    return (time.perf_counter() - t0) / n_frames
+
+
+def run_benchmark(n_buses: int = 20000) -> None:
+    """
+    Run the benchmark
+    :param n_buses: number of buses of the generated grid
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    grid = make_mesh_grid(n_buses=n_buses)
+
+    diagram = generate_schematic_diagram(buses=grid.buses,
+                                         busbars=list(),
+                                         connecivity_nodes=list(),
+                                         lines=grid.lines,
+                                         dc_lines=list(),
+                                         transformers2w=list(),
+                                         transformers3w=list(),
+                                         windings=list(),
+                                         hvdc_lines=list(),
+                                         vsc_devices=list(),
+                                         upfc_devices=list(),
+                                         series_reactances=list(),
+                                         switches=list(),
+                                         fluid_nodes=list(),
+                                         fluid_paths=list())
+
+    for use_lod in [False, True]:
+
+        t0 = time.perf_counter()
+        widget = SchematicWidget(gui=None, circuit=grid, diagram=None)
+        widget.lod.enabled = use_lod
+        widget.diagram = diagram
+        widget.draw()
+        widget.resize(1600, 1000)
+        widget.show()
+        widget.center_nodes()
+        t_open = time.perf_counter() - t0
+
+        print(f"\nLevel of detail {'enabled' if use_lod else 'disabled'}: "
+              f"{len(grid.buses)} buses, {len(grid.lines)} lines, opened in {t_open:.2f} s")
+
+        # zoom in from the whole grid view to the detail
+        for step in range(25):
+            t0 = time.perf_counter()
+            widget.zoom_in(1.15)
+            t_zoom = time.perf_counter() - t0
+            t_frame = measure_frames(widget=widget, app=app)
+            scale = widget.editor_graphics_view.transform().m11()
+            print(f"scale {scale:8.4f}  level {widget.lod.level}  zoom {t_zoom * 1e3:8.2f} ms  "
+                  f"frame {t_frame * 1e3:8.2f} ms")
+
+        widget.close()
+
+
+if __name__ == '__main__':
+    run_benchmark(n_buses=20000)